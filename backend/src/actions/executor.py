@@ -1,7 +1,8 @@
+import asyncio
 import logging
 from typing import Optional
 
-from backend.src.actions.registry import get_action_spec, normalize_action_type
+from backend.src.actions.registry import ActionTypeSpec, get_action_spec, normalize_action_type
 from backend.src.actions.post_action_verifier import verify_and_normalize_action_result
 from backend.src.common.errors import AppError
 from backend.src.common.utils import parse_json_dict
@@ -15,27 +16,22 @@ from backend.src.services.llm.prompt_templates import ensure_llm_call_template
 logger = logging.getLogger(__name__)
 
 
-def _execute_step_action(
-    task_id: int, run_id: int, step_row, context: Optional[dict] = None
-) -> tuple[Optional[dict], Optional[str]]:
+def _resolve_step_action(step_row) -> tuple[Optional[str], dict, Optional[ActionTypeSpec], Optional[str]]:
     """
-    执行单个步骤 action（Agent/ReAct 与 tasks.execute 共用）。
-
-    返回：(result, error_message)：
-    - result 为 dict（用于持久化到 task_steps.result）
-    - error_message 非空表示本步失败
+    解析 step_row.detail 为 (action_type, payload, spec, error_message)（同步/异步执行共用）。
+    error_message 非空表示无法执行。
     """
     detail = step_row["detail"]
     if not detail:
-        return None, ERROR_MESSAGE_PROMPT_RENDER_FAILED
+        return None, {}, None, ERROR_MESSAGE_PROMPT_RENDER_FAILED
     action = parse_json_dict(detail)
     if not action:
-        return None, ERROR_MESSAGE_PROMPT_RENDER_FAILED
+        return None, {}, None, ERROR_MESSAGE_PROMPT_RENDER_FAILED
     raw_type = action.get("type")
     action_type = normalize_action_type(raw_type) or raw_type
     payload = action.get("payload", {})
     if not isinstance(payload, dict):
-        return None, ERROR_MESSAGE_PROMPT_RENDER_FAILED
+        return None, {}, None, ERROR_MESSAGE_PROMPT_RENDER_FAILED
 
     # 容错：LLM 规划时可能把 template_id 写成字符串（例如模板名称），导致 pydantic 校验失败。
     # 这里做一次归一化，尽量把“计划错误”转化为“可执行”的 llm_call。
@@ -49,7 +45,7 @@ def _execute_step_action(
 
     spec = get_action_spec(str(action_type or "").strip())
     if not spec:
-        return None, ERROR_MESSAGE_ACTION_UNSUPPORTED
+        return None, {}, None, ERROR_MESSAGE_ACTION_UNSUPPORTED
 
     allowed_keys = spec.allowed_payload_keys or set()
     if allowed_keys:
@@ -59,6 +55,22 @@ def _execute_step_action(
             # 说明：detail 仍保留原始输入，便于审计；执行阶段仅使用过滤后的 payload。
             payload = {key: value for key, value in payload.items() if key in allowed_keys}
             logger.debug("drop_extra_payload_keys action_type=%s extra=%s", action_type, extra_keys)
+    return action_type, payload, spec, None
+
+
+def _execute_step_action(
+    task_id: int, run_id: int, step_row, context: Optional[dict] = None
+) -> tuple[Optional[dict], Optional[str]]:
+    """
+    执行单个步骤 action（Agent/ReAct 与 tasks.execute 共用）。
+
+    返回：(result, error_message)：
+    - result 为 dict（用于持久化到 task_steps.result）
+    - error_message 非空表示本步失败
+    """
+    action_type, payload, spec, resolve_error = _resolve_step_action(step_row)
+    if resolve_error or spec is None:
+        return None, resolve_error or ERROR_MESSAGE_ACTION_UNSUPPORTED
 
     try:
         result, error = spec.executor(int(task_id), int(run_id), step_row, payload, context)
@@ -77,4 +89,40 @@ def _execute_step_action(
         return None, message or ERROR_MESSAGE_PROMPT_RENDER_FAILED
 
 
-__all__ = ["_execute_step_action"]
+async def execute_step_action_async(
+    task_id: int, run_id: int, step_row, context: Optional[dict] = None
+) -> tuple[Optional[dict], Optional[str]]:
+    """
+    _execute_step_action 的 asyncio 版本（返回值语义一致）。
+
+    说明：
+    - spec.async_executor 存在时原生 await（调用方 task 被 cancel 即可中止在途 LLM/子进程）；
+    - 否则回退为 asyncio.to_thread 执行同步 executor（兼容层：行为与同步路径一致，但无法被 cancel 打断）。
+    """
+    action_type, payload, spec, resolve_error = _resolve_step_action(step_row)
+    if resolve_error or spec is None:
+        return None, resolve_error or ERROR_MESSAGE_ACTION_UNSUPPORTED
+
+    try:
+        if spec.async_executor is not None:
+            result, error = await spec.async_executor(int(task_id), int(run_id), step_row, payload, context)
+        else:
+            result, error = await asyncio.to_thread(
+                spec.executor, int(task_id), int(run_id), step_row, payload, context
+            )
+        return verify_and_normalize_action_result(
+            action_type=action_type,
+            payload=payload,
+            result=result,
+            error=error,
+            context=context,
+        )
+    except AppError as exc:
+        message = str(exc.message or "").strip()
+        return None, message or ERROR_MESSAGE_PROMPT_RENDER_FAILED
+    except Exception as exc:
+        message = str(exc).strip()
+        return None, message or ERROR_MESSAGE_PROMPT_RENDER_FAILED
+
+
+__all__ = ["_execute_step_action", "execute_step_action_async"]
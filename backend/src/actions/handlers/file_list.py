@@ -6,11 +6,36 @@ from backend.src.actions.handlers.file_action_common import (
     require_action_path,
     resolve_action_target_path,
 )
+from backend.src.common.dir_listing import (
+    SORT_MTIME,
+    SORT_NAME,
+    IgnoreRules,
+    load_gitignore_patterns,
+    normalize_patterns,
+    scan_directory,
+)
+from backend.src.constants import AGENT_FILE_LIST_DEFAULT_EXCLUDES, AGENT_FILE_LIST_MAX_SCAN_ENTRIES
+from backend.src.services.tasks.run_listing_cache import get_cached_listing, store_listing
+
+
+def _optional_positive_int(value: object) -> Optional[int]:
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        parsed = int(value)
+    except Exception:
+        return None
+    return parsed if parsed > 0 else None
 
 
-def execute_file_list(payload: dict) -> Tuple[Optional[dict], Optional[str]]:
+def execute_file_list(payload: dict, *, run_id: Optional[int] = None) -> Tuple[Optional[dict], Optional[str]]:
     """
-    执行 file_list：列出目录内容。
+    执行 file_list：列出目录内容（os.scandir 增量遍历）。
+
+    - recursive 时只列文件，默认剪枝 .git/node_modules/.venv 等目录；exclude 为 gitignore 风格规则，
+      gitignore=true 时追加目录下 .gitignore；max_depth 限制递归层数；
+    - max_entries 达到即停止遍历（sort=mtime 时返回最新的 N 个文件）；
+    - 传入 run_id 时复用本 run 内同目录同参数的上次结果（目录未变化时）。
     """
     path = require_action_path(payload, "file_list")
     permission_error = ensure_write_permission_for_action(path, "file_list")
@@ -32,39 +57,43 @@ def execute_file_list(payload: dict) -> Tuple[Optional[dict], Optional[str]]:
     else:
         pattern = None
 
-    max_entries = payload.get("max_entries")
-    if max_entries is not None:
-        try:
-            max_entries = int(max_entries)
-        except Exception:
-            max_entries = None
+    max_entries = _optional_positive_int(payload.get("max_entries"))
+    max_depth = _optional_positive_int(payload.get("max_depth")) if recursive else None
+    sort = SORT_MTIME if str(payload.get("sort") or "").strip().lower() == SORT_MTIME else SORT_NAME
+    use_gitignore = payload.get("gitignore") is True
 
-    items = []
+    exclude = []
     if recursive:
-        for root, _dirs, files in os.walk(target_path):
-            for name in files:
-                full = os.path.join(root, name)
-                rel = os.path.relpath(full, target_path)
-                if pattern and pattern not in rel:
-                    continue
-                items.append(rel.replace("\\", "/"))
-                if isinstance(max_entries, int) and max_entries > 0 and len(items) >= max_entries:
-                    break
-            if isinstance(max_entries, int) and max_entries > 0 and len(items) >= max_entries:
-                break
-    else:
-        for name in os.listdir(target_path):
-            full = os.path.join(target_path, name)
-            rel = os.path.relpath(full, target_path)
-            if pattern and pattern not in rel:
-                continue
-            items.append(rel.replace("\\", "/"))
-            if isinstance(max_entries, int) and max_entries > 0 and len(items) >= max_entries:
-                break
+        exclude.extend(AGENT_FILE_LIST_DEFAULT_EXCLUDES)
+    if use_gitignore:
+        exclude.extend(load_gitignore_patterns(target_path))
+    exclude.extend(normalize_patterns(payload.get("exclude")))
+
+    params = (recursive, pattern, max_entries, max_depth, sort, tuple(exclude))
+    listing = get_cached_listing(run_id=int(run_id), root=target_path, params=params) if run_id else None
+    cached = listing is not None
+    if listing is None:
+        listing = scan_directory(
+            target_path,
+            recursive=recursive,
+            max_depth=max_depth,
+            max_entries=max_entries,
+            pattern=pattern,
+            ignore=IgnoreRules(exclude),
+            sort=sort,
+            scan_limit=int(AGENT_FILE_LIST_MAX_SCAN_ENTRIES),
+        )
+        if run_id:
+            store_listing(run_id=int(run_id), root=target_path, params=params, listing=listing)
 
+    items = list(listing.items)
     return {
         "path": target_path,
         "count": len(items),
         "items": items,
         "recursive": bool(recursive),
+        "truncated": bool(listing.truncated),
+        "scanned": int(listing.scanned),
+        "sort": sort,
+        "cached": cached,
     }, None
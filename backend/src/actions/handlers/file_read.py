@@ -8,10 +8,47 @@ from backend.src.actions.handlers.file_action_common import (
     resolve_action_target_path,
 )
 from backend.src.common.errors import AppError
-from backend.src.constants import ERROR_CODE_INVALID_REQUEST, HTTP_STATUS_BAD_REQUEST
+from backend.src.common.text_window import ENCODING_AUTO, TextWindowReader
+from backend.src.constants import (
+    AGENT_FILE_READ_DEFAULT_MAX_BYTES,
+    AGENT_FILE_READ_DEFAULT_MAX_LINES,
+    ERROR_CODE_INVALID_REQUEST,
+    HTTP_STATUS_BAD_REQUEST,
+)
+
+_DEFAULT_GREP_MAX_MATCHES = 100
 
 
-def _read_text_file(path: str, encoding: str, max_bytes: Optional[int]) -> dict:
+def _optional_int(value: object) -> Optional[int]:
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, str) and not value.strip():
+        return None
+    try:
+        return int(value)
+    except Exception:
+        return None
+
+
+def _read_text_file(
+    path: str,
+    encoding: str,
+    max_bytes: Optional[int],
+    *,
+    offset: Optional[int] = None,
+    start_line: Optional[int] = None,
+    max_lines: Optional[int] = None,
+    tail_lines: Optional[int] = None,
+    grep: Optional[str] = None,
+    ignore_case: bool = False,
+    max_matches: Optional[int] = None,
+) -> dict:
+    """
+    窗口化读取文本文件（mmap，窗口之外不读入内存）。
+
+    模式（按优先级）：grep 文件内检索 > tail_lines 尾部 N 行 > start_line/max_lines 行区间 > offset/max_bytes 字节窗口。
+    返回始终带 size/encoding/total_lines 元数据；has_more 为真时可用 next_offset / next_line 继续翻页。
+    """
     target_path = resolve_action_target_path(path)
     if not target_path:
         raise AppError(
@@ -26,41 +63,62 @@ def _read_text_file(path: str, encoding: str, max_bytes: Optional[int]) -> dict:
             status_code=HTTP_STATUS_BAD_REQUEST,
         )
 
-    limit = None
-    if isinstance(max_bytes, int) and max_bytes > 0:
-        limit = int(max_bytes)
-
-    with open(target_path, "rb") as f:
-        raw = f.read(limit) if limit else f.read()
-    try:
-        text = raw.decode(encoding, errors="ignore")
-    except Exception:
-        text = raw.decode("utf-8", errors="ignore")
+    limit = int(max_bytes) if isinstance(max_bytes, int) and max_bytes > 0 else int(AGENT_FILE_READ_DEFAULT_MAX_BYTES)
 
-    return {
-        "path": target_path,
-        "bytes": len(raw),
-        "content": text,
-    }
+    with TextWindowReader(target_path, encoding=encoding) as reader:
+        result = {"path": target_path, "mode": "bytes"}
+        if grep:
+            found = reader.grep(
+                grep,
+                ignore_case=bool(ignore_case),
+                max_matches=max_matches or _DEFAULT_GREP_MAX_MATCHES,
+            )
+            content = "\n".join(f"{item['line']}: {item['text']}" for item in found["matches"])
+            result.update(found)
+            result.update({"mode": "grep", "content": content, "bytes": len(content.encode("utf-8"))})
+        elif tail_lines:
+            result.update(reader.read_tail(tail_lines, limit))
+            result["mode"] = "tail"
+        elif start_line or max_lines:
+            window = reader.read_lines(start_line or 1, max_lines or int(AGENT_FILE_READ_DEFAULT_MAX_LINES), limit)
+            result.update(window)
+            result["mode"] = "lines"
+            if window.get("has_more"):
+                if window.get("line_truncated"):
+                    result["next_offset"] = window.get("end_offset")
+                elif window.get("end_line"):
+                    result["next_line"] = int(window["end_line"]) + 1
+        else:
+            window = reader.read_bytes(offset or 0, limit)
+            result.update(window)
+            if window.get("has_more"):
+                result["next_offset"] = window.get("end_offset")
+        result.update(reader.metadata())
+    return result
 
 
 def execute_file_read(payload: dict) -> Tuple[Optional[dict], Optional[str]]:
     """
-    执行 file_read：读取文本文件内容。
+    执行 file_read：按窗口读取文本文件内容（字节/行区间、尾部、文件内检索）。
     """
     path = require_action_path(payload, "file_read")
     permission_error = ensure_write_permission_for_action(path, "file_read")
     if permission_error:
         return None, permission_error
 
-    encoding = normalize_encoding(payload.get("encoding"))
-
-    max_bytes = payload.get("max_bytes")
-    if max_bytes is not None:
-        try:
-            max_bytes = int(max_bytes)
-        except Exception:
-            max_bytes = None
+    # 未指定编码时嗅探（BOM/utf-8/gb18030）
+    encoding = normalize_encoding(payload.get("encoding"), default=ENCODING_AUTO)
 
-    result = _read_text_file(path=path, encoding=encoding, max_bytes=max_bytes)
+    result = _read_text_file(
+        path=path,
+        encoding=encoding,
+        max_bytes=_optional_int(payload.get("max_bytes")),
+        offset=_optional_int(payload.get("offset")),
+        start_line=_optional_int(payload.get("start_line")),
+        max_lines=_optional_int(payload.get("max_lines")),
+        tail_lines=_optional_int(payload.get("tail_lines")),
+        grep=str(payload.get("grep") or "") or None,
+        ignore_case=payload.get("ignore_case") is True,
+        max_matches=_optional_int(payload.get("max_matches")),
+    )
     return result, None
@@ -1,4 +1,6 @@
-from typing import Optional, Tuple
+import time
+from dataclasses import dataclass
+from typing import Any, Generator, Optional, Tuple
 from urllib.parse import urlparse
 
 from backend.src.actions.handlers.common_utils import truncate_inline_text
@@ -13,16 +15,48 @@ except ModuleNotFoundError:
 
     class _MissingHttpxModule:
         Client = _MissingHttpxClient
+        AsyncClient = _MissingHttpxClient
 
     httpx = _MissingHttpxModule()  # type: ignore[assignment]
 
 from backend.src.constants import HTTP_REQUEST_DEFAULT_TIMEOUT_MS
 from backend.src.common.task_error_codes import format_task_error
+from backend.src.services.search.source_reputation import (
+    is_source_host_skipped,
+    plan_source_candidates,
+    record_source_attempt,
+)
 
 # HTTP 错误状态码时的预览截断长度
 _ERROR_PREVIEW_CHARS = 260
 
 
+@dataclass
+class _HttpFetchRequest:
+    """一次网络请求的参数（同步/异步执行共用）。"""
+
+    method: str
+    url: str
+    headers: Optional[dict]
+    params: Optional[dict]
+    data: Any
+    json_data: Any
+    follow_redirects: bool
+    timeout: Optional[float]
+    max_bytes: Optional[int]
+
+
+@dataclass
+class _HttpFetchResponse:
+    """网络请求的原始结果（stream context 关闭前保存的元数据 + 已截断的 body）。"""
+
+    raw: bytes
+    encoding: Optional[str]
+    status_code: int
+    url: str
+    headers: dict
+
+
 def _extract_business_error_message(text: str) -> Optional[str]:
     """
     从 JSON 响应里提取业务失败信息。
@@ -197,6 +231,119 @@ def execute_http_request(payload: dict) -> Tuple[Optional[dict], Optional[str]]:
     默认启用业务成功门禁：当 JSON 中包含 success=false 时，步骤按失败处理，
     避免后续链路在错误响应上继续“编造数据”。
     """
+    attempts = _iter_http_request_attempts(payload)
+    try:
+        request = next(attempts)
+        while True:
+            try:
+                response = _fetch_http(request)
+            except Exception as exc:
+                request = attempts.throw(exc)
+            else:
+                request = attempts.send(response)
+    except StopIteration as exc:
+        return exc.value
+
+
+async def execute_http_request_async(payload: dict) -> Tuple[Optional[dict], Optional[str]]:
+    """execute_http_request 的 asyncio 版本（httpx.AsyncClient；调用方 task 被 cancel 即中止在途请求）。"""
+    attempts = _iter_http_request_attempts(payload)
+    try:
+        request = next(attempts)
+        while True:
+            try:
+                response = await _fetch_http_async(request)
+            except Exception as exc:
+                request = attempts.throw(exc)
+            else:
+                request = attempts.send(response)
+    except StopIteration as exc:
+        return exc.value
+
+
+def _fetch_http(request: _HttpFetchRequest) -> _HttpFetchResponse:
+    with httpx.Client(timeout=request.timeout) as client:
+        with client.stream(
+            request.method,
+            request.url,
+            headers=request.headers,
+            params=request.params,
+            data=request.data,
+            json=request.json_data,
+            follow_redirects=request.follow_redirects,
+        ) as resp:
+            if request.max_bytes is not None:
+                remaining = int(request.max_bytes)
+                chunks: list[bytes] = []
+                for chunk in resp.iter_bytes():
+                    if not chunk:
+                        continue
+                    if remaining <= 0:
+                        break
+                    if len(chunk) > remaining:
+                        chunks.append(chunk[:remaining])
+                        remaining = 0
+                        break
+                    chunks.append(chunk)
+                    remaining -= len(chunk)
+                raw = b"".join(chunks)
+            else:
+                raw = resp.read() or b""
+            # 在 stream context 关闭前保存响应元数据，避免连接释放后属性不可用
+            return _HttpFetchResponse(
+                raw=raw[: request.max_bytes] if request.max_bytes is not None else raw,
+                encoding=resp.encoding,
+                status_code=resp.status_code,
+                url=str(resp.url),
+                headers=dict(resp.headers),
+            )
+
+
+async def _fetch_http_async(request: _HttpFetchRequest) -> _HttpFetchResponse:
+    async with httpx.AsyncClient(timeout=request.timeout) as client:
+        async with client.stream(
+            request.method,
+            request.url,
+            headers=request.headers,
+            params=request.params,
+            data=request.data,
+            json=request.json_data,
+            follow_redirects=request.follow_redirects,
+        ) as resp:
+            if request.max_bytes is not None:
+                remaining = int(request.max_bytes)
+                chunks: list[bytes] = []
+                async for chunk in resp.aiter_bytes():
+                    if not chunk:
+                        continue
+                    if remaining <= 0:
+                        break
+                    if len(chunk) > remaining:
+                        chunks.append(chunk[:remaining])
+                        remaining = 0
+                        break
+                    chunks.append(chunk)
+                    remaining -= len(chunk)
+                raw = b"".join(chunks)
+            else:
+                raw = await resp.aread() or b""
+            return _HttpFetchResponse(
+                raw=raw[: request.max_bytes] if request.max_bytes is not None else raw,
+                encoding=resp.encoding,
+                status_code=resp.status_code,
+                url=str(resp.url),
+                headers=dict(resp.headers),
+            )
+
+
+def _iter_http_request_attempts(
+    payload: dict,
+) -> Generator[_HttpFetchRequest, _HttpFetchResponse, Tuple[Optional[dict], Optional[str]]]:
+    """
+    http_request 的主体（同步/异步执行共用）：解析 payload、按候选源依次尝试并做状态码/业务门禁。
+
+    每个候选源 yield 一个 _HttpFetchRequest，由调用方发起请求后 send 回 _HttpFetchResponse（网络异常经 throw 抛回）。
+    """
     url = payload.get("url")
     if not isinstance(url, str) or not url.strip():
         raise ValueError("http_request.url 不能为空")
@@ -265,44 +412,15 @@ def execute_http_request(payload: dict) -> Tuple[Optional[dict], Optional[str]]:
         source_candidates.append(text)
     if not source_candidates:
         return None, "http_request 执行失败: 未提供有效请求源"
-    ordered_candidates = _reorder_source_candidates(source_candidates)
-
-    def _execute_once(request_url: str) -> Tuple[Optional[dict], Optional[str], str]:
-        with httpx.Client(timeout=timeout) as client:
-            with client.stream(
-                method,
-                request_url,
-                headers=headers,
-                params=params,
-                data=data,
-                json=json_data,
-                follow_redirects=bool(allow_redirects),
-            ) as resp:
-                if isinstance(max_bytes, int) and max_bytes > 0:
-                    remaining = int(max_bytes)
-                    chunks: list[bytes] = []
-                    for chunk in resp.iter_bytes():
-                        if not chunk:
-                            continue
-                        if remaining <= 0:
-                            break
-                        if len(chunk) > remaining:
-                            chunks.append(chunk[:remaining])
-                            remaining = 0
-                            break
-                        chunks.append(chunk)
-                        remaining -= len(chunk)
-                    raw = b"".join(chunks)
-                else:
-                    raw = resp.read() or b""
-                # 在 stream context 关闭前保存响应元数据，避免连接释放后属性不可用
-                resp_encoding = resp.encoding
-                resp_status_code = resp.status_code
-                resp_url = str(resp.url)
-                resp_headers = dict(resp.headers)
-        if isinstance(max_bytes, int) and max_bytes > 0:
-            raw = raw[:max_bytes]
-        use_encoding = encoding or resp_encoding or "utf-8"
+    # 先按 host 去重交错，再按跨 run 信誉稳定重排（冷却中的 host 排最后/跳过）
+    ordered_candidates, cooling_hosts = plan_source_candidates(
+        _reorder_source_candidates(source_candidates),
+        host_of=_normalize_host,
+    )
+
+    def _evaluate_response(request_url: str, response: _HttpFetchResponse) -> Tuple[Optional[dict], Optional[str], str]:
+        raw = response.raw
+        use_encoding = encoding or response.encoding or "utf-8"
         try:
             text = raw.decode(use_encoding, errors="ignore")
         except Exception:
@@ -310,12 +428,12 @@ def execute_http_request(payload: dict) -> Tuple[Optional[dict], Optional[str]]:
 
         # 默认启用状态码门禁：HTTP>=400 直接视为失败，避免把 429/403/404 页面当作"成功抓取证据"继续执行。
         try:
-            status_code = int(resp_status_code)
+            status_code = int(response.status_code)
         except Exception:
             status_code = 0
         if bool(strict_status_code) and status_code >= 400:
             preview = truncate_inline_text(text, _ERROR_PREVIEW_CHARS)
-            url_text = resp_url
+            url_text = response.url
             tail = f" {preview}" if preview else ""
             code = _classify_http_status_error_code(int(status_code))
             return None, format_task_error(
@@ -333,9 +451,9 @@ def execute_http_request(payload: dict) -> Tuple[Optional[dict], Optional[str]]:
                 return None, message_text, business_code
 
         return {
-            "url": resp_url,
-            "status_code": int(resp_status_code),
-            "headers": resp_headers,
+            "url": response.url,
+            "status_code": int(response.status_code),
+            "headers": response.headers,
             "bytes": len(raw),
             "content": text,
             "source_url": str(request_url),
@@ -352,14 +470,38 @@ def execute_http_request(payload: dict) -> Tuple[Optional[dict], Optional[str]]:
                 errors.append(f"source#{idx + 1} {source_url} -> {skipped_error}")
             last_error = skipped_error
             continue
+        if is_source_host_skipped(source_host, cooling_hosts):
+            skipped_error = f"http_request 跳过冷却中的来源: host={source_host}"
+            errors.append(f"source#{idx + 1} {source_url} -> {skipped_error}")
+            last_error = skipped_error
+            continue
+        started = time.monotonic()
         try:
-            result, error_message, error_code = _execute_once(source_url)
+            response = yield _HttpFetchRequest(
+                method=method,
+                url=source_url,
+                headers=headers,
+                params=params,
+                data=data,
+                json_data=json_data,
+                follow_redirects=bool(allow_redirects),
+                timeout=timeout,
+                max_bytes=max_bytes if isinstance(max_bytes, int) and max_bytes > 0 else None,
+            )
+            result, error_message, error_code = _evaluate_response(source_url, response)
         except Exception as exc:
             error_code = _classify_exception_error_code(str(exc))
             result, error_message = None, format_task_error(
                 code=error_code,
                 message=f"http_request 执行失败: {exc}",
             )
+        record_source_attempt(
+            source_host,
+            ok=not error_message and result is not None,
+            latency_ms=(time.monotonic() - started) * 1000,
+            error_code=error_code,
+            host_level=bool(error_message) and _is_host_level_failure_code(error_code),
+        )
         if error_message:
             last_error = str(error_message)
             if source_host and _is_host_level_failure_code(error_code):
@@ -2,6 +2,7 @@ from typing import Optional, Tuple
 
 from backend.src.constants import ERROR_MESSAGE_LLM_CALL_FAILED, LLM_STATUS_ERROR
 from backend.src.services.llm.llm_calls import create_llm_call as _create_llm_call
+from backend.src.services.llm.llm_calls import create_llm_call_async as _create_llm_call_async
 
 
 def execute_llm_call(task_id: int, run_id: int, payload: dict) -> Tuple[Optional[dict], Optional[str]]:
@@ -15,6 +16,19 @@ def execute_llm_call(task_id: int, run_id: int, payload: dict) -> Tuple[Optional
     payload.setdefault("run_id", run_id)
 
     result = _create_llm_call(payload)
+    return _record_from_llm_call_result(result)
+
+
+async def execute_llm_call_async(task_id: int, run_id: int, payload: dict) -> Tuple[Optional[dict], Optional[str]]:
+    """execute_llm_call 的 asyncio 版本（走 create_llm_call_async，可被 cancel 中止）。"""
+    payload.setdefault("task_id", task_id)
+    payload.setdefault("run_id", run_id)
+
+    result = await _create_llm_call_async(payload)
+    return _record_from_llm_call_result(result)
+
+
+def _record_from_llm_call_result(result: object) -> Tuple[Optional[dict], Optional[str]]:
     record = result.get("record") if isinstance(result, dict) else None
 
     # create_llm_call 可能返回 status=error 的 record（HTTP 仍是 200）；任务执行应将其视为失败
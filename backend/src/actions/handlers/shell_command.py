@@ -18,11 +18,11 @@ from backend.src.common.csv_artifact_quality import build_csv_quality_failure_te
 from backend.src.common.task_error_codes import format_task_error
 from backend.src.common.utils import is_test_env, parse_json_value
 from backend.src.actions.handlers.common_utils import (
-    load_json_object,
     parse_command_tokens,
     resolve_path_with_workdir,
 )
 from backend.src.constants import (
+    ACTION_TYPE_SHELL_COMMAND,
     AGENT_EXPERIMENT_DIR_REL,
     ERROR_MESSAGE_COMMAND_FAILED,
     ERROR_MESSAGE_PERMISSION_DENIED,
@@ -33,9 +33,13 @@ from backend.src.constants import (
 
 # python -c 代码复杂度判断阈值（字符数）
 _COMPLEX_PYTHON_C_CODE_LENGTH_THRESHOLD = 220
-from backend.src.repositories.task_steps_repo import list_task_steps_for_run
 from backend.src.services.permissions.permissions_store import has_exec_permission
+from backend.src.services.execution.process_capture import (
+    build_context_output_progress,
+    shell_output_progress_scope,
+)
 from backend.src.services.execution.shell_command import run_shell_command
+from backend.src.services.tasks.run_artifacts import get_run_written_paths
 
 
 def _detect_unsupported_shell_operator(command: object) -> str:
@@ -260,53 +264,13 @@ def _collect_written_script_paths(
     *,
     task_id: int,
     run_id: int,
-    workdir: str,
     current_step_id: Optional[int],
 ) -> Set[str]:
-    paths: Set[str] = set()
+    # 直接查 run 产物登记（写入时维护），不再回扫 task_steps
     try:
-        rows = list_task_steps_for_run(task_id=int(task_id), run_id=int(run_id))
+        return get_run_written_paths(task_id=int(task_id), run_id=int(run_id), exclude_step_ids=(current_step_id,))
     except Exception:
-        return paths
-
-    for row in rows or []:
-        if not row:
-            continue
-        try:
-            row_data = dict(row)
-        except Exception:
-            continue
-
-        try:
-            row_id = int(row_data.get("id")) if row_data.get("id") is not None else None
-        except Exception:
-            row_id = None
-        if current_step_id is not None and row_id == int(current_step_id):
-            continue
-
-        status = str(row_data.get("status") or "").strip().lower()
-        if status != "done":
-            continue
-
-        detail_obj = load_json_object(row_data.get("detail"))
-        action_type = str(detail_obj.get("type") or "").strip().lower() if isinstance(detail_obj, dict) else ""
-        if action_type not in {"file_write", "file_append"}:
-            continue
-
-        payload_obj = detail_obj.get("payload") if isinstance(detail_obj, dict) else None
-        result_obj = load_json_object(row_data.get("result"))
-
-        path_text = ""
-        if isinstance(result_obj, dict):
-            path_text = str(result_obj.get("path") or "").strip()
-        if not path_text and isinstance(payload_obj, dict):
-            path_text = str(payload_obj.get("path") or "").strip()
-        resolved = resolve_path_with_workdir(path_text, workdir)
-        if not resolved:
-            continue
-        paths.add(os.path.normcase(resolved))
-
-    return paths
+        return set()
 
 
 def _enforce_script_dependency(
@@ -339,7 +303,6 @@ def _enforce_script_dependency(
     written_paths = _collect_written_script_paths(
         task_id=int(task_id),
         run_id=int(run_id),
-        workdir=workdir,
         current_step_id=current_step_id,
     )
 
@@ -2828,7 +2791,9 @@ def execute_shell_command(
 
     payload, explicit_stdin_len = _maybe_apply_stdin_from_context(payload=payload, context=ctx)
     payload, auto_attached_stdin_len = _maybe_attach_context_stdin_before_run(payload=payload, context=ctx)
-    result, error_message = run_shell_command(payload)
+    output_progress = build_context_output_progress(ctx, action_type=ACTION_TYPE_SHELL_COMMAND)
+    with shell_output_progress_scope(output_progress):
+        result, error_message = run_shell_command(payload)
     if error_message:
         raise ValueError(error_message)
     if not isinstance(result, dict):
@@ -2902,7 +2867,8 @@ def execute_shell_command(
                 retry_reason = "missing_required_columns"
 
         if isinstance(retry_payload, dict):
-            retry_result, retry_error = run_shell_command(retry_payload)
+            with shell_output_progress_scope(output_progress):
+                retry_result, retry_error = run_shell_command(retry_payload)
             if not retry_error and isinstance(retry_result, dict) and bool(retry_result.get("ok")):
                 merged_result = dict(retry_result)
                 auto_retry_payload = {
@@ -3,14 +3,12 @@ import hashlib
 import json
 import os
 import re
-import shlex
 import time
 from functools import lru_cache
 from typing import Dict, List, Optional, Set, Tuple
 from urllib.parse import parse_qs, quote_plus, unquote, urlparse
 
 from backend.src.actions.handlers.common_utils import (
-    load_json_object,
     parse_command_tokens,
     resolve_path_with_workdir,
     truncate_inline_text,
@@ -19,6 +17,7 @@ from backend.src.common.path_utils import normalize_windows_abs_path_on_posix
 from backend.src.common.text_sanitize import strip_illustrative_example_clauses
 from backend.src.common.task_error_codes import format_task_error
 from backend.src.common.utils import parse_json_dict, parse_json_value, parse_positive_int
+from backend.src.common.web_document import WebDocument, build_web_document
 from backend.src.constants import (
     ACTION_TYPE_TOOL_CALL,
     AGENT_EXPERIMENT_DIR_REL,
@@ -38,20 +37,32 @@ from backend.src.constants import (
     WEB_FETCH_SEARCH_URL_TEMPLATES_DEFAULT,
     AGENT_WEB_FETCH_SEARCH_MAX_RESULTS,
     AGENT_WEB_FETCH_SEARCH_MAX_PAGES,
+    AGENT_WEB_FETCH_DOCUMENT_MAX_CHARS,
     TOOL_METADATA_SOURCE_AUTO,
     SHELL_COMMAND_REQUIRE_FILE_WRITE_BINDING_DEFAULT,
 )
+from backend.src.services.execution.process_capture import (
+    build_context_output_progress,
+    shell_output_progress_scope,
+)
 from backend.src.services.execution.shell_command import run_shell_command
+from backend.src.services.tasks.run_artifacts import get_run_written_paths
+from backend.src.services.search.source_reputation import (
+    is_source_host_skipped,
+    plan_source_candidates,
+    record_source_attempt,
+)
 from backend.src.services.debug.safe_debug import safe_write_debug as _safe_write_debug
 from backend.src.services.llm.llm_calls import create_llm_call
 from backend.src.services.tools.tool_records import create_tool_record as _create_tool_record
-from backend.src.repositories.task_steps_repo import list_task_steps_for_run
-from backend.src.repositories.tools_repo import (
-    get_tool,
-    get_tool_by_name,
-    get_tool_metadata_by_id,
-    get_tool_metadata_by_name,
+from backend.src.services.tools.tool_registry_cache import (
+    CompiledTool,
+    get_compiled_tool,
+    has_nonempty_exec_spec as _has_nonempty_exec_spec,
+    normalize_exec_spec as _normalize_exec_spec,
+    tokenize_command_template,
 )
+from backend.src.repositories.tools_repo import get_tool_by_name
 from backend.src.services.permissions.permissions_store import is_tool_enabled
 
 _WEB_FETCH_PROTOCOL_CONTEXT_KEY = "web_fetch_protocol_v1"
@@ -1901,8 +1912,8 @@ def _build_web_fetch_candidate_preview(sample: str) -> str:
     return truncate_inline_text(text, 200)
 
 
-def _count_web_fetch_page_noise_hits(sample: str) -> int:
-    return _count_unique_substring_hits(str(sample or ""), list(_WEB_FETCH_GENERIC_PAGE_NOISE_TERMS))
+def _count_web_fetch_page_noise_hits(lowered: str) -> int:
+    return _count_unique_lowered_hits(lowered, list(_WEB_FETCH_GENERIC_PAGE_NOISE_TERMS))
 
 
 def _is_web_fetch_require_structured(protocol: Optional[dict]) -> bool:
@@ -1912,8 +1923,11 @@ def _is_web_fetch_require_structured(protocol: Optional[dict]) -> bool:
 
 
 def _count_unique_substring_hits(sample: str, keywords: List[str]) -> int:
+    return _count_unique_lowered_hits(str(sample or "").lower(), keywords)
+
+
+def _count_unique_lowered_hits(lowered: str, keywords: List[str]) -> int:
     hits = 0
-    lowered = str(sample or "").lower()
     for keyword in _dedupe_web_fetch_strings([str(item or "").lower() for item in (keywords or [])]):
         if keyword and keyword in lowered:
             hits += 1
@@ -1922,13 +1936,12 @@ def _count_unique_substring_hits(sample: str, keywords: List[str]) -> int:
 
 def _extract_web_fetch_required_field_evidence(
     *,
-    sample: str,
+    lowered: str,
     required_fields: List[str],
     unit_hints: List[str],
     target_signals: List[str],
     date_hits: int,
 ) -> Dict[str, List[str]]:
-    lowered = str(sample or "").lower()
     evidence: Dict[str, List[str]] = {}
     unit_terms = _dedupe_web_fetch_strings(
         [str(item or "").lower() for item in (unit_hints or [])] + list(_WEB_FETCH_REQUIRED_FIELD_ALIASES["currency_cny"])
@@ -1972,11 +1985,10 @@ def _extract_web_fetch_required_field_evidence(
     return evidence
 
 
-def _detect_structured_content_signals(sample: str) -> int:
+def _detect_structured_content_signals(document: WebDocument) -> int:
     structured_hits = 0
-    text = str(sample or "")
-    lowered = text.lower()
-    if "<table" in lowered or "<tr" in lowered:
+    text = document.text
+    if document.table_count > 0:
         structured_hits += 1
     lines = [str(line or "").strip() for line in text.splitlines() if str(line or "").strip()]
     csv_like_lines = 0
@@ -1987,42 +1999,12 @@ def _detect_structured_content_signals(sample: str) -> int:
         structured_hits += 1
     if re.search(r"(^|\n)\s*[^,\n]+,[^,\n]+,[^,\n]+", text):
         structured_hits += 1
-    parsed = parse_json_value(text)
-    if isinstance(parsed, (dict, list)):
+    if document.json_payload:
         structured_hits += 2
+    if document.json_ld_blocks > 0 or document.microdata_items > 0:
+        structured_hits += 1
     return structured_hits
 
-def _normalize_web_fetch_date_token(token: str) -> str:
-    text = str(token or "").strip()
-    if not text:
-        return ""
-    normalized = text.replace("年", "-").replace("月", "-").replace("日", "")
-    normalized = normalized.replace("/", "-").replace(".", "-")
-    normalized = re.sub(r"-+", "-", normalized).strip("-")
-    return normalized
-
-
-def _count_distinct_web_fetch_dates(sample: str) -> int:
-    seen: Set[str] = set()
-    for token in re.findall(r"(?:20\d{2}[-/.年]\d{1,2}(?:[-/.月]\d{1,2})?)", str(sample or "")):
-        normalized = _normalize_web_fetch_date_token(token)
-        if normalized:
-            seen.add(normalized)
-    return len(seen)
-
-
-def _count_web_fetch_date_price_pair_hits(sample: str) -> int:
-    text = str(sample or "")
-    patterns = [
-        r"(?:20\d{2}[-/.年]\d{1,2}(?:[-/.月]\d{1,2})?).{0,80}?\b\d{2,5}(?:\.\d{1,4})?\b.{0,20}?(?:元/克|人民币/克|cny/?g|price)",
-        r"(?:元/克|人民币/克|cny/?g|price).{0,40}?(?:20\d{2}[-/.年]\d{1,2}(?:[-/.月]\d{1,2})?).{0,80}?\b\d{2,5}(?:\.\d{1,4})?\b",
-        r"(?:^|\n)\s*(?:20\d{2}[-/.]\d{1,2}[-/.]\d{1,2})\s*,\s*\d{2,5}(?:\.\d{1,4})?",
-    ]
-    hits = 0
-    for pattern in patterns:
-        hits += len(re.findall(pattern, text, flags=re.IGNORECASE))
-    return hits
-
 
 def _is_historical_structured_target(protocol: Optional[dict], query_keywords: List[str]) -> bool:
     time_hints = _get_web_fetch_time_hints(protocol)
@@ -2096,8 +2078,9 @@ def _analyze_web_fetch_candidate_content(
     protocol: Optional[dict],
     query_keywords: List[str],
 ) -> dict:
-    sample = str(output_text or "")[:_WEB_FETCH_PREVIEW_SAMPLE_CHARS]
-    lowered = sample.lower()
+    document = build_web_document(str(output_text or ""), max_text_chars=_WEB_FETCH_PREVIEW_SAMPLE_CHARS)
+    sample = document.text
+    lowered = document.lowered
     required_fields = _get_web_fetch_required_fields(protocol)
     target_signals = _get_web_fetch_target_signals(protocol)
     unit_hints = _get_web_fetch_unit_hints(protocol)
@@ -2110,23 +2093,24 @@ def _analyze_web_fetch_candidate_content(
         context_text=context_text,
         query_keywords=query_keywords,
     )
-    date_hits = len(re.findall(r"(?:20\d{2}[-/.年]\d{1,2}(?:[-/.月]\d{1,2})?)", sample))
-    distinct_date_hits = _count_distinct_web_fetch_dates(sample)
-    price_hits = len(re.findall(r"\b\d{2,5}(?:\.\d{1,4})?\b", sample))
-    date_price_pair_hits = _count_web_fetch_date_price_pair_hits(sample)
+    text_signals = document.signals
+    date_hits = text_signals.date_hits
+    distinct_date_hits = text_signals.distinct_dates
+    price_hits = text_signals.number_hits
+    date_price_pair_hits = text_signals.date_price_pairs
     required_field_evidence = _extract_web_fetch_required_field_evidence(
-        sample=sample,
+        lowered=lowered,
         required_fields=required_fields,
         unit_hints=unit_hints,
         target_signals=target_signals,
         date_hits=date_hits,
     )
     required_hits = len(required_field_evidence)
-    signal_hits = _count_unique_substring_hits(lowered, [item.lower() for item in target_signals])
-    unit_hits = _count_unique_substring_hits(lowered, [item.lower() for item in unit_hints])
-    negative_hits = _count_unique_substring_hits(lowered, [item.lower() for item in negative_terms])
+    signal_hits = _count_unique_lowered_hits(lowered, [item.lower() for item in target_signals])
+    unit_hits = _count_unique_lowered_hits(lowered, [item.lower() for item in unit_hints])
+    negative_hits = _count_unique_lowered_hits(lowered, [item.lower() for item in negative_terms])
     page_noise_hits = _count_web_fetch_page_noise_hits(lowered)
-    structured_hits = _detect_structured_content_signals(sample)
+    structured_hits = _detect_structured_content_signals(document)
     require_structured = _is_web_fetch_require_structured(protocol)
     min_required_hits = 1 if len(required_fields) <= 1 else min(2, len(required_fields))
     has_required_schema = required_hits >= min_required_hits
@@ -2252,26 +2236,6 @@ def _analyze_web_fetch_candidate_content(
     }
 
 
-def _normalize_web_fetch_anchor_text(value: str) -> str:
-    text = re.sub(r"<[^>]+>", " ", str(value or ""))
-    text = re.sub(r"\s+", " ", text).strip()
-    return text
-
-
-
-def _build_web_fetch_anchor_context(sample: str, anchor_start: int, anchor_end: int, anchor_text: str) -> str:
-    start = max(0, int(anchor_start) - 220)
-    end = min(len(sample), int(anchor_end) + 260)
-    snippet = sample[start:end]
-    snippet = re.sub(r"<script[^>]*>.*?</script>", " ", snippet, flags=re.IGNORECASE | re.DOTALL)
-    snippet = re.sub(r"<style[^>]*>.*?</style>", " ", snippet, flags=re.IGNORECASE | re.DOTALL)
-    snippet = re.sub(r"<[^>]+>", " ", snippet)
-    snippet = re.sub(r"\s+", " ", snippet).strip()
-    merged = f"{anchor_text} {snippet}".strip()
-    return truncate_inline_text(merged, 280)
-
-
-
 def _is_web_fetch_anchor_noise(text: str) -> bool:
     lowered = str(text or "").strip().lower()
     if not lowered:
@@ -2282,22 +2246,6 @@ def _is_web_fetch_anchor_noise(text: str) -> bool:
 
 
 
-def _is_web_fetch_search_results_page(sample: str) -> bool:
-    lowered = str(sample or "").lower()
-    return any(
-        marker in lowered
-        for marker in (
-            'id="b_results"',
-            'class="b_algo"',
-            'class="res-list"',
-            'data-mdurl=',
-            'sogou_vr_',
-            'markdown content:',
-        )
-    )
-
-
-
 def _build_web_fetch_search_result_context(title: str, snippet: str) -> str:
     merged = " ".join([str(title or "").strip(), str(snippet or "").strip()]).strip()
     merged = re.sub(r"\s+", " ", merged).strip()
@@ -2305,80 +2253,39 @@ def _build_web_fetch_search_result_context(title: str, snippet: str) -> str:
 
 
 
-def _build_web_fetch_generic_search_anchor_context(sample: str, anchor_end: int, anchor_text: str) -> str:
-    tail = sample[int(anchor_end) : min(len(sample), int(anchor_end) + 240)]
-    stops = []
-    for pattern in (r"<a\b", r"</li>", r"</div>", r"</article>", r"</section>"):
-        match = re.search(pattern, tail, flags=re.IGNORECASE)
-        if match:
-            stops.append(int(match.start()))
-    if stops:
-        tail = tail[: min(stops)]
-    snippet = _normalize_web_fetch_anchor_text(tail)
-    return _build_web_fetch_search_result_context(anchor_text, snippet)
-
-
-
-def _extract_web_fetch_links_from_bing_blocks(sample: str) -> List[Tuple[str, str, int]]:
-    candidates: List[Tuple[str, str, int]] = []
-    for match in re.finditer(r'<li class="b_algo"[^>]*>(.*?)</li>', sample, flags=re.IGNORECASE | re.DOTALL):
-        block = str(match.group(1) or "")
-        title_match = re.search(
-            r"<h2[^>]*>\s*<a[^>]*href=[\"']([^\"']+)[\"'][^>]*>(.*?)</a>",
-            block,
-            flags=re.IGNORECASE | re.DOTALL,
-        )
-        if not title_match:
-            continue
-        href = str(title_match.group(1) or "")
-        title = _normalize_web_fetch_anchor_text(title_match.group(2) or "")
-        if _is_web_fetch_anchor_noise(title):
-            continue
-        snippet_match = re.search(
-            r'<div class="b_caption"[^>]*>.*?<p[^>]*>(.*?)</p>',
-            block,
-            flags=re.IGNORECASE | re.DOTALL,
-        )
-        snippet = _normalize_web_fetch_anchor_text(snippet_match.group(1) or "") if snippet_match else ""
-        context_text = _build_web_fetch_search_result_context(title, snippet)
-        candidates.append((href, context_text or title, len(candidates)))
-    return candidates
-
-
-
-def _extract_web_fetch_links_from_360_blocks(sample: str) -> List[Tuple[str, str, int]]:
-    candidates: List[Tuple[str, str, int]] = []
-    for match in re.finditer(r'<li class="res-list"[^>]*>(.*?)</li>', sample, flags=re.IGNORECASE | re.DOTALL):
-        block = str(match.group(1) or "")
-        title_match = re.search(
-            r"<h3[^>]*>\s*<a[^>]*href=[\"']([^\"']+)[\"'][^>]*>(.*?)</a>",
-            block,
-            flags=re.IGNORECASE | re.DOTALL,
-        )
-        if not title_match:
-            continue
-        wrapper_url = str(title_match.group(1) or "")
-        title = _normalize_web_fetch_anchor_text(title_match.group(2) or "")
-        if _is_web_fetch_anchor_noise(title):
+def _collect_web_fetch_document_candidates(
+    document: WebDocument,
+    *,
+    structured_search_page: bool,
+) -> List[Tuple[str, str, int, str]]:
+    """
+    按既有优先级从文档模型收集候选：结果块 -> data 属性 -> markdown 链接 -> 普通锚点 -> 裸 URL。
+    """
+    candidates: List[Tuple[str, str, int, str]] = []
+    for anchor in document.block_anchors:
+        if _is_web_fetch_anchor_noise(anchor.text):
             continue
-        direct_match = re.search(r"\bdata-mdurl=[\"']([^\"']+)[\"']", block, flags=re.IGNORECASE)
-        href = str(direct_match.group(1) or "") if direct_match else wrapper_url
-        snippet_match = re.search(r'<span class="res-list-summary"[^>]*>(.*?)</span>', block, flags=re.IGNORECASE | re.DOTALL)
-        snippet = _normalize_web_fetch_anchor_text(snippet_match.group(1) or "") if snippet_match else ""
-        context_text = _build_web_fetch_search_result_context(title, snippet)
-        candidates.append((href, context_text or title, len(candidates)))
-    return candidates
-
+        context_text = truncate_inline_text(anchor.context, 280)
+        candidates.append((anchor.href, context_text or anchor.text, len(candidates), anchor.source))
+    for anchor in document.data_anchors:
+        candidates.append((anchor.href, truncate_inline_text(anchor.context, 280), len(candidates), anchor.source))
+    for anchor in document.text_links:
+        candidates.append((anchor.href, anchor.text, len(candidates), anchor.source))
 
+    if (not structured_search_page) or (structured_search_page and not candidates):
+        for anchor in document.html_anchors:
+            if _is_web_fetch_anchor_noise(anchor.text):
+                continue
+            if structured_search_page:
+                context_text = _build_web_fetch_search_result_context(anchor.text, anchor.tail)
+            else:
+                context_text = truncate_inline_text(f"{anchor.text} {anchor.context}".strip(), 280)
+            candidates.append((anchor.href, context_text or anchor.text, len(candidates), anchor.source))
 
-def _extract_web_fetch_links_from_search_data_attrs(sample: str) -> List[Tuple[str, str, int]]:
-    candidates: List[Tuple[str, str, int]] = []
-    for attr_name in ("data-mdurl", "data-url"):
-        pattern = rf"\b{attr_name}=[\"'](https?://[^\"']+)[\"']"
-        for match in re.finditer(pattern, sample, flags=re.IGNORECASE):
-            url = str(match.group(1) or "")
-            context_text = _build_web_fetch_anchor_context(sample, match.start(), match.end(), "")
-            candidates.append((url, context_text, len(candidates)))
+    if ((not structured_search_page) or (structured_search_page and not candidates)) and len(candidates) < 3:
+        for anchor in document.plain_urls:
+            context_text = anchor.href if structured_search_page else anchor.context
+            candidates.append((anchor.href, context_text, len(candidates), anchor.source))
     return candidates
 
 
@@ -2395,53 +2302,10 @@ def _extract_web_fetch_link_records_from_text(
     if not text.strip():
         return []
 
-    sample = text[:400000]
+    document = build_web_document(text, max_input_chars=AGENT_WEB_FETCH_DOCUMENT_MAX_CHARS)
     query_keywords = _build_web_fetch_query_keywords(query)
-    candidates: List[Tuple[str, str, int, str]] = []
-    structured_search_page = bool(force_search_result_page) or _is_web_fetch_search_results_page(sample)
-
-    for href, context_text, _ordinal in _extract_web_fetch_links_from_bing_blocks(sample):
-        candidates.append((href, context_text, len(candidates), "bing_block"))
-    for href, context_text, _ordinal in _extract_web_fetch_links_from_360_blocks(sample):
-        candidates.append((href, context_text, len(candidates), "360_block"))
-    for href, context_text, _ordinal in _extract_web_fetch_links_from_search_data_attrs(sample):
-        candidates.append((href, context_text, len(candidates), "search_data_attr"))
-
-    markdown_matches = re.findall(
-        r"\[([^\]]*)\]\((https?://[^\s)]+)\)",
-        sample,
-        flags=re.IGNORECASE,
-    )
-    for anchor_text, url in markdown_matches:
-        candidates.append((str(url or ""), str(anchor_text or ""), len(candidates), "markdown_link"))
-
-    if (not structured_search_page) or (structured_search_page and not candidates):
-        for match in re.finditer(
-            r"<a\b[^>]*href=[\"']([^\"']+)[\"'][^>]*>(.*?)</a>",
-            sample,
-            flags=re.IGNORECASE | re.DOTALL,
-        ):
-            href = str(match.group(1) or "")
-            anchor_html = str(match.group(2) or "")
-            anchor_text = _normalize_web_fetch_anchor_text(str(anchor_html or ""))
-            if _is_web_fetch_anchor_noise(anchor_text):
-                continue
-            if structured_search_page:
-                context_text = _build_web_fetch_generic_search_anchor_context(sample, match.end(), anchor_text)
-            else:
-                context_text = _build_web_fetch_anchor_context(sample, match.start(), match.end(), anchor_text)
-            candidates.append((str(href or ""), context_text or anchor_text, len(candidates), "html_anchor"))
-
-    if ((not structured_search_page) or (structured_search_page and not candidates)) and len(candidates) < 3:
-        for match in re.finditer(r"https?://[^\s\"'<>]+", sample, flags=re.IGNORECASE):
-            url = str(match.group(0) or "")
-            if structured_search_page:
-                context_text = url
-            else:
-                start = max(0, int(match.start()) - 80)
-                end = min(len(sample), int(match.end()) + 80)
-                context_text = sample[start:end]
-            candidates.append((url, context_text, len(candidates), "plain_url"))
+    structured_search_page = bool(force_search_result_page) or document.search_result_page
+    candidates = _collect_web_fetch_document_candidates(document, structured_search_page=structured_search_page)
 
     skip_suffixes = (
         ".css",
@@ -3051,13 +2915,24 @@ def _execute_web_fetch_keyword_search(
             search_url_count=len(search_urls),
         )
 
-        for search_url in search_urls:
+        ordered_search_urls, cooling_search_hosts = plan_source_candidates(
+            search_urls,
+            host_of=_extract_web_fetch_host,
+        )
+        for search_url in ordered_search_urls:
             search_host = _extract_web_fetch_host(search_url)
+            if is_source_host_skipped(search_host, cooling_search_hosts):
+                attempts.append(
+                    dict(_source_cooldown_attempt(search_url, search_host, stage="search"), query=query)
+                )
+                continue
+            started = time.monotonic()
             output_text, exec_error = _execute_tool_with_exec_spec(exec_spec, search_url)
             current_output = str(output_text or "")
             if current_output.strip():
                 last_output = current_output
             classified = _classify_web_fetch_result(current_output, exec_error)
+            _record_web_fetch_source_attempt(search_host, classified, started)
             if str(classified.get("ok")) == "1":
                 extracted = _extract_web_fetch_link_records_from_text(
                     current_output,
@@ -3215,8 +3090,14 @@ def _execute_web_fetch_keyword_search(
     accepted_candidates: List[dict] = []
     candidate_rankings: List[dict] = []
     candidate_rejections: List[dict] = []
+    # 预览顺序保持相关性排序，只按来源信誉跳过冷却中的 host
+    preview_candidates, cooling_preview_hosts = plan_source_candidates(
+        initial_ranked[:preview_limit],
+        host_of=lambda item: _extract_web_fetch_host(str(item.get("url") or "")),
+        reorder=False,
+    )
 
-    for candidate in initial_ranked[:preview_limit]:
+    for candidate in preview_candidates:
         page_url = str(candidate.get("url") or "")
         host = _extract_web_fetch_host(page_url)
         if host and _is_host_denied_by_protocol(host, denied_domains):
@@ -3259,6 +3140,13 @@ def _execute_web_fetch_keyword_search(
                 }
             )
             continue
+        if is_source_host_skipped(host, cooling_preview_hosts):
+            skipped = _source_cooldown_attempt(page_url, host, stage="preview")
+            candidate_rejections.append(
+                {"url": page_url, "host": host, "reason": skipped["reason"], "detail": skipped["detail"]}
+            )
+            attempts.append(skipped)
+            continue
 
         _emit_web_fetch_event(
             context,
@@ -3268,11 +3156,13 @@ def _execute_web_fetch_keyword_search(
             host=host,
             query=str(candidate.get("query") or ""),
         )
+        started = time.monotonic()
         output_text, exec_error = _execute_tool_with_exec_spec(exec_spec, page_url)
         current_output = str(output_text or "")
         if current_output.strip():
             last_output = current_output
         classified = _classify_web_fetch_result(current_output, exec_error)
+        _record_web_fetch_source_attempt(host, classified, started)
         if str(classified.get("ok")) != "1":
             current_code = str(classified.get("error_code") or "candidate_preview_empty")
             current_reason = str(classified.get("reason") or "candidate_preview_failed")
@@ -3587,6 +3477,35 @@ def _should_block_host_after_web_fetch_error(error_code: str, reason: str) -> bo
     return normalized_reason in host_block_reasons
 
 
+def _record_web_fetch_source_attempt(host: str, classified: dict, started: float) -> None:
+    """把一次 web_fetch 尝试回写到跨 run 来源信誉（host 级失败进入冷却）。"""
+    if not host:
+        return
+    ok = str(classified.get("ok")) == "1"
+    error_code = "" if ok else str(classified.get("error_code") or "web_fetch_blocked")
+    reason = "" if ok else str(classified.get("reason") or "")
+    record_source_attempt(
+        host,
+        ok=ok,
+        latency_ms=(time.monotonic() - started) * 1000,
+        error_code=error_code,
+        reason=reason,
+        host_level=(not ok) and _should_block_host_after_web_fetch_error(error_code, reason),
+    )
+
+
+def _source_cooldown_attempt(url: str, host: str, *, stage: Optional[str] = None) -> dict:
+    item = {
+        "url": url,
+        "host": host,
+        "status": "skipped",
+        "error_code": "source_cooling_down",
+        "reason": "source_cooling_down",
+        "detail": "来源信誉：该 host 最近一次尝试为 host 级失败（拦截/限流/超时等），冷却中，优先尝试其他来源",
+    }
+    return {"stage": stage, **item} if stage else item
+
+
 def _build_web_fetch_attempt_summary(attempts: List[dict]) -> str:
     chunks: List[str] = []
     for item in attempts[-6:]:
@@ -3616,7 +3535,12 @@ def _execute_web_fetch_with_fallback(
     if not primary:
         return _execute_web_fetch_keyword_search(exec_spec, str(tool_input), protocol=protocol, context=context)
 
-    candidates = [primary] + _build_web_fetch_fallback_urls(primary)
+    # 跨 run 来源信誉：保持“原始 URL 优先、备用源（含第三方代理）在后”的顺序，只在存在可用候选时跳过冷却中的 host
+    candidates, cooling_hosts = plan_source_candidates(
+        [primary] + _build_web_fetch_fallback_urls(primary),
+        host_of=_extract_web_fetch_host,
+        reorder=False,
+    )
     attempts: List[dict] = []
     warnings: List[str] = []
     blocked_hosts: Set[str] = set()
@@ -3652,12 +3576,17 @@ def _execute_web_fetch_with_fallback(
                 }
             )
             continue
+        if is_source_host_skipped(host, cooling_hosts):
+            attempts.append(_source_cooldown_attempt(candidate_url, host))
+            continue
 
+        started = time.monotonic()
         output_text, exec_error = _execute_tool_with_exec_spec(exec_spec, candidate_url)
         current_output = str(output_text or "")
         if current_output.strip():
             last_output = current_output
         classified = _classify_web_fetch_result(current_output, exec_error)
+        _record_web_fetch_source_attempt(host, classified, started)
 
         if str(classified.get("ok")) == "1":
             attempts.append(
@@ -3670,7 +3599,7 @@ def _execute_web_fetch_with_fallback(
                     "detail": "",
                 }
             )
-            if index > 0:
+            if candidate_url != primary:
                 warnings.append(
                     "web_fetch 已自动切换到备用源："
                     f"{truncate_inline_text(primary, 120)} -> "
@@ -3808,73 +3737,16 @@ def _detect_structured_tool_error(
     return None
 
 
-def _normalize_exec_spec(exec_spec: dict) -> dict:
-    """
-    tool_metadata.exec 兼容归一化：
-    - 常见别名：shell -> command，timeout -> timeout_ms
-    - args 可能被模型输出成字符串：转为 command
-    - command 可能被模型输出成 list：转为 args
-
-    约定：最终使用字段
-    - type: "shell"（可省略，若提供了 command/args 会自动按 shell 执行）
-    - command: str 或 args: list[str]
-    - timeout_ms: int（可选）
-    - workdir: str（建议必填）
-    """
-    if not isinstance(exec_spec, dict):
-        return {}
-    spec = dict(exec_spec)
-
-    # 常见别名：shell -> command
-    shell_value = spec.get("shell")
-    if (
-        isinstance(shell_value, str)
-        and shell_value.strip()
-        and not spec.get("command")
-    ):
-        spec["command"] = shell_value.strip()
-
-    # args: str -> command
-    args_value = spec.get("args")
-    if isinstance(args_value, str) and args_value.strip():
-        if not spec.get("command"):
-            spec["command"] = args_value.strip()
-        spec.pop("args", None)
-
-    # command: list -> args
-    cmd_value = spec.get("command")
-    if isinstance(cmd_value, list) and cmd_value:
-        existing_args = spec.get("args")
-        if isinstance(existing_args, list) and existing_args:
-            # 兼容：模型可能同时输出 command(list) + args(list)。这里把两者拼接成“完整命令 token 列表”，
-            # 避免丢失 command(list) 导致仅执行 args（常见错误：args=["GC=F"] -> [WinError 2]）。
-            spec["args"] = [str(v) for v in cmd_value] + [str(v) for v in existing_args]
-        else:
-            spec["args"] = [str(v) for v in cmd_value]
-        spec.pop("command", None)
-
-    # timeout: 兼容字段；若 < 1000 认为是秒，否则认为是毫秒
-    if spec.get("timeout_ms") is None and spec.get("timeout") is not None:
-        value = spec.get("timeout")
-        try:
-            num = float(value)
-            spec["timeout_ms"] = int(num * 1000) if 0 < num < 1000 else int(num)
-        except Exception:
-            pass
-
-    return spec
-
-
-def _load_tool_metadata_from_db(tool_id: object, tool_name: Optional[str]) -> Optional[dict]:
-    """
-    读取 tools_items.metadata（JSON）并解析为 dict。
-    """
+def _load_compiled_tool(tool_id: object, tool_name: Optional[str]) -> Optional[CompiledTool]:
     tool_id_value = parse_positive_int(tool_id, default=None)
     if tool_id_value is None and not tool_name:
         return None
-    if tool_id_value is not None:
-        return get_tool_metadata_by_id(tool_id=int(tool_id_value))
-    return get_tool_metadata_by_name(name=str(tool_name or ""))
+    try:
+        if tool_id_value is not None:
+            return get_compiled_tool(tool_id=int(tool_id_value))
+        return get_compiled_tool(name=str(tool_name or ""))
+    except Exception:
+        return None
 
 
 def _coerce_optional_tool_int_fields(payload: dict) -> None:
@@ -3930,15 +3802,6 @@ def _coerce_optional_tool_text_fields(payload: dict) -> None:
             payload[key] = text
 
 
-def _has_nonempty_exec_spec(spec: dict) -> bool:
-    """判断 exec_spec 是否包含有效内容（兼容模型输出空 exec {}）。"""
-    return bool(
-        str(spec.get("type") or "").strip()
-        or (isinstance(spec.get("args"), list) and spec.get("args"))
-        or str(spec.get("command") or "").strip()
-    )
-
-
 def _resolve_tool_exec_spec(payload: dict) -> Optional[dict]:
     """
     优先从 payload.tool_metadata 读取 exec，其次从 tools_items.metadata 读取 exec。
@@ -3950,13 +3813,13 @@ def _resolve_tool_exec_spec(payload: dict) -> Optional[dict]:
             exec_spec = _normalize_exec_spec(exec_spec)
             if _has_nonempty_exec_spec(exec_spec):
                 return exec_spec
-    meta = _load_tool_metadata_from_db(payload.get("tool_id"), payload.get("tool_name"))
-    if isinstance(meta, dict):
-        exec_spec = meta.get("exec")
-        if isinstance(exec_spec, dict):
-            normalized = _normalize_exec_spec(exec_spec)
-            if _has_nonempty_exec_spec(normalized):
-                return normalized
+    # 已入库工具：直接取编译工具表中归一化好的 exec（返回副本，调用方可安全修改）
+    compiled = _load_compiled_tool(payload.get("tool_id"), payload.get("tool_name"))
+    if compiled is not None and compiled.exec_spec is not None:
+        exec_spec = dict(compiled.exec_spec)
+        if isinstance(exec_spec.get("args"), list):
+            exec_spec["args"] = list(exec_spec["args"])
+        return exec_spec
 
     # 再兜底：从实验目录脚本推断执行定义（防止“已写脚本但漏填 exec”中断）。
     inferred = _infer_exec_spec_from_workspace_script(payload)
@@ -4105,47 +3968,12 @@ def _collect_written_script_paths_for_run(
     task_id: int,
     run_id: int,
     current_step_id: Optional[int],
-    workdir: str,
 ) -> Set[str]:
-    paths: Set[str] = set()
+    # 直接查 run 产物登记（写入时维护），不再回扫 task_steps
     try:
-        rows = list_task_steps_for_run(task_id=int(task_id), run_id=int(run_id))
+        return get_run_written_paths(task_id=int(task_id), run_id=int(run_id), exclude_step_ids=(current_step_id,))
     except Exception:
-        return paths
-
-    for row in rows or []:
-        if not row:
-            continue
-        try:
-            row_id = int(row["id"]) if row["id"] is not None else None
-        except Exception:
-            row_id = None
-        if current_step_id is not None and row_id == int(current_step_id):
-            continue
-
-        status = str(row["status"] or "").strip().lower() if "status" in row.keys() else ""
-        if status != "done":
-            continue
-
-        detail_obj = load_json_object(row["detail"] if "detail" in row.keys() else None)
-        action_type = str(detail_obj.get("type") or "").strip().lower() if isinstance(detail_obj, dict) else ""
-        if action_type not in {"file_write", "file_append"}:
-            continue
-
-        payload_obj = detail_obj.get("payload") if isinstance(detail_obj, dict) else None
-        result_obj = load_json_object(row["result"] if "result" in row.keys() else None)
-
-        raw_path = ""
-        if isinstance(result_obj, dict):
-            raw_path = str(result_obj.get("path") or "").strip()
-        if not raw_path and isinstance(payload_obj, dict):
-            raw_path = str(payload_obj.get("path") or "").strip()
-
-        resolved = resolve_path_with_workdir(raw_path, workdir)
-        if resolved:
-            paths.add(os.path.normcase(resolved))
-
-    return paths
+        return set()
 
 
 def _enforce_tool_exec_script_dependency(
@@ -4192,7 +4020,6 @@ def _enforce_tool_exec_script_dependency(
         task_id=int(task_id),
         run_id=int(run_id),
         current_step_id=current_step_id,
-        workdir=workdir,
     )
 
     missing_paths: List[str] = []
@@ -4252,18 +4079,8 @@ def _execute_tool_with_exec_spec(exec_spec: dict, tool_input: str) -> Tuple[Opti
             return None, f"不支持的工具执行类型: {exec_type}"
 
     def _split_command_text(text: str) -> list[str]:
-        tokens = shlex.split(text, posix=os.name != "nt")
-        if os.name == "nt":
-            # 参见 services/execution/shell_command.py：Windows 下要剥离最外层引号，
-            # 否则 python -c 会把代码当作字符串字面量导致无输出。
-            cleaned: list[str] = []
-            for item in tokens:
-                s = str(item)
-                if len(s) >= 2 and ((s[0] == s[-1] == '"') or (s[0] == s[-1] == "'")):
-                    s = s[1:-1]
-                cleaned.append(s)
-            tokens = cleaned
-        return [str(t).replace("{input}", tool_input) for t in tokens]
+        # token 模板按命令文本缓存（同一工具反复调用不再重复 shlex 切分）
+        return [t.replace("{input}", tool_input) for t in tokenize_command_template(text)]
 
     def _looks_like_executable_token(token: str) -> bool:
         head = str(token or "").strip()
@@ -4490,11 +4307,8 @@ def execute_tool_call(
     tool_name_value = str(payload.get("tool_name") or "").strip()
     tool_id_value = parse_positive_int(payload.get("tool_id"), default=None)
     if not tool_name_value and tool_id_value is not None:
-        try:
-            row = get_tool(tool_id=int(tool_id_value))
-            tool_name_value = str(row["name"] or "").strip() if row else ""
-        except Exception:
-            tool_name_value = ""
+        compiled_tool = _load_compiled_tool(tool_id_value, None)
+        tool_name_value = compiled_tool.name.strip() if compiled_tool is not None else ""
     if tool_name_value and not is_tool_enabled(tool_name_value):
         raise ValueError(f"tool 已禁用: {tool_name_value}")
 
@@ -4570,7 +4384,12 @@ def execute_tool_call(
             web_fetch_attempts = [dict(item) for item in web_fetch_result.get("attempts") if isinstance(item, dict)]
         warnings.extend([str(item) for item in (web_fetch_result.get("warnings") or []) if str(item or "").strip()])
     else:
-        output_text, exec_error = _execute_tool_with_exec_spec(exec_spec, str(tool_input))
+        output_progress = build_context_output_progress(
+            context if isinstance(context, dict) else None,
+            action_type=ACTION_TYPE_TOOL_CALL,
+        )
+        with shell_output_progress_scope(output_progress):
+            output_text, exec_error = _execute_tool_with_exec_spec(exec_spec, str(tool_input))
         if exec_error:
             # 检测 TLS/SSL 握手失败
             lowered_err = str(exec_error).lower()
@@ -1,9 +1,11 @@
 from __future__ import annotations
 
+import logging
+import re
 import threading
 
 from dataclasses import dataclass
-from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
 
 from backend.src.common.task_error_codes import format_task_error
 
@@ -12,10 +14,12 @@ from backend.src.actions.handlers.file_delete import execute_file_delete
 from backend.src.actions.handlers.file_list import execute_file_list
 from backend.src.actions.handlers.file_read import execute_file_read
 from backend.src.actions.handlers.file_write import execute_file_write, validate_file_write_payload_semantics
-from backend.src.actions.handlers.http_request import execute_http_request
+from backend.src.actions.handlers.http_request import execute_http_request, execute_http_request_async
 from backend.src.actions.handlers.json_parse import execute_json_parse
 from backend.src.services.permissions.permissions_store import is_action_enabled
-from backend.src.actions.handlers.llm_call import execute_llm_call
+from backend.src.services.tasks.run_artifacts import forget_run_artifact
+from backend.src.services.tasks.run_listing_cache import invalidate_run_listings
+from backend.src.actions.handlers.llm_call import execute_llm_call, execute_llm_call_async
 from backend.src.actions.handlers.memory_write import execute_memory_write
 from backend.src.actions.handlers.shell_command import execute_shell_command
 from backend.src.actions.handlers.task_output import execute_task_output
@@ -37,11 +41,18 @@ from backend.src.constants import (
     AGENT_REACT_OBSERVATION_MAX_CHARS,
 )
 
+logger = logging.getLogger(__name__)
+
 # Action 执行函数统一签名：尽量让 executor 不需要知道每个 action 的“特殊参数形态”。
 ActionExecutor = Callable[
     [int, int, dict, dict, Optional[dict]],
     Tuple[Optional[dict], Optional[str]],
 ]
+# asyncio 原生执行函数（可选）：签名同 ActionExecutor，返回 awaitable。
+AsyncActionExecutor = Callable[
+    [int, int, dict, dict, Optional[dict]],
+    Awaitable[Tuple[Optional[dict], Optional[str]]],
+]
 
 
 @dataclass(frozen=True)
@@ -60,6 +71,8 @@ class ActionTypeSpec:
     executor: ActionExecutor
     # validate_payload：只做“结构与关键字段”校验；执行错误由 executor 返回。
     validate_payload: Callable[[dict], Optional[str]]
+    # async_executor：asyncio 原生实现（可被 cancel 中止）；未提供时异步路径回退为线程执行 executor。
+    async_executor: Optional[AsyncActionExecutor] = None
 
 
 def _require_nonempty_string(value: object, error_message: str) -> Optional[str]:
@@ -169,7 +182,7 @@ def _validate_shell_command(payload: dict) -> Optional[str]:
             if not isinstance(item, str) or not str(item).strip():
                 return f"shell_command.expected_outputs[{idx}] 不能为空"
 
-    for key in ("parse_json_output", "discover_required_args", "stdin_from_context"):
+    for key in ("parse_json_output", "discover_required_args", "stdin_from_context", "spill_output"):
         value = payload.get(key)
         if value is not None and not isinstance(value, bool):
             return f"shell_command.{key} 必须是布尔值"
@@ -202,7 +215,32 @@ def _validate_file_write(payload: dict) -> Optional[str]:
 
 
 def _validate_file_read(payload: dict) -> Optional[str]:
-    return _validate_required_path_field(payload, "file_read")
+    path_error = _validate_required_path_field(payload, "file_read")
+    if path_error:
+        return path_error
+    for key in ("start_line", "max_lines", "tail_lines", "max_matches"):
+        field_error = _validate_optional_positive_int_field(payload, key, action_name="file_read")
+        if field_error:
+            return field_error
+    offset = payload.get("offset")
+    if offset is not None and not (isinstance(offset, str) and not offset.strip()):
+        try:
+            if int(offset) < 0:
+                raise ValueError
+        except Exception:
+            return format_task_error(code="invalid_action_payload", message="file_read.offset 必须为非负整数或空")
+    grep = payload.get("grep")
+    if grep is not None:
+        if not isinstance(grep, str) or not grep:
+            return "file_read.grep 必须是非空字符串"
+        try:
+            re.compile(grep)
+        except re.error as exc:
+            return f"file_read.grep 不是有效的正则表达式: {exc}"
+    ignore_case = payload.get("ignore_case")
+    if ignore_case is not None and not isinstance(ignore_case, bool):
+        return "file_read.ignore_case 必须是布尔值"
+    return None
 
 
 def _validate_http_request(payload: dict) -> Optional[str]:
@@ -240,7 +278,24 @@ def _validate_file_append(payload: dict) -> Optional[str]:
 
 
 def _validate_file_list(payload: dict) -> Optional[str]:
-    return _validate_required_path_field(payload, "file_list")
+    path_error = _validate_required_path_field(payload, "file_list")
+    if path_error:
+        return path_error
+    for key in ("max_entries", "max_depth"):
+        field_error = _validate_optional_positive_int_field(payload, key, action_name="file_list")
+        if field_error:
+            return field_error
+    exclude = payload.get("exclude")
+    if exclude is not None and not isinstance(exclude, str):
+        if not isinstance(exclude, list) or not all(isinstance(item, str) for item in exclude):
+            return "file_list.exclude 必须是字符串或字符串数组"
+    sort = payload.get("sort")
+    if sort is not None and str(sort).strip().lower() not in {"name", "mtime"}:
+        return "file_list.sort 仅支持 name 或 mtime"
+    gitignore = payload.get("gitignore")
+    if gitignore is not None and not isinstance(gitignore, bool):
+        return "file_list.gitignore 必须是布尔值"
+    return None
 
 
 def _validate_file_delete(payload: dict) -> Optional[str]:
@@ -334,6 +389,19 @@ def _exec_llm_call(task_id: int, run_id: int, step_row: dict, payload: dict, con
     return execute_llm_call(task_id, run_id, patched_payload)
 
 
+async def _exec_llm_call_async(task_id: int, run_id: int, step_row: dict, payload: dict, context: Optional[dict]):
+    _ = step_row
+    patched_payload = dict(payload or {})
+    prompt = str(patched_payload.get("prompt") or "").strip()
+    if prompt:
+        injected_prompt, injected = _inject_latest_parse_input_prompt(prompt, context)
+        if injected:
+            patched_payload["prompt"] = injected_prompt
+            if isinstance(context, dict):
+                context["llm_prompt_auto_observation_injected"] = True
+    return await execute_llm_call_async(task_id, run_id, patched_payload)
+
+
 def _exec_memory_write(task_id: int, run_id: int, step_row: dict, payload: dict, context: Optional[dict]):
     _ = run_id
     _ = step_row
@@ -345,18 +413,40 @@ def _exec_task_output(task_id: int, run_id: int, step_row: dict, payload: dict,
     return execute_task_output(task_id, run_id, payload, context=context, step_row=step_row)
 
 
+def _invalidate_listings(run_id: int, path: Optional[str] = None) -> None:
+    # 本 run 的 file_list 缓存：写/删按路径失效，命令/工具执行后整体失效
+    if not run_id:
+        return
+    try:
+        invalidate_run_listings(run_id=int(run_id), path=path)
+    except Exception as exc:
+        logger.warning("invalidate run listings failed: run_id=%s err=%s", run_id, exc)
+
+
 def _exec_tool_call(task_id: int, run_id: int, step_row: dict, payload: dict, context: Optional[dict]):
-    return execute_tool_call(task_id, run_id, step_row, payload, context=context)
+    try:
+        return execute_tool_call(task_id, run_id, step_row, payload, context=context)
+    finally:
+        _invalidate_listings(run_id)
 
 
 def _exec_shell_command(task_id: int, run_id: int, step_row: dict, payload: dict, context: Optional[dict]):
-    return execute_shell_command(
-        int(task_id),
-        int(run_id),
-        step_row,
-        payload,
-        context=context,
-    )
+    try:
+        result, error_message = execute_shell_command(
+            int(task_id),
+            int(run_id),
+            step_row,
+            payload,
+            context=context,
+        )
+    finally:
+        _invalidate_listings(run_id)
+    # spill_output 落盘的完整输出登记为 run 产物（随 run 可查、可清理）
+    if isinstance(result, dict):
+        for key in ("stdout_file", "stderr_file"):
+            if result.get(key):
+                _record_written_artifact(task_id, run_id, step_row, "shell_output", {"path": result.get(key)})
+    return result, error_message
 
 
 def _looks_like_csv_text(text: object) -> bool:
@@ -406,36 +496,57 @@ def _autofill_json_parse_text_from_context(payload: dict, context: Optional[dict
     return current_payload, True
 
 
+def _invalidate_written_path(run_id: int, result: Optional[dict]) -> None:
+    # run 产物在步骤标记 done 时登记（见 run_artifacts.record_done_step_artifact），这里只让目录列表缓存失效
+    path = str(result.get("path") or "").strip() if isinstance(result, dict) else ""
+    if not path or not run_id:
+        return
+    _invalidate_listings(run_id, path)
+
+
 def _exec_file_write(task_id: int, run_id: int, step_row: dict, payload: dict, context: Optional[dict]):
     _ = task_id
-    _ = run_id
     _ = step_row
     patched_payload, _ = _autofill_file_write_content_from_context(payload, context)
-    return execute_file_write(patched_payload, context=context)
+    result, error_message = execute_file_write(patched_payload, context=context)
+    if not error_message:
+        _invalidate_written_path(run_id, result)
+    return result, error_message
 
 
 def _exec_file_append(task_id: int, run_id: int, step_row: dict, payload: dict, context: Optional[dict]):
     _ = task_id
-    _ = run_id
     _ = step_row
     _ = context
-    return execute_file_append(payload)
+    result, error_message = execute_file_append(payload)
+    if not error_message:
+        _invalidate_written_path(run_id, result)
+    return result, error_message
 
 
 def _exec_file_list(task_id: int, run_id: int, step_row: dict, payload: dict, context: Optional[dict]):
     _ = task_id
-    _ = run_id
     _ = step_row
     _ = context
-    return execute_file_list(payload)
+    return execute_file_list(payload, run_id=run_id)
 
 
 def _exec_file_delete(task_id: int, run_id: int, step_row: dict, payload: dict, context: Optional[dict]):
-    _ = task_id
-    _ = run_id
     _ = step_row
     _ = context
-    return execute_file_delete(payload)
+    result, error_message = execute_file_delete(payload)
+    if not error_message and isinstance(result, dict) and result.get("deleted") and run_id:
+        _invalidate_listings(run_id, str(result.get("path") or "") or None)
+        try:
+            forget_run_artifact(
+                task_id=int(task_id),
+                run_id=int(run_id),
+                path=str(result.get("path") or ""),
+                is_dir=result.get("type") == "dir",
+            )
+        except Exception as exc:
+            logger.warning("forget run artifact failed: run_id=%s err=%s", run_id, exc)
+    return result, error_message
 
 
 def _exec_json_parse(task_id: int, run_id: int, step_row: dict, payload: dict, context: Optional[dict]):
@@ -462,6 +573,14 @@ def _exec_http_request(task_id: int, run_id: int, step_row: dict, payload: dict,
     return execute_http_request(payload)
 
 
+async def _exec_http_request_async(task_id: int, run_id: int, step_row: dict, payload: dict, context: Optional[dict]):
+    _ = task_id
+    _ = run_id
+    _ = step_row
+    _ = context
+    return await execute_http_request_async(payload)
+
+
 def _exec_user_prompt(task_id: int, run_id: int, step_row: dict, payload: dict, context: Optional[dict]):
     # user_prompt 在 ReAct 循环里被“短路处理”（暂停等待用户输入），此处通常不会执行到。
     _ = task_id
@@ -691,6 +810,7 @@ def _register_builtin_specs() -> None:
             aliases={"llm", "chat", "llmcall"},
             executor=_exec_llm_call,
             validate_payload=_validate_llm_call,
+            async_executor=_exec_llm_call_async,
         )
     )
     register_action_type(
@@ -750,6 +870,7 @@ def _register_builtin_specs() -> None:
                 "timeout_ms",
                 "stdin",
                 "stdin_from_context",
+                "spill_output",
             },
             aliases={"shell", "cmd", "command", "script_run"},
             executor=_exec_shell_command,
@@ -779,12 +900,22 @@ def _register_builtin_specs() -> None:
             aliases={"http", "http_request", "request"},
             executor=_exec_http_request,
             validate_payload=_validate_http_request,
+            async_executor=_exec_http_request_async,
         )
     )
     register_action_type(
         ActionTypeSpec(
             action_type=ACTION_TYPE_FILE_LIST,
-            allowed_payload_keys={"path", "pattern", "recursive", "max_entries"},
+            allowed_payload_keys={
+                "path",
+                "pattern",
+                "recursive",
+                "max_entries",
+                "max_depth",
+                "exclude",
+                "sort",
+                "gitignore",
+            },
             aliases={"list_file", "list_files", "listdir"},
             executor=_exec_file_list,
             validate_payload=_validate_file_list,
@@ -793,7 +924,18 @@ def _register_builtin_specs() -> None:
     register_action_type(
         ActionTypeSpec(
             action_type=ACTION_TYPE_FILE_READ,
-            allowed_payload_keys={"path", "encoding", "max_bytes"},
+            allowed_payload_keys={
+                "path",
+                "encoding",
+                "max_bytes",
+                "offset",
+                "start_line",
+                "max_lines",
+                "tail_lines",
+                "grep",
+                "ignore_case",
+                "max_matches",
+            },
             aliases={"read_file", "readfile"},
             executor=_exec_file_read,
             validate_payload=_validate_file_read,
@@ -22,7 +22,7 @@ from backend.src.agent.support import _truncate_observation
 from backend.src.agent.source_failure_summary import summarize_recent_source_failures_for_prompt
 from backend.src.agent.core.context_budget import apply_context_budgets
 from backend.src.actions.registry import action_types_line
-from backend.src.services.llm.llm_calls import create_llm_call
+from backend.src.services.llm.llm_calls import create_llm_call, create_llm_call_async
 from backend.src.constants import (
     ACTION_TYPE_FILE_READ,
     ACTION_TYPE_FILE_WRITE,
@@ -43,7 +43,8 @@ from backend.src.constants import (
 )
 from backend.src.services.debug.safe_debug import safe_write_debug as _safe_write_debug
 from backend.src.services.llm.llm_client import sse_json
-from backend.src.agent.runner.react_helpers import call_llm_for_text_with_id
+from backend.src.services.llm.llm_scheduler import LLM_PRIORITY_PLANNING
+from backend.src.agent.runner.react_helpers import call_llm_for_text_with_id, iter_call_llm_for_text_with_id
 from backend.src.agent.runner.goal_progress import detect_task_grounding_drift, summarize_task_grounding_for_prompt
 from backend.src.agent.runner.step_feedback import (
     summarize_failure_guidance_for_prompt,
@@ -490,14 +491,16 @@ def run_replan_phase(
     if task_grounding_text and task_grounding_text != "(无)":
         replan_prompt += f"\n原任务不可变约束（必须继承，不可改题）：\n{task_grounding_text}\n"
 
-    text, err, llm_id = call_llm_for_text_with_id(
+    text, err, llm_id = yield from iter_call_llm_for_text_with_id(
         create_llm_call,
+        llm_call_async=create_llm_call_async,
         prompt=replan_prompt,
         task_id=int(task_id),
         run_id=int(run_id),
         model=model,
         parameters=parameters,
         variables={"source": "agent_replan"},
+        priority=LLM_PRIORITY_PLANNING,
     )
     if err or not text:
         raise PlanPhaseFailure(
@@ -521,14 +524,16 @@ def run_replan_phase(
         )
         retry_params = dict(parameters or {})
         retry_params["temperature"] = 0
-        retry_text, retry_err, retry_llm_id = call_llm_for_text_with_id(
+        retry_text, retry_err, retry_llm_id = yield from iter_call_llm_for_text_with_id(
             create_llm_call,
+            llm_call_async=create_llm_call_async,
             prompt=reprompt,
             task_id=int(task_id),
             run_id=int(run_id),
             model=model,
             parameters=retry_params,
             variables={"source": "agent_replan_plain_json_retry"},
+            priority=LLM_PRIORITY_PLANNING,
         )
         if not retry_err and retry_text:
             plan_text = str(retry_text)
@@ -653,14 +658,16 @@ def run_replan_phase(
         )
         retry_params = dict(parameters or {})
         retry_params["temperature"] = 0
-        retry_text, retry_err, retry_llm_id = call_llm_for_text_with_id(
+        retry_text, retry_err, retry_llm_id = yield from iter_call_llm_for_text_with_id(
             create_llm_call,
+            llm_call_async=create_llm_call_async,
             prompt=reprompt,
             task_id=int(task_id),
             run_id=int(run_id),
             model=model,
             parameters=retry_params,
             variables={"source": "agent_replan_grounding_retry"},
+            priority=LLM_PRIORITY_PLANNING,
         )
         retry_plan = _extract_json_object(retry_text or "")
         if retry_err or not retry_plan:
@@ -931,6 +938,7 @@ def run_planning_phase(
             model=model,
             parameters=parameters,
             variables={"source": "agent_plan"},
+            priority=LLM_PRIORITY_PLANNING,
         )
         try:
             plan_queue.put((text, err, llm_id), timeout=1)
@@ -1002,6 +1010,7 @@ def run_planning_phase(
             model=model,
             parameters=retry_params,
             variables={"source": "agent_plan_plain_json_retry"},
+            priority=LLM_PRIORITY_PLANNING,
         )
         if not retry_err and retry_text:
             plan_text_value = str(retry_text)
@@ -1065,6 +1074,7 @@ def run_planning_phase(
             model=model,
             parameters=fixed_params,
             variables={"source": "agent_plan_fix_output_last"},
+            priority=LLM_PRIORITY_PLANNING,
         )
         if fixed_err or not fixed_text:
             raise PlanPhaseFailure(
@@ -1132,6 +1142,7 @@ def run_planning_phase(
                     model=model,
                     parameters=fixed_params,
                     variables={"source": "agent_plan_repair"},
+                    priority=LLM_PRIORITY_PLANNING,
                 )
 
                 fixed_plan = _extract_json_object(fixed_text or "")
@@ -37,6 +37,7 @@ from backend.src.constants import (
     SKILL_COMPOSE_PROMPT_TEMPLATE,
     SKILL_DRAFT_PROMPT_TEMPLATE,
 )
+from backend.src.services.knowledge.knowledge_version import get_knowledge_version
 from backend.src.services.knowledge.query import retrieval as retrieval_query
 from backend.src.services.llm.llm_client import call_openai
 
@@ -92,6 +93,7 @@ def _cached_call_openai(
     说明：
     - 仅缓存成功响应（err=None 且 text 非空）
     - key 维度包含 DB 路径与 prompt_root，避免测试/多实例串扰
+    - key 维度包含知识库版本号：文件监听同步到新的 skills/memory/graph 后旧结果自动失效
     - TTL/max_entries 由常量控制；<=0 时自动禁用
     """
     ttl = coerce_int(AGENT_RETRIEVAL_LLM_CACHE_TTL_SECONDS or 0, default=0)
@@ -105,7 +107,11 @@ def _cached_call_openai(
         params_key = json.dumps(params or {}, ensure_ascii=False, sort_keys=True)
     except Exception:
         params_key = str(params or "")
-    raw = f"{cache_namespace}|db:{db_key}|prompt_root:{prompt_root}|model:{model}|params:{params_key}|prompt:{prompt}"
+    knowledge_version = get_knowledge_version()
+    raw = (
+        f"{cache_namespace}|db:{db_key}|prompt_root:{prompt_root}|kv:{knowledge_version}"
+        f"|model:{model}|params:{params_key}|prompt:{prompt}"
+    )
     key = hashlib.sha256(raw.encode("utf-8")).hexdigest()
 
     now_value = time.monotonic()
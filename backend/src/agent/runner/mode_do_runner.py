@@ -1,14 +1,16 @@
 from __future__ import annotations
 
+import asyncio
 import time
 from dataclasses import dataclass
 from typing import Callable, List, Optional
 
 from backend.src.agent.core.plan_structure import PlanStructure
 from backend.src.agent.runner.react_loop import run_react_loop
-from backend.src.agent.runner.stream_pump import pump_sync_generator
+from backend.src.agent.runner.stream_pump import pump_coroutine_generator, pump_sync_generator
 from backend.src.agent.runner.stream_status_event import normalize_stream_run_status
-from backend.src.constants import RUN_STATUS_RUNNING
+from backend.src.common.async_bridge import LoopBridge, bind_loop_bridge, reset_loop_bridge
+from backend.src.constants import AGENT_REACT_ASYNC_EXECUTION, RUN_STATUS_RUNNING
 from backend.src.services.llm.llm_client import sse_json
 from backend.src.services.tasks.task_queries import get_task_run
 
@@ -46,6 +48,8 @@ class DoExecutionConfig:
     idle_timeout_seconds: float = 300.0
     heartbeat_min_interval_seconds: float = 3.0
     heartbeat_trigger_debounce_seconds: float = 0.6
+    # None 表示沿用 AGENT_REACT_ASYNC_EXECUTION
+    async_execution: Optional[bool] = None
 
 
 async def _run_do_mode_execution_impl(config: DoExecutionConfig) -> DoExecutionResult:
@@ -57,6 +61,13 @@ async def _run_do_mode_execution_impl(config: DoExecutionConfig) -> DoExecutionR
     run_id = int(config.run_id)
     pump_label = str(config.pump_label or "react")
 
+    async_execution = AGENT_REACT_ASYNC_EXECUTION if config.async_execution is None else bool(config.async_execution)
+    # 异步执行：ReAct 循环作为协程在本 event loop 上驱动，LLM/HTTP 动作直接 await，
+    # 文件/命令等阻塞动作走 asyncio.to_thread；子进程经 LoopBridge 交回本 loop 等待，流结束（含客户端断开）时统一取消
+    async_bridge = LoopBridge(asyncio.get_running_loop()) if async_execution else None
+    bridge_token = bind_loop_bridge(async_bridge) if async_bridge is not None else None
+    pump = pump_coroutine_generator if async_execution else pump_sync_generator
+
     inner_react = run_react_loop(
         task_id=task_id,
         run_id=run_id,
@@ -94,39 +105,44 @@ async def _run_do_mode_execution_impl(config: DoExecutionConfig) -> DoExecutionR
             return ""
         return status
 
-    async for kind, payload in pump_sync_generator(
-        inner=inner_react,
-        label=str(pump_label or "react"),
-        poll_interval_seconds=float(config.poll_interval_seconds),
-        idle_timeout_seconds=float(config.idle_timeout_seconds),
-        heartbeat_builder=lambda: sse_json(
-            {
-                "type": "run_heartbeat",
-                "phase": "do_execution",
-                "task_id": int(task_id),
-                "run_id": int(run_id),
-                "status": "running",
-                "label": str(pump_label or "react"),
-            }
-        ),
-        heartbeat_min_interval_seconds=float(config.heartbeat_min_interval_seconds or 0),
-        heartbeat_trigger_debounce_seconds=float(config.heartbeat_trigger_debounce_seconds or 0),
-        stop_status_provider=_read_external_terminal_status,
-    ):
-        if kind == "msg":
-            if payload:
-                config.yield_func(str(payload))
-            continue
-        if kind == "stop":
-            external_stop_status = str(payload or "").strip().lower()
-            break
-        if kind == "done":
-            react_result = payload
-            break
-        if kind == "err":
-            if isinstance(payload, BaseException):
-                raise payload  # noqa: TRY301
-            raise RuntimeError(f"{pump_label} 异常:{payload}")  # noqa: TRY301
+    try:
+        async for kind, payload in pump(
+            inner=inner_react,
+            label=str(pump_label or "react"),
+            poll_interval_seconds=float(config.poll_interval_seconds),
+            idle_timeout_seconds=float(config.idle_timeout_seconds),
+            heartbeat_builder=lambda: sse_json(
+                {
+                    "type": "run_heartbeat",
+                    "phase": "do_execution",
+                    "task_id": int(task_id),
+                    "run_id": int(run_id),
+                    "status": "running",
+                    "label": str(pump_label or "react"),
+                }
+            ),
+            heartbeat_min_interval_seconds=float(config.heartbeat_min_interval_seconds or 0),
+            heartbeat_trigger_debounce_seconds=float(config.heartbeat_trigger_debounce_seconds or 0),
+            stop_status_provider=_read_external_terminal_status,
+        ):
+            if kind == "msg":
+                if payload:
+                    config.yield_func(str(payload))
+                continue
+            if kind == "stop":
+                external_stop_status = str(payload or "").strip().lower()
+                break
+            if kind == "done":
+                react_result = payload
+                break
+            if kind == "err":
+                if isinstance(payload, BaseException):
+                    raise payload  # noqa: TRY301
+                raise RuntimeError(f"{pump_label} 异常:{payload}")  # noqa: TRY301
+    finally:
+        if async_bridge is not None:
+            async_bridge.close()
+            reset_loop_bridge(bridge_token)
 
     if external_stop_status:
         if callable(config.safe_write_debug):
@@ -1,6 +1,6 @@
 import json
 from dataclasses import dataclass
-from typing import Callable, Dict, Generator, List, Optional
+from typing import Any, Awaitable, Callable, Dict, Generator, List, Optional
 
 from backend.src.agent.core.plan_structure import PlanStructure
 from backend.src.agent.contracts.stream_events import build_need_input_payload, generate_prompt_token
@@ -14,6 +14,7 @@ from backend.src.agent.runner.feedback import (
 )
 from backend.src.agent.runner.plan_events import sse_plan, sse_plan_delta
 from backend.src.agent.runner.react_state_manager import resolve_executor
+from backend.src.common.async_bridge import iter_blocking_call
 from backend.src.common.utils import coerce_int, now_iso, parse_optional_int
 from backend.src.constants import (
     AGENT_MAX_STEPS_UNLIMITED,
@@ -75,7 +76,8 @@ def maybe_apply_review_gate_before_feedback(
     max_steps_limit: Optional[int],
     agent_state: Dict,
     safe_write_debug: Callable[..., None],
-) -> Generator[str, None, bool]:
+    llm_call_async: Optional[Callable[[dict], Awaitable[dict]]] = None,
+) -> Generator[Any, Any, bool]:
     """
     评估门闩（在"确认满意度"之前）：
     - 若评估未通过，则在"确认满意度"之前插入修复步骤并继续执行（不立刻进入 waiting）；
@@ -97,11 +99,14 @@ def maybe_apply_review_gate_before_feedback(
         from backend.src.services.tasks.task_postprocess import ensure_agent_review_record
 
         yield sse_json({"delta": f"{STREAM_TAG_EXEC} 评估任务完成度…\n"})
-        review_id = ensure_agent_review_record(
-            task_id=int(task_id),
-            run_id=int(run_id),
-            skills=[],
-            force=True,
+        # 评估记录生成是同步流水线（含 LLM 与落库）：协程驱动时放进线程，不卡住 event loop
+        review_id = yield from iter_blocking_call(
+            lambda: ensure_agent_review_record(
+                task_id=int(task_id),
+                run_id=int(run_id),
+                skills=[],
+                force=True,
+            )
         )
         if review_id:
             review_row = get_agent_review(review_id=int(review_id))
@@ -156,8 +161,9 @@ def maybe_apply_review_gate_before_feedback(
             review_summary=review_summary,
             review_next_actions=review_next_actions,
         )
-        deliberation_text, deliberation_err = review_repair.call_llm_for_text(
+        deliberation_text, deliberation_err = yield from review_repair.iter_call_llm_for_text(
             llm_call,
+            llm_call_async=llm_call_async,
             prompt=repair_prompt,
             task_id=int(task_id),
             run_id=int(run_id),
@@ -1,7 +1,7 @@
 import os
 import json
 import re
-from typing import Callable, Dict, List, Optional, Tuple
+from typing import Any, Awaitable, Callable, Dict, Generator, List, Optional, Tuple
 
 from backend.src.actions.registry import (
     action_payload_keys_guide,
@@ -18,6 +18,7 @@ from backend.src.agent.support import (
 )
 from backend.src.agent.core.context_budget import apply_context_budget_pipeline
 from backend.src.agent.runner.goal_progress import summarize_task_grounding_for_prompt
+from backend.src.common.async_bridge import AwaitRequest, coroutine_driver_active
 from backend.src.common.errors import AppError
 from backend.src.common.task_error_codes import format_task_error
 from backend.src.common.utils import coerce_int, now_iso
@@ -278,9 +279,147 @@ def call_llm_for_text_with_id(
     variables: Optional[dict] = None,
     retry_max_attempts: Optional[int] = None,
     hard_timeout_seconds: Optional[int] = None,
+    priority: Optional[str] = None,
 ) -> Tuple[Optional[str], Optional[str], Optional[int]]:
     """
     call_llm_for_text 的扩展版本：额外返回 llm_records.id，便于链路调试与溯源。
+
+    priority：LLM 调度类别（见 llm_scheduler），缺省为 interactive。
+    """
+    try:
+        payload = _build_llm_text_payload(
+            prompt=prompt,
+            task_id=task_id,
+            run_id=run_id,
+            model=model,
+            parameters=parameters,
+            variables=variables,
+            retry_max_attempts=retry_max_attempts,
+            hard_timeout_seconds=hard_timeout_seconds,
+            priority=priority,
+        )
+        resp = llm_call(payload)
+        return extract_llm_call_text_and_id(resp)
+    except AppError as exc:
+        return None, str(exc.message or "").strip() or ERROR_MESSAGE_LLM_CALL_FAILED, None
+    except (TypeError, ValueError, KeyError, AttributeError, RuntimeError) as exc:
+        return None, str(exc) or ERROR_MESSAGE_LLM_CALL_FAILED, None
+
+
+def _build_llm_text_payload(
+    *,
+    prompt: str,
+    task_id: int,
+    run_id: int,
+    model: str,
+    parameters: dict,
+    variables: Optional[dict],
+    retry_max_attempts: Optional[int],
+    hard_timeout_seconds: Optional[int],
+    priority: Optional[str],
+) -> dict:
+    payload = {
+        "prompt": prompt,
+        "task_id": int(task_id),
+        "run_id": int(run_id),
+        "model": model,
+        "parameters": parameters,
+        "variables": variables or {},
+    }
+    if retry_max_attempts is not None:
+        payload["retry_max_attempts"] = int(retry_max_attempts)
+    if hard_timeout_seconds is not None:
+        payload["hard_timeout_seconds"] = int(hard_timeout_seconds)
+    if priority:
+        payload["priority"] = str(priority)
+    return payload
+
+
+async def call_llm_for_text_with_id_async(
+    llm_call_async: Callable[[dict], Awaitable[dict]],
+    *,
+    prompt: str,
+    task_id: int,
+    run_id: int,
+    model: str,
+    parameters: dict,
+    variables: Optional[dict] = None,
+    retry_max_attempts: Optional[int] = None,
+    hard_timeout_seconds: Optional[int] = None,
+    priority: Optional[str] = None,
+) -> Tuple[Optional[str], Optional[str], Optional[int]]:
+    """call_llm_for_text_with_id 的 asyncio 版本（llm_call_async 通常为 create_llm_call_async）。"""
+    try:
+        payload = _build_llm_text_payload(
+            prompt=prompt,
+            task_id=task_id,
+            run_id=run_id,
+            model=model,
+            parameters=parameters,
+            variables=variables,
+            retry_max_attempts=retry_max_attempts,
+            hard_timeout_seconds=hard_timeout_seconds,
+            priority=priority,
+        )
+        resp = await llm_call_async(payload)
+        return extract_llm_call_text_and_id(resp)
+    except AppError as exc:
+        return None, str(exc.message or "").strip() or ERROR_MESSAGE_LLM_CALL_FAILED, None
+    except (TypeError, ValueError, KeyError, AttributeError, RuntimeError) as exc:
+        return None, str(exc) or ERROR_MESSAGE_LLM_CALL_FAILED, None
+
+
+async def call_llm_for_text_async(
+    llm_call_async: Callable[[dict], Awaitable[dict]],
+    **kwargs,
+) -> Tuple[Optional[str], Optional[str]]:
+    """call_llm_for_text 的 asyncio 版本（参数同 call_llm_for_text）。"""
+    text, err, _llm_id = await call_llm_for_text_with_id_async(llm_call_async, **kwargs)
+    return text, err
+
+
+def iter_call_llm_for_text_with_id(
+    llm_call: Callable[[dict], dict],
+    *,
+    llm_call_async: Optional[Callable[[dict], Awaitable[dict]]] = None,
+    **kwargs,
+) -> Generator[Any, Any, Tuple[Optional[str], Optional[str], Optional[int]]]:
+    """
+    供 SSE generator 以 yield from 调用的 call_llm_for_text_with_id：
+    由协程驱动且提供 llm_call_async 时 yield AwaitRequest 交给 event loop await，否则同步调用 llm_call。
+    """
+    if llm_call_async is not None and coroutine_driver_active():
+        return (yield AwaitRequest(lambda: call_llm_for_text_with_id_async(llm_call_async, **kwargs)))
+    return call_llm_for_text_with_id(llm_call, **kwargs)
+
+
+def iter_call_llm_for_text(
+    llm_call: Callable[[dict], dict],
+    *,
+    llm_call_async: Optional[Callable[[dict], Awaitable[dict]]] = None,
+    **kwargs,
+) -> Generator[Any, Any, Tuple[Optional[str], Optional[str]]]:
+    """iter_call_llm_for_text_with_id 的 (text, error) 版本。"""
+    text, err, _llm_id = yield from iter_call_llm_for_text_with_id(llm_call, llm_call_async=llm_call_async, **kwargs)
+    return text, err
+
+
+def call_llm_streaming_for_text(
+    llm_stream_call: Callable[[dict, Callable[[str], bool]], dict],
+    *,
+    on_text: Callable[[str], bool],
+    prompt: str,
+    task_id: int,
+    run_id: int,
+    model: str,
+    parameters: dict,
+    variables: Optional[dict] = None,
+    hard_timeout_seconds: Optional[int] = None,
+) -> Tuple[Optional[str], Optional[str], dict]:
+    """
+    call_llm_for_text 的流式版本：on_text 返回 True 时提前中止生成。
+
+    返回：(text, error_message, stream_meta)
     """
     try:
         payload = {
@@ -291,16 +430,16 @@ def call_llm_for_text_with_id(
             "parameters": parameters,
             "variables": variables or {},
         }
-        if retry_max_attempts is not None:
-            payload["retry_max_attempts"] = int(retry_max_attempts)
         if hard_timeout_seconds is not None:
             payload["hard_timeout_seconds"] = int(hard_timeout_seconds)
-        resp = llm_call(payload)
-        return extract_llm_call_text_and_id(resp)
+        resp = llm_stream_call(payload, on_text)
+        text, err, _llm_id = extract_llm_call_text_and_id(resp)
+        stream_meta = resp.get("stream") if isinstance(resp, dict) else None
+        return text, err, dict(stream_meta) if isinstance(stream_meta, dict) else {}
     except AppError as exc:
-        return None, str(exc.message or "").strip() or ERROR_MESSAGE_LLM_CALL_FAILED, None
+        return None, str(exc.message or "").strip() or ERROR_MESSAGE_LLM_CALL_FAILED, {}
     except (TypeError, ValueError, KeyError, AttributeError, RuntimeError) as exc:
-        return None, str(exc) or ERROR_MESSAGE_LLM_CALL_FAILED, None
+        return None, str(exc) or ERROR_MESSAGE_LLM_CALL_FAILED, {}
 
 
 def build_react_step_prompt(
@@ -843,9 +982,13 @@ def json_dumps_or_fallback(value: dict) -> str:
 
 __all__ = [
     "call_llm_for_text",
+    "call_llm_for_text_async",
     "call_llm_for_text_with_id",
+    "call_llm_for_text_with_id_async",
     "extract_llm_call_text",
     "extract_llm_call_text_and_id",
+    "iter_call_llm_for_text",
+    "iter_call_llm_for_text_with_id",
     "json_dumps_or_fallback",
     "needs_nonempty_task_output_content",
     "normalize_action_obj_for_execution",
@@ -3,16 +3,20 @@ ReAct 执行循环（Facade）。
 
 说明：
 - 本模块作为"稳定入口"，供 Agent runner（new/resume）调用；
-- 关键依赖（create_llm_call / _execute_step_action）在这里保留为模块级符号，便于单测 patch；
+- 关键依赖（create_llm_call / _execute_step_action 及其 async 版本）在这里保留为模块级符号，便于单测 patch；
+- 同时传入 async 版本（create_llm_call_async / execute_step_action_async）：循环由 pump_coroutine_generator
+  在 SSE 流的 event loop 上驱动时（AGENT_REACT_ASYNC_EXECUTION），LLM 调用与步骤动作直接在该 loop 上 await，
+  不再起泵线程/桥接线程；由 pump_sync_generator 在线程中驱动时仍走同步版本；
 - 具体实现下沉到 react_loop_impl，降低耦合并提升可扩展性。
 """
 
 from __future__ import annotations
 
-from typing import Callable, Dict, Generator, List, Optional, Tuple
+from typing import Any, Callable, Dict, Generator, List, Optional, Tuple
 
-from backend.src.actions.executor import _execute_step_action
-from backend.src.services.llm.llm_calls import create_llm_call
+from backend.src.actions.executor import _execute_step_action, execute_step_action_async
+from backend.src.constants import AGENT_REACT_ACTION_STREAMING
+from backend.src.services.llm.llm_calls import create_llm_call, create_llm_call_async, create_llm_call_streaming
 from backend.src.agent.core.plan_structure import PlanStructure
 
 from backend.src.agent.runner.react_loop_impl import ReactLoopResult, run_react_loop_impl
@@ -44,7 +48,7 @@ def run_react_loop(
     step_llm_config_resolver: Optional[
         Callable[[int, str, List[str]], Tuple[Optional[str], Optional[dict]]]
     ] = None,
-) -> Generator[str, None, ReactLoopResult]:
+) -> Generator[Any, Any, ReactLoopResult]:
     """
     ReAct 执行循环公开入口。
 
@@ -74,5 +78,8 @@ def run_react_loop(
         llm_call=create_llm_call,
         execute_step_action=_execute_step_action,
         step_llm_config_resolver=step_llm_config_resolver,
+        llm_stream_call=create_llm_call_streaming if AGENT_REACT_ACTION_STREAMING else None,
+        llm_call_async=create_llm_call_async,
+        execute_step_action_async=execute_step_action_async,
     )
     return result
@@ -12,7 +12,7 @@ import json
 import os
 import queue
 from dataclasses import dataclass
-from typing import Callable, Dict, Generator, List, Optional, Tuple
+from typing import Any, Awaitable, Callable, Dict, Generator, List, Optional, Tuple
 
 from backend.src.agent.support import (
     _truncate_observation,
@@ -22,7 +22,7 @@ from backend.src.agent.core.plan_structure import PlanStructure
 from backend.src.agent.runner.react_helpers import (
     build_execution_constraints_hint,
     build_react_step_prompt,
-    call_llm_for_text,
+    iter_call_llm_for_text,
     resolve_direct_user_prompt_payload,
     validate_and_normalize_action_text,
     validate_runtime_action_contracts,
@@ -46,12 +46,26 @@ from backend.src.agent.runner.react_step_executor import (
     build_step_progress_payload,
     build_step_warning_payload,
     generate_action_with_retry,
+    generate_action_with_retry_async,
+    generate_speculative_action_text,
+    generate_speculative_action_text_async,
     handle_user_prompt_action,
-    handle_task_output_fallback,
+    record_action_generation_stats,
+    iter_handle_task_output_fallback,
     run_blocking_call_with_progress,
     yield_memory_write_event,
     yield_visible_result,
 )
+from backend.src.agent.runner.react_speculation import (
+    SpeculativePrefetch,
+    build_speculation_key,
+    consume_speculative_prefetch,
+    discard_speculative_prefetch,
+    predict_success_observation,
+    record_speculation_started,
+    speculation_skip_reason,
+    start_speculative_prefetch,
+)
 from backend.src.agent.runner.react_error_handler import (
     clear_failure_streak,
     handle_action_invalid,
@@ -77,6 +91,7 @@ from backend.src.constants import (
     ACTION_TYPE_TASK_OUTPUT,
     ACTION_TYPE_USER_PROMPT,
     ACTION_TYPE_LLM_CALL,
+    AGENT_REACT_SPECULATIVE_PREFETCH,
     RUN_STATUS_DONE,
     RUN_STATUS_FAILED,
     RUN_STATUS_STOPPED,
@@ -163,7 +178,54 @@ def _enforce_allow_constraints(
     llm_call: Callable[[dict], dict],
 ) -> Tuple[Optional[dict], Optional[str], Optional[dict], Optional[str]]:
     """
-    强制执行计划阶段给出的 allow 约束。
+    强制执行计划阶段给出的 allow 约束（同步版本，参数与返回值同 _iter_enforce_allow_constraints）。
+    """
+    steps = _iter_enforce_allow_constraints(
+        task_id=task_id,
+        run_id=run_id,
+        step_order=step_order,
+        step_title=step_title,
+        workdir=workdir,
+        allowed=allowed,
+        allowed_text=allowed_text,
+        action_obj=action_obj,
+        action_type=action_type,
+        payload_obj=payload_obj,
+        react_prompt=react_prompt,
+        model=model,
+        react_params=react_params,
+        variables_source=variables_source,
+        llm_call=llm_call,
+    )
+    try:
+        next(steps)
+    except StopIteration as exc:
+        return exc.value
+    # 未提供 llm_call_async 时不会 yield AwaitRequest
+    raise RuntimeError("_enforce_allow_constraints 不应挂起")
+
+
+def _iter_enforce_allow_constraints(
+    *,
+    task_id: int,
+    run_id: int,
+    step_order: int,
+    step_title: str,
+    workdir: str,
+    allowed: List[str],
+    allowed_text: str,
+    action_obj: dict,
+    action_type: str,
+    payload_obj: dict,
+    react_prompt: str,
+    model: str,
+    react_params: dict,
+    variables_source: str,
+    llm_call: Callable[[dict], dict],
+    llm_call_async: Optional[Callable[[dict], Awaitable[dict]]] = None,
+) -> Generator[Any, Any, Tuple[Optional[dict], Optional[str], Optional[dict], Optional[str]]]:
+    """
+    强制执行计划阶段给出的 allow 约束（generator：调用方 yield from 取返回值）。
     """
     allowed_set = set(allowed or [])
     if not allowed_set or action_type in allowed_set:
@@ -178,8 +240,9 @@ def _enforce_allow_constraints(
     )
 
     forced_prompt = react_prompt + f"\n补充约束：本步骤允许的 action.type 只能是：{allowed_text}。请重新输出 JSON。\n"
-    forced_text, forced_err = call_llm_for_text(
+    forced_text, forced_err = yield from iter_call_llm_for_text(
         llm_call,
+        llm_call_async=llm_call_async,
         prompt=forced_prompt,
         task_id=int(task_id),
         run_id=int(run_id),
@@ -226,6 +289,272 @@ def _is_run_stopped(*, run_id: int) -> bool:
     return status == str(RUN_STATUS_STOPPED)
 
 
+def _resolve_step_llm_config(
+    *,
+    task_id: int,
+    run_id: int,
+    step_order: int,
+    title: str,
+    allowed: List[str],
+    model: str,
+    react_params: dict,
+    step_llm_config_resolver: Optional[
+        Callable[[int, str, List[str]], Tuple[Optional[str], Optional[dict]]]
+    ],
+) -> Tuple[str, dict, Dict]:
+    """按步骤解析模型与参数覆盖，返回 (step_model, step_react_params, step_llm_overrides)。"""
+    step_model = model
+    step_react_params = react_params
+    step_llm_overrides: Dict = {}
+    if step_llm_config_resolver:
+        try:
+            resolved_model, resolved_params = step_llm_config_resolver(step_order, title, allowed)
+        except Exception as exc:
+            _safe_write_debug(
+                task_id=int(task_id),
+                run_id=int(run_id),
+                message="agent.step_llm_config_resolver.failed",
+                data={"step_order": int(step_order), "title": str(title), "error": str(exc)},
+                level="warning",
+            )
+            resolved_model, resolved_params = None, None
+        if isinstance(resolved_model, str) and resolved_model.strip():
+            step_model = resolved_model.strip()
+        if isinstance(resolved_params, dict):
+            step_llm_overrides = dict(resolved_params)
+            step_react_params = dict(react_params)
+            step_react_params.update(step_llm_overrides)
+    return step_model, step_react_params, step_llm_overrides
+
+
+def _build_step_prompt(
+    *,
+    workdir: str,
+    message: str,
+    plan_struct: PlanStructure,
+    step_order: int,
+    title: str,
+    allowed: List[str],
+    allowed_text: str,
+    observations: List[str],
+    tools_hint: str,
+    skills_hint: str,
+    memories_hint: str,
+    graph_hint: str,
+    agent_state: Dict,
+    context: Dict,
+    budget_meta_sink: Optional[dict] = None,
+) -> str:
+    """构建单步 ReAct prompt（正常生成与投机预取共用，保证两者输入口径一致）。"""
+    obs_text = "\n".join(f"- {_compact_observation_for_prompt(o)}" for o in observations[-2:]) or "(无)"
+    source_failure_summary = summarize_recent_source_failures_for_prompt(
+        observations=list(observations or []),
+        failure_signatures=(
+            agent_state.get("failure_signatures")
+            if isinstance(agent_state, dict) and isinstance(agent_state.get("failure_signatures"), dict)
+            else None
+        ),
+    )
+    execution_hint = build_execution_constraints_hint(
+        agent_state=agent_state,
+        step_order=step_order,
+    )
+    latest_parse_input_text = str((context or {}).get("latest_parse_input_text") or "").strip()
+    latest_external_url = str((context or {}).get("latest_external_url") or "").strip()
+    return build_react_step_prompt(
+        now_utc=now_iso(),
+        workdir=workdir,
+        message=message,
+        plan=plan_struct.get_titles_json(),
+        step_index=step_order,
+        step_title=title,
+        allowed_actions=allowed_text,
+        observations=obs_text,
+        recent_source_failures=source_failure_summary,
+        graph=graph_hint,
+        tools=tools_hint,
+        skills=skills_hint,
+        memories=memories_hint,
+        latest_parse_input_text=latest_parse_input_text,
+        latest_external_url=latest_external_url,
+        capability_hint=build_capability_hint(
+            capability=resolve_step_capability(
+                allowed_actions=list(allowed or []),
+                step_title=title,
+            )
+        ),
+        execution_hint=execution_hint,
+        budget_meta_sink=budget_meta_sink,
+        recent_step_feedback=summarize_recent_step_feedback_for_prompt(agent_state),
+        retry_requirements=summarize_retry_requirements_for_prompt(agent_state),
+        failure_guidance=summarize_failure_guidance_for_prompt(agent_state),
+    )
+
+
+def _speculation_retry_guidance(agent_state: Dict) -> str:
+    """投机预取 key 的一部分：prompt 中随执行结果变化的重试要求/失败指引。"""
+    return "\n".join(
+        [
+            summarize_retry_requirements_for_prompt(agent_state),
+            summarize_failure_guidance_for_prompt(agent_state),
+        ]
+    )
+
+
+def _speculation_exit_reason(run_status: str) -> str:
+    """循环结束时仍未消费的预取按 run 状态记丢弃原因（正常结束为 run_ended）。"""
+    if run_status == RUN_STATUS_DONE:
+        return "run_ended"
+    return f"run_{str(run_status or 'unknown')}"
+
+
+def _maybe_start_speculative_prefetch(
+    *,
+    task_id: int,
+    run_id: int,
+    idx: int,
+    current_title: str,
+    current_action_type: str,
+    current_payload: Optional[dict],
+    message: str,
+    workdir: str,
+    model: str,
+    react_params: dict,
+    plan_struct: PlanStructure,
+    tools_hint: str,
+    skills_hint: str,
+    memories_hint: str,
+    graph_hint: str,
+    agent_state: Dict,
+    context: Dict,
+    observations: List[str],
+    variables_source: str,
+    llm_call: Callable[[dict], dict],
+    step_llm_config_resolver: Optional[
+        Callable[[int, str, List[str]], Tuple[Optional[str], Optional[dict]]]
+    ],
+    llm_call_async: Optional[Callable[[dict], Awaitable[dict]]] = None,
+) -> Optional[SpeculativePrefetch]:
+    """
+    当前步骤执行前，为下一步发起投机预取（不满足条件时返回 None）。
+
+    说明：
+    - prompt 与正常生成走同一个 _build_step_prompt，只是观测里用按 payload 预测的成功观测行代替真实观测；
+    - 复用与否由 consume_speculative_prefetch 在下一步开始时按 key + 真实观测 + 真实状态判定。
+    """
+    next_idx = int(idx) + 1
+    if next_idx >= plan_struct.step_count:
+        return None
+    next_step = plan_struct.get_step(next_idx)
+    if next_step is None:
+        return None
+    next_order = next_idx + 1
+    next_title = str(next_step.title or "")
+    next_allowed: List[str] = list(next_step.allow or [])
+    next_kind = str(getattr(next_step, "kind", "") or "").strip().lower()
+    skip_reason = speculation_skip_reason(
+        current_action_type=current_action_type,
+        next_allowed=next_allowed,
+        next_is_feedback=bool(next_kind == "task_feedback" or is_task_feedback_step_title(next_title)),
+        next_has_direct_user_prompt=isinstance(
+            resolve_direct_user_prompt_payload(
+                step_title=next_title,
+                allowed_actions=next_allowed,
+                step_prompt=next_step.prompt,
+            ),
+            dict,
+        ),
+    )
+    if skip_reason:
+        return None
+    predicted_observation = predict_success_observation(
+        action_type=current_action_type,
+        title=current_title,
+        payload=current_payload,
+    )
+    if predicted_observation is None:
+        return None
+
+    next_allowed_text = " / ".join(next_allowed) if next_allowed else "(未限制)"
+    next_model, next_params, _overrides = _resolve_step_llm_config(
+        task_id=int(task_id),
+        run_id=int(run_id),
+        step_order=int(next_order),
+        title=next_title,
+        allowed=next_allowed,
+        model=model,
+        react_params=react_params,
+        step_llm_config_resolver=step_llm_config_resolver,
+    )
+    predicted_observations = list(observations or []) + [predicted_observation]
+    next_prompt = _build_step_prompt(
+        workdir=workdir,
+        message=message,
+        plan_struct=plan_struct,
+        step_order=int(next_order),
+        title=next_title,
+        allowed=next_allowed,
+        allowed_text=next_allowed_text,
+        observations=predicted_observations,
+        tools_hint=tools_hint,
+        skills_hint=skills_hint,
+        memories_hint=memories_hint,
+        graph_hint=graph_hint,
+        agent_state=agent_state,
+        context=context,
+    )
+    record_speculation_started(agent_state)
+    _safe_write_debug(
+        task_id=int(task_id),
+        run_id=int(run_id),
+        message="agent.react.speculation.started",
+        data={"step_order": int(next_order), "after_action": str(current_action_type)},
+        level="info",
+    )
+    return start_speculative_prefetch(
+        step_order=int(next_order),
+        key=build_speculation_key(
+            step_order=int(next_order),
+            title=next_title,
+            allowed_text=next_allowed_text,
+            plan_titles_json=plan_struct.get_titles_json(),
+            model=next_model,
+            retry_guidance=_speculation_retry_guidance(agent_state),
+        ),
+        predicted_observation=predicted_observation,
+        generate=lambda: generate_speculative_action_text(
+            llm_call=llm_call,
+            react_prompt=next_prompt,
+            task_id=int(task_id),
+            run_id=int(run_id),
+            step_order=int(next_order),
+            step_title=next_title,
+            model=next_model,
+            react_params=next_params,
+            variables_source=variables_source,
+            allowed_actions_text=next_allowed_text,
+        ),
+        generate_async=(
+            (
+                lambda: generate_speculative_action_text_async(
+                    llm_call_async=llm_call_async,
+                    react_prompt=next_prompt,
+                    task_id=int(task_id),
+                    run_id=int(run_id),
+                    step_order=int(next_order),
+                    step_title=next_title,
+                    model=next_model,
+                    react_params=next_params,
+                    variables_source=variables_source,
+                    allowed_actions_text=next_allowed_text,
+                )
+            )
+            if llm_call_async is not None
+            else None
+        ),
+    )
+
+
 def run_react_loop_impl(
     *,
     task_id: int,
@@ -249,7 +578,11 @@ def run_react_loop_impl(
     step_llm_config_resolver: Optional[
         Callable[[int, str, List[str]], Tuple[Optional[str], Optional[dict]]]
     ] = None,
-) -> Generator[str, None, ReactLoopResult]:
+    llm_stream_call: Optional[Callable[[dict, Callable[[str], bool]], dict]] = None,
+    speculative_prefetch: Optional[bool] = None,
+    llm_call_async: Optional[Callable[[dict], Awaitable[dict]]] = None,
+    execute_step_action_async: Optional[Callable[..., Awaitable[Tuple[Optional[dict], Optional[str]]]]] = None,
+) -> Generator[Any, Any, ReactLoopResult]:
     """
     ReAct 执行循环（新 run 与 resume 共用）。
 
@@ -257,6 +590,9 @@ def run_react_loop_impl(
     - 每个 step 只执行一条 action，并落库到 task_steps / task_outputs / llm_records 等表
     - 支持 plan_patch（仅允许改下一步 k+1），并立即推送计划栏更新
     - 支持 user_prompt：进入 waiting，等待前端用 /agent/command/resume/stream 继续执行
+    - speculative_prefetch（默认取 AGENT_REACT_SPECULATIVE_PREFETCH）：执行期间投机预取下一步 action
+    - llm_call_async / execute_step_action_async：由协程驱动（pump_coroutine_generator）时，
+      LLM 调用与步骤动作经 AwaitRequest 在 event loop 上 await，不再起线程；未驱动时忽略
     """
     run_status = RUN_STATUS_DONE
     last_step_order = max(0, int(start_step_order) - 1)
@@ -305,813 +641,897 @@ def run_react_loop_impl(
         )
     )
 
+    speculation_enabled = bool(
+        AGENT_REACT_SPECULATIVE_PREFETCH if speculative_prefetch is None else speculative_prefetch
+    )
+    pending_prefetch: Optional[SpeculativePrefetch] = None
+    loop_exited = False
+
     # 主循环
-    while idx < plan_struct.step_count:
-        if _is_run_stopped(run_id=int(run_id)):
-            _safe_write_debug(
-                task_id=int(task_id),
-                run_id=int(run_id),
-                message="agent.react.run_stopped_detected",
-                data={"idx": int(idx)},
-                level="warning",
-            )
-            run_status = RUN_STATUS_STOPPED
-            break
-
-        step_order = idx + 1
-        last_step_order = step_order
-        step = plan_struct.get_step(idx)
-        title = step.title if step else ""
-        step_kind = str(getattr(step, "kind", "") or "").strip().lower()
-        is_feedback_step = bool(step_kind == "task_feedback" or is_task_feedback_step_title(title))
-
-        # 结算上一步状态
-        plan_struct.mark_running_as_done()
-
-        allowed: List[str] = step.allow if step else []
-        allowed_text = " / ".join(allowed) if allowed else "(未限制)"
-
-        step_model = model
-        step_react_params = react_params
-        step_llm_overrides: Dict = {}
-        if step_llm_config_resolver:
-            try:
-                resolved_model, resolved_params = step_llm_config_resolver(step_order, title, allowed)
-            except Exception as exc:
+    try:
+        while idx < plan_struct.step_count:
+            if pending_prefetch is not None and pending_prefetch.step_order != idx + 1:
+                discard_speculative_prefetch(pending_prefetch, agent_state=agent_state, reason="plan_jump")
+                pending_prefetch = None
+
+            if _is_run_stopped(run_id=int(run_id)):
                 _safe_write_debug(
                     task_id=int(task_id),
                     run_id=int(run_id),
-                    message="agent.step_llm_config_resolver.failed",
-                    data={"step_order": int(step_order), "title": str(title), "error": str(exc)},
+                    message="agent.react.run_stopped_detected",
+                    data={"idx": int(idx)},
                     level="warning",
                 )
-                resolved_model, resolved_params = None, None
-            if isinstance(resolved_model, str) and resolved_model.strip():
-                step_model = resolved_model.strip()
-            if isinstance(resolved_params, dict):
-                step_llm_overrides = dict(resolved_params)
-                step_react_params = dict(react_params)
-                step_react_params.update(step_llm_overrides)
-
-        # 评估门闩
-        if is_feedback_step and (not bool(agent_state.get("task_feedback_asked"))) and idx > 0:
-            inserted = yield from maybe_apply_review_gate_before_feedback(
+                run_status = RUN_STATUS_STOPPED
+                break
+
+            step_order = idx + 1
+            last_step_order = step_order
+            step = plan_struct.get_step(idx)
+            title = step.title if step else ""
+            step_kind = str(getattr(step, "kind", "") or "").strip().lower()
+            is_feedback_step = bool(step_kind == "task_feedback" or is_task_feedback_step_title(title))
+
+            # 结算上一步状态
+            plan_struct.mark_running_as_done()
+
+            allowed: List[str] = step.allow if step else []
+            allowed_text = " / ".join(allowed) if allowed else "(未限制)"
+
+            step_model, step_react_params, step_llm_overrides = _resolve_step_llm_config(
                 task_id=int(task_id),
                 run_id=int(run_id),
-                idx=int(idx),
+                step_order=int(step_order),
                 title=title,
-                model=step_model,
-                react_params=step_react_params,
-                variables_source=variables_source,
-                llm_call=llm_call,
-                plan_struct=plan_struct,
-                max_steps_limit=max_steps_limit,
-                agent_state=agent_state,
-                safe_write_debug=_safe_write_debug,
+                allowed=allowed,
+                model=model,
+                react_params=react_params,
+                step_llm_config_resolver=step_llm_config_resolver,
             )
-            if inserted:
-                continue
 
-        # 任务闭环：确认满意度
-        if is_feedback_step:
-            outcome = yield from handle_task_feedback_step(
+            # 评估门闩
+            if is_feedback_step and (not bool(agent_state.get("task_feedback_asked"))) and idx > 0:
+                inserted = yield from maybe_apply_review_gate_before_feedback(
+                    task_id=int(task_id),
+                    run_id=int(run_id),
+                    idx=int(idx),
+                    title=title,
+                    model=step_model,
+                    react_params=step_react_params,
+                    variables_source=variables_source,
+                    llm_call=llm_call,
+                    plan_struct=plan_struct,
+                    max_steps_limit=max_steps_limit,
+                    agent_state=agent_state,
+                    safe_write_debug=_safe_write_debug,
+                    llm_call_async=llm_call_async,
+                )
+                if inserted:
+                    continue
+
+            # 任务闭环：确认满意度
+            if is_feedback_step:
+                outcome = yield from handle_task_feedback_step(
+                    task_id=int(task_id),
+                    run_id=int(run_id),
+                    idx=int(idx),
+                    step_order=int(step_order),
+                    title=title,
+                    message=message,
+                    workdir=workdir,
+                    model=step_model,
+                    react_params=step_react_params,
+                    variables_source=variables_source,
+                    tools_hint=tools_hint,
+                    skills_hint=skills_hint,
+                    memories_hint=memories_hint,
+                    graph_hint=graph_hint,
+                    plan_struct=plan_struct,
+                    agent_state=agent_state,
+                    context=context,
+                    observations=observations,
+                    max_steps_limit=max_steps_limit,
+                    run_replan_and_merge=run_replan_and_merge,
+                    safe_write_debug=_safe_write_debug,
+                )
+                if outcome.run_status:
+                    run_status = outcome.run_status
+                    break
+                if outcome.next_idx is not None:
+                    idx = outcome.next_idx
+                    continue
+
+            # artifacts 门闩
+            artifacts_outcome = yield from apply_artifacts_gates(
                 task_id=int(task_id),
                 run_id=int(run_id),
                 idx=int(idx),
                 step_order=int(step_order),
                 title=title,
-                message=message,
                 workdir=workdir,
+                message=message,
                 model=step_model,
                 react_params=step_react_params,
-                variables_source=variables_source,
                 tools_hint=tools_hint,
                 skills_hint=skills_hint,
                 memories_hint=memories_hint,
                 graph_hint=graph_hint,
+                allowed=allowed,
                 plan_struct=plan_struct,
                 agent_state=agent_state,
-                context=context,
                 observations=observations,
                 max_steps_limit=max_steps_limit,
                 run_replan_and_merge=run_replan_and_merge,
                 safe_write_debug=_safe_write_debug,
             )
-            if outcome.run_status:
-                run_status = outcome.run_status
+            if artifacts_outcome.run_status:
+                run_status = artifacts_outcome.run_status
                 break
-            if outcome.next_idx is not None:
-                idx = outcome.next_idx
+            if artifacts_outcome.next_idx is not None:
+                idx = artifacts_outcome.next_idx
                 continue
 
-        # artifacts 门闩
-        artifacts_outcome = yield from apply_artifacts_gates(
-            task_id=int(task_id),
-            run_id=int(run_id),
-            idx=int(idx),
-            step_order=int(step_order),
-            title=title,
-            workdir=workdir,
-            message=message,
-            model=step_model,
-            react_params=step_react_params,
-            tools_hint=tools_hint,
-            skills_hint=skills_hint,
-            memories_hint=memories_hint,
-            graph_hint=graph_hint,
-            allowed=allowed,
-            plan_struct=plan_struct,
-            agent_state=agent_state,
-            observations=observations,
-            max_steps_limit=max_steps_limit,
-            run_replan_and_merge=run_replan_and_merge,
-            safe_write_debug=_safe_write_debug,
-        )
-        if artifacts_outcome.run_status:
-            run_status = artifacts_outcome.run_status
-            break
-        if artifacts_outcome.next_idx is not None:
-            idx = artifacts_outcome.next_idx
-            continue
-
-        # 当前步 -> running
-        plan_struct.set_step_status(idx, "running")
-        yield sse_plan_delta(task_id=task_id, run_id=run_id, plan_items=plan_struct.get_items_payload(), indices=[idx])
-
-        # 尽早落库 running
-        persist_loop_state(
-            run_id=run_id,
-            plan_struct=plan_struct,
-            agent_state=agent_state,
-            step_order=step_order,
-            observations=observations,
-            context=context,
-            safe_write_debug=_safe_write_debug,
-            task_id=task_id,
-            where="before_step",
-            # running 状态变更必须落盘：若此处被节流丢弃，崩溃后 resume 将从错误的步骤启动。
-            force=True,
-        )
-
-        yield sse_json({"delta": f"{STREAM_TAG_STEP} {title}\n"})
+            # 当前步 -> running
+            plan_struct.set_step_status(idx, "running")
+            yield sse_plan_delta(task_id=task_id, run_id=run_id, plan_items=plan_struct.get_items_payload(), indices=[idx])
 
-        # 确定性步骤直通：allow 仅 user_prompt 且标题已携带问题时，不再调用 LLM 生成 action。
-        direct_user_prompt_payload = resolve_direct_user_prompt_payload(
-            step_title=title,
-            allowed_actions=allowed,
-            step_prompt=(step.prompt if step is not None else None),
-        )
-        if isinstance(direct_user_prompt_payload, dict):
-            _safe_write_debug(
-                task_id=int(task_id),
-                run_id=int(run_id),
-                message="agent.user_prompt.short_circuit",
-                data={"step_order": int(step_order), "title": str(title)},
-                level="info",
-            )
-            status, should_break = yield from handle_user_prompt_action(
-                task_id=task_id,
+            # 尽早落库 running
+            persist_loop_state(
                 run_id=run_id,
-                step_order=step_order,
-                title=title,
-                payload_obj=direct_user_prompt_payload,
                 plan_struct=plan_struct,
                 agent_state=agent_state,
+                step_order=step_order,
+                observations=observations,
+                context=context,
                 safe_write_debug=_safe_write_debug,
+                task_id=task_id,
+                where="before_step",
+                # running 状态变更必须落盘：若此处被节流丢弃，崩溃后 resume 将从错误的步骤启动。
+                force=True,
             )
-            if should_break:
-                run_status = status
-                break
-            idx += 1
-            continue
 
-        retry_strategy_event = maybe_enforce_retry_change(
-            agent_state=agent_state,
-            plan_struct=plan_struct,
-            step_order=step_order,
-        )
-        if retry_strategy_event:
-            yield sse_json(retry_strategy_event)
-
-        obs_text = "\n".join(f"- {_compact_observation_for_prompt(o)}" for o in observations[-2:]) or "(无)"
-        source_failure_summary = summarize_recent_source_failures_for_prompt(
-            observations=list(observations or []),
-            failure_signatures=(
-                agent_state.get("failure_signatures")
-                if isinstance(agent_state, dict) and isinstance(agent_state.get("failure_signatures"), dict)
-                else None
-            ),
-        )
+            yield sse_json({"delta": f"{STREAM_TAG_STEP} {title}\n"})
 
-        budget_meta: dict = {}
-        execution_hint = build_execution_constraints_hint(
-            agent_state=agent_state,
-            step_order=step_order,
-        )
-        latest_parse_input_text = str((context or {}).get("latest_parse_input_text") or "").strip()
-        latest_external_url = str((context or {}).get("latest_external_url") or "").strip()
-        react_prompt = build_react_step_prompt(
-            now_utc=now_iso(),
-            workdir=workdir,
-            message=message,
-            plan=plan_struct.get_titles_json(),
-            step_index=step_order,
-            step_title=title,
-            allowed_actions=allowed_text,
-            observations=obs_text,
-            recent_source_failures=source_failure_summary,
-            graph=graph_hint,
-            tools=tools_hint,
-            skills=skills_hint,
-            memories=memories_hint,
-            latest_parse_input_text=latest_parse_input_text,
-            latest_external_url=latest_external_url,
-            capability_hint=build_capability_hint(
-                capability=resolve_step_capability(
-                    allowed_actions=list(allowed or []),
-                    step_title=title,
+            # 确定性步骤直通：allow 仅 user_prompt 且标题已携带问题时，不再调用 LLM 生成 action。
+            direct_user_prompt_payload = resolve_direct_user_prompt_payload(
+                step_title=title,
+                allowed_actions=allowed,
+                step_prompt=(step.prompt if step is not None else None),
+            )
+            if isinstance(direct_user_prompt_payload, dict):
+                _safe_write_debug(
+                    task_id=int(task_id),
+                    run_id=int(run_id),
+                    message="agent.user_prompt.short_circuit",
+                    data={"step_order": int(step_order), "title": str(title)},
+                    level="info",
                 )
-            ),
-            execution_hint=execution_hint,
-            budget_meta_sink=budget_meta,
-            recent_step_feedback=summarize_recent_step_feedback_for_prompt(agent_state),
-            retry_requirements=summarize_retry_requirements_for_prompt(agent_state),
-            failure_guidance=summarize_failure_guidance_for_prompt(agent_state),
-        )
-        if isinstance(agent_state, dict):
-            agent_state["context_budget_last_meta"] = dict(budget_meta or {})
+                status, should_break = yield from handle_user_prompt_action(
+                    task_id=task_id,
+                    run_id=run_id,
+                    step_order=step_order,
+                    title=title,
+                    payload_obj=direct_user_prompt_payload,
+                    plan_struct=plan_struct,
+                    agent_state=agent_state,
+                    safe_write_debug=_safe_write_debug,
+                )
+                if should_break:
+                    run_status = status
+                    break
+                idx += 1
+                continue
 
-        # 生成 action
-        action_obj, action_type, payload_obj, action_validate_error, last_action_text = yield from run_blocking_call_with_progress(
-            func=lambda: generate_action_with_retry(
-                llm_call=llm_call,
-                react_prompt=react_prompt,
-                task_id=task_id,
-                run_id=run_id,
+            retry_strategy_event = maybe_enforce_retry_change(
+                agent_state=agent_state,
+                plan_struct=plan_struct,
                 step_order=step_order,
-                step_title=title,
+            )
+            if retry_strategy_event:
+                yield sse_json(retry_strategy_event)
+
+            budget_meta: dict = {}
+            react_prompt = _build_step_prompt(
                 workdir=workdir,
-                model=step_model,
-                react_params=step_react_params,
-                variables_source=variables_source,
-                allowed_actions_text=allowed_text,
-            ),
-            start_payload=build_step_progress_payload(
-                task_id=int(task_id),
-                run_id=int(run_id),
-                step_order=int(step_order),
-                title=str(title or ""),
-                phase="action_generation",
-                status="start",
-                message="正在生成当前步骤动作",
-            ),
-            progress_payload_builder=lambda elapsed_ms, tick: build_step_progress_payload(
-                task_id=int(task_id),
-                run_id=int(run_id),
+                message=message,
+                plan_struct=plan_struct,
                 step_order=int(step_order),
-                title=str(title or ""),
-                phase="action_generation",
-                status="running",
-                message="动作生成仍在进行",
-                elapsed_ms=elapsed_ms,
-                tick=tick,
-            ),
-        )
-
-        # 处理 action 验证失败
-        if action_validate_error or not action_obj:
-            status, next_idx = yield from handle_action_invalid(
-                task_id=task_id,
-                run_id=run_id,
-                step_order=step_order,
-                idx=idx,
                 title=title,
-                message=message,
-                workdir=workdir,
-                model=step_model,
-                react_params=step_react_params,
+                allowed=allowed,
+                allowed_text=allowed_text,
+                observations=observations,
                 tools_hint=tools_hint,
                 skills_hint=skills_hint,
                 memories_hint=memories_hint,
                 graph_hint=graph_hint,
-                action_validate_error=action_validate_error or "invalid_action",
-                last_action_text=last_action_text,
-                plan_struct=plan_struct,
                 agent_state=agent_state,
                 context=context,
-                observations=observations,
-                max_steps_limit=max_steps_limit,
-                run_replan_and_merge=run_replan_and_merge,
-                safe_write_debug=_safe_write_debug,
+                budget_meta_sink=budget_meta,
             )
-            yield sse_json(
-                update_progress_state(
+            if isinstance(agent_state, dict):
+                agent_state["context_budget_last_meta"] = dict(budget_meta or {})
+
+            # 生成 action（上一步执行期间若已投机预取到本步 action，先尝试复用）
+            action_gen_stats: dict = {}
+            action_gen_start_payload = build_step_progress_payload(
+                task_id=int(task_id),
+                run_id=int(run_id),
+                step_order=int(step_order),
+                title=str(title or ""),
+                phase="action_generation",
+                status="start",
+                message="正在生成当前步骤动作",
+            )
+
+            def _action_gen_progress(elapsed_ms: int, tick: int) -> dict:
+                return build_step_progress_payload(
+                    task_id=int(task_id),
+                    run_id=int(run_id),
+                    step_order=int(step_order),
+                    title=str(title or ""),
+                    phase="action_generation",
+                    status="running",
+                    message="动作生成仍在进行",
+                    elapsed_ms=elapsed_ms,
+                    tick=tick,
+                )
+
+            speculative_action = None
+            if pending_prefetch is not None:
+                # 等待预取期间生成器可能被关闭：消费结束前保留句柄，由 finally 兜底取消
+                speculative_action = yield from consume_speculative_prefetch(
+                    prefetch=pending_prefetch,
+                    key=build_speculation_key(
+                        step_order=int(step_order),
+                        title=title,
+                        allowed_text=allowed_text,
+                        plan_titles_json=plan_struct.get_titles_json(),
+                        model=step_model,
+                        retry_guidance=_speculation_retry_guidance(agent_state),
+                    ),
+                    actual_observation=observations[-1] if observations else None,
+                    retry_strategy_changed=bool(retry_strategy_event),
                     agent_state=agent_state,
+                    step_title=title,
+                    workdir=workdir,
+                    start_payload=action_gen_start_payload,
+                    progress_payload_builder=_action_gen_progress,
+                    stats_sink=action_gen_stats,
+                )
+                pending_prefetch = None
+            if speculative_action is not None:
+                action_obj, action_type, payload_obj, action_validate_error, last_action_text = speculative_action
+            else:
+                action_obj, action_type, payload_obj, action_validate_error, last_action_text = yield from run_blocking_call_with_progress(
+                    func=lambda: generate_action_with_retry(
+                        llm_call=llm_call,
+                        react_prompt=react_prompt,
+                        task_id=task_id,
+                        run_id=run_id,
+                        step_order=step_order,
+                        step_title=title,
+                        workdir=workdir,
+                        model=step_model,
+                        react_params=step_react_params,
+                        variables_source=variables_source,
+                        allowed_actions_text=allowed_text,
+                        llm_stream_call=llm_stream_call,
+                        stats_sink=action_gen_stats,
+                    ),
+                    async_func=(
+                        (
+                            lambda: generate_action_with_retry_async(
+                                llm_call_async=llm_call_async,
+                                react_prompt=react_prompt,
+                                task_id=task_id,
+                                run_id=run_id,
+                                step_order=step_order,
+                                step_title=title,
+                                workdir=workdir,
+                                model=step_model,
+                                react_params=step_react_params,
+                                variables_source=variables_source,
+                                allowed_actions_text=allowed_text,
+                                stats_sink=action_gen_stats,
+                            )
+                        )
+                        if llm_call_async is not None
+                        else None
+                    ),
+                    start_payload=action_gen_start_payload,
+                    progress_payload_builder=_action_gen_progress,
+                )
+            record_action_generation_stats(agent_state, step_order=int(step_order), stats=action_gen_stats)
+
+            # 处理 action 验证失败
+            if action_validate_error or not action_obj:
+                status, next_idx = yield from handle_action_invalid(
+                    task_id=task_id,
+                    run_id=run_id,
+                    step_order=step_order,
+                    idx=idx,
+                    title=title,
+                    message=message,
+                    workdir=workdir,
+                    model=step_model,
+                    react_params=step_react_params,
+                    tools_hint=tools_hint,
+                    skills_hint=skills_hint,
+                    memories_hint=memories_hint,
+                    graph_hint=graph_hint,
+                    action_validate_error=action_validate_error or "invalid_action",
+                    last_action_text=last_action_text,
                     plan_struct=plan_struct,
+                    agent_state=agent_state,
                     context=context,
-                    reason="action_invalid",
-                    step_order=step_order,
+                    observations=observations,
+                    max_steps_limit=max_steps_limit,
+                    run_replan_and_merge=run_replan_and_merge,
+                    safe_write_debug=_safe_write_debug,
                 )
-            )
-            if status:
-                run_status = status
-                break
-            if next_idx is not None:
-                idx = next_idx
+                yield sse_json(
+                    update_progress_state(
+                        agent_state=agent_state,
+                        plan_struct=plan_struct,
+                        context=context,
+                        reason="action_invalid",
+                        step_order=step_order,
+                    )
+                )
+                if status:
+                    run_status = status
+                    break
+                if next_idx is not None:
+                    idx = next_idx
+                    continue
+                idx += 1
                 continue
-            idx += 1
-            continue
-
-        # allow 约束检查
-        action_obj, action_type, payload_obj, allow_err = _enforce_allow_constraints(
-            task_id=int(task_id),
-            run_id=int(run_id),
-            step_order=int(step_order),
-            step_title=title,
-            workdir=workdir,
-            allowed=allowed,
-            allowed_text=allowed_text,
-            action_obj=action_obj,
-            action_type=action_type,
-            payload_obj=payload_obj or {},
-            react_prompt=react_prompt,
-            model=step_model,
-            react_params=step_react_params,
-            variables_source=variables_source,
-            llm_call=llm_call,
-        )
 
-        runtime_contract_error = validate_runtime_action_contracts(
-            task_id=int(task_id),
-            run_id=int(run_id),
-            step_title=title,
-            action_type=str(action_type or ""),
-            payload_obj=payload_obj if isinstance(payload_obj, dict) else {},
-            workdir=workdir,
-        )
-        if runtime_contract_error:
-            status, next_idx = yield from handle_action_invalid(
-                task_id=task_id,
-                run_id=run_id,
-                step_order=step_order,
-                idx=idx,
-                title=title,
-                message=message,
+            # allow 约束检查
+            action_obj, action_type, payload_obj, allow_err = yield from _iter_enforce_allow_constraints(
+                task_id=int(task_id),
+                run_id=int(run_id),
+                step_order=int(step_order),
+                step_title=title,
                 workdir=workdir,
+                allowed=allowed,
+                allowed_text=allowed_text,
+                action_obj=action_obj,
+                action_type=action_type,
+                payload_obj=payload_obj or {},
+                react_prompt=react_prompt,
                 model=step_model,
                 react_params=step_react_params,
-                tools_hint=tools_hint,
-                skills_hint=skills_hint,
-                memories_hint=memories_hint,
-                graph_hint=graph_hint,
-                action_validate_error=runtime_contract_error,
-                last_action_text=last_action_text,
-                plan_struct=plan_struct,
-                agent_state=agent_state,
-                context=context,
-                observations=observations,
-                max_steps_limit=max_steps_limit,
-                run_replan_and_merge=run_replan_and_merge,
-                safe_write_debug=_safe_write_debug,
+                variables_source=variables_source,
+                llm_call=llm_call,
+                llm_call_async=llm_call_async,
             )
-            yield sse_json(
-                update_progress_state(
-                    agent_state=agent_state,
+
+            runtime_contract_error = validate_runtime_action_contracts(
+                task_id=int(task_id),
+                run_id=int(run_id),
+                step_title=title,
+                action_type=str(action_type or ""),
+                payload_obj=payload_obj if isinstance(payload_obj, dict) else {},
+                workdir=workdir,
+            )
+            if runtime_contract_error:
+                status, next_idx = yield from handle_action_invalid(
+                    task_id=task_id,
+                    run_id=run_id,
+                    step_order=step_order,
+                    idx=idx,
+                    title=title,
+                    message=message,
+                    workdir=workdir,
+                    model=step_model,
+                    react_params=step_react_params,
+                    tools_hint=tools_hint,
+                    skills_hint=skills_hint,
+                    memories_hint=memories_hint,
+                    graph_hint=graph_hint,
+                    action_validate_error=runtime_contract_error,
+                    last_action_text=last_action_text,
                     plan_struct=plan_struct,
+                    agent_state=agent_state,
                     context=context,
-                    reason="action_runtime_contract_invalid",
-                    step_order=step_order,
+                    observations=observations,
+                    max_steps_limit=max_steps_limit,
+                    run_replan_and_merge=run_replan_and_merge,
+                    safe_write_debug=_safe_write_debug,
                 )
-            )
-            if status:
-                run_status = status
-                break
-            if next_idx is not None:
-                idx = next_idx
+                yield sse_json(
+                    update_progress_state(
+                        agent_state=agent_state,
+                        plan_struct=plan_struct,
+                        context=context,
+                        reason="action_runtime_contract_invalid",
+                        step_order=step_order,
+                    )
+                )
+                if status:
+                    run_status = status
+                    break
+                if next_idx is not None:
+                    idx = next_idx
+                    continue
+                idx += 1
                 continue
-            idx += 1
-            continue
 
-        if allow_err or not action_obj or not action_type:
-            status, next_idx = yield from handle_allow_failure(
-                task_id=task_id,
-                run_id=run_id,
-                step_order=step_order,
-                idx=idx,
-                title=title,
-                message=message,
-                workdir=workdir,
-                model=step_model,
-                react_params=step_react_params,
-                tools_hint=tools_hint,
-                skills_hint=skills_hint,
-                memories_hint=memories_hint,
-                graph_hint=graph_hint,
-                allow_err=allow_err or "action.type 不在 allow 内",
-                plan_struct=plan_struct,
-                agent_state=agent_state,
-                context=context,
-                observations=observations,
-                max_steps_limit=max_steps_limit,
-                run_replan_and_merge=run_replan_and_merge,
-                safe_write_debug=_safe_write_debug,
-            )
-            yield sse_json(
-                update_progress_state(
-                    agent_state=agent_state,
+            if allow_err or not action_obj or not action_type:
+                status, next_idx = yield from handle_allow_failure(
+                    task_id=task_id,
+                    run_id=run_id,
+                    step_order=step_order,
+                    idx=idx,
+                    title=title,
+                    message=message,
+                    workdir=workdir,
+                    model=step_model,
+                    react_params=step_react_params,
+                    tools_hint=tools_hint,
+                    skills_hint=skills_hint,
+                    memories_hint=memories_hint,
+                    graph_hint=graph_hint,
+                    allow_err=allow_err or "action.type 不在 allow 内",
                     plan_struct=plan_struct,
+                    agent_state=agent_state,
                     context=context,
-                    reason="allow_failed",
-                    step_order=step_order,
+                    observations=observations,
+                    max_steps_limit=max_steps_limit,
+                    run_replan_and_merge=run_replan_and_merge,
+                    safe_write_debug=_safe_write_debug,
                 )
-            )
-            if status:
-                run_status = status
-                break
-            if next_idx is not None:
-                idx = next_idx
+                yield sse_json(
+                    update_progress_state(
+                        agent_state=agent_state,
+                        plan_struct=plan_struct,
+                        context=context,
+                        reason="allow_failed",
+                        step_order=step_order,
+                    )
+                )
+                if status:
+                    run_status = status
+                    break
+                if next_idx is not None:
+                    idx = next_idx
+                    continue
+                idx += 1
                 continue
-            idx += 1
-            continue
 
-        # stop 保护：LLM 生成 action 后，可能在“计划补丁落库前”收到 stop。
-        # 这里必须先检查一次，避免出现 stopped 后仍写入 plan_patch 的竞态。
-        if _is_run_stopped(run_id=int(run_id)):
-            _safe_write_debug(
-                task_id=int(task_id),
-                run_id=int(run_id),
-                message="agent.react.run_stopped_before_plan_patch",
-                data={"step_order": int(step_order)},
-                level="warning",
-            )
-            run_status = RUN_STATUS_STOPPED
-            break
-
-        # plan_patch 处理
-        patch_obj = action_obj.get("plan_patch")
-        if isinstance(patch_obj, dict):
-            # apply_next_step_patch 仍使用 legacy 列表接口（后续可进一步收编到 PlanStructure）
-            patch_titles, patch_items, patch_allows, patch_artifacts = plan_struct.to_legacy_lists()
-            patch_err = apply_next_step_patch(
-                current_step_index=step_order,
-                patch_obj=patch_obj,
-                plan_titles=patch_titles,
-                plan_items=patch_items,
-                plan_allows=patch_allows,
-                plan_artifacts=patch_artifacts,
-                max_steps=max_steps_limit,
-            )
-            if patch_err:
-                yield sse_json({"delta": f"{STREAM_TAG_FAIL} plan_patch 不合法（{patch_err}），已忽略\n"})
-            else:
-                patched_plan = PlanStructure.from_legacy(
+            # stop 保护：LLM 生成 action 后，可能在“计划补丁落库前”收到 stop。
+            # 这里必须先检查一次，避免出现 stopped 后仍写入 plan_patch 的竞态。
+            if _is_run_stopped(run_id=int(run_id)):
+                _safe_write_debug(
+                    task_id=int(task_id),
+                    run_id=int(run_id),
+                    message="agent.react.run_stopped_before_plan_patch",
+                    data={"step_order": int(step_order)},
+                    level="warning",
+                )
+                run_status = RUN_STATUS_STOPPED
+                break
+
+            # plan_patch 处理
+            patch_obj = action_obj.get("plan_patch")
+            if isinstance(patch_obj, dict):
+                # apply_next_step_patch 仍使用 legacy 列表接口（后续可进一步收编到 PlanStructure）
+                patch_titles, patch_items, patch_allows, patch_artifacts = plan_struct.to_legacy_lists()
+                patch_err = apply_next_step_patch(
+                    current_step_index=step_order,
+                    patch_obj=patch_obj,
                     plan_titles=patch_titles,
                     plan_items=patch_items,
                     plan_allows=patch_allows,
                     plan_artifacts=patch_artifacts,
+                    max_steps=max_steps_limit,
                 )
-                plan_struct.replace_from(patched_plan)
-                _safe_write_debug(
-                    task_id=int(task_id),
-                    run_id=int(run_id),
-                    message="agent.plan_patch.applied",
-                    data={"current_step_order": int(step_order), "patch": patch_obj},
-                    level="info",
-                )
-                yield sse_plan(task_id=task_id, run_id=run_id, plan_items=plan_struct.get_items_payload())
-                persist_plan_only(
+                if patch_err:
+                    yield sse_json({"delta": f"{STREAM_TAG_FAIL} plan_patch 不合法（{patch_err}），已忽略\n"})
+                else:
+                    patched_plan = PlanStructure.from_legacy(
+                        plan_titles=patch_titles,
+                        plan_items=patch_items,
+                        plan_allows=patch_allows,
+                        plan_artifacts=patch_artifacts,
+                    )
+                    plan_struct.replace_from(patched_plan)
+                    _safe_write_debug(
+                        task_id=int(task_id),
+                        run_id=int(run_id),
+                        message="agent.plan_patch.applied",
+                        data={"current_step_order": int(step_order), "patch": patch_obj},
+                        level="info",
+                    )
+                    yield sse_plan(task_id=task_id, run_id=run_id, plan_items=plan_struct.get_items_payload())
+                    persist_plan_only(
+                        run_id=run_id,
+                        plan_struct=plan_struct,
+                        safe_write_debug=_safe_write_debug,
+                        task_id=task_id,
+                        step_order=step_order,
+                        where="after_plan_patch",
+                    )
+
+            # task_output.content 兜底
+            if action_type == ACTION_TYPE_TASK_OUTPUT:
+                forced_obj, forced_type, forced_payload, fallback_err = yield from iter_handle_task_output_fallback(
+                    llm_call=llm_call,
+                    llm_call_async=llm_call_async,
+                    react_prompt=react_prompt,
+                    task_id=task_id,
                     run_id=run_id,
-                    plan_struct=plan_struct,
+                    step_order=step_order,
+                    title=title,
+                    workdir=workdir,
+                    model=step_model,
+                    react_params=step_react_params,
+                    variables_source=variables_source,
+                    payload_obj=payload_obj,
+                    context=context,
                     safe_write_debug=_safe_write_debug,
+                )
+                if fallback_err:
+                    run_status = RUN_STATUS_FAILED
+                    plan_struct.set_step_status(idx, "failed")
+                    yield sse_plan_delta(
+                        task_id=task_id, run_id=run_id, plan_items=plan_struct.get_items_payload(), indices=[idx]
+                    )
+                    yield sse_json({"delta": f"{STREAM_TAG_FAIL} {fallback_err}\n"})
+                    break
+                if forced_obj:
+                    action_obj = forced_obj
+                    action_type = forced_type
+                    payload_obj = forced_payload or {}
+
+            # user_prompt 处理
+            if action_type == ACTION_TYPE_USER_PROMPT:
+                status, should_break = yield from handle_user_prompt_action(
                     task_id=task_id,
+                    run_id=run_id,
                     step_order=step_order,
-                    where="after_plan_patch",
+                    title=title,
+                    payload_obj=payload_obj,
+                    plan_struct=plan_struct,
+                    agent_state=agent_state,
+                    safe_write_debug=_safe_write_debug,
                 )
+                if should_break:
+                    run_status = status
+                    break
 
-        # task_output.content 兜底
-        if action_type == ACTION_TYPE_TASK_OUTPUT:
-            forced_obj, forced_type, forced_payload, fallback_err = handle_task_output_fallback(
-                llm_call=llm_call,
-                react_prompt=react_prompt,
-                task_id=task_id,
-                run_id=run_id,
-                step_order=step_order,
-                title=title,
-                workdir=workdir,
-                model=step_model,
-                react_params=step_react_params,
-                variables_source=variables_source,
-                payload_obj=payload_obj,
-                context=context,
-                safe_write_debug=_safe_write_debug,
-            )
-            if fallback_err:
-                run_status = RUN_STATUS_FAILED
-                plan_struct.set_step_status(idx, "failed")
-                yield sse_plan_delta(
-                    task_id=task_id, run_id=run_id, plan_items=plan_struct.get_items_payload(), indices=[idx]
+            # Think 模式：llm_call 执行也要按 executor 选择的模型/参数运行。
+            # 说明：上游会移除 LLM 自己写的 model/provider，避免“模型写错不可用”；这里仅注入服务端解析出的配置。
+            if action_type == ACTION_TYPE_LLM_CALL and step_llm_config_resolver:
+                payload_obj["model"] = step_model
+                if step_llm_overrides:
+                    params = payload_obj.get("parameters")
+                    if not isinstance(params, dict):
+                        params = {}
+                    merged = dict(params)
+                    merged.update(step_llm_overrides)
+                    payload_obj["parameters"] = merged
+
+            # docs/agent：Think 模式需要把 executor 角色落到 task_steps.executor 便于审计/复盘。
+            # 约定：executor 由上游（think runner）写入 agent_state.executor_assignments，再由执行阶段按 step_order 查表。
+            executor_value = resolve_executor(agent_state, step_order)
+
+            if _is_run_stopped(run_id=int(run_id)):
+                _safe_write_debug(
+                    task_id=int(task_id),
+                    run_id=int(run_id),
+                    message="agent.react.run_stopped_before_step_persist",
+                    data={"step_order": int(step_order)},
+                    level="warning",
                 )
-                yield sse_json({"delta": f"{STREAM_TAG_FAIL} {fallback_err}\n"})
+                run_status = RUN_STATUS_STOPPED
                 break
-            if forced_obj:
-                action_obj = forced_obj
-                action_type = forced_type
-                payload_obj = forced_payload or {}
-
-        # user_prompt 处理
-        if action_type == ACTION_TYPE_USER_PROMPT:
-            status, should_break = yield from handle_user_prompt_action(
-                task_id=task_id,
-                run_id=run_id,
-                step_order=step_order,
-                title=title,
-                payload_obj=payload_obj,
-                plan_struct=plan_struct,
-                agent_state=agent_state,
-                safe_write_debug=_safe_write_debug,
-            )
-            if should_break:
-                run_status = status
+
+            # 执行步骤
+            detail = json.dumps({"type": action_type, "payload": payload_obj}, ensure_ascii=False)
+            step_created_at = now_iso()
+            try:
+                step_id, _created, _updated = create_task_step(
+                    TaskStepCreateParams(
+                        task_id=int(task_id),
+                        run_id=int(run_id),
+                        title=title,
+                        status=STEP_STATUS_RUNNING,
+                        executor=executor_value,
+                        detail=detail,
+                        result=None,
+                        error=None,
+                        attempts=1,
+                        started_at=step_created_at,
+                        finished_at=None,
+                        step_order=step_order,
+                        created_at=step_created_at,
+                        updated_at=step_created_at,
+                    )
+                )
+            except Exception as create_step_exc:
+                _safe_write_debug(
+                    task_id=int(task_id),
+                    run_id=int(run_id),
+                    message="agent.react.create_task_step_failed",
+                    data={"step_order": int(step_order), "error": str(create_step_exc)},
+                    level="error",
+                )
+                run_status = RUN_STATUS_FAILED
                 break
 
-        # Think 模式：llm_call 执行也要按 executor 选择的模型/参数运行。
-        # 说明：上游会移除 LLM 自己写的 model/provider，避免“模型写错不可用”；这里仅注入服务端解析出的配置。
-        if action_type == ACTION_TYPE_LLM_CALL and step_llm_config_resolver:
-            payload_obj["model"] = step_model
-            if step_llm_overrides:
-                params = payload_obj.get("parameters")
-                if not isinstance(params, dict):
-                    params = {}
-                merged = dict(params)
-                merged.update(step_llm_overrides)
-                payload_obj["parameters"] = merged
-
-        # docs/agent：Think 模式需要把 executor 角色落到 task_steps.executor 便于审计/复盘。
-        # 约定：executor 由上游（think runner）写入 agent_state.executor_assignments，再由执行阶段按 step_order 查表。
-        executor_value = resolve_executor(agent_state, step_order)
-
-        if _is_run_stopped(run_id=int(run_id)):
-            _safe_write_debug(
-                task_id=int(task_id),
-                run_id=int(run_id),
-                message="agent.react.run_stopped_before_step_persist",
-                data={"step_order": int(step_order)},
-                level="warning",
-            )
-            run_status = RUN_STATUS_STOPPED
-            break
+            step_row = {"id": step_id, "title": title, "detail": detail}
+            step_event_queue: "queue.Queue[dict]" = queue.Queue()
+            step_context = context if isinstance(context, dict) else {}
+            injected_context = {
+                "event_sink": lambda payload: step_event_queue.put(dict(payload or {})),
+                "task_id": int(task_id),
+                "run_id": int(run_id),
+                "step_id": int(step_id),
+                "step_order": int(step_order),
+                "step_title": str(title or ""),
+                "model": str(step_model or model or ""),
+            }
+            sentinel = object()
+            previous_context_values = {
+                key: step_context[key] if key in step_context else sentinel
+                for key in injected_context.keys()
+            }
+            step_context.update(injected_context)
+
+            def _drain_step_events() -> List[dict]:
+                items: List[dict] = []
+                while True:
+                    try:
+                        payload = step_event_queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if isinstance(payload, dict) and payload:
+                        items.append(payload)
+                return items
+
+            if speculation_enabled and pending_prefetch is None:
+                pending_prefetch = _maybe_start_speculative_prefetch(
+                    task_id=int(task_id),
+                    run_id=int(run_id),
+                    idx=int(idx),
+                    current_title=title,
+                    current_action_type=str(action_type or ""),
+                    current_payload=payload_obj if isinstance(payload_obj, dict) else None,
+                    message=message,
+                    workdir=workdir,
+                    model=model,
+                    react_params=react_params,
+                    plan_struct=plan_struct,
+                    tools_hint=tools_hint,
+                    skills_hint=skills_hint,
+                    memories_hint=memories_hint,
+                    graph_hint=graph_hint,
+                    agent_state=agent_state,
+                    context=context,
+                    observations=observations,
+                    variables_source=variables_source,
+                    llm_call=llm_call,
+                    step_llm_config_resolver=step_llm_config_resolver,
+                    llm_call_async=llm_call_async,
+                )
 
-        # 执行步骤
-        detail = json.dumps({"type": action_type, "payload": payload_obj}, ensure_ascii=False)
-        step_created_at = now_iso()
-        try:
-            step_id, _created, _updated = create_task_step(
-                TaskStepCreateParams(
+            try:
+                result, step_error = yield from run_blocking_call_with_progress(
+                    func=lambda: execute_step_action(int(task_id), int(run_id), step_row, context=step_context),
+                    async_func=(
+                        (lambda: execute_step_action_async(int(task_id), int(run_id), step_row, context=step_context))
+                        if execute_step_action_async is not None
+                        else None
+                    ),
+                    start_payload=build_step_progress_payload(
+                        task_id=int(task_id),
+                        run_id=int(run_id),
+                        step_order=int(step_order),
+                        title=str(title or ""),
+                        phase="action_execution",
+                        status="start",
+                        action_type=str(action_type or ""),
+                        message=f"正在执行 {str(action_type or '') or 'step'}",
+                    ),
+                    progress_payload_builder=lambda elapsed_ms, tick: build_step_progress_payload(
+                        task_id=int(task_id),
+                        run_id=int(run_id),
+                        step_order=int(step_order),
+                        title=str(title or ""),
+                        phase="action_execution",
+                        status="running",
+                        action_type=str(action_type or ""),
+                        message=f"{str(action_type or '') or 'step'} 执行中",
+                        elapsed_ms=elapsed_ms,
+                        tick=tick,
+                    ),
+                    drain_events=_drain_step_events,
+                )
+            finally:
+                for key, previous in previous_context_values.items():
+                    if previous is sentinel:
+                        step_context.pop(key, None)
+                    else:
+                        step_context[key] = previous
+            finished_at = now_iso()
+
+            if _is_run_stopped(run_id=int(run_id)):
+                _safe_write_debug(
                     task_id=int(task_id),
                     run_id=int(run_id),
-                    title=title,
-                    status=STEP_STATUS_RUNNING,
-                    executor=executor_value,
-                    detail=detail,
-                    result=None,
-                    error=None,
-                    attempts=1,
-                    started_at=step_created_at,
-                    finished_at=None,
+                    message="agent.react.run_stopped_after_step_execution",
+                    data={"step_order": int(step_order), "step_id": int(step_id)},
+                    level="warning",
+                )
+                run_status = RUN_STATUS_STOPPED
+                break
+
+            # 处理步骤失败
+            if step_error:
+                if pending_prefetch is not None:
+                    discard_speculative_prefetch(pending_prefetch, agent_state=agent_state, reason="step_failed")
+                    pending_prefetch = None
+                status, next_idx = yield from handle_step_failure(
+                    task_id=task_id,
+                    run_id=run_id,
+                    step_id=step_id,
                     step_order=step_order,
-                    created_at=step_created_at,
-                    updated_at=step_created_at,
+                    idx=idx,
+                    title=title,
+                    message=message,
+                    workdir=workdir,
+                    model=step_model,
+                    react_params=step_react_params,
+                    tools_hint=tools_hint,
+                    skills_hint=skills_hint,
+                    memories_hint=memories_hint,
+                    graph_hint=graph_hint,
+                    action_type=action_type,
+                    step_detail=detail,
+                    step_error=step_error,
+                    plan_struct=plan_struct,
+                    agent_state=agent_state,
+                    context=context,
+                    observations=observations,
+                    max_steps_limit=max_steps_limit,
+                    run_replan_and_merge=run_replan_and_merge,
+                    safe_write_debug=_safe_write_debug,
+                    mark_task_step_failed=mark_task_step_failed,
+                    finished_at=finished_at,
+                )
+                yield sse_json(
+                    update_progress_state(
+                        agent_state=agent_state,
+                        plan_struct=plan_struct,
+                        context=context,
+                        reason="step_failed",
+                        step_order=step_order,
+                    )
                 )
+                if status:
+                    run_status = status
+                    break
+                if next_idx is not None:
+                    idx = next_idx
+                    continue
+                idx += 1
+                continue
+
+            # 步骤成功
+            result_value = None
+            if result is not None:
+                try:
+                    result_value = json.dumps(result, ensure_ascii=False)
+                except Exception:
+                    result_value = json.dumps({"text": str(result)}, ensure_ascii=False)
+
+            mark_task_step_done(
+                step_id=int(step_id),
+                result=result_value,
+                finished_at=finished_at,
             )
-        except Exception as create_step_exc:
-            _safe_write_debug(
-                task_id=int(task_id),
-                run_id=int(run_id),
-                message="agent.react.create_task_step_failed",
-                data={"step_order": int(step_order), "error": str(create_step_exc)},
-                level="error",
+
+            # 成功后清空失败连击：失败预算应表达“连续失败”，不应跨成功步骤累积。
+            clear_failure_streak(agent_state)
+
+            yield sse_json({"delta": f"{STREAM_TAG_OK} {title}\n"})
+
+            # 构建观测
+            obs_line, visible_content = build_observation_line(
+                action_type=action_type,
+                title=title,
+                result=result,
+                context=context,
             )
-            run_status = RUN_STATUS_FAILED
-            break
-
-        step_row = {"id": step_id, "title": title, "detail": detail}
-        step_event_queue: "queue.Queue[dict]" = queue.Queue()
-        step_context = context if isinstance(context, dict) else {}
-        injected_context = {
-            "event_sink": lambda payload: step_event_queue.put(dict(payload or {})),
-            "task_id": int(task_id),
-            "run_id": int(run_id),
-            "step_id": int(step_id),
-            "step_order": int(step_order),
-            "step_title": str(title or ""),
-            "model": str(step_model or model or ""),
-        }
-        sentinel = object()
-        previous_context_values = {
-            key: step_context[key] if key in step_context else sentinel
-            for key in injected_context.keys()
-        }
-        step_context.update(injected_context)
-
-        def _drain_step_events() -> List[dict]:
-            items: List[dict] = []
-            while True:
-                try:
-                    payload = step_event_queue.get_nowait()
-                except queue.Empty:
-                    break
-                if isinstance(payload, dict) and payload:
-                    items.append(payload)
-            return items
+            observations.append(obs_line)
 
-        try:
-            result, step_error = yield from run_blocking_call_with_progress(
-                func=lambda: execute_step_action(int(task_id), int(run_id), step_row, context=step_context),
-                start_payload=build_step_progress_payload(
-                    task_id=int(task_id),
-                    run_id=int(run_id),
-                    step_order=int(step_order),
-                    title=str(title or ""),
-                    phase="action_execution",
-                    status="start",
-                    action_type=str(action_type or ""),
-                    message=f"正在执行 {str(action_type or '') or 'step'}",
-                ),
-                progress_payload_builder=lambda elapsed_ms, tick: build_step_progress_payload(
-                    task_id=int(task_id),
-                    run_id=int(run_id),
-                    step_order=int(step_order),
-                    title=str(title or ""),
-                    phase="action_execution",
-                    status="running",
-                    action_type=str(action_type or ""),
-                    message=f"{str(action_type or '') or 'step'} 执行中",
-                    elapsed_ms=elapsed_ms,
-                    tick=tick,
+            feedback = build_step_feedback(
+                message=message,
+                step_order=int(step_order),
+                title=str(title or ""),
+                action_type=str(action_type or ""),
+                status="success",
+                result=result if isinstance(result, dict) else None,
+                visible_content=str(visible_content or ""),
+                context=context,
+                strategy_fingerprint=str(agent_state.get("strategy_fingerprint") or ""),
+                attempt_index=int(coerce_int(agent_state.get("attempt_index"), default=0)),
+                previous_goal_progress_score=coerce_int(
+                    ((agent_state.get("goal_progress") if isinstance(agent_state.get("goal_progress"), dict) else {}) or {}).get("score"),
+                    default=0,
                 ),
-                drain_events=_drain_step_events,
             )
-        finally:
-            for key, previous in previous_context_values.items():
-                if previous is sentinel:
-                    step_context.pop(key, None)
-                else:
-                    step_context[key] = previous
-        finished_at = now_iso()
+            register_step_feedback(agent_state, feedback)
 
-        if _is_run_stopped(run_id=int(run_id)):
-            _safe_write_debug(
+            warning_payload = build_step_warning_payload(
                 task_id=int(task_id),
                 run_id=int(run_id),
-                message="agent.react.run_stopped_after_step_execution",
-                data={"step_order": int(step_order), "step_id": int(step_id)},
-                level="warning",
+                step_id=int(step_id),
+                step_order=int(step_order),
+                title=str(title or ""),
+                action_type=str(action_type or ""),
+                result=result if isinstance(result, dict) else None,
             )
-            run_status = RUN_STATUS_STOPPED
-            break
+            if warning_payload:
+                yield sse_json(warning_payload)
 
-        # 处理步骤失败
-        if step_error:
-            status, next_idx = yield from handle_step_failure(
-                task_id=task_id,
+            # 特殊输出处理
+            if visible_content:
+                yield yield_visible_result(visible_content)
+
+            if action_type == ACTION_TYPE_MEMORY_WRITE and isinstance(result, dict):
+                yield yield_memory_write_event(task_id=task_id, run_id=run_id, result=result)
+
+            # 结算计划栏状态：步骤成功 -> done
+            plan_struct.set_step_status(idx, "done")
+            yield sse_plan_delta(task_id=task_id, run_id=run_id, plan_items=plan_struct.get_items_payload(), indices=[idx])
+
+            # 持久化状态
+            persist_loop_state(
                 run_id=run_id,
-                step_id=step_id,
-                step_order=step_order,
-                idx=idx,
-                title=title,
-                message=message,
-                workdir=workdir,
-                model=step_model,
-                react_params=step_react_params,
-                tools_hint=tools_hint,
-                skills_hint=skills_hint,
-                memories_hint=memories_hint,
-                graph_hint=graph_hint,
-                action_type=action_type,
-                step_detail=detail,
-                step_error=step_error,
                 plan_struct=plan_struct,
                 agent_state=agent_state,
-                context=context,
+                step_order=step_order + 1,
                 observations=observations,
-                max_steps_limit=max_steps_limit,
-                run_replan_and_merge=run_replan_and_merge,
+                context=context,
                 safe_write_debug=_safe_write_debug,
-                mark_task_step_failed=mark_task_step_failed,
-                finished_at=finished_at,
+                task_id=task_id,
+                where="after_step",
+                # 步骤结算必须落盘：避免节流吞掉 done/failed 状态，影响可恢复性。
+                force=True,
             )
+
             yield sse_json(
                 update_progress_state(
                     agent_state=agent_state,
                     plan_struct=plan_struct,
                     context=context,
-                    reason="step_failed",
+                    reason="step_done",
                     step_order=step_order,
                 )
             )
-            if status:
-                run_status = status
-                break
-            if next_idx is not None:
-                idx = next_idx
-                continue
-            idx += 1
-            continue
 
-        # 步骤成功
-        result_value = None
-        if result is not None:
-            try:
-                result_value = json.dumps(result, ensure_ascii=False)
-            except Exception:
-                result_value = json.dumps({"text": str(result)}, ensure_ascii=False)
-
-        mark_task_step_done(
-            step_id=int(step_id),
-            result=result_value,
-            finished_at=finished_at,
-        )
-
-        # 成功后清空失败连击：失败预算应表达“连续失败”，不应跨成功步骤累积。
-        clear_failure_streak(agent_state)
-
-        yield sse_json({"delta": f"{STREAM_TAG_OK} {title}\n"})
-
-        # 构建观测
-        obs_line, visible_content = build_observation_line(
-            action_type=action_type,
-            title=title,
-            result=result,
-            context=context,
-        )
-        observations.append(obs_line)
-
-        feedback = build_step_feedback(
-            message=message,
-            step_order=int(step_order),
-            title=str(title or ""),
-            action_type=str(action_type or ""),
-            status="success",
-            result=result if isinstance(result, dict) else None,
-            visible_content=str(visible_content or ""),
-            context=context,
-            strategy_fingerprint=str(agent_state.get("strategy_fingerprint") or ""),
-            attempt_index=int(coerce_int(agent_state.get("attempt_index"), default=0)),
-            previous_goal_progress_score=coerce_int(
-                ((agent_state.get("goal_progress") if isinstance(agent_state.get("goal_progress"), dict) else {}) or {}).get("score"),
-                default=0,
-            ),
-        )
-        register_step_feedback(agent_state, feedback)
+            idx += 1
+        loop_exited = True
+    finally:
+        # 提前退出（waiting/stopped/failed、异常、客户端断开导致生成器被关闭）也要取消并记入统计
+        if pending_prefetch is not None:
+            discard_speculative_prefetch(
+                pending_prefetch,
+                agent_state=agent_state,
+                reason=_speculation_exit_reason(run_status) if loop_exited else "run_aborted",
+            )
+            pending_prefetch = None
 
-        warning_payload = build_step_warning_payload(
+    if speculation_enabled and isinstance(agent_state, dict) and agent_state.get("speculation_stats"):
+        _safe_write_debug(
             task_id=int(task_id),
             run_id=int(run_id),
-            step_id=int(step_id),
-            step_order=int(step_order),
-            title=str(title or ""),
-            action_type=str(action_type or ""),
-            result=result if isinstance(result, dict) else None,
-        )
-        if warning_payload:
-            yield sse_json(warning_payload)
-
-        # 特殊输出处理
-        if visible_content:
-            yield yield_visible_result(visible_content)
-
-        if action_type == ACTION_TYPE_MEMORY_WRITE and isinstance(result, dict):
-            yield yield_memory_write_event(task_id=task_id, run_id=run_id, result=result)
-
-        # 结算计划栏状态：步骤成功 -> done
-        plan_struct.set_step_status(idx, "done")
-        yield sse_plan_delta(task_id=task_id, run_id=run_id, plan_items=plan_struct.get_items_payload(), indices=[idx])
-
-        # 持久化状态
-        persist_loop_state(
-            run_id=run_id,
-            plan_struct=plan_struct,
-            agent_state=agent_state,
-            step_order=step_order + 1,
-            observations=observations,
-            context=context,
-            safe_write_debug=_safe_write_debug,
-            task_id=task_id,
-            where="after_step",
-            # 步骤结算必须落盘：避免节流吞掉 done/failed 状态，影响可恢复性。
-            force=True,
-        )
-
-        yield sse_json(
-            update_progress_state(
-                agent_state=agent_state,
-                plan_struct=plan_struct,
-                context=context,
-                reason="step_done",
-                step_order=step_order,
-            )
+            message="agent.react.speculation.summary",
+            data=dict(agent_state.get("speculation_stats") or {}),
+            level="info",
         )
 
-        idx += 1
-
     return ReactLoopResult(run_status=run_status, last_step_order=last_step_order, plan_struct=plan_struct)
@@ -0,0 +1,337 @@
+# -*- coding: utf-8 -*-
+"""
+ReAct 投机预取：当前步骤执行期间，提前为下一步生成 action 文本。
+
+说明：
+- 只在当前动作的“成功观测”可由 payload 逐字预测时发起（写文件/追加/删除：观测只是路径与字节数等确认信息），
+  预取 prompt 使用该预测观测行；
+- 真实观测与预测不一致（如写入带告警、删除目标不存在）时丢弃预取，避免下一步基于未发生的观测决策；
+- 计划被 patch/replan、当前步骤失败、下一步换了模型、重试要求变化等情况一律丢弃，回退正常生成；
+- 丢弃（含 run 进入 waiting/stopped/failed、生成器被关闭等提前退出）都经 discard_speculative_prefetch 取消后台生成：
+  后台线程绑定 LLMCancelScope，尚未发出的 LLM 调用直接跳过，在途调用被放弃（归还并发槽位、关闭连接）；
+- 循环由协程驱动（pump_coroutine_generator）时预取改为 event loop 上的 task（不起线程），取消即 cancel 该 task；
+- 统计写入 agent_state["speculation_stats"]：started/accepted/discarded/cancelled_in_flight/latency_saved_ms/discard_reasons。
+"""
+
+import asyncio
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Generator, Optional, Tuple
+
+from backend.src.actions.handlers.file_action_common import normalize_encoding, resolve_action_target_path
+from backend.src.agent.runner.react_helpers import validate_and_normalize_action_text
+from backend.src.agent.runner.react_step_executor import build_observation_line, run_blocking_call_with_progress
+from backend.src.common.async_bridge import coroutine_driver_active
+from backend.src.constants import (
+    ACTION_TYPE_FILE_APPEND,
+    ACTION_TYPE_FILE_DELETE,
+    ACTION_TYPE_FILE_WRITE,
+    ACTION_TYPE_TASK_OUTPUT,
+    ACTION_TYPE_USER_PROMPT,
+)
+from backend.src.services.llm.llm_client import LLMCancelScope, bind_llm_cancel_scope, reset_llm_cancel_scope
+
+# 成功观测可预测的动作类型：下一步 prompt 中只会多出一行“已写入/已删除”的确认信息，且可由 payload 推出。
+SPECULATION_PREDICTABLE_ACTION_TYPES = frozenset(
+    {
+        ACTION_TYPE_FILE_WRITE,
+        ACTION_TYPE_FILE_APPEND,
+        ACTION_TYPE_FILE_DELETE,
+    }
+)
+
+# 下一步允许这些动作时不做预取：task_output 需要汇总真实观测，user_prompt 需要等待用户。
+SPECULATION_BLOCKING_NEXT_ACTION_TYPES = frozenset({ACTION_TYPE_TASK_OUTPUT, ACTION_TYPE_USER_PROMPT})
+
+
+@dataclass
+class SpeculativePrefetch:
+    """一次进行中的预取（后台线程或 event loop task + 结果盒）。"""
+
+    step_order: int
+    key: Tuple[Any, ...]
+    started_at: float
+    predicted_observation: Optional[str] = None
+    done: threading.Event = field(default_factory=threading.Event)
+    cancelled: threading.Event = field(default_factory=threading.Event)
+    scope: LLMCancelScope = field(default_factory=LLMCancelScope)
+    box: Dict[str, Any] = field(default_factory=dict)
+    task: Optional["asyncio.Task[None]"] = None
+
+    def cancel(self) -> bool:
+        """请求取消（放弃在途 LLM 调用）；返回取消时后台生成是否仍在进行。"""
+        self.cancelled.set()
+        in_flight = not self.done.is_set()
+        self.scope.cancel()
+        return in_flight
+
+    def wait(self) -> Tuple[Optional[str], Optional[str]]:
+        """阻塞等待预取完成，返回 (action_text, error)。"""
+        self.done.wait()
+        if self.box.get("error") is not None:
+            return None, str(self.box.get("error") or "speculation_failed")
+        result = self.box.get("result")
+        if isinstance(result, tuple) and len(result) >= 2:
+            return result[0], result[1]
+        return None, "speculation_failed"
+
+    async def wait_async(self) -> Tuple[Optional[str], Optional[str]]:
+        """wait 的 asyncio 版本（预取以 task 运行时使用）。"""
+        if self.task is not None:
+            await asyncio.wait({self.task})
+        return self.wait()
+
+    @property
+    def elapsed_ms(self) -> int:
+        """预取本身的生成耗时（完成前为已运行时长）。"""
+        finished_at = self.box.get("finished_at")
+        end = float(finished_at) if finished_at is not None else time.monotonic()
+        return int(max(0.0, (end - float(self.started_at)) * 1000))
+
+
+def build_speculation_key(
+    *,
+    step_order: int,
+    title: str,
+    allowed_text: str,
+    plan_titles_json: str,
+    model: str,
+    retry_guidance: str,
+) -> Tuple[Any, ...]:
+    """
+    预取结果可复用的前提：步骤序号/标题/allow/整体计划/模型，以及注入 prompt 的重试要求与失败指引
+    都与真正生成时一致（当前步骤若触发“必须换策略”，下一步 prompt 会变化，预取即失效）。
+    """
+    return (
+        int(step_order),
+        str(title or ""),
+        str(allowed_text or ""),
+        str(plan_titles_json or ""),
+        str(model or ""),
+        str(retry_guidance or ""),
+    )
+
+
+def predict_success_observation(*, action_type: str, title: str, payload: Optional[dict]) -> Optional[str]:
+    """
+    按 payload 推出当前动作成功时的观测行（与 build_observation_line 的输出逐字一致）；无法预测时返回 None。
+    """
+    if str(action_type or "") not in SPECULATION_PREDICTABLE_ACTION_TYPES or not isinstance(payload, dict):
+        return None
+    path = str(payload.get("path") or "").strip()
+    if not path:
+        return None
+    target_path = resolve_action_target_path(path)
+    if action_type == ACTION_TYPE_FILE_DELETE:
+        result: Dict[str, Any] = {"path": target_path, "deleted": True}
+    else:
+        content = payload.get("content")
+        if content is None:
+            content = ""
+        if not isinstance(content, str):
+            return None
+        encoding = normalize_encoding(payload.get("encoding"))
+        try:
+            size = len(content.encode(encoding, errors="ignore"))
+        except Exception:
+            size = len(content.encode("utf-8", errors="ignore"))
+        result = {"path": target_path, "bytes": size}
+    obs_line, _visible = build_observation_line(action_type=action_type, title=title, result=result, context={})
+    return obs_line
+
+
+def speculation_skip_reason(
+    *,
+    current_action_type: str,
+    next_allowed: Optional[list],
+    next_is_feedback: bool,
+    next_has_direct_user_prompt: bool,
+) -> Optional[str]:
+    """判断下一步是否适合预取；不适合时返回原因（仅用于统计/调试）。"""
+    if str(current_action_type or "") not in SPECULATION_PREDICTABLE_ACTION_TYPES:
+        return "unpredictable_observation"
+    if next_is_feedback:
+        return "next_is_feedback"
+    if next_has_direct_user_prompt:
+        return "next_is_direct_user_prompt"
+    allowed = {str(item or "").strip() for item in (next_allowed or [])}
+    if not allowed or allowed & SPECULATION_BLOCKING_NEXT_ACTION_TYPES:
+        return "next_depends_on_observation"
+    return None
+
+
+def start_speculative_prefetch(
+    *,
+    step_order: int,
+    key: Tuple[Any, ...],
+    generate: Callable[[], Tuple[Optional[str], Optional[str]]],
+    generate_async: Optional[Callable[[], Awaitable[Tuple[Optional[str], Optional[str]]]]] = None,
+    predicted_observation: Optional[str] = None,
+) -> SpeculativePrefetch:
+    """
+    在后台线程中执行 generate()（其中的 LLM 调用归属 prefetch.scope），立即返回句柄。
+
+    协程驱动且提供 generate_async 时改为在当前 event loop 上建 task 执行，scope 取消即 cancel 该 task。
+    """
+    prefetch = SpeculativePrefetch(
+        step_order=int(step_order),
+        key=key,
+        started_at=time.monotonic(),
+        predicted_observation=predicted_observation,
+    )
+
+    if generate_async is not None and coroutine_driver_active():
+
+        async def _run() -> None:
+            try:
+                result = await generate_async()
+                if not prefetch.cancelled.is_set():
+                    prefetch.box["result"] = result
+            except BaseException as exc:  # noqa: BLE001
+                # 含 CancelledError：task 由本模块独占，取消后收敛为 error 结果
+                prefetch.box["error"] = exc
+            finally:
+                prefetch.box["finished_at"] = time.monotonic()
+                prefetch.done.set()
+
+        prefetch.task = asyncio.get_running_loop().create_task(_run())
+        prefetch.scope.add(prefetch.task.cancel)
+        return prefetch
+
+    def _worker() -> None:
+        token = bind_llm_cancel_scope(prefetch.scope)
+        try:
+            if not prefetch.cancelled.is_set():
+                result = generate()
+                if not prefetch.cancelled.is_set():
+                    prefetch.box["result"] = result
+        except BaseException as exc:  # noqa: BLE001
+            prefetch.box["error"] = exc
+        finally:
+            reset_llm_cancel_scope(token)
+            prefetch.box["finished_at"] = time.monotonic()
+            prefetch.done.set()
+
+    threading.Thread(target=_worker, daemon=True).start()
+    return prefetch
+
+
+def _ensure_speculation_stats(agent_state: Optional[Dict]) -> Optional[Dict]:
+    if not isinstance(agent_state, dict):
+        return None
+    stats = agent_state.get("speculation_stats")
+    if not isinstance(stats, dict):
+        stats = {}
+        agent_state["speculation_stats"] = stats
+    for key in ("started", "accepted", "discarded", "cancelled_in_flight", "latency_saved_ms"):
+        stats.setdefault(key, 0)
+    if not isinstance(stats.get("discard_reasons"), dict):
+        stats["discard_reasons"] = {}
+    return stats
+
+
+def _refresh_accept_rate(stats: Dict) -> None:
+    settled = int(stats.get("accepted") or 0) + int(stats.get("discarded") or 0)
+    stats["accept_rate"] = round(float(stats.get("accepted") or 0) / settled, 4) if settled > 0 else None
+
+
+def record_speculation_started(agent_state: Optional[Dict]) -> None:
+    stats = _ensure_speculation_stats(agent_state)
+    if stats is not None:
+        stats["started"] = int(stats["started"]) + 1
+
+
+def record_speculation_accepted(agent_state: Optional[Dict], *, latency_saved_ms: int) -> None:
+    stats = _ensure_speculation_stats(agent_state)
+    if stats is None:
+        return
+    stats["accepted"] = int(stats["accepted"]) + 1
+    stats["latency_saved_ms"] = int(stats["latency_saved_ms"]) + max(0, int(latency_saved_ms))
+    _refresh_accept_rate(stats)
+
+
+def record_speculation_discarded(agent_state: Optional[Dict], *, reason: str, in_flight: bool = False) -> None:
+    stats = _ensure_speculation_stats(agent_state)
+    if stats is None:
+        return
+    stats["discarded"] = int(stats["discarded"]) + 1
+    if in_flight:
+        stats["cancelled_in_flight"] = int(stats["cancelled_in_flight"]) + 1
+    reasons = stats["discard_reasons"]
+    reason_key = str(reason or "unknown")
+    reasons[reason_key] = int(reasons.get(reason_key) or 0) + 1
+    _refresh_accept_rate(stats)
+
+
+def discard_speculative_prefetch(prefetch: SpeculativePrefetch, *, agent_state: Optional[Dict], reason: str) -> None:
+    """取消后台生成并记入 discard 统计（仍在生成中的另计 cancelled_in_flight）。"""
+    record_speculation_discarded(agent_state, reason=reason, in_flight=prefetch.cancel())
+
+
+def consume_speculative_prefetch(
+    *,
+    prefetch: SpeculativePrefetch,
+    key: Tuple[Any, ...],
+    actual_observation: Optional[str],
+    retry_strategy_changed: bool,
+    agent_state: Optional[Dict],
+    step_title: str,
+    workdir: str,
+    start_payload: Optional[dict],
+    progress_payload_builder: Optional[Callable[[int, int], Optional[dict]]],
+    stats_sink: Optional[dict] = None,
+) -> Generator[str, None, Optional[Tuple[dict, str, dict, None, str]]]:
+    """
+    尝试复用预取结果：key 一致且真实观测与预测一致时等待预取完成，再按当前（真实观测之后的）状态校验。
+
+    返回与 generate_action_with_retry 相同形态的五元组；无法复用时返回 None（已记入 discard 统计）。
+    """
+    if prefetch.key != key:
+        discard_speculative_prefetch(prefetch, agent_state=agent_state, reason="context_changed")
+        return None
+    if prefetch.predicted_observation is None or actual_observation != prefetch.predicted_observation:
+        discard_speculative_prefetch(prefetch, agent_state=agent_state, reason="observation_mismatch")
+        return None
+    if retry_strategy_changed:
+        discard_speculative_prefetch(prefetch, agent_state=agent_state, reason="retry_strategy_changed")
+        return None
+
+    wait_started_at = time.monotonic()
+    if prefetch.done.is_set():
+        action_text, action_error = prefetch.wait()
+    else:
+        action_text, action_error = yield from run_blocking_call_with_progress(
+            func=prefetch.wait,
+            async_func=prefetch.wait_async if prefetch.task is not None else None,
+            start_payload=start_payload,
+            progress_payload_builder=progress_payload_builder,
+        )
+    wait_ms = int(max(0.0, (time.monotonic() - wait_started_at) * 1000))
+
+    if action_error or not action_text:
+        record_speculation_discarded(agent_state, reason="llm_error")
+        return None
+    action_obj, action_type, payload_obj, validate_error = validate_and_normalize_action_text(
+        action_text=action_text,
+        step_title=step_title,
+        workdir=workdir,
+    )
+    if validate_error or not action_obj or not action_type:
+        record_speculation_discarded(agent_state, reason="invalid_action")
+        return None
+
+    generation_ms = int(prefetch.elapsed_ms)
+    latency_saved_ms = max(0, generation_ms - wait_ms)
+    record_speculation_accepted(agent_state, latency_saved_ms=latency_saved_ms)
+    if stats_sink is not None:
+        stats_sink.clear()
+        stats_sink.update(
+            {
+                "speculative": True,
+                "time_to_action_ms": int(wait_ms),
+                "total_ms": int(generation_ms),
+                "latency_saved_ms": int(latency_saved_ms),
+            }
+        )
+    return action_obj, action_type, payload_obj or {}, None, action_text
@@ -11,7 +11,7 @@ import os
 import re
 import time
 import threading
-from typing import Any, Callable, Dict, Generator, List, Optional, Tuple, TypeVar
+from typing import Any, Awaitable, Callable, Dict, Generator, List, Optional, Tuple, TypeVar
 
 from backend.src.agent.contracts.stream_events import (
     build_need_input_payload,
@@ -20,6 +20,9 @@ from backend.src.agent.contracts.stream_events import (
 from backend.src.agent.support import _truncate_observation
 from backend.src.agent.runner.react_helpers import (
     call_llm_for_text,
+    call_llm_for_text_async,
+    call_llm_streaming_for_text,
+    iter_call_llm_for_text,
     needs_nonempty_task_output_content,
     validate_and_normalize_action_text,
 )
@@ -27,6 +30,8 @@ from backend.src.agent.runner.need_input_choices import resolve_need_input_choic
 from backend.src.agent.core.plan_structure import PlanStructure
 from backend.src.agent.runner.plan_events import sse_plan_delta
 from backend.src.agent.runner.react_state_manager import resolve_executor
+from backend.src.common.async_bridge import AWAIT_PENDING, AwaitRequest, coroutine_driver_active
+from backend.src.common.json_stream import IncrementalJsonObjectScanner
 from backend.src.common.utils import coerce_int, now_iso
 from backend.src.constants import (
     ACTION_TYPE_FILE_WRITE,
@@ -177,25 +182,26 @@ def build_step_progress_payload(
 def run_blocking_call_with_progress(
     *,
     func: Callable[[], T],
+    async_func: Optional[Callable[[], Awaitable[T]]] = None,
     start_payload: Optional[dict] = None,
     progress_payload_builder: Optional[Callable[[int, int], Optional[dict]]] = None,
     interval_seconds: Optional[float] = None,
     drain_events: Optional[Callable[[], List[dict]]] = None,
-) -> Generator[str, None, T]:
-    """在线程中执行阻塞调用，并周期性发出 step_progress 与子线程业务事件。"""
+) -> Generator[Any, Any, T]:
+    """
+    在线程中执行阻塞调用，并周期性发出 step_progress 与子线程业务事件。
+
+    由协程驱动（pump_coroutine_generator）且提供 async_func 时不起线程：
+    yield AwaitRequest 让驱动器在 event loop 上 await async_func()，等待期间照常发进度/业务事件。
+    """
     if isinstance(start_payload, dict) and start_payload:
         yield sse_json(start_payload)
 
-    box: Dict[str, Any] = {}
-    done = threading.Event()
-
-    def _worker() -> None:
-        try:
-            box["result"] = func()
-        except BaseException as exc:  # noqa: BLE001
-            box["error"] = exc
-        finally:
-            done.set()
+    interval = float(interval_seconds or REACT_BLOCKING_PROGRESS_INTERVAL_SECONDS or 0)
+    interval = interval if interval > 0 else float(REACT_BLOCKING_PROGRESS_INTERVAL_SECONDS)
+    tick = 0
+    started_at = time.monotonic()
+    next_emit_at = started_at + interval
 
     def _yield_drained_events() -> Generator[str, None, None]:
         if not callable(drain_events):
@@ -208,28 +214,47 @@ def run_blocking_call_with_progress(
             if isinstance(payload, dict) and payload:
                 yield sse_json(payload)
 
-    worker = threading.Thread(target=_worker, daemon=True)
-    worker.start()
-
-    interval = float(interval_seconds or REACT_BLOCKING_PROGRESS_INTERVAL_SECONDS or 0)
-    interval = interval if interval > 0 else float(REACT_BLOCKING_PROGRESS_INTERVAL_SECONDS)
-    tick = 0
-    started_at = time.monotonic()
-    next_emit_at = started_at + interval
-
-    while not done.wait(timeout=min(0.25, interval)):
+    def _yield_progress() -> Generator[str, None, None]:
+        nonlocal tick, next_emit_at
         yield from _yield_drained_events()
         if not callable(progress_payload_builder):
-            continue
+            return
         now_value = time.monotonic()
         if now_value < next_emit_at:
-            continue
+            return
         tick += 1
         payload = progress_payload_builder(int(max(0.0, (now_value - started_at) * 1000)), tick)
         if isinstance(payload, dict) and payload:
             yield sse_json(payload)
         next_emit_at = now_value + interval
 
+    if async_func is not None and coroutine_driver_active():
+        request = AwaitRequest(async_func, poll_seconds=min(0.25, interval))
+        while True:
+            outcome = yield request
+            if outcome is not AWAIT_PENDING:
+                break
+            yield from _yield_progress()
+        yield from _yield_drained_events()
+        return outcome
+
+    box: Dict[str, Any] = {}
+    done = threading.Event()
+
+    def _worker() -> None:
+        try:
+            box["result"] = func()
+        except BaseException as exc:  # noqa: BLE001
+            box["error"] = exc
+        finally:
+            done.set()
+
+    worker = threading.Thread(target=_worker, daemon=True)
+    worker.start()
+
+    while not done.wait(timeout=min(0.25, interval)):
+        yield from _yield_progress()
+
     yield from _yield_drained_events()
     error = box.get("error")
     if error is not None:
@@ -573,6 +598,77 @@ def _build_file_write_timeout_fallback_action(
     return normalized_obj, normalized_type, normalized_payload or {}, None
 
 
+def _stream_action_attempt(
+    *,
+    llm_stream_call: Callable[[dict, Callable[[str], bool]], dict],
+    prompt_text: str,
+    task_id: int,
+    run_id: int,
+    model: str,
+    attempt_params: dict,
+    variables: dict,
+    hard_timeout_seconds: int,
+    step_title: str,
+    workdir: str,
+) -> Tuple[Optional[str], Optional[str], Optional[Tuple[dict, str, dict]], dict]:
+    """
+    流式生成一次 Action：增量扫描顶层 JSON 对象，第一个通过校验的对象出现时立即中止生成。
+
+    返回：(action_text, action_error, parsed, stats)
+    - parsed：提前解析成功时为 (action_obj, action_type, payload_obj)，否则 None（由调用方按全文校验）；
+    - stats：time_to_action_ms / total_ms / stopped_early / streamed_chars / tokens_saved_est 等。
+    """
+    scanner = IncrementalJsonObjectScanner()
+    found: dict = {}
+    started_at = time.monotonic()
+
+    def _on_text(chunk: str) -> bool:
+        for candidate in scanner.feed(chunk):
+            obj, a_type, payload, err = validate_and_normalize_action_text(
+                action_text=candidate,
+                step_title=step_title,
+                workdir=workdir,
+            )
+            if not err and obj and a_type:
+                found["parsed"] = (obj, a_type, payload or {})
+                found["text"] = candidate
+                found["time_to_action_ms"] = int((time.monotonic() - started_at) * 1000)
+                return True
+        return False
+
+    action_text, action_error, stream_meta = call_llm_streaming_for_text(
+        llm_stream_call,
+        on_text=_on_text,
+        prompt=prompt_text,
+        task_id=int(task_id),
+        run_id=int(run_id),
+        model=model,
+        parameters=attempt_params,
+        variables=variables,
+        hard_timeout_seconds=int(hard_timeout_seconds),
+    )
+    total_ms = int((time.monotonic() - started_at) * 1000)
+    streamed_chars = int(scanner.consumed_chars)
+    stopped_early = bool(stream_meta.get("stopped_early")) if stream_meta else bool(found)
+    # tokens_saved_est 为上界估计：max_tokens 预算减去已接收内容的估算 token 数（约 4 字符/token）。
+    # 中止后模型实际还会输出多少无法得知，这里只用于观察“提前停止”是否在起作用。
+    max_tokens = coerce_int(attempt_params.get("max_tokens"), default=0)
+    streamed_tokens_est = (streamed_chars + 3) // 4
+    tokens_saved_est = max(0, int(max_tokens) - int(streamed_tokens_est)) if (stopped_early and max_tokens > 0) else 0
+    stats = {
+        "streaming": True,
+        "stopped_early": stopped_early,
+        "time_to_action_ms": found.get("time_to_action_ms"),
+        "first_chunk_ms": stream_meta.get("first_chunk_ms") if stream_meta else None,
+        "total_ms": total_ms,
+        "streamed_chars": streamed_chars,
+        "tokens_saved_est": int(tokens_saved_est),
+    }
+    if found:
+        return str(found.get("text") or action_text or ""), None, found.get("parsed"), stats
+    return action_text, action_error, None, stats
+
+
 def generate_action_with_retry(
     *,
     llm_call: Callable[[dict], dict],
@@ -586,6 +682,8 @@ def generate_action_with_retry(
     react_params: dict,
     variables_source: str,
     allowed_actions_text: Optional[str] = None,
+    llm_stream_call: Optional[Callable[[dict, Callable[[str], bool]], dict]] = None,
+    stats_sink: Optional[dict] = None,
 ) -> Tuple[Optional[dict], Optional[str], Optional[dict], Optional[str], Optional[str]]:
     """
     生成 Action（支持自动重试）。
@@ -601,10 +699,97 @@ def generate_action_with_retry(
         model: 模型名称
         react_params: LLM 参数
         variables_source: 变量来源标识
+        llm_stream_call: 可选的流式 LLM 调用（payload, on_text）；提供时解析出完整合法 action 即停止生成，
+            流式调用失败则本次尝试回退到 llm_call
+        stats_sink: 可选，写入本次生成的耗时统计（time_to_action_ms/total_ms/tokens_saved_est 等）
 
     Returns:
         (action_obj, action_type, payload_obj, validate_error, last_action_text)
     """
+    steps = _generate_action_steps(
+        react_prompt=react_prompt,
+        task_id=task_id,
+        run_id=run_id,
+        step_order=step_order,
+        step_title=step_title,
+        workdir=workdir,
+        model=model,
+        react_params=react_params,
+        variables_source=variables_source,
+        allowed_actions_text=allowed_actions_text,
+        llm_stream_call=llm_stream_call,
+        stats_sink=stats_sink,
+    )
+    try:
+        request = next(steps)
+        while True:
+            request = steps.send(call_llm_for_text(llm_call, **request))
+    except StopIteration as exc:
+        return exc.value
+
+
+async def generate_action_with_retry_async(
+    *,
+    llm_call_async: Callable[[dict], Awaitable[dict]],
+    react_prompt: str,
+    task_id: int,
+    run_id: int,
+    step_order: int,
+    step_title: str,
+    workdir: str,
+    model: str,
+    react_params: dict,
+    variables_source: str,
+    allowed_actions_text: Optional[str] = None,
+    stats_sink: Optional[dict] = None,
+) -> Tuple[Optional[dict], Optional[str], Optional[dict], Optional[str], Optional[str]]:
+    """
+    generate_action_with_retry 的 asyncio 版本（重试/兜底逻辑共用 _generate_action_steps）。
+
+    说明：每次尝试直接 await llm_call_async（通常为 create_llm_call_async），调用方 task 被 cancel 即中止在途请求；
+    流式通道是同步回调接口，这里不使用。
+    """
+    steps = _generate_action_steps(
+        react_prompt=react_prompt,
+        task_id=task_id,
+        run_id=run_id,
+        step_order=step_order,
+        step_title=step_title,
+        workdir=workdir,
+        model=model,
+        react_params=react_params,
+        variables_source=variables_source,
+        allowed_actions_text=allowed_actions_text,
+        llm_stream_call=None,
+        stats_sink=stats_sink,
+    )
+    try:
+        request = next(steps)
+        while True:
+            request = steps.send(await call_llm_for_text_async(llm_call_async, **request))
+    except StopIteration as exc:
+        return exc.value
+
+
+def _generate_action_steps(
+    *,
+    react_prompt: str,
+    task_id: int,
+    run_id: int,
+    step_order: int,
+    step_title: str,
+    workdir: str,
+    model: str,
+    react_params: dict,
+    variables_source: str,
+    allowed_actions_text: Optional[str],
+    llm_stream_call: Optional[Callable[[dict, Callable[[str], bool]], dict]],
+    stats_sink: Optional[dict],
+) -> Generator[dict, Tuple[Optional[str], Optional[str]], Tuple[Optional[dict], Optional[str], Optional[dict], Optional[str], Optional[str]]]:
+    """
+    动作生成的重试/兜底主体（同步与 asyncio 版本共用）：
+    每次需要非流式 LLM 调用时 yield call_llm_for_text 的关键字参数，由调用方执行后 send 回 (text, error)。
+    """
     action_obj = None
     action_type = None
     payload_obj = None
@@ -655,23 +840,65 @@ def generate_action_with_retry(
             int(hard_timeout_seconds),
             bool(compact_prompt),
         )
-        action_text, action_error = call_llm_for_text(
-            llm_call,
-            prompt=prompt_text,
-            task_id=int(task_id),
-            run_id=int(run_id),
-            model=model,
-            parameters=attempt_params,
-            variables={
-                "source": variables_source if attempt == 0 else f"{variables_source}_retry{attempt}",
-                "step_order": int(step_order),
-                "attempt": int(attempt),
-            },
-            retry_max_attempts=int(REACT_LLM_INNER_RETRY_MAX_ATTEMPTS),
-            hard_timeout_seconds=int(hard_timeout_seconds),
-        )
+        attempt_variables = {
+            "source": variables_source if attempt == 0 else f"{variables_source}_retry{attempt}",
+            "step_order": int(step_order),
+            "attempt": int(attempt),
+        }
+        streamed_action = None
+        stream_stats: dict = {}
+        if llm_stream_call is not None:
+            action_text, action_error, streamed_action, stream_stats = _stream_action_attempt(
+                llm_stream_call=llm_stream_call,
+                prompt_text=prompt_text,
+                task_id=int(task_id),
+                run_id=int(run_id),
+                model=model,
+                attempt_params=attempt_params,
+                variables=attempt_variables,
+                hard_timeout_seconds=int(hard_timeout_seconds),
+                step_title=str(step_title or ""),
+                workdir=str(workdir or ""),
+            )
+            if action_error and not streamed_action:
+                # 流式通道失败（供应商不支持/连接中断）：本次尝试回退到非流式调用，不消耗重试次数。
+                logger.warning(
+                    "[agent.react.action_gen.stream_fallback] task_id=%s run_id=%s step_order=%s attempt=%s error=%s",
+                    int(task_id),
+                    int(run_id),
+                    int(step_order),
+                    int(attempt),
+                    str(action_error or ""),
+                )
+                stream_stats["fallback"] = True
+                action_text, action_error = None, None
+        if llm_stream_call is None or stream_stats.get("fallback"):
+            action_text, action_error = yield {
+                "prompt": prompt_text,
+                "task_id": int(task_id),
+                "run_id": int(run_id),
+                "model": model,
+                "parameters": attempt_params,
+                "variables": attempt_variables,
+                "retry_max_attempts": int(REACT_LLM_INNER_RETRY_MAX_ATTEMPTS),
+                "hard_timeout_seconds": int(hard_timeout_seconds),
+            }
         elapsed_ms = int(max(0.0, (time.monotonic() - call_started_at) * 1000))
         last_action_text = action_text
+        if stats_sink is not None:
+            stats_sink.clear()
+            stats_sink.update(
+                {
+                    "streaming": bool(stream_stats.get("streaming")),
+                    "stopped_early": bool(stream_stats.get("stopped_early")),
+                    "time_to_action_ms": stream_stats.get("time_to_action_ms") or int(elapsed_ms),
+                    "total_ms": int(elapsed_ms),
+                    "streamed_chars": int(stream_stats.get("streamed_chars") or 0),
+                    "tokens_saved_est": int(stream_stats.get("tokens_saved_est") or 0),
+                    "fallback": bool(stream_stats.get("fallback")),
+                    "attempt": int(attempt),
+                }
+            )
 
         if action_error or not action_text:
             action_validate_error = action_error or "empty_response"
@@ -722,11 +949,15 @@ def generate_action_with_retry(
                 int(elapsed_ms),
                 int(len(str(action_text or ""))),
             )
-            action_obj, action_type, payload_obj, action_validate_error = validate_and_normalize_action_text(
-                action_text=action_text,
-                step_title=step_title,
-                workdir=workdir,
-            )
+            if streamed_action is not None:
+                action_obj, action_type, payload_obj = streamed_action
+                action_validate_error = None
+            else:
+                action_obj, action_type, payload_obj, action_validate_error = validate_and_normalize_action_text(
+                    action_text=action_text,
+                    step_title=step_title,
+                    workdir=workdir,
+                )
 
         if not action_validate_error and action_obj:
             break
@@ -795,6 +1026,150 @@ def generate_action_with_retry(
     return action_obj, action_type, payload_obj, action_validate_error, last_action_text
 
 
+def generate_speculative_action_text(
+    *,
+    llm_call: Callable[[dict], dict],
+    react_prompt: str,
+    task_id: int,
+    run_id: int,
+    step_order: int,
+    step_title: str,
+    model: str,
+    react_params: dict,
+    variables_source: str,
+    allowed_actions_text: Optional[str] = None,
+) -> Tuple[Optional[str], Optional[str]]:
+    """
+    投机预取用的单次 Action 文本生成（不做校验、不重试）。
+
+    说明：
+    - 参数整形（max_tokens 上限、单次硬超时）与 generate_action_with_retry 的首次尝试一致；
+    - 校验推迟到真实观测返回后再做（文件系统状态此时才确定，例如 shell_command 引用的脚本是否已写出）。
+    """
+    return call_llm_for_text(
+        llm_call,
+        **_speculative_action_request(
+            react_prompt=react_prompt,
+            task_id=task_id,
+            run_id=run_id,
+            step_order=step_order,
+            step_title=step_title,
+            model=model,
+            react_params=react_params,
+            variables_source=variables_source,
+            allowed_actions_text=allowed_actions_text,
+        ),
+    )
+
+
+async def generate_speculative_action_text_async(
+    *,
+    llm_call_async: Callable[[dict], Awaitable[dict]],
+    react_prompt: str,
+    task_id: int,
+    run_id: int,
+    step_order: int,
+    step_title: str,
+    model: str,
+    react_params: dict,
+    variables_source: str,
+    allowed_actions_text: Optional[str] = None,
+) -> Tuple[Optional[str], Optional[str]]:
+    """generate_speculative_action_text 的 asyncio 版本（协程驱动时预取以 task 运行在 event loop 上）。"""
+    return await call_llm_for_text_async(
+        llm_call_async,
+        **_speculative_action_request(
+            react_prompt=react_prompt,
+            task_id=task_id,
+            run_id=run_id,
+            step_order=step_order,
+            step_title=step_title,
+            model=model,
+            react_params=react_params,
+            variables_source=variables_source,
+            allowed_actions_text=allowed_actions_text,
+        ),
+    )
+
+
+def _speculative_action_request(
+    *,
+    react_prompt: str,
+    task_id: int,
+    run_id: int,
+    step_order: int,
+    step_title: str,
+    model: str,
+    react_params: dict,
+    variables_source: str,
+    allowed_actions_text: Optional[str],
+) -> dict:
+    attempt_params = dict(react_params or {})
+    initial_token_cap, _retry_token_cap = _resolve_action_token_caps(
+        step_title=str(step_title or ""),
+        allowed_actions_text=str(allowed_actions_text or ""),
+        react_prompt=str(react_prompt or ""),
+    )
+    current_max_tokens = coerce_int(attempt_params.get("max_tokens"), default=0)
+    if current_max_tokens <= 0 or current_max_tokens > int(initial_token_cap):
+        attempt_params["max_tokens"] = int(initial_token_cap)
+    return {
+        "prompt": react_prompt,
+        "task_id": int(task_id),
+        "run_id": int(run_id),
+        "model": model,
+        "parameters": attempt_params,
+        "variables": {
+            "source": f"{variables_source}_speculative",
+            "step_order": int(step_order),
+            "attempt": 0,
+        },
+        "retry_max_attempts": int(REACT_LLM_INNER_RETRY_MAX_ATTEMPTS),
+        "hard_timeout_seconds": int(REACT_LLM_INNER_HARD_TIMEOUT_SECONDS),
+    }
+
+
+# agent_state 中保留的动作生成统计条数上限（避免长 run 的 agent_state 无限增长）
+_ACTION_GENERATION_STATS_KEEP = 50
+
+
+def record_action_generation_stats(agent_state: Optional[Dict], *, step_order: int, stats: Optional[dict]) -> None:
+    """
+    把单步动作生成统计写入 agent_state：
+    - action_generation_last_meta：最近一步（便于调试面板直接查看）；
+    - action_generation_stats：按步骤追加的有界列表（time_to_action_ms / tokens_saved_est 等）。
+    """
+    if not isinstance(agent_state, dict) or not isinstance(stats, dict) or not stats:
+        return
+    entry = {"step_order": int(step_order), **stats}
+    agent_state["action_generation_last_meta"] = dict(entry)
+    history = agent_state.get("action_generation_stats")
+    if not isinstance(history, list):
+        history = []
+    history.append(entry)
+    agent_state["action_generation_stats"] = history[-_ACTION_GENERATION_STATS_KEEP:]
+
+
+def _describe_file_read_window(result: dict) -> str:
+    """file_read 窗口元数据（让模型知道文件多大、读到了哪里、如何继续翻页）。"""
+    parts: List[str] = []
+    if isinstance(result.get("size"), int):
+        parts.append(f"size={result['size']}")
+    total_lines = result.get("total_lines")
+    mode = str(result.get("mode") or "")
+    if mode == "grep":
+        parts.append(f"matches={result.get('match_count')}" + ("+" if result.get("truncated") else ""))
+    elif isinstance(result.get("start_line"), int) and isinstance(result.get("end_line"), int):
+        parts.append(f"lines={result['start_line']}-{result['end_line']}")
+    if isinstance(total_lines, int):
+        parts.append(f"total_lines={total_lines}")
+    if result.get("next_line") is not None:
+        parts.append(f"next_line={result['next_line']}")
+    elif result.get("next_offset") is not None:
+        parts.append(f"next_offset={result['next_offset']}")
+    return " ".join(parts)
+
+
 def build_observation_line(
     *,
     action_type: str,
@@ -895,6 +1270,9 @@ def build_observation_line(
         path = str(result.get("path") or "").strip()
         size = result.get("bytes")
         tail = f"{size} bytes" if isinstance(size, int) else ""
+        window = _describe_file_read_window(result)
+        if window:
+            tail = f"{tail} {window}".strip()
         content_raw = str(result.get("content") or "")
         content = _truncate_observation(content_raw)
         obs_line = f"{title}: file_read {path} {tail} content={content}".strip()
@@ -1243,10 +1621,54 @@ def handle_task_output_fallback(
     safe_write_debug: Callable,
 ) -> Tuple[Optional[dict], Optional[str], Optional[dict], Optional[str]]:
     """
-    处理 task_output.content 为空的情况，强制让模型补齐。
+    处理 task_output.content 为空的情况，强制让模型补齐（同步版本，参数与返回值同 iter_handle_task_output_fallback）。
+    """
+    steps = iter_handle_task_output_fallback(
+        llm_call=llm_call,
+        react_prompt=react_prompt,
+        task_id=task_id,
+        run_id=run_id,
+        step_order=step_order,
+        title=title,
+        workdir=workdir,
+        model=model,
+        react_params=react_params,
+        variables_source=variables_source,
+        payload_obj=payload_obj,
+        context=context,
+        safe_write_debug=safe_write_debug,
+    )
+    try:
+        next(steps)
+    except StopIteration as exc:
+        return exc.value
+    # 未提供 llm_call_async 时不会 yield AwaitRequest
+    raise RuntimeError("handle_task_output_fallback 不应挂起")
+
+
+def iter_handle_task_output_fallback(
+    *,
+    llm_call: Callable[[dict], dict],
+    llm_call_async: Optional[Callable[[dict], Awaitable[dict]]] = None,
+    react_prompt: str,
+    task_id: int,
+    run_id: int,
+    step_order: int,
+    title: str,
+    workdir: str,
+    model: str,
+    react_params: dict,
+    variables_source: str,
+    payload_obj: dict,
+    context: Dict,
+    safe_write_debug: Callable,
+) -> Generator[Any, Any, Tuple[Optional[dict], Optional[str], Optional[dict], Optional[str]]]:
+    """
+    处理 task_output.content 为空的情况，强制让模型补齐（generator：SSE generator 内 yield from 取返回值）。
 
     Args:
         llm_call: LLM 调用函数
+        llm_call_async: 可选的 asyncio 版 LLM 调用；协程驱动时经 AwaitRequest 在 event loop 上 await
         react_prompt: ReAct 提示词
         task_id: 任务 ID
         run_id: 执行尝试 ID
@@ -1280,8 +1702,9 @@ def handle_task_output_fallback(
         "因此你必须在 task_output.payload.content 中写入非空的最终结论（不要返回空字符串）。只输出 JSON。\n"
     )
 
-    forced_text, forced_err = call_llm_for_text(
+    forced_text, forced_err = yield from iter_call_llm_for_text(
         llm_call,
+        llm_call_async=llm_call_async,
         prompt=force_content_prompt,
         task_id=int(task_id),
         run_id=int(run_id),
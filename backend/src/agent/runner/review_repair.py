@@ -1,11 +1,13 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Any, Awaitable, Callable, Generator, List, Optional, Tuple
 
 from backend.src.actions.registry import list_action_types, normalize_action_type
 from backend.src.agent.support import _extract_json_object
+from backend.src.agent.runner import react_helpers
 from backend.src.agent.runner.react_helpers import call_llm_for_text
+from backend.src.common.async_bridge import coroutine_driver_active
 
 
 REVIEW_GATE_DECISION_REPAIR = "repair"
@@ -30,6 +32,18 @@ class ReviewGateDecision:
     parse_error: Optional[str] = None
 
 
+def iter_call_llm_for_text(
+    llm_call: Callable[[dict], dict],
+    *,
+    llm_call_async: Optional[Callable[[dict], Awaitable[dict]]] = None,
+    **kwargs,
+) -> Generator[Any, Any, Tuple[Optional[str], Optional[str]]]:
+    """评估修复决策的 LLM 调用：协程驱动时 await llm_call_async，否则走本模块的 call_llm_for_text。"""
+    if llm_call_async is not None and coroutine_driver_active():
+        return (yield from react_helpers.iter_call_llm_for_text(llm_call, llm_call_async=llm_call_async, **kwargs))
+    return call_llm_for_text(llm_call, **kwargs)
+
+
 def build_review_repair_prompt(
     *,
     review_status: str,
@@ -220,6 +234,7 @@ __all__ = [
     "ReviewGateDecision",
     "build_review_repair_prompt",
     "call_llm_for_text",
+    "iter_call_llm_for_text",
     "parse_insert_steps_from_text",
     "parse_review_gate_decision_from_text",
 ]
@@ -4,11 +4,12 @@ import asyncio
 import os
 import threading
 import time
-from dataclasses import dataclass
-from typing import Dict, Optional
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
 
 from backend.src.agent.contracts.stream_events import coerce_session_key
 from backend.src.common.utils import coerce_int
+from backend.src.services.coordination.coordinator import Lease, get_coordinator
 
 _STATE_LOCK = threading.Lock()
 _LANE_QUEUES: Dict[str, asyncio.Queue] = {}
@@ -70,6 +71,46 @@ def _decrement_lane_ref_unlocked(*, lane_key: str, lane_queue: asyncio.Queue) ->
     _LANE_REF_COUNTS[lane_key] = next_ref
 
 
+def _remaining_seconds(deadline: float) -> float:
+    """距 deadline 的剩余秒数（>= 0）：同一次 acquire 的各段等待共用一个总超时。"""
+    return max(0.0, float(deadline) - time.monotonic())
+
+
+async def _acquire_cluster_leases(*, lane_key: str, deadline: float) -> List[Lease]:
+    """
+    多实例部署：在进程内令牌之外再占用集群级槽位（全局并发 + 同 session 串行）。
+
+    local 后端直接返回空列表（进程内令牌已经等价）。
+    """
+    coordinator = get_coordinator()
+    if not coordinator.distributed:
+        return []
+    leases: List[Lease] = []
+    try:
+        leases.append(
+            await coordinator.acquire_async(
+                "stream:global", _resolve_global_limit(), timeout_seconds=_remaining_seconds(deadline)
+            )
+        )
+        leases.append(
+            await coordinator.acquire_async(
+                f"stream:lane:{lane_key}", 1, timeout_seconds=_remaining_seconds(deadline)
+            )
+        )
+    except BaseException:
+        await _release_cluster_leases(leases)
+        raise
+    return leases
+
+
+async def _release_cluster_leases(leases: List[Lease]) -> None:
+    if not leases:
+        return
+    coordinator = get_coordinator()
+    for lease in reversed(leases):
+        await asyncio.to_thread(coordinator.release, lease)
+
+
 async def _return_token(queue_obj: asyncio.Queue, token: object) -> None:
     try:
         queue_obj.put_nowait(token)
@@ -86,6 +127,7 @@ class StreamQueueTicket:
     global_queue: asyncio.Queue
     global_token: object
     acquired_at: float
+    cluster_leases: List[Lease] = field(default_factory=list)
     _released: bool = False
 
     async def release(self) -> None:
@@ -93,9 +135,12 @@ class StreamQueueTicket:
             return
         self._released = True
         try:
-            await _return_token(self.lane_queue, self.lane_token)
+            await _release_cluster_leases(self.cluster_leases)
         finally:
-            await _return_token(self.global_queue, self.global_token)
+            try:
+                await _return_token(self.lane_queue, self.lane_token)
+            finally:
+                await _return_token(self.global_queue, self.global_token)
 
         with _STATE_LOCK:
             _decrement_lane_ref_unlocked(lane_key=self.lane_key, lane_queue=self.lane_queue)
@@ -115,10 +160,13 @@ async def acquire_stream_queue_ticket(
     session_key: str,
     timeout_seconds: float = 120.0,
 ) -> StreamQueueTicket:
+    """
+    依次拿全局令牌、同 session 令牌与集群槽位；timeout_seconds 是整个过程的总超时（各段共用一个 deadline）。
+    """
     lane_key = _normalize_lane_key(session_key)
-    timeout = max(0.01, float(timeout_seconds))
+    deadline = time.monotonic() + max(0.01, float(timeout_seconds))
     global_queue = await _get_global_queue()
-    global_token = await asyncio.wait_for(global_queue.get(), timeout=timeout)
+    global_token = await asyncio.wait_for(global_queue.get(), timeout=_remaining_seconds(deadline))
 
     lane_queue: Optional[asyncio.Queue] = None
     lane_token: Optional[object] = None
@@ -127,7 +175,8 @@ async def acquire_stream_queue_ticket(
             lane_queue = _get_or_create_lane_queue(lane_key)
             _LANE_REF_COUNTS[lane_key] = coerce_int(_LANE_REF_COUNTS.get(lane_key), default=0) + 1
 
-        lane_token = await asyncio.wait_for(lane_queue.get(), timeout=timeout)
+        lane_token = await asyncio.wait_for(lane_queue.get(), timeout=_remaining_seconds(deadline))
+        cluster_leases = await _acquire_cluster_leases(lane_key=lane_key, deadline=deadline)
         return StreamQueueTicket(
             lane_key=lane_key,
             lane_queue=lane_queue,
@@ -135,6 +184,7 @@ async def acquire_stream_queue_ticket(
             global_queue=global_queue,
             global_token=global_token,
             acquired_at=time.monotonic(),
+            cluster_leases=cluster_leases,
         )
     except Exception:
         if lane_queue is not None:
@@ -165,6 +215,7 @@ def get_stream_queue_snapshot() -> dict:
                 "maxsize": global_maxsize,
             },
             "lanes": lanes,
+            "coordination": get_coordinator().name,
         }
 
 
@@ -21,6 +21,7 @@ from backend.src.constants import RUN_STATUS_DONE, RUN_STATUS_FAILED, RUN_STATUS
 from backend.src.common.utils import parse_optional_int
 from backend.src.services.llm.llm_client import sse_json
 from backend.src.services.permissions.permission_checks import ensure_write_permission
+from backend.src.services.system.state_channel import publish_run_status
 from backend.src.services.tasks.task_run_events import (
     append_task_run_event_audit,
     create_task_run_event,
@@ -249,6 +250,8 @@ class StreamRunStateEmitter:
         if self.task_id is None or self.run_id is None:
             return None
         self._last_emitted_run_status = normalized
+        # 同步推送到状态通道（/api/state/stream），面板无需轮询 runs/current
+        publish_run_status(task_id=int(self.task_id), run_id=int(self.run_id), status=normalized)
         return self.emit(
             build_run_status_sse(
                 status=normalized,
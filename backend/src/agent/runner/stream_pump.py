@@ -1,10 +1,14 @@
 import asyncio
+import concurrent.futures
+import contextvars
 import json
 import threading
 import time
 import traceback
+from contextlib import aclosing
 from typing import AsyncGenerator, Callable, Generator, Optional, TypeVar
 
+from backend.src.common.async_bridge import AWAIT_PENDING, AwaitRequest, bind_coroutine_driver
 from backend.src.common.utils import coerce_int
 from backend.src.constants import AGENT_SSE_PLAN_MIN_INTERVAL_SECONDS
 
@@ -88,97 +92,24 @@ def _plan_delta_change_key(change: object) -> Optional[int]:
     return None
 
 
-async def pump_sync_generator(
+async def _consume_pump_queue(
     *,
-    inner: Generator[str, None, T],
-    label: str,
+    q: "asyncio.Queue[tuple[str, object]]",
+    pump_error: dict[str, str],
+    producer_alive: Callable[[], bool],
+    request_stop: Callable[[], None],
     poll_interval_seconds: float,
     idle_timeout_seconds: float,
-    heartbeat_builder: Optional[Callable[[], Optional[str]]] = None,
-    heartbeat_min_interval_seconds: float = 0.0,
-    heartbeat_trigger_debounce_seconds: float = 0.0,
-    stop_status_provider: Optional[Callable[[], Optional[str]]] = None,
+    heartbeat_builder: Optional[Callable[[], Optional[str]]],
+    heartbeat_min_interval_seconds: float,
+    heartbeat_trigger_debounce_seconds: float,
+    stop_status_provider: Optional[Callable[[], Optional[str]]],
 ) -> AsyncGenerator[tuple[str, object], None]:
     """
-    将“同步 generator”的产出桥接为“异步事件流”。
-
-    事件格式：(kind, payload)
-    - ("msg", <str>)  : 需要继续向 SSE 输出的内容
-    - ("done", <T>)   : 同步 generator 正常结束，payload 为 return 值
-    - ("err", <exc>)  : 同步 generator 内部异常（payload 为异常对象）
-    - ("stop", <str>) : 检测到外部终态（如 stopped/failed）后主动停泵
-
-    重要：这里使用 tick_task + asyncio.wait 定期唤醒 event loop。
-    在 httpx.ASGITransport 的测试场景中，单纯 await queue.get() 可能出现“回调已投递但 loop
-    没有及时唤醒”的卡死现象；tick 可以显著降低该类卡死概率。
+    泵队列的消费侧（同步/异步两种生产者共用）：
+    - plan/plan_delta 节流合并、关键事件前 flush；
+    - heartbeat、外部终态停泵、生产者异常退出/长时间无输出检测。
     """
-    q: "asyncio.Queue[tuple[str, object]]" = asyncio.Queue()
-    loop = asyncio.get_running_loop()
-    # 重要：当 SSE 客户端断开/外层 async generator 被 cancel 时，需要通知线程停止继续泵数据；
-    # 否则同步 generator 可能持续 yield，导致队列无限增长（内存泄漏）或后台线程长期空转。
-    stop_event = threading.Event()
-    pump_error: dict[str, str] = {"label": str(label or "").strip() or "(empty)"}
-
-    def _enqueue(kind: str, payload: object) -> None:
-        try:
-            q.put_nowait((kind, payload))
-        except RuntimeError as exc:
-            pump_error["queue_put_error"] = f"{type(exc).__name__}: {exc}"
-            pump_error["queue_put_trace"] = traceback.format_exc()
-
-    def _try_put(kind: str, payload: object) -> bool:
-        if stop_event.is_set():
-            return False
-        try:
-            loop.call_soon_threadsafe(_enqueue, kind, payload)
-            return True
-        except RuntimeError as exc:
-            pump_error["call_soon_error"] = f"{type(exc).__name__}: {exc}"
-            pump_error["call_soon_trace"] = traceback.format_exc()
-            return False
-
-    def _pump() -> None:
-        sent = 0
-        pump_error["phase"] = "start"
-
-        def _close_inner_if_possible() -> None:
-            try:
-                inner.close()
-            except (AttributeError, RuntimeError) as exc:
-                pump_error["close_error"] = f"{type(exc).__name__}: {exc}"
-                pump_error["close_trace"] = traceback.format_exc()
-
-        try:
-            while True:
-                if stop_event.is_set():
-                    pump_error["phase"] = "cancelled"
-                    _close_inner_if_possible()
-                    return
-                pump_error["phase"] = "next"
-                try:
-                    item = next(inner)
-                except StopIteration as exc:
-                    pump_error["phase"] = "stop"
-                    pump_error["sent_count"] = str(sent)
-                    _try_put("done", exc.value)
-                    return
-                sent += 1
-                pump_error["phase"] = "enqueue_msg"
-                pump_error["sent_count"] = str(sent)
-                if not _try_put("msg", item):
-                    pump_error["phase"] = "cancelled"
-                    _close_inner_if_possible()
-                    return
-        except BaseException as exc:  # noqa: BLE001
-            pump_error["phase"] = "exception"
-            pump_error["error"] = f"{type(exc).__name__}: {exc}"
-            pump_error["trace"] = traceback.format_exc()
-            _try_put("err", exc)
-            return
-
-    t = threading.Thread(target=_pump, daemon=True)
-    t.start()
-
     last_recv_at = time.monotonic()
     heartbeat_active = False
     heartbeat_min_interval = _normalize_interval_seconds(heartbeat_min_interval_seconds)
@@ -341,7 +272,7 @@ async def pump_sync_generator(
                     if pending_plan_msg:
                         yield "msg", str(pending_plan_msg)
                         pending_plan_msg = None
-                    stop_event.set()
+                    request_stop()
                     yield "stop", external_status
                     return
 
@@ -397,7 +328,7 @@ async def pump_sync_generator(
                 suffix = f" (label={pump_error.get('label')} phase={phase} sent={sent_count})"
                 raise RuntimeError(f"stream pump 回传失败: {detail}{suffix}")  # noqa: TRY301
 
-            if not t.is_alive():
+            if not producer_alive():
                 phase = pump_error.get("phase")
                 sent_count = pump_error.get("sent_count")
                 suffix = f" (label={pump_error.get('label')} phase={phase} sent={sent_count})"
@@ -407,7 +338,239 @@ async def pump_sync_generator(
                 suffix = f" (label={pump_error.get('label')})"
                 raise RuntimeError(f"stream pump 长时间无输出，判定卡死{suffix}")  # noqa: TRY301
     finally:
-        stop_event.set()
+        request_stop()
         get_task.cancel()
         tick_task.cancel()
         await asyncio.gather(get_task, tick_task, return_exceptions=True)
+
+
+async def pump_sync_generator(
+    *,
+    inner: Generator[str, None, T],
+    label: str,
+    poll_interval_seconds: float,
+    idle_timeout_seconds: float,
+    heartbeat_builder: Optional[Callable[[], Optional[str]]] = None,
+    heartbeat_min_interval_seconds: float = 0.0,
+    heartbeat_trigger_debounce_seconds: float = 0.0,
+    stop_status_provider: Optional[Callable[[], Optional[str]]] = None,
+) -> AsyncGenerator[tuple[str, object], None]:
+    """
+    将“同步 generator”的产出桥接为“异步事件流”。
+
+    事件格式：(kind, payload)
+    - ("msg", <str>)  : 需要继续向 SSE 输出的内容
+    - ("done", <T>)   : 同步 generator 正常结束，payload 为 return 值
+    - ("err", <exc>)  : 同步 generator 内部异常（payload 为异常对象）
+    - ("stop", <str>) : 检测到外部终态（如 stopped/failed）后主动停泵
+
+    重要：这里使用 tick_task + asyncio.wait 定期唤醒 event loop。
+    在 httpx.ASGITransport 的测试场景中，单纯 await queue.get() 可能出现“回调已投递但 loop
+    没有及时唤醒”的卡死现象；tick 可以显著降低该类卡死概率。
+    """
+    q: "asyncio.Queue[tuple[str, object]]" = asyncio.Queue()
+    loop = asyncio.get_running_loop()
+    # 重要：当 SSE 客户端断开/外层 async generator 被 cancel 时，需要通知线程停止继续泵数据；
+    # 否则同步 generator 可能持续 yield，导致队列无限增长（内存泄漏）或后台线程长期空转。
+    stop_event = threading.Event()
+    pump_error: dict[str, str] = {"label": str(label or "").strip() or "(empty)"}
+
+    def _enqueue(kind: str, payload: object) -> None:
+        try:
+            q.put_nowait((kind, payload))
+        except RuntimeError as exc:
+            pump_error["queue_put_error"] = f"{type(exc).__name__}: {exc}"
+            pump_error["queue_put_trace"] = traceback.format_exc()
+
+    def _try_put(kind: str, payload: object) -> bool:
+        if stop_event.is_set():
+            return False
+        try:
+            loop.call_soon_threadsafe(_enqueue, kind, payload)
+            return True
+        except RuntimeError as exc:
+            pump_error["call_soon_error"] = f"{type(exc).__name__}: {exc}"
+            pump_error["call_soon_trace"] = traceback.format_exc()
+            return False
+
+    def _pump() -> None:
+        sent = 0
+        pump_error["phase"] = "start"
+
+        def _close_inner_if_possible() -> None:
+            try:
+                inner.close()
+            except (AttributeError, RuntimeError) as exc:
+                pump_error["close_error"] = f"{type(exc).__name__}: {exc}"
+                pump_error["close_trace"] = traceback.format_exc()
+
+        try:
+            while True:
+                if stop_event.is_set():
+                    pump_error["phase"] = "cancelled"
+                    _close_inner_if_possible()
+                    return
+                pump_error["phase"] = "next"
+                try:
+                    item = next(inner)
+                except StopIteration as exc:
+                    pump_error["phase"] = "stop"
+                    pump_error["sent_count"] = str(sent)
+                    _try_put("done", exc.value)
+                    return
+                sent += 1
+                pump_error["phase"] = "enqueue_msg"
+                pump_error["sent_count"] = str(sent)
+                if not _try_put("msg", item):
+                    pump_error["phase"] = "cancelled"
+                    _close_inner_if_possible()
+                    return
+        except BaseException as exc:  # noqa: BLE001
+            pump_error["phase"] = "exception"
+            pump_error["error"] = f"{type(exc).__name__}: {exc}"
+            pump_error["trace"] = traceback.format_exc()
+            _try_put("err", exc)
+            return
+
+    t = threading.Thread(target=_pump, daemon=True)
+    t.start()
+
+    consumer = _consume_pump_queue(
+        q=q,
+        pump_error=pump_error,
+        producer_alive=t.is_alive,
+        request_stop=stop_event.set,
+        poll_interval_seconds=poll_interval_seconds,
+        idle_timeout_seconds=idle_timeout_seconds,
+        heartbeat_builder=heartbeat_builder,
+        heartbeat_min_interval_seconds=heartbeat_min_interval_seconds,
+        heartbeat_trigger_debounce_seconds=heartbeat_trigger_debounce_seconds,
+        stop_status_provider=stop_status_provider,
+    )
+    try:
+        async with aclosing(consumer):
+            async for event in consumer:
+                yield event
+    finally:
+        stop_event.set()
+
+
+async def pump_coroutine_generator(
+    *,
+    inner: Generator[object, object, T],
+    label: str,
+    poll_interval_seconds: float,
+    idle_timeout_seconds: float,
+    heartbeat_builder: Optional[Callable[[], Optional[str]]] = None,
+    heartbeat_min_interval_seconds: float = 0.0,
+    heartbeat_trigger_debounce_seconds: float = 0.0,
+    stop_status_provider: Optional[Callable[[], Optional[str]]] = None,
+) -> AsyncGenerator[tuple[str, object], None]:
+    """
+    pump_sync_generator 的协程版本：在当前 event loop 上逐步驱动同步 generator，不起泵线程。
+
+    - inner yield 的字符串作为 ("msg", ...) 输出（节流/heartbeat/停泵与 pump_sync_generator 一致）；
+    - inner yield AwaitRequest 时在本 loop 上 await 其协程，结果 send 回 inner（异常 throw 回 inner）；
+      请求带 poll_seconds 且到期未完成时 send AWAIT_PENDING，inner 发完进度事件后再次 yield 同一请求；
+    - inner 的同步代码（落库、拼 prompt 等）在两次 await 之间直接运行在 loop 线程上，
+      整个生命周期共用一个 contextvars.Context（coroutine_driver_active() 为真，AwaitRequest 的 task 也在其中运行）；
+    - 消费者提前结束/外部停泵时取消在途 task 并关闭 inner。
+    """
+    q: "asyncio.Queue[tuple[str, object]]" = asyncio.Queue()
+    pump_error: dict[str, str] = {"label": str(label or "").strip() or "(empty)"}
+    context = contextvars.copy_context()
+    context.run(bind_coroutine_driver)
+
+    async def _await_request(request: AwaitRequest) -> object:
+        if request.task is None:
+            # task 用 context 的副本：能看到驱动标记/绑定的桥，但其内部设置的 contextvar 不回流到 generator
+            task_context = context.copy()
+            request.task = asyncio.create_task(task_context.run(request.factory), context=task_context)
+        done, _pending = await asyncio.wait({request.task}, timeout=request.poll_seconds)
+        if not done:
+            return AWAIT_PENDING
+        if request.task.cancelled():
+            # 请求自身被取消（不是驱动器被取消）：与 LoopBridge.run 一致，按 concurrent.futures.CancelledError 抛回
+            raise concurrent.futures.CancelledError()
+        return request.task.result()
+
+    async def _drive() -> None:
+        sent = 0
+        pump_error["phase"] = "start"
+        in_flight: Optional[AwaitRequest] = None
+        value: object = None
+        error: Optional[BaseException] = None
+        try:
+            while True:
+                pump_error["phase"] = "next"
+                try:
+                    if error is not None:
+                        item = context.run(inner.throw, error)
+                    else:
+                        item = context.run(inner.send, value)
+                except StopIteration as exc:
+                    pump_error["phase"] = "stop"
+                    pump_error["sent_count"] = str(sent)
+                    q.put_nowait(("done", exc.value))
+                    return
+                value, error = None, None
+                if isinstance(item, AwaitRequest):
+                    pump_error["phase"] = "await"
+                    in_flight = item
+                    try:
+                        value = await _await_request(item)
+                    except Exception as exc:  # noqa: BLE001
+                        error = exc
+                    if value is not AWAIT_PENDING:
+                        in_flight = None
+                    continue
+                sent += 1
+                pump_error["phase"] = "enqueue_msg"
+                pump_error["sent_count"] = str(sent)
+                q.put_nowait(("msg", item))
+                # 让出 loop：消费者转发 SSE，heartbeat/停泵检测得以运行
+                await asyncio.sleep(0)
+        except asyncio.CancelledError:
+            pump_error["phase"] = "cancelled"
+            raise
+        except BaseException as exc:  # noqa: BLE001
+            pump_error["phase"] = "exception"
+            pump_error["error"] = f"{type(exc).__name__}: {exc}"
+            pump_error["trace"] = traceback.format_exc()
+            q.put_nowait(("err", exc))
+        finally:
+            if in_flight is not None and in_flight.task is not None and not in_flight.task.done():
+                in_flight.task.cancel()
+                await asyncio.gather(in_flight.task, return_exceptions=True)
+            if pump_error.get("phase") != "stop":
+                try:
+                    context.run(inner.close)
+                except (AttributeError, RuntimeError) as exc:
+                    pump_error["close_error"] = f"{type(exc).__name__}: {exc}"
+                    pump_error["close_trace"] = traceback.format_exc()
+
+    driver = asyncio.create_task(_drive())
+
+    def _request_stop() -> None:
+        if not driver.done():
+            driver.cancel()
+
+    consumer = _consume_pump_queue(
+        q=q,
+        pump_error=pump_error,
+        producer_alive=lambda: not driver.done() or not q.empty(),
+        request_stop=_request_stop,
+        poll_interval_seconds=poll_interval_seconds,
+        idle_timeout_seconds=idle_timeout_seconds,
+        heartbeat_builder=heartbeat_builder,
+        heartbeat_min_interval_seconds=heartbeat_min_interval_seconds,
+        heartbeat_trigger_debounce_seconds=heartbeat_trigger_debounce_seconds,
+        stop_status_provider=stop_status_provider,
+    )
+    try:
+        async with aclosing(consumer):
+            async for event in consumer:
+                yield event
+    finally:
+        _request_stop()
+        await asyncio.gather(driver, return_exceptions=True)
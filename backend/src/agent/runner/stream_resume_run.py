@@ -43,6 +43,7 @@ from backend.src.agent.runner.execution_pipeline import (
     retrieve_all_knowledge,
 )
 from backend.src.agent.runner.stream_status_event import normalize_stream_run_status
+from backend.src.services.coordination.coordinator import get_coordinator
 from backend.src.agent.runner.stream_convergence import (
     build_stream_error_payload,
     resolve_terminal_meta,
@@ -130,6 +131,10 @@ def _cleanup_resume_token_state(now: float) -> None:
         _RESUME_TOKEN_STATE.pop(key, None)
 
 
+def _resume_claim_key(*, run_id: int, token: str) -> str:
+    return f"resume:{int(run_id)}:{token}"
+
+
 def _claim_resume_prompt_token(*, run_id: int, token: str) -> tuple[bool, str]:
     token_text = str(token or "").strip()
     if not token_text:
@@ -143,6 +148,23 @@ def _claim_resume_prompt_token(*, run_id: int, token: str) -> tuple[bool, str]:
             state = str(prev.get("state") or "").strip() or "done"
             return False, state
         _RESUME_TOKEN_STATE[key] = {"state": "inflight", "ts": now}
+
+    # 多实例部署：同一输入可能被重试到另一个实例，需要集群级 exactly-once 认领
+    coordinator = get_coordinator()
+    if coordinator.distributed:
+        try:
+            claimed, state = coordinator.claim(
+                _resume_claim_key(run_id=int(run_id), token=token_text),
+                ttl_seconds=float(_RESUME_TOKEN_TTL_SECONDS),
+            )
+        except Exception as exc:
+            # 协调库不可用时退回进程内语义，不阻断用户继续执行
+            logger.warning("[agent.resume] cluster claim failed run_id=%s err=%s", run_id, exc)
+            claimed, state = True, "inflight"
+        if not claimed:
+            with _RESUME_TOKEN_LOCK:
+                _RESUME_TOKEN_STATE[key] = {"state": state, "ts": now}
+            return False, state
     return True, "inflight"
 
 
@@ -155,6 +177,16 @@ def _finalize_resume_prompt_token(*, run_id: int, token: str, state: str) -> Non
     with _RESUME_TOKEN_LOCK:
         _cleanup_resume_token_state(now)
         _RESUME_TOKEN_STATE[key] = {"state": str(state or "done"), "ts": now}
+    coordinator = get_coordinator()
+    if coordinator.distributed:
+        try:
+            coordinator.set_claim_state(
+                _resume_claim_key(run_id=int(run_id), token=token_text),
+                str(state or "done"),
+                ttl_seconds=float(_RESUME_TOKEN_TTL_SECONDS),
+            )
+        except Exception as exc:
+            logger.warning("[agent.resume] cluster claim finalize failed run_id=%s err=%s", run_id, exc)
 
 
 @require_write_permission_stream
@@ -44,7 +44,14 @@ from backend.src.agent.runner.react_helpers import (
 from backend.src.agent.runner.capability_router import build_capability_hint, resolve_step_capability
 from backend.src.agent.runner.plan_events import sse_plan_delta
 from backend.src.agent.runner.react_state_manager import persist_loop_state
-from backend.src.agent.think.think_execution import _infer_executor_from_allow
+from backend.src.agent.think.think_execution import (
+    _infer_executor_from_allow,
+    compute_critical_path_priorities,
+    estimate_step_costs,
+    executor_can_take_step,
+    record_executor_reassignment,
+    resolve_recorded_reassignments,
+)
 from backend.src.common.utils import now_iso
 from backend.src.constants import (
     ACTION_TYPE_FILE_APPEND,
@@ -67,10 +74,15 @@ from backend.src.constants import (
     STREAM_TAG_SKIP,
     STREAM_TAG_STEP,
     AGENT_THINK_PARALLEL_PERSIST_MIN_INTERVAL_SECONDS,
+    AGENT_THINK_PARALLEL_SCHEDULER,
+    THINK_PARALLEL_DURATION_HISTORY_LIMIT,
+    THINK_PARALLEL_SCHEDULER_CRITICAL_PATH,
+    THINK_PARALLEL_SCHEDULER_ROLE,
 )
 from backend.src.services.tasks.task_queries import (
     TaskStepCreateParams,
     create_task_step,
+    get_action_duration_estimates,
     mark_task_step_done,
     mark_task_step_failed,
 )
@@ -369,6 +381,35 @@ def _has_cycle(dep_map: List[List[int]]) -> bool:
     return visited != n
 
 
+def _resolve_scheduler(value: Optional[str]) -> str:
+    mode = str(value or AGENT_THINK_PARALLEL_SCHEDULER or "").strip().lower()
+    if mode == THINK_PARALLEL_SCHEDULER_CRITICAL_PATH:
+        return THINK_PARALLEL_SCHEDULER_CRITICAL_PATH
+    return THINK_PARALLEL_SCHEDULER_ROLE
+
+
+def _load_action_durations(
+    *,
+    task_id: int,
+    run_id: int,
+    safe_write_debug: Callable[..., None],
+) -> Dict[str, float]:
+    """
+    读取历史 action 平均耗时（task_steps started_at/finished_at）；失败时返回空表（全部走默认耗时）。
+    """
+    try:
+        return get_action_duration_estimates(limit=int(THINK_PARALLEL_DURATION_HISTORY_LIMIT))
+    except Exception as exc:  # noqa: BLE001
+        safe_write_debug(
+            task_id=int(task_id),
+            run_id=int(run_id),
+            message="agent.think.parallel.duration_history_failed",
+            data={"error": str(exc)},
+            level="warning",
+        )
+        return {}
+
+
 def run_think_parallel_loop(
     *,
     task_id: int,
@@ -396,10 +437,16 @@ def run_think_parallel_loop(
     llm_call: Callable[[dict], dict],
     execute_step_action: Callable[..., tuple[Optional[dict], Optional[str]]],
     safe_write_debug: Callable[..., None],
+    scheduler: Optional[str] = None,
 ) -> Generator[str, None, ThinkParallelLoopResult]:
     """
     Think 并行执行主循环（同步 generator）。
 
+    scheduler：
+    - role（默认）：每个 executor 只执行归属自己的就绪步骤（按 step_order）；
+    - critical_path：就绪步骤按关键路径优先级排序；executor 空闲且步骤归属角色忙碌时，
+      可窃取 allow 兼容的就绪步骤，窃取结果写回 agent_state.executor_assignments。
+
     返回值（StopIteration.value）：
     - ThinkParallelLoopResult(run_status, last_step_order)
     """
@@ -459,14 +506,34 @@ def run_think_parallel_loop(
     if not roles:
         roles = ["executor_doc", "executor_code", "executor_test"]
 
+    scheduler_mode = _resolve_scheduler(scheduler)
+    critical_path_mode = scheduler_mode == THINK_PARALLEL_SCHEDULER_CRITICAL_PATH
+
+    # resume 确定性：上次运行中已发生的窃取分配优先复用（allow 不一致时忽略）。
+    plan_allows_all = [list(step.allow or []) for step in plan_struct.steps]
+    recorded_reassignments = resolve_recorded_reassignments(agent_state, plan_allows_all)
+
     executor_for_step: Dict[int, str] = {}
     for i, step in enumerate(plan_struct.steps):
-        role = _infer_executor_from_allow(list(step.allow or []), str(step.title or ""))
+        role = recorded_reassignments.get(i) or _infer_executor_from_allow(list(step.allow or []), str(step.title or ""))
         role = str(role or "").strip() or "executor_code"
         executor_for_step[i] = role
         if role not in roles:
             roles.append(role)
 
+    # 关键路径优先级（仅 critical_path 模式使用）；role 模式保持 step_order 顺序。
+    step_priorities: List[float] = [0.0] * total
+    if critical_path_mode:
+        action_durations = _load_action_durations(
+            task_id=int(task_id),
+            run_id=int(run_id),
+            safe_write_debug=safe_write_debug,
+        )
+        step_priorities = compute_critical_path_priorities(
+            dep_map,
+            estimate_step_costs(plan_allows_all, action_durations),
+        )
+
     # 依赖图/分工信息落库（写入 agent_state，便于 resume/审计/调试）。
     # 注意：这里只写入“执行器实际使用的最终依赖图”（含 artifacts 推导 + task_output/反馈门闩），
     # 便于后续恢复时复用，避免仅靠本地推断丢失 LLM 给出的显式依赖。
@@ -481,6 +548,7 @@ def run_think_parallel_loop(
         if isinstance(agent_state, dict):
             agent_state["think_parallel_dependencies"] = dep_payload
             agent_state["think_parallel_roles"] = list(roles)
+            agent_state["think_parallel_scheduler"] = scheduler_mode
             agent_state["think_parallel_executors"] = [
                 {"step_order": int(i) + 1, "executor": str(executor_for_step.get(i) or "")}
                 for i in range(0, total)
@@ -491,7 +559,12 @@ def run_think_parallel_loop(
         task_id=int(task_id),
         run_id=int(run_id),
         message="agent.think.parallel.dep_graph",
-        data={"roles": list(roles), "dependencies": dep_payload},
+        data={
+            "roles": list(roles),
+            "dependencies": dep_payload,
+            "scheduler": scheduler_mode,
+            "priorities": [round(float(p), 3) for p in step_priorities] if critical_path_mode else None,
+        },
         level="info",
     )
 
@@ -506,6 +579,8 @@ def run_think_parallel_loop(
 
     completed: Set[int] = set()
     running: Set[int] = set()
+    # running step -> 实际执行的 role（critical_path 窃取判定“归属角色是否忙碌”）
+    running_roles: Dict[int, str] = {}
     # 并行场景下的 step 上下文隔离：
     # - 避免多个线程互相覆盖 context.last_llm_response，导致 task_output 兜底串台；
     # - 仅在依赖满足时，允许把“依赖链路中最近的 llm_call 输出”作为 seed（更接近串行语义）。
@@ -689,29 +764,77 @@ def run_think_parallel_loop(
                 if any(i != int(barrier_idx) for i in (running or set())):
                     return None
 
-            # 找到当前 role 下依赖满足的最小 idx（稳定）
+            ready: List[int] = []
             for idx in range(start_idx, end_idx + 1):
                 if idx in completed or idx in running:
                     continue
                 if barrier_idx is not None and int(idx) != int(barrier_idx):
                     continue
-                if executor_for_step.get(idx) != role:
-                    continue
                 deps = dep_map[idx] if 0 <= idx < len(dep_map) else []
                 if any(d not in completed for d in deps):
                     continue
+                ready.append(idx)
+
+            picked: Optional[int] = None
+            stolen_from: Optional[str] = None
+            if not critical_path_mode:
+                # 找到当前 role 下依赖满足的最小 idx（稳定）
+                for idx in ready:
+                    if executor_for_step.get(idx) == role:
+                        picked = idx
+                        break
+            else:
+                # 关键路径优先：优先级高者先执行，同优先级按 step_order（确定性）。
+                ordered = sorted(ready, key=lambda i: (-float(step_priorities[i]), int(i)))
+                for idx in ordered:
+                    if executor_for_step.get(idx) == role:
+                        picked = idx
+                        break
+                if picked is None and barrier_idx is None:
+                    # 工作窃取：归属角色正忙时，由当前空闲角色承接兼容步骤。
+                    busy_roles = set(running_roles.values())
+                    for idx in ordered:
+                        owner = str(executor_for_step.get(idx) or "")
+                        if owner not in busy_roles:
+                            continue
+                        if not executor_can_take_step(role, list(plan_struct.steps[idx].allow or [])):
+                            continue
+                        picked = idx
+                        stolen_from = owner
+                        break
+
+            if picked is None:
+                return None
 
-                # 标记 running + 更新 plan_struct
-                running.add(idx)
-                plan_struct.set_step_status(idx, "running")
-                _emit(sse_plan_delta(task_id=int(task_id), run_id=int(run_id), plan_items=plan_struct.get_items_payload(), indices=[idx]))
+            idx = int(picked)
+            if stolen_from is not None:
+                executor_for_step[idx] = str(role)
+                record_executor_reassignment(
+                    agent_state,
+                    step_order=idx + 1,
+                    executor=str(role),
+                    from_executor=str(stolen_from),
+                    allow=list(plan_struct.steps[idx].allow or []),
+                )
+                if isinstance(agent_state, dict) and isinstance(agent_state.get("think_parallel_executors"), list):
+                    for item in agent_state["think_parallel_executors"]:
+                        if isinstance(item, dict) and int(item.get("step_order") or 0) == idx + 1:
+                            item["executor"] = str(role)
+                _emit(sse_json({"delta": f"{STREAM_TAG_EXECUTOR} [{role}] 接管步骤 {idx + 1}（原 {stolen_from} 忙碌）\n"}))
+                _mark_persist_dirty("think_parallel.steal", step_order=_next_step_order_for_state())
+
+            # 标记 running + 更新 plan_struct
+            running.add(idx)
+            running_roles[idx] = str(role)
+            plan_struct.set_step_status(idx, "running")
+            _emit(sse_plan_delta(task_id=int(task_id), run_id=int(run_id), plan_items=plan_struct.get_items_payload(), indices=[idx]))
 
-                return idx
-            return None
+            return idx
 
     def _mark_step_finished(idx: int, status: str) -> None:
         with state_lock:
             running.discard(idx)
+            running_roles.pop(idx, None)
             if status in {"done", "skipped"}:
                 completed.add(idx)
             plan_struct.set_step_status(idx, status)
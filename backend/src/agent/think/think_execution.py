@@ -25,7 +25,10 @@ from backend.src.constants import (
     ACTION_TYPE_TOOL_CALL,
     ACTION_TYPE_LLM_CALL,
     ACTION_TYPE_TASK_OUTPUT,
+    ACTION_TYPE_USER_PROMPT,
     STREAM_TAG_EXECUTOR,
+    THINK_EXECUTOR_ROLE_ACTION_TYPES,
+    THINK_PARALLEL_DEFAULT_STEP_SECONDS,
 )
 from backend.src.agent.json_utils import safe_json_parse
 from backend.src.agent.think.think_config import ThinkConfig, ThinkExecutorConfig
@@ -408,6 +411,169 @@ def build_executor_assignments_payload(
     return payload
 
 
+def estimate_step_costs(
+    plan_allows: List[List[str]],
+    action_durations: Optional[Dict[str, float]],
+    *,
+    default_seconds: float = THINK_PARALLEL_DEFAULT_STEP_SECONDS,
+) -> List[float]:
+    """
+    估算每个步骤的耗时（秒），用于关键路径优先级。
+
+    说明：
+    - 步骤真实 action 在执行前未知，取 allow 中“历史平均耗时最大”的类型（保守估计）；
+    - 无历史样本的类型回退到 default_seconds。
+    """
+    durations = action_durations if isinstance(action_durations, dict) else {}
+    try:
+        fallback = max(0.0, float(default_seconds))
+    except (TypeError, ValueError):
+        fallback = float(THINK_PARALLEL_DEFAULT_STEP_SECONDS)
+
+    costs: List[float] = []
+    for allow in plan_allows or []:
+        samples: List[float] = []
+        for action_type in allow or []:
+            value = durations.get(str(action_type or "").strip())
+            try:
+                samples.append(max(0.0, float(value)) if value is not None else fallback)
+            except (TypeError, ValueError):
+                samples.append(fallback)
+        costs.append(max(samples) if samples else fallback)
+    return costs
+
+
+def compute_critical_path_priorities(
+    dep_map: List[List[int]],
+    step_costs: List[float],
+) -> List[float]:
+    """
+    计算每个步骤的关键路径优先级（bottom level）：
+    priority[i] = cost[i] + max(priority[后继])。
+
+    值越大表示该步骤后面挂着越长的依赖链，越应该优先执行。
+    依赖图有环时（调用方应已降级为串行）按步骤顺序逆序近似。
+    """
+    total = len(dep_map or [])
+    successors: List[List[int]] = [[] for _ in range(total)]
+    for to_idx, deps in enumerate(dep_map or []):
+        for from_idx in deps or []:
+            if 0 <= int(from_idx) < total and int(from_idx) != to_idx:
+                successors[int(from_idx)].append(to_idx)
+
+    def _cost(idx: int) -> float:
+        try:
+            return float(step_costs[idx])
+        except (IndexError, TypeError, ValueError):
+            return float(THINK_PARALLEL_DEFAULT_STEP_SECONDS)
+
+    priorities: List[Optional[float]] = [None] * total
+    # 依赖索引约定 from < to 时逆序遍历即为拓扑逆序；不满足时用迭代 DFS 兜底。
+    for start in range(total - 1, -1, -1):
+        if priorities[start] is not None:
+            continue
+        stack: List[Tuple[int, bool]] = [(start, False)]
+        visiting: Set[int] = set()
+        while stack:
+            idx, expanded = stack.pop()
+            if priorities[idx] is not None:
+                continue
+            if expanded:
+                visiting.discard(idx)
+                tail = [priorities[j] for j in successors[idx] if priorities[j] is not None]
+                priorities[idx] = _cost(idx) + (max(tail) if tail else 0.0)
+                continue
+            if idx in visiting:
+                continue
+            visiting.add(idx)
+            stack.append((idx, True))
+            for j in successors[idx]:
+                if priorities[j] is None and j not in visiting:
+                    stack.append((j, False))
+    return [float(p or 0.0) for p in priorities]
+
+
+def executor_can_take_step(role: str, allow: List[str]) -> bool:
+    """
+    判断某 executor 角色能否承接该步骤（跨角色窃取的兼容性校验）。
+
+    规则：
+    - user_prompt 步骤永不窃取（需要全局栅栏保证先收尾再等待用户）；
+    - allow 为空（未限制）时不窃取，避免把“任意动作”步骤交给能力受限的角色；
+    - allow 必须全部落在角色支持的 action 类型集合内。
+    """
+    allow_set = {str(a or "").strip() for a in (allow or []) if str(a or "").strip()}
+    if not allow_set or ACTION_TYPE_USER_PROMPT in allow_set:
+        return False
+    supported = THINK_EXECUTOR_ROLE_ACTION_TYPES.get(str(role or "").strip())
+    if not supported:
+        return False
+    return allow_set.issubset(set(supported))
+
+
+def record_executor_reassignment(
+    agent_state: Dict,
+    *,
+    step_order: int,
+    executor: str,
+    from_executor: str,
+    allow: List[str],
+) -> None:
+    """
+    把跨角色窃取结果写回 agent_state.executor_assignments（resume 时据此复现同一分配）。
+    """
+    if not isinstance(agent_state, dict):
+        return
+    assignments = agent_state.get("executor_assignments")
+    if not isinstance(assignments, list):
+        assignments = []
+        agent_state["executor_assignments"] = assignments
+    for item in assignments:
+        if isinstance(item, dict) and int(item.get("step_order") or 0) == int(step_order):
+            item["executor"] = str(executor)
+            item["stolen_from"] = str(from_executor)
+            item["allow"] = list(allow or [])
+            return
+    assignments.append(
+        {
+            "step_order": int(step_order),
+            "executor": str(executor),
+            "allow": list(allow or []),
+            "stolen_from": str(from_executor),
+        }
+    )
+
+
+def resolve_recorded_reassignments(
+    agent_state: Dict,
+    plan_allows: List[List[str]],
+) -> Dict[int, str]:
+    """
+    读取 executor_assignments 中已记录的窃取结果，返回 {step_index: executor}。
+
+    仅当记录的 allow 与当前计划一致时才复用，避免反思插入步骤后 step_order 漂移导致错配。
+    """
+    resolved: Dict[int, str] = {}
+    assignments = agent_state.get("executor_assignments") if isinstance(agent_state, dict) else None
+    if not isinstance(assignments, list):
+        return resolved
+    for item in assignments:
+        if not isinstance(item, dict) or not str(item.get("stolen_from") or "").strip():
+            continue
+        try:
+            idx = int(item.get("step_order") or 0) - 1
+        except (TypeError, ValueError):
+            continue
+        if not (0 <= idx < len(plan_allows or [])):
+            continue
+        if list(item.get("allow") or []) != list(plan_allows[idx] or []):
+            continue
+        executor = str(item.get("executor") or "").strip()
+        if executor:
+            resolved[idx] = executor
+    return resolved
+
+
 @dataclass
 class ExecutorContext:
     """Executor 执行上下文。"""
@@ -32,6 +32,7 @@ from backend.src.services.agent_review.review_snapshot import (
 from backend.src.services.llm.llm_client import call_openai, sse_json
 from backend.src.services.skills.skills_publish import publish_skill_file
 from backend.src.services.skills.skills_upsert import upsert_skill_from_agent_payload
+from backend.src.services.tasks.run_artifacts import list_run_artifacts
 from backend.src.services.tasks.task_queries import (
     get_task,
     get_task_run,
@@ -124,6 +125,7 @@ async def agent_evaluate_stream(payload: AgentEvaluateStreamRequest):
             artifacts_check_workdir, artifacts_check_items, missing_artifacts = build_artifacts_check(
                 plan_artifacts=plan_artifacts,
                 state_obj=state_obj if isinstance(state_obj, dict) else None,
+                run_artifacts=list_run_artifacts(task_id=task_id, run_id=run_id) if plan_artifacts else None,
             )
             run_meta = build_run_meta(
                 run_id=run_id,
@@ -30,14 +30,18 @@ def list_agent_reviews(
     limit: int = DEFAULT_PAGE_LIMIT,
     task_id: Optional[int] = None,
     run_id: Optional[int] = None,
+    cursor: Optional[int] = None,
 ):
     """
     评估记录列表（Eval Agent 输出）。
+
+    分页：优先使用 keyset 游标（cursor=上一页返回的 next_cursor），offset 仅为兼容旧调用保留。
     """
     offset = clamp_non_negative_int(offset, default=DEFAULT_PAGE_OFFSET)
     limit = clamp_page_limit(limit, default=DEFAULT_PAGE_LIMIT)
+    before_id = parse_positive_int(cursor, default=None)
 
-    rows = repo_list_agent_reviews(offset=offset, limit=limit, task_id=task_id, run_id=run_id)
+    rows = repo_list_agent_reviews(offset=offset, limit=limit, task_id=task_id, run_id=run_id, before_id=before_id)
     items = []
     for row in rows:
         items.append(
@@ -51,7 +55,8 @@ def list_agent_reviews(
                 "created_at": row["created_at"],
             }
         )
-    return {"items": items}
+    next_cursor = items[-1]["id"] if len(items) >= limit else None
+    return {"items": items, "next_cursor": next_cursor}
 
 
 @router.get("/agent/reviews/{review_id}")
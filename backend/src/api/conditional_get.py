@@ -0,0 +1,126 @@
+"""
+高频轮询接口的条件请求（ETag / If-None-Match -> 304）。
+
+说明：
+- ETag 由资源族版本号（common.resource_versions，写库提交时递增）+ 查询参数生成，
+  命中 If-None-Match 时直接返回 304，不进入路由、不查询业务表；
+- ETag 在调用路由之前计算：处理期间发生的写入会让下一次轮询拿到新版本，不会把旧数据“钉住”；
+- 多进程部署（AGENT_COORDINATION_BACKEND != local）时，其他进程的写入不会递增本进程版本号，
+  因此额外拼接数据库/WAL 文件的 (mtime, size) 作为外部写入标记。
+- 实现为纯 ASGI 中间件，路由函数本身保持不变（仍可被直接调用/测试）。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+from typing import Dict, Optional, Sequence, Tuple
+
+from backend.src.common.resource_versions import (
+    RESOURCE_FAMILY_MEMORY,
+    RESOURCE_FAMILY_RECORDS,
+    RESOURCE_FAMILY_REVIEWS,
+    RESOURCE_FAMILY_RUNS,
+    RESOURCE_FAMILY_TASKS,
+    resource_etag,
+)
+from backend.src.constants import AGENT_COORDINATION_BACKEND, AGENT_HTTP_ETAG_ENABLED
+from backend.src.storage import resolve_db_path
+
+POLLING_RESOURCE_FAMILIES: Dict[str, Tuple[str, ...]] = {
+    "/api/agent/runs/current": (RESOURCE_FAMILY_RUNS,),
+    "/api/tasks/summary": (RESOURCE_FAMILY_TASKS,),
+    "/api/records/recent": (RESOURCE_FAMILY_RECORDS,),
+    "/api/memory/summary": (RESOURCE_FAMILY_MEMORY,),
+    "/api/memory/items": (RESOURCE_FAMILY_MEMORY,),
+    "/api/agent/reviews": (RESOURCE_FAMILY_REVIEWS,),
+}
+
+
+def _external_write_token() -> Optional[str]:
+    if AGENT_COORDINATION_BACKEND == "local":
+        return None
+    db_path = resolve_db_path()
+    parts = []
+    for path in (db_path, f"{db_path}-wal"):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            parts.append("0")
+            continue
+        parts.append(f"{stat.st_mtime_ns:x}:{stat.st_size:x}")
+    return hashlib.sha1("|".join(parts).encode("ascii")).hexdigest()[:10]
+
+
+def polling_etag(families: Sequence[str], *, query_string: bytes = b"") -> str:
+    extras = []
+    if query_string:
+        extras.append(hashlib.sha1(bytes(query_string)).hexdigest()[:10])
+    external = _external_write_token()
+    if external:
+        extras.append(external)
+    return resource_etag(families, extra="-".join(extras) or None)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match 弱比较（忽略 W/ 前缀，支持逗号分隔多个值与 *）。"""
+    text = str(if_none_match or "").strip()
+    if not text:
+        return False
+    if text == "*":
+        return True
+    target = etag[2:] if etag.startswith("W/") else etag
+    for candidate in text.split(","):
+        value = candidate.strip()
+        if value.startswith("W/"):
+            value = value[2:]
+        if value == target:
+            return True
+    return False
+
+
+class ConditionalPollingMiddleware:
+    """纯 ASGI 中间件：对 POLLING_RESOURCE_FAMILIES 中的 GET 接口附加 ETag，并处理 304。"""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if not AGENT_HTTP_ETAG_ENABLED or scope.get("type") != "http" or scope.get("method") not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+        families = POLLING_RESOURCE_FAMILIES.get(str(scope.get("path") or ""))
+        if not families:
+            await self.app(scope, receive, send)
+            return
+
+        etag = polling_etag(families, query_string=scope.get("query_string") or b"")
+        etag_header = etag.encode("latin-1")
+        if_none_match = None
+        for key, value in scope.get("headers") or []:
+            if key == b"if-none-match":
+                if_none_match = value.decode("latin-1")
+                break
+        if etag_matches(if_none_match, etag):
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": 304,
+                    "headers": [(b"etag", etag_header), (b"cache-control", b"no-cache")],
+                }
+            )
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        async def _send_with_etag(message):
+            if message.get("type") == "http.response.start" and int(message.get("status") or 0) == 200:
+                headers = [
+                    (key, value)
+                    for key, value in (message.get("headers") or [])
+                    if key.lower() not in (b"etag", b"cache-control")
+                ]
+                headers.extend([(b"etag", etag_header), (b"cache-control", b"no-cache")])
+                message = dict(message, headers=headers)
+            await send(message)
+
+        await self.app(scope, receive, _send_with_etag)
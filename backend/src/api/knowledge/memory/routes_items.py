@@ -1,4 +1,5 @@
 import asyncio
+from typing import Optional
 
 from fastapi import APIRouter
 
@@ -8,6 +9,7 @@ from backend.src.api.utils import (
     clamp_non_negative_int,
     clamp_page_limit,
     error_response,
+    parse_positive_int,
     require_write_permission,
 )
 from backend.src.constants import (
@@ -64,12 +66,17 @@ async def sync_memory() -> dict:
 
 @router.get("/memory/items")
 def list_memory_items(
-    offset: int = DEFAULT_PAGE_OFFSET, limit: int = DEFAULT_PAGE_LIMIT
+    offset: int = DEFAULT_PAGE_OFFSET, limit: int = DEFAULT_PAGE_LIMIT, cursor: Optional[int] = None
 ) -> dict:
+    """
+    分页：优先使用 keyset 游标（cursor=上一页返回的 next_cursor），offset 仅为兼容旧调用保留。
+    """
     offset = clamp_non_negative_int(offset, default=DEFAULT_PAGE_OFFSET)
     limit = clamp_page_limit(limit, default=DEFAULT_PAGE_LIMIT)
-    rows = list_memory_items_repo(offset=offset, limit=limit)
-    return {"items": [memory_from_row(row) for row in rows]}
+    rows = list_memory_items_repo(offset=offset, limit=limit, after_id=parse_positive_int(cursor, default=None))
+    items = [memory_from_row(row) for row in rows]
+    next_cursor = int(rows[-1]["id"]) if len(rows) >= limit else None
+    return {"items": items, "next_cursor": next_cursor}
 
 
 @router.get("/memory/items/{item_id}")
@@ -1,4 +1,5 @@
-from typing import List, Optional
+import base64
+from typing import Any, List, Optional, Tuple
 
 from fastapi import APIRouter
 
@@ -14,11 +15,32 @@ from backend.src.constants import (
     DEFAULT_PAGE_OFFSET,
     STREAM_RESULT_PREVIEW_MAX_CHARS,
 )
+from backend.src.repositories.llm_blobs_repo import llm_text_sql_expr, resolve_llm_text_markers
 from backend.src.storage import get_connection
 
 router = APIRouter()
 
 
+def _encode_cursor(row) -> str:
+    raw = f"{row['timestamp'] or ''}|{row['event_type']}|{int(row['event_id'])}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: Optional[str]) -> Optional[Tuple[str, str, int]]:
+    """
+    游标 = (timestamp, event_type, event_id) 的 base64url；非法游标按“无游标”处理。
+    """
+    text = str(cursor or "").strip()
+    if not text:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(text + "=" * (-len(text) % 4)).decode("utf-8")
+        timestamp, event_type, event_id = raw.rsplit("|", 2)
+        return timestamp, event_type, int(event_id)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
 def _truncate_preview(text: str, max_chars: int = STREAM_RESULT_PREVIEW_MAX_CHARS) -> str:
     return truncate_text(text, max_chars)
 
@@ -29,6 +51,7 @@ def list_recent_records(
     offset: int = DEFAULT_PAGE_OFFSET,
     task_id: Optional[int] = None,
     run_id: Optional[int] = None,
+    cursor: Optional[str] = None,
 ) -> dict:
     """
     最近动态（跨任务聚合）。
@@ -36,6 +59,7 @@ def list_recent_records(
     说明：
     - 用于前端主面板 Dashboard 展示“日志/动态”，让用户随时看到 Agent/系统做了什么。
     - 数据来源于现有表（run/step/output/llm/tool/memory/skill/agent_review），不引入额外日志系统。
+    - 分页：优先使用 keyset 游标（cursor=上一页返回的 next_cursor），offset 仅为兼容旧调用保留。
     """
     offset = clamp_non_negative_int(offset, default=DEFAULT_PAGE_OFFSET)
     limit = clamp_page_limit(limit, default=DEFAULT_PAGE_LIMIT, max_value=DEFAULT_PAGE_LIMIT)
@@ -50,8 +74,9 @@ def list_recent_records(
             return f"WHERE {task_field} = ?", [task_id_value]
         return "", []
 
+    keyset = _decode_cursor(cursor)
     segments: List[str] = []
-    params: List[int] = []
+    params: List[Any] = []
 
     # run
     where, where_params = _where(run_field="r.id", task_field="r.task_id")
@@ -117,9 +142,10 @@ def list_recent_records(
     params.extend(where_params)
 
     # llm：把 prompt 放到 title，便于前端“最近动态”展示 prompt 预览
+    # 说明：存入 blob 的 prompt/response 先返回引用标记，分页后只解析当前页
     where, where_params = _where(run_field="l.run_id", task_field="l.task_id")
     segments.append(
-        """
+        f"""
         SELECT
             'llm' AS event_type,
             l.id AS event_id,
@@ -127,10 +153,10 @@ def list_recent_records(
             l.task_id AS task_id,
             l.run_id AS run_id,
             NULL AS ref_id,
-            l.prompt AS title,
+            {llm_text_sql_expr("l", "prompt")} AS title,
             l.status AS status,
             l.model AS summary,
-            l.response AS detail
+            {llm_text_sql_expr("l", "response")} AS detail
         FROM llm_records l
         """
         + where
@@ -225,12 +251,22 @@ def list_recent_records(
     )
     params.extend(where_params)
 
+    keyset_where = ""
+    if keyset is not None:
+        timestamp_value, event_type_value, event_id_value = keyset
+        keyset_where = (
+            "WHERE IFNULL(timestamp, '') < ? OR (IFNULL(timestamp, '') = ? "
+            "AND (event_type < ? OR (event_type = ? AND event_id < ?)))\n"
+        )
+        params.extend([timestamp_value, timestamp_value, event_type_value, event_type_value, event_id_value])
+        offset = 0
     query = (
         "SELECT event_type, event_id, timestamp, task_id, run_id, ref_id, title, status, summary, detail\n"
         "FROM (\n"
         + "\nUNION ALL\n".join(segments)
         + "\n)\n"
-        "ORDER BY timestamp DESC\n"
+        + keyset_where
+        + "ORDER BY IFNULL(timestamp, '') DESC, event_type DESC, event_id DESC\n"
         "LIMIT ? OFFSET ?"
     )
     params.extend([limit, offset])
@@ -249,8 +285,11 @@ def list_recent_records(
                 ).fetchall()
                 task_titles = {int(r["id"]): str(r["title"] or "") for r in task_rows}
 
+        titles = resolve_llm_text_markers([r["title"] for r in rows], conn=conn)
+        details = resolve_llm_text_markers([r["detail"] for r in rows], conn=conn)
+
     items = []
-    for row in rows:
+    for row, title, detail in zip(rows, titles, details):
         task_id = row["task_id"]
         task_title = task_titles.get(int(task_id)) if task_id is not None else None
         items.append(
@@ -262,10 +301,11 @@ def list_recent_records(
                 "task_title": task_title,
                 "run_id": int(row["run_id"]) if row["run_id"] is not None else None,
                 "ref_id": int(row["ref_id"]) if row["ref_id"] is not None else None,
-                "title": _truncate_preview(str(row["title"] or "")),
+                "title": _truncate_preview(str(title or "")),
                 "status": _truncate_preview(str(row["status"] or ""), 80),
                 "summary": _truncate_preview(str(row["summary"] or "")),
-                "detail": _truncate_preview(str(row["detail"] or "")),
+                "detail": _truncate_preview(str(detail or "")),
             }
         )
-    return {"items": items}
+    next_cursor = _encode_cursor(rows[-1]) if len(rows) >= limit else None
+    return {"items": items, "next_cursor": next_cursor}
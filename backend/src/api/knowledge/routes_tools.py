@@ -29,6 +29,7 @@ from backend.src.services.tools.tools_query import list_tool_versions as list_to
 from backend.src.services.tools.tools_query import list_tools as list_tools_repo
 from backend.src.services.tools.tools_query import tool_exists
 from backend.src.services.tools.tools_query import update_tool as update_tool_repo
+from backend.src.services.tools.tool_registry_cache import refresh_compiled_tools_after_commit
 from backend.src.services.tools.tools_store import publish_tool_file, sync_tools_from_files
 from backend.src.storage import get_connection
 
@@ -83,6 +84,7 @@ def create_tool(payload: ToolCreate) -> dict:
         )
         publish = _publish_tool_file_or_raise(int(tool_id), conn=conn)
         row = get_tool_repo(tool_id=tool_id, conn=conn)
+    refresh_compiled_tools_after_commit([int(tool_id)])
     return {"tool": tool_from_row(row), "file": publish}
 
 
@@ -130,6 +132,7 @@ def update_tool(tool_id: int, payload: ToolUpdate) -> dict:
             return _tool_not_found_response()
         publish = _publish_tool_file_or_raise(int(tool_id), conn=conn)
         latest = get_tool_repo(tool_id=int(tool_id), conn=conn)
+    refresh_compiled_tools_after_commit([int(tool_id)])
     return {"tool": tool_from_row(latest or row), "file": publish}
 
 
@@ -17,6 +17,8 @@ from backend.src.api.system.routes_config import router as config_router
 from backend.src.api.system.routes_expectations import router as expectations_router
 from backend.src.api.system.routes_maintenance import router as maintenance_router
 from backend.src.api.system.routes_metrics import router as metrics_router
+from backend.src.api.system.routes_sources import router as sources_router
+from backend.src.api.system.routes_state_stream import router as state_stream_router
 from backend.src.api.system.routes_update import router as update_router
 from backend.src.api.tasks.routes_tasks import router as tasks_router
 
@@ -33,6 +35,8 @@ router.include_router(expectations_router)
 router.include_router(memory_router)
 router.include_router(maintenance_router)
 router.include_router(metrics_router)
+router.include_router(sources_router)
+router.include_router(state_stream_router)
 router.include_router(records_router)
 router.include_router(config_router)
 router.include_router(update_router)
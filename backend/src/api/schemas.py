@@ -404,6 +404,16 @@ class MaintenanceKnowledgeDedupeSkillsRequest(BaseModel):
     reason: Optional[str] = None
 
 
+class MaintenanceLlmRecordsCompactRequest(BaseModel):
+    """
+    llm_records 压缩迁移：把历史内联的 prompt/response 转存到内容寻址 blob。
+    """
+
+    batch_size: Optional[int] = None
+    max_rows: Optional[int] = None
+    vacuum: Optional[bool] = None
+
+
 class CleanupJobCreate(BaseModel):
     name: str
     mode: Optional[str] = None
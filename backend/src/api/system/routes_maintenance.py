@@ -15,6 +15,7 @@ from backend.src.api.schemas import (
     MaintenanceKnowledgeRollbackVersionRequest,
     MaintenanceKnowledgeValidateTagsRequest,
     MaintenanceKnowledgeDedupeSkillsRequest,
+    MaintenanceLlmRecordsCompactRequest,
 )
 from backend.src.api.utils import clamp_page_limit, error_response, now_iso, require_write_permission
 from backend.src.common.sql import in_clause_placeholders
@@ -31,7 +32,10 @@ from backend.src.constants import (
     ERROR_CODE_INVALID_REQUEST,
     HTTP_STATUS_BAD_REQUEST,
 )
+from backend.src.repositories.llm_blobs_repo import prune_orphan_llm_blobs
+from backend.src.repositories.run_summaries_repo import collect_summary_run_ids, refresh_run_summaries
 from backend.src.storage import get_connection
+from backend.src.services.llm.llm_blob_compaction import compact_llm_records
 from backend.src.services.tasks.task_recovery import stop_running_task_records
 from backend.src.services.knowledge.knowledge_governance import (
     auto_deprecate_low_quality_knowledge,
@@ -297,6 +301,24 @@ def maintenance_knowledge_dedupe_skills(payload: MaintenanceKnowledgeDedupeSkill
     )
 
 
+@router.post("/maintenance/llm-records/compact")
+@require_write_permission
+def maintenance_llm_records_compact(payload: MaintenanceLlmRecordsCompactRequest) -> dict:
+    """
+    把历史内联的 llm_records prompt/response 迁移到内容寻址 blob 存储，并报告回收的空间。
+    """
+    batch_size, error = _resolve_positive_int(payload.batch_size, default=200, field_name="batch_size")
+    if error:
+        return error
+    max_rows = _payload_int(payload.max_rows, default=0)
+    result = compact_llm_records(
+        batch_size=batch_size,
+        max_rows=max_rows if max_rows > 0 else None,
+        vacuum=_payload_bool(payload.vacuum, default=False),
+    )
+    return {"result": result}
+
+
 def _ensure_interval_column() -> None:
     with get_connection() as conn:
         columns = [
@@ -328,6 +350,10 @@ def _ensure_archive_table(table_name: str) -> None:
         ]
         if "archived_at" not in columns:
             conn.execute(f"ALTER TABLE {archive_table} ADD COLUMN archived_at TEXT")
+        # 源表后续新增的列（如 llm_records.prompt_ref）同步到归档表，否则 INSERT ... SELECT 列不匹配
+        for row in conn.execute(f"PRAGMA table_info({table_name})").fetchall():
+            if row["name"] not in columns:
+                conn.execute(f"ALTER TABLE {archive_table} ADD COLUMN {row['name']} {row['type'] or ''}".rstrip())
 
 
 def _fetch_ids(
@@ -362,6 +388,7 @@ def _archive_rows(
         if not placeholders:
             return 0, archive_table
         column_list = ", ".join(columns)
+        summary_run_ids = collect_summary_run_ids(table_name=table_name, ids=ids, conn=conn)
         conn.execute(
             f"INSERT INTO {archive_table} ({column_list}, archived_at) "
             f"SELECT {column_list}, ? FROM {table_name} WHERE id IN ({placeholders})",
@@ -371,6 +398,7 @@ def _archive_rows(
             f"DELETE FROM {table_name} WHERE id IN ({placeholders})",
             ids,
         )
+        refresh_run_summaries(run_ids=summary_run_ids, conn=conn)
     return len(ids), archive_table
 
 
@@ -381,10 +409,16 @@ def _delete_rows(table_name: str, ids: List[int]) -> int:
     if not placeholders:
         return 0
     with get_connection() as conn:
+        summary_run_ids = collect_summary_run_ids(table_name=table_name, ids=ids, conn=conn)
         conn.execute(
             f"DELETE FROM {table_name} WHERE id IN ({placeholders})",
             ids,
         )
+        # 清理 task_runs/task_steps/llm_records 会改变 run 汇总：同事务刷新预计算结果
+        refresh_run_summaries(run_ids=summary_run_ids, conn=conn)
+        if table_name == "llm_records":
+            # 删除记录后回收不再被引用的 prompt/response blob
+            prune_orphan_llm_blobs(conn=conn)
     return len(ids)
 
 
@@ -1,6 +1,10 @@
+from typing import Optional
+
 from fastapi import APIRouter
 
+from backend.src.api.utils import require_write_permission
 from backend.src.services.metrics.agent_metrics import compute_agent_metrics
+from backend.src.services.metrics.run_summaries import backfill_run_summaries
 
 router = APIRouter()
 
@@ -12,3 +16,11 @@ def metrics_agent(since_days: int = 30) -> dict:
     """
     return compute_agent_metrics(since_days=since_days)
 
+
+@router.post("/metrics/agent/backfill-run-summaries")
+@require_write_permission
+def metrics_agent_backfill_run_summaries(batch_size: int = 200, max_runs: Optional[int] = None) -> dict:
+    """
+    为历史 agent run 补齐预计算汇总（run_summaries / run_daily_rollups），可重复执行。
+    """
+    return backfill_run_summaries(batch_size=batch_size, max_runs=max_runs)
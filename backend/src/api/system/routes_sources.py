@@ -0,0 +1,53 @@
+from fastapi import APIRouter
+
+from backend.src.api.utils import clamp_non_negative_int, clamp_page_limit, error_response, require_write_permission
+from backend.src.constants import (
+    DEFAULT_PAGE_LIMIT,
+    DEFAULT_PAGE_OFFSET,
+    ERROR_CODE_NOT_FOUND,
+    ERROR_MESSAGE_SOURCE_REPUTATION_NOT_FOUND,
+    HTTP_STATUS_NOT_FOUND,
+)
+from backend.src.services.search.source_reputation import (
+    get_source_reputation,
+    list_source_reputations,
+    reset_source_reputation,
+)
+
+router = APIRouter()
+
+
+@router.get("/sources/reputation")
+def list_sources_reputation(offset: int = DEFAULT_PAGE_OFFSET, limit: int = DEFAULT_PAGE_LIMIT) -> dict:
+    """
+    web_fetch/http_request 来源信誉（按 host，最近更新在前）：成功率、延迟 EWMA、最近错误与冷却剩余时间。
+    """
+    offset = clamp_non_negative_int(offset, default=DEFAULT_PAGE_OFFSET)
+    limit = clamp_page_limit(limit, default=DEFAULT_PAGE_LIMIT)
+    return {"items": list_source_reputations(offset=offset, limit=limit)}
+
+
+@router.get("/sources/reputation/{host}")
+def get_source_reputation_by_host(host: str):
+    item = get_source_reputation(host)
+    if not item:
+        return error_response(ERROR_CODE_NOT_FOUND, ERROR_MESSAGE_SOURCE_REPUTATION_NOT_FOUND, HTTP_STATUS_NOT_FOUND)
+    return {"reputation": item}
+
+
+@router.delete("/sources/reputation/{host}")
+@require_write_permission
+def reset_source_reputation_by_host(host: str):
+    """
+    重置单个 host 的信誉（清除冷却与统计，下次尝试重新积累）。
+    """
+    deleted = reset_source_reputation([host])
+    if not deleted:
+        return error_response(ERROR_CODE_NOT_FOUND, ERROR_MESSAGE_SOURCE_REPUTATION_NOT_FOUND, HTTP_STATUS_NOT_FOUND)
+    return {"deleted": deleted}
+
+
+@router.delete("/sources/reputation")
+@require_write_permission
+def reset_all_source_reputation() -> dict:
+    return {"deleted": reset_source_reputation()}
@@ -0,0 +1,89 @@
+import asyncio
+from typing import Optional
+
+from fastapi import APIRouter, Request
+from fastapi.responses import StreamingResponse
+
+from backend.src.api.agent.routes_agent_reviews import list_agent_reviews
+from backend.src.api.agent.routes_agent_runs import get_current_agent_run
+from backend.src.api.knowledge.memory.routes_items import memory_summary
+from backend.src.api.knowledge.records.routes_recent_records import list_recent_records
+from backend.src.api.tasks.routes_tasks_core import tasks_summary
+from backend.src.constants import AGENT_STATE_CHANNEL_KEEPALIVE_SECONDS, DEFAULT_PAGE_LIMIT
+from backend.src.services.system.state_channel import (
+    STATE_TOPIC_MEMORY,
+    STATE_TOPIC_RECORDS,
+    STATE_TOPIC_REVIEWS,
+    STATE_TOPIC_RUNS,
+    STATE_TOPIC_TASKS,
+    format_state_sse,
+    get_state_channel,
+    parse_state_topics,
+)
+
+router = APIRouter()
+
+# 与世界页思考轨迹回源拉取的条数一致（records/recent 上限 DEFAULT_PAGE_LIMIT）：通道快照可直接替代该次拉取
+_STATE_RECENT_RECORDS_LIMIT = DEFAULT_PAGE_LIMIT
+_STATE_REVIEWS_LIMIT = 5
+
+
+def _register_state_snapshots() -> None:
+    # 快照与对应轮询接口返回结构一致：前端可直接复用原有渲染逻辑
+    channel = get_state_channel()
+    channel.register_snapshot(STATE_TOPIC_RUNS, get_current_agent_run)
+    channel.register_snapshot(STATE_TOPIC_TASKS, tasks_summary)
+    channel.register_snapshot(STATE_TOPIC_RECORDS, lambda: list_recent_records(limit=_STATE_RECENT_RECORDS_LIMIT))
+    channel.register_snapshot(STATE_TOPIC_REVIEWS, lambda: list_agent_reviews(limit=_STATE_REVIEWS_LIMIT))
+    channel.register_snapshot(STATE_TOPIC_MEMORY, memory_summary)
+
+
+_register_state_snapshots()
+
+
+@router.get("/state/stream")
+async def state_stream(request: Request, topics: Optional[str] = None, last_event_id: Optional[str] = None):
+    """
+    多路复用状态推送（SSE）：替代 runs/current、tasks/summary、records/recent、memory/summary、agent/reviews 轮询。
+
+    说明：
+    - topics：逗号分隔（runs,tasks,records,reviews,memory），缺省订阅全部；
+    - 断线续传：EventSource 自动携带 Last-Event-ID（或 last_event_id 查询参数），
+      缓冲内的缺失事件会补发；无法续传时先发 reset 事件，再为每个主题发送一次完整快照；
+    - 事件 data 中 type=snapshot 为完整数据，type=run_status 为 run 状态即时变更。
+    """
+    channel = get_state_channel()
+    topic_set = parse_state_topics(topics)
+    resume_id = request.headers.get("last-event-id") or last_event_id
+
+    async def gen():
+        sub = channel.subscribe(topic_set)
+        try:
+            yield "retry: 3000\n\n"
+            cursor = channel.parse_event_id(resume_id) if resume_id else None
+            while True:
+                events, reset, head = channel.events_after(cursor, topic_set)
+                if reset:
+                    if cursor is not None or resume_id:
+                        yield f"id: {channel.format_event_id(head)}\nevent: reset\ndata: {{}}\n\n"
+                    for topic in sorted(topic_set):
+                        snapshot = await asyncio.to_thread(channel.build_snapshot, topic)
+                        if snapshot is not None:
+                            yield format_state_sse(channel, (head, topic, snapshot))
+                for event in events:
+                    yield format_state_sse(channel, event)
+                cursor = head
+                if await request.is_disconnected():
+                    break
+                if not await sub.wait(float(AGENT_STATE_CHANNEL_KEEPALIVE_SECONDS)):
+                    yield ": keepalive\n\n"
+        finally:
+            channel.unsubscribe(sub)
+
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return StreamingResponse(gen(), media_type="text/event-stream", headers=headers)
+
+
+@router.get("/state/stream/stats")
+def state_stream_stats() -> dict:
+    return {"stats": get_state_channel().snapshot_stats()}
@@ -19,6 +19,7 @@ from backend.src.constants import (
     RUN_STATUS_WAITING,
     STATUS_QUEUED,
 )
+from backend.src.services.system.startup_sync import get_startup_sync_status
 from backend.src.services.tasks.task_queries import count_tasks
 from backend.src.services.tasks.task_queries import create_task as create_task_record
 from backend.src.services.tasks.task_queries import fetch_current_task_title_by_run_statuses
@@ -31,7 +32,12 @@ router = APIRouter()
 
 @router.get("/health")
 def health() -> dict:
-    return {"status": HEALTH_STATUS_OK}
+    # startup_sync：后台启动同步模式下，前端可据此判断知识库是否已就绪
+    status = get_startup_sync_status()
+    return {
+        "status": HEALTH_STATUS_OK,
+        "startup_sync": {"state": status.get("state"), "elapsed_ms": status.get("elapsed_ms")},
+    }
 
 
 @router.get("/tasks/summary")
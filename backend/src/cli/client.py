@@ -170,6 +170,45 @@ class ApiClient:
     def delete(self, path: str) -> Dict[str, Any]:
         return self._request("DELETE", path)
 
+    def stream_get(
+        self,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Iterator[SseEvent]:
+        """
+        发送 GET 请求并返回 SSE 事件流迭代器（用于 /state/stream 等长连接推送）。
+        """
+        url = f"{self._base_url}{path}"
+        request_headers = {"Accept": "text/event-stream"}
+        request_headers.update(headers or {})
+        try:
+            timeout = httpx.Timeout(connect=self._timeout, read=None, write=30.0, pool=None)
+            with self._make_client(timeout=timeout) as client:
+                with client.stream("GET", url, params=params, headers=request_headers) as response:
+                    if response.status_code >= 400:
+                        response.read()
+                        msg = _extract_error_message(response)
+                        raise CliError(
+                            f"HTTP {response.status_code}: {msg}", exit_code=1
+                        )
+                    yield from iter_sse_stream(response.iter_text())
+        except CliError:
+            raise
+        except httpx.ConnectError:
+            raise CliError(
+                f"无法连接到后端服务 ({self._base_url})。\n"
+                "请确认后端已启动，可执行: python scripts/start.py",
+                exit_code=2,
+            )
+        except httpx.RequestError as exc:
+            raise CliError(f"流式请求失败: {exc}", exit_code=1)
+        except ModuleNotFoundError:
+            raise CliError(
+                "缺少依赖 httpx，请先运行: python scripts/install.py",
+                exit_code=2,
+            )
+
     def stream_post(
         self,
         path: str,
@@ -4,11 +4,13 @@
 from __future__ import annotations
 
 import json
+import time
 from dataclasses import dataclass, field
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterator, Optional, Sequence
 
 from backend.src.cli.commands.stream_render import RenderOutcome, render_stream_event
 from backend.src.cli.output import print_sse_status
+from backend.src.cli.client import CliError
 from backend.src.cli.sse import SseEvent
 
 _TERMINAL_RUN_STATUSES = {"done", "failed", "stopped", "cancelled"}
@@ -290,3 +292,41 @@ def resolve_terminal_run_status(result: StreamSessionResult) -> str:
     if bool(getattr(result, "seen_done", False)):
         return "done"
     return ""
+
+
+def iter_state_channel(
+    *,
+    client: Any,
+    topics: Sequence[str],
+    last_event_id: Optional[str] = None,
+    max_reconnects: int = 5,
+) -> Iterator[SseEvent]:
+    """
+    订阅后端状态推送通道（/state/stream），替代对 runs/current、tasks/summary 等接口的轮询。
+
+    说明：
+    - 断线后携带 Last-Event-ID 自动重连，服务端补发缺失事件（无法续传时先发 reset 再发完整快照）；
+    - 连续重连失败超过 max_reconnects 次后抛出最后一次 CliError。
+    """
+    cursor = str(last_event_id or "").strip()
+    failures = 0
+    params = {"topics": ",".join(str(topic) for topic in topics)} if topics else None
+    while True:
+        headers = {"Last-Event-ID": cursor} if cursor else None
+        try:
+            for event in client.stream_get("/state/stream", params=params, headers=headers):
+                failures = 0
+                if event.id:
+                    cursor = event.id
+                yield event
+        except CliError:
+            failures += 1
+            if failures > int(max_reconnects):
+                raise
+            time.sleep(min(float(failures), 5.0))
+            continue
+        # 服务端正常关闭（例如重启）：按重连处理
+        failures += 1
+        if failures > int(max_reconnects):
+            return
+        time.sleep(min(float(failures), 5.0))
@@ -13,6 +13,7 @@ import click
 
 from backend.src.cli.client import CliError
 from backend.src.cli.commands.stream_session import (
+    iter_state_channel,
     resolve_terminal_run_status,
     run_stream_session,
 )
@@ -188,11 +189,22 @@ def execute(
 
 
 @task.command()
+@click.option("--watch", is_flag=True, default=False, help="订阅状态推送通道，统计变化时实时输出（Ctrl+C 退出）")
 @click.pass_context
-def summary(ctx: click.Context) -> None:
+def summary(ctx: click.Context, watch: bool) -> None:
     """任务统计"""
     client = ctx.obj["client"]
     try:
+        if watch:
+            for event in iter_state_channel(client=client, topics=["tasks"]):
+                payload = event.json_data if isinstance(event.json_data, dict) else {}
+                if payload.get("type") != "snapshot" or not isinstance(payload.get("data"), dict):
+                    continue
+                if ctx.obj["output_json"]:
+                    print_json(payload["data"])
+                else:
+                    print_summary(payload["data"], "任务统计")
+            return
         data = client.get("/tasks/summary")
         if ctx.obj["output_json"]:
             print_json(data)
@@ -201,3 +213,6 @@ def summary(ctx: click.Context) -> None:
     except CliError as exc:
         print_error(str(exc))
         sys.exit(exc.exit_code)
+    except KeyboardInterrupt:
+        console.print("\n[yellow]已中断[/yellow]")
+        sys.exit(130)
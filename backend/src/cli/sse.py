@@ -24,6 +24,7 @@ class SseEvent:
     event: str = "message"
     data: str = ""
     json_data: Optional[Dict[str, Any]] = field(default=None, repr=False)
+    id: str = ""
 
 
 def parse_event_block(raw_block: str) -> SseEvent:
@@ -34,6 +35,7 @@ def parse_event_block(raw_block: str) -> SseEvent:
         raw_block: 一个不含分隔空行的事件块原始文本
     """
     event_name = "message"
+    event_id = ""
     data_lines: list[str] = []
 
     normalized = raw_block.replace("\r", "")
@@ -43,6 +45,8 @@ def parse_event_block(raw_block: str) -> SseEvent:
             continue
         if line.startswith("event:"):
             event_name = line[6:].strip()
+        elif line.startswith("id:"):
+            event_id = line[3:].strip()
         elif line.startswith("data:"):
             payload = line[5:]
             # SSE 规范：data: 后可跟一个可选空格，只移除一个
@@ -62,7 +66,7 @@ def parse_event_block(raw_block: str) -> SseEvent:
         except (json.JSONDecodeError, ValueError):
             pass
 
-    return SseEvent(event=event_name, data=data_str, json_data=json_data)
+    return SseEvent(event=event_name, data=data_str, json_data=json_data, id=event_id)
 
 
 def iter_sse_events(text: str) -> Iterator[SseEvent]:
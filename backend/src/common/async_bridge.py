@@ -0,0 +1,147 @@
+"""
+同步代码 ↔ asyncio event loop 的桥接。
+
+两种形态：
+- AwaitRequest：同步 generator（ReAct 循环）由 stream_pump.pump_coroutine_generator 在 event loop 上逐步驱动时，
+  yield AwaitRequest 把协程交给驱动器 await，结果经 send 回到 generator（异常经 throw 抛回），
+  不需要泵线程/桥接线程；是否处于协程驱动下由 coroutine_driver_active() 判断，否则调用方走同步路径；
+- LoopBridge：仍在线程中运行的同步代码（asyncio.to_thread 执行的文件/命令 executor）把协程提交回 loop 并阻塞等待，
+  如 run_shell_command 把等待子进程交回 event loop；流结束时 close() 取消全部在途 task（子进程整组 kill），
+  之后的 run() 直接抛 concurrent.futures.CancelledError。
+
+说明：
+- current_loop_bridge() 读取 contextvar（会随 asyncio.to_thread 传入线程），由 bind_loop_bridge 或 run() 设置；
+- 不能在 event loop 线程内调用 run()（会死锁），此时 current_loop_bridge() 返回 None，调用方应走同步路径。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import contextvars
+import threading
+from typing import Any, Awaitable, Callable, Generator, Optional, Set, TypeVar
+
+T = TypeVar("T")
+
+_CURRENT_BRIDGE: "contextvars.ContextVar[Optional[LoopBridge]]" = contextvars.ContextVar(
+    "agent_loop_bridge", default=None
+)
+_COROUTINE_DRIVER_ACTIVE: "contextvars.ContextVar[bool]" = contextvars.ContextVar(
+    "agent_coroutine_driver_active", default=False
+)
+
+# AwaitRequest 设置了 poll_seconds 且到期仍未完成时，驱动器 send 回 generator 的占位值
+AWAIT_PENDING: Any = object()
+
+
+class AwaitRequest:
+    """
+    同步 generator 交给协程驱动器 await 的请求（yield 出去，由 pump_coroutine_generator 处理）。
+
+    - factory() 返回协程：首次处理时在驱动器的 context 中建 task，结果经 send 回 generator；
+    - poll_seconds > 0 时每次最多等待该时长，未完成则 send AWAIT_PENDING，
+      generator 可借机发进度事件后再次 yield 同一请求继续等待。
+    """
+
+    __slots__ = ("factory", "poll_seconds", "task")
+
+    def __init__(self, factory: Callable[[], Awaitable[Any]], *, poll_seconds: Optional[float] = None):
+        self.factory = factory
+        self.poll_seconds = poll_seconds if poll_seconds and poll_seconds > 0 else None
+        self.task: Optional[asyncio.Task] = None
+
+
+class LoopBridge:
+    """在非 loop 线程中把协程交给指定 event loop 执行；需在该 loop 的线程内创建。"""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+        self._loop_thread_id = threading.get_ident()
+        self._lock = threading.Lock()
+        self._pending: Set[concurrent.futures.Future] = set()
+        self._closed = False
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def usable_from_current_thread(self) -> bool:
+        return (
+            not self._closed
+            and not self._loop.is_closed()
+            and threading.get_ident() != self._loop_thread_id
+        )
+
+    def run(self, coro_factory: Callable[[], Awaitable[T]]) -> T:
+        """
+        在 loop 上执行 coro_factory() 返回的协程并阻塞等待结果（协程异常原样抛出）。
+
+        桥已关闭或 task 被 close() 取消时抛 concurrent.futures.CancelledError。
+        """
+        if threading.get_ident() == self._loop_thread_id:
+            raise RuntimeError("LoopBridge.run 不能在 event loop 线程内调用")
+
+        async def _scoped() -> T:
+            # task 拥有独立的 context 副本：这里设置只影响本次协程（及其 to_thread 调用）
+            _CURRENT_BRIDGE.set(self)
+            return await coro_factory()
+
+        with self._lock:
+            if self._closed:
+                raise concurrent.futures.CancelledError()
+            future = asyncio.run_coroutine_threadsafe(_scoped(), self._loop)
+            self._pending.add(future)
+        try:
+            return future.result()
+        finally:
+            with self._lock:
+                self._pending.discard(future)
+
+    def close(self) -> int:
+        """关闭桥并取消全部在途 task；返回被取消的数量。"""
+        with self._lock:
+            self._closed = True
+            pending = list(self._pending)
+        cancelled = 0
+        for future in pending:
+            if future.cancel():
+                cancelled += 1
+        return cancelled
+
+
+def current_loop_bridge() -> Optional[LoopBridge]:
+    """当前执行上下文所属的桥（仅在可从当前线程调用 run() 时返回）。"""
+    bridge = _CURRENT_BRIDGE.get()
+    if bridge is None or not bridge.usable_from_current_thread():
+        return None
+    return bridge
+
+
+def bind_loop_bridge(bridge: Optional[LoopBridge]):
+    """在当前 context 绑定 LoopBridge（之后 to_thread 进入的线程可经 current_loop_bridge 取到）。"""
+    return _CURRENT_BRIDGE.set(bridge)
+
+
+def reset_loop_bridge(token) -> None:
+    _CURRENT_BRIDGE.reset(token)
+
+
+def bind_coroutine_driver():
+    """标记当前 context 由协程驱动器逐步驱动（pump_coroutine_generator 内部使用）。"""
+    return _COROUTINE_DRIVER_ACTIVE.set(True)
+
+
+def coroutine_driver_active() -> bool:
+    """当前同步 generator 是否由协程驱动器驱动（是则可以 yield AwaitRequest）。"""
+    return bool(_COROUTINE_DRIVER_ACTIVE.get())
+
+
+def iter_blocking_call(func: Callable[[], T]) -> Generator[Any, Any, T]:
+    """
+    供同步 generator 以 yield from 调用的阻塞函数：协程驱动时经 AwaitRequest 放进 asyncio.to_thread（不卡住 event loop），
+    否则直接调用。
+    """
+    if coroutine_driver_active():
+        return (yield AwaitRequest(lambda: asyncio.to_thread(func)))
+    return func()
@@ -0,0 +1,58 @@
+"""
+内容寻址 blob 的编解码（纯函数，不涉及 DB）。
+
+说明：
+- 分段：按空行（"\\n\\n"）切分，ReAct prompt 中重复出现的规则/图谱/工具/技能/记忆段落各自成为独立 blob，
+  跨步骤、跨 run 只存一份；
+- 压缩：优先 zstd（安装了 zstandard 时），否则 zlib；压缩后不变小则原样存储；
+- codec 随 blob 存储，读取时按 codec 解码，因此运行环境切换压缩库不影响历史数据。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+import zlib
+from typing import List, Tuple
+
+try:  # 可选依赖
+    import zstandard as _zstd
+except ImportError:  # pragma: no cover - 取决于运行环境
+    _zstd = None
+
+BLOB_CODEC_RAW = "raw"
+BLOB_CODEC_ZLIB = "zlib"
+BLOB_CODEC_ZSTD = "zstd"
+
+_SECTION_SPLIT_RE = re.compile(r"(?<=\n\n)")
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(str(text).encode("utf-8")).hexdigest()
+
+
+def split_sections(text: str) -> List[str]:
+    """按空行切分（保留分隔符），拼接结果与原文完全一致。"""
+    return [part for part in _SECTION_SPLIT_RE.split(str(text or "")) if part]
+
+
+def compress_text(text: str) -> Tuple[str, bytes]:
+    raw = str(text).encode("utf-8")
+    if _zstd is not None:
+        codec, data = BLOB_CODEC_ZSTD, _zstd.ZstdCompressor(level=6).compress(raw)
+    else:
+        codec, data = BLOB_CODEC_ZLIB, zlib.compress(raw, 6)
+    if len(data) >= len(raw):
+        return BLOB_CODEC_RAW, raw
+    return codec, data
+
+
+def decompress_text(codec: str, data: bytes) -> str:
+    payload = bytes(data or b"")
+    if codec == BLOB_CODEC_ZLIB:
+        payload = zlib.decompress(payload)
+    elif codec == BLOB_CODEC_ZSTD:
+        if _zstd is None:
+            raise RuntimeError("zstandard is required to read zstd blobs")
+        payload = _zstd.ZstdDecompressor().decompress(payload)
+    return payload.decode("utf-8")
@@ -1,8 +1,13 @@
 from __future__ import annotations
 
+import math
+import os
+import random
 import re
+import threading
+from collections import OrderedDict
 from datetime import date
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 from backend.src.constants import (
     AGENT_ARTIFACT_CSV_MAX_PLACEHOLDER_RATIO,
@@ -10,6 +15,7 @@ from backend.src.constants import (
     AGENT_ARTIFACT_CSV_MIN_NUMERIC_RATIO,
     AGENT_ARTIFACT_CSV_MIN_NUMERIC_ROWS,
     AGENT_ARTIFACT_CSV_MIN_ROWS,
+    AGENT_ARTIFACT_CSV_SAMPLE_ROWS,
 )
 
 
@@ -45,85 +51,201 @@ def parse_csv_iso_date(text: str) -> Optional[date]:
         return None
 
 
-def load_csv_quality_stats_from_text(content: str) -> Dict[str, object]:
-    rows_total = 0
-    numeric_rows = 0
-    placeholder_rows = 0
-    date_values: List[date] = []
-    placeholders = ("暂无", "n/a", "na", "none", "null", "无数据", "待补充", "tbd")
+_PLACEHOLDERS = ("暂无", "n/a", "na", "none", "null", "无数据", "待补充", "tbd")
+_CELL_SPLIT_RE = re.compile(r"[,，]\s*")
+_SEPARATORS_ONLY_RE = re.compile(r"^[\s,，]*$")
+_FIRST_CELL_RE = re.compile(r"^[\s,，]*([^,，]*)")
+# 95% 置信区间（Wilson score）
+_CONFIDENCE_Z = 1.96
+_READ_BUFFER_BYTES = 1024 * 1024
+_CACHE_MAX_ENTRIES = 128
+
+_CacheKey = Tuple[str, int, int, int]
+_CACHE_LOCK = threading.Lock()
+_STATS_CACHE: "OrderedDict[_CacheKey, Dict[str, object]]" = OrderedDict()
+
+
+def _wilson_interval(hits: int, total: int) -> List[float]:
+    if total <= 0:
+        return [0.0, 0.0]
+    p = float(hits) / float(total)
+    z2 = _CONFIDENCE_Z * _CONFIDENCE_Z
+    denom = 1.0 + z2 / total
+    center = (p + z2 / (2.0 * total)) / denom
+    margin = _CONFIDENCE_Z * math.sqrt(p * (1.0 - p) / total + z2 / (4.0 * total * total)) / denom
+    return [round(max(0.0, center - margin), 4), round(min(1.0, center + margin), 4)]
+
+
+class _CsvQualityScan:
+    """
+    逐行统计 CSV 质量：行数与日期跨度全量统计（只看首个非空单元格），
+    数值/占位比例在超过 sample_rows 行后改用蓄水池抽样估计（固定种子，结果可复现）。
+    """
+
+    def __init__(self, sample_rows: int):
+        self.sample_rows = max(1, int(sample_rows))
+        self.rows_total = 0
+        self.header_seen = False
+        self.min_date: Optional[date] = None
+        self.max_date: Optional[date] = None
+        self.date_count = 0
+        self.sample: List[str] = []
+        self._rng = random.Random(0)
+
+    def feed(self, raw_line: str) -> None:
+        line = str(raw_line or "").strip()
+        if not line:
+            return
+        if not self.header_seen:
+            self.header_seen = True
+            if ("日期" in line) or ("date" in line.lower()):
+                return
+        if _SEPARATORS_ONLY_RE.match(line):
+            return
+        self.rows_total += 1
+
+        first_cell = _FIRST_CELL_RE.match(line)
+        date_candidate = parse_csv_iso_date(first_cell.group(1)) if first_cell else None
+        if date_candidate is not None:
+            self.date_count += 1
+            if self.min_date is None or date_candidate < self.min_date:
+                self.min_date = date_candidate
+            if self.max_date is None or date_candidate > self.max_date:
+                self.max_date = date_candidate
+
+        if len(self.sample) < self.sample_rows:
+            self.sample.append(line)
+            return
+        slot = self._rng.randrange(self.rows_total)
+        if slot < self.sample_rows:
+            self.sample[slot] = line
+
+    def result(self) -> Dict[str, object]:
+        if not self.header_seen:
+            return {
+                "rows_total": 0,
+                "numeric_rows": 0,
+                "placeholder_rows": 0,
+                "numeric_ratio": 0.0,
+                "placeholder_ratio": 0.0,
+                "date_span_days": 0,
+                "sampled": False,
+                "sample_rows": 0,
+                "numeric_ratio_ci": [0.0, 0.0],
+                "placeholder_ratio_ci": [0.0, 0.0],
+                "issues": ["csv_empty"],
+            }
+
+        sample_numeric = 0
+        sample_placeholder = 0
+        for line in self.sample:
+            cells = [cell.strip() for cell in _CELL_SPLIT_RE.split(line) if str(cell).strip()]
+            joined = " ".join(cells).lower()
+            if any(mark in joined for mark in _PLACEHOLDERS):
+                sample_placeholder += 1
+            candidate_cells = cells[1:] if len(cells) > 1 else cells
+            for cell in candidate_cells:
+                if parse_csv_numeric(cell) is not None:
+                    sample_numeric += 1
+                    break
+
+        rows_total = self.rows_total
+        sample_size = len(self.sample)
+        sampled = sample_size < rows_total
+        numeric_ratio = float(sample_numeric) / float(sample_size) if sample_size > 0 else 0.0
+        placeholder_ratio = float(sample_placeholder) / float(sample_size) if sample_size > 0 else 0.0
+        if sampled:
+            numeric_rows = int(round(numeric_ratio * rows_total))
+            placeholder_rows = int(round(placeholder_ratio * rows_total))
+            numeric_ci = _wilson_interval(sample_numeric, sample_size)
+            placeholder_ci = _wilson_interval(sample_placeholder, sample_size)
+        else:
+            numeric_rows = sample_numeric
+            placeholder_rows = sample_placeholder
+            numeric_ci = [round(numeric_ratio, 4)] * 2
+            placeholder_ci = [round(placeholder_ratio, 4)] * 2
+
+        span_days = 0
+        if self.date_count >= 2 and self.min_date is not None and self.max_date is not None:
+            span_days = abs((self.max_date - self.min_date).days)
+
+        issues: List[str] = []
+        if rows_total < int(AGENT_ARTIFACT_CSV_MIN_ROWS):
+            issues.append("rows_insufficient")
+        if numeric_rows < int(AGENT_ARTIFACT_CSV_MIN_NUMERIC_ROWS):
+            issues.append("numeric_rows_insufficient")
+        if numeric_ratio < float(AGENT_ARTIFACT_CSV_MIN_NUMERIC_RATIO):
+            issues.append("numeric_ratio_low")
+        if placeholder_ratio > float(AGENT_ARTIFACT_CSV_MAX_PLACEHOLDER_RATIO):
+            issues.append("placeholder_ratio_high")
+        if span_days < int(AGENT_ARTIFACT_CSV_MIN_DATE_SPAN_DAYS):
+            issues.append("date_span_too_short")
 
-    raw_lines = [str(line or "").strip() for line in str(content or "").splitlines()]
-    clean_lines = [line for line in raw_lines if line]
-    if not clean_lines:
         return {
-            "rows_total": 0,
-            "numeric_rows": 0,
-            "placeholder_rows": 0,
-            "numeric_ratio": 0.0,
-            "placeholder_ratio": 0.0,
-            "date_span_days": 0,
-            "issues": ["csv_empty"],
+            "rows_total": rows_total,
+            "numeric_rows": numeric_rows,
+            "placeholder_rows": placeholder_rows,
+            "numeric_ratio": round(numeric_ratio, 4),
+            "placeholder_ratio": round(placeholder_ratio, 4),
+            "date_span_days": span_days,
+            "sampled": sampled,
+            "sample_rows": sample_size,
+            "numeric_ratio_ci": numeric_ci,
+            "placeholder_ratio_ci": placeholder_ci,
+            "issues": issues,
         }
 
-    first_line = clean_lines[0].lower()
-    has_header = ("日期" in clean_lines[0]) or ("date" in first_line)
-    data_lines = clean_lines[1:] if has_header else clean_lines
-
-    for line in data_lines:
-        cells = [cell.strip() for cell in re.split(r"[,，]\s*", line) if str(cell).strip()]
-        if not cells:
-            continue
-        rows_total += 1
-
-        joined = " ".join(cells).lower()
-        if any(mark in joined for mark in placeholders):
-            placeholder_rows += 1
-
-        numeric_hit = False
-        candidate_cells = cells[1:] if len(cells) > 1 else cells
-        for cell in candidate_cells:
-            if parse_csv_numeric(cell) is not None:
-                numeric_hit = True
-                break
-        if numeric_hit:
-            numeric_rows += 1
-
-        date_candidate = parse_csv_iso_date(cells[0])
-        if date_candidate is not None:
-            date_values.append(date_candidate)
-
-    numeric_ratio = float(numeric_rows) / float(rows_total) if rows_total > 0 else 0.0
-    placeholder_ratio = float(placeholder_rows) / float(rows_total) if rows_total > 0 else 0.0
-    span_days = 0
-    if len(date_values) >= 2:
-        span_days = abs((max(date_values) - min(date_values)).days)
-
-    issues: List[str] = []
-    if rows_total < int(AGENT_ARTIFACT_CSV_MIN_ROWS):
-        issues.append("rows_insufficient")
-    if numeric_rows < int(AGENT_ARTIFACT_CSV_MIN_NUMERIC_ROWS):
-        issues.append("numeric_rows_insufficient")
-    if numeric_ratio < float(AGENT_ARTIFACT_CSV_MIN_NUMERIC_RATIO):
-        issues.append("numeric_ratio_low")
-    if placeholder_ratio > float(AGENT_ARTIFACT_CSV_MAX_PLACEHOLDER_RATIO):
-        issues.append("placeholder_ratio_high")
-    if span_days < int(AGENT_ARTIFACT_CSV_MIN_DATE_SPAN_DAYS):
-        issues.append("date_span_too_short")
-
-    return {
-        "rows_total": rows_total,
-        "numeric_rows": numeric_rows,
-        "placeholder_rows": placeholder_rows,
-        "numeric_ratio": round(numeric_ratio, 4),
-        "placeholder_ratio": round(placeholder_ratio, 4),
-        "date_span_days": span_days,
-        "issues": issues,
-    }
-
-
-def load_csv_quality_stats(path: str) -> Dict[str, object]:
-    with open(path, "r", encoding="utf-8", errors="ignore") as handle:
-        return load_csv_quality_stats_from_text(handle.read())
+
+def load_csv_quality_stats_from_text(content: str, *, sample_rows: Optional[int] = None) -> Dict[str, object]:
+    scan = _CsvQualityScan(sample_rows or int(AGENT_ARTIFACT_CSV_SAMPLE_ROWS))
+    for line in str(content or "").splitlines():
+        scan.feed(line)
+    return scan.result()
+
+
+def _copy_stats(stats: Dict[str, object]) -> Dict[str, object]:
+    return {key: list(value) if isinstance(value, list) else value for key, value in stats.items()}
+
+
+def load_csv_quality_stats(path: str, *, sample_rows: Optional[int] = None) -> Dict[str, object]:
+    """
+    流式统计 CSV 文件质量（按块读取，不整体载入内存）；结果按 (path, mtime, size) 缓存。
+    """
+    budget = int(sample_rows or AGENT_ARTIFACT_CSV_SAMPLE_ROWS)
+    try:
+        stat = os.stat(path)
+        key: Optional[_CacheKey] = (
+            os.path.normcase(os.path.abspath(path)),
+            int(stat.st_mtime_ns),
+            int(stat.st_size),
+            budget,
+        )
+    except OSError:
+        key = None
+    if key is not None:
+        with _CACHE_LOCK:
+            cached = _STATS_CACHE.get(key)
+            if cached is not None:
+                _STATS_CACHE.move_to_end(key)
+                return _copy_stats(cached)
+
+    scan = _CsvQualityScan(budget)
+    with open(path, "r", encoding="utf-8", errors="ignore", buffering=_READ_BUFFER_BYTES) as handle:
+        for line in handle:
+            scan.feed(line)
+    stats = scan.result()
+
+    if key is not None:
+        with _CACHE_LOCK:
+            _STATS_CACHE[key] = _copy_stats(stats)
+            while len(_STATS_CACHE) > _CACHE_MAX_ENTRIES:
+                _STATS_CACHE.popitem(last=False)
+    return stats
+
+
+def clear_csv_quality_cache() -> None:
+    with _CACHE_LOCK:
+        _STATS_CACHE.clear()
 
 
 def build_csv_quality_failure_text(path: str, stats: Dict[str, object]) -> str:
@@ -0,0 +1,248 @@
+"""
+目录列举引擎（os.scandir）：gitignore 风格排除、深度/条数上限（提前停止）、按修改时间排序。
+
+说明：
+- 被排除的目录直接剪枝，不再进入（node_modules/.venv 等不会被遍历）；
+- 按名称排序时，每层目录内按名称排序后深度优先遍历，达到 max_entries 即停止；
+- 按 mtime 排序需要看完候选才能取最新的 N 个：遍历仍受 scan_limit 约束，超出时标记 truncated；
+- 结果带上遍历过的目录及其 mtime，供缓存校验（目录内增删条目会改变目录 mtime）。
+"""
+
+from __future__ import annotations
+
+import heapq
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+SORT_NAME = "name"
+SORT_MTIME = "mtime"
+
+
+@dataclass(frozen=True)
+class _IgnoreRule:
+    regex: "re.Pattern[str]"
+    negate: bool
+    dir_only: bool
+    anchored: bool
+
+
+def _translate_glob(pattern: str) -> str:
+    out: List[str] = []
+    i = 0
+    n = len(pattern)
+    while i < n:
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("/**", i) and i + 3 == n:
+            out.append("(?:/.*)?")
+            i += 3
+        elif pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+        elif pattern[i] == "*":
+            out.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            out.append("[^/]")
+            i += 1
+        elif pattern[i] == "[":
+            end = pattern.find("]", i + 1)
+            if end < 0:
+                out.append(re.escape(pattern[i]))
+                i += 1
+                continue
+            body = pattern[i + 1 : end]
+            if body.startswith("!"):
+                body = "^" + body[1:]
+            out.append(f"[{body}]")
+            i = end + 1
+        else:
+            out.append(re.escape(pattern[i]))
+            i += 1
+    return "".join(out)
+
+
+class IgnoreRules:
+    """gitignore 风格规则（支持 * ? [] ** 、前导/锚定、结尾/仅目录、!取反；后出现的规则优先）。"""
+
+    def __init__(self, patterns: Iterable[str] = ()):
+        self._rules: List[_IgnoreRule] = []
+        for raw in patterns or ():
+            self.add(raw)
+
+    def add(self, raw: str) -> None:
+        text = str(raw or "").rstrip("\r\n")
+        if not text.strip() or text.lstrip().startswith("#"):
+            return
+        text = text.strip()
+        negate = text.startswith("!")
+        if negate:
+            text = text[1:]
+        dir_only = text.endswith("/")
+        text = text.strip("/") if dir_only else text
+        anchored = "/" in text
+        if text.startswith("/"):
+            text = text[1:]
+        if not text:
+            return
+        self._rules.append(
+            _IgnoreRule(
+                regex=re.compile("^" + _translate_glob(text) + "$"),
+                negate=negate,
+                dir_only=dir_only,
+                anchored=anchored,
+            )
+        )
+
+    def __bool__(self) -> bool:
+        return bool(self._rules)
+
+    def is_ignored(self, rel_path: str, *, is_dir: bool) -> bool:
+        name = rel_path.rsplit("/", 1)[-1]
+        ignored = False
+        for rule in self._rules:
+            if rule.dir_only and not is_dir:
+                continue
+            target = rel_path if rule.anchored else name
+            if rule.regex.match(target):
+                ignored = not rule.negate
+        return ignored
+
+
+def load_gitignore_patterns(root: str) -> List[str]:
+    path = os.path.join(root, ".gitignore")
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as handle:
+            return handle.read().splitlines()
+    except OSError:
+        return []
+
+
+@dataclass
+class DirListing:
+    items: List[str]
+    truncated: bool
+    scanned: int
+    # 遍历过的目录（绝对路径）-> st_mtime_ns；用于缓存校验
+    dir_mtimes: Dict[str, int] = field(default_factory=dict)
+
+
+def _safe_mtime_ns(entry: os.DirEntry) -> int:
+    try:
+        return int(entry.stat(follow_symlinks=False).st_mtime_ns)
+    except OSError:
+        return 0
+
+
+def scan_directory(
+    root: str,
+    *,
+    recursive: bool,
+    max_depth: Optional[int] = None,
+    max_entries: Optional[int] = None,
+    pattern: Optional[str] = None,
+    ignore: Optional[IgnoreRules] = None,
+    sort: str = SORT_NAME,
+    scan_limit: Optional[int] = None,
+) -> DirListing:
+    """
+    列举 root 下的条目（相对路径，/ 分隔）。
+
+    - 非递归：列出 root 直接子项（文件与目录）；
+    - 递归：只列文件（与 os.walk 口径一致），max_depth=1 表示只看 root 直接子项，符号链接目录不进入；
+    - pattern 为子串过滤（与旧实现一致），ignore 命中的条目/目录被跳过/剪枝。
+    """
+    limit = int(max_entries) if isinstance(max_entries, int) and max_entries > 0 else None
+    cap = int(scan_limit) if isinstance(scan_limit, int) and scan_limit > 0 else None
+    depth_limit = int(max_depth) if isinstance(max_depth, int) and max_depth > 0 else None
+    by_mtime = sort == SORT_MTIME
+    rules = ignore if ignore else None
+
+    items: List[str] = []
+    newest: List[Tuple[int, str]] = []
+    dir_mtimes: Dict[str, int] = {}
+    scanned = 0
+    truncated = False
+
+    try:
+        dir_mtimes[root] = int(os.stat(root).st_mtime_ns)
+    except OSError:
+        dir_mtimes[root] = 0
+
+    # (绝对路径, 相对前缀, 深度)；栈顶为下一个要展开的目录，保证按名称的深度优先顺序
+    stack: List[Tuple[str, str, int]] = [(root, "", 1)]
+    while stack:
+        current, prefix, depth = stack.pop()
+        try:
+            with os.scandir(current) as iterator:
+                entries = sorted(iterator, key=lambda item: item.name)
+        except OSError:
+            continue
+        subdirs: List[Tuple[str, str, int]] = []
+        for entry in entries:
+            scanned += 1
+            if cap is not None and scanned > cap:
+                truncated = True
+                stack.clear()
+                break
+            rel = f"{prefix}{entry.name}"
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+            except OSError:
+                is_dir = False
+            if rules is not None and rules.is_ignored(rel, is_dir=is_dir):
+                continue
+            if is_dir and recursive:
+                if depth_limit is None or depth < depth_limit:
+                    subdirs.append((entry.path, rel + "/", depth + 1))
+                    dir_mtimes[entry.path] = _safe_mtime_ns(entry)
+                continue
+            if recursive and entry.is_symlink() and entry.is_dir():
+                # 与 os.walk(followlinks=False) 一致：符号链接目录既不进入也不当作文件
+                continue
+            if pattern and pattern not in rel:
+                continue
+            if by_mtime:
+                key = (_safe_mtime_ns(entry), rel)
+                if limit is not None and len(newest) >= limit:
+                    truncated = True
+                if limit is None:
+                    newest.append(key)
+                elif len(newest) < limit:
+                    heapq.heappush(newest, key)
+                else:
+                    heapq.heappushpop(newest, key)
+                continue
+            items.append(rel)
+            if limit is not None and len(items) >= limit:
+                truncated = True
+                stack.clear()
+                break
+        else:
+            stack.extend(reversed(subdirs))
+
+    if by_mtime:
+        items = [rel for _, rel in sorted(newest, key=lambda item: (-item[0], item[1]))]
+    return DirListing(items=items, truncated=truncated, scanned=scanned, dir_mtimes=dir_mtimes)
+
+
+def listing_still_valid(dir_mtimes: Dict[str, int]) -> bool:
+    """缓存校验：遍历过的目录 mtime 均未变化（只 stat 目录，不重新列举）。"""
+    for path, mtime_ns in dir_mtimes.items():
+        try:
+            if int(os.stat(path).st_mtime_ns) != int(mtime_ns):
+                return False
+        except OSError:
+            return False
+    return True
+
+
+def normalize_patterns(value: object) -> List[str]:
+    if isinstance(value, str):
+        return [line for line in value.splitlines() if line.strip()]
+    if isinstance(value, Sequence):
+        return [str(item) for item in value if isinstance(item, str) and item.strip()]
+    return []
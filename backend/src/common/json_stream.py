@@ -0,0 +1,80 @@
+from typing import List
+
+
+class IncrementalJsonObjectScanner:
+    """
+    增量 JSON 对象扫描器（utils.extract_json_object 中“首个平衡对象”扫描的流式版本）。
+
+    说明：
+    - 逐块 feed 文本，跟踪顶层 `{...}` 的括号深度与字符串/转义状态；
+    - 每当一个顶层对象闭合，就把该对象的原始文本作为候选返回（不做 json 解析，交给调用方校验）；
+    - 对象之外的文字（前言、代码块围栏、尾随解释）直接跳过；
+    - max_object_chars：单个对象的最大长度，超过则放弃该对象并重新寻找下一个 `{`，避免缓冲无限增长。
+    """
+
+    def __init__(self, *, max_object_chars: int = 1_000_000):
+        self._max_object_chars = max(2, int(max_object_chars))
+        self._parts: List[str] = []
+        self._object_chars = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self.consumed_chars = 0
+        self.emitted_objects = 0
+
+    def feed(self, chunk: str) -> List[str]:
+        """输入一段文本，返回本段内闭合的所有顶层对象文本（按出现顺序）。"""
+        text = str(chunk or "")
+        if not text:
+            return []
+        completed: List[str] = []
+        segment_start = 0 if self._depth > 0 else -1
+        for idx, ch in enumerate(text):
+            if self._depth == 0:
+                if ch == "{":
+                    self._depth = 1
+                    self._in_string = False
+                    self._escaped = False
+                    segment_start = idx
+                continue
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == "\"":
+                    self._in_string = False
+                continue
+            if ch == "\"":
+                self._in_string = True
+            elif ch == "{":
+                self._depth += 1
+            elif ch == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._parts.append(text[segment_start : idx + 1])
+                    completed.append("".join(self._parts))
+                    self.emitted_objects += 1
+                    self._parts = []
+                    self._object_chars = 0
+                    segment_start = -1
+        if self._depth > 0 and segment_start >= 0:
+            tail = text[segment_start:]
+            self._parts.append(tail)
+            self._object_chars += len(tail)
+            if self._object_chars > self._max_object_chars:
+                self.reset_object()
+        self.consumed_chars += len(text)
+        return completed
+
+    def reset_object(self) -> None:
+        """放弃当前未闭合的对象（重新寻找下一个顶层 `{`）。"""
+        self._parts = []
+        self._object_chars = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    @property
+    def in_object(self) -> bool:
+        return self._depth > 0
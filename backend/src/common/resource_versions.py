@@ -0,0 +1,157 @@
+"""
+资源族变更版本号（进程内）：高频轮询接口据此生成 ETag，未变化时直接 304，不再查询业务表。
+
+说明：
+- 版本号由 storage 连接层在每次“提交成功且有写入”后按被写的表递增（见 WriteTracker/TrackedConnection），
+  业务代码无需逐个写入点维护；
+- 表 -> 资源族的映射见 _TABLE_FAMILIES；一个表可以影响多个资源族；
+- 版本号只在进程内有效：进程重启后 epoch 变化，旧 ETag 自然失效。
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set
+
+RESOURCE_FAMILY_TASKS = "tasks"
+RESOURCE_FAMILY_RUNS = "runs"
+RESOURCE_FAMILY_RECORDS = "records"
+RESOURCE_FAMILY_MEMORY = "memory"
+RESOURCE_FAMILY_REVIEWS = "reviews"
+
+_TABLE_FAMILIES: Dict[str, tuple] = {
+    "tasks": (RESOURCE_FAMILY_TASKS, RESOURCE_FAMILY_RUNS, RESOURCE_FAMILY_RECORDS),
+    "task_runs": (RESOURCE_FAMILY_TASKS, RESOURCE_FAMILY_RUNS, RESOURCE_FAMILY_RECORDS),
+    "task_steps": (RESOURCE_FAMILY_RECORDS,),
+    "task_outputs": (RESOURCE_FAMILY_RECORDS,),
+    "llm_records": (RESOURCE_FAMILY_RECORDS,),
+    "tool_call_records": (RESOURCE_FAMILY_RECORDS,),
+    "skills_items": (RESOURCE_FAMILY_RECORDS,),
+    "memory_items": (RESOURCE_FAMILY_MEMORY, RESOURCE_FAMILY_RECORDS),
+    "agent_review_records": (RESOURCE_FAMILY_REVIEWS, RESOURCE_FAMILY_RECORDS),
+}
+
+_WRITE_ACTIONS = frozenset({sqlite3.SQLITE_INSERT, sqlite3.SQLITE_UPDATE, sqlite3.SQLITE_DELETE})
+
+_EPOCH = format(int(time.time() * 1000), "x")
+_LOCK = threading.Lock()
+_VERSIONS: Dict[str, int] = {}
+_LISTENERS: List[Callable[[Set[str]], None]] = []
+
+
+def add_resource_version_listener(listener: Callable[[Set[str]], None]) -> None:
+    """
+    注册版本变更监听（在写入线程内同步回调，必须足够轻量；异常会被吞掉）。
+    """
+    with _LOCK:
+        if listener not in _LISTENERS:
+            _LISTENERS.append(listener)
+
+
+def remove_resource_version_listener(listener: Callable[[Set[str]], None]) -> None:
+    with _LOCK:
+        if listener in _LISTENERS:
+            _LISTENERS.remove(listener)
+
+
+def bump_resource_versions_for_tables(tables: Iterable[str]) -> None:
+    families: Set[str] = set()
+    for table in tables or ():
+        families.update(_TABLE_FAMILIES.get(str(table or "").lower(), ()))
+    if not families:
+        return
+    with _LOCK:
+        for family in families:
+            _VERSIONS[family] = _VERSIONS.get(family, 0) + 1
+        listeners = list(_LISTENERS)
+    for listener in listeners:
+        try:
+            listener(set(families))
+        except Exception:
+            continue
+
+
+def get_resource_version(family: str) -> int:
+    with _LOCK:
+        return int(_VERSIONS.get(str(family), 0))
+
+
+def get_resource_versions() -> Dict[str, int]:
+    with _LOCK:
+        return dict(_VERSIONS)
+
+
+def resource_etag(families: Sequence[str], *, extra: Optional[str] = None) -> str:
+    """
+    生成弱 ETag：epoch + 各资源族版本号（+ 调用方附加的区分串，如查询参数/外部写入标记）。
+    """
+    with _LOCK:
+        parts = [f"{family}{int(_VERSIONS.get(family, 0))}" for family in families]
+    tag = f"{_EPOCH}-{'.'.join(parts)}"
+    if extra:
+        tag = f"{tag}-{extra}"
+    return f'W/"{tag}"'
+
+
+class WriteTracker:
+    """
+    连接级写入追踪：作为 sqlite3 authorizer 记录语句编译时涉及写入的表名。
+
+    说明：
+    - storage 每次 get_connection 都是新连接，语句均会重新编译，authorizer 不会因语句缓存漏记；
+    - 每次提交成功且自上次提交以来 total_changes 有增长时才递增版本号（回滚/只读连接不影响 ETag）；
+    - 提交后清空已记录的表：同一连接上的多次提交各自只递增本次写入的表。
+    """
+
+    __slots__ = ("tables", "_committed_changes")
+
+    def __init__(self) -> None:
+        self.tables: Set[str] = set()
+        self._committed_changes = 0
+
+    def __call__(self, action: int, arg1, arg2, db_name, trigger) -> int:
+        if action in _WRITE_ACTIONS and arg1:
+            self.tables.add(arg1)
+        return sqlite3.SQLITE_OK
+
+    def install(self, conn: sqlite3.Connection) -> None:
+        conn.set_authorizer(self)
+        if isinstance(conn, TrackedConnection):
+            conn.write_tracker = self
+
+    def commit(self, conn: sqlite3.Connection) -> None:
+        changes = int(conn.total_changes)
+        tables = set(self.tables)
+        self.tables.clear()
+        if tables and changes > self._committed_changes:
+            bump_resource_versions_for_tables(tables)
+        self._committed_changes = changes
+
+
+class TrackedConnection(sqlite3.Connection):
+    """
+    提交即递增版本号的连接（sqlite3.connect 的 factory）。
+
+    调用方在 get_connection 上下文内自行 commit() 后又抛异常时，已提交的写入不会随 rollback 撤销；
+    版本号在 commit() 时递增，客户端不会因此拿到过期的 304。
+    """
+
+    write_tracker: Optional[WriteTracker] = None
+
+    def commit(self) -> None:
+        super().commit()
+        self._track_commit()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # with conn: 的提交走 C 实现，不经过 commit()
+        result = super().__exit__(exc_type, exc_value, traceback)
+        if exc_type is None:
+            self._track_commit()
+        return result
+
+    def _track_commit(self) -> None:
+        tracker = self.write_tracker
+        if tracker is not None:
+            tracker.commit(self)
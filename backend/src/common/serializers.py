@@ -140,6 +140,7 @@ def llm_record_from_row(row) -> dict:
         "tokens_prompt": row["tokens_prompt"],
         "tokens_completion": row["tokens_completion"],
         "tokens_total": row["tokens_total"],
+        "coalesced": bool(row["coalesced"]),
     }
 
 
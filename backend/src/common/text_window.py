@@ -0,0 +1,427 @@
+"""
+大文本文件的窗口化读取（mmap + 增量解码）：按字节/行区间、尾部 N 行、文件内正则检索。
+
+说明：
+- 只映射不读取：窗口之外的内容不会被拷贝进内存，也不会整体解码；
+- 编码嗅探：BOM（utf-8-sig/utf-16/utf-32）> 采样按 utf-8 严格解码 > gb18030 > 系统首选编码；
+- 行号定位依赖按块（1MB）统计的换行数索引，按 (path, mtime_ns, size) 缓存，
+  同一文件反复翻页时只需在目标块内查找；文件超过 AGENT_FILE_READ_LINE_COUNT_MAX_BYTES 时
+  不主动统计总行数（total_lines 为 None），行区间/检索仍可用；
+- utf-16/utf-32 等非 ASCII 兼容编码无法按字节找换行：整体解码后按文本处理（这类文件通常很小）。
+"""
+
+from __future__ import annotations
+
+import bisect
+import codecs
+import locale
+import mmap
+import os
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from backend.src.constants import AGENT_FILE_READ_LINE_COUNT_MAX_BYTES
+
+ENCODING_AUTO = "auto"
+
+_SNIFF_BYTES = 64 * 1024
+_INDEX_CHUNK_BYTES = 1024 * 1024
+_INDEX_CACHE_MAX = 32
+_GREP_LINE_MAX_CHARS = 500
+# 字节正则与 str 正则语义可能不同的写法：`.`、字符类、带字母/数字的转义（\w \b \s \d \x \u ...）
+_GREP_BYTES_UNSAFE_RE = re.compile(r"[.\[]|\\[A-Za-z0-9]")
+# str 正则忽略大小写时会匹配到非 ASCII 字符的 ASCII 字母（ı/İ、K（开尔文）、ſ）
+_GREP_CASEFOLD_NON_ASCII = frozenset("iIkKsS")
+
+_BOMS = (
+    (codecs.BOM_UTF32_LE, "utf-32-le"),
+    (codecs.BOM_UTF32_BE, "utf-32-be"),
+    (codecs.BOM_UTF8, "utf-8"),
+    (codecs.BOM_UTF16_LE, "utf-16-le"),
+    (codecs.BOM_UTF16_BE, "utf-16-be"),
+)
+
+
+@dataclass(frozen=True)
+class _LineIndex:
+    # chunk_lines[i] = 第 i 个块（起始字节 i * chunk_bytes）之前的换行数
+    chunk_bytes: int
+    chunk_lines: Tuple[int, ...]
+    newline_count: int
+    ends_with_newline: bool
+
+    @property
+    def total_lines(self) -> int:
+        return self.newline_count + (0 if self.ends_with_newline else 1)
+
+
+_INDEX_LOCK = threading.Lock()
+_INDEX_CACHE: "OrderedDict[Tuple[str, int, int], _LineIndex]" = OrderedDict()
+
+
+def sniff_encoding(sample: bytes) -> Tuple[str, int]:
+    """返回 (编码, BOM 字节数)。"""
+    for bom, name in _BOMS:
+        if sample.startswith(bom):
+            return name, len(bom)
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="strict")
+    try:
+        # 采样末尾可能截断多字节字符：final=False 时不算错误
+        decoder.decode(sample, final=False)
+        return "utf-8", 0
+    except UnicodeDecodeError:
+        pass
+    candidates = ["gb18030", str(locale.getpreferredencoding(False) or "")]
+    for name in candidates:
+        if not name:
+            continue
+        try:
+            codecs.getincrementaldecoder(name)(errors="strict").decode(sample, final=False)
+            return codecs.lookup(name).name, 0
+        except (UnicodeDecodeError, LookupError):
+            continue
+    return "utf-8", 0
+
+
+def resolve_encoding(requested: Optional[str], sample: bytes) -> Tuple[str, int]:
+    """显式编码优先（utf-8-sig 仍跳过 BOM）；未指定或 auto 时嗅探。"""
+    name = str(requested or "").strip()
+    if not name or name.lower() == ENCODING_AUTO:
+        return sniff_encoding(sample)
+    try:
+        canonical = codecs.lookup(name).name
+    except LookupError:
+        canonical = "utf-8"
+    if canonical == "utf-8-sig":
+        return "utf-8", len(codecs.BOM_UTF8) if sample.startswith(codecs.BOM_UTF8) else 0
+    return canonical, 0
+
+
+def is_ascii_compatible(encoding: str) -> bool:
+    try:
+        return "a\n".encode(encoding) == b"a\n"
+    except (LookupError, UnicodeError):
+        return False
+
+
+def _decode_window(data, encoding: str, *, skip_leading_continuation: bool) -> Tuple[str, int]:
+    """
+    增量解码一个字节窗口：返回 (文本, 实际消费的字节数)。
+
+    末尾被截断的多字节字符不计入消费字节（下一页从该字符开始）；
+    窗口起点落在 utf-8 多字节字符中间时跳过残余的续字节。
+    """
+    raw = bytes(data)
+    skipped = 0
+    if skip_leading_continuation and encoding == "utf-8":
+        while skipped < min(3, len(raw)) and 0x80 <= raw[skipped] <= 0xBF:
+            skipped += 1
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    text = decoder.decode(raw[skipped:], final=False)
+    pending = len(decoder.getstate()[0])
+    return text, len(raw) - pending
+
+
+def _build_line_index(mm, size: int) -> _LineIndex:
+    chunk_bytes = int(_INDEX_CHUNK_BYTES)
+    chunk_lines: List[int] = []
+    count = 0
+    for start in range(0, size, chunk_bytes):
+        chunk_lines.append(count)
+        count += mm[start : start + chunk_bytes].count(b"\n")
+    ends_with_newline = size > 0 and mm[size - 1 : size] == b"\n"
+    return _LineIndex(
+        chunk_bytes=chunk_bytes,
+        chunk_lines=tuple(chunk_lines),
+        newline_count=count,
+        ends_with_newline=ends_with_newline,
+    )
+
+
+def _cached_line_index(path: str, stat: os.stat_result, mm, *, build: bool) -> Optional[_LineIndex]:
+    key = (os.path.normcase(path), int(stat.st_mtime_ns), int(stat.st_size))
+    with _INDEX_LOCK:
+        index = _INDEX_CACHE.get(key)
+        if index is not None:
+            _INDEX_CACHE.move_to_end(key)
+            return index
+    if not build:
+        return None
+    index = _build_line_index(mm, int(stat.st_size))
+    with _INDEX_LOCK:
+        _INDEX_CACHE[key] = index
+        _INDEX_CACHE.move_to_end(key)
+        while len(_INDEX_CACHE) > _INDEX_CACHE_MAX:
+            _INDEX_CACHE.popitem(last=False)
+    return index
+
+
+def clear_line_index_cache() -> None:
+    with _INDEX_LOCK:
+        _INDEX_CACHE.clear()
+
+
+def _line_start_offset(mm, line_no: int, index: Optional[_LineIndex], base: int) -> Optional[int]:
+    """第 line_no 行（1 起）的起始字节；换行数不足时返回 None。"""
+    target = int(line_no) - 1  # 需要跳过的换行数
+    if target <= 0:
+        return base
+    pos = base
+    seen = 0
+    if index is not None:
+        if target > index.newline_count:
+            return None
+        # 最后一个“块前换行数 < target”的块：第 target 个换行一定在该块内或之后
+        chunk = bisect.bisect_left(index.chunk_lines, target) - 1
+        if chunk > 0:
+            pos = chunk * index.chunk_bytes
+            seen = index.chunk_lines[chunk]
+    while seen < target:
+        found = mm.find(b"\n", pos)
+        if found < 0:
+            return None
+        pos = found + 1
+        seen += 1
+    return pos
+
+
+# 字节正则快路径只用于 ASCII 字节不会出现在多字节字符内部的编码；gbk/gb18030/big5/shift_jis 等
+# 双字节编码的尾字节可能落在 ASCII 区间（如 GBK 的“乤”= b"\x81a"），必须逐行解码后匹配
+_GREP_BYTES_ENCODINGS = frozenset({"utf-8", "ascii", "iso8859-1"})
+
+
+def _can_grep_bytes(pattern: str, *, ignore_case: bool) -> bool:
+    """
+    能否直接在 mmap 上用字节正则检索：仅限纯 ASCII 且不含多字节敏感写法的模式，
+    其余（CJK、字符类、\\w 等）回退到逐行解码的 str 正则，保证匹配语义一致。
+    """
+    if not pattern.isascii() or _GREP_BYTES_UNSAFE_RE.search(pattern):
+        return False
+    return not (ignore_case and any(ch in _GREP_CASEFOLD_NON_ASCII for ch in pattern))
+
+
+class TextWindowReader:
+    """一次打开、多次窗口查询；用作上下文管理器。"""
+
+    def __init__(self, path: str, *, encoding: Optional[str] = None):
+        self.path = path
+        self._handle = open(path, "rb")
+        try:
+            self.stat = os.fstat(self._handle.fileno())
+            self.size = int(self.stat.st_size)
+            self._mm = mmap.mmap(self._handle.fileno(), 0, access=mmap.ACCESS_READ) if self.size > 0 else b""
+        except BaseException:
+            self._handle.close()
+            raise
+        self.encoding, self.bom_len = resolve_encoding(encoding, bytes(self._mm[:_SNIFF_BYTES]))
+        self.ascii_compatible = is_ascii_compatible(self.encoding)
+        self._text_lines: Optional[List[str]] = None
+
+    def __enter__(self) -> "TextWindowReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if isinstance(self._mm, mmap.mmap):
+            self._mm.close()
+        self._handle.close()
+
+    # ---- 元数据 ----
+
+    def line_index(self, *, force: bool = False) -> Optional[_LineIndex]:
+        if not self.ascii_compatible:
+            return None
+        build = force or self.size <= int(AGENT_FILE_READ_LINE_COUNT_MAX_BYTES)
+        return _cached_line_index(self.path, self.stat, self._mm, build=build)
+
+    def total_lines(self) -> Optional[int]:
+        if not self.ascii_compatible:
+            return len(self._decoded_lines())
+        if self.size <= self.bom_len:
+            return 0
+        index = self.line_index()
+        return index.total_lines if index is not None else None
+
+    def metadata(self) -> Dict[str, object]:
+        return {"size": self.size, "encoding": self.encoding, "total_lines": self.total_lines()}
+
+    # ---- 非 ASCII 兼容编码：整体解码后按文本处理 ----
+
+    def _decoded_lines(self) -> List[str]:
+        if self._text_lines is None:
+            text = bytes(self._mm[self.bom_len :]).decode(self.encoding, errors="replace")
+            lines = text.split("\n")
+            if lines and lines[-1] == "":
+                lines.pop()
+            self._text_lines = lines
+        return self._text_lines
+
+    # ---- 查询 ----
+
+    def read_bytes(self, offset: int, max_bytes: int) -> Dict[str, object]:
+        start = max(int(offset), self.bom_len)
+        start = min(start, self.size)
+        end = min(self.size, start + max(0, int(max_bytes)))
+        text, consumed = _decode_window(
+            self._mm[start:end],
+            self.encoding,
+            skip_leading_continuation=start > self.bom_len,
+        )
+        if end >= self.size:
+            consumed = end - start
+        end_offset = start + consumed
+        return {
+            "content": text,
+            "bytes": consumed,
+            "offset": start,
+            "end_offset": end_offset,
+            "has_more": end_offset < self.size,
+        }
+
+    def read_lines(self, start_line: int, max_lines: int, max_bytes: int) -> Dict[str, object]:
+        start_line = max(1, int(start_line))
+        max_lines = max(1, int(max_lines))
+        if not self.ascii_compatible:
+            lines = self._decoded_lines()
+            picked = lines[start_line - 1 : start_line - 1 + max_lines]
+            content = "\n".join(picked)
+            return {
+                "content": content + ("\n" if picked else ""),
+                "start_line": start_line,
+                "end_line": start_line + len(picked) - 1 if picked else None,
+                "has_more": start_line - 1 + len(picked) < len(lines),
+                "bytes": len(content.encode(self.encoding, errors="replace")),
+            }
+
+        index = self.line_index()
+        begin = _line_start_offset(self._mm, start_line, index, self.bom_len)
+        if begin is None or begin >= self.size:
+            return {"content": "", "start_line": start_line, "end_line": None, "has_more": False, "bytes": 0}
+        limit = min(self.size, begin + max(1, int(max_bytes)))
+        pos = begin
+        taken = 0
+        while taken < max_lines and pos < limit:
+            found = self._mm.find(b"\n", pos, limit)
+            if found < 0:
+                # 最后一行无换行，或被 max_bytes 截断
+                pos = limit
+                taken += 1
+                break
+            pos = found + 1
+            taken += 1
+        text, consumed = _decode_window(self._mm[begin:pos], self.encoding, skip_leading_continuation=False)
+        if pos >= self.size:
+            consumed = pos - begin
+        end = begin + consumed
+        clipped = end < self.size and self._mm[end - 1 : end] != b"\n"
+        result: Dict[str, object] = {
+            "content": text,
+            "start_line": start_line,
+            "end_line": start_line + taken - 1,
+            "has_more": end < self.size,
+            "bytes": consumed,
+            "offset": begin,
+            "end_offset": end,
+        }
+        if clipped:
+            # 行过长被 max_bytes 截断：下一页用 offset 续读
+            result["line_truncated"] = True
+        return result
+
+    def read_tail(self, tail_lines: int, max_bytes: int) -> Dict[str, object]:
+        tail_lines = max(1, int(tail_lines))
+        if not self.ascii_compatible:
+            lines = self._decoded_lines()
+            picked = lines[-tail_lines:]
+            content = "\n".join(picked)
+            return {
+                "content": content + ("\n" if picked else ""),
+                "start_line": len(lines) - len(picked) + 1 if picked else None,
+                "end_line": len(lines) if picked else None,
+                "bytes": len(content.encode(self.encoding, errors="replace")),
+            }
+
+        end = self.size
+        if end <= self.bom_len:
+            return {"content": "", "start_line": None, "end_line": None, "bytes": 0}
+        search_end = end - 1 if self._mm[end - 1 : end] == b"\n" else end
+        floor = max(self.bom_len, end - max(1, int(max_bytes)))
+        cursor = search_end
+        begin = search_end
+        found_lines = 0
+        while found_lines < tail_lines:
+            found = self._mm.rfind(b"\n", floor, cursor)
+            found_lines += 1
+            if found < 0:
+                begin = floor
+                break
+            begin = found + 1
+            cursor = found
+        text, _ = _decode_window(
+            self._mm[begin:end],
+            self.encoding,
+            skip_leading_continuation=begin > self.bom_len,
+        )
+        result: Dict[str, object] = {
+            "content": text,
+            "bytes": end - begin,
+            "offset": begin,
+            "end_offset": end,
+        }
+        if begin == floor and floor > self.bom_len and self._mm[floor - 1 : floor] != b"\n":
+            # 首行超出 max_bytes 被截断
+            result["line_truncated"] = True
+        index = self.line_index()
+        if index is not None:
+            total = index.total_lines
+            result["start_line"] = total - found_lines + 1
+            result["end_line"] = total
+        return result
+
+    def grep(self, pattern: str, *, ignore_case: bool = False, max_matches: int = 100) -> Dict[str, object]:
+        flags = re.MULTILINE | (re.IGNORECASE if ignore_case else 0)
+        limit = max(1, int(max_matches))
+        matches: List[Dict[str, object]] = []
+        truncated = False
+
+        if self.encoding not in _GREP_BYTES_ENCODINGS or not _can_grep_bytes(pattern, ignore_case=ignore_case):
+            compiled = re.compile(pattern, flags)
+            for line_no, line in enumerate(self._decoded_lines(), start=1):
+                if compiled.search(line):
+                    if len(matches) >= limit:
+                        truncated = True
+                        break
+                    matches.append({"line": line_no, "text": line.rstrip("\r")[:_GREP_LINE_MAX_CHARS]})
+            return {"matches": matches, "match_count": len(matches), "truncated": truncated}
+
+        compiled = re.compile(pattern.encode(self.encoding, errors="strict"), flags)
+        line_no = 1
+        counted_to = self.bom_len
+        last_line_start = -1
+        pos = self.bom_len
+        while pos <= self.size:
+            found = compiled.search(self._mm, pos)
+            if found is None:
+                break
+            line_start = self._mm.rfind(b"\n", self.bom_len, found.start()) + 1
+            line_start = max(line_start, self.bom_len)
+            line_end = self._mm.find(b"\n", found.start())
+            if line_end < 0:
+                line_end = self.size
+            if line_start != last_line_start:
+                if len(matches) >= limit:
+                    truncated = True
+                    break
+                line_no += self._mm[counted_to:line_start].count(b"\n")
+                counted_to = line_start
+                text, _ = _decode_window(self._mm[line_start:line_end], self.encoding, skip_leading_continuation=False)
+                matches.append({"line": line_no, "text": text.rstrip("\r")[:_GREP_LINE_MAX_CHARS]})
+                last_line_start = line_start
+            # 每行只报告一次：从下一行继续
+            pos = line_end + 1
+        return {"matches": matches, "match_count": len(matches), "truncated": truncated}
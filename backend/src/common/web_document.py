@@ -0,0 +1,560 @@
+"""
+web_fetch 页面文档模型：对抓取结果做一次流式解析（html.parser），产出紧凑的 WebDocument：
+- 可见文本（跳过 script/style 等；块级元素换行，表格行渲染为逗号分隔行）；
+- 锚点（href/锚文本/前后文窗口/搜索结果摘要尾部），bing b_algo、360 res-list 结果块，data-mdurl/data-url；
+- 表格行、JSON-LD / microdata 等结构化数据信号；
+- 日期/数值/日期-数值成对等文本信号（按需单遍扫描并缓存）。
+
+说明：
+- 输入按 max_input_chars 截断，分块 feed，可见文本达到 max_text_chars 即停止解析（硬上限）；
+- 非 HTML（markdown/CSV/JSON/纯文本）直接作为可见文本，markdown 链接与裸 URL 在同一遍扫描中抽取；
+- 候选链接抽取与候选页打分（actions/handlers/tool_call）只消费该模型，不再对原文反复跑正则。
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from functools import cached_property
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Set, Tuple
+
+from backend.src.common.utils import parse_json_value
+
+WEB_DOCUMENT_MAX_INPUT_CHARS = 400000
+WEB_DOCUMENT_MAX_TEXT_CHARS = 200000
+
+_FEED_CHUNK_CHARS = 32 * 1024
+_MAX_ANCHORS = 2000
+_MAX_PLAIN_URLS = 500
+_MAX_TABLES = 20
+_MAX_TABLE_ROWS = 200
+# 锚点上下文窗口（可见文本字符数）与搜索结果摘要尾部上限
+_CONTEXT_BEFORE_CHARS = 160
+_CONTEXT_AFTER_CHARS = 200
+_TAIL_CHARS = 240
+_PLAIN_URL_CONTEXT_CHARS = 80
+
+_SKIP_TEXT_TAGS = frozenset({"script", "style", "noscript", "template"})
+_BLOCK_TAGS = frozenset(
+    {
+        "address", "article", "aside", "blockquote", "br", "dd", "div", "dl", "dt", "fieldset", "figcaption",
+        "figure", "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6", "header", "hr", "li", "main", "nav",
+        "ol", "p", "pre", "section", "table", "title", "tr", "ul",
+    }
+)
+# 搜索结果尾部摘要的终止点（与旧实现一致：下一个链接或块容器结束）
+_TAIL_STOP_END_TAGS = frozenset({"li", "div", "article", "section"})
+_SEARCH_PAGE_CLASSES = frozenset({"b_algo", "res-list"})
+
+_WS_RE = re.compile(r"\s+")
+_HTML_SNIFF_RE = re.compile(
+    r"<(?:!doctype|html|head|body|div|p|a|span|table|tr|td|ul|ol|li|script|h[1-6]|section|article)\b",
+    re.IGNORECASE,
+)
+_TEXT_LINK_RE = re.compile(r"\[([^\]]*)\]\((https?://[^\s)]+)\)|https?://[^\s\"'<>]+", re.IGNORECASE)
+_URL_RE = re.compile(r"https?://[^\s\"'<>]+", re.IGNORECASE)
+# 日期与数值在同一遍扫描中识别；日期内的数字段按旧口径也计入数值
+_TOKEN_RE = re.compile(r"(?P<date>20\d{2}[-/.年]\d{1,2}(?:[-/.月]\d{1,2})?)|(?P<num>\b\d{2,5}(?:\.\d{1,4})?\b)")
+_NUMBER_RE = re.compile(r"\b\d{2,5}(?:\.\d{1,4})?\b")
+# 日期-数值成对：三种模式都不跨行，只需在含日期的行上匹配
+_DATE_PRICE_PAIR_RES = (
+    re.compile(
+        r"(?:20\d{2}[-/.年]\d{1,2}(?:[-/.月]\d{1,2})?).{0,80}?\b\d{2,5}(?:\.\d{1,4})?\b.{0,20}?(?:元/克|人民币/克|cny/?g|price)",
+        re.IGNORECASE,
+    ),
+    re.compile(
+        r"(?:元/克|人民币/克|cny/?g|price).{0,40}?(?:20\d{2}[-/.年]\d{1,2}(?:[-/.月]\d{1,2})?).{0,80}?\b\d{2,5}(?:\.\d{1,4})?\b",
+        re.IGNORECASE,
+    ),
+    re.compile(r"^\s*(?:20\d{2}[-/.]\d{1,2}[-/.]\d{1,2})\s*,\s*\d{2,5}(?:\.\d{1,4})?", re.IGNORECASE),
+)
+
+
+def _collapse(text: str) -> str:
+    return " ".join(str(text or "").split())
+
+
+def normalize_date_token(token: str) -> str:
+    text = str(token or "").strip()
+    if not text:
+        return ""
+    normalized = text.replace("年", "-").replace("月", "-").replace("日", "")
+    normalized = normalized.replace("/", "-").replace(".", "-")
+    normalized = re.sub(r"-+", "-", normalized).strip("-")
+    return normalized
+
+
+@dataclass(frozen=True)
+class WebAnchor:
+    href: str
+    text: str
+    # bing_block / 360_block / search_data_attr / markdown_link / html_anchor / plain_url
+    source: str
+    # 结果块：标题 + 摘要；其他：锚点前后的可见文本窗口
+    context: str = ""
+    # 锚点之后到下一个链接/块容器结束的可见文本（搜索结果页摘要）
+    tail: str = ""
+
+
+@dataclass(frozen=True)
+class TextSignals:
+    date_hits: int
+    distinct_dates: int
+    number_hits: int
+    date_price_pairs: int
+
+
+@dataclass
+class WebDocument:
+    kind: str
+    text: str
+    block_anchors: Tuple[WebAnchor, ...]
+    data_anchors: Tuple[WebAnchor, ...]
+    html_anchors: Tuple[WebAnchor, ...]
+    text_links: Tuple[WebAnchor, ...]
+    plain_urls: Tuple[WebAnchor, ...]
+    tables: Tuple[Tuple[Tuple[str, ...], ...], ...]
+    table_count: int
+    json_ld_blocks: int
+    microdata_items: int
+    search_result_page: bool
+    truncated: bool
+    source_chars: int
+
+    @cached_property
+    def lowered(self) -> str:
+        return self.text.lower()
+
+    @cached_property
+    def json_payload(self) -> bool:
+        stripped = self.text.strip()
+        if self.kind != "text" or not stripped or stripped[0] not in "{[":
+            return False
+        return isinstance(parse_json_value(stripped), (dict, list))
+
+    @cached_property
+    def signals(self) -> TextSignals:
+        date_hits = 0
+        number_hits = 0
+        dates: Set[str] = set()
+        date_lines: Set[int] = set()
+        text = self.text
+        for match in _TOKEN_RE.finditer(text):
+            token = match.group("date")
+            if token is None:
+                number_hits += 1
+                continue
+            date_hits += 1
+            number_hits += len(_NUMBER_RE.findall(token))
+            normalized = normalize_date_token(token)
+            if normalized:
+                dates.add(normalized)
+            date_lines.add(text.rfind("\n", 0, match.start()) + 1)
+        pairs = 0
+        for line_start in sorted(date_lines):
+            line_end = text.find("\n", line_start)
+            line = text[line_start : line_end if line_end >= 0 else len(text)]
+            for pattern in _DATE_PRICE_PAIR_RES:
+                pairs += sum(1 for _ in pattern.finditer(line))
+        return TextSignals(
+            date_hits=date_hits,
+            distinct_dates=len(dates),
+            number_hits=number_hits,
+            date_price_pairs=pairs,
+        )
+
+
+@dataclass
+class _PendingAnchor:
+    href: str
+    source: str
+    start: int
+    end: int = -1
+    stop: int = -1
+    text_parts: Optional[List[str]] = None
+    block: Optional["_ResultBlock"] = None
+
+
+@dataclass
+class _ResultBlock:
+    kind: str
+    title_href: str = ""
+    title: str = ""
+    title_done: bool = False
+    mdurl: str = ""
+    snippet_parts: Optional[List[str]] = None
+    snippet_state: str = ""
+
+
+class _DocumentParser(HTMLParser):
+    def __init__(self, *, max_text_chars: int) -> None:
+        super().__init__(convert_charrefs=True)
+        self.max_text_chars = int(max_text_chars)
+        self.parts: List[str] = []
+        self.length = 0
+        self.last_char = "\n"
+        self.skip_depth = 0
+        self.skip_tag = ""
+        self.heading_stack: List[str] = []
+        self.anchor: Optional[_PendingAnchor] = None
+        self.anchors: List[_PendingAnchor] = []
+        self.tail_pending: List[_PendingAnchor] = []
+        self.data_mdurl: List[Tuple[str, int]] = []
+        self.data_url: List[Tuple[str, int]] = []
+        self.script_urls: List[str] = []
+        self.block: Optional[_ResultBlock] = None
+        self.blocks: List[_ResultBlock] = []
+        self.tables: List[List[Tuple[str, ...]]] = []
+        self.table_count = 0
+        self.table_depth = 0
+        self.row: Optional[List[str]] = None
+        self.cell: Optional[List[str]] = None
+        self.json_ld_blocks = 0
+        self.microdata_items = 0
+        self.search_markers = False
+        self.text_full = False
+
+    # ---- 文本输出 ----
+    def _emit(self, text: str) -> None:
+        if self.text_full or not text:
+            return
+        chunk = _WS_RE.sub(" ", text)
+        if self.last_char in (" ", "\n"):
+            chunk = chunk.lstrip(" ")
+        if not chunk:
+            return
+        remaining = self.max_text_chars - self.length
+        if len(chunk) >= remaining:
+            chunk = chunk[:remaining]
+            self.text_full = True
+        self.parts.append(chunk)
+        self.length += len(chunk)
+        self.last_char = chunk[-1]
+
+    def _newline(self) -> None:
+        if self.last_char == "\n" or self.text_full:
+            return
+        if self.last_char == " " and self.parts:
+            self.parts[-1] = self.parts[-1][:-1]
+            self.length -= 1
+        self.parts.append("\n")
+        self.length += 1
+        self.last_char = "\n"
+
+    def _stop_tails(self) -> None:
+        for pending in self.tail_pending:
+            pending.stop = self.length
+        self.tail_pending = []
+
+    # ---- 表格 ----
+    def _close_cell(self) -> None:
+        if self.cell is not None and self.row is not None:
+            self.row.append(_collapse("".join(self.cell)))
+        self.cell = None
+
+    def _close_row(self) -> None:
+        self._close_cell()
+        if self.row is not None:
+            if self.row and self.tables and len(self.tables[-1]) < _MAX_TABLE_ROWS:
+                self.tables[-1].append(tuple(self.row))
+            self._newline()
+        self.row = None
+
+    # ---- 锚点 ----
+    def _close_anchor(self) -> None:
+        anchor = self.anchor
+        if anchor is None:
+            return
+        self.anchor = None
+        anchor.end = self.length
+        text = _collapse("".join(anchor.text_parts or []))
+        block = anchor.block
+        if block is not None and not block.title_done and self.heading_stack:
+            block.title_href = anchor.href
+            block.title = text
+            block.title_done = True
+        anchor.text_parts = [text]
+        if len(self.anchors) < _MAX_ANCHORS:
+            self.anchors.append(anchor)
+            self.tail_pending.append(anchor)
+
+    def _close_block(self) -> None:
+        if self.block is not None:
+            self.blocks.append(self.block)
+        self.block = None
+
+    def handle_starttag(self, tag, attrs):
+        if self.text_full:
+            return
+        attr_map: Dict[str, str] = {}
+        for key, value in attrs:
+            if key and key not in attr_map:
+                attr_map[key] = str(value or "")
+        if self.skip_depth:
+            if tag == self.skip_tag:
+                self.skip_depth += 1
+            return
+        if tag in _SKIP_TEXT_TAGS:
+            self.skip_depth = 1
+            self.skip_tag = tag
+            if tag == "script" and "ld+json" in attr_map.get("type", "").lower():
+                self.json_ld_blocks += 1
+            return
+
+        classes = attr_map.get("class", "").split()
+        element_id = attr_map.get("id", "")
+        if "itemscope" in attr_map:
+            self.microdata_items += 1
+        if (
+            element_id == "b_results"
+            or attr_map.get("class", "") in _SEARCH_PAGE_CLASSES
+            or "sogou_vr_" in element_id
+            or "data-mdurl" in attr_map
+        ):
+            self.search_markers = True
+        for attr_name, bucket in (("data-mdurl", self.data_mdurl), ("data-url", self.data_url)):
+            value = attr_map.get(attr_name, "").strip()
+            if value.lower().startswith(("http://", "https://")) and len(bucket) < _MAX_ANCHORS:
+                bucket.append((value, self.length))
+                if attr_name == "data-mdurl" and self.block is not None and not self.block.mdurl:
+                    self.block.mdurl = value
+
+        if tag == "li":
+            if "b_algo" in classes:
+                self._close_block()
+                self.block = _ResultBlock(kind="bing_block")
+            elif "res-list" in classes:
+                self._close_block()
+                self.block = _ResultBlock(kind="360_block")
+        if self.block is not None and self.block.snippet_parts is None:
+            if self.block.kind == "bing_block":
+                if tag == "div" and "b_caption" in classes:
+                    self.block.snippet_state = "caption"
+                elif tag == "p" and self.block.snippet_state == "caption":
+                    self.block.snippet_parts = []
+                    self.block.snippet_state = "p"
+            elif tag == "span" and "res-list-summary" in classes:
+                self.block.snippet_parts = []
+                self.block.snippet_state = "span"
+
+        if tag in ("h2", "h3"):
+            self.heading_stack.append(tag)
+        if tag == "a":
+            self._close_anchor()
+            self._stop_tails()
+            href = attr_map.get("href", "").strip()
+            if href:
+                block = self.block
+                if block is not None and not block.title_done:
+                    expected = "h2" if block.kind == "bing_block" else "h3"
+                    if expected not in self.heading_stack:
+                        block = None
+                self.anchor = _PendingAnchor(href=href, source="html_anchor", start=self.length, text_parts=[], block=block)
+        elif tag == "table":
+            self._close_row()
+            self.table_depth += 1
+            self.table_count += 1
+            if len(self.tables) < _MAX_TABLES:
+                self.tables.append([])
+            self._newline()
+        elif tag == "tr":
+            self._close_row()
+            self.row = []
+        elif tag in ("td", "th"):
+            if self.row is None:
+                self.row = []
+            self._close_cell()
+            if self.row:
+                self._emit(",")
+                self.last_char = " "
+            self.cell = []
+        elif tag in _BLOCK_TAGS:
+            self._newline()
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in ("br", "hr"):
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if self.text_full:
+            return
+        if self.skip_depth:
+            if tag == self.skip_tag:
+                self.skip_depth -= 1
+            return
+        if tag == "a":
+            self._close_anchor()
+        if tag in ("h2", "h3") and tag in self.heading_stack:
+            while self.heading_stack:
+                if self.heading_stack.pop() == tag:
+                    break
+        block = self.block
+        if block is not None and block.snippet_parts is not None and block.snippet_state in ("p", "span"):
+            if (block.snippet_state == "p" and tag == "p") or (block.snippet_state == "span" and tag == "span"):
+                block.snippet_state = "done"
+        if tag in _TAIL_STOP_END_TAGS:
+            self._stop_tails()
+        if tag == "li" and block is not None:
+            self._close_anchor()
+            self._close_block()
+        if tag in ("td", "th"):
+            self._close_cell()
+        elif tag == "tr":
+            self._close_row()
+        elif tag == "table":
+            self._close_row()
+            self.table_depth = max(0, self.table_depth - 1)
+            self._newline()
+        elif tag in _BLOCK_TAGS:
+            self._newline()
+
+    def handle_data(self, data):
+        if self.text_full:
+            return
+        if self.skip_depth:
+            if self.skip_tag == "script" and len(self.script_urls) < _MAX_PLAIN_URLS and "http" in data:
+                self.script_urls.extend(_URL_RE.findall(data)[: _MAX_PLAIN_URLS - len(self.script_urls)])
+            return
+        if self.anchor is not None and self.anchor.text_parts is not None:
+            self.anchor.text_parts.append(data)
+        if self.cell is not None:
+            self.cell.append(data)
+        block = self.block
+        if block is not None and block.snippet_parts is not None and block.snippet_state in ("p", "span"):
+            block.snippet_parts.append(data)
+        self._emit(data)
+
+
+def _window(text: str, start: int, end: int, *, before: int, after: int) -> str:
+    # 可见文本已做空白归一，只需把换行折叠为空格
+    return text[max(0, start - before) : min(len(text), end + after)].replace("\n", " ").strip()
+
+
+def _scan_text_links(text: str) -> Tuple[List[WebAnchor], List[WebAnchor]]:
+    markdown: List[WebAnchor] = []
+    plain: List[WebAnchor] = []
+    for match in _TEXT_LINK_RE.finditer(text):
+        if match.group(2):
+            if len(markdown) < _MAX_ANCHORS:
+                label = str(match.group(1) or "")
+                markdown.append(WebAnchor(href=match.group(2), text=label, source="markdown_link", context=label))
+            continue
+        if len(plain) < _MAX_PLAIN_URLS:
+            url = match.group(0)
+            context = text[max(0, match.start() - _PLAIN_URL_CONTEXT_CHARS) : match.end() + _PLAIN_URL_CONTEXT_CHARS]
+            plain.append(WebAnchor(href=url, text="", source="plain_url", context=context))
+    return markdown, plain
+
+
+def looks_like_html(text: str) -> bool:
+    return bool(_HTML_SNIFF_RE.search(str(text or "")[:4096]))
+
+
+def build_web_document(
+    raw_text: str,
+    *,
+    max_input_chars: int = WEB_DOCUMENT_MAX_INPUT_CHARS,
+    max_text_chars: int = WEB_DOCUMENT_MAX_TEXT_CHARS,
+) -> WebDocument:
+    """
+    单遍构建文档模型；max_input_chars 为原文硬上限，可见文本达到 max_text_chars 后停止解析。
+    """
+    raw = str(raw_text or "")
+    source_chars = len(raw)
+    sample = raw[: max(0, int(max_input_chars))]
+    truncated = len(sample) < source_chars
+
+    if not looks_like_html(sample):
+        text = sample[: max(0, int(max_text_chars))]
+        markdown, plain = _scan_text_links(text)
+        return WebDocument(
+            kind="text",
+            text=text,
+            block_anchors=(),
+            data_anchors=(),
+            html_anchors=(),
+            text_links=tuple(markdown),
+            plain_urls=tuple(plain),
+            tables=(),
+            table_count=0,
+            json_ld_blocks=0,
+            microdata_items=0,
+            search_result_page="markdown content:" in text[:4096].lower(),
+            truncated=truncated or len(text) < len(sample),
+            source_chars=source_chars,
+        )
+
+    parser = _DocumentParser(max_text_chars=max_text_chars)
+    try:
+        for offset in range(0, len(sample), _FEED_CHUNK_CHARS):
+            parser.feed(sample[offset : offset + _FEED_CHUNK_CHARS])
+            if parser.text_full:
+                truncated = True
+                break
+        else:
+            parser.close()
+    except Exception:
+        # 畸形 HTML：保留已解析部分
+        truncated = True
+    parser._close_anchor()
+    parser._close_row()
+    parser._close_block()
+    parser._stop_tails()
+
+    text = "".join(parser.parts).rstrip()
+    blocks: List[WebAnchor] = []
+    for block in parser.blocks:
+        if not block.title_done:
+            continue
+        snippet = _collapse("".join(block.snippet_parts or []))
+        href = block.mdurl if block.kind == "360_block" and block.mdurl else block.title_href
+        blocks.append(
+            WebAnchor(href=href, text=block.title, source=block.kind, context=_collapse(f"{block.title} {snippet}"))
+        )
+
+    html_anchors: List[WebAnchor] = []
+    for pending in parser.anchors:
+        end = pending.end if pending.end >= 0 else len(text)
+        stop = pending.stop if pending.stop >= end else len(text)
+        html_anchors.append(
+            WebAnchor(
+                href=pending.href,
+                text=(pending.text_parts or [""])[0],
+                source="html_anchor",
+                context=_window(text, pending.start, end, before=_CONTEXT_BEFORE_CHARS, after=_CONTEXT_AFTER_CHARS),
+                tail=text[end : min(stop, end + _TAIL_CHARS)].replace("\n", " ").strip(),
+            )
+        )
+
+    data_anchors = [
+        WebAnchor(
+            href=url,
+            text="",
+            source="search_data_attr",
+            context=_window(text, pos, pos, before=_CONTEXT_BEFORE_CHARS, after=_CONTEXT_AFTER_CHARS),
+        )
+        for url, pos in parser.data_mdurl + parser.data_url
+    ]
+
+    markdown, plain = _scan_text_links(text)
+    for url in parser.script_urls[: max(0, _MAX_PLAIN_URLS - len(plain))]:
+        plain.append(WebAnchor(href=url, text="", source="plain_url", context=url))
+
+    return WebDocument(
+        kind="html",
+        text=text,
+        block_anchors=tuple(blocks),
+        data_anchors=tuple(data_anchors),
+        html_anchors=tuple(html_anchors),
+        text_links=tuple(markdown),
+        plain_urls=tuple(plain),
+        tables=tuple(tuple(rows) for rows in parser.tables),
+        table_count=int(parser.table_count),
+        json_ld_blocks=int(parser.json_ld_blocks),
+        microdata_items=int(parser.microdata_items),
+        search_result_page=bool(parser.search_markers or "markdown content:" in text[:4096].lower()),
+        truncated=truncated,
+        source_chars=source_chars,
+    )
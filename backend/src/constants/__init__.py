@@ -120,6 +120,7 @@ from backend.src.constants.error_messages import (
     ERROR_MESSAGE_CHAT_ROLE_INVALID,
     ERROR_MESSAGE_CHAT_QUERY_MISSING,
     ERROR_MESSAGE_ACTION_UNSUPPORTED,
+    ERROR_MESSAGE_ACTION_CANCELLED,
     ERROR_MESSAGE_COMMAND_FAILED,
     ERROR_MESSAGE_EXPECTATION_NOT_FOUND,
     ERROR_MESSAGE_EVAL_NOT_FOUND,
@@ -129,6 +130,7 @@ from backend.src.constants.error_messages import (
     ERROR_MESSAGE_NODE_NOT_FOUND,
     ERROR_MESSAGE_EDGE_NOT_FOUND,
     ERROR_MESSAGE_RECORD_NOT_FOUND,
+    ERROR_MESSAGE_SOURCE_REPUTATION_NOT_FOUND,
     ERROR_MESSAGE_TOOL_NOT_FOUND,
     ERROR_MESSAGE_TOOL_REQUIRED,
     ERROR_MESSAGE_NOT_FOUND,
@@ -138,6 +140,15 @@ from backend.src.constants.agent_config import (
     DB_ENV_VAR,
     DB_RELATIVE_PATH,
     PROMPT_ENV_VAR,
+    AGENT_STARTUP_SYNC_INCREMENTAL,
+    AGENT_STARTUP_SYNC_BACKGROUND,
+    AGENT_KNOWLEDGE_WATCH_ENABLED,
+    AGENT_KNOWLEDGE_WATCH_POLL_INTERVAL_MS,
+    AGENT_KNOWLEDGE_WATCH_DEBOUNCE_MS,
+    AGENT_HTTP_ETAG_ENABLED,
+    AGENT_STATE_CHANNEL_BUFFER,
+    AGENT_STATE_CHANNEL_DEBOUNCE_MS,
+    AGENT_STATE_CHANNEL_KEEPALIVE_SECONDS,
     APP_TITLE,
     SINGLETON_ROW_ID,
     SINGLE_ROW_LIMIT,
@@ -161,15 +172,47 @@ from backend.src.constants.agent_config import (
     AGENT_SSE_PLAN_MIN_INTERVAL_SECONDS,
     AGENT_REACT_PERSIST_MIN_INTERVAL_SECONDS,
     AGENT_THINK_PARALLEL_PERSIST_MIN_INTERVAL_SECONDS,
+    AGENT_THINK_PARALLEL_SCHEDULER,
     AGENT_LLM_MAX_CONCURRENCY_GLOBAL,
     AGENT_LLM_MAX_CONCURRENCY_PER_MODEL,
+    AGENT_LLM_TOKENS_PER_MINUTE,
+    AGENT_LLM_BACKGROUND_MAX_SHARE_PERCENT,
+    AGENT_LLM_SINGLE_FLIGHT_ENABLED,
+    AGENT_COORDINATION_BACKEND,
+    AGENT_COORDINATION_DB_PATH,
+    AGENT_COORDINATION_LEASE_TTL_SECONDS,
+    AGENT_LLM_CLUSTER_RPM,
+    AGENT_LLM_BLOB_STORE_ENABLED,
+    AGENT_LLM_BLOB_MIN_CHARS,
+    AGENT_LLM_BLOB_SECTION_MIN_CHARS,
     AGENT_SHELL_COMMAND_DEFAULT_TIMEOUT_MS,
     HTTP_REQUEST_DEFAULT_TIMEOUT_MS,
+    AGENT_SHELL_OUTPUT_HEAD_BYTES,
+    AGENT_SHELL_OUTPUT_TAIL_BYTES,
+    AGENT_SHELL_OUTPUT_PROGRESS_INTERVAL_MS,
+    AGENT_FILE_READ_DEFAULT_MAX_BYTES,
+    AGENT_FILE_READ_DEFAULT_MAX_LINES,
+    AGENT_FILE_READ_LINE_COUNT_MAX_BYTES,
+    AGENT_FILE_LIST_DEFAULT_EXCLUDES,
+    AGENT_FILE_LIST_MAX_SCAN_ENTRIES,
+    AGENT_FILE_LIST_CACHE_ENTRIES_PER_RUN,
+    AGENT_PROMPT_CACHE_CHECK_INTERVAL_MS,
+    AGENT_SOURCE_REPUTATION_ENABLED,
+    AGENT_SOURCE_COOLDOWN_BASE_SECONDS,
+    AGENT_SOURCE_COOLDOWN_MAX_SECONDS,
+    AGENT_PYTHON_WORKER_POOL_ENABLED,
+    AGENT_PYTHON_WORKER_POOL_SIZE,
+    AGENT_PYTHON_WORKER_MAX_RUNS,
+    AGENT_PYTHON_WORKER_MAX_RSS_MB,
+    AGENT_PYTHON_WORKER_PRELOAD,
     AGENT_REACT_OBSERVATION_MAX_CHARS,
     AGENT_REACT_ACTION_RETRY_MAX_ATTEMPTS,
     AGENT_REACT_ARTIFACT_AUTOFIX_MAX_ATTEMPTS,
     AGENT_REACT_REPLAN_MAX_ATTEMPTS,
     AGENT_REACT_REPEAT_FAILURE_MAX,
+    AGENT_REACT_ACTION_STREAMING,
+    AGENT_REACT_SPECULATIVE_PREFETCH,
+    AGENT_REACT_ASYNC_EXECUTION,
     SHELL_COMMAND_REQUIRE_FILE_WRITE_BINDING_DEFAULT,
     SHELL_COMMAND_DISALLOW_COMPLEX_PYTHON_C_DEFAULT,
     SHELL_COMMAND_AUTO_REWRITE_COMPLEX_PYTHON_C_DEFAULT,
@@ -180,6 +223,7 @@ from backend.src.constants.agent_config import (
     AGENT_ARTIFACT_CSV_MIN_NUMERIC_RATIO,
     AGENT_ARTIFACT_CSV_MAX_PLACEHOLDER_RATIO,
     AGENT_ARTIFACT_CSV_MIN_DATE_SPAN_DAYS,
+    AGENT_ARTIFACT_CSV_SAMPLE_ROWS,
     JSON_PARSE_REQUIRE_RECENT_SOURCE_DEFAULT,
     JSON_PARSE_SOURCE_MIN_TEXT_CHARS,
     AGENT_REVIEW_PASS_SCORE_THRESHOLD,
@@ -251,6 +295,7 @@ from backend.src.constants.agent_config import (
     WEB_FETCH_SEARCH_URL_TEMPLATES_DEFAULT,
     AGENT_WEB_FETCH_SEARCH_MAX_RESULTS,
     AGENT_WEB_FETCH_SEARCH_MAX_PAGES,
+    AGENT_WEB_FETCH_DOCUMENT_MAX_CHARS,
     TOOL_WEB_FETCH_TIMEOUT_MS,
     TOOL_WEB_FETCH_ARGS_TEMPLATE,
     PROMPT_TEMPLATE_NAME_MAX_CHARS,
@@ -286,6 +331,12 @@ from backend.src.constants.think_config import (
     EXECUTOR_ROLE_CODE,
     EXECUTOR_ROLE_DOC,
     EXECUTOR_ROLE_TEST,
+    THINK_PARALLEL_SCHEDULER_ROLE,
+    THINK_PARALLEL_SCHEDULER_CRITICAL_PATH,
+    THINK_PARALLEL_SCHEDULER_ENV,
+    THINK_PARALLEL_DEFAULT_STEP_SECONDS,
+    THINK_PARALLEL_DURATION_HISTORY_LIMIT,
+    THINK_EXECUTOR_ROLE_ACTION_TYPES,
 )
 
 from backend.src.constants.llm_config import (
@@ -475,6 +526,7 @@ __all__ = [
     "ERROR_MESSAGE_CHAT_ROLE_INVALID",
     "ERROR_MESSAGE_CHAT_QUERY_MISSING",
     "ERROR_MESSAGE_ACTION_UNSUPPORTED",
+    "ERROR_MESSAGE_ACTION_CANCELLED",
     "ERROR_MESSAGE_COMMAND_FAILED",
     "ERROR_MESSAGE_EXPECTATION_NOT_FOUND",
     "ERROR_MESSAGE_EVAL_NOT_FOUND",
@@ -484,6 +536,7 @@ __all__ = [
     "ERROR_MESSAGE_NODE_NOT_FOUND",
     "ERROR_MESSAGE_EDGE_NOT_FOUND",
     "ERROR_MESSAGE_RECORD_NOT_FOUND",
+    "ERROR_MESSAGE_SOURCE_REPUTATION_NOT_FOUND",
     "ERROR_MESSAGE_TOOL_NOT_FOUND",
     "ERROR_MESSAGE_TOOL_REQUIRED",
     "ERROR_MESSAGE_NOT_FOUND",
@@ -491,6 +544,25 @@ __all__ = [
     "DB_ENV_VAR",
     "DB_RELATIVE_PATH",
     "PROMPT_ENV_VAR",
+    "AGENT_STARTUP_SYNC_INCREMENTAL",
+    "AGENT_STARTUP_SYNC_BACKGROUND",
+    "AGENT_KNOWLEDGE_WATCH_ENABLED",
+    "AGENT_KNOWLEDGE_WATCH_POLL_INTERVAL_MS",
+    "AGENT_KNOWLEDGE_WATCH_DEBOUNCE_MS",
+    "AGENT_HTTP_ETAG_ENABLED",
+    "AGENT_STATE_CHANNEL_BUFFER",
+    "AGENT_STATE_CHANNEL_DEBOUNCE_MS",
+    "AGENT_STATE_CHANNEL_KEEPALIVE_SECONDS",
+    "AGENT_LLM_TOKENS_PER_MINUTE",
+    "AGENT_LLM_BACKGROUND_MAX_SHARE_PERCENT",
+    "AGENT_LLM_SINGLE_FLIGHT_ENABLED",
+    "AGENT_COORDINATION_BACKEND",
+    "AGENT_COORDINATION_DB_PATH",
+    "AGENT_COORDINATION_LEASE_TTL_SECONDS",
+    "AGENT_LLM_CLUSTER_RPM",
+    "AGENT_LLM_BLOB_STORE_ENABLED",
+    "AGENT_LLM_BLOB_MIN_CHARS",
+    "AGENT_LLM_BLOB_SECTION_MIN_CHARS",
     "APP_TITLE",
     "SINGLETON_ROW_ID",
     "SINGLE_ROW_LIMIT",
@@ -512,8 +584,29 @@ __all__ = [
     "AGENT_STREAM_PUMP_IDLE_TIMEOUT_SECONDS",
     "AGENT_THINK_PLANNING_TIMEOUT_SECONDS",
     "HTTP_REQUEST_DEFAULT_TIMEOUT_MS",
+    "AGENT_SHELL_OUTPUT_HEAD_BYTES",
+    "AGENT_SHELL_OUTPUT_TAIL_BYTES",
+    "AGENT_SHELL_OUTPUT_PROGRESS_INTERVAL_MS",
+    "AGENT_FILE_READ_DEFAULT_MAX_BYTES",
+    "AGENT_FILE_READ_DEFAULT_MAX_LINES",
+    "AGENT_FILE_READ_LINE_COUNT_MAX_BYTES",
+    "AGENT_FILE_LIST_DEFAULT_EXCLUDES",
+    "AGENT_FILE_LIST_MAX_SCAN_ENTRIES",
+    "AGENT_FILE_LIST_CACHE_ENTRIES_PER_RUN",
+    "AGENT_PROMPT_CACHE_CHECK_INTERVAL_MS",
+    "AGENT_SOURCE_REPUTATION_ENABLED",
+    "AGENT_SOURCE_COOLDOWN_BASE_SECONDS",
+    "AGENT_SOURCE_COOLDOWN_MAX_SECONDS",
+    "AGENT_PYTHON_WORKER_POOL_ENABLED",
+    "AGENT_PYTHON_WORKER_POOL_SIZE",
+    "AGENT_PYTHON_WORKER_MAX_RUNS",
+    "AGENT_PYTHON_WORKER_MAX_RSS_MB",
+    "AGENT_PYTHON_WORKER_PRELOAD",
     "AGENT_REACT_OBSERVATION_MAX_CHARS",
     "AGENT_REACT_ACTION_RETRY_MAX_ATTEMPTS",
+    "AGENT_REACT_ACTION_STREAMING",
+    "AGENT_REACT_SPECULATIVE_PREFETCH",
+    "AGENT_REACT_ASYNC_EXECUTION",
     "AGENT_REACT_ARTIFACT_AUTOFIX_MAX_ATTEMPTS",
     "AGENT_REACT_REPLAN_MAX_ATTEMPTS",
     "AGENT_REACT_REPEAT_FAILURE_MAX",
@@ -527,6 +620,7 @@ __all__ = [
     "AGENT_ARTIFACT_CSV_MIN_NUMERIC_RATIO",
     "AGENT_ARTIFACT_CSV_MAX_PLACEHOLDER_RATIO",
     "AGENT_ARTIFACT_CSV_MIN_DATE_SPAN_DAYS",
+    "AGENT_ARTIFACT_CSV_SAMPLE_ROWS",
     "JSON_PARSE_REQUIRE_RECENT_SOURCE_DEFAULT",
     "JSON_PARSE_SOURCE_MIN_TEXT_CHARS",
     "AGENT_REVIEW_PASS_SCORE_THRESHOLD",
@@ -598,6 +692,7 @@ __all__ = [
     "WEB_FETCH_SEARCH_URL_TEMPLATES_DEFAULT",
     "AGENT_WEB_FETCH_SEARCH_MAX_RESULTS",
     "AGENT_WEB_FETCH_SEARCH_MAX_PAGES",
+    "AGENT_WEB_FETCH_DOCUMENT_MAX_CHARS",
     "TOOL_WEB_FETCH_TIMEOUT_MS",
     "TOOL_WEB_FETCH_ARGS_TEMPLATE",
     "PROMPT_TEMPLATE_NAME_MAX_CHARS",
@@ -631,6 +726,12 @@ __all__ = [
     "EXECUTOR_ROLE_CODE",
     "EXECUTOR_ROLE_DOC",
     "EXECUTOR_ROLE_TEST",
+    "THINK_PARALLEL_SCHEDULER_ROLE",
+    "THINK_PARALLEL_SCHEDULER_CRITICAL_PATH",
+    "THINK_PARALLEL_SCHEDULER_ENV",
+    "THINK_PARALLEL_DEFAULT_STEP_SECONDS",
+    "THINK_PARALLEL_DURATION_HISTORY_LIMIT",
+    "THINK_EXECUTOR_ROLE_ACTION_TYPES",
     # llm_config
     "LLM_STATUS_RUNNING",
     "LLM_STATUS_SUCCESS",
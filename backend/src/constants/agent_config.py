@@ -13,6 +13,8 @@ Agent 配置常量。
 import os
 from typing import Final, Tuple
 
+from backend.src.constants.think_config import THINK_PARALLEL_SCHEDULER_ENV, THINK_PARALLEL_SCHEDULER_ROLE
+
 
 def _read_int_env(name: str, default: int, *, min_value: int = 0) -> int:
     """
@@ -33,6 +35,23 @@ def _read_int_env(name: str, default: int, *, min_value: int = 0) -> int:
 DB_ENV_VAR: Final = "AGENT_DB_PATH"
 DB_RELATIVE_PATH: Final = ("..", "data", "agent.db")
 PROMPT_ENV_VAR: Final = "AGENT_PROMPT_ROOT"
+# 启动同步（skills/memory/tools/graph 文件 -> SQLite）
+# 增量：按 file_sync_manifest（path/mtime/size/hash）只解析变化文件；设为 0 退回每次全量解析。
+AGENT_STARTUP_SYNC_INCREMENTAL: Final = _read_int_env("AGENT_STARTUP_SYNC_INCREMENTAL", 1, min_value=0) > 0
+# 后台：同步放到后台线程，服务先开始接收请求（同步完成前检索到的可能是上次的知识库）。默认关闭。
+AGENT_STARTUP_SYNC_BACKGROUND: Final = _read_int_env("AGENT_STARTUP_SYNC_BACKGROUND", 0, min_value=0) > 0
+# 知识目录文件监听：运行中编辑 skills/memory/tools/graph 文件后自动增量同步（无需重启）。
+# 装了 watchdog 则用原生事件（只处理事件里的路径）；否则按间隔轮询全量 stat。只同步变化的文件。默认关闭，设为 1 开启。
+AGENT_KNOWLEDGE_WATCH_ENABLED: Final = _read_int_env("AGENT_KNOWLEDGE_WATCH_ENABLED", 0, min_value=0) > 0
+AGENT_KNOWLEDGE_WATCH_POLL_INTERVAL_MS: Final = _read_int_env("AGENT_KNOWLEDGE_WATCH_POLL_INTERVAL_MS", 2000, min_value=100)
+# 防抖：目录静默该时长后才同步（批量拷贝/编辑器多次保存只同步一次）
+AGENT_KNOWLEDGE_WATCH_DEBOUNCE_MS: Final = _read_int_env("AGENT_KNOWLEDGE_WATCH_DEBOUNCE_MS", 500, min_value=0)
+# 高频轮询接口 ETag/304：资源族版本号未变化时不查库直接返回 304；设为 0 关闭。
+AGENT_HTTP_ETAG_ENABLED: Final = _read_int_env("AGENT_HTTP_ETAG_ENABLED", 1, min_value=0) > 0
+# 状态推送通道（/api/state/stream）：断线续传缓冲条数、心跳间隔、变更合并窗口
+AGENT_STATE_CHANNEL_BUFFER: Final = _read_int_env("AGENT_STATE_CHANNEL_BUFFER", 1000, min_value=10)
+AGENT_STATE_CHANNEL_KEEPALIVE_SECONDS: Final = _read_int_env("AGENT_STATE_CHANNEL_KEEPALIVE_SECONDS", 15, min_value=1)
+AGENT_STATE_CHANNEL_DEBOUNCE_MS: Final = _read_int_env("AGENT_STATE_CHANNEL_DEBOUNCE_MS", 200, min_value=0)
 
 # 应用信息
 APP_TITLE: Final = "智能体 API"
@@ -83,6 +102,12 @@ AGENT_REACT_PERSIST_MIN_INTERVAL_SECONDS: Final = 0.5
 # 该阈值用于限制 persist_loop_state 的最小间隔（秒），但 waiting/failed 等关键状态仍应立即落盘。
 AGENT_THINK_PARALLEL_PERSIST_MIN_INTERVAL_SECONDS: Final = 0.5
 
+# Think 并行执行：调度策略（role / critical_path，见 think_config.THINK_PARALLEL_SCHEDULER_*）
+# 说明：默认 role 保持“步骤固定归属 executor 角色”的既有行为；critical_path 需显式开启。
+AGENT_THINK_PARALLEL_SCHEDULER: Final = (
+    str(os.getenv(THINK_PARALLEL_SCHEDULER_ENV, "") or "").strip().lower() or THINK_PARALLEL_SCHEDULER_ROLE
+)
+
 # LLM 并发限制（同步调用，含规划/执行/反思等后台线程）
 # 说明：Think 并行执行可能触发多线程同时调用 LLM，容易遇到供应商限流（429）/连接抖动；
 # 通过全局与“按 provider+model”两级信号量限流，把峰值并发压到可控范围。
@@ -90,10 +115,85 @@ AGENT_THINK_PARALLEL_PERSIST_MIN_INTERVAL_SECONDS: Final = 0.5
 AGENT_LLM_MAX_CONCURRENCY_GLOBAL: Final = 8
 AGENT_LLM_MAX_CONCURRENCY_PER_MODEL: Final = 4
 
+# LLM 请求调度（进程内）：interactive > planning > postprocess > backfill
+# - AGENT_LLM_TOKENS_PER_MINUTE：按 prompt 长度估算的每分钟 token 预算（所有调用合计）；<=0 表示不限制
+# - AGENT_LLM_BACKGROUND_MAX_SHARE_PERCENT：后台类（postprocess/backfill）最多占用全局并发与 TPM 的百分比
+AGENT_LLM_TOKENS_PER_MINUTE: Final = _read_int_env("AGENT_LLM_TOKENS_PER_MINUTE", 0, min_value=0)
+AGENT_LLM_BACKGROUND_MAX_SHARE_PERCENT: Final = _read_int_env(
+    "AGENT_LLM_BACKGROUND_MAX_SHARE_PERCENT", 50, min_value=1
+)
+
+# LLM 请求合并（single-flight）：完全相同的并发调用只向供应商发一次并共享结果；0 关闭
+AGENT_LLM_SINGLE_FLIGHT_ENABLED: Final = _read_int_env("AGENT_LLM_SINGLE_FLIGHT_ENABLED", 1, min_value=0) > 0
+
+# 多进程/多实例协调（集群级准入）：local=仅进程内（默认）；sqlite=共享 SQLite 租约
+# 说明：多个 uvicorn worker / 多实例共享同一 DB 时改为 sqlite，run 准入、LLM 并发与 resume 认领在实例间共享容量。
+AGENT_COORDINATION_BACKEND: Final = (
+    str(os.getenv("AGENT_COORDINATION_BACKEND", "") or "").strip().lower() or "local"
+)
+# 协调库路径：为空则使用主库（各实例主库不同时，可指向同一个共享文件）
+AGENT_COORDINATION_DB_PATH: Final = str(os.getenv("AGENT_COORDINATION_DB_PATH", "") or "").strip()
+# 租约 TTL（秒）：持有进程按 TTL/3 续租；进程崩溃后最多 TTL 秒释放槽位
+AGENT_COORDINATION_LEASE_TTL_SECONDS: Final = _read_int_env("AGENT_COORDINATION_LEASE_TTL_SECONDS", 30, min_value=2)
+# 集群级 LLM 请求数限额（次/分钟，所有实例合计）；<=0 表示不限制
+AGENT_LLM_CLUSTER_RPM: Final = _read_int_env("AGENT_LLM_CLUSTER_RPM", 0, min_value=0)
+
+# llm_records 内容寻址存储：prompt/response 按段落去重并压缩后存入 llm_blobs，记录只保存引用
+# - 短于 AGENT_LLM_BLOB_MIN_CHARS 的文本仍内联存储；段落短于 AGENT_LLM_BLOB_SECTION_MIN_CHARS 时内联在清单中
+AGENT_LLM_BLOB_STORE_ENABLED: Final = _read_int_env("AGENT_LLM_BLOB_STORE_ENABLED", 1, min_value=0) > 0
+AGENT_LLM_BLOB_MIN_CHARS: Final = _read_int_env("AGENT_LLM_BLOB_MIN_CHARS", 512, min_value=1)
+AGENT_LLM_BLOB_SECTION_MIN_CHARS: Final = _read_int_env("AGENT_LLM_BLOB_SECTION_MIN_CHARS", 128, min_value=1)
+
 # Agent Shell 命令和 HTTP 超时
 AGENT_SHELL_COMMAND_DEFAULT_TIMEOUT_MS: Final = 20000
 HTTP_REQUEST_DEFAULT_TIMEOUT_MS: Final = 20000
 
+# Shell 子进程输出采集：每个流只在内存保留前 HEAD 与最后 TAIL 字节（中间以截断标记代替）；
+# 需要完整输出时 payload.spill_output=true 落盘到临时文件。进度事件按行限频（毫秒，0 表示不限频）。
+AGENT_SHELL_OUTPUT_HEAD_BYTES: Final = _read_int_env("AGENT_SHELL_OUTPUT_HEAD_BYTES", 1024 * 1024, min_value=1024)
+AGENT_SHELL_OUTPUT_TAIL_BYTES: Final = _read_int_env("AGENT_SHELL_OUTPUT_TAIL_BYTES", 256 * 1024, min_value=1024)
+AGENT_SHELL_OUTPUT_PROGRESS_INTERVAL_MS: Final = _read_int_env(
+    "AGENT_SHELL_OUTPUT_PROGRESS_INTERVAL_MS", 500, min_value=0
+)
+
+# file_read 窗口化读取：未指定 max_bytes 时单次最多返回的字节数；行区间模式默认行数；
+# 超过 LINE_COUNT_MAX_BYTES 的文件不主动统计总行数（避免为元数据扫描整个大文件）。
+AGENT_FILE_READ_DEFAULT_MAX_BYTES: Final = _read_int_env("AGENT_FILE_READ_DEFAULT_MAX_BYTES", 1024 * 1024, min_value=1024)
+AGENT_FILE_READ_DEFAULT_MAX_LINES: Final = _read_int_env("AGENT_FILE_READ_DEFAULT_MAX_LINES", 200, min_value=1)
+AGENT_FILE_READ_LINE_COUNT_MAX_BYTES: Final = _read_int_env(
+    "AGENT_FILE_READ_LINE_COUNT_MAX_BYTES", 256 * 1024 * 1024, min_value=0
+)
+
+# file_list（os.scandir）：递归列举时默认剪枝的目录（gitignore 语法，payload.exclude 可用 !name/ 取消）；
+# 单次列举最多检查的条目数（超出标记 truncated）；按 run 缓存列举结果的条数上限（目录 mtime 变化即失效）。
+AGENT_FILE_LIST_DEFAULT_EXCLUDES: Final = tuple(
+    item.strip()
+    for item in str(
+        os.getenv("AGENT_FILE_LIST_DEFAULT_EXCLUDES", "")
+        or ".git/,node_modules/,__pycache__/,.venv/,venv/,.mypy_cache/,.pytest_cache/,.tox/"
+    ).split(",")
+    if item.strip()
+)
+AGENT_FILE_LIST_MAX_SCAN_ENTRIES: Final = _read_int_env("AGENT_FILE_LIST_MAX_SCAN_ENTRIES", 200000, min_value=1)
+AGENT_FILE_LIST_CACHE_ENTRIES_PER_RUN: Final = _read_int_env("AGENT_FILE_LIST_CACHE_ENTRIES_PER_RUN", 32, min_value=0)
+
+# 系统提示词文件缓存：间隔内直接返回缓存内容，超过间隔才 stat 检查 mtime/size（毫秒，0 表示每次检查）。
+AGENT_PROMPT_CACHE_CHECK_INTERVAL_MS: Final = _read_int_env("AGENT_PROMPT_CACHE_CHECK_INTERVAL_MS", 2000, min_value=0)
+
+# Python 脚本热 worker 池（默认关闭；仅 POSIX）：常驻进程预导入 PRELOAD 模块后 fork 执行 `python script.py`，
+# 省去每一步的解释器启动/依赖导入；每个 worker 执行 MAX_RUNS 次或内存超过 MAX_RSS_MB 后回收。
+AGENT_PYTHON_WORKER_POOL_ENABLED: Final = _read_int_env("AGENT_PYTHON_WORKER_POOL_ENABLED", 0, min_value=0) > 0
+AGENT_PYTHON_WORKER_POOL_SIZE: Final = _read_int_env("AGENT_PYTHON_WORKER_POOL_SIZE", 2, min_value=1)
+AGENT_PYTHON_WORKER_MAX_RUNS: Final = _read_int_env("AGENT_PYTHON_WORKER_MAX_RUNS", 100, min_value=1)
+AGENT_PYTHON_WORKER_MAX_RSS_MB: Final = _read_int_env("AGENT_PYTHON_WORKER_MAX_RSS_MB", 1024, min_value=0)
+AGENT_PYTHON_WORKER_PRELOAD: Final = tuple(
+    item.strip()
+    for item in str(
+        os.getenv("AGENT_PYTHON_WORKER_PRELOAD", "") or "json,csv,re,datetime,urllib.request,requests,pandas"
+    ).split(",")
+    if item.strip()
+)
+
 # Agent ReAct 参数
 AGENT_REACT_OBSERVATION_MAX_CHARS: Final = 4000
 AGENT_REACT_ACTION_RETRY_MAX_ATTEMPTS: Final = 2
@@ -102,6 +202,15 @@ AGENT_REACT_REPLAN_MAX_ATTEMPTS: Final = _read_int_env("AGENT_REACT_REPLAN_MAX_A
 # ReAct 重复失败预算：同一错误签名连续命中达到阈值后直接失败收敛，
 # 避免外部依赖不可用时出现“失败-重规划-再失败”的长循环。
 AGENT_REACT_REPEAT_FAILURE_MAX: Final = _read_int_env("AGENT_REACT_REPEAT_FAILURE_MAX", 3, min_value=0)
+# ReAct 动作生成走流式输出：解析出第一个完整且合法的 action JSON 即中止生成（省去尾随文字的等待与 tokens）。
+# 默认关闭（部分 OpenAI 兼容实现的流式接口不稳定）；设为 1 开启，流式失败时自动回退非流式。
+AGENT_REACT_ACTION_STREAMING: Final = _read_int_env("AGENT_REACT_ACTION_STREAMING", 0, min_value=0) > 0
+# ReAct 投机预取：当前步骤（写文件/写记忆等观测可预测的动作）执行期间，提前生成下一步 action 文本，
+# 真实观测返回后再校验/复用。默认关闭（被丢弃的预取仍会消耗一次 LLM 调用）；设为 1 开启。
+AGENT_REACT_SPECULATIVE_PREFETCH: Final = _read_int_env("AGENT_REACT_SPECULATIVE_PREFETCH", 0, min_value=0) > 0
+# ReAct 异步执行：步骤动作、action 生成的 LLM 调用与子进程改为在 SSE 流的 event loop 上以 task 运行，
+# 客户端断开/外部停止时在途 LLM 请求被取消、子进程整组 kill。默认关闭（沿用线程执行）；设为 1 开启。
+AGENT_REACT_ASYNC_EXECUTION: Final = _read_int_env("AGENT_REACT_ASYNC_EXECUTION", 0, min_value=0) > 0
 
 # shell_command 执行保护（P0）
 # 说明：当 shell_command 运行本地脚本时，要求脚本必须由当前 run 的 file_write/file_append 产生，
@@ -126,6 +235,9 @@ AGENT_ARTIFACT_CSV_MIN_NUMERIC_ROWS: Final = 3
 AGENT_ARTIFACT_CSV_MIN_NUMERIC_RATIO: Final = 0.2
 AGENT_ARTIFACT_CSV_MAX_PLACEHOLDER_RATIO: Final = 0.8
 AGENT_ARTIFACT_CSV_MIN_DATE_SPAN_DAYS: Final = 7
+# 超过 SAMPLE_ROWS 行的 CSV 以蓄水池抽样估计比例（行数/日期跨度仍为全量统计），结果附 95% 置信区间；
+# 统计结果按 (path, mtime, size) 缓存，同一产物重复检查不再重读。
+AGENT_ARTIFACT_CSV_SAMPLE_ROWS: Final = _read_int_env("AGENT_ARTIFACT_CSV_SAMPLE_ROWS", 20000, min_value=100)
 
 # json_parse 来源绑定（P0）
 # 说明：解析 JSON 时优先要求 payload.text 来自最近成功步骤输出，降低模型直接内联/编造数据的风险。
@@ -289,6 +401,18 @@ AGENT_WEB_FETCH_SEARCH_MAX_PAGES: Final = _read_int_env(
     5,
     min_value=1,
 )
+# web_fetch 候选抽取：抓取结果构建文档模型（流式 HTML 解析）时读取的原文硬上限（字符）
+AGENT_WEB_FETCH_DOCUMENT_MAX_CHARS: Final = _read_int_env(
+    "AGENT_WEB_FETCH_DOCUMENT_MAX_CHARS",
+    400000,
+    min_value=4096,
+)
+
+# 来源信誉（source_reputation，按 host 跨 run 持久化）：web_fetch/http_request 每次尝试回写成功率/延迟 EWMA；
+# host 级失败（403/限流/缺 key/超时等）后进入冷却，时长按连续失败次数指数退避（秒），冷却中的 host 排到最后或跳过。
+AGENT_SOURCE_REPUTATION_ENABLED: Final = _read_int_env("AGENT_SOURCE_REPUTATION_ENABLED", 1, min_value=0) > 0
+AGENT_SOURCE_COOLDOWN_BASE_SECONDS: Final = _read_int_env("AGENT_SOURCE_COOLDOWN_BASE_SECONDS", 120, min_value=0)
+AGENT_SOURCE_COOLDOWN_MAX_SECONDS: Final = _read_int_env("AGENT_SOURCE_COOLDOWN_MAX_SECONDS", 6 * 3600, min_value=0)
 
 # curl:
 # -f：HTTP>=400 直接返回非 0（否则 429/403 会被当作“成功抓取”而污染后续步骤）
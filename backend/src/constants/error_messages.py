@@ -45,6 +45,7 @@ ERROR_MESSAGE_CHAT_QUERY_MISSING: Final = "q 不能为空"
 
 # 错误信息 - Action 相关
 ERROR_MESSAGE_ACTION_UNSUPPORTED: Final = "不支持的动作类型"
+ERROR_MESSAGE_ACTION_CANCELLED: Final = "动作已取消"
 ERROR_MESSAGE_COMMAND_FAILED: Final = "命令执行失败"
 
 # 错误信息 - 知识相关
@@ -56,6 +57,7 @@ ERROR_MESSAGE_SKILL_NOT_FOUND: Final = "技能不存在"
 ERROR_MESSAGE_NODE_NOT_FOUND: Final = "节点不存在"
 ERROR_MESSAGE_EDGE_NOT_FOUND: Final = "关系不存在"
 ERROR_MESSAGE_RECORD_NOT_FOUND: Final = "记录不存在"
+ERROR_MESSAGE_SOURCE_REPUTATION_NOT_FOUND: Final = "来源信誉记录不存在"
 
 # 错误信息 - 工具相关
 ERROR_MESSAGE_TOOL_NOT_FOUND: Final = "工具不存在"
@@ -346,8 +346,12 @@ AGENT_REACT_STEP_PROMPT_TEMPLATE: Final = (
     "- file_write: {{\"path\":\"test/output.txt\",\"content\":\"hello\"}}\n"
     "- 脚本类 file_write 应先写最小可执行版本，避免一次生成超长 content 导致动作被截断。\n"
     "- file_read: {{\"path\":\"test/output.txt\",\"encoding\":\"utf-8\",\"max_bytes\":2000}}\n"
+    "- file_read 大文件分页（不必整体读取）：行区间 {{\"path\":\"data/big.csv\",\"start_line\":1001,\"max_lines\":200}}；"
+    "尾部 {{\"path\":\"logs/run.log\",\"tail_lines\":50}}；检索 {{\"path\":\"logs/run.log\",\"grep\":\"ERROR|Traceback\",\"max_matches\":20}}；"
+    "字节续读 {{\"path\":\"data/big.json\",\"offset\":<next_offset>}}\n"
     "- file_append: {{\"path\":\"test/log.txt\",\"content\":\"ok\\n\"}}\n"
-    "- file_list: {{\"path\":\"test\",\"recursive\":false,\"max_entries\":50}}\n"
+    "- file_list: {{\"path\":\"test\",\"recursive\":false,\"max_entries\":50}}；"
+    "递归可限深度/排除/取最近修改 {{\"path\":\"src\",\"recursive\":true,\"max_depth\":3,\"exclude\":[\"*.log\",\"dist/\"],\"sort\":\"mtime\",\"max_entries\":20}}\n"
     "- file_delete: {{\"path\":\"test/output.txt\"}}\n"
     "- http_request: {{\"url\":\"https://<api-endpoint>\",\"method\":\"GET\",\"timeout_ms\":10000,\"fallback_urls\":[\"https://<mirror-1>\",\"https://<mirror-2>\"]}}\n"
     "- json_parse: {{\"text\":\"{{\\\\\"a\\\\\":1}}\",\"pick_keys\":[\"a\"]}}\n"
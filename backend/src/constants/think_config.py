@@ -11,6 +11,21 @@ Think 模式常量。
 
 from typing import Final
 
+from backend.src.constants.action_types import (
+    ACTION_TYPE_FILE_APPEND,
+    ACTION_TYPE_FILE_DELETE,
+    ACTION_TYPE_FILE_LIST,
+    ACTION_TYPE_FILE_READ,
+    ACTION_TYPE_FILE_WRITE,
+    ACTION_TYPE_HTTP_REQUEST,
+    ACTION_TYPE_JSON_PARSE,
+    ACTION_TYPE_LLM_CALL,
+    ACTION_TYPE_MEMORY_WRITE,
+    ACTION_TYPE_SHELL_COMMAND,
+    ACTION_TYPE_TASK_OUTPUT,
+    ACTION_TYPE_TOOL_CALL,
+)
+
 # Think 模式基础配置
 THINK_DEFAULT_PLANNER_COUNT: Final = 3
 THINK_TIEBREAKER_INDEX: Final = 0
@@ -53,3 +68,50 @@ THINK_PHASE_FINAL_VOTE: Final = "final_vote"
 EXECUTOR_ROLE_CODE: Final = "executor_code"
 EXECUTOR_ROLE_DOC: Final = "executor_doc"
 EXECUTOR_ROLE_TEST: Final = "executor_test"
+
+# 并行调度策略
+# - role：每个步骤固定由推断出的 executor 角色执行（默认，兼容既有行为）
+# - critical_path：按依赖图关键路径（历史 action 耗时加权）排序，空闲 executor 可跨角色窃取兼容的就绪步骤
+THINK_PARALLEL_SCHEDULER_ROLE: Final = "role"
+THINK_PARALLEL_SCHEDULER_CRITICAL_PATH: Final = "critical_path"
+THINK_PARALLEL_SCHEDULER_ENV: Final = "AGENT_THINK_PARALLEL_SCHEDULER"
+
+# 关键路径估算：无历史耗时样本时的单步默认耗时（秒），以及历史样本窗口（最近 N 条已完成步骤）
+THINK_PARALLEL_DEFAULT_STEP_SECONDS: Final = 5.0
+THINK_PARALLEL_DURATION_HISTORY_LIMIT: Final = 500
+
+# 跨角色窃取：各 executor 角色可承接的 action 类型。
+# 步骤 allow 全部落在该集合内时才允许被该角色窃取；user_prompt 步骤永不窃取（由全局栅栏处理）。
+THINK_EXECUTOR_ROLE_ACTION_TYPES: Final = {
+    EXECUTOR_ROLE_CODE: (
+        ACTION_TYPE_FILE_WRITE,
+        ACTION_TYPE_FILE_READ,
+        ACTION_TYPE_FILE_APPEND,
+        ACTION_TYPE_FILE_LIST,
+        ACTION_TYPE_FILE_DELETE,
+        ACTION_TYPE_SHELL_COMMAND,
+        ACTION_TYPE_TOOL_CALL,
+        ACTION_TYPE_HTTP_REQUEST,
+        ACTION_TYPE_JSON_PARSE,
+        ACTION_TYPE_LLM_CALL,
+        ACTION_TYPE_MEMORY_WRITE,
+        ACTION_TYPE_TASK_OUTPUT,
+    ),
+    EXECUTOR_ROLE_DOC: (
+        ACTION_TYPE_FILE_WRITE,
+        ACTION_TYPE_FILE_READ,
+        ACTION_TYPE_FILE_APPEND,
+        ACTION_TYPE_FILE_LIST,
+        ACTION_TYPE_LLM_CALL,
+        ACTION_TYPE_MEMORY_WRITE,
+    ),
+    EXECUTOR_ROLE_TEST: (
+        ACTION_TYPE_FILE_READ,
+        ACTION_TYPE_FILE_LIST,
+        ACTION_TYPE_SHELL_COMMAND,
+        ACTION_TYPE_TOOL_CALL,
+        ACTION_TYPE_HTTP_REQUEST,
+        ACTION_TYPE_JSON_PARSE,
+        ACTION_TYPE_LLM_CALL,
+    ),
+}
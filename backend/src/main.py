@@ -6,10 +6,18 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 
+from backend.src.api.conditional_get import ConditionalPollingMiddleware
 from backend.src.api.routes import router as api_router
 from backend.src.common.app_error_utils import app_error_response
 from backend.src.common.errors import AppError
-from backend.src.constants import APP_TITLE
+from backend.src.constants import (
+    AGENT_KNOWLEDGE_WATCH_DEBOUNCE_MS,
+    AGENT_KNOWLEDGE_WATCH_ENABLED,
+    AGENT_KNOWLEDGE_WATCH_POLL_INTERVAL_MS,
+    AGENT_STARTUP_SYNC_BACKGROUND,
+    AGENT_STARTUP_SYNC_INCREMENTAL,
+    APP_TITLE,
+)
 from backend.src.storage import init_db
 from backend.src.services.tasks.task_recovery import stop_running_task_records
 
@@ -76,37 +84,39 @@ def create_app() -> FastAPI:
         # 初始化数据库（放在 lifespan：避免 import 即产生副作用，且兼容 FastAPI 未来版本）
         init_db()
 
-        # 启动时同步本地 skills 文件到数据库，保证 Agent 能立即检索到最新技能库（失败不阻塞启动）。
-        try:
-            from backend.src.services.skills.skills_sync import sync_skills_from_files
-
-            sync_skills_from_files()
-        except Exception as exc:
-            logger.exception("sync_skills_from_files failed: %s", exc)
-
-        # 启动时同步本地 memory 文件到数据库，并补齐 uid/落盘（失败不阻塞启动）。
-        try:
-            from backend.src.services.memory.memory_store import sync_memory_from_files
-
-            sync_memory_from_files(prune=True)
-        except Exception as exc:
-            logger.exception("sync_memory_from_files failed: %s", exc)
+        # 启动时同步本地 skills/memory/tools/graph 文件到数据库（失败不阻塞启动）。
+        # - 增量：只解析 mtime/size/hash 有变化的文件，只 prune 已删除文件对应的记录；
+        # - 后台：AGENT_STARTUP_SYNC_BACKGROUND=1 时服务先接收请求，同步在后台线程完成。
+        # 同步完成后启动文件监听（运行中编辑知识文件自动增量同步）。
+        def _start_knowledge_watcher() -> None:
+            if not AGENT_KNOWLEDGE_WATCH_ENABLED:
+                return
+            try:
+                from backend.src.services.knowledge.knowledge_watcher import start_knowledge_watcher
+
+                start_knowledge_watcher(
+                    poll_interval_seconds=AGENT_KNOWLEDGE_WATCH_POLL_INTERVAL_MS / 1000.0,
+                    debounce_seconds=AGENT_KNOWLEDGE_WATCH_DEBOUNCE_MS / 1000.0,
+                )
+            except Exception as exc:
+                logger.exception("start knowledge watcher failed: %s", exc)
 
-        # 启动时同步本地 tools 文件到数据库（失败不阻塞启动）。
         try:
-            from backend.src.services.tools.tools_store import sync_tools_from_files
-
-            sync_tools_from_files(prune=True)
-        except Exception as exc:
-            logger.exception("sync_tools_from_files failed: %s", exc)
-
-        # 启动时同步本地 graph 文件到数据库（失败不阻塞启动）。
-        try:
-            from backend.src.services.graph.graph_store import sync_graph_from_files
+            from backend.src.services.system.startup_sync import (
+                run_startup_file_sync,
+                start_startup_file_sync_background,
+            )
 
-            sync_graph_from_files(prune=True)
+            if AGENT_STARTUP_SYNC_BACKGROUND:
+                start_startup_file_sync_background(
+                    incremental=AGENT_STARTUP_SYNC_INCREMENTAL,
+                    after=_start_knowledge_watcher,
+                )
+            else:
+                run_startup_file_sync(incremental=AGENT_STARTUP_SYNC_INCREMENTAL)
+                _start_knowledge_watcher()
         except Exception as exc:
-            logger.exception("sync_graph_from_files failed: %s", exc)
+            logger.exception("startup file sync failed: %s", exc)
 
         # 启动时兜底修复：将上一次异常退出遗留的 running 任务标记为 stopped，避免 UI 永久卡在“执行中”。
         try:
@@ -134,8 +144,38 @@ def create_app() -> FastAPI:
         except Exception as exc:
             logger.exception("start backfill_missing_agent_reviews thread failed: %s", exc)
 
+        # 启动兜底：为历史 agent run 补齐预计算汇总（/api/metrics 读 rollup；未汇总的 run 走实时口径）。
+        try:
+            from backend.src.services.metrics.run_summaries import start_run_summaries_backfill_background
+
+            start_run_summaries_backfill_background()
+        except Exception as exc:
+            logger.exception("start backfill_run_summaries thread failed: %s", exc)
+
+        # 可选：预热 Python 脚本 worker 池（AGENT_PYTHON_WORKER_POOL_ENABLED=1 时生效，后台线程）。
+        try:
+            from backend.src.services.execution.python_worker_pool import start_python_worker_pool_background
+
+            start_python_worker_pool_background()
+        except Exception as exc:
+            logger.exception("start python worker pool failed: %s", exc)
+
         yield
 
+        try:
+            from backend.src.services.execution.python_worker_pool import shutdown_python_worker_pool
+
+            shutdown_python_worker_pool()
+        except Exception as exc:
+            logger.exception("shutdown python worker pool failed: %s", exc)
+
+        try:
+            from backend.src.services.knowledge.knowledge_watcher import stop_knowledge_watcher
+
+            stop_knowledge_watcher()
+        except Exception as exc:
+            logger.exception("stop knowledge watcher failed: %s", exc)
+
         # 尽量在正常退出时落库（例如 Electron 先发 stop-running 再 kill、或 uvicorn 收到 SIGTERM）。
         try:
             stop_running_task_records(reason="shutdown")
@@ -149,6 +189,8 @@ def create_app() -> FastAPI:
         # 统一服务层异常协议：services 层只 raise AppError；API 层/全局 handler 转为 HTTP JSONResponse。
         return app_error_response(exc)
 
+    # 高频轮询接口：资源族版本未变化时直接 304（不查库）；先注册，位于 CORS 内层
+    app.add_middleware(ConditionalPollingMiddleware)
     app.add_middleware(
         CORSMiddleware,
         allow_origins=["*"],  # For development convenience
@@ -7,9 +7,10 @@
 
 import sqlite3
 
-from backend.src.migrations.schema import get_schema_sql
+from backend.src.migrations.schema import get_coordination_schema_sql, get_schema_sql
 from backend.src.migrations.columns import run_column_migrations
 from backend.src.migrations.fts import run_fts_setup
+from backend.src.migrations.indexes import run_index_setup
 from backend.src.migrations.seeds import run_all_seeds
 
 
@@ -20,8 +21,9 @@ def run_all_migrations(conn: sqlite3.Connection) -> None:
     执行顺序：
     1. 创建表结构
     2. 添加缺失的列
-    3. 设置 FTS 索引
-    4. 填充初始数据
+    3. 创建普通索引
+    4. 设置 FTS 索引
+    5. 填充初始数据
 
     Args:
         conn: 数据库连接
@@ -32,17 +34,22 @@ def run_all_migrations(conn: sqlite3.Connection) -> None:
     # 2. 添加缺失的列
     run_column_migrations(conn)
 
-    # 3. 设置 FTS 索引
+    # 3. 创建普通索引
+    run_index_setup(conn)
+
+    # 4. 设置 FTS 索引
     run_fts_setup(conn)
 
-    # 4. 填充初始数据
+    # 5. 填充初始数据
     run_all_seeds(conn)
 
 
 __all__ = [
     "run_all_migrations",
     "get_schema_sql",
+    "get_coordination_schema_sql",
     "run_column_migrations",
+    "run_index_setup",
     "run_fts_setup",
     "run_all_seeds",
 ]
@@ -128,6 +128,9 @@ COLUMN_MIGRATIONS: Dict[str, List[str]] = {
         "tokens_prompt INTEGER",
         "tokens_completion INTEGER",
         "tokens_total INTEGER",
+        "coalesced INTEGER NOT NULL DEFAULT 0",
+        "prompt_ref TEXT",
+        "response_ref TEXT",
     ],
     "eval_criteria_records": [
         "criterion TEXT",
@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+"""
+索引设置。
+
+在列迁移之后执行：旧库的 run_id 等列由 columns 迁移补齐后才能建索引。
+"""
+
+import logging
+import sqlite3
+from typing import List, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+# (索引名, 表名, 列)
+INDEX_DEFINITIONS: List[Tuple[str, str, str]] = [
+    # 运行汇总/指标：按 run 统计步骤数与 token，按时间窗筛选 run
+    ("idx_task_steps_run_id", "task_steps", "run_id"),
+    ("idx_llm_records_run_id", "llm_records", "run_id"),
+    ("idx_task_runs_created_at", "task_runs", "created_at"),
+    ("idx_run_summaries_day", "run_summaries", "day"),
+]
+
+
+def run_index_setup(conn: sqlite3.Connection) -> None:
+    """
+    确保索引存在（幂等；单个索引失败不影响其他索引）。
+
+    Args:
+        conn: 数据库连接
+    """
+    for name, table, columns in INDEX_DEFINITIONS:
+        try:
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})")
+        except sqlite3.OperationalError as exc:
+            logger.warning("create index %s failed: %s", name, exc)
@@ -47,6 +47,36 @@ def get_schema_sql() -> str:
         updated_at TEXT NOT NULL
     );
 
+    -- run 产物登记：file_write/file_append 写入时登记（path 已解析为绝对路径），供脚本绑定/产物检查按 run 直接查询
+    CREATE TABLE IF NOT EXISTS run_artifacts (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        task_id INTEGER NOT NULL,
+        run_id INTEGER NOT NULL,
+        step_id INTEGER,
+        path TEXT NOT NULL,
+        kind TEXT NOT NULL,
+        size INTEGER,
+        sha256 TEXT,
+        created_at TEXT NOT NULL,
+        updated_at TEXT NOT NULL,
+        UNIQUE (run_id, path)
+    );
+
+    -- 来源信誉：按 host 记录 web_fetch/http_request 的尝试结果，跨 run 复用（冷却到期时间为 epoch 秒）
+    CREATE TABLE IF NOT EXISTS source_reputation (
+        host TEXT PRIMARY KEY,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        successes INTEGER NOT NULL DEFAULT 0,
+        consecutive_failures INTEGER NOT NULL DEFAULT 0,
+        latency_ewma_ms REAL,
+        last_status TEXT,
+        last_error_code TEXT,
+        last_error_reason TEXT,
+        cooldown_until REAL,
+        created_at TEXT NOT NULL,
+        updated_at TEXT NOT NULL
+    );
+
     CREATE TABLE IF NOT EXISTS task_outputs (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
         task_id INTEGER NOT NULL,
@@ -214,7 +244,20 @@ def get_schema_sql() -> str:
         updated_at TEXT,
         tokens_prompt INTEGER,
         tokens_completion INTEGER,
-        tokens_total INTEGER
+        tokens_total INTEGER,
+        prompt_ref TEXT,
+        response_ref TEXT,
+        coalesced INTEGER NOT NULL DEFAULT 0
+    );
+
+    -- llm_records 的内容寻址 blob（按段落去重 + 压缩；记录通过 prompt_ref/response_ref 引用清单 blob）
+    CREATE TABLE IF NOT EXISTS llm_blobs (
+        hash TEXT PRIMARY KEY,
+        codec TEXT NOT NULL,
+        data BLOB NOT NULL,
+        raw_size INTEGER NOT NULL,
+        stored_size INTEGER NOT NULL,
+        created_at TEXT NOT NULL
     );
 
     CREATE TABLE IF NOT EXISTS prompt_templates (
@@ -357,4 +400,76 @@ def get_schema_sql() -> str:
         created_at TEXT NOT NULL,
         updated_at TEXT NOT NULL
     );
+
+    CREATE TABLE IF NOT EXISTS run_summaries (
+        run_id INTEGER PRIMARY KEY,
+        task_id INTEGER,
+        status TEXT NOT NULL,
+        mode TEXT NOT NULL,
+        day TEXT NOT NULL,
+        created_at TEXT NOT NULL,
+        step_count INTEGER NOT NULL DEFAULT 0,
+        tokens_total INTEGER NOT NULL DEFAULT 0,
+        replan_attempts INTEGER NOT NULL DEFAULT 0,
+        reflection_count INTEGER NOT NULL DEFAULT 0,
+        updated_at TEXT NOT NULL
+    );
+
+    CREATE TABLE IF NOT EXISTS run_daily_rollups (
+        day TEXT NOT NULL,
+        status TEXT NOT NULL,
+        mode TEXT NOT NULL,
+        runs INTEGER NOT NULL DEFAULT 0,
+        steps INTEGER NOT NULL DEFAULT 0,
+        tokens_total INTEGER NOT NULL DEFAULT 0,
+        replan_attempts INTEGER NOT NULL DEFAULT 0,
+        reflection_count INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (day, status, mode)
+    );
+
+    CREATE TABLE IF NOT EXISTS file_sync_manifest (
+        kind TEXT NOT NULL,
+        path TEXT NOT NULL,
+        mtime_ns INTEGER NOT NULL,
+        size INTEGER NOT NULL,
+        content_hash TEXT NOT NULL,
+        entity_key TEXT,
+        synced_at TEXT NOT NULL,
+        PRIMARY KEY (kind, path)
+    );
+    {get_coordination_schema_sql()}
+    """
+
+
+def get_coordination_schema_sql() -> str:
+    """
+    多进程协调表（租约/一次性认领/限额窗口）。
+
+    说明：协调库可以独立于主库（AGENT_COORDINATION_DB_PATH），因此单独提供，供协调层自行建表。
+    时间字段为 epoch 秒（REAL），便于跨进程直接比较过期时间。
+    """
+    return """
+    CREATE TABLE IF NOT EXISTS coordination_leases (
+        resource TEXT NOT NULL,
+        slot INTEGER NOT NULL,
+        holder TEXT NOT NULL,
+        acquired_at REAL NOT NULL,
+        expires_at REAL NOT NULL,
+        PRIMARY KEY (resource, slot)
+    );
+
+    CREATE TABLE IF NOT EXISTS coordination_claims (
+        claim_key TEXT PRIMARY KEY,
+        holder TEXT NOT NULL,
+        state TEXT NOT NULL,
+        created_at REAL NOT NULL,
+        expires_at REAL NOT NULL
+    );
+
+    CREATE TABLE IF NOT EXISTS coordination_budgets (
+        resource TEXT NOT NULL,
+        window_start INTEGER NOT NULL,
+        used INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (resource, window_start)
+    );
     """
@@ -1,17 +1,29 @@
+import os
+import threading
+import time
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional, Tuple
 
+from backend.src.constants import AGENT_PROMPT_CACHE_CHECK_INTERVAL_MS, PROMPT_ENV_VAR
 from backend.src.prompt.paths import repo_root, system_prompt_dir
 
 
-def load_system_prompt(name: str) -> Optional[str]:
-    """
-    从 backend/prompt/system/ 读取系统提示词。
+@dataclass(frozen=True)
+class _CachedPrompt:
+    path: Optional[str]
+    mtime_ns: int
+    size: int
+    text: Optional[str]
+    checked_at: float
 
-    约定：
-    - name 对应文件名（不含扩展名）
-    - 优先读取 .txt，其次 .md
-    """
+
+# (AGENT_PROMPT_ROOT 原值, name) -> 最近一次解析结果
+_CACHE_LOCK = threading.Lock()
+_CACHE: Dict[Tuple[str, str], _CachedPrompt] = {}
+
+
+def _candidate_paths(name: str):
     # 兼容：AGENT_PROMPT_ROOT 可能只覆盖 skills/memory 等目录，system 目录缺失时回退到仓库内置 prompts，
     # 避免单测/新手配置导致“提示词不存在”直接中断主链路。
     bases = [system_prompt_dir()]
@@ -23,14 +35,57 @@ def load_system_prompt(name: str) -> Optional[str]:
         pass
 
     for base in bases:
-        candidates = [
-            Path(base) / f"{name}.txt",
-            Path(base) / f"{name}.md",
-        ]
-        for path in candidates:
-            if path.exists() and path.is_file():
-                try:
-                    return path.read_text(encoding="utf-8")
-                except Exception:
-                    return None
-    return None
+        yield Path(base) / f"{name}.txt"
+        yield Path(base) / f"{name}.md"
+
+
+def _resolve_prompt_file(name: str) -> Tuple[Optional[str], int, int]:
+    for path in _candidate_paths(name):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        if not os.path.isfile(path):
+            continue
+        return str(path), int(stat.st_mtime_ns), int(stat.st_size)
+    return None, 0, 0
+
+
+def load_system_prompt(name: str) -> Optional[str]:
+    """
+    从 backend/prompt/system/ 读取系统提示词。
+
+    约定：
+    - name 对应文件名（不含扩展名）
+    - 优先读取 .txt，其次 .md
+
+    缓存：按解析到的路径 + mtime/size 缓存内容；CHECK_INTERVAL 内直接返回（不访问文件系统），
+    超过间隔才重新解析候选路径并 stat，文件未变化时不重读。
+    """
+    key = (str(os.getenv(PROMPT_ENV_VAR, "")), str(name))
+    now = time.monotonic()
+    interval = float(AGENT_PROMPT_CACHE_CHECK_INTERVAL_MS) / 1000.0
+    with _CACHE_LOCK:
+        cached = _CACHE.get(key)
+    if cached is not None and interval > 0 and now - cached.checked_at < interval:
+        return cached.text
+
+    path, mtime_ns, size = _resolve_prompt_file(name)
+    if cached is not None and (cached.path, cached.mtime_ns, cached.size) == (path, mtime_ns, size):
+        text = cached.text
+    elif path is None:
+        text = None
+    else:
+        try:
+            text = Path(path).read_text(encoding="utf-8")
+        except Exception:
+            text = None
+
+    with _CACHE_LOCK:
+        _CACHE[key] = _CachedPrompt(path=path, mtime_ns=mtime_ns, size=size, text=text, checked_at=now)
+    return text
+
+
+def clear_system_prompt_cache() -> None:
+    with _CACHE_LOCK:
+        _CACHE.clear()
@@ -190,11 +190,19 @@ def list_agent_reviews(
     limit: int,
     task_id: Optional[int],
     run_id: Optional[int],
+    before_id: Optional[int] = None,
     conn: Optional[sqlite3.Connection] = None,
 ) -> List[sqlite3.Row]:
+    """
+    按 id 倒序分页；传入 before_id 时走 keyset（id < before_id），忽略 offset。
+    """
     with provide_connection(conn) as inner:
         where = []
         params: list[Any] = []
+        if before_id is not None:
+            where.append("id < ?")
+            params.append(int(before_id))
+            offset = 0
         if task_id is not None:
             where.append("task_id = ?")
             params.append(int(task_id))
@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import sqlite3
+from typing import List, Optional, Tuple
+
+from backend.src.repositories.repo_conn import provide_connection
+
+# 说明：本模块的写操作都以 DELETE/INSERT/UPDATE 开头，sqlite3 会在第一条写语句前隐式 BEGIN，
+# 从而先拿到写锁（受 busy_timeout 约束地等待）再读：同一事务内的“检查 + 写入”不会被其他进程穿插。
+
+
+def try_acquire_lease(
+    *,
+    resource: str,
+    limit: int,
+    holder: str,
+    ttl_seconds: float,
+    now: float,
+    conn: Optional[sqlite3.Connection] = None,
+) -> Optional[int]:
+    """
+    尝试占用 resource 的一个槽位（0..limit-1），成功返回槽位号，已满返回 None。
+
+    槽位号是主键的一部分：即使两个进程同时选中同一个空槽，也只有一个 INSERT 能成功，
+    因此持有者数量永远不会超过 limit。
+    """
+    size = max(1, int(limit))
+    with provide_connection(conn) as inner:
+        inner.execute(
+            "DELETE FROM coordination_leases WHERE resource = ? AND expires_at <= ?",
+            (str(resource), float(now)),
+        )
+        rows = inner.execute(
+            "SELECT slot FROM coordination_leases WHERE resource = ? AND slot < ?",
+            (str(resource), size),
+        ).fetchall()
+        used = {int(row["slot"]) for row in rows}
+        for slot in range(size):
+            if slot in used:
+                continue
+            try:
+                inner.execute(
+                    "INSERT INTO coordination_leases (resource, slot, holder, acquired_at, expires_at) VALUES (?, ?, ?, ?, ?)",
+                    (str(resource), int(slot), str(holder), float(now), float(now) + float(ttl_seconds)),
+                )
+            except sqlite3.IntegrityError:
+                continue
+            return int(slot)
+    return None
+
+
+def release_lease(
+    *,
+    resource: str,
+    slot: int,
+    holder: str,
+    conn: Optional[sqlite3.Connection] = None,
+) -> bool:
+    with provide_connection(conn) as inner:
+        cursor = inner.execute(
+            "DELETE FROM coordination_leases WHERE resource = ? AND slot = ? AND holder = ?",
+            (str(resource), int(slot), str(holder)),
+        )
+        return int(cursor.rowcount or 0) > 0
+
+
+def renew_leases(
+    *,
+    holder: str,
+    ttl_seconds: float,
+    now: float,
+    conn: Optional[sqlite3.Connection] = None,
+) -> int:
+    """续租 holder 名下所有未过期的租约；已过期的租约可能已被其他进程接管，不再续。"""
+    with provide_connection(conn) as inner:
+        cursor = inner.execute(
+            "UPDATE coordination_leases SET expires_at = ? WHERE holder = ? AND expires_at > ?",
+            (float(now) + float(ttl_seconds), str(holder), float(now)),
+        )
+        return int(cursor.rowcount or 0)
+
+
+def list_active_leases(
+    *,
+    now: float,
+    resource_prefix: Optional[str] = None,
+    conn: Optional[sqlite3.Connection] = None,
+) -> List[sqlite3.Row]:
+    sql = "SELECT resource, slot, holder, acquired_at, expires_at FROM coordination_leases WHERE expires_at > ?"
+    params: list = [float(now)]
+    if resource_prefix:
+        sql += " AND resource LIKE ?"
+        params.append(f"{resource_prefix}%")
+    sql += " ORDER BY resource ASC, slot ASC"
+    with provide_connection(conn) as inner:
+        return list(inner.execute(sql, params).fetchall())
+
+
+def try_claim(
+    *,
+    claim_key: str,
+    holder: str,
+    ttl_seconds: float,
+    now: float,
+    conn: Optional[sqlite3.Connection] = None,
+) -> Tuple[bool, str]:
+    """
+    一次性认领：同一个 claim_key 在 TTL 内只有一个调用方能拿到。
+
+    返回 (claimed, state)：未拿到时 state 为当前持有者记录的状态（inflight/done/failed...）。
+    """
+    with provide_connection(conn) as inner:
+        inner.execute("DELETE FROM coordination_claims WHERE expires_at <= ?", (float(now),))
+        cursor = inner.execute(
+            "INSERT INTO coordination_claims (claim_key, holder, state, created_at, expires_at) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT(claim_key) DO NOTHING",
+            (str(claim_key), str(holder), "inflight", float(now), float(now) + float(ttl_seconds)),
+        )
+        if int(cursor.rowcount or 0) > 0:
+            return True, "inflight"
+        row = inner.execute(
+            "SELECT state FROM coordination_claims WHERE claim_key = ?",
+            (str(claim_key),),
+        ).fetchone()
+    return False, str(row["state"] if row else "") or "done"
+
+
+def set_claim_state(
+    *,
+    claim_key: str,
+    state: str,
+    ttl_seconds: float,
+    now: float,
+    conn: Optional[sqlite3.Connection] = None,
+) -> None:
+    with provide_connection(conn) as inner:
+        inner.execute(
+            "UPDATE coordination_claims SET state = ?, expires_at = ? WHERE claim_key = ?",
+            (str(state or "done"), float(now) + float(ttl_seconds), str(claim_key)),
+        )
+
+
+def release_claim(*, claim_key: str, conn: Optional[sqlite3.Connection] = None) -> None:
+    with provide_connection(conn) as inner:
+        inner.execute("DELETE FROM coordination_claims WHERE claim_key = ?", (str(claim_key),))
+
+
+def try_consume_budget(
+    *,
+    resource: str,
+    amount: int,
+    limit: int,
+    window_seconds: int,
+    now: float,
+    conn: Optional[sqlite3.Connection] = None,
+) -> bool:
+    """
+    固定窗口限额：当前窗口已用量 + amount 不超过 limit 时记账并返回 True。
+    """
+    window = max(1, int(window_seconds))
+    window_start = int(float(now) // window) * window
+    value = max(0, int(amount))
+    with provide_connection(conn) as inner:
+        inner.execute(
+            "DELETE FROM coordination_budgets WHERE resource = ? AND window_start < ?",
+            (str(resource), int(window_start)),
+        )
+        if value > int(limit):
+            return False
+        cursor = inner.execute(
+            "INSERT INTO coordination_budgets (resource, window_start, used) VALUES (?, ?, ?) "
+            "ON CONFLICT(resource, window_start) DO UPDATE SET used = used + excluded.used "
+            "WHERE used + excluded.used <= ?",
+            (str(resource), int(window_start), value, int(limit)),
+        )
+        return int(cursor.rowcount or 0) > 0
+
+
+def get_budget_usage(
+    *,
+    resource: str,
+    window_seconds: int,
+    now: float,
+    conn: Optional[sqlite3.Connection] = None,
+) -> int:
+    window = max(1, int(window_seconds))
+    window_start = int(float(now) // window) * window
+    with provide_connection(conn) as inner:
+        row = inner.execute(
+            "SELECT used FROM coordination_budgets WHERE resource = ? AND window_start = ?",
+            (str(resource), int(window_start)),
+        ).fetchone()
+    return int(row["used"]) if row else 0
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import sqlite3
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from backend.src.common.utils import now_iso
+from backend.src.repositories.repo_conn import provide_connection
+
+
+def list_file_sync_manifest(
+    *,
+    kind: str,
+    conn: Optional[sqlite3.Connection] = None,
+) -> Dict[str, sqlite3.Row]:
+    """
+    读取某类文件（skills/memory/tools/graph_nodes/graph_edges）的同步清单：path -> row。
+    """
+    sql = "SELECT path, mtime_ns, size, content_hash, entity_key FROM file_sync_manifest WHERE kind = ?"
+    with provide_connection(conn) as inner:
+        rows = inner.execute(sql, (str(kind),)).fetchall()
+    return {str(row["path"]): row for row in rows}
+
+
+def upsert_file_sync_manifest_entries(
+    *,
+    kind: str,
+    entries: Sequence[dict],
+    synced_at: Optional[str] = None,
+    conn: Optional[sqlite3.Connection] = None,
+) -> int:
+    """
+    批量写入清单条目（entries: path/mtime_ns/size/content_hash/entity_key）。
+    """
+    if not entries:
+        return 0
+    synced = synced_at or now_iso()
+    sql = (
+        "INSERT INTO file_sync_manifest (kind, path, mtime_ns, size, content_hash, entity_key, synced_at) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?) "
+        "ON CONFLICT(kind, path) DO UPDATE SET mtime_ns = excluded.mtime_ns, size = excluded.size, "
+        "content_hash = excluded.content_hash, entity_key = excluded.entity_key, synced_at = excluded.synced_at"
+    )
+    params: List[tuple] = [
+        (
+            str(kind),
+            str(item["path"]),
+            int(item["mtime_ns"]),
+            int(item["size"]),
+            str(item["content_hash"]),
+            item.get("entity_key"),
+            synced,
+        )
+        for item in entries
+    ]
+    with provide_connection(conn) as inner:
+        inner.executemany(sql, params)
+    return len(params)
+
+
+def delete_file_sync_manifest_entries(
+    *,
+    kind: str,
+    paths: Iterable[str],
+    conn: Optional[sqlite3.Connection] = None,
+) -> int:
+    params = [(str(kind), str(path)) for path in paths]
+    if not params:
+        return 0
+    sql = "DELETE FROM file_sync_manifest WHERE kind = ? AND path = ?"
+    with provide_connection(conn) as inner:
+        inner.executemany(sql, params)
+    return len(params)
+
+
+def clear_file_sync_manifest(
+    *,
+    kind: Optional[str] = None,
+    conn: Optional[sqlite3.Connection] = None,
+) -> int:
+    """
+    清空清单（kind 为空则全部清空）：下一次同步将退化为全量解析。
+    """
+    with provide_connection(conn) as inner:
+        if kind:
+            cursor = inner.execute("DELETE FROM file_sync_manifest WHERE kind = ?", (str(kind),))
+        else:
+            cursor = inner.execute("DELETE FROM file_sync_manifest")
+        return int(cursor.rowcount or 0)
@@ -0,0 +1,313 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from backend.src.common.content_blobs import (
+    compress_text,
+    content_hash,
+    decompress_text,
+    split_sections,
+)
+from backend.src.common.sql import in_clause_placeholders
+from backend.src.common.utils import now_iso
+from backend.src.constants import (
+    AGENT_LLM_BLOB_MIN_CHARS,
+    AGENT_LLM_BLOB_SECTION_MIN_CHARS,
+    AGENT_LLM_BLOB_STORE_ENABLED,
+)
+from backend.src.repositories.repo_conn import provide_connection
+
+# SQL 聚合查询（如最近动态 UNION）里无法就地解引用：用该前缀标记“这是 blob 引用”，查询后再按页解析
+LLM_BLOB_REF_MARKER = "\x01llm_blob:"
+
+# (列名, 引用列名)
+_LLM_TEXT_COLUMNS = (("prompt", "prompt_ref"), ("response", "response_ref"))
+_MANIFEST_VERSION = 1
+
+# blob 不可变：按 hash 缓存解码后的文本（ReAct 相邻步骤的 prompt 大段重复，命中率很高）
+_TEXT_CACHE_LOCK = threading.Lock()
+_TEXT_CACHE: "OrderedDict[str, str]" = OrderedDict()
+_TEXT_CACHE_MAX_ITEMS = 512
+
+
+def _cache_get(key: str) -> Optional[str]:
+    with _TEXT_CACHE_LOCK:
+        value = _TEXT_CACHE.get(key)
+        if value is not None:
+            _TEXT_CACHE.move_to_end(key)
+        return value
+
+
+def _cache_put(key: str, value: str) -> None:
+    with _TEXT_CACHE_LOCK:
+        _TEXT_CACHE[key] = value
+        _TEXT_CACHE.move_to_end(key)
+        while len(_TEXT_CACHE) > _TEXT_CACHE_MAX_ITEMS:
+            _TEXT_CACHE.popitem(last=False)
+
+
+def _put_blob(conn: sqlite3.Connection, text: str) -> str:
+    digest = content_hash(text)
+    exists = conn.execute("SELECT 1 FROM llm_blobs WHERE hash = ?", (digest,)).fetchone()
+    if exists:
+        return digest
+    codec, data = compress_text(text)
+    conn.execute(
+        "INSERT OR IGNORE INTO llm_blobs (hash, codec, data, raw_size, stored_size, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+        (digest, codec, sqlite3.Binary(data), len(str(text).encode("utf-8")), len(data), now_iso()),
+    )
+    return digest
+
+
+def should_store_llm_text(text: Optional[str]) -> bool:
+    return bool(AGENT_LLM_BLOB_STORE_ENABLED) and text is not None and len(str(text)) >= int(AGENT_LLM_BLOB_MIN_CHARS)
+
+
+def store_llm_text(text: str, *, conn: Optional[sqlite3.Connection] = None) -> str:
+    """
+    把一段 prompt/response 写入内容寻址 blob 存储，返回引用（清单 blob 的 hash）。
+
+    清单记录分段顺序：足够长的段落按 hash 引用（跨记录去重），短段落直接内联在清单里。
+    """
+    sections: List[Any] = []
+    with provide_connection(conn) as inner:
+        for part in split_sections(text):
+            if len(part) >= int(AGENT_LLM_BLOB_SECTION_MIN_CHARS):
+                sections.append(_put_blob(inner, part))
+            else:
+                sections.append({"t": part})
+        manifest = json.dumps({"v": _MANIFEST_VERSION, "s": sections}, ensure_ascii=False, separators=(",", ":"))
+        ref = _put_blob(inner, manifest)
+    _cache_put(f"text:{ref}", str(text))
+    return ref
+
+
+def _load_blob_texts(conn: sqlite3.Connection, hashes: Iterable[str]) -> Dict[str, str]:
+    out: Dict[str, str] = {}
+    missing: List[str] = []
+    for digest in dict.fromkeys(hashes):
+        cached = _cache_get(digest)
+        if cached is not None:
+            out[digest] = cached
+        else:
+            missing.append(digest)
+    for start in range(0, len(missing), 900):
+        chunk = missing[start : start + 900]
+        placeholders = in_clause_placeholders(chunk)
+        if not placeholders:
+            continue
+        rows = conn.execute(
+            f"SELECT hash, codec, data FROM llm_blobs WHERE hash IN ({placeholders})",
+            chunk,
+        ).fetchall()
+        for row in rows:
+            text = decompress_text(str(row["codec"]), bytes(row["data"]))
+            out[str(row["hash"])] = text
+            _cache_put(str(row["hash"]), text)
+    return out
+
+
+def load_llm_texts(refs: Sequence[str], *, conn: Optional[sqlite3.Connection] = None) -> Dict[str, str]:
+    """批量解引用：ref -> 原文（缺失的引用不出现在结果中）。"""
+    result: Dict[str, str] = {}
+    pending: List[str] = []
+    for ref in dict.fromkeys(str(r) for r in refs if r):
+        cached = _cache_get(f"text:{ref}")
+        if cached is not None:
+            result[ref] = cached
+        else:
+            pending.append(ref)
+    if not pending:
+        return result
+    with provide_connection(conn) as inner:
+        manifests = _load_blob_texts(inner, pending)
+        parsed: Dict[str, list] = {}
+        segment_hashes: List[str] = []
+        for ref, raw in manifests.items():
+            sections = (json.loads(raw) or {}).get("s") or []
+            parsed[ref] = sections
+            segment_hashes.extend(item for item in sections if isinstance(item, str))
+        segments = _load_blob_texts(inner, segment_hashes)
+    for ref, sections in parsed.items():
+        parts: List[str] = []
+        complete = True
+        for item in sections:
+            if isinstance(item, str):
+                if item not in segments:
+                    complete = False
+                    break
+                parts.append(segments[item])
+            else:
+                parts.append(str(item.get("t") or ""))
+        if complete:
+            text = "".join(parts)
+            result[ref] = text
+            _cache_put(f"text:{ref}", text)
+    return result
+
+
+def hydrate_llm_record_rows(
+    rows: Sequence[sqlite3.Row],
+    *,
+    conn: Optional[sqlite3.Connection] = None,
+) -> List[dict]:
+    """把 llm_records 行里的 blob 引用还原为 prompt/response 原文（调用方看到的字段与旧结构一致）。"""
+    items = [dict(row) for row in rows or []]
+    refs = [item.get(ref_col) for item in items for _col, ref_col in _LLM_TEXT_COLUMNS if item.get(ref_col)]
+    if not refs:
+        return items
+    texts = load_llm_texts(refs, conn=conn)
+    for item in items:
+        for col, ref_col in _LLM_TEXT_COLUMNS:
+            ref = item.get(ref_col)
+            if ref and ref in texts:
+                item[col] = texts[ref]
+    return items
+
+
+def hydrate_llm_record_row(
+    row: Optional[sqlite3.Row],
+    *,
+    conn: Optional[sqlite3.Connection] = None,
+) -> Optional[dict]:
+    if row is None:
+        return None
+    return hydrate_llm_record_rows([row], conn=conn)[0]
+
+
+def llm_text_sql_expr(alias: str, column: str) -> str:
+    """聚合查询中的 prompt/response 取值表达式：引用行返回“标记 + ref”，查询后用 resolve_llm_text_markers 解析。"""
+    return (
+        f"CASE WHEN {alias}.{column}_ref IS NOT NULL THEN '{LLM_BLOB_REF_MARKER}' || {alias}.{column}_ref "
+        f"ELSE {alias}.{column} END"
+    )
+
+
+def resolve_llm_text_markers(values: Sequence[Any], *, conn: Optional[sqlite3.Connection] = None) -> List[Any]:
+    refs = [
+        str(value)[len(LLM_BLOB_REF_MARKER) :]
+        for value in values
+        if isinstance(value, str) and value.startswith(LLM_BLOB_REF_MARKER)
+    ]
+    if not refs:
+        return list(values)
+    texts = load_llm_texts(refs, conn=conn)
+    out: List[Any] = []
+    for value in values:
+        if isinstance(value, str) and value.startswith(LLM_BLOB_REF_MARKER):
+            out.append(texts.get(value[len(LLM_BLOB_REF_MARKER) :], ""))
+        else:
+            out.append(value)
+    return out
+
+
+def list_referenced_llm_blob_refs(*, conn: Optional[sqlite3.Connection] = None) -> List[str]:
+    """llm_records 及其归档表中仍在使用的引用。"""
+    tables = ["llm_records"]
+    with provide_connection(conn) as inner:
+        if inner.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'archive_llm_records'"
+        ).fetchone():
+            columns = {row["name"] for row in inner.execute("PRAGMA table_info(archive_llm_records)").fetchall()}
+            if {"prompt_ref", "response_ref"} <= columns:
+                tables.append("archive_llm_records")
+        refs: List[str] = []
+        for table in tables:
+            for _col, ref_col in _LLM_TEXT_COLUMNS:
+                rows = inner.execute(f"SELECT DISTINCT {ref_col} AS ref FROM {table} WHERE {ref_col} IS NOT NULL").fetchall()
+                refs.extend(str(row["ref"]) for row in rows)
+    return list(dict.fromkeys(refs))
+
+
+def prune_orphan_llm_blobs(*, conn: Optional[sqlite3.Connection] = None) -> Dict[str, int]:
+    """删除不再被任何 llm_records（含归档）引用的清单与分段 blob。"""
+    with provide_connection(conn) as inner:
+        live_refs = list_referenced_llm_blob_refs(conn=inner)
+        live: set = set(live_refs)
+        manifests = _load_blob_texts(inner, live_refs)
+        for raw in manifests.values():
+            for item in (json.loads(raw) or {}).get("s") or []:
+                if isinstance(item, str):
+                    live.add(item)
+        rows = inner.execute("SELECT hash, stored_size FROM llm_blobs").fetchall()
+        orphan = [(str(row["hash"]), int(row["stored_size"] or 0)) for row in rows if str(row["hash"]) not in live]
+        for start in range(0, len(orphan), 900):
+            chunk = [digest for digest, _size in orphan[start : start + 900]]
+            placeholders = in_clause_placeholders(chunk)
+            if placeholders:
+                inner.execute(f"DELETE FROM llm_blobs WHERE hash IN ({placeholders})", chunk)
+    return {"deleted": len(orphan), "bytes": sum(size for _digest, size in orphan)}
+
+
+def get_llm_blob_stats(*, conn: Optional[sqlite3.Connection] = None) -> Dict[str, int]:
+    with provide_connection(conn) as inner:
+        row = inner.execute(
+            "SELECT COUNT(*) AS blobs, COALESCE(SUM(raw_size), 0) AS raw_bytes, COALESCE(SUM(stored_size), 0) AS stored_bytes FROM llm_blobs"
+        ).fetchone()
+    return {
+        "blobs": int(row["blobs"] or 0),
+        "raw_bytes": int(row["raw_bytes"] or 0),
+        "stored_bytes": int(row["stored_bytes"] or 0),
+    }
+
+
+def prepare_llm_text_column(
+    text: Optional[str],
+    *,
+    conn: Optional[sqlite3.Connection] = None,
+) -> Tuple[str, Optional[str]]:
+    """
+    写入 llm_records 前的列值：返回 (内联文本, 引用)。
+
+    - 长文本：内联列写空串，原文进入 blob 存储；
+    - 短文本或未启用：原样内联，引用为 None。
+    """
+    value = "" if text is None else str(text)
+    if not should_store_llm_text(value):
+        return value, None
+    return "", store_llm_text(value, conn=conn)
+
+
+def compact_inline_llm_records(
+    *,
+    after_id: int,
+    limit: int,
+    min_chars: int = AGENT_LLM_BLOB_MIN_CHARS,
+    conn: Optional[sqlite3.Connection] = None,
+) -> Dict[str, int]:
+    """
+    把一批历史内联的 prompt/response 转存为 blob 引用（按 id 递增，单事务）。
+
+    返回 last_id（本批最后处理的 id，0 表示没有待处理行）、rows、inline_bytes（转存前内联文本的字节数）。
+    """
+    threshold = max(1, int(min_chars))
+    last_id = 0
+    converted = 0
+    inline_bytes = 0
+    with provide_connection(conn) as inner:
+        rows = inner.execute(
+            "SELECT id, prompt, response, prompt_ref, response_ref FROM llm_records "
+            "WHERE id > ? AND ((prompt_ref IS NULL AND length(prompt) >= ?) OR (response_ref IS NULL AND length(response) >= ?)) "
+            "ORDER BY id ASC LIMIT ?",
+            (int(after_id), threshold, threshold, int(limit)),
+        ).fetchall()
+        for row in rows:
+            last_id = int(row["id"])
+            for col, ref_col in _LLM_TEXT_COLUMNS:
+                text = row[col]
+                if row[ref_col] is not None or text is None or len(str(text)) < threshold:
+                    continue
+                ref = store_llm_text(str(text), conn=inner)
+                # 条件更新：与并发写入（如 running 记录落 response）互不覆盖
+                cursor = inner.execute(
+                    f"UPDATE llm_records SET {col} = '', {ref_col} = ? WHERE id = ? AND {ref_col} IS NULL AND {col} = ?",
+                    (ref, last_id, text),
+                )
+                if cursor.rowcount:
+                    inline_bytes += len(str(text).encode("utf-8"))
+            converted += 1
+    return {"last_id": last_id, "rows": converted, "inline_bytes": inline_bytes}
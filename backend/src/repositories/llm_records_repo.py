@@ -4,6 +4,7 @@ import sqlite3
 from typing import List, Optional, Sequence
 
 from backend.src.common.utils import now_iso
+from backend.src.repositories.llm_blobs_repo import hydrate_llm_record_row, hydrate_llm_record_rows, prepare_llm_text_column
 from backend.src.repositories.repo_conn import provide_connection
 
 
@@ -14,7 +15,7 @@ def list_llm_records(
     offset: int,
     limit: int,
     conn: Optional[sqlite3.Connection] = None,
-) -> List[sqlite3.Row]:
+) -> List[dict]:
     conditions: List[str] = []
     params: List = []
     if task_id is not None:
@@ -28,25 +29,25 @@ def list_llm_records(
 
     sql = f"SELECT * FROM llm_records {where_clause} ORDER BY id ASC LIMIT ? OFFSET ?"
     with provide_connection(conn) as inner:
-        return list(inner.execute(sql, params).fetchall())
+        return hydrate_llm_record_rows(inner.execute(sql, params).fetchall(), conn=inner)
 
 
 def list_llm_records_for_task(
     *,
     task_id: int,
     conn: Optional[sqlite3.Connection] = None,
-) -> List[sqlite3.Row]:
+) -> List[dict]:
     sql = "SELECT * FROM llm_records WHERE task_id = ? ORDER BY id ASC"
     params = (int(task_id),)
     with provide_connection(conn) as inner:
-        return list(inner.execute(sql, params).fetchall())
+        return hydrate_llm_record_rows(inner.execute(sql, params).fetchall(), conn=inner)
 
 
-def get_llm_record(*, record_id: int, conn: Optional[sqlite3.Connection] = None) -> Optional[sqlite3.Row]:
+def get_llm_record(*, record_id: int, conn: Optional[sqlite3.Connection] = None) -> Optional[dict]:
     sql = "SELECT * FROM llm_records WHERE id = ?"
     params = (int(record_id),)
     with provide_connection(conn) as inner:
-        return inner.execute(sql, params).fetchone()
+        return hydrate_llm_record_row(inner.execute(sql, params).fetchone(), conn=inner)
 
 
 def create_llm_record(
@@ -63,10 +64,22 @@ def create_llm_record(
     created = created_at or now_iso()
     updated = updated_at or created
     sql = (
-        "INSERT INTO llm_records (prompt, response, task_id, run_id, status, created_at, updated_at) "
-        "VALUES (?, ?, ?, ?, ?, ?, ?)"
+        "INSERT INTO llm_records (prompt, response, prompt_ref, response_ref, task_id, run_id, status, created_at, updated_at) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
     )
-    params: Sequence = (prompt, response, task_id, run_id, status, created, updated)
     with provide_connection(conn) as inner:
+        prompt_value, prompt_ref = prepare_llm_text_column(prompt, conn=inner)
+        response_value, response_ref = prepare_llm_text_column(response, conn=inner)
+        params: Sequence = (
+            prompt_value,
+            response_value,
+            prompt_ref,
+            response_ref,
+            task_id,
+            run_id,
+            status,
+            created,
+            updated,
+        )
         cursor = inner.execute(sql, params)
         return int(cursor.lastrowid)
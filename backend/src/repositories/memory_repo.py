@@ -72,10 +72,18 @@ def list_memory_items(
     *,
     offset: int,
     limit: int,
+    after_id: Optional[int] = None,
     conn: Optional[sqlite3.Connection] = None,
 ) -> List[sqlite3.Row]:
-    sql = "SELECT * FROM memory_items ORDER BY id ASC LIMIT ? OFFSET ?"
-    params = (int(limit), int(offset))
+    """
+    按 id 正序分页；传入 after_id 时走 keyset（id > after_id），忽略 offset。
+    """
+    if after_id is not None:
+        sql = "SELECT * FROM memory_items WHERE id > ? ORDER BY id ASC LIMIT ?"
+        params: tuple = (int(after_id), int(limit))
+    else:
+        sql = "SELECT * FROM memory_items ORDER BY id ASC LIMIT ? OFFSET ?"
+        params = (int(limit), int(offset))
     with provide_connection(conn) as inner:
         return list(inner.execute(sql, params).fetchall())
 
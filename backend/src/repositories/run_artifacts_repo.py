@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import sqlite3
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+from backend.src.common.utils import now_iso
+from backend.src.repositories.repo_conn import provide_connection
+
+_RUN_ARTIFACT_UPSERT_SQL = (
+    "INSERT INTO run_artifacts (task_id, run_id, step_id, path, kind, size, sha256, created_at, updated_at) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT(run_id, path) DO UPDATE SET step_id = excluded.step_id, kind = excluded.kind, "
+    "size = excluded.size, sha256 = excluded.sha256, updated_at = excluded.updated_at"
+)
+
+
+@dataclass(frozen=True)
+class RunArtifactParams:
+    task_id: int
+    run_id: int
+    step_id: Optional[int]
+    path: str
+    kind: str
+    size: Optional[int] = None
+    sha256: Optional[str] = None
+
+
+def _run_artifact_values(params: RunArtifactParams, created_at: str) -> tuple:
+    return (
+        int(params.task_id),
+        int(params.run_id),
+        int(params.step_id) if params.step_id is not None else None,
+        str(params.path),
+        str(params.kind),
+        int(params.size) if params.size is not None else None,
+        params.sha256,
+        created_at,
+        created_at,
+    )
+
+
+def upsert_run_artifact(
+    params: RunArtifactParams,
+    *,
+    conn: Optional[sqlite3.Connection] = None,
+) -> None:
+    """同一 run 内同一路径只保留一行：重复写入时更新为最近一次的产出步骤/大小/哈希。"""
+    with provide_connection(conn) as inner:
+        inner.execute(_RUN_ARTIFACT_UPSERT_SQL, _run_artifact_values(params, now_iso()))
+
+
+def upsert_run_artifacts(
+    params_list: Sequence[RunArtifactParams],
+    *,
+    conn: Optional[sqlite3.Connection] = None,
+) -> int:
+    items = list(params_list or [])
+    if not items:
+        return 0
+    created_at = now_iso()
+    with provide_connection(conn) as inner:
+        inner.executemany(_RUN_ARTIFACT_UPSERT_SQL, [_run_artifact_values(item, created_at) for item in items])
+    return len(items)
+
+
+def list_run_artifacts(
+    *,
+    run_id: int,
+    conn: Optional[sqlite3.Connection] = None,
+) -> List[sqlite3.Row]:
+    with provide_connection(conn) as inner:
+        return list(
+            inner.execute(
+                "SELECT * FROM run_artifacts WHERE run_id = ? ORDER BY id ASC",
+                (int(run_id),),
+            ).fetchall()
+        )
+
+
+def delete_run_artifact(
+    *,
+    run_id: int,
+    path: str,
+    conn: Optional[sqlite3.Connection] = None,
+) -> int:
+    with provide_connection(conn) as inner:
+        cursor = inner.execute(
+            "DELETE FROM run_artifacts WHERE run_id = ? AND path = ?",
+            (int(run_id), str(path)),
+        )
+        return int(cursor.rowcount or 0)
+
+
+def delete_run_artifacts_under(
+    *,
+    run_id: int,
+    directory: str,
+    conn: Optional[sqlite3.Connection] = None,
+) -> int:
+    """删除目录（file_delete recursive）时移除其下的全部登记。"""
+    prefix = str(directory).rstrip("/\\")
+    with provide_connection(conn) as inner:
+        cursor = inner.execute(
+            "DELETE FROM run_artifacts WHERE run_id = ? AND (path = ? OR substr(path, 1, ?) IN (?, ?))",
+            (int(run_id), prefix, len(prefix) + 1, prefix + "/", prefix + "\\"),
+        )
+        return int(cursor.rowcount or 0)
+
+
+def list_runs_without_artifacts(
+    *,
+    statuses: Sequence[str],
+    conn: Optional[sqlite3.Connection] = None,
+) -> List[sqlite3.Row]:
+    """指定状态下尚无任何产物登记的 run（回填候选）。"""
+    items = [str(item) for item in statuses or [] if str(item or "").strip()]
+    if not items:
+        return []
+    placeholders = ",".join(["?"] * len(items))
+    sql = (
+        "SELECT r.id AS run_id, r.task_id AS task_id FROM task_runs r "
+        f"WHERE r.status IN ({placeholders}) "
+        "AND NOT EXISTS (SELECT 1 FROM run_artifacts a WHERE a.run_id = r.id) "
+        "ORDER BY r.id ASC"
+    )
+    with provide_connection(conn) as inner:
+        return list(inner.execute(sql, items).fetchall())
@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+import sqlite3
+from typing import Dict, List, Optional
+
+from backend.src.common.sql import in_clause_placeholders
+from backend.src.common.utils import coerce_int, extract_json_object, now_iso
+from backend.src.repositories.repo_conn import provide_connection
+
+# run_summaries 中参与 run_daily_rollups 累加的数值字段：summary 列 -> rollup 列
+_ROLLUP_FIELDS = (
+    ("step_count", "steps"),
+    ("tokens_total", "tokens_total"),
+    ("replan_attempts", "replan_attempts"),
+    ("reflection_count", "reflection_count"),
+)
+
+
+def is_agent_run_summary(summary: Optional[str]) -> bool:
+    """与指标口径一致：task_runs.summary LIKE 'agent_%'。"""
+    return str(summary or "").startswith("agent_")
+
+
+def _day_of(created_at: str) -> str:
+    return str(created_at or "")[:10]
+
+
+def _build_summary(conn: sqlite3.Connection, run_row: sqlite3.Row) -> dict:
+    run_id = int(run_row["id"])
+    state_obj = extract_json_object(run_row["agent_state"] or "") or {}
+    step_row = conn.execute("SELECT COUNT(*) AS c FROM task_steps WHERE run_id = ?", (run_id,)).fetchone()
+    token_row = conn.execute(
+        "SELECT COALESCE(SUM(tokens_total), 0) AS t FROM llm_records WHERE run_id = ?",
+        (run_id,),
+    ).fetchone()
+    created_at = str(run_row["created_at"] or "")
+    return {
+        "run_id": run_id,
+        "task_id": run_row["task_id"],
+        "status": str(run_row["status"] or "").strip(),
+        "mode": str(state_obj.get("mode") or "").strip().lower() or "do",
+        "day": _day_of(created_at),
+        "created_at": created_at,
+        "step_count": coerce_int(step_row["c"] if step_row else 0, default=0),
+        "tokens_total": coerce_int(token_row["t"] if token_row else 0, default=0),
+        "replan_attempts": coerce_int(state_obj.get("replan_attempts") or 0, default=0),
+        "reflection_count": coerce_int(state_obj.get("reflection_count") or 0, default=0),
+    }
+
+
+def _apply_rollup_delta(conn: sqlite3.Connection, summary: dict, sign: int) -> None:
+    """把一条 run 汇总计入（sign=1）或移出（sign=-1）对应的日汇总行。"""
+    values = [int(sign) * coerce_int(summary.get(src) or 0, default=0) for src, _dst in _ROLLUP_FIELDS]
+    conn.execute(
+        "INSERT INTO run_daily_rollups (day, status, mode, runs, steps, tokens_total, replan_attempts, reflection_count) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+        "ON CONFLICT(day, status, mode) DO UPDATE SET runs = runs + excluded.runs, steps = steps + excluded.steps, "
+        "tokens_total = tokens_total + excluded.tokens_total, replan_attempts = replan_attempts + excluded.replan_attempts, "
+        "reflection_count = reflection_count + excluded.reflection_count",
+        (summary["day"], summary["status"], summary["mode"], int(sign), *values),
+    )
+    if sign < 0:
+        conn.execute(
+            "DELETE FROM run_daily_rollups WHERE day = ? AND status = ? AND mode = ? AND runs <= 0",
+            (summary["day"], summary["status"], summary["mode"]),
+        )
+
+
+def _same_summary(old: sqlite3.Row, new: dict) -> bool:
+    keys = ("status", "mode", "day", "created_at") + tuple(src for src, _dst in _ROLLUP_FIELDS)
+    return all(str(old[key]) == str(new[key]) for key in keys)
+
+
+def refresh_run_summary(*, run_id: int, conn: Optional[sqlite3.Connection] = None) -> Optional[dict]:
+    """
+    重新计算单个 run 的汇总行，并把差值增量应用到 run_daily_rollups。
+
+    说明：
+    - 在 run 状态/agent_state 变化、步骤创建与收尾时调用，与对应写入处于同一事务；
+    - 汇总未变化时不写库，可放在步骤热路径上；
+    - 非 agent run（summary 不以 agent_ 开头）不做汇总，已有汇总会被移除。
+    """
+    with provide_connection(conn) as inner:
+        run_row = inner.execute(
+            "SELECT id, task_id, status, summary, agent_state, created_at FROM task_runs WHERE id = ?",
+            (int(run_id),),
+        ).fetchone()
+        old = inner.execute("SELECT * FROM run_summaries WHERE run_id = ?", (int(run_id),)).fetchone()
+
+        if not run_row or not is_agent_run_summary(run_row["summary"]):
+            if old is not None:
+                _apply_rollup_delta(inner, dict(old), -1)
+                inner.execute("DELETE FROM run_summaries WHERE run_id = ?", (int(run_id),))
+            return None
+
+        summary = _build_summary(inner, run_row)
+        if old is not None and _same_summary(old, summary):
+            return summary
+        if old is not None:
+            _apply_rollup_delta(inner, dict(old), -1)
+        _apply_rollup_delta(inner, summary, 1)
+        inner.execute(
+            "INSERT INTO run_summaries (run_id, task_id, status, mode, day, created_at, step_count, tokens_total, "
+            "replan_attempts, reflection_count, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(run_id) DO UPDATE SET task_id = excluded.task_id, status = excluded.status, mode = excluded.mode, "
+            "day = excluded.day, created_at = excluded.created_at, step_count = excluded.step_count, "
+            "tokens_total = excluded.tokens_total, replan_attempts = excluded.replan_attempts, "
+            "reflection_count = excluded.reflection_count, updated_at = excluded.updated_at",
+            (
+                summary["run_id"],
+                summary["task_id"],
+                summary["status"],
+                summary["mode"],
+                summary["day"],
+                summary["created_at"],
+                summary["step_count"],
+                summary["tokens_total"],
+                summary["replan_attempts"],
+                summary["reflection_count"],
+                now_iso(),
+            ),
+        )
+        return summary
+
+
+# 删除这些表的行会改变 run 汇总口径：表名 -> 关联 run_id 的列
+_SUMMARY_SOURCE_RUN_COLUMNS = {
+    "task_runs": "id",
+    "task_steps": "run_id",
+    "llm_records": "run_id",
+}
+
+
+def collect_summary_run_ids(
+    *,
+    table_name: str,
+    ids: List[int],
+    conn: Optional[sqlite3.Connection] = None,
+) -> List[int]:
+    """删除/归档前调用：返回受影响、删除后需要刷新汇总的 run_id。"""
+    column = _SUMMARY_SOURCE_RUN_COLUMNS.get(str(table_name or ""))
+    if not column or not ids:
+        return []
+    out: set[int] = set()
+    with provide_connection(conn) as inner:
+        for start in range(0, len(ids), 900):
+            chunk = [int(value) for value in ids[start : start + 900]]
+            placeholders = in_clause_placeholders(chunk)
+            rows = inner.execute(
+                f"SELECT DISTINCT {column} AS run_id FROM {table_name} WHERE id IN ({placeholders}) AND {column} IS NOT NULL",
+                chunk,
+            ).fetchall()
+            out.update(int(row["run_id"]) for row in rows)
+    return sorted(out)
+
+
+def refresh_run_summaries_for_steps(*, step_ids: List[int], conn: Optional[sqlite3.Connection] = None) -> int:
+    """步骤写入后调用：刷新这些步骤所属 run 的汇总。"""
+    with provide_connection(conn) as inner:
+        run_ids = collect_summary_run_ids(table_name="task_steps", ids=step_ids, conn=inner)
+        return refresh_run_summaries(run_ids=run_ids, conn=inner)
+
+
+def refresh_run_summaries(*, run_ids: List[int], conn: Optional[sqlite3.Connection] = None) -> int:
+    with provide_connection(conn) as inner:
+        for run_id in run_ids or []:
+            refresh_run_summary(run_id=int(run_id), conn=inner)
+    return len(run_ids or [])
+
+
+def list_agent_run_ids_missing_summary(
+    *,
+    after_id: int = 0,
+    limit: int = 500,
+    conn: Optional[sqlite3.Connection] = None,
+) -> List[int]:
+    sql = (
+        "SELECT r.id FROM task_runs r WHERE r.id > ? AND r.summary LIKE 'agent_%' "
+        "AND NOT EXISTS (SELECT 1 FROM run_summaries s WHERE s.run_id = r.id) ORDER BY r.id ASC LIMIT ?"
+    )
+    with provide_connection(conn) as inner:
+        rows = inner.execute(sql, (int(after_id), int(limit))).fetchall()
+    return [int(row["id"]) for row in rows]
+
+
+def aggregate_rollups_after_day(
+    *,
+    day: Optional[str],
+    conn: Optional[sqlite3.Connection] = None,
+) -> List[sqlite3.Row]:
+    """按 (status, mode) 汇总 day 之后（不含 day）的日汇总行；day 为空则汇总全部。"""
+    sql = (
+        "SELECT status, mode, SUM(runs) AS runs, SUM(steps) AS steps, SUM(tokens_total) AS tokens_total, "
+        "SUM(replan_attempts) AS replan_attempts, SUM(reflection_count) AS reflection_count FROM run_daily_rollups"
+    )
+    params: list = []
+    if day:
+        sql += " WHERE day > ?"
+        params.append(str(day))
+    sql += " GROUP BY status, mode"
+    with provide_connection(conn) as inner:
+        return list(inner.execute(sql, params).fetchall())
+
+
+def aggregate_summaries_for_day_since(
+    *,
+    day: str,
+    since: str,
+    conn: Optional[sqlite3.Connection] = None,
+) -> List[sqlite3.Row]:
+    """时间窗起始那一天只有部分 run 落在窗口内：直接从 run_summaries 精确聚合。"""
+    sql = (
+        "SELECT status, mode, COUNT(*) AS runs, SUM(step_count) AS steps, SUM(tokens_total) AS tokens_total, "
+        "SUM(replan_attempts) AS replan_attempts, SUM(reflection_count) AS reflection_count "
+        "FROM run_summaries WHERE day = ? AND created_at >= ? GROUP BY status, mode"
+    )
+    with provide_connection(conn) as inner:
+        return list(inner.execute(sql, (str(day), str(since))).fetchall())
+
+
+def list_unsummarized_agent_runs_since(
+    *,
+    since: Optional[str],
+    conn: Optional[sqlite3.Connection] = None,
+) -> List[sqlite3.Row]:
+    """时间窗内尚无汇总行的 agent run（历史数据未回填 / 外部直接写库）。"""
+    sql = (
+        "SELECT r.id, r.status, r.agent_state FROM task_runs r WHERE r.summary LIKE 'agent_%' "
+        "AND NOT EXISTS (SELECT 1 FROM run_summaries s WHERE s.run_id = r.id)"
+    )
+    params: list = []
+    if since:
+        sql += " AND r.created_at >= ?"
+        params.append(str(since))
+    sql += " ORDER BY r.id ASC"
+    with provide_connection(conn) as inner:
+        return list(inner.execute(sql, params).fetchall())
+
+
+def count_run_summaries(*, conn: Optional[sqlite3.Connection] = None) -> Dict[str, int]:
+    with provide_connection(conn) as inner:
+        summaries = inner.execute("SELECT COUNT(*) AS c FROM run_summaries").fetchone()
+        rollups = inner.execute("SELECT COUNT(*) AS c FROM run_daily_rollups").fetchone()
+    return {"summaries": int(summaries["c"] or 0), "rollup_rows": int(rollups["c"] or 0)}
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import sqlite3
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+from backend.src.common.sql import in_clause_placeholders
+from backend.src.common.utils import now_iso
+from backend.src.repositories.repo_conn import provide_connection
+
+# 单条语句完成“读-改-写”：ON CONFLICT 分支的 SET 表达式均基于旧行求值，
+# 并发回写同一 host 时不会丢失计数（无需 BEGIN IMMEDIATE）。
+# 冷却：host 级失败时 now + MIN(max, base * 2^MIN(旧连续失败数, max_exponent))，即按新连续失败数 n 取 base·2^(n-1)。
+_SOURCE_ATTEMPT_UPSERT_SQL = (
+    "INSERT INTO source_reputation (host, attempts, successes, consecutive_failures, latency_ewma_ms, "
+    "last_status, last_error_code, last_error_reason, cooldown_until, created_at, updated_at) "
+    "VALUES (:host, 1, :ok, :failure_step, :latency_ms, :status, :error_code, :error_reason, "
+    "CASE WHEN :cooling THEN :now + MIN(:cooldown_max, :cooldown_base) ELSE NULL END, :updated_at, :updated_at) "
+    "ON CONFLICT(host) DO UPDATE SET "
+    "attempts = attempts + 1, "
+    "successes = successes + :ok, "
+    "consecutive_failures = CASE WHEN :ok THEN 0 ELSE consecutive_failures + :failure_step END, "
+    "latency_ewma_ms = CASE WHEN :latency_ms IS NULL THEN latency_ewma_ms "
+    "WHEN latency_ewma_ms IS NULL THEN :latency_ms "
+    "ELSE latency_ewma_ms + :ewma_alpha * (:latency_ms - latency_ewma_ms) END, "
+    "last_status = :status, "
+    "last_error_code = CASE WHEN :ok THEN last_error_code ELSE :error_code END, "
+    "last_error_reason = CASE WHEN :ok THEN last_error_reason ELSE :error_reason END, "
+    "cooldown_until = CASE WHEN :ok THEN NULL "
+    "WHEN :cooling THEN :now + MIN(:cooldown_max, :cooldown_base * (1 << MIN(consecutive_failures, :max_exponent))) "
+    "ELSE cooldown_until END, "
+    "updated_at = :updated_at"
+)
+
+
+@dataclass(frozen=True)
+class SourceAttemptParams:
+    host: str
+    ok: bool
+    now: float
+    latency_ms: Optional[float] = None
+    error_code: Optional[str] = None
+    error_reason: Optional[str] = None
+    # host 级失败：连续失败 +1 并进入/延长冷却
+    host_level: bool = False
+    ewma_alpha: float = 0.3
+    cooldown_base_seconds: float = 0.0
+    cooldown_max_seconds: float = 0.0
+    cooldown_max_exponent: int = 16
+
+
+def get_source_reputation(*, host: str, conn: Optional[sqlite3.Connection] = None) -> Optional[sqlite3.Row]:
+    with provide_connection(conn) as inner:
+        return inner.execute("SELECT * FROM source_reputation WHERE host = ?", (str(host),)).fetchone()
+
+
+def get_source_reputations(
+    *,
+    hosts: Sequence[str],
+    conn: Optional[sqlite3.Connection] = None,
+) -> List[sqlite3.Row]:
+    items = sorted({str(host) for host in hosts or [] if str(host or "").strip()})
+    if not items:
+        return []
+    with provide_connection(conn) as inner:
+        return list(
+            inner.execute(
+                f"SELECT * FROM source_reputation WHERE host IN ({in_clause_placeholders(items)})",
+                items,
+            ).fetchall()
+        )
+
+
+def list_source_reputations(
+    *,
+    offset: int,
+    limit: int,
+    conn: Optional[sqlite3.Connection] = None,
+) -> List[sqlite3.Row]:
+    with provide_connection(conn) as inner:
+        return list(
+            inner.execute(
+                "SELECT * FROM source_reputation ORDER BY updated_at DESC, host ASC LIMIT ? OFFSET ?",
+                (int(limit), int(offset)),
+            ).fetchall()
+        )
+
+
+def record_source_attempt(
+    params: SourceAttemptParams,
+    *,
+    conn: Optional[sqlite3.Connection] = None,
+) -> None:
+    """原子地累加一次尝试结果（计数、延迟 EWMA、错误分类、冷却）。"""
+    cooling = bool(params.host_level and not params.ok)
+    with provide_connection(conn) as inner:
+        inner.execute(
+            _SOURCE_ATTEMPT_UPSERT_SQL,
+            {
+                "host": str(params.host),
+                "ok": 1 if params.ok else 0,
+                "failure_step": 1 if cooling else 0,
+                "latency_ms": float(params.latency_ms) if params.latency_ms is not None else None,
+                "status": "ok" if params.ok else "failed",
+                "error_code": params.error_code,
+                "error_reason": params.error_reason,
+                "cooling": 1 if cooling else 0,
+                "now": float(params.now),
+                "ewma_alpha": float(params.ewma_alpha),
+                "cooldown_base": float(params.cooldown_base_seconds),
+                "cooldown_max": float(params.cooldown_max_seconds),
+                "max_exponent": int(params.cooldown_max_exponent),
+                "updated_at": now_iso(),
+            },
+        )
+
+
+def delete_source_reputations(
+    *,
+    hosts: Optional[Sequence[str]] = None,
+    conn: Optional[sqlite3.Connection] = None,
+) -> int:
+    """hosts 为空时清空全表；返回删除行数。"""
+    with provide_connection(conn) as inner:
+        if hosts is None:
+            cursor = inner.execute("DELETE FROM source_reputation")
+        else:
+            items = sorted({str(host) for host in hosts if str(host or "").strip()})
+            if not items:
+                return 0
+            cursor = inner.execute(
+                f"DELETE FROM source_reputation WHERE host IN ({in_clause_placeholders(items)})",
+                items,
+            )
+        return int(cursor.rowcount or 0)
@@ -14,6 +14,7 @@ from backend.src.constants import (
     RUN_STATUS_WAITING,
 )
 from backend.src.repositories.repo_conn import provide_connection
+from backend.src.repositories.run_summaries_repo import refresh_run_summary
 
 
 def _status_items_and_placeholders(statuses: list[str]) -> tuple[list[str], Optional[str]]:
@@ -38,7 +39,14 @@ def _stop_task_runs(
         params.append(str(from_status or ""))
     sql = f"UPDATE task_runs SET status = ?, finished_at = ?, updated_at = ? WHERE {where_clause}"
     with provide_connection(conn) as inner:
+        affected = inner.execute(
+            f"SELECT id FROM task_runs WHERE {where_clause}",
+            params[3:],
+        ).fetchall()
         inner.execute(sql, params)
+        # 预计算汇总与状态变更同事务更新（/api/metrics 的 rollup 依赖它）
+        for row in affected:
+            refresh_run_summary(run_id=int(row["id"]), conn=inner)
 
 
 def create_task_run(
@@ -63,6 +71,7 @@ def create_task_run(
             (task_id, status, summary, started_at, finished_at, created, updated),
         )
         run_id = int(cursor.lastrowid)
+        refresh_run_summary(run_id=run_id, conn=inner)
     return run_id, created, updated
 
 
@@ -276,6 +285,11 @@ def update_task_run(
                 else:
                     raise
 
+            # 状态/类型/agent_state（replan_attempts、reflection_count）变化都会影响汇总；
+            # 汇总未变化时 refresh 不写库
+            if status is not None or summary is not None or agent_state is not None:
+                refresh_run_summary(run_id=int(run_id), conn=inner)
+
         # 无论是否更新字段，都返回最新 row（方便调用方直接使用）
         return get_task_run(run_id=run_id, conn=inner)
 
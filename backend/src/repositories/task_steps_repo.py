@@ -13,6 +13,7 @@ from backend.src.constants import (
     STEP_STATUS_SKIPPED,
 )
 from backend.src.repositories.repo_conn import provide_connection
+from backend.src.repositories.run_summaries_repo import refresh_run_summaries_for_steps, refresh_run_summary
 
 
 def _list_task_steps_rows(
@@ -124,6 +125,8 @@ def create_task_step(
             else:
                 raise
         step_id = int(cursor.lastrowid)
+        if run_id_value is not None:
+            refresh_run_summary(run_id=run_id_value, conn=inner)
     return step_id, created, updated
 
 
@@ -194,6 +197,33 @@ def get_last_non_planned_step_for_run(
         return inner.execute(sql, params).fetchone()
 
 
+def list_action_duration_stats(
+    *,
+    limit: int,
+    conn: Optional[sqlite3.Connection] = None,
+) -> list[sqlite3.Row]:
+    """
+    统计最近 limit 条已完成步骤的 action 平均耗时（秒），按 detail.type 分组。
+
+    说明：
+    - 用于 Think 并行调度的关键路径估算（只读、可容忍缺失）；
+    - detail 非法 JSON 或时间字段缺失的行直接忽略。
+    """
+    sql = (
+        "SELECT action_type, COUNT(*) AS samples, AVG(seconds) AS avg_seconds FROM ("
+        "SELECT CASE WHEN json_valid(detail) THEN json_extract(detail, '$.type') END AS action_type, "
+        "(julianday(finished_at) - julianday(started_at)) * 86400.0 AS seconds "
+        "FROM task_steps "
+        "WHERE status = ? AND started_at IS NOT NULL AND finished_at IS NOT NULL AND detail IS NOT NULL "
+        "ORDER BY id DESC LIMIT ?"
+        ") WHERE action_type IS NOT NULL AND seconds IS NOT NULL AND seconds >= 0 "
+        "GROUP BY action_type"
+    )
+    params = (STEP_STATUS_DONE, int(limit))
+    with provide_connection(conn) as inner:
+        return list(inner.execute(sql, params).fetchall())
+
+
 def reset_all_running_steps_to_planned(
     *,
     from_status: str,
@@ -426,6 +456,64 @@ def mark_task_step_skipped(
     )
 
 
+@dataclass(frozen=True)
+class TaskStepTransition:
+    """
+    单个步骤的状态迁移（批量写入用）：除 step_id/status 外，字段为 None 表示不修改。
+
+    说明：
+    - started_at 只在原值为空时写入（与 mark_task_step_running 一致）；
+    - updated_at 缺省取 finished_at/started_at/当前时间。
+    """
+
+    step_id: int
+    status: str
+    run_id: Optional[int] = None
+    attempts: Optional[int] = None
+    result: Optional[str] = None
+    error: Optional[str] = None
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    updated_at: Optional[str] = None
+
+
+def apply_task_step_transitions(
+    transitions: Sequence[TaskStepTransition],
+    *,
+    conn: Optional[sqlite3.Connection] = None,
+) -> int:
+    """
+    在单个事务内批量应用步骤状态迁移/结果写入（executemany），返回处理的条数。
+    """
+    items = list(transitions or [])
+    if not items:
+        return 0
+    now_value = now_iso()
+    sql = (
+        "UPDATE task_steps SET status = ?, run_id = COALESCE(?, run_id), attempts = COALESCE(?, attempts), "
+        "result = COALESCE(?, result), error = COALESCE(?, error), started_at = COALESCE(started_at, ?), "
+        "finished_at = COALESCE(?, finished_at), updated_at = ? WHERE id = ?"
+    )
+    rows = [
+        (
+            str(item.status or ""),
+            int(item.run_id) if item.run_id is not None else None,
+            int(item.attempts) if item.attempts is not None else None,
+            item.result,
+            item.error,
+            item.started_at,
+            item.finished_at,
+            item.updated_at or item.finished_at or item.started_at or now_value,
+            int(item.step_id),
+        )
+        for item in items
+    ]
+    with provide_connection(conn) as inner:
+        inner.executemany(sql, rows)
+        refresh_run_summaries_for_steps(step_ids=[int(item.step_id) for item in items], conn=inner)
+    return len(rows)
+
+
 def _reset_running_steps(
     *,
     from_status: str,
@@ -461,4 +549,6 @@ def _mark_task_step_finished(
     params = (str(status or ""), value, finished_at, updated, int(step_id))
     with provide_connection(conn) as inner:
         inner.execute(sql, params)
+        # 步骤收尾时该步的 LLM 调用已落库：同事务刷新 run 汇总（steps/tokens）
+        refresh_run_summaries_for_steps(step_ids=[int(step_id)], conn=inner)
     return updated
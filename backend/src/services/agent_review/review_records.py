@@ -54,6 +54,7 @@ def list_agent_reviews(
     limit: int,
     task_id: Optional[int],
     run_id: Optional[int],
+    before_id: Optional[int] = None,
     conn: Optional[sqlite3.Connection] = None,
 ):
     return agent_reviews_repo.list_agent_reviews(
@@ -61,6 +62,7 @@ def list_agent_reviews(
         limit=to_int(limit),
         task_id=to_optional_int(task_id),
         run_id=to_optional_int(run_id),
+        before_id=to_optional_int(before_id),
         conn=conn,
     )
 
@@ -6,14 +6,25 @@ from typing import List, Optional
 from backend.src.common.utils import json_preview, parse_json_value, truncate_text
 
 
-def build_artifacts_check(*, plan_artifacts: List[object], state_obj: Optional[dict]) -> tuple[str, List[dict], List[str]]:
+def build_artifacts_check(
+    *,
+    plan_artifacts: List[object],
+    state_obj: Optional[dict],
+    run_artifacts: Optional[List[dict]] = None,
+) -> tuple[str, List[dict], List[str]]:
     """
     依据 plan_artifacts + state.workdir 计算产物落盘检查结果。
 
     返回：(workdir, items, missing)
-    - items: [{"path": str, "exists": bool}]
+    - items: [{"path": str, "exists": bool}]；传入 run_artifacts（run 产物登记）时，
+      命中登记的条目附带 step_id/kind/size/sha256，评估可直接引用产出步骤
     - missing: [path, ...]
     """
+    registered = {
+        os.path.normcase(str(item.get("path"))): item
+        for item in run_artifacts or []
+        if isinstance(item, dict) and item.get("path")
+    }
     workdir = str(state_obj.get("workdir") or "").strip() if isinstance(state_obj, dict) else ""
     if not workdir:
         workdir = os.getcwd()
@@ -30,7 +41,11 @@ def build_artifacts_check(*, plan_artifacts: List[object], state_obj: Optional[d
             target = os.path.abspath(os.path.join(workdir, target))
         exists = bool(os.path.exists(target))
 
-        items.append({"path": rel, "exists": exists})
+        check_item = {"path": rel, "exists": exists}
+        produced = registered.get(os.path.normcase(target))
+        if produced:
+            check_item.update({key: produced.get(key) for key in ("step_id", "kind", "size", "sha256")})
+        items.append(check_item)
         if not exists:
             missing.append(rel)
 
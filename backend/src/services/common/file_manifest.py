@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import sqlite3
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+from backend.src.repositories.file_sync_manifest_repo import (
+    delete_file_sync_manifest_entries,
+    list_file_sync_manifest,
+    upsert_file_sync_manifest_entries,
+)
+
+FILE_SYNC_KIND_SKILLS = "skills"
+FILE_SYNC_KIND_MEMORY = "memory"
+FILE_SYNC_KIND_TOOLS = "tools"
+FILE_SYNC_KIND_GRAPH_NODES = "graph_nodes"
+FILE_SYNC_KIND_GRAPH_EDGES = "graph_edges"
+
+
+def _content_hash(data: bytes) -> str:
+    return hashlib.sha1(data).hexdigest()
+
+
+@dataclass
+class ManifestFile:
+    """
+    一个被扫描到的文件。
+
+    说明：
+    - rel：相对 base_dir 的路径（与各 sync 的 source_path 口径一致）；
+    - entity_key：该文件对应的 DB 实体主键（source_path/uid/id），来自清单或本次解析；
+    - 变更文件的内容已在哈希时读入，解析阶段直接复用，避免二次 IO。
+    """
+
+    path: Path
+    rel: str
+    manifest_path: str
+    mtime_ns: int
+    size: int
+    content_hash: Optional[str] = None
+    entity_key: Optional[str] = None
+    data: Optional[bytes] = None
+    dirty: bool = False
+
+    def read_text(self) -> str:
+        if self.data is None:
+            self.data = self.path.read_bytes()
+            self.content_hash = _content_hash(self.data)
+        return self.data.decode("utf-8")
+
+
+@dataclass
+class FileManifestScan:
+    """
+    一次增量扫描的结果：changed 需要解析/upsert，unchanged 可直接跳过（entity_key 来自清单）。
+    """
+
+    kind: str
+    base_dir: Path
+    incremental: bool
+    changed: List[ManifestFile] = field(default_factory=list)
+    unchanged: List[ManifestFile] = field(default_factory=list)
+    removed_paths: List[str] = field(default_factory=list)
+    # removed_paths 在清单里记录的实体主键（按路径同步时据此只删除这些实体）
+    removed_keys: Set[str] = field(default_factory=set)
+    hashed: int = 0
+
+    @property
+    def files(self) -> List[ManifestFile]:
+        return list(self.unchanged) + list(self.changed)
+
+    def requeue_missing(self, existing_keys: Set[str]) -> int:
+        """
+        清单认为未变化、但 DB 中已找不到对应实体的文件（例如 DB 被外部改动）重新放回 changed。
+        """
+        keep: List[ManifestFile] = []
+        moved = 0
+        for item in self.unchanged:
+            if item.entity_key is not None and str(item.entity_key) in existing_keys:
+                keep.append(item)
+                continue
+            self.changed.append(item)
+            moved += 1
+        self.unchanged = keep
+        return moved
+
+    def mark_synced(self, item: ManifestFile, entity_key: object) -> None:
+        """解析并写入 DB 成功后调用：本次同步结束时该文件的清单条目会被刷新。"""
+        if item.content_hash is None:
+            try:
+                item.read_text()
+            except Exception:
+                return
+        item.entity_key = str(entity_key)
+        item.dirty = True
+
+    def summary(self) -> dict:
+        return {
+            "incremental": bool(self.incremental),
+            "scanned": len(self.changed) + len(self.unchanged),
+            "changed": len(self.changed),
+            "unchanged": len(self.unchanged),
+            "hashed": int(self.hashed),
+        }
+
+
+def existing_paths_under(base_dir: Path, paths: Iterable[Path]) -> List[Path]:
+    """按路径同步时的“发现”：只取位于 base_dir 下且仍存在的文件（不遍历目录）。"""
+    base_prefix = os.path.abspath(str(base_dir)) + os.sep
+    out: List[Path] = []
+    for path in paths:
+        candidate = Path(path)
+        if not os.path.abspath(str(candidate)).startswith(base_prefix):
+            continue
+        if candidate.is_file():
+            out.append(candidate)
+    return sorted(out)
+
+
+def scan_file_manifest(
+    *,
+    kind: str,
+    base_dir: Path,
+    paths: Iterable[Path],
+    incremental: bool = True,
+    scope: Optional[Iterable[Path]] = None,
+    conn: Optional[sqlite3.Connection] = None,
+) -> FileManifestScan:
+    """
+    对比文件系统与 file_sync_manifest，找出需要重新解析的文件。
+
+    规则：
+    - mtime_ns/size 与清单一致：视为未变化（不读文件）；
+    - 否则读取内容算哈希：哈希一致只刷新清单里的 stat，不一致才进入 changed；
+    - incremental=False：全部进入 changed（全量同步，但仍会在结束时刷新清单）；
+    - scope：按路径同步（文件监听）时传入变更/删除的路径，只有其中不存在的文件才算 removed。
+    """
+    base = Path(base_dir)
+    scan = FileManifestScan(kind=str(kind), base_dir=base, incremental=bool(incremental))
+    manifest = list_file_sync_manifest(kind=kind, conn=conn)
+
+    seen: Set[str] = set()
+    for path in paths:
+        try:
+            rel = str(path.relative_to(base)).replace("\\", "/")
+        except ValueError:
+            rel = path.name
+        manifest_path = os.path.abspath(str(path))
+        seen.add(manifest_path)
+        try:
+            stat = path.stat()
+            mtime_ns, size = int(stat.st_mtime_ns), int(stat.st_size)
+        except OSError:
+            # stat 失败：交给解析阶段报错（并保留在 discovered 集合里，避免误删 DB）
+            scan.changed.append(ManifestFile(path=path, rel=rel, manifest_path=manifest_path, mtime_ns=0, size=-1))
+            continue
+
+        item = ManifestFile(path=path, rel=rel, manifest_path=manifest_path, mtime_ns=mtime_ns, size=size)
+        prev = manifest.get(manifest_path) if incremental else None
+        prev_key = str(prev["entity_key"]) if prev is not None and prev["entity_key"] is not None else None
+        if prev is not None and prev_key is not None:
+            item.entity_key = prev_key
+            if int(prev["mtime_ns"]) == mtime_ns and int(prev["size"]) == size:
+                item.content_hash = str(prev["content_hash"])
+                scan.unchanged.append(item)
+                continue
+            try:
+                item.read_text()
+            except Exception:
+                scan.changed.append(item)
+                continue
+            scan.hashed += 1
+            if item.content_hash == str(prev["content_hash"]):
+                # 仅 touch：内容未变，刷新 stat 即可
+                item.data = None
+                item.dirty = True
+                scan.unchanged.append(item)
+                continue
+        scan.changed.append(item)
+
+    base_prefix = os.path.abspath(str(base)) + os.sep
+    scope_set = {os.path.abspath(str(p)) for p in scope} if scope is not None else None
+    scan.removed_paths = [
+        p
+        for p in manifest
+        if p not in seen and p.startswith(base_prefix) and (scope_set is None or p in scope_set)
+    ]
+    scan.removed_keys = {
+        str(manifest[p]["entity_key"]) for p in scan.removed_paths if manifest[p]["entity_key"] is not None
+    }
+    return scan
+
+
+def save_file_manifest(scan: FileManifestScan, *, conn: Optional[sqlite3.Connection] = None) -> Dict[str, int]:
+    """
+    持久化本次扫描结果：刷新已同步文件的条目，删除已不存在文件的条目。
+    """
+    entries = [
+        {
+            "path": item.manifest_path,
+            "mtime_ns": item.mtime_ns,
+            "size": item.size,
+            "content_hash": item.content_hash,
+            "entity_key": item.entity_key,
+        }
+        for item in scan.files
+        if item.dirty and item.content_hash is not None and item.size >= 0
+    ]
+    written = upsert_file_sync_manifest_entries(kind=scan.kind, entries=entries, conn=conn)
+    removed = delete_file_sync_manifest_entries(kind=scan.kind, paths=scan.removed_paths, conn=conn)
+    return {"written": int(written), "removed": int(removed)}
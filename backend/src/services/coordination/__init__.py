@@ -0,0 +1,3 @@
+"""
+多进程/多实例协调层（集群级准入、LLM 限额、一次性认领）。
+"""
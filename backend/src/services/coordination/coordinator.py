@@ -0,0 +1,422 @@
+from __future__ import annotations
+
+import abc
+import asyncio
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from backend.src.constants import (
+    AGENT_COORDINATION_BACKEND,
+    AGENT_COORDINATION_DB_PATH,
+    AGENT_COORDINATION_LEASE_TTL_SECONDS,
+)
+from backend.src.repositories import coordination_repo
+
+logger = logging.getLogger(__name__)
+
+COORDINATION_BACKEND_LOCAL = "local"
+COORDINATION_BACKEND_SQLITE = "sqlite"
+
+# 等待槽位/限额时的轮询间隔（秒）
+_ACQUIRE_POLL_SECONDS = 0.05
+
+
+class CoordinationTimeout(TimeoutError):
+    """等待集群槽位/限额超时。"""
+
+
+@dataclass
+class Lease:
+    resource: str
+    slot: int
+    holder: str
+    acquired_at: float
+
+
+def _new_holder_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class CoordinationBackend(abc.ABC):
+    """
+    协调后端接口：租约（带上限的集群信号量）、一次性认领、固定窗口限额。
+
+    说明：
+    - distributed=False 表示只在本进程内生效（调用方可跳过，沿用进程内限流）；
+    - 阻塞/异步等待基于 try_* 轮询实现，后端只需提供非阻塞原语。
+    """
+
+    name = "base"
+    distributed = False
+
+    def __init__(self) -> None:
+        self.holder = _new_holder_id()
+
+    # --- 非阻塞原语（子类实现） ---
+    @abc.abstractmethod
+    def try_acquire(self, resource: str, limit: int) -> Optional[Lease]:
+        """尝试占用 resource 的一个槽位（上限 limit）；已满返回 None。"""
+
+    @abc.abstractmethod
+    def release(self, lease: Optional[Lease]) -> None:
+        """归还租约（幂等，None 忽略）。"""
+
+    @abc.abstractmethod
+    def claim(self, key: str, *, ttl_seconds: float) -> Tuple[bool, str]:
+        """一次性认领 key；返回 (是否由本次认领, 当前状态)。"""
+
+    @abc.abstractmethod
+    def set_claim_state(self, key: str, state: str, *, ttl_seconds: float) -> None:
+        """更新认领状态（如 inflight -> done）。"""
+
+    @abc.abstractmethod
+    def release_claim(self, key: str) -> None:
+        """释放认领。"""
+
+    @abc.abstractmethod
+    def try_consume_budget(self, resource: str, amount: int, *, limit: int, window_seconds: int) -> bool:
+        """在固定窗口内消耗 amount 的限额；超出 limit 返回 False。"""
+
+    def snapshot(self) -> dict:
+        return {"backend": self.name, "distributed": self.distributed, "holder": self.holder}
+
+    # --- 等待封装 ---
+    def acquire(self, resource: str, limit: int, *, timeout_seconds: Optional[float] = None) -> Lease:
+        deadline = None if timeout_seconds is None else time.monotonic() + max(0.0, float(timeout_seconds))
+        while True:
+            lease = self.try_acquire(resource, limit)
+            if lease is not None:
+                return lease
+            if deadline is not None and time.monotonic() >= deadline:
+                raise CoordinationTimeout(f"acquire {resource} timeout")
+            time.sleep(_ACQUIRE_POLL_SECONDS)
+
+    async def acquire_async(self, resource: str, limit: int, *, timeout_seconds: Optional[float] = None) -> Lease:
+        deadline = None if timeout_seconds is None else time.monotonic() + max(0.0, float(timeout_seconds))
+        while True:
+            lease = await asyncio.to_thread(self.try_acquire, resource, limit)
+            if lease is not None:
+                return lease
+            if deadline is not None and time.monotonic() >= deadline:
+                raise asyncio.TimeoutError(f"acquire {resource} timeout")
+            await asyncio.sleep(_ACQUIRE_POLL_SECONDS)
+
+    def consume_budget(
+        self,
+        resource: str,
+        amount: int,
+        *,
+        limit: int,
+        window_seconds: int,
+        timeout_seconds: Optional[float] = None,
+    ) -> None:
+        """等到当前窗口有余量并记账；超过 timeout 抛 CoordinationTimeout。"""
+        deadline = None if timeout_seconds is None else time.monotonic() + max(0.0, float(timeout_seconds))
+        while not self.try_consume_budget(resource, amount, limit=limit, window_seconds=window_seconds):
+            if amount > limit or (deadline is not None and time.monotonic() >= deadline):
+                raise CoordinationTimeout(f"budget {resource} exhausted")
+            time.sleep(min(1.0, max(_ACQUIRE_POLL_SECONDS, float(window_seconds) / 50.0)))
+
+
+class LocalCoordinationBackend(CoordinationBackend):
+    """进程内实现（默认）：单实例部署时与原有进程内限流等价。"""
+
+    name = COORDINATION_BACKEND_LOCAL
+    distributed = False
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._lock = threading.Lock()
+        self._leases: Dict[str, Set[int]] = {}
+        self._claims: Dict[str, Tuple[str, float]] = {}
+        self._budgets: Dict[Tuple[str, int], int] = {}
+
+    def try_acquire(self, resource: str, limit: int) -> Optional[Lease]:
+        with self._lock:
+            used = self._leases.setdefault(str(resource), set())
+            for slot in range(max(1, int(limit))):
+                if slot not in used:
+                    used.add(slot)
+                    return Lease(resource=str(resource), slot=slot, holder=self.holder, acquired_at=time.time())
+        return None
+
+    def release(self, lease: Optional[Lease]) -> None:
+        if lease is None:
+            return
+        with self._lock:
+            used = self._leases.get(lease.resource)
+            if used is not None:
+                used.discard(int(lease.slot))
+                if not used:
+                    self._leases.pop(lease.resource, None)
+
+    def claim(self, key: str, *, ttl_seconds: float) -> Tuple[bool, str]:
+        now = time.time()
+        with self._lock:
+            for claim_key, (_state, expires_at) in list(self._claims.items()):
+                if expires_at <= now:
+                    self._claims.pop(claim_key, None)
+            prev = self._claims.get(str(key))
+            if prev is not None:
+                return False, prev[0]
+            self._claims[str(key)] = ("inflight", now + float(ttl_seconds))
+        return True, "inflight"
+
+    def set_claim_state(self, key: str, state: str, *, ttl_seconds: float) -> None:
+        with self._lock:
+            self._claims[str(key)] = (str(state or "done"), time.time() + float(ttl_seconds))
+
+    def release_claim(self, key: str) -> None:
+        with self._lock:
+            self._claims.pop(str(key), None)
+
+    def try_consume_budget(self, resource: str, amount: int, *, limit: int, window_seconds: int) -> bool:
+        window = max(1, int(window_seconds))
+        window_start = int(time.time() // window) * window
+        with self._lock:
+            for key in [k for k in self._budgets if k[0] == str(resource) and k[1] < window_start]:
+                self._budgets.pop(key, None)
+            used = int(self._budgets.get((str(resource), window_start), 0))
+            if used + int(amount) > int(limit):
+                return False
+            self._budgets[(str(resource), window_start)] = used + int(amount)
+        return True
+
+    def snapshot(self) -> dict:
+        out = super().snapshot()
+        with self._lock:
+            out["leases"] = {resource: len(slots) for resource, slots in self._leases.items()}
+            out["claims"] = len(self._claims)
+        return out
+
+
+class SqliteCoordinationBackend(CoordinationBackend):
+    """
+    基于 SQLite 的集群协调：同一台机器上共享同一个 DB 文件的多个进程/实例共享容量。
+
+    说明：
+    - 租约带 TTL，由后台心跳线程按 TTL/3 续租；进程崩溃后最多 TTL 秒自动回收；
+    - 每次操作使用独立短连接（WAL + busy_timeout），不与业务长事务互相阻塞；
+    - 协调库可与主库分离（AGENT_COORDINATION_DB_PATH），此时只建协调表。
+    """
+
+    name = COORDINATION_BACKEND_SQLITE
+    distributed = True
+
+    def __init__(self, *, db_path: Optional[str] = None, lease_ttl_seconds: float = 30.0) -> None:
+        super().__init__()
+        self._db_path = str(db_path or "").strip() or None
+        self._ttl = max(1.0, float(lease_ttl_seconds))
+        self._schema_ready: Set[str] = set()
+        self._schema_lock = threading.Lock()
+        self._held_lock = threading.Lock()
+        self._held: Dict[Tuple[str, int], Lease] = {}
+        self._heartbeat_stop = threading.Event()
+        self._heartbeat_thread: Optional[threading.Thread] = None
+
+    @property
+    def db_path(self) -> str:
+        if self._db_path:
+            return self._db_path
+        from backend.src.storage import resolve_db_path
+
+        return resolve_db_path()
+
+    def _ensure_schema(self, conn: sqlite3.Connection, path: str) -> None:
+        if path in self._schema_ready:
+            return
+        with self._schema_lock:
+            if path in self._schema_ready:
+                return
+            from backend.src.migrations.schema import get_coordination_schema_sql
+
+            try:
+                conn.execute("PRAGMA journal_mode = WAL")
+            except sqlite3.OperationalError as exc:
+                logger.warning("coordination: set WAL failed: %s", exc)
+            conn.executescript(get_coordination_schema_sql())
+            self._schema_ready.add(path)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        path = self.db_path
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(path, timeout=15.0)
+        conn.row_factory = sqlite3.Row
+        try:
+            conn.execute("PRAGMA busy_timeout = 15000")
+            self._ensure_schema(conn, path)
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def try_acquire(self, resource: str, limit: int) -> Optional[Lease]:
+        now = time.time()
+        with self._connect() as conn:
+            slot = coordination_repo.try_acquire_lease(
+                resource=resource,
+                limit=limit,
+                holder=self.holder,
+                ttl_seconds=self._ttl,
+                now=now,
+                conn=conn,
+            )
+        if slot is None:
+            return None
+        lease = Lease(resource=str(resource), slot=int(slot), holder=self.holder, acquired_at=now)
+        with self._held_lock:
+            self._held[(lease.resource, lease.slot)] = lease
+        self._ensure_heartbeat()
+        return lease
+
+    def release(self, lease: Optional[Lease]) -> None:
+        if lease is None:
+            return
+        with self._held_lock:
+            self._held.pop((lease.resource, int(lease.slot)), None)
+        try:
+            with self._connect() as conn:
+                coordination_repo.release_lease(
+                    resource=lease.resource,
+                    slot=int(lease.slot),
+                    holder=lease.holder,
+                    conn=conn,
+                )
+        except sqlite3.Error as exc:
+            # 释放失败不影响主流程：租约会在 TTL 后过期回收
+            logger.warning("coordination: release %s#%s failed: %s", lease.resource, lease.slot, exc)
+
+    def renew(self) -> int:
+        with self._held_lock:
+            if not self._held:
+                return 0
+        with self._connect() as conn:
+            return coordination_repo.renew_leases(holder=self.holder, ttl_seconds=self._ttl, now=time.time(), conn=conn)
+
+    def _ensure_heartbeat(self) -> None:
+        if self._heartbeat_thread is not None and self._heartbeat_thread.is_alive():
+            return
+        with self._schema_lock:
+            if self._heartbeat_thread is not None and self._heartbeat_thread.is_alive():
+                return
+            self._heartbeat_stop.clear()
+            self._heartbeat_thread = threading.Thread(
+                target=self._heartbeat_loop,
+                name="coordination-heartbeat",
+                daemon=True,
+            )
+            self._heartbeat_thread.start()
+
+    def _heartbeat_loop(self) -> None:
+        interval = max(0.2, self._ttl / 3.0)
+        while not self._heartbeat_stop.wait(timeout=interval):
+            try:
+                self.renew()
+            except Exception as exc:
+                logger.warning("coordination: renew leases failed: %s", exc)
+
+    def stop(self) -> None:
+        self._heartbeat_stop.set()
+
+    def claim(self, key: str, *, ttl_seconds: float) -> Tuple[bool, str]:
+        with self._connect() as conn:
+            return coordination_repo.try_claim(
+                claim_key=key,
+                holder=self.holder,
+                ttl_seconds=ttl_seconds,
+                now=time.time(),
+                conn=conn,
+            )
+
+    def set_claim_state(self, key: str, state: str, *, ttl_seconds: float) -> None:
+        with self._connect() as conn:
+            coordination_repo.set_claim_state(
+                claim_key=key,
+                state=state,
+                ttl_seconds=ttl_seconds,
+                now=time.time(),
+                conn=conn,
+            )
+
+    def release_claim(self, key: str) -> None:
+        with self._connect() as conn:
+            coordination_repo.release_claim(claim_key=key, conn=conn)
+
+    def try_consume_budget(self, resource: str, amount: int, *, limit: int, window_seconds: int) -> bool:
+        with self._connect() as conn:
+            return coordination_repo.try_consume_budget(
+                resource=resource,
+                amount=amount,
+                limit=limit,
+                window_seconds=window_seconds,
+                now=time.time(),
+                conn=conn,
+            )
+
+    def active_leases(self, resource_prefix: Optional[str] = None) -> List[dict]:
+        with self._connect() as conn:
+            rows = coordination_repo.list_active_leases(now=time.time(), resource_prefix=resource_prefix, conn=conn)
+        return [dict(row) for row in rows]
+
+    def snapshot(self) -> dict:
+        out = super().snapshot()
+        out["db_path"] = self.db_path
+        out["lease_ttl_seconds"] = self._ttl
+        with self._held_lock:
+            out["held_leases"] = len(self._held)
+        try:
+            leases: Dict[str, int] = {}
+            for row in self.active_leases():
+                leases[row["resource"]] = leases.get(row["resource"], 0) + 1
+            out["leases"] = leases
+        except sqlite3.Error as exc:
+            out["error"] = str(exc)
+        return out
+
+
+_COORDINATOR_LOCK = threading.Lock()
+_COORDINATOR: Optional[CoordinationBackend] = None
+
+
+def build_coordinator(backend: Optional[str] = None) -> CoordinationBackend:
+    name = str(backend or AGENT_COORDINATION_BACKEND or "").strip().lower() or COORDINATION_BACKEND_LOCAL
+    if name == COORDINATION_BACKEND_SQLITE:
+        return SqliteCoordinationBackend(
+            db_path=AGENT_COORDINATION_DB_PATH or None,
+            lease_ttl_seconds=AGENT_COORDINATION_LEASE_TTL_SECONDS,
+        )
+    if name != COORDINATION_BACKEND_LOCAL:
+        logger.warning("unknown AGENT_COORDINATION_BACKEND=%s, fallback to local", name)
+    return LocalCoordinationBackend()
+
+
+def get_coordinator() -> CoordinationBackend:
+    """进程级单例（AGENT_COORDINATION_BACKEND：local/sqlite）。"""
+    global _COORDINATOR
+    with _COORDINATOR_LOCK:
+        if _COORDINATOR is None:
+            _COORDINATOR = build_coordinator()
+        return _COORDINATOR
+
+
+def set_coordinator(backend: Optional[CoordinationBackend]) -> None:
+    """替换进程级协调后端（测试/嵌入式部署使用；None 表示下次按配置重建）。"""
+    global _COORDINATOR
+    with _COORDINATOR_LOCK:
+        previous = _COORDINATOR
+        _COORDINATOR = backend
+    if isinstance(previous, SqliteCoordinationBackend) and previous is not backend:
+        previous.stop()
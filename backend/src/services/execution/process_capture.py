@@ -0,0 +1,545 @@
+"""
+子进程输出流式采集：边读边写入有界的 head/tail 缓冲，避免大输出把整个 stdout/stderr 读进内存。
+
+说明：
+- 每个流只保留前 head_bytes 与最后 tail_bytes 字节，中间部分以截断标记代替（总字节数照常统计）；
+- spill=True 时完整输出同时落盘（结果里返回路径），需要完整数据的调用方自行读取：文件放在
+  <cwd>/AGENT_EXPERIMENT_DIR_REL/shell_output 下（无 cwd 时用系统临时目录）；未截断的流输出已完整在结果里，
+  收尾时删除其落盘文件；异常/取消路径同样删除，只保留截断流的完整副本；
+- 进度：按行统计并限频回调最近一行（shell_output_progress_scope 注册的回调，ContextVar 传递），
+  ReAct 执行线程把它转成 step_progress 事件，经 run_blocking_call_with_progress 的 drain_events 推给 UI；
+- 子进程在独立进程组中启动：超时时整组 kill，不留孙进程；主进程先退出但后台孙进程仍持有输出管道时，
+  读取收尾同样受超时约束，到期整组 kill 并按超时返回。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import signal
+import subprocess
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from backend.src.constants import (
+    AGENT_EXPERIMENT_DIR_REL,
+    AGENT_SHELL_OUTPUT_HEAD_BYTES,
+    AGENT_SHELL_OUTPUT_PROGRESS_INTERVAL_MS,
+    AGENT_SHELL_OUTPUT_TAIL_BYTES,
+)
+
+STREAM_STDOUT = "stdout"
+STREAM_STDERR = "stderr"
+
+_READ_CHUNK_BYTES = 64 * 1024
+# 进度回调里“最近一行”的最大长度（超长行只保留末尾）
+_PROGRESS_LINE_MAX_BYTES = 4096
+_PROGRESS_LINE_MAX_CHARS = 200
+# 超时 kill 之后等待读取线程收尾的上限（Windows 下孙进程可能仍持有管道）
+_READER_JOIN_SECONDS = 2.0
+
+# 进度回调：payload = {"stream", "line", "lines", "bytes"}
+ProgressCallback = Callable[[Dict[str, Any]], None]
+
+_CURRENT_PROGRESS: ContextVar[Optional[ProgressCallback]] = ContextVar("shell_output_progress", default=None)
+
+
+@contextmanager
+def shell_output_progress_scope(callback: Optional[ProgressCallback]):
+    """在当前上下文内为 run_shell_command 注册输出进度回调（None 表示不需要进度）。"""
+    token = _CURRENT_PROGRESS.set(callback if callable(callback) else None)
+    try:
+        yield
+    finally:
+        _CURRENT_PROGRESS.reset(token)
+
+
+def current_shell_output_progress() -> Optional[ProgressCallback]:
+    return _CURRENT_PROGRESS.get()
+
+
+def build_context_output_progress(context: Optional[dict], *, action_type: str) -> Optional[ProgressCallback]:
+    """
+    把输出进度转成步骤事件写入 context["event_sink"]（ReAct 注入；没有 sink 时返回 None，不做行统计）。
+
+    事件：{"type": "shell_output", "action_type", task_id/run_id/step_id/step_order/step_title,
+           "stream", "line", "lines", "bytes"}
+    """
+    if not isinstance(context, dict):
+        return None
+    sink = context.get("event_sink")
+    if not callable(sink):
+        return None
+    base: Dict[str, Any] = {"type": "shell_output", "action_type": str(action_type or "")}
+    for key in ("task_id", "run_id", "step_id", "step_order", "step_title"):
+        value = context.get(key)
+        if value not in (None, ""):
+            base[key] = value
+
+    def _emit(progress: Dict[str, Any]) -> None:
+        payload = dict(base)
+        payload.update(progress)
+        sink(payload)
+
+    return _emit
+
+
+class _ProgressThrottle:
+    """多个流共享的限频器：interval 内最多回调一次，结束时补发最后一次。"""
+
+    def __init__(self, callback: Optional[ProgressCallback], interval_seconds: float) -> None:
+        self._callback = callback
+        self._interval = max(0.0, float(interval_seconds))
+        self._lock = threading.Lock()
+        self._next_at = 0.0
+        self._pending: Optional[Dict[str, Any]] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._callback is not None
+
+    def offer(self, payload: Dict[str, Any]) -> None:
+        if self._callback is None:
+            return
+        now_value = time.monotonic()
+        with self._lock:
+            if now_value < self._next_at:
+                self._pending = payload
+                return
+            self._next_at = now_value + self._interval
+            self._pending = None
+        self._emit(payload)
+
+    def flush(self) -> None:
+        with self._lock:
+            payload, self._pending = self._pending, None
+        if payload is not None:
+            self._emit(payload)
+
+    def _emit(self, payload: Dict[str, Any]) -> None:
+        try:
+            self._callback(payload)
+        except Exception:
+            return
+
+
+class OutputCapture:
+    """单个输出流的有界采集（线程内调用 feed；非线程安全）。"""
+
+    def __init__(
+        self,
+        *,
+        stream: str,
+        head_bytes: int = AGENT_SHELL_OUTPUT_HEAD_BYTES,
+        tail_bytes: int = AGENT_SHELL_OUTPUT_TAIL_BYTES,
+        spill_path: Optional[str] = None,
+        throttle: Optional[_ProgressThrottle] = None,
+    ) -> None:
+        self.stream = stream
+        self.head_limit = max(0, int(head_bytes))
+        self.tail_limit = max(0, int(tail_bytes))
+        self.total = 0
+        self.lines = 0
+        self.spill_path = spill_path
+        self._head = bytearray()
+        self._tail = bytearray()
+        self._line = bytearray()
+        self._spill = open(spill_path, "wb") if spill_path else None
+        self._throttle = throttle
+
+    @property
+    def truncated(self) -> bool:
+        return self.total > self.head_limit + self.tail_limit
+
+    def feed(self, chunk: bytes) -> None:
+        if not chunk:
+            return
+        self.total += len(chunk)
+        if self._spill is not None:
+            self._spill.write(chunk)
+        rest = chunk
+        room = self.head_limit - len(self._head)
+        if room > 0:
+            self._head += rest[:room]
+            rest = rest[room:]
+        if rest:
+            self._tail += rest
+            overflow = len(self._tail) - self.tail_limit
+            if overflow > 0:
+                del self._tail[:overflow]
+        if self._throttle is not None and self._throttle.enabled:
+            self._track_progress(chunk)
+
+    def _track_progress(self, chunk: bytes) -> None:
+        newlines = chunk.count(b"\n")
+        if not newlines:
+            self._line += chunk[-_PROGRESS_LINE_MAX_BYTES:]
+            if len(self._line) > _PROGRESS_LINE_MAX_BYTES:
+                del self._line[: len(self._line) - _PROGRESS_LINE_MAX_BYTES]
+            return
+        self.lines += newlines
+        body, _, partial = chunk.rpartition(b"\n")
+        last_break = body.rfind(b"\n")
+        last_line = body[last_break + 1 :] if last_break >= 0 else bytes(self._line) + body
+        self._line = bytearray(partial[-_PROGRESS_LINE_MAX_BYTES:])
+        text = last_line[-_PROGRESS_LINE_MAX_BYTES:].decode("utf-8", errors="replace").strip()
+        self._throttle.offer(
+            {
+                "stream": self.stream,
+                "line": text[-_PROGRESS_LINE_MAX_CHARS:],
+                "lines": self.lines,
+                "bytes": self.total,
+            }
+        )
+
+    def close(self) -> None:
+        if self._spill is not None:
+            try:
+                self._spill.close()
+            finally:
+                self._spill = None
+
+    def discard_spill(self) -> None:
+        """关闭并删除落盘文件（结果不再返回路径）。"""
+        self.close()
+        path, self.spill_path = self.spill_path, None
+        if path:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def getvalue(self) -> bytes:
+        """完整输出（未超限）或 head + 截断标记 + tail。"""
+        if not self.truncated:
+            return bytes(self._head) + bytes(self._tail)
+        omitted = self.total - len(self._head) - len(self._tail)
+        marker = f"\n...[truncated {omitted} bytes of {self.total}]...\n".encode("utf-8")
+        return bytes(self._head) + marker + bytes(self._tail)
+
+
+@dataclass
+class CapturedProcess:
+    stdout: bytes
+    stderr: bytes
+    returncode: Optional[int]
+    timed_out: bool
+    stdout_bytes: int
+    stderr_bytes: int
+    stdout_truncated: bool
+    stderr_truncated: bool
+    stdout_file: Optional[str] = None
+    stderr_file: Optional[str] = None
+
+    def extra_fields(self) -> Dict[str, Any]:
+        """截断/落盘信息（仅在发生时附加到结果中，保持普通命令的结果结构不变）。"""
+        extra: Dict[str, Any] = {}
+        for name in (STREAM_STDOUT, STREAM_STDERR):
+            if getattr(self, f"{name}_truncated"):
+                extra[f"{name}_truncated"] = True
+                extra[f"{name}_bytes"] = int(getattr(self, f"{name}_bytes"))
+            path = getattr(self, f"{name}_file")
+            if path:
+                extra[f"{name}_file"] = path
+        return extra
+
+
+def shell_output_spill_dir(cwd: Optional[str]) -> Optional[str]:
+    """落盘目录：命令工作目录下的 agent 工作区（与 python -c 落盘脚本同处）；无 cwd 时返回 None（系统临时目录）。"""
+    if not cwd:
+        return None
+    return os.path.join(str(cwd), str(AGENT_EXPERIMENT_DIR_REL).replace("/", os.sep), "shell_output")
+
+
+def _spill_path(stream: str, directory: Optional[str]) -> str:
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    fd, path = tempfile.mkstemp(prefix=f"shell_{stream}_", suffix=".log", dir=directory or None)
+    os.close(fd)
+    return path
+
+
+def _discard_captures(captures: List[OutputCapture]) -> None:
+    for capture in captures:
+        capture.discard_spill()
+
+
+def _build_captures(
+    *,
+    spill: bool,
+    head_bytes: Optional[int],
+    tail_bytes: Optional[int],
+    spill_dir: Optional[str] = None,
+) -> List[OutputCapture]:
+    throttle = _ProgressThrottle(
+        current_shell_output_progress(),
+        max(0, int(AGENT_SHELL_OUTPUT_PROGRESS_INTERVAL_MS)) / 1000.0,
+    )
+    head = AGENT_SHELL_OUTPUT_HEAD_BYTES if head_bytes is None else int(head_bytes)
+    tail = AGENT_SHELL_OUTPUT_TAIL_BYTES if tail_bytes is None else int(tail_bytes)
+    return [
+        OutputCapture(
+            stream=name,
+            head_bytes=head,
+            tail_bytes=tail,
+            spill_path=_spill_path(name, spill_dir) if spill else None,
+            throttle=throttle,
+        )
+        for name in (STREAM_STDOUT, STREAM_STDERR)
+    ]
+
+
+def _finish(captures: List[OutputCapture], returncode: Optional[int], timed_out: bool) -> CapturedProcess:
+    out, err = captures
+    for capture in captures:
+        capture.close()
+        if not capture.truncated:
+            capture.discard_spill()
+    if out._throttle is not None:
+        out._throttle.flush()
+    return CapturedProcess(
+        stdout=out.getvalue(),
+        stderr=err.getvalue(),
+        returncode=returncode,
+        timed_out=timed_out,
+        stdout_bytes=out.total,
+        stderr_bytes=err.total,
+        stdout_truncated=out.truncated,
+        stderr_truncated=err.truncated,
+        stdout_file=out.spill_path,
+        stderr_file=err.spill_path,
+    )
+
+
+def kill_process_group(proc: Any, *, orphans: bool = False) -> None:
+    """
+    超时/取消时结束整个进程组（POSIX 下以 start_new_session 启动），避免孙进程残留。
+
+    orphans=True：主进程已退出时仍按 pgid 结束组内残留的后台进程（仅 POSIX）。
+    """
+    if proc.returncode is not None and not (orphans and os.name != "nt"):
+        return
+    try:
+        if os.name != "nt":
+            os.killpg(proc.pid, signal.SIGKILL)
+        else:
+            proc.kill()
+    except ProcessLookupError:
+        return
+    except OSError:
+        try:
+            proc.kill()
+        except ProcessLookupError:
+            return
+
+
+def _pump(pipe, capture: OutputCapture) -> None:
+    try:
+        while True:
+            chunk = pipe.read1(_READ_CHUNK_BYTES)
+            if not chunk:
+                break
+            capture.feed(chunk)
+    except (OSError, ValueError):
+        pass
+    finally:
+        try:
+            pipe.close()
+        except OSError:
+            pass
+
+
+def _feed_stdin(pipe, data: bytes) -> None:
+    try:
+        if data:
+            pipe.write(data)
+    except (BrokenPipeError, OSError, ValueError):
+        pass
+    finally:
+        try:
+            pipe.close()
+        except OSError:
+            pass
+
+
+def _join_threads(threads: List[threading.Thread], deadline: Optional[float]) -> bool:
+    """等待线程结束（deadline 为 None 时不限时）；返回是否全部结束。"""
+    for thread in threads:
+        thread.join(timeout=None if deadline is None else max(0.0, deadline - time.monotonic()))
+    return not any(thread.is_alive() for thread in threads)
+
+
+def stream_process_output(
+    proc: Any,
+    *,
+    stdin_bytes: bytes = b"",
+    timeout: Optional[float] = None,
+    spill: bool = False,
+    spill_dir: Optional[str] = None,
+    head_bytes: Optional[int] = None,
+    tail_bytes: Optional[int] = None,
+) -> CapturedProcess:
+    """
+    对已启动的进程做流式采集：写 stdin、读 stdout/stderr、等待退出，超时整组 kill。
+
+    proc 为 Popen，或具备相同接口的对象（pid/returncode/stdin/stdout/stderr/wait(timeout)，
+    wait 超时抛 subprocess.TimeoutExpired），例如 python_worker_pool 中由常驻 worker fork 出的进程。
+    """
+    captures = _build_captures(spill=spill, spill_dir=spill_dir, head_bytes=head_bytes, tail_bytes=tail_bytes)
+    threads = [
+        threading.Thread(target=_pump, args=(proc.stdout, captures[0]), daemon=True),
+        threading.Thread(target=_pump, args=(proc.stderr, captures[1]), daemon=True),
+        threading.Thread(target=_feed_stdin, args=(proc.stdin, bytes(stdin_bytes or b"")), daemon=True),
+    ]
+    for thread in threads:
+        thread.start()
+
+    deadline = None if timeout is None else time.monotonic() + float(timeout)
+    timed_out = False
+    try:
+        proc.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        timed_out = True
+        kill_process_group(proc)
+        proc.wait()
+    except BaseException:
+        kill_process_group(proc)
+        proc.wait()
+        _join_threads(threads, time.monotonic() + _READER_JOIN_SECONDS)
+        _discard_captures(captures)
+        raise
+
+    if not timed_out and not _join_threads(threads, deadline):
+        # 主进程已退出，但后台孙进程仍持有输出管道：同样按超时处理
+        timed_out = True
+        kill_process_group(proc, orphans=True)
+    if timed_out:
+        _join_threads(threads, time.monotonic() + _READER_JOIN_SECONDS)
+
+    return _finish(captures, None if timed_out else proc.returncode, timed_out)
+
+
+def run_process_streaming(
+    args: Sequence[str],
+    *,
+    cwd: Optional[str],
+    stdin_bytes: bytes = b"",
+    timeout: Optional[float] = None,
+    spill: bool = False,
+    head_bytes: Optional[int] = None,
+    tail_bytes: Optional[int] = None,
+) -> CapturedProcess:
+    """
+    同步执行子进程并流式采集输出（启动失败时抛出 OSError/ValueError，由调用方转换为业务错误）。
+    落盘文件放在 shell_output_spill_dir(cwd) 下。
+    """
+    proc = subprocess.Popen(
+        list(args),
+        cwd=cwd,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        start_new_session=os.name != "nt",
+    )
+    return stream_process_output(
+        proc,
+        stdin_bytes=stdin_bytes,
+        timeout=timeout,
+        spill=spill,
+        spill_dir=shell_output_spill_dir(cwd),
+        head_bytes=head_bytes,
+        tail_bytes=tail_bytes,
+    )
+
+
+async def _pump_async(reader: asyncio.StreamReader, capture: OutputCapture) -> None:
+    while True:
+        chunk = await reader.read(_READ_CHUNK_BYTES)
+        if not chunk:
+            break
+        capture.feed(chunk)
+
+
+async def _feed_stdin_async(writer: asyncio.StreamWriter, data: bytes) -> None:
+    try:
+        if data:
+            writer.write(data)
+            await writer.drain()
+    except (BrokenPipeError, ConnectionResetError, OSError):
+        pass
+    finally:
+        try:
+            writer.close()
+        except OSError:
+            pass
+
+
+async def run_process_streaming_async(
+    args: Sequence[str],
+    *,
+    cwd: Optional[str],
+    stdin_bytes: bytes = b"",
+    timeout: Optional[float] = None,
+    spill: bool = False,
+    head_bytes: Optional[int] = None,
+    tail_bytes: Optional[int] = None,
+) -> CapturedProcess:
+    """run_process_streaming 的 asyncio 版本：调用方 task 被 cancel 时整组 kill 后再向上抛出。"""
+    captures = _build_captures(
+        spill=spill,
+        spill_dir=shell_output_spill_dir(cwd),
+        head_bytes=head_bytes,
+        tail_bytes=tail_bytes,
+    )
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            *args,
+            cwd=cwd,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            start_new_session=os.name != "nt",
+        )
+    except BaseException:
+        _discard_captures(captures)
+        raise
+
+    io_tasks = asyncio.gather(
+        _pump_async(proc.stdout, captures[0]),
+        _pump_async(proc.stderr, captures[1]),
+        _feed_stdin_async(proc.stdin, bytes(stdin_bytes or b"")),
+    )
+    deadline = None if timeout is None else time.monotonic() + float(timeout)
+    timed_out = False
+    try:
+        await asyncio.wait_for(asyncio.shield(proc.wait()), timeout=timeout)
+    except asyncio.TimeoutError:
+        # 部分 Python 版本的 proc.wait() 会等到输出管道关闭：主进程可能已退出，仍按进程组 kill 残留后台进程
+        timed_out = True
+        kill_process_group(proc, orphans=True)
+        await proc.wait()
+    except BaseException:
+        kill_process_group(proc, orphans=True)
+        await asyncio.shield(proc.wait())
+        io_tasks.cancel()
+        _discard_captures(captures)
+        raise
+
+    if not timed_out:
+        remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+        done, _pending = await asyncio.wait({io_tasks}, timeout=remaining)
+        if not done:
+            # 主进程已退出，但后台孙进程仍持有输出管道：同样按超时处理
+            timed_out = True
+            kill_process_group(proc, orphans=True)
+    if timed_out:
+        done, _pending = await asyncio.wait({io_tasks}, timeout=_READER_JOIN_SECONDS)
+        if not done:
+            io_tasks.cancel()
+            await asyncio.gather(io_tasks, return_exceptions=True)
+    return _finish(captures, None if timed_out else proc.returncode, timed_out)
@@ -0,0 +1,376 @@
+"""
+Python 脚本热 worker 池（可选，AGENT_PYTHON_WORKER_POOL_ENABLED=1 开启；仅 POSIX）。
+
+说明：
+- 工具脚本/shell_command 大多是 `python xxx.py ...`，每一步都要付出解释器启动 + 导入 pandas/requests 的开销；
+- 开启后由常驻 worker（python_worker_server，预导入 AGENT_PYTHON_WORKER_PRELOAD）fork 子进程执行脚本：
+  argv/cwd/stdin/env 按本次调用隔离，子进程独立进程组，输出同样走 process_capture 的流式采集，
+  返回结构与 subprocess 路径一致；
+- worker 执行满 AGENT_PYTHON_WORKER_MAX_RUNS 次或常驻内存超过 AGENT_PYTHON_WORKER_MAX_RSS_MB 后回收重建；
+- 不满足条件（非 `sys.executable script.py` 形式、带解释器参数、Windows、worker 异常）时返回 None，
+  调用方回退到普通子进程执行。
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import selectors
+import shutil
+import socket
+import struct
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional, Sequence
+
+from backend.src.constants import (
+    AGENT_PYTHON_WORKER_MAX_RSS_MB,
+    AGENT_PYTHON_WORKER_MAX_RUNS,
+    AGENT_PYTHON_WORKER_POOL_ENABLED,
+    AGENT_PYTHON_WORKER_POOL_SIZE,
+    AGENT_PYTHON_WORKER_PRELOAD,
+)
+from backend.src.services.execution.process_capture import (
+    CapturedProcess,
+    shell_output_spill_dir,
+    stream_process_output,
+)
+
+logger = logging.getLogger(__name__)
+
+_SERVER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "python_worker_server.py")
+_HEADER = struct.Struct("!I")
+# 预导入 pandas 等重型依赖时首次启动可能较慢
+_START_TIMEOUT_SECONDS = 60.0
+_SUBMIT_TIMEOUT_SECONDS = 10.0
+
+
+def is_python_worker_supported() -> bool:
+    return os.name == "posix" and hasattr(socket, "send_fds") and hasattr(os, "fork")
+
+
+def python_script_argv(args: Sequence[str], cwd: Optional[str]) -> Optional[List[str]]:
+    """`[sys.executable, script.py, *args]` -> 脚本 argv（sys.argv 语义）；其他形式返回 None。"""
+    items = [str(item) for item in (args or [])]
+    if len(items) < 2:
+        return None
+    head = items[0]
+    if head != sys.executable and os.path.realpath(head) != os.path.realpath(sys.executable):
+        return None
+    script = items[1]
+    if script.startswith("-") or not script.lower().endswith(".py"):
+        return None
+    script_path = script if os.path.isabs(script) else os.path.join(cwd or os.getcwd(), script)
+    if not os.path.isfile(script_path):
+        return None
+    return items[1:]
+
+
+def _read_rss_bytes(pid: int) -> Optional[int]:
+    try:
+        with open(f"/proc/{int(pid)}/statm", "r", encoding="ascii") as handle:
+            fields = handle.read().split()
+        return int(fields[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class _ForkedProcess:
+    """worker fork 出的脚本进程（提供 stream_process_output 需要的 Popen 子集接口）。"""
+
+    def __init__(self, *, args: List[str], conn: socket.socket, pid: int, stdin_fd: int, stdout_fd: int, stderr_fd: int):
+        self.args = args
+        self.pid = int(pid)
+        self.returncode: Optional[int] = None
+        self.stdin = open(stdin_fd, "wb")
+        self.stdout = open(stdout_fd, "rb")
+        self.stderr = open(stderr_fd, "rb")
+        self._conn = conn
+        self._buffer = b""
+
+    def wait(self, timeout: Optional[float] = None) -> int:
+        if self.returncode is not None:
+            return self.returncode
+        deadline = None if timeout is None else time.monotonic() + float(timeout)
+        while b"\n" not in self._buffer:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                raise subprocess.TimeoutExpired(self.args, timeout)
+            self._conn.settimeout(remaining)
+            try:
+                chunk = self._conn.recv(4096)
+            except socket.timeout:
+                raise subprocess.TimeoutExpired(self.args, timeout)
+            if not chunk:
+                # worker 异常退出：子进程状态未知，按失败处理
+                self._finish(1)
+                return 1
+            self._buffer += chunk
+        line = self._buffer.split(b"\n", 1)[0]
+        try:
+            code = int(json.loads(line.decode("utf-8")).get("returncode"))
+        except (ValueError, TypeError, AttributeError):
+            code = 1
+        self._finish(code)
+        return code
+
+    def _finish(self, code: int) -> None:
+        self.returncode = int(code)
+        try:
+            self._conn.close()
+        except OSError:
+            pass
+
+
+class _Worker:
+    def __init__(self, preload: Sequence[str]):
+        self.socket_dir = tempfile.mkdtemp(prefix="agent_pyworker_")
+        self.socket_path = os.path.join(self.socket_dir, "worker.sock")
+        self.runs = 0
+        self.proc = subprocess.Popen(
+            [sys.executable, _SERVER_SCRIPT, self.socket_path, ",".join(preload)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            close_fds=True,
+        )
+        self._wait_ready()
+
+    def _wait_ready(self) -> None:
+        selector = selectors.DefaultSelector()
+        selector.register(self.proc.stdout, selectors.EVENT_READ)
+        try:
+            if not selector.select(timeout=_START_TIMEOUT_SECONDS):
+                raise RuntimeError("python worker start timeout")
+        finally:
+            selector.close()
+        line = self.proc.stdout.readline()
+        if not line.startswith(b"ready"):
+            raise RuntimeError("python worker failed to start")
+
+    @property
+    def alive(self) -> bool:
+        return self.proc.poll() is None
+
+    def rss_bytes(self) -> Optional[int]:
+        return _read_rss_bytes(self.proc.pid)
+
+    def submit(self, *, argv: List[str], cwd: Optional[str], env: Dict[str, str]) -> _ForkedProcess:
+        body = json.dumps({"argv": argv, "cwd": cwd, "env": env}).encode("utf-8")
+        message = _HEADER.pack(len(body)) + body
+        stdin_r, stdin_w = os.pipe()
+        stdout_r, stdout_w = os.pipe()
+        stderr_r, stderr_w = os.pipe()
+        conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            conn.settimeout(_SUBMIT_TIMEOUT_SECONDS)
+            conn.connect(self.socket_path)
+            sent = socket.send_fds(conn, [message], [stdin_r, stdout_w, stderr_w])
+            if sent < len(message):
+                conn.sendall(message[sent:])
+        except BaseException:
+            conn.close()
+            for fd in (stdin_w, stdout_r, stderr_r):
+                os.close(fd)
+            raise
+        finally:
+            # 子进程端的 fd 已随消息复制给 worker，本进程只保留自己的一端
+            for fd in (stdin_r, stdout_w, stderr_w):
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+
+        try:
+            buffer = b""
+            while b"\n" not in buffer:
+                chunk = conn.recv(4096)
+                if not chunk:
+                    raise RuntimeError("python worker closed connection")
+                buffer += chunk
+            line, rest = buffer.split(b"\n", 1)
+            pid = int(json.loads(line.decode("utf-8"))["pid"])
+        except BaseException:
+            conn.close()
+            for fd in (stdin_w, stdout_r, stderr_r):
+                os.close(fd)
+            raise
+        proc = _ForkedProcess(args=argv, conn=conn, pid=pid, stdin_fd=stdin_w, stdout_fd=stdout_r, stderr_fd=stderr_r)
+        proc._buffer = rest
+        return proc
+
+    def close(self) -> None:
+        """停止接收新任务；已在执行的脚本由 worker 等待结束后自行退出。"""
+        try:
+            self.proc.stdin.close()
+        except OSError:
+            pass
+
+        def _reap() -> None:
+            try:
+                self.proc.wait()
+            finally:
+                shutil.rmtree(self.socket_dir, ignore_errors=True)
+
+        threading.Thread(target=_reap, daemon=True).start()
+
+
+class PythonWorkerPool:
+    def __init__(
+        self,
+        *,
+        size: int = AGENT_PYTHON_WORKER_POOL_SIZE,
+        preload: Sequence[str] = AGENT_PYTHON_WORKER_PRELOAD,
+        max_runs: int = AGENT_PYTHON_WORKER_MAX_RUNS,
+        max_rss_mb: int = AGENT_PYTHON_WORKER_MAX_RSS_MB,
+    ):
+        self.size = max(1, int(size))
+        self.preload = [str(item) for item in preload if str(item or "").strip()]
+        self.max_runs = max(1, int(max_runs))
+        self.max_rss_bytes = max(0, int(max_rss_mb)) * 1024 * 1024
+        self._lock = threading.Lock()
+        self._workers: List[_Worker] = []
+        self._next = 0
+        self._stats = {"runs": 0, "fallbacks": 0, "started": 0, "recycled": 0}
+
+    def warm(self) -> None:
+        with self._lock:
+            self._fill_locked()
+
+    def _fill_locked(self) -> None:
+        self._workers = [worker for worker in self._workers if worker.alive]
+        while len(self._workers) < self.size:
+            self._workers.append(_Worker(self.preload))
+            self._stats["started"] += 1
+
+    def _acquire(self) -> _Worker:
+        with self._lock:
+            self._fill_locked()
+            worker = self._workers[self._next % len(self._workers)]
+            self._next += 1
+            worker.runs += 1
+            return worker
+
+    def _retire(self, worker: _Worker) -> None:
+        with self._lock:
+            if worker not in self._workers:
+                return
+            self._workers.remove(worker)
+            self._stats["recycled"] += 1
+        worker.close()
+
+    def _after_run(self, worker: _Worker) -> None:
+        if worker.runs >= self.max_runs:
+            self._retire(worker)
+            return
+        if self.max_rss_bytes > 0:
+            rss = worker.rss_bytes()
+            if rss is not None and rss > self.max_rss_bytes:
+                self._retire(worker)
+
+    def run(
+        self,
+        args: Sequence[str],
+        *,
+        cwd: Optional[str],
+        stdin_bytes: bytes = b"",
+        timeout: Optional[float] = None,
+        spill: bool = False,
+    ) -> Optional[CapturedProcess]:
+        """在热 worker 中执行 python 脚本；不适用或 worker 不可用时返回 None（调用方回退到子进程）。"""
+        argv = python_script_argv(args, cwd)
+        if argv is None:
+            return None
+        try:
+            worker = self._acquire()
+        except Exception as exc:
+            logger.warning("python worker unavailable: %s", exc)
+            with self._lock:
+                self._stats["fallbacks"] += 1
+            return None
+        try:
+            proc = worker.submit(argv=argv, cwd=cwd, env=dict(os.environ))
+        except Exception as exc:
+            logger.warning("python worker submit failed: %s", exc)
+            self._retire(worker)
+            with self._lock:
+                self._stats["fallbacks"] += 1
+            return None
+        try:
+            return stream_process_output(
+                proc,
+                stdin_bytes=stdin_bytes,
+                timeout=timeout,
+                spill=spill,
+                spill_dir=shell_output_spill_dir(cwd),
+            )
+        finally:
+            with self._lock:
+                self._stats["runs"] += 1
+            self._after_run(worker)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats, workers=len(self._workers))
+
+    def shutdown(self) -> None:
+        with self._lock:
+            workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.close()
+
+
+_POOL_LOCK = threading.Lock()
+_POOL: Optional[PythonWorkerPool] = None
+
+
+def get_python_worker_pool() -> Optional[PythonWorkerPool]:
+    """开启且平台支持时返回进程级单例，否则返回 None。"""
+    global _POOL
+    if not AGENT_PYTHON_WORKER_POOL_ENABLED or not is_python_worker_supported():
+        return None
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = PythonWorkerPool()
+        return _POOL
+
+
+def run_python_script_in_worker(
+    args: Sequence[str],
+    *,
+    cwd: Optional[str],
+    stdin_bytes: bytes = b"",
+    timeout: Optional[float] = None,
+    spill: bool = False,
+) -> Optional[CapturedProcess]:
+    pool = get_python_worker_pool()
+    if pool is None:
+        return None
+    return pool.run(args, cwd=cwd, stdin_bytes=stdin_bytes, timeout=timeout, spill=spill)
+
+
+def start_python_worker_pool_background() -> None:
+    """启动时在后台预热 worker（预导入较慢，不阻塞服务启动）。"""
+    pool = get_python_worker_pool()
+    if pool is None:
+        return
+
+    def _warm() -> None:
+        try:
+            pool.warm()
+        except Exception as exc:
+            logger.warning("python worker pool warm failed: %s", exc)
+
+    threading.Thread(target=_warm, name="python-worker-pool-warm", daemon=True).start()
+
+
+def shutdown_python_worker_pool() -> None:
+    global _POOL
+    with _POOL_LOCK:
+        pool, _POOL = _POOL, None
+    if pool is not None:
+        pool.shutdown()
@@ -0,0 +1,247 @@
+"""
+常驻 Python worker（fork server）：由 python_worker_pool 以独立解释器启动，只依赖标准库。
+
+说明：
+- 启动时预导入配置的模块（pandas/requests 等），之后每次执行脚本都从这个“热”进程 fork 子进程，
+  子进程内按 `python script.py args...` 的语义运行（独立 argv/cwd/stdin/env/进程组），
+  因此脚本之间互不影响，只省掉解释器启动与重型依赖的导入时间；
+- 协议（AF_UNIX 流式 socket，每次执行一个连接）：
+  请求 = 4 字节长度 + JSON{"argv", "cwd", "env"}，附带 SCM_RIGHTS 传递的 stdin/stdout/stderr 三个 fd；
+  响应 = 两行 JSON：{"pid": ...}（fork 成功后立即返回）与 {"returncode": ...}（子进程回收后返回）；
+- stdin 为与 pool 相连的管道：EOF（pool 关闭/回收该 worker 或主进程退出）后不再接受新请求，
+  等待已在执行的子进程结束后退出。
+
+用法：python python_worker_server.py <socket_path> <comma_separated_preload_modules>
+"""
+
+import builtins
+import importlib
+import importlib.machinery
+import io
+import json
+import os
+import selectors
+import signal
+import socket
+import struct
+import sys
+import traceback
+import types
+
+_HEADER = struct.Struct("!I")
+# SIGCHLD 唤醒之外的兜底回收间隔
+_REAP_INTERVAL_SECONDS = 0.5
+
+
+def _preload(modules):
+    loaded = []
+    for name in modules:
+        name = name.strip()
+        if not name:
+            continue
+        try:
+            importlib.import_module(name)
+            loaded.append(name)
+        except Exception:
+            continue
+    return loaded
+
+
+def _recv_request(conn):
+    data, fds, _, _ = socket.recv_fds(conn, 65536, 3)
+    if len(data) < _HEADER.size or len(fds) != 3:
+        for fd in fds:
+            os.close(fd)
+        raise ValueError("bad request")
+    (length,) = _HEADER.unpack(data[: _HEADER.size])
+    body = bytearray(data[_HEADER.size :])
+    while len(body) < length:
+        chunk = conn.recv(length - len(body))
+        if not chunk:
+            break
+        body += chunk
+    return json.loads(bytes(body).decode("utf-8")), fds
+
+
+def _reset_stdio():
+    encoding = sys.stdout.encoding if sys.stdout is not None else "utf-8"
+    sys.stdin = open(0, "r", encoding=encoding, closefd=False)
+    sys.stdout = open(1, "w", encoding=encoding, closefd=False)
+    sys.stderr = open(2, "w", encoding=encoding, errors="backslashreplace", closefd=False, buffering=1)
+    sys.__stdin__, sys.__stdout__, sys.__stderr__ = sys.stdin, sys.stdout, sys.stderr
+
+
+def _exit_code_from_system_exit(exc):
+    code = exc.code
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code
+    try:
+        print(code, file=sys.stderr)
+    except Exception:
+        pass
+    return 1
+
+
+def _flush_stdio():
+    for stream in (sys.stdout, sys.stderr):
+        try:
+            stream.flush()
+        except Exception:
+            pass
+
+
+def _print_script_exception(exc, script_path):
+    """去掉本模块的栈帧（脚本之前的帧）后交给 sys.excepthook，使 traceback 与直接运行脚本一致。"""
+    tb = exc.__traceback__
+    skipped = tb
+    while skipped is not None and skipped.tb_frame.f_code.co_filename != script_path:
+        skipped = skipped.tb_next
+    if skipped is not None:
+        tb = skipped
+        exc.__traceback__ = tb
+    try:
+        sys.excepthook(type(exc), exc, tb)
+    except Exception:
+        traceback.print_exception(type(exc), exc, tb)
+
+
+def _exec_main(script_path):
+    """以新的 __main__ 模块执行脚本（不用 runpy.run_path：它会把 sys.argv[0] 改成脚本路径）。"""
+    main = types.ModuleType("__main__")
+    main.__file__ = script_path
+    main.__cached__ = None
+    main.__loader__ = importlib.machinery.SourceFileLoader("__main__", script_path)
+    main.__builtins__ = builtins
+    sys.modules["__main__"] = main
+    with io.open_code(script_path) as handle:
+        source = handle.read()
+    exec(compile(source, script_path, "exec"), main.__dict__)
+
+
+def _run_child(request, fds):
+    """fork 出的子进程：模拟 `python script.py args...`，结束时 os._exit（不回到 server 循环）。"""
+    code = 1
+    try:
+        os.setsid()
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        for target, fd in enumerate(fds):
+            os.dup2(fd, target)
+            os.close(fd)
+        os.environ.clear()
+        os.environ.update({str(k): str(v) for k, v in (request.get("env") or {}).items()})
+        cwd = request.get("cwd")
+        if cwd:
+            os.chdir(cwd)
+        argv = [str(item) for item in request["argv"]]
+        # 与解释器一致：sys.argv[0] 保持原样，__main__.__file__ 为绝对路径
+        script_path = os.path.abspath(argv[0])
+        sys.argv = argv
+        sys.path[0] = os.path.dirname(os.path.realpath(script_path))
+        _reset_stdio()
+        try:
+            _exec_main(script_path)
+            code = 0
+        except SystemExit as exc:
+            code = _exit_code_from_system_exit(exc)
+        except BaseException as exc:
+            _print_script_exception(exc, script_path)
+            if isinstance(exc, KeyboardInterrupt):
+                # 与解释器一致：未处理的 KeyboardInterrupt 以 SIGINT 结束（returncode=-2）
+                _flush_stdio()
+                signal.signal(signal.SIGINT, signal.SIG_DFL)
+                os.kill(os.getpid(), signal.SIGINT)
+            code = 1
+        try:
+            import atexit
+
+            atexit._run_exitfuncs()
+        except Exception:
+            pass
+    finally:
+        _flush_stdio()
+        os._exit(code)
+
+
+def _send_line(conn, obj):
+    try:
+        conn.sendall((json.dumps(obj) + "\n").encode("utf-8"))
+    except OSError:
+        pass
+
+
+def serve(socket_path, preload_modules):
+    _preload(preload_modules)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(socket_path)
+    server.listen(64)
+    selector = selectors.DefaultSelector()
+    selector.register(server, selectors.EVENT_READ, "accept")
+    selector.register(sys.stdin.fileno(), selectors.EVENT_READ, "control")
+    # 子进程退出时通过 wakeup fd 立即唤醒 select（而不是靠轮询间隔回收）
+    wakeup_r, wakeup_w = os.pipe()
+    os.set_blocking(wakeup_w, False)
+    signal.set_wakeup_fd(wakeup_w)
+    signal.signal(signal.SIGCHLD, lambda *_: None)
+    selector.register(wakeup_r, selectors.EVENT_READ, "wakeup")
+    sys.stdout.write("ready %d\n" % os.getpid())
+    sys.stdout.flush()
+
+    running = {}
+    accepting = True
+    while accepting or running:
+        for key, _ in selector.select(timeout=_REAP_INTERVAL_SECONDS):
+            if key.data == "wakeup":
+                os.read(wakeup_r, 4096)
+                continue
+            if key.data == "control":
+                if not os.read(sys.stdin.fileno(), 4096):
+                    accepting = False
+                    selector.unregister(sys.stdin.fileno())
+                    selector.unregister(server)
+                    server.close()
+                continue
+            if not accepting:
+                continue
+            conn, _ = server.accept()
+            try:
+                request, fds = _recv_request(conn)
+            except Exception:
+                conn.close()
+                continue
+            pid = os.fork()
+            if pid == 0:
+                conn.close()
+                server.close()
+                signal.set_wakeup_fd(-1)
+                signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+                os.close(wakeup_r)
+                os.close(wakeup_w)
+                _run_child(request, fds)
+            for fd in fds:
+                os.close(fd)
+            running[pid] = conn
+            _send_line(conn, {"pid": pid})
+
+        while running:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                break
+            conn = running.pop(pid, None)
+            if conn is not None:
+                _send_line(conn, {"returncode": os.waitstatus_to_exitcode(status)})
+                conn.close()
+
+    try:
+        os.unlink(socket_path)
+    except OSError:
+        pass
+
+
+if __name__ == "__main__":
+    serve(sys.argv[1], [item for item in (sys.argv[2] if len(sys.argv) > 2 else "").split(",") if item])
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import concurrent.futures
 import locale
 import os
 import re
@@ -9,13 +10,21 @@ import sys
 import uuid
 from typing import Optional, Tuple
 
+from backend.src.common.async_bridge import current_loop_bridge
 from backend.src.common.python_code import has_risky_inline_control_flow, normalize_python_c_source
 from backend.src.constants import (
     AGENT_EXPERIMENT_DIR_REL,
+    ERROR_MESSAGE_ACTION_CANCELLED,
     ERROR_MESSAGE_COMMAND_FAILED,
     ERROR_MESSAGE_PERMISSION_DENIED,
     ERROR_MESSAGE_PROMPT_RENDER_FAILED,
 )
+from backend.src.services.execution.process_capture import (
+    CapturedProcess,
+    run_process_streaming,
+    run_process_streaming_async,
+)
+from backend.src.services.execution.python_worker_pool import run_python_script_in_worker
 from backend.src.services.permissions.permissions_store import has_exec_permission
 
 
@@ -132,18 +141,17 @@ def _decode_subprocess_stream(value: object) -> str:
         return raw.decode("utf-8", errors="replace")
 
 
-
-def run_shell_command(payload: dict) -> Tuple[Optional[dict], Optional[str]]:
+def _prepare_shell_invocation(payload: dict) -> Tuple[Optional[dict], Optional[dict], Optional[str]]:
     """
-    执行本地命令（供 shell_command/tool_call 复用）。
+    解析/归一化命令参数（线程执行与 event loop 桥接执行共用）。
 
-    返回：(result, error_message)
-    - result: {"stdout": str, "stderr": str, "returncode": int|None, "ok": bool}
-    - error_message: 业务错误字符串（用于写入 task_steps.error 或输出到 UI）
+    返回：(invocation, result, error_message)
+    - invocation 非空：{"args", "workdir", "timeout", "stdin_bytes", "spill"}，交给具体执行器运行；
+    - invocation 为空：直接以 (result, error_message) 作为执行结果返回（参数错误/无权限/拒绝执行）。
     """
     command = payload.get("command")
     if not command:
-        return None, ERROR_MESSAGE_PROMPT_RENDER_FAILED
+        return None, None, ERROR_MESSAGE_PROMPT_RENDER_FAILED
 
     raw_command_str = command if isinstance(command, str) else None
     if isinstance(command, str):
@@ -196,7 +204,7 @@ def run_shell_command(payload: dict) -> Tuple[Optional[dict], Optional[str]]:
         except Exception:
             pass
     else:
-        return None, ERROR_MESSAGE_PROMPT_RENDER_FAILED
+        return None, None, ERROR_MESSAGE_PROMPT_RENDER_FAILED
 
     # 当调用方以 {command, args} 结构传参时，统一在执行层做一次合并。
     # 注意：若已走 script_run 归一化（payload.script 存在），command 通常已包含 args，
@@ -251,7 +259,7 @@ def run_shell_command(payload: dict) -> Tuple[Optional[dict], Optional[str]]:
 
     workdir = payload.get("workdir")
     if not has_exec_permission(workdir):
-        return None, ERROR_MESSAGE_PERMISSION_DENIED
+        return None, None, ERROR_MESSAGE_PERMISSION_DENIED
 
     # 将 python -c 代码自动落盘为脚本再执行（避免多行/结构化语句触发语法错误）
     if args and workdir:
@@ -263,7 +271,7 @@ def run_shell_command(payload: dict) -> Tuple[Optional[dict], Optional[str]]:
                 code = str(args[2] or "").strip()
                 if code:
                     if has_risky_inline_control_flow(code):
-                        return {
+                        return None, {
                             "stdout": "",
                             "stderr": "complex python -c requires file_write script",
                             "returncode": 1,
@@ -293,23 +301,90 @@ def run_shell_command(payload: dict) -> Tuple[Optional[dict], Optional[str]]:
 
     stdin_bytes = str(stdin_text).encode("utf-8", errors="replace")
 
-    try:
-        result = subprocess.run(
-            args,
-            cwd=workdir,
-            capture_output=True,
-            text=False,
-            input=stdin_bytes,
-            timeout=timeout,
-            check=False,
-        )
-    except subprocess.TimeoutExpired:
-        return {
-            "stdout": "",
-            "stderr": "timeout",
+    return {
+        "args": args,
+        "workdir": workdir,
+        "timeout": timeout,
+        "stdin_bytes": stdin_bytes,
+        "spill": bool(payload.get("spill_output")),
+    }, None, None
+
+
+def _captured_to_result(captured: CapturedProcess) -> dict:
+    """
+    CapturedProcess -> run_shell_command 结果结构。
+
+    超时：保留 stderr="timeout" 约定，并附上超时前已采集到的部分输出（便于定位卡在哪一步）。
+    """
+    stdout_text = _decode_subprocess_stream(captured.stdout)
+    stderr_text = _decode_subprocess_stream(captured.stderr)
+    if captured.timed_out:
+        result = {
+            "stdout": stdout_text,
+            "stderr": f"timeout\n{stderr_text}" if stderr_text.strip() else "timeout",
             "returncode": None,
             "ok": False,
-        }, None
+        }
+    else:
+        result = {
+            "stdout": stdout_text,
+            "stderr": stderr_text,
+            "returncode": captured.returncode,
+            "ok": captured.returncode == 0,
+        }
+    result.update(captured.extra_fields())
+    return result
+
+
+def run_shell_command(payload: dict) -> Tuple[Optional[dict], Optional[str]]:
+    """
+    执行本地命令（供 shell_command/tool_call 复用）。
+
+    返回：(result, error_message)
+    - result: {"stdout": str, "stderr": str, "returncode": int|None, "ok": bool}
+      输出超过采集上限时额外带 stdout_truncated/stdout_bytes（stderr 同理），
+      payload.spill_output=true 时带 stdout_file/stderr_file（完整输出）
+    - error_message: 业务错误字符串（用于写入 task_steps.error 或输出到 UI）
+
+    输出边读边进入有界 head/tail 缓冲（见 process_capture），进度经 shell_output_progress_scope 回调。
+    在 LoopBridge 上下文中（AGENT_REACT_ASYNC_EXECUTION）子进程改由 event loop 等待，流结束时整组 kill。
+    """
+    invocation, early_result, early_error = _prepare_shell_invocation(payload)
+    if invocation is None:
+        return early_result, early_error
+
+    try:
+        # 可选：`python script.py` 交给热 worker 执行（未开启/不适用时返回 None，走普通子进程）
+        captured = run_python_script_in_worker(
+            invocation["args"],
+            cwd=invocation["workdir"],
+            stdin_bytes=invocation["stdin_bytes"],
+            timeout=invocation["timeout"],
+            spill=invocation["spill"],
+        )
+        bridge = current_loop_bridge() if captured is None else None
+        if bridge is not None:
+            # 异步执行（AGENT_REACT_ASYNC_EXECUTION）：子进程交给 SSE 流的 event loop 等待，
+            # 流结束时在途 task 被取消，子进程所在进程组整组 kill
+            captured = bridge.run(
+                lambda: run_process_streaming_async(
+                    invocation["args"],
+                    cwd=invocation["workdir"],
+                    stdin_bytes=invocation["stdin_bytes"],
+                    timeout=invocation["timeout"],
+                    spill=invocation["spill"],
+                )
+            )
+        elif captured is None:
+            captured = run_process_streaming(
+                invocation["args"],
+                cwd=invocation["workdir"],
+                stdin_bytes=invocation["stdin_bytes"],
+                timeout=invocation["timeout"],
+                spill=invocation["spill"],
+            )
+    except concurrent.futures.CancelledError:
+        return None, f"{ERROR_MESSAGE_COMMAND_FAILED}:{ERROR_MESSAGE_ACTION_CANCELLED}"
     except FileNotFoundError as exc:
         return None, f"{ERROR_MESSAGE_COMMAND_FAILED}:{exc}"
     except (ValueError, OSError) as exc:
@@ -317,9 +392,5 @@ def run_shell_command(payload: dict) -> Tuple[Optional[dict], Optional[str]]:
     except Exception as exc:
         return None, f"{ERROR_MESSAGE_COMMAND_FAILED}:{exc}"
 
-    return {
-        "stdout": _decode_subprocess_stream(result.stdout),
-        "stderr": _decode_subprocess_stream(result.stderr),
-        "returncode": result.returncode,
-        "ok": result.returncode == 0,
-    }, None
+    return _captured_to_result(captured), None
+
@@ -16,7 +16,9 @@ from backend.src.constants import (
     GRAPH_LLM_MAX_CHARS,
     GRAPH_LLM_PROMPT_TEMPLATE,
 )
+from backend.src.services.coordination.coordinator import Lease, get_coordinator
 from backend.src.services.llm.llm_client import call_openai, resolve_default_model
+from backend.src.services.llm.llm_scheduler import LLM_PRIORITY_BACKFILL, llm_request_scope
 from backend.src.storage import get_connection, resolve_db_path
 
 logger = logging.getLogger(__name__)
@@ -328,14 +330,21 @@ def _graph_extract_worker() -> None:
                 continue
 
         db_path, extract_id, task_id, run_id, content = item
+        claimed, cluster_lease = _claim_graph_extract_item(db_path=db_path, extract_id=int(extract_id))
+        if not claimed:
+            # 其他实例正在处理：稍后再看（避免 DB 轮询反复捞到同一条 queued 任务空转）
+            time.sleep(0.5)
+            continue
         try:
-            _process_graph_extract_item(
-                db_path=db_path,
-                extract_id=int(extract_id),
-                task_id=int(task_id),
-                run_id=int(run_id),
-                content=str(content or ""),
-            )
+            # 图谱抽取是后台补全：LLM 调用按 backfill 排队，不占用前台步骤的容量
+            with llm_request_scope(priority=LLM_PRIORITY_BACKFILL, run_id=int(run_id)):
+                _process_graph_extract_item(
+                    db_path=db_path,
+                    extract_id=int(extract_id),
+                    task_id=int(task_id),
+                    run_id=int(run_id),
+                    content=str(content or ""),
+                )
         except sqlite3.OperationalError:
             # DB 被删除/切换路径/缺表时：不应让线程崩溃或刷屏；回退为 queued 并重试。
             try:
@@ -360,6 +369,40 @@ def _graph_extract_worker() -> None:
                 )
             except Exception as mark_exc:
                 logger.exception("graph_extract.mark_failed: %s", mark_exc)
+        finally:
+            if cluster_lease is not None:
+                get_coordinator().release(cluster_lease)
+
+
+def _claim_graph_extract_item(*, db_path: str, extract_id: int) -> Tuple[bool, Optional[Lease]]:
+    """
+    多实例部署：各实例的 worker 都会轮询 queued 任务，处理前先拿集群租约，避免同一条任务被重复抽取。
+
+    返回 (是否处理, 租约)；local 后端直接返回 (True, None)。
+    """
+    coordinator = get_coordinator()
+    if not coordinator.distributed:
+        return True, None
+    try:
+        lease = coordinator.try_acquire(f"graph_extract:{int(extract_id)}", 1)
+    except sqlite3.Error as exc:
+        logger.warning("graph_extract.claim failed: %s", exc)
+        return True, None
+    if lease is None:
+        return False, None
+    # 拿到租约后复查状态：可能已被其他实例处理完（本进程队列里的是旧快照）
+    try:
+        with get_connection(db_path=db_path) as conn:
+            row = conn.execute(
+                "SELECT status FROM graph_extract_tasks WHERE id = ?",
+                (int(extract_id),),
+            ).fetchone()
+    except sqlite3.OperationalError:
+        row = None
+    if not row or str(row["status"] or "") != GRAPH_EXTRACT_STATUS_QUEUED:
+        coordinator.release(lease)
+        return False, None
+    return True, lease
 
 
 def _process_graph_extract_item(
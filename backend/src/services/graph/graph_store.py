@@ -3,7 +3,7 @@ from __future__ import annotations
 import json
 import logging
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Set, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 
 from backend.src.common.utils import (
     atomic_write_text,
@@ -16,6 +16,14 @@ from backend.src.common.utils import (
 )
 from backend.src.prompt.paths import graph_prompt_dir
 from backend.src.prompt.skill_files import parse_skill_markdown
+from backend.src.services.common.file_manifest import (
+    FILE_SYNC_KIND_GRAPH_EDGES,
+    FILE_SYNC_KIND_GRAPH_NODES,
+    ManifestFile,
+    existing_paths_under,
+    save_file_manifest,
+    scan_file_manifest,
+)
 from backend.src.storage import get_connection
 
 logger = logging.getLogger(__name__)
@@ -100,16 +108,13 @@ def publish_graph_edge_file(edge_id: int, *, conn=None, base_dir: Optional[Path]
     return {"ok": True, "path": str(path)}
 
 
-def _parse_graph_file(path: Path, rel_root: Path) -> Tuple[Optional[Dict[str, Any]], Optional[str], Optional[str]]:
+def _parse_graph_file(entry: ManifestFile) -> Tuple[Optional[Dict[str, Any]], Optional[str], Optional[str]]:
     """
     返回：(meta, rel, error)
     """
+    rel = entry.rel
     try:
-        rel = str(path.relative_to(rel_root)).replace("\\", "/")
-    except Exception:
-        rel = path.name
-    try:
-        text = path.read_text(encoding="utf-8")
+        text = entry.read_text()
         parsed = parse_skill_markdown(text=text, source_path=rel)
         meta = parsed.meta or {}
         if not isinstance(meta, dict):
@@ -119,7 +124,13 @@ def _parse_graph_file(path: Path, rel_root: Path) -> Tuple[Optional[Dict[str, An
         return None, rel, f"{exc}"
 
 
-def sync_graph_from_files(base_dir: Optional[Path] = None, *, prune: bool = True) -> dict:
+def sync_graph_from_files(
+    base_dir: Optional[Path] = None,
+    *,
+    prune: bool = True,
+    incremental: bool = False,
+    changed_paths: Optional[Iterable[Path]] = None,
+) -> dict:
     """
     将 backend/prompt/graph 下的 nodes/edges 文件同步到 SQLite（graph_nodes/graph_edges）。
 
@@ -132,8 +143,11 @@ def sync_graph_from_files(base_dir: Optional[Path] = None, *, prune: bool = True
     - 边文件：graph/edges/{id}.md（frontmatter.id 可选；默认用文件名 stem）
     - prune=True：若 DB 存在但文件不存在，则删除 DB 记录（强一致删除）
     - 迁移兜底：若目录内完全没有任何 graph 文件，则自动把 DB 现有图谱导出到文件（避免升级后误删历史数据）
+    - incremental=True 时只解析 file_sync_manifest 中 mtime/size/hash 有变化的文件（启动同步使用）
+    - changed_paths：只同步这些文件（文件监听传入），prune 也只删除其中已不存在的文件对应的记录；不做迁移兜底导出
     """
     base = base_dir or graph_prompt_dir()
+    scope = list(changed_paths) if changed_paths is not None else None
     nodes_base = base / "nodes"
     edges_base = base / "edges"
     nodes_base.mkdir(parents=True, exist_ok=True)
@@ -145,13 +159,39 @@ def sync_graph_from_files(base_dir: Optional[Path] = None, *, prune: bool = True
     node_items: List[Dict[str, Any]] = []
     edge_items: List[Dict[str, Any]] = []
 
+    nodes_scan = scan_file_manifest(
+        kind=FILE_SYNC_KIND_GRAPH_NODES,
+        base_dir=nodes_base,
+        paths=discover_markdown_files(nodes_base) if scope is None else existing_paths_under(nodes_base, scope),
+        incremental=incremental,
+        scope=scope,
+    )
+    edges_scan = scan_file_manifest(
+        kind=FILE_SYNC_KIND_GRAPH_EDGES,
+        base_dir=edges_base,
+        paths=discover_markdown_files(edges_base) if scope is None else existing_paths_under(edges_base, scope),
+        incremental=incremental,
+        scope=scope,
+    )
+    if nodes_scan.unchanged or edges_scan.unchanged:
+        with get_connection() as conn:
+            node_rows = conn.execute("SELECT id FROM graph_nodes").fetchall()
+            edge_rows = conn.execute("SELECT id FROM graph_edges").fetchall()
+        nodes_scan.requeue_missing({str(row["id"]) for row in node_rows})
+        edges_scan.requeue_missing({str(row["id"]) for row in edge_rows})
+    for entry in nodes_scan.unchanged:
+        discovered_node_ids.add(int(entry.entity_key))
+    for entry in edges_scan.unchanged:
+        discovered_edge_ids.add(int(entry.entity_key))
+
     # --- nodes ---
-    for path in discover_markdown_files(nodes_base):
+    for entry in nodes_scan.changed:
+        path = entry.path
         # parse 失败也要尽量纳入 discovered（避免误删 DB）
         stem_id = parse_positive_int(path.stem, default=None)
         if stem_id:
             discovered_node_ids.add(stem_id)
-        meta, _rel, err = _parse_graph_file(path, nodes_base)
+        meta, _rel, err = _parse_graph_file(entry)
         if err:
             errors.append(f"{path}: {err}")
             continue
@@ -161,14 +201,15 @@ def sync_graph_from_files(base_dir: Optional[Path] = None, *, prune: bool = True
         if not node_id:
             continue
         discovered_node_ids.add(int(node_id))
-        node_items.append({"id": int(node_id), "meta": meta})
+        node_items.append({"id": int(node_id), "meta": meta, "entry": entry})
 
     # --- edges ---
-    for path in discover_markdown_files(edges_base):
+    for entry in edges_scan.changed:
+        path = entry.path
         stem_id = parse_positive_int(path.stem, default=None)
         if stem_id:
             discovered_edge_ids.add(stem_id)
-        meta, _rel, err = _parse_graph_file(path, edges_base)
+        meta, _rel, err = _parse_graph_file(entry)
         if err:
             errors.append(f"{path}: {err}")
             continue
@@ -178,7 +219,7 @@ def sync_graph_from_files(base_dir: Optional[Path] = None, *, prune: bool = True
         if not edge_id:
             continue
         discovered_edge_ids.add(int(edge_id))
-        edge_items.append({"id": int(edge_id), "meta": meta})
+        edge_items.append({"id": int(edge_id), "meta": meta, "entry": entry})
 
     inserted_nodes = 0
     updated_nodes = 0
@@ -191,7 +232,13 @@ def sync_graph_from_files(base_dir: Optional[Path] = None, *, prune: bool = True
 
     with get_connection() as conn:
         # 迁移兜底：如果完全没有任何文件，则导出 DB 现有图谱，并跳过 prune
-        if not node_items and not edge_items:
+        if (
+            scope is None
+            and not node_items
+            and not edge_items
+            and not nodes_scan.unchanged
+            and not edges_scan.unchanged
+        ):
             db_nodes = conn.execute("SELECT id FROM graph_nodes ORDER BY id ASC").fetchall()
             db_edges = conn.execute("SELECT id FROM graph_edges ORDER BY id ASC").fetchall()
             for row in db_nodes:
@@ -240,6 +287,7 @@ def sync_graph_from_files(base_dir: Optional[Path] = None, *, prune: bool = True
                     (node_id, label, created_at, node_type, attributes_value, task_id, evidence),
                 )
                 inserted_nodes += 1
+            nodes_scan.mark_synced(item["entry"], node_id)
 
         # 2) 文件 -> DB upsert（edges）
         for item in edge_items:
@@ -287,25 +335,35 @@ def sync_graph_from_files(base_dir: Optional[Path] = None, *, prune: bool = True
                     (edge_id, source_id, target_id, relation, created_at, confidence_value, evidence),
                 )
                 inserted_edges += 1
+            edges_scan.mark_synced(item["entry"], edge_id)
 
         # 3) prune：文件不存在 -> 删除 DB 记录
         if prune:
-            rows = conn.execute("SELECT id FROM graph_edges ORDER BY id ASC").fetchall()
+            if scope is None:
+                rows = conn.execute("SELECT id FROM graph_edges ORDER BY id ASC").fetchall()
+            else:
+                rows = [{"id": key} for key in sorted(edges_scan.removed_keys)]
             for row in rows:
                 eid = int(row["id"])
                 if eid in discovered_edge_ids:
                     continue
-                conn.execute("DELETE FROM graph_edges WHERE id = ?", (eid,))
-                deleted_edges += 1
+                cursor = conn.execute("DELETE FROM graph_edges WHERE id = ?", (eid,))
+                deleted_edges += int(cursor.rowcount or 0)
 
-            rows = conn.execute("SELECT id FROM graph_nodes ORDER BY id ASC").fetchall()
+            if scope is None:
+                rows = conn.execute("SELECT id FROM graph_nodes ORDER BY id ASC").fetchall()
+            else:
+                rows = [{"id": key} for key in sorted(nodes_scan.removed_keys)]
             for row in rows:
                 nid = int(row["id"])
                 if nid in discovered_node_ids:
                     continue
-                conn.execute("DELETE FROM graph_nodes WHERE id = ?", (nid,))
+                cursor = conn.execute("DELETE FROM graph_nodes WHERE id = ?", (nid,))
                 conn.execute("DELETE FROM graph_edges WHERE source = ? OR target = ?", (nid, nid))
-                deleted_nodes += 1
+                deleted_nodes += int(cursor.rowcount or 0)
+
+        save_file_manifest(nodes_scan, conn=conn)
+        save_file_manifest(edges_scan, conn=conn)
 
     if errors:
         for err in errors[:5]:
@@ -320,5 +378,6 @@ def sync_graph_from_files(base_dir: Optional[Path] = None, *, prune: bool = True
         "deleted_nodes": deleted_nodes,
         "deleted_edges": deleted_edges,
         "prune": bool(prune),
+        "manifest": {"nodes": nodes_scan.summary(), "edges": edges_scan.summary()},
         "errors": errors,
     }
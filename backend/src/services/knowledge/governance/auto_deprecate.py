@@ -19,6 +19,7 @@ from backend.src.services.knowledge.governance.helpers import (
     _update_tool_meta_and_publish,
 )
 from backend.src.services.skills.skills_publish import publish_skill_file
+from backend.src.services.tools.tool_registry_cache import refresh_compiled_tools_after_commit
 from backend.src.storage import get_connection
 
 
@@ -199,6 +200,9 @@ def auto_deprecate_low_quality_knowledge(
                 except Exception as exc:
                     errors.append(f"tool:{tid}: {exc}")
 
+    if not dry_run and changed_tool_ids:
+        refresh_compiled_tools_after_commit(changed_tool_ids)
+
     # skills：状态更新后同步落盘文件（失败不阻塞）
     if include_skills and not dry_run and changed_skill_ids:
         for sid in changed_skill_ids:
@@ -83,3 +83,4 @@ def _update_tool_meta_and_publish(
         publish_tool_file(int(tool_id), conn=conn)
     except Exception:
         pass
+    # 注意：调用方提交事务后需 refresh_compiled_tools_after_commit（落盘时的编译表校验发生在事务内）
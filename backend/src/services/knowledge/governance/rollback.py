@@ -12,6 +12,7 @@ from backend.src.services.knowledge.governance.helpers import (
     _update_tool_meta_and_publish,
 )
 from backend.src.services.skills.skills_publish import publish_skill_file
+from backend.src.services.tools.tool_registry_cache import refresh_compiled_tools_after_commit
 from backend.src.storage import get_connection
 
 
@@ -187,6 +188,9 @@ def rollback_knowledge_from_run(
                 except Exception as exc:
                     tool_errors.append(f"tool:{tid}: {exc}")
 
+    if not dry_run and changed_tool_ids:
+        refresh_compiled_tools_after_commit(changed_tool_ids)
+
     # 技能文件落盘：需要独立连接（publish_skill_file 内部会读写 DB）
     if include_skills and not dry_run and changed_skill_ids:
         for sid in changed_skill_ids:
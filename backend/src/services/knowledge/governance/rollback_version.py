@@ -7,6 +7,7 @@ from backend.src.common.utils import now_iso, parse_json_dict
 from backend.src.repositories.skills_repo import get_skill
 from backend.src.repositories.tools_repo import get_tool
 from backend.src.services.skills.skills_publish import publish_skill_file
+from backend.src.services.tools.tool_registry_cache import refresh_compiled_tools_after_commit
 from backend.src.services.tools.tools_store import publish_tool_file
 from backend.src.storage import get_connection
 
@@ -260,6 +261,7 @@ def rollback_tool_to_previous_version(
         except Exception as exc:
             publish_err = str(exc)
 
+    refresh_compiled_tools_after_commit([int(tid)])
     return {
         "ok": True,
         "dry_run": False,
@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Dict
+
+_VERSION_LOCK = threading.Lock()
+_VERSION_STATE: Dict[str, Any] = {"version": 0, "reason": None, "bumped_at": None}
+
+
+def get_knowledge_version() -> int:
+    """
+    进程内知识库版本号（skills/memory/tools/graph 任一发生文件同步变更即递增）。
+
+    说明：缓存把版本号并入 key，版本变化即自然失效，无需逐个清理。
+    """
+    with _VERSION_LOCK:
+        return int(_VERSION_STATE["version"])
+
+
+def bump_knowledge_version(reason: str = "") -> int:
+    with _VERSION_LOCK:
+        _VERSION_STATE["version"] = int(_VERSION_STATE["version"]) + 1
+        _VERSION_STATE["reason"] = str(reason or "") or None
+        _VERSION_STATE["bumped_at"] = time.time()
+        return int(_VERSION_STATE["version"])
+
+
+def get_knowledge_version_state() -> Dict[str, Any]:
+    with _VERSION_LOCK:
+        return dict(_VERSION_STATE)
@@ -0,0 +1,384 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from backend.src.common.utils import discover_markdown_files
+from backend.src.services.knowledge.knowledge_version import bump_knowledge_version, get_knowledge_version
+
+logger = logging.getLogger(__name__)
+
+_STATS_LOCK = threading.Lock()
+_STATS: Dict[str, Any] = {
+    "running": False,
+    "backend": None,
+    "syncs_applied": 0,
+    "files_changed": 0,
+    "errors": 0,
+    "last_kind": None,
+    "last_lag_ms": None,
+    "max_lag_ms": 0,
+    "total_lag_ms": 0,
+}
+
+_WATCHER_LOCK = threading.Lock()
+_WATCHER: Optional["KnowledgeWatcher"] = None
+
+
+def _update_stats(**fields: Any) -> None:
+    with _STATS_LOCK:
+        _STATS.update(fields)
+
+
+def get_knowledge_watcher_stats() -> Dict[str, Any]:
+    """
+    文件监听同步的进程内统计（用于 /api/metrics）。
+
+    sync lag：文件变更（mtime，删除则取发现时间）到变更写入 DB 的耗时。
+    """
+    with _STATS_LOCK:
+        stats = dict(_STATS)
+    applied = int(stats.pop("total_lag_ms", 0) or 0)
+    count = int(stats.get("syncs_applied") or 0)
+    stats["avg_lag_ms"] = int(applied / count) if count > 0 else None
+    stats["knowledge_version"] = get_knowledge_version()
+    return stats
+
+
+Snapshot = Dict[str, Tuple[int, int]]
+
+
+def snapshot_markdown_files(base_dir: Path) -> Snapshot:
+    """path -> (mtime_ns, size)；与各 sync 的文件发现规则一致（跳过 readme/隐藏路径）。"""
+    out: Snapshot = {}
+    for path in discover_markdown_files(base_dir):
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        out[str(path)] = (int(stat.st_mtime_ns), int(stat.st_size))
+    return out
+
+
+def _is_markdown_candidate(path: Path) -> bool:
+    """与 discover_markdown_files 相同的过滤规则（单文件版，供原生事件使用）。"""
+    name = path.name.lower()
+    if not name.endswith(".md") or name in {"readme.md", "_readme.md"}:
+        return False
+    return not any(part.startswith(".") for part in path.parts)
+
+
+def snapshot_event_path(path: Path) -> Snapshot:
+    """原生事件路径的局部快照：文件只 stat 自身，目录（整体移入/创建）只遍历该子目录。"""
+    if path.is_dir():
+        return snapshot_markdown_files(path)
+    if not _is_markdown_candidate(path):
+        return {}
+    try:
+        stat = path.stat()
+    except OSError:
+        return {}
+    return {str(path): (int(stat.st_mtime_ns), int(stat.st_size))}
+
+
+@dataclass
+class WatchTarget:
+    """一个被监听的知识目录：文件变化后调用 sync(changed_paths)，只同步变化/删除的文件。"""
+
+    kind: str
+    resolve_dir: Callable[[], Path]
+    sync: Callable[[List[Path]], dict]
+    snapshot: Snapshot = field(default_factory=dict)
+    # 待应用的变更：首次发现时间/最近一次变化时间/最早的文件 mtime（秒）/变化的文件路径
+    pending_since: Optional[float] = None
+    pending_last_change: Optional[float] = None
+    pending_earliest_change: Optional[float] = None
+    pending_paths: Set[str] = field(default_factory=set)
+
+
+def default_watch_targets() -> List[WatchTarget]:
+    from backend.src.prompt.paths import (
+        graph_prompt_dir,
+        memory_prompt_dir,
+        skills_prompt_dir,
+        tools_prompt_dir,
+    )
+    from backend.src.services.system.startup_sync import knowledge_sync_steps
+
+    dirs = {
+        "skills": skills_prompt_dir,
+        "memory": memory_prompt_dir,
+        "tools": tools_prompt_dir,
+        "graph": graph_prompt_dir,
+    }
+    targets: List[WatchTarget] = []
+    for kind, func, kwargs in knowledge_sync_steps():
+        resolve_dir = dirs.get(kind)
+        if resolve_dir is None:
+            continue
+        targets.append(
+            WatchTarget(
+                kind=kind,
+                resolve_dir=resolve_dir,
+                sync=lambda paths, func=func, kwargs=kwargs: func(incremental=True, changed_paths=paths, **kwargs),
+            )
+        )
+    return targets
+
+
+def _diff_snapshot(old: Snapshot, new: Snapshot) -> Tuple[List[str], Optional[float]]:
+    """返回 (变化/删除的文件路径, 最早变化文件的 mtime 秒)；删除文件不提供 mtime。"""
+    changed: List[str] = []
+    earliest: Optional[float] = None
+    for path, sig in new.items():
+        if old.get(path) == sig:
+            continue
+        changed.append(path)
+        mtime = sig[0] / 1e9
+        earliest = mtime if earliest is None else min(earliest, mtime)
+    changed.extend(path for path in old if path not in new)
+    return changed, earliest
+
+
+class KnowledgeWatcher:
+    """
+    prompt 知识目录监听器：变化防抖后只同步变化的文件。
+
+    说明：
+    - 装了 watchdog 时用原生事件（inotify/FSEvents/ReadDirectoryChangesW）：只 stat 事件里的路径，不再周期性全量遍历；
+    - 否则退回轮询（os.stat 快照比对，跨平台），每轮遍历一次目录；
+    - 同一目录在 debounce 窗口内持续变化只同步一次（批量拷贝/编辑器多次保存）；
+    - 同步走 sync_*_from_files(incremental=True, changed_paths=...)：只解析变化的文件，只删除已删除文件对应的记录；
+    - 有实际写入时递增知识库版本号，让依赖它的缓存失效。
+    """
+
+    def __init__(
+        self,
+        *,
+        targets: Optional[List[WatchTarget]] = None,
+        poll_interval_seconds: float = 2.0,
+        debounce_seconds: float = 0.5,
+        use_native: bool = True,
+    ):
+        self._targets = targets if targets is not None else default_watch_targets()
+        self._poll_interval = max(0.05, float(poll_interval_seconds))
+        self._debounce = max(0.0, float(debounce_seconds))
+        self._use_native = bool(use_native)
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._events_lock = threading.Lock()
+        self._event_paths: List[str] = []
+        self._thread: Optional[threading.Thread] = None
+        self._observer = None
+        self.backend = "polling"
+
+    @property
+    def targets(self) -> List[WatchTarget]:
+        return list(self._targets)
+
+    def prime(self) -> None:
+        """记录初始快照（启动同步之后调用：此刻 DB 与文件一致）。"""
+        for target in self._targets:
+            target.snapshot = snapshot_markdown_files(target.resolve_dir())
+
+    def notify(self, *paths: str) -> None:
+        """原生事件回调：记录事件路径并唤醒监听线程。"""
+        if paths:
+            with self._events_lock:
+                self._event_paths.extend(str(path) for path in paths if path)
+        self._wake.set()
+
+    @staticmethod
+    def _mark_pending(target: WatchTarget, changed: List[str], earliest: Optional[float], now_value: float) -> None:
+        if target.pending_since is None:
+            target.pending_since = now_value
+        target.pending_last_change = now_value
+        target.pending_paths.update(changed)
+        if earliest is not None:
+            prev = target.pending_earliest_change
+            target.pending_earliest_change = earliest if prev is None else min(prev, earliest)
+
+    def _apply_due(self, now_value: float) -> List[str]:
+        applied: List[str] = []
+        for target in self._targets:
+            if target.pending_since is None:
+                continue
+            if now_value - float(target.pending_last_change or now_value) < self._debounce:
+                continue
+            self._apply(target)
+            applied.append(target.kind)
+        return applied
+
+    def poll_once(self, *, now: Optional[float] = None) -> List[str]:
+        """
+        轮询模式：比对一次全量快照；对已静默超过 debounce 的目录执行同步。返回本次已同步的 kind 列表。
+        """
+        now_value = float(now) if now is not None else time.time()
+        for target in self._targets:
+            current = snapshot_markdown_files(target.resolve_dir())
+            changed, earliest = _diff_snapshot(target.snapshot, current)
+            if changed:
+                target.snapshot = current
+                self._mark_pending(target, changed, earliest, now_value)
+        return self._apply_due(now_value)
+
+    def process_events(self, *, now: Optional[float] = None) -> List[str]:
+        """
+        原生事件模式：只对事件里的路径（及其子路径）做局部快照比对；之后同 poll_once 应用到期的变更。
+        """
+        now_value = float(now) if now is not None else time.time()
+        with self._events_lock:
+            paths = list(dict.fromkeys(self._event_paths))
+            self._event_paths.clear()
+        for raw in paths:
+            event_path = os.path.abspath(raw)
+            for target in self._targets:
+                base = os.path.abspath(str(target.resolve_dir()))
+                if event_path != base and not event_path.startswith(base + os.sep):
+                    continue
+                prefix = event_path + os.sep
+                old = {
+                    key: sig for key, sig in target.snapshot.items() if key == event_path or key.startswith(prefix)
+                }
+                new = snapshot_event_path(Path(event_path))
+                changed, earliest = _diff_snapshot(old, new)
+                if changed:
+                    for key in old:
+                        target.snapshot.pop(key, None)
+                    target.snapshot.update(new)
+                    self._mark_pending(target, changed, earliest, now_value)
+                break
+        return self._apply_due(now_value)
+
+    def _apply(self, target: WatchTarget) -> None:
+        from backend.src.services.system.startup_sync import count_sync_changes
+
+        origin = target.pending_since or time.time()
+        if target.pending_earliest_change is not None:
+            origin = min(origin, target.pending_earliest_change)
+        paths = [Path(path) for path in sorted(target.pending_paths)]
+        files = len(paths)
+        target.pending_since = None
+        target.pending_last_change = None
+        target.pending_earliest_change = None
+        target.pending_paths = set()
+        try:
+            result = target.sync(paths)
+        except Exception as exc:
+            logger.exception("knowledge watcher sync %s failed: %s", target.kind, exc)
+            with _STATS_LOCK:
+                _STATS["errors"] = int(_STATS["errors"]) + 1
+            return
+        if count_sync_changes(result) > 0:
+            bump_knowledge_version(f"watch:{target.kind}")
+        lag_ms = int(max(0.0, time.time() - origin) * 1000)
+        with _STATS_LOCK:
+            _STATS["syncs_applied"] = int(_STATS["syncs_applied"]) + 1
+            _STATS["files_changed"] = int(_STATS["files_changed"]) + files
+            _STATS["last_kind"] = target.kind
+            _STATS["last_lag_ms"] = lag_ms
+            _STATS["max_lag_ms"] = max(int(_STATS["max_lag_ms"]), lag_ms)
+            _STATS["total_lag_ms"] = int(_STATS["total_lag_ms"]) + lag_ms
+        logger.info("knowledge watcher synced %s (%s files, lag=%sms)", target.kind, files, lag_ms)
+
+    def _start_native_observer(self) -> None:
+        try:
+            from watchdog.events import FileSystemEventHandler
+            from watchdog.observers import Observer
+        except ImportError:
+            return
+
+        watcher = self
+
+        class _Handler(FileSystemEventHandler):
+            def on_any_event(self, event):  # noqa: D401
+                # 目录 modified 只表示其下有条目变化（具体文件另有事件），不必整目录重扫
+                if event.is_directory and event.event_type == "modified":
+                    return
+                # 移动事件同时带源/目标路径：源路径按删除处理，目标路径按新增处理
+                watcher.notify(str(event.src_path), str(getattr(event, "dest_path", "") or ""))
+
+        observer = Observer()
+        for target in self._targets:
+            directory = target.resolve_dir()
+            directory.mkdir(parents=True, exist_ok=True)
+            observer.schedule(_Handler(), str(directory), recursive=True)
+        observer.daemon = True
+        observer.start()
+        self._observer = observer
+        self.backend = "native"
+
+    def _run(self) -> None:
+        native = self._observer is not None
+        while not self._stop.is_set():
+            try:
+                if native:
+                    self.process_events()
+                else:
+                    self.poll_once()
+            except Exception as exc:
+                logger.exception("knowledge watcher poll failed: %s", exc)
+            pending = any(target.pending_since is not None for target in self._targets)
+            # 有待应用变更时按 debounce 粒度复查；否则等待下一轮轮询，原生模式下一直等到事件唤醒
+            if pending:
+                timeout: Optional[float] = min(self._poll_interval, max(0.05, self._debounce))
+            else:
+                timeout = None if native else self._poll_interval
+            self._wake.wait(timeout=timeout)
+            self._wake.clear()
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self.prime()
+        if self._use_native:
+            try:
+                self._start_native_observer()
+            except Exception as exc:
+                logger.warning("knowledge watcher native backend unavailable, fallback to polling: %s", exc)
+                self._observer = None
+                self.backend = "polling"
+        self._thread = threading.Thread(target=self._run, name="knowledge-watcher", daemon=True)
+        self._thread.start()
+        _update_stats(running=True, backend=self.backend)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._observer is not None:
+            try:
+                self._observer.stop()
+            except Exception:
+                pass
+            self._observer = None
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+        _update_stats(running=False)
+
+
+def start_knowledge_watcher(*, poll_interval_seconds: float, debounce_seconds: float) -> KnowledgeWatcher:
+    """启动进程级单例监听器（重复调用返回已有实例）。"""
+    global _WATCHER
+    with _WATCHER_LOCK:
+        if _WATCHER is None:
+            _WATCHER = KnowledgeWatcher(
+                poll_interval_seconds=poll_interval_seconds,
+                debounce_seconds=debounce_seconds,
+            )
+            _WATCHER.start()
+        return _WATCHER
+
+
+def stop_knowledge_watcher() -> None:
+    global _WATCHER
+    with _WATCHER_LOCK:
+        watcher = _WATCHER
+        _WATCHER = None
+    if watcher is not None:
+        watcher.stop()
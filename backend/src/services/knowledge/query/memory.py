@@ -4,7 +4,7 @@ import sqlite3
 from typing import Optional
 
 from backend.src.repositories import memory_repo
-from backend.src.services.common.coerce import to_int, to_int_or_default, to_text
+from backend.src.services.common.coerce import to_int, to_int_or_default, to_optional_int, to_text
 
 
 def count_memory_items(*, conn: Optional[sqlite3.Connection] = None) -> int:
@@ -23,11 +23,13 @@ def list_memory_items(
     *,
     offset: int,
     limit: int,
+    after_id: Optional[int] = None,
     conn: Optional[sqlite3.Connection] = None,
 ):
     return memory_repo.list_memory_items(
         offset=to_int(offset),
         limit=to_int(limit),
+        after_id=to_optional_int(after_id),
         conn=conn,
     )
 
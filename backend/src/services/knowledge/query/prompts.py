@@ -5,6 +5,7 @@ from typing import Optional
 
 from backend.src.repositories import prompt_templates_repo
 from backend.src.services.common.coerce import to_int, to_text
+from backend.src.services.llm.prompt_templates import invalidate_prompt_caches
 
 
 def list_prompt_templates(
@@ -33,7 +34,7 @@ def create_prompt_template(
     updated_at: Optional[str] = None,
     conn: Optional[sqlite3.Connection] = None,
 ) -> int:
-    return to_int(
+    template_id = to_int(
         prompt_templates_repo.create_prompt_template(
             name=to_text(name),
             template=to_text(template),
@@ -43,6 +44,8 @@ def create_prompt_template(
             conn=conn,
         )
     )
+    invalidate_prompt_caches()
+    return template_id
 
 
 def update_prompt_template(
@@ -54,7 +57,7 @@ def update_prompt_template(
     updated_at: Optional[str] = None,
     conn: Optional[sqlite3.Connection] = None,
 ):
-    return prompt_templates_repo.update_prompt_template(
+    row = prompt_templates_repo.update_prompt_template(
         template_id=to_int(template_id),
         name=name,
         template=template,
@@ -62,7 +65,11 @@ def update_prompt_template(
         updated_at=updated_at,
         conn=conn,
     )
+    invalidate_prompt_caches()
+    return row
 
 
 def delete_prompt_template(*, template_id: int, conn: Optional[sqlite3.Connection] = None):
-    return prompt_templates_repo.delete_prompt_template(template_id=to_int(template_id), conn=conn)
+    row = prompt_templates_repo.delete_prompt_template(template_id=to_int(template_id), conn=conn)
+    invalidate_prompt_caches()
+    return row
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Optional
+
+from backend.src.constants import AGENT_LLM_BLOB_MIN_CHARS
+from backend.src.repositories.llm_blobs_repo import (
+    compact_inline_llm_records,
+    get_llm_blob_stats,
+    prune_orphan_llm_blobs,
+)
+from backend.src.storage import get_connection
+
+_COMPACT_LOCK = threading.Lock()
+
+
+def _database_bytes() -> dict:
+    with get_connection() as conn:
+        page_size = int(conn.execute("PRAGMA page_size").fetchone()[0] or 0)
+        page_count = int(conn.execute("PRAGMA page_count").fetchone()[0] or 0)
+        freelist = int(conn.execute("PRAGMA freelist_count").fetchone()[0] or 0)
+    return {
+        "file_bytes": page_size * page_count,
+        "free_bytes": page_size * freelist,
+    }
+
+
+def _vacuum() -> None:
+    with get_connection() as conn:
+        # VACUUM 不能在事务中执行
+        conn.commit()
+        conn.execute("VACUUM")
+
+
+def compact_llm_records(
+    *,
+    batch_size: int = 200,
+    max_rows: Optional[int] = None,
+    vacuum: bool = False,
+    min_chars: int = AGENT_LLM_BLOB_MIN_CHARS,
+) -> dict:
+    """
+    把历史内联存储的 llm_records prompt/response 迁移到内容寻址 blob，并报告回收的空间。
+
+    说明：
+    - 可重复执行：只处理尚无引用且长度达到阈值的列；每批一个事务，避免长时间阻塞前台写入；
+    - 迁移后清理无引用的 blob；
+    - 内联文本释放的页进入 freelist，需 vacuum=True 才会真正缩小数据库文件。
+    """
+    size = max(1, int(batch_size or 200))
+    limit = int(max_rows) if max_rows is not None and int(max_rows) > 0 else None
+    if not _COMPACT_LOCK.acquire(blocking=False):
+        return {"ok": False, "running": True, "rows": 0}
+    started = time.monotonic()
+    try:
+        db_before = _database_bytes()
+        blobs_before = get_llm_blob_stats()
+        rows = 0
+        batches = 0
+        inline_bytes = 0
+        after_id = 0
+        while limit is None or rows < limit:
+            take = size if limit is None else min(size, limit - rows)
+            with get_connection() as conn:
+                batch = compact_inline_llm_records(after_id=after_id, limit=take, min_chars=min_chars, conn=conn)
+            if not batch["last_id"]:
+                break
+            rows += int(batch["rows"])
+            inline_bytes += int(batch["inline_bytes"])
+            batches += 1
+            after_id = int(batch["last_id"])
+        with get_connection() as conn:
+            pruned = prune_orphan_llm_blobs(conn=conn)
+        blobs_after = get_llm_blob_stats()
+        if vacuum:
+            _vacuum()
+        db_after = _database_bytes()
+    finally:
+        _COMPACT_LOCK.release()
+
+    blob_bytes_added = int(blobs_after["stored_bytes"]) - int(blobs_before["stored_bytes"])
+    return {
+        "ok": True,
+        "rows": int(rows),
+        "batches": int(batches),
+        "inline_bytes_removed": int(inline_bytes),
+        "blob_bytes_added": int(blob_bytes_added),
+        "bytes_reclaimed": int(inline_bytes - blob_bytes_added),
+        "orphan_blobs_deleted": int(pruned["deleted"]),
+        "blobs": blobs_after,
+        "database": {
+            "before": db_before,
+            "after": db_after,
+            "vacuumed": bool(vacuum),
+            "file_bytes_reclaimed": int(db_before["file_bytes"]) - int(db_after["file_bytes"]),
+        },
+        "duration_ms": int((time.monotonic() - started) * 1000),
+    }
@@ -1,3 +1,5 @@
+import asyncio
+import contextvars
 import json
 import os
 import time
@@ -19,7 +21,20 @@ from backend.src.constants import (
     LLM_STATUS_RUNNING,
     LLM_STATUS_SUCCESS,
 )
-from backend.src.services.llm.llm_client import call_llm, classify_llm_error_text
+from backend.src.repositories.llm_blobs_repo import hydrate_llm_record_row, prepare_llm_text_column
+from backend.src.services.llm.llm_scheduler import llm_request_scope
+from backend.src.services.llm.prompt_templates import get_prompt_template_text
+from backend.src.services.llm.llm_client import (
+    LLMCallCancelled,
+    LLMCallTicket,
+    bind_llm_call_ticket,
+    call_llm,
+    call_llm_async,
+    call_llm_streaming,
+    classify_llm_error_text,
+    current_llm_cancel_scope,
+    reset_llm_call_ticket,
+)
 from backend.src.storage import get_connection
 
 T = TypeVar("T")
@@ -93,7 +108,8 @@ def _resolve_call_budget(data: dict, *, parameters: Optional[dict]) -> tuple[int
 
 
 def _fetch_llm_record_by_id(conn, record_id: int):
-    return conn.execute("SELECT * FROM llm_records WHERE id = ?", (record_id,)).fetchone()
+    row = conn.execute("SELECT * FROM llm_records WHERE id = ?", (record_id,)).fetchone()
+    return hydrate_llm_record_row(row, conn=conn)
 
 
 def _with_sqlite_locked_retry(op: Callable[[], T]) -> T:
@@ -107,33 +123,69 @@ def _with_sqlite_locked_retry(op: Callable[[], T]) -> T:
     return run_with_sqlite_locked_retry(op, attempts=3, base_delay_seconds=0.05)
 
 
-def _call_llm_with_hard_timeout(
+def _align_transport_timeout(parameters: Any, timeout_seconds: int) -> dict:
+    """传输层超时与硬超时对齐：取 min(硬超时, 调用方 timeout)，统一写为 timeout_seconds（至少 5 秒）。"""
+    call_parameters = dict(parameters or {}) if isinstance(parameters, dict) else {}
+    transport_timeout = int(timeout_seconds)
+    for key in ("timeout", "timeout_seconds"):
+        if key not in call_parameters:
+            continue
+        try:
+            transport_timeout = min(transport_timeout, int(float(call_parameters.pop(key))))
+        except Exception:
+            continue
+    call_parameters["timeout_seconds"] = max(5, transport_timeout)
+    return call_parameters
+
+
+def _run_with_hard_timeout(
+    fn: Callable[[], T],
     *,
-    prompt_text: str,
-    model: str,
-    parameters: Any,
-    provider: str,
     timeout_seconds: int,
-):
+    priority: Optional[str] = None,
+    run_id: Any = None,
+) -> T:
     """
-    对 call_llm 增加线程级硬超时，避免单次 SDK 卡死拖垮整个 run。
+    在工作线程中执行一次供应商调用并施加硬超时。
 
     说明：
-    - 超时时仅中断主流程，后台线程会作为 daemon 继续/退出，不阻塞当前请求返回；
+    - 工作线程继承调用方上下文，并按 priority/run_id 标注调度类别（见 llm_scheduler）；
+    - 工作线程绑定 LLMCallTicket，并发槽位/连接登记到 ticket；
+    - 超时则 abandon()：立即归还并发槽位、关闭连接池，并计入 orphaned gauge，
+      而不是让后台线程继续占着槽位；
+    - 当前上下文绑定了 LLMCancelScope 时，cancel() 同样 abandon 该 ticket，并抛 LLMCallCancelled；
     - 异常语义保持为普通 Exception，由上层重试/记录。
     """
+    scope = current_llm_cancel_scope()
+    if scope is not None and scope.cancelled:
+        raise LLMCallCancelled()
     box: dict = {}
+    ticket = LLMCallTicket()
 
     def _worker():
+        token = bind_llm_call_ticket(ticket)
         try:
-            box["result"] = call_llm(prompt_text, model, parameters, provider=provider)
+            with llm_request_scope(priority=priority, run_id=run_id):
+                box["result"] = fn()
         except Exception as exc:  # pragma: no cover - 由调用方行为断言
             box["error"] = exc
+        finally:
+            reset_llm_call_ticket(token)
+            ticket.finish()
 
-    worker = threading.Thread(target=_worker, daemon=True)
+    context = contextvars.copy_context()
+    worker = threading.Thread(target=context.run, args=(_worker,), daemon=True)
     worker.start()
-    worker.join(timeout=float(timeout_seconds))
-    if worker.is_alive():
+    remove_cancel = scope.add(lambda: ticket.abandon(cancelled=True)) if scope is not None else None
+    try:
+        ticket.wait(float(timeout_seconds))
+    finally:
+        if remove_cancel is not None:
+            remove_cancel()
+    if ticket.cancelled:
+        raise LLMCallCancelled()
+    if not ticket.finished:
+        ticket.abandon()
         raise TimeoutError(f"LLM call timeout after {int(timeout_seconds)}s")
 
     err = box.get("error")
@@ -142,14 +194,41 @@ def _call_llm_with_hard_timeout(
     return box.get("result")
 
 
-def create_llm_call(payload: Any) -> dict:
+def _call_llm_with_hard_timeout(
+    *,
+    prompt_text: str,
+    model: str,
+    parameters: Any,
+    provider: str,
+    timeout_seconds: int,
+    priority: Optional[str] = None,
+    run_id: Any = None,
+):
     """
-    创建一次 LLM 调用并写入 llm_records（同步）。
+    对 call_llm 增加硬超时，避免单次 SDK 卡死拖垮整个 run。
 
     说明：
-    - 这是“业务逻辑函数”，会被 Agent 执行链路复用；
-    - API 层的权限校验（ensure_write_permission）应由路由函数负责；
-    - 返回值保持与旧 /llm/calls 一致：成功时 {"record": ...}；失败时抛出 AppError（由 API 层捕获并转为错误响应）。
+    - 传输层超时与硬超时对齐（透传为 timeout_seconds），正常情况下由 SDK 自身先超时返回；
+    - 若工作线程仍未返回，则放弃该调用（见 _run_with_hard_timeout）。
+    """
+    call_parameters = _align_transport_timeout(parameters, timeout_seconds)
+    return _run_with_hard_timeout(
+        lambda: call_llm(prompt_text, model, call_parameters, provider=provider),
+        timeout_seconds=int(timeout_seconds),
+        priority=priority,
+        run_id=run_id,
+    )
+
+
+def _should_retry_llm_error(error_text: str) -> bool:
+    kind = classify_llm_error_text(error_text)
+    return kind in ("rate_limit", "transient")
+
+
+def _prepare_llm_call(payload: Any) -> tuple[dict, str, str, str, int]:
+    """
+    create_llm_call 前半段：渲染 prompt、解析 provider/model，并插入 running 状态的 llm_records。
+    返回 (data, prompt_text, provider, model, record_id)。
     """
     data = dump_model(payload)
     if not data.get("prompt") and data.get("template_id") is None:
@@ -160,14 +239,14 @@ def create_llm_call(payload: Any) -> dict:
         prompt_text = str(prompt_text)
     template_id = data.get("template_id")
     if template_id is not None:
-        with get_connection() as conn:
-            template_row = conn.execute(
-                "SELECT * FROM prompt_templates WHERE id = ?", (template_id,)
-            ).fetchone()
-        if not template_row:
+        try:
+            template_text = get_prompt_template_text(int(template_id))
+        except (TypeError, ValueError):
+            template_text = None
+        if template_text is None:
             raise not_found_error(ERROR_MESSAGE_PROMPT_NOT_FOUND)
         rendered = render_prompt(
-            template_row["template"],
+            template_text,
             data.get("variables") if isinstance(data.get("variables"), dict) else None,
         )
         if rendered is None:
@@ -196,11 +275,14 @@ def create_llm_call(payload: Any) -> dict:
 
     def _insert_record() -> int:
         with get_connection() as conn:
+            # 长 prompt 写入内容寻址 blob（按段落去重 + 压缩），记录只保存引用
+            prompt_value, prompt_ref = prepare_llm_text_column(prompt_text, conn=conn)
             cursor = conn.execute(
-                "INSERT INTO llm_records (prompt, response, task_id, run_id, provider, model, prompt_template_id, variables, parameters, status, error, started_at, finished_at, created_at, updated_at, tokens_prompt, tokens_completion, tokens_total) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                "INSERT INTO llm_records (prompt, response, prompt_ref, task_id, run_id, provider, model, prompt_template_id, variables, parameters, status, error, started_at, finished_at, created_at, updated_at, tokens_prompt, tokens_completion, tokens_total) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
                 (
-                    prompt_text,
+                    prompt_value,
                     "",
+                    prompt_ref,
                     data.get("task_id"),
                     data.get("run_id"),
                     provider,
@@ -222,25 +304,85 @@ def create_llm_call(payload: Any) -> dict:
             return int(cursor.lastrowid)
 
     record_id = _with_sqlite_locked_retry(_insert_record)
+    return data, prompt_text, provider, model, record_id
 
-    if data.get("dry_run"):
-        finished_at = now_iso()
-        def _mark_dry_run():
+
+def _mark_llm_call_dry_run(record_id: int) -> dict:
+    finished_at = now_iso()
+    def _mark_dry_run():
+        with get_connection() as conn:
+            conn.execute(
+                "UPDATE llm_records SET status = ?, finished_at = ?, updated_at = ? WHERE id = ?",
+                (LLM_STATUS_DRY_RUN, finished_at, finished_at, record_id),
+            )
+            return _fetch_llm_record_by_id(conn, record_id)
+
+    row = _with_sqlite_locked_retry(_mark_dry_run)
+    return {"record": llm_record_from_row(row)}
+
+
+
+
+def _finish_llm_call(record_id: int, *, response_text: Any, tokens: Any, error_message: Optional[str]) -> dict:
+    """create_llm_call 后半段：按调用结果把 llm_records 落为 success/error 并返回 {"record": ...}。"""
+    finished_at = now_iso()
+    if error_message:
+        def _mark_error():
             with get_connection() as conn:
                 conn.execute(
-                    "UPDATE llm_records SET status = ?, finished_at = ?, updated_at = ? WHERE id = ?",
-                    (LLM_STATUS_DRY_RUN, finished_at, finished_at, record_id),
+                    "UPDATE llm_records SET status = ?, error = ?, finished_at = ?, updated_at = ? WHERE id = ?",
+                    (
+                        LLM_STATUS_ERROR,
+                        error_message,
+                        finished_at,
+                        finished_at,
+                        record_id,
+                    ),
                 )
                 return _fetch_llm_record_by_id(conn, record_id)
 
-        row = _with_sqlite_locked_retry(_mark_dry_run)
+        row = _with_sqlite_locked_retry(_mark_error)
         return {"record": llm_record_from_row(row)}
 
+    def _mark_success():
+        with get_connection() as conn:
+            response_value, response_ref = prepare_llm_text_column(response_text, conn=conn)
+            conn.execute(
+                "UPDATE llm_records SET response = ?, response_ref = ?, status = ?, error = NULL, finished_at = ?, updated_at = ?, tokens_prompt = ?, tokens_completion = ?, tokens_total = ?, coalesced = ? WHERE id = ?",
+                (
+                    response_value,
+                    response_ref,
+                    LLM_STATUS_SUCCESS,
+                    finished_at,
+                    finished_at,
+                    tokens.get("prompt") if isinstance(tokens, dict) else None,
+                    tokens.get("completion") if isinstance(tokens, dict) else None,
+                    tokens.get("total") if isinstance(tokens, dict) else None,
+                    1 if isinstance(tokens, dict) and tokens.get("coalesced") else 0,
+                    record_id,
+                ),
+            )
+            return _fetch_llm_record_by_id(conn, record_id)
+
+    row = _with_sqlite_locked_retry(_mark_success)
+    return {"record": llm_record_from_row(row)}
+
+
+def create_llm_call(payload: Any) -> dict:
+    """
+    创建一次 LLM 调用并写入 llm_records（同步）。
+
+    说明：
+    - 这是“业务逻辑函数”，会被 Agent 执行链路复用；
+    - API 层的权限校验（ensure_write_permission）应由路由函数负责；
+    - 返回值保持与旧 /llm/calls 一致：成功时 {"record": ...}；失败时抛出 AppError（由 API 层捕获并转为错误响应）。
+    """
+    data, prompt_text, provider, model, record_id = _prepare_llm_call(payload)
+    if data.get("dry_run"):
+        return _mark_llm_call_dry_run(record_id)
+
     parameters = data.get("parameters") if isinstance(data.get("parameters"), dict) else None
     call_max_attempts, call_hard_timeout_seconds = _resolve_call_budget(data, parameters=parameters)
-    def _should_retry_llm_error(error_text: str) -> bool:
-        kind = classify_llm_error_text(error_text)
-        return kind in ("rate_limit", "transient")
 
     response_text = None
     tokens = None
@@ -253,6 +395,8 @@ def create_llm_call(payload: Any) -> dict:
                 parameters=parameters,
                 provider=provider,
                 timeout_seconds=int(call_hard_timeout_seconds),
+                priority=data.get("priority"),
+                run_id=data.get("run_id"),
             )
             if isinstance(call_result, tuple) and len(call_result) >= 2:
                 response_text, tokens = call_result[0], call_result[1]
@@ -260,6 +404,9 @@ def create_llm_call(payload: Any) -> dict:
                 raise RuntimeError(ERROR_MESSAGE_LLM_CALL_FAILED)
             error_message = None
             break
+        except LLMCallCancelled as exc:
+            error_message = str(exc)
+            break
         except AppError as exc:
             error_message = exc.message or ERROR_MESSAGE_LLM_CALL_FAILED
         except Exception as exc:
@@ -270,41 +417,159 @@ def create_llm_call(payload: Any) -> dict:
         if not _should_retry_llm_error(error_message):
             break
         time.sleep(float(LLM_CALL_RETRY_BASE_SECONDS) * float(attempt))
-    finished_at = now_iso()
-    if error_message:
-        def _mark_error():
-            with get_connection() as conn:
-                conn.execute(
-                    "UPDATE llm_records SET status = ?, error = ?, finished_at = ?, updated_at = ? WHERE id = ?",
-                    (
-                        LLM_STATUS_ERROR,
-                        error_message,
-                        finished_at,
-                        finished_at,
-                        record_id,
-                    ),
-                )
-                return _fetch_llm_record_by_id(conn, record_id)
+    return _finish_llm_call(
+        record_id,
+        response_text=response_text,
+        tokens=tokens,
+        error_message=error_message,
+    )
 
-        row = _with_sqlite_locked_retry(_mark_error)
-        return {"record": llm_record_from_row(row)}
 
-    def _mark_success():
-        with get_connection() as conn:
-            conn.execute(
-                "UPDATE llm_records SET response = ?, status = ?, error = NULL, finished_at = ?, updated_at = ?, tokens_prompt = ?, tokens_completion = ?, tokens_total = ? WHERE id = ?",
-                (
-                    response_text,
-                    LLM_STATUS_SUCCESS,
-                    finished_at,
-                    finished_at,
-                    tokens.get("prompt") if isinstance(tokens, dict) else None,
-                    tokens.get("completion") if isinstance(tokens, dict) else None,
-                    tokens.get("total") if isinstance(tokens, dict) else None,
-                    record_id,
-                ),
+def create_llm_call_streaming(payload: Any, on_text: Callable[[str], bool]) -> dict:
+    """
+    create_llm_call 的流式版本：边接收边回调 on_text(chunk)，返回 True 时立即中止生成。
+
+    说明：
+    - llm_records 的写入语义与 create_llm_call 一致（response 为实际接收到的内容）；
+    - 只做一次流式尝试（同样受硬超时保护）：失败时记录为 error，由调用方回退到 create_llm_call；
+    - 返回 {"record": ..., "stream": {chunks, stopped_early, first_chunk_ms, elapsed_ms}}。
+    """
+    data, prompt_text, provider, model, record_id = _prepare_llm_call(payload)
+    if data.get("dry_run"):
+        return _mark_llm_call_dry_run(record_id)
+
+    parameters = data.get("parameters") if isinstance(data.get("parameters"), dict) else None
+    _attempts, call_hard_timeout_seconds = _resolve_call_budget(data, parameters=parameters)
+    call_parameters = _align_transport_timeout(parameters, int(call_hard_timeout_seconds))
+
+    response_text = None
+    tokens = None
+    stream_meta: dict = {}
+    error_message = None
+    try:
+        response_text, tokens, stream_meta = _run_with_hard_timeout(
+            lambda: call_llm_streaming(
+                prompt_text,
+                model,
+                call_parameters,
+                provider=provider,
+                on_text=on_text,
+            ),
+            timeout_seconds=int(call_hard_timeout_seconds),
+            priority=data.get("priority"),
+            run_id=data.get("run_id"),
+        )
+    except AppError as exc:
+        error_message = exc.message or ERROR_MESSAGE_LLM_CALL_FAILED
+    except Exception as exc:
+        error_message = str(exc) or ERROR_MESSAGE_LLM_CALL_FAILED
+
+    result = _finish_llm_call(
+        record_id,
+        response_text=response_text,
+        tokens=tokens,
+        error_message=error_message,
+    )
+    result["stream"] = dict(stream_meta or {})
+    return result
+
+
+async def _call_llm_async_with_hard_timeout(
+    *,
+    prompt_text: str,
+    model: str,
+    parameters: Any,
+    provider: str,
+    timeout_seconds: int,
+    priority: Optional[str] = None,
+    run_id: Any = None,
+):
+    """
+    _call_llm_with_hard_timeout 的 asyncio 版本：超时会真正 cancel 在途请求（并归还并发槽位），
+    而不是把卡住的线程留在后台。
+    """
+    try:
+        with llm_request_scope(priority=priority, run_id=run_id):
+            return await asyncio.wait_for(
+                call_llm_async(prompt_text, model, parameters, provider=provider),
+                timeout=float(timeout_seconds),
             )
-            return _fetch_llm_record_by_id(conn, record_id)
+    except asyncio.TimeoutError:
+        raise TimeoutError(f"LLM call timeout after {int(timeout_seconds)}s") from None
 
-    row = _with_sqlite_locked_retry(_mark_success)
-    return {"record": llm_record_from_row(row)}
+
+async def create_llm_call_async(payload: Any) -> dict:
+    """
+    create_llm_call 的 asyncio 版本（返回值/错误语义一致）。
+
+    说明：
+    - SQLite 读写仍是同步 API，放到 asyncio.to_thread 中执行，不阻塞 event loop；
+    - 供应商调用走 call_llm_async：调用方 task 被 cancel 时在途请求随之中止，
+      此时 llm_records 会被标记为 error（cancelled），不会永久停留在 running；
+    - 当前上下文绑定的 LLMCancelScope 被 cancel() 时同样 cancel 本 task。
+    """
+    data, prompt_text, provider, model, record_id = await asyncio.to_thread(_prepare_llm_call, payload)
+    if data.get("dry_run"):
+        return await asyncio.to_thread(_mark_llm_call_dry_run, record_id)
+
+    scope = current_llm_cancel_scope()
+    remove_cancel = None
+    if scope is not None:
+        loop = asyncio.get_running_loop()
+        task = asyncio.current_task()
+        remove_cancel = scope.add(lambda: loop.call_soon_threadsafe(task.cancel))
+    try:
+        parameters = data.get("parameters") if isinstance(data.get("parameters"), dict) else None
+        call_max_attempts, call_hard_timeout_seconds = _resolve_call_budget(data, parameters=parameters)
+
+        response_text = None
+        tokens = None
+        error_message = None
+        for attempt in range(1, int(call_max_attempts) + 1):
+            try:
+                call_result = await _call_llm_async_with_hard_timeout(
+                    prompt_text=prompt_text,
+                    model=model,
+                    parameters=parameters,
+                    provider=provider,
+                    timeout_seconds=int(call_hard_timeout_seconds),
+                    priority=data.get("priority"),
+                    run_id=data.get("run_id"),
+                )
+                if isinstance(call_result, tuple) and len(call_result) >= 2:
+                    response_text, tokens = call_result[0], call_result[1]
+                else:
+                    raise RuntimeError(ERROR_MESSAGE_LLM_CALL_FAILED)
+                error_message = None
+                break
+            except AppError as exc:
+                error_message = exc.message or ERROR_MESSAGE_LLM_CALL_FAILED
+            except Exception as exc:
+                error_message = str(exc) or ERROR_MESSAGE_LLM_CALL_FAILED
+
+            if attempt >= int(call_max_attempts):
+                break
+            if not _should_retry_llm_error(error_message):
+                break
+            await asyncio.sleep(float(LLM_CALL_RETRY_BASE_SECONDS) * float(attempt))
+    except asyncio.CancelledError:
+        await asyncio.shield(
+            asyncio.to_thread(
+                _finish_llm_call,
+                record_id,
+                response_text=None,
+                tokens=None,
+                error_message="cancelled",
+            )
+        )
+        raise
+    finally:
+        if remove_cancel is not None:
+            remove_cancel()
+    return await asyncio.to_thread(
+        _finish_llm_call,
+        record_id,
+        response_text=response_text,
+        tokens=tokens,
+        error_message=error_message,
+    )
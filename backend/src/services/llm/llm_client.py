@@ -1,18 +1,22 @@
+import asyncio
 import json
 import logging
 import os
 import time
 import threading
-from contextlib import contextmanager
+from contextvars import ContextVar
+from contextlib import asynccontextmanager, contextmanager
 from dataclasses import dataclass
 from enum import Enum
-from typing import Any, AsyncGenerator, Dict, List, Optional, Tuple
+from typing import Any, AsyncGenerator, Callable, Dict, Generator, List, Optional, Tuple
 
 from backend.src.common.app_error_utils import invalid_request_error
 from backend.src.common.errors import AppError
 from backend.src.constants import (
+    AGENT_LLM_CLUSTER_RPM,
     AGENT_LLM_MAX_CONCURRENCY_GLOBAL,
     AGENT_LLM_MAX_CONCURRENCY_PER_MODEL,
+    AGENT_LLM_SINGLE_FLIGHT_ENABLED,
     DEFAULT_LLM_MODEL,
     ERROR_MESSAGE_LLM_API_KEY_MISSING,
     ERROR_MESSAGE_LLM_CALL_FAILED,
@@ -27,6 +31,15 @@ from backend.src.services.llm.providers.registry import (
 )
 from backend.src.storage import get_connection
 from backend.src.repositories.config_repo import fetch_llm_store_config
+from backend.src.services.coordination.coordinator import Lease, get_coordinator
+from backend.src.services.llm.llm_scheduler import (
+    LLMAdmission,
+    current_llm_request_class,
+    estimate_llm_request_tokens,
+    get_llm_scheduler,
+    llm_request_scope,
+)
+from backend.src.services.llm.llm_single_flight import AsyncSingleFlight, SingleFlight, single_flight_key
 
 logger = logging.getLogger(__name__)
 
@@ -114,6 +127,17 @@ class _AdaptiveLimiter:
                     return
                 self._cond.wait(timeout=0.1)
 
+    def try_acquire(self) -> bool:
+        """非阻塞 acquire：供 asyncio 路径轮询使用（不能在 event loop 里阻塞等待 Condition）。"""
+        if self.base_limit <= 0:
+            return True
+        with self._cond:
+            limit = int(self.current_limit or self.base_limit)
+            if self.in_flight < limit:
+                self.in_flight += 1
+                return True
+            return False
+
     def release(self) -> None:
         if self.base_limit <= 0:
             return
@@ -270,67 +294,449 @@ def _get_llm_concurrency_semaphores(
         return global_sem, model_sem, global_adaptive, model_adaptive
 
 
+def _report_llm_guard_success(limiters: Tuple[Optional[_AdaptiveLimiter], ...]) -> None:
+    # 成功：尝试恢复并发（慢速）
+    for limiter in limiters:
+        if limiter is None:
+            continue
+        try:
+            limiter.on_success()
+        except Exception:
+            continue
+
+
+def _report_llm_guard_failure(limiters: Tuple[Optional[_AdaptiveLimiter], ...], exc: BaseException) -> None:
+    kind = _classify_llm_exception(exc)
+    for limiter in limiters:
+        if limiter is None:
+            continue
+        try:
+            if kind == "rate_limit":
+                limiter.on_rate_limited()
+            elif kind == "transient":
+                limiter.on_transient_failure()
+        except Exception:
+            continue
+
+
+def _release_llm_guard(acquired: List[_AdaptiveLimiter]) -> None:
+    # 反序 release：先 per-model，再 global
+    for limiter in reversed(acquired):
+        try:
+            limiter.release()
+        except Exception:
+            continue
+    if acquired:
+        # 全局槽位空出：唤醒调度队列中的等待者
+        get_llm_scheduler().notify()
+
+
+# LLM 调用计量（进程内 gauge）：
+# - in_flight：已拿到并发槽位、正在等待供应商响应的调用数；
+# - orphaned：调用方已因硬超时放弃、但工作线程尚未退出的调用数（理想情况下应迅速回落到 0）。
+_LLM_CALL_GAUGE_LOCK = threading.Lock()
+_LLM_CALL_GAUGE: Dict[str, int] = {
+    "in_flight": 0,
+    "orphaned": 0,
+    "hard_timeouts_total": 0,
+    "orphaned_total": 0,
+}
+
+
+def _bump_llm_call_gauge(key: str, delta: int) -> None:
+    with _LLM_CALL_GAUGE_LOCK:
+        _LLM_CALL_GAUGE[key] = max(0, int(_LLM_CALL_GAUGE.get(key) or 0) + int(delta))
+
+
+def get_llm_call_gauge() -> Dict[str, int]:
+    """返回 LLM 调用计量快照（用于 /metrics 与排障）。"""
+    with _LLM_CALL_GAUGE_LOCK:
+        return {key: int(value) for key, value in _LLM_CALL_GAUGE.items()}
+
+
+class LLMCallTicket:
+    """
+    单次同步 LLM 调用的资源句柄（由硬超时包装方创建，经 ContextVar 传给 call_llm）。
+
+    作用：调用方因硬超时放弃时，可以从外部
+    - 立即归还该调用占用的 _AdaptiveLimiter 槽位与集群准入租约（不再等待卡住的线程自行退出）；
+    - 关闭供应商 client 的连接池，让阻塞在 socket 上的请求尽快报错退出。
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._acquired: List[_AdaptiveLimiter] = []
+        self._limiters: Tuple[Optional[_AdaptiveLimiter], ...] = ()
+        self._admission: Optional[LLMAdmission] = None
+        self._lease: Optional[Lease] = None
+        self._client: Optional["LLMClient"] = None
+        self._released = False
+        self._finished = False
+        self._orphaned = False
+        self._settled = threading.Event()
+        self.abandoned = False
+        self.cancelled = False
+
+    @property
+    def finished(self) -> bool:
+        return self._finished
+
+    def wait(self, timeout: Optional[float]) -> bool:
+        """等待工作线程结束或调用被放弃；返回是否在 timeout 内发生。"""
+        return self._settled.wait(timeout)
+
+    def bind_limiters(
+        self,
+        limiters: Tuple[Optional[_AdaptiveLimiter], ...],
+        acquired: List[_AdaptiveLimiter],
+        admission: Optional[LLMAdmission] = None,
+    ) -> bool:
+        """登记已 acquire 的槽位（含调度准入）；若调用方已放弃则立即归还并返回 False。"""
+        with self._lock:
+            if not self.abandoned:
+                self._limiters = limiters
+                self._acquired = list(acquired)
+                self._admission = admission
+                self._released = False
+                return True
+        _release_llm_guard(acquired)
+        if admission is not None:
+            admission.release()
+        return False
+
+    def bind_lease(self, lease: Optional[Lease]) -> bool:
+        """登记集群准入租约（随 release_slots 归还）；若调用方已放弃则立即归还并返回 False。"""
+        with self._lock:
+            if not self.abandoned:
+                self._lease = lease
+                return True
+        _release_cluster_llm_admission(lease)
+        return False
+
+    def bind_client(self, client: "LLMClient") -> None:
+        with self._lock:
+            self._client = client
+        if self.abandoned:
+            client.close_sync()
+
+    def release_slots(self) -> bool:
+        """归还已登记的槽位（幂等）；返回本次是否真正执行了归还。"""
+        with self._lock:
+            if self._released:
+                return False
+            self._released = True
+            acquired = list(self._acquired)
+            self._acquired = []
+            admission = self._admission
+            self._admission = None
+            lease = self._lease
+            self._lease = None
+        _release_cluster_llm_admission(lease)
+        _release_llm_guard(acquired)
+        if admission is not None:
+            admission.release()
+        return True
+
+    def abandon(self, *, cancelled: bool = False) -> None:
+        """
+        调用方放弃等待：归还槽位、关闭连接；工作线程未退出则计为 orphaned。
+
+        cancelled=True 表示主动取消（LLMCancelScope）：不计入硬超时，也不按 transient 失败降并发。
+        """
+        with self._lock:
+            if self.abandoned or (cancelled and self._finished):
+                return
+            self.abandoned = True
+            self.cancelled = bool(cancelled)
+            client = self._client
+            limiters = self._limiters
+            self._orphaned = not self._finished
+        self._settled.set()
+        if not cancelled:
+            _bump_llm_call_gauge("hard_timeouts_total", 1)
+        if self._orphaned:
+            _bump_llm_call_gauge("orphaned", 1)
+            _bump_llm_call_gauge("orphaned_total", 1)
+        if self.release_slots() and not cancelled:
+            _report_llm_guard_failure(limiters, TimeoutError("LLM call timeout"))
+        if client is not None:
+            client.close_sync()
+
+    def finish(self) -> None:
+        """工作线程退出时调用：若此前已被放弃，则 orphaned 计数回落。"""
+        with self._lock:
+            self._finished = True
+            orphaned = self._orphaned
+            self._orphaned = False
+        self._settled.set()
+        if orphaned:
+            _bump_llm_call_gauge("orphaned", -1)
+
+
+_CURRENT_LLM_CALL_TICKET: ContextVar[Optional[LLMCallTicket]] = ContextVar("llm_call_ticket", default=None)
+
+
+def bind_llm_call_ticket(ticket: Optional[LLMCallTicket]):
+    """在当前上下文（通常是硬超时的工作线程）绑定 ticket，返回用于 reset 的 token。"""
+    return _CURRENT_LLM_CALL_TICKET.set(ticket)
+
+
+def reset_llm_call_ticket(token) -> None:
+    _CURRENT_LLM_CALL_TICKET.reset(token)
+
+
+class LLMCallCancelled(Exception):
+    """调用所在的 LLMCancelScope 已被取消。"""
+
+    def __init__(self) -> None:
+        super().__init__("cancelled")
+
+
+class LLMCancelScope:
+    """
+    一组 LLM 调用的取消令牌（如投机预取）：cancel() 放弃其中全部在途调用，并让之后的调用直接失败。
+
+    说明：
+    - 同步路径登记 LLMCallTicket.abandon(cancelled=True)：归还槽位、关闭连接，等待方立即返回；
+    - asyncio 路径登记取消所在 task 的回调：在途请求随 task 一起中止。
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._callbacks: Dict[int, Callable[[], None]] = {}
+        self._next_id = 0
+        self._cancelled = False
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    def add(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """登记取消回调，返回注销函数；已取消时立即执行回调。"""
+        with self._lock:
+            if not self._cancelled:
+                key = self._next_id
+                self._next_id += 1
+                self._callbacks[key] = callback
+
+                def _remove() -> None:
+                    with self._lock:
+                        self._callbacks.pop(key, None)
+
+                return _remove
+        callback()
+        return lambda: None
+
+    def cancel(self) -> None:
+        with self._lock:
+            if self._cancelled:
+                return
+            self._cancelled = True
+            callbacks = list(self._callbacks.values())
+            self._callbacks.clear()
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as exc:
+                logger.warning("llm cancel callback failed: %s", exc)
+
+
+_CURRENT_LLM_CANCEL_SCOPE: ContextVar[Optional[LLMCancelScope]] = ContextVar("llm_cancel_scope", default=None)
+
+
+def bind_llm_cancel_scope(scope: Optional[LLMCancelScope]):
+    """在当前上下文绑定取消令牌（其后发起的 LLM 调用都归属该令牌），返回用于 reset 的 token。"""
+    return _CURRENT_LLM_CANCEL_SCOPE.set(scope)
+
+
+def reset_llm_cancel_scope(token) -> None:
+    _CURRENT_LLM_CANCEL_SCOPE.reset(token)
+
+
+def current_llm_cancel_scope() -> Optional[LLMCancelScope]:
+    return _CURRENT_LLM_CANCEL_SCOPE.get()
+
+
+# 集群级 LLM 准入（AGENT_COORDINATION_BACKEND=sqlite 时生效）：
+# - llm:global：所有实例合计的 LLM 并发上限（与单进程 global 上限相同，避免多实例叠加放大）；
+# - llm:rpm：所有实例合计的每分钟请求数（AGENT_LLM_CLUSTER_RPM>0 时）。
+_LLM_CLUSTER_POLL_SECONDS = 0.05
+_LLM_CLUSTER_RPM_WINDOW_SECONDS = 60
+
+
+def _try_cluster_llm_step(state: Dict[str, Any]) -> bool:
+    """推进一次集群准入（先限额后槽位）；全部完成返回 True。"""
+    coordinator = get_coordinator()
+    rpm = int(AGENT_LLM_CLUSTER_RPM or 0)
+    if rpm > 0 and not state.get("budget_ok"):
+        if not coordinator.try_consume_budget(
+            "llm:rpm", 1, limit=rpm, window_seconds=_LLM_CLUSTER_RPM_WINDOW_SECONDS
+        ):
+            return False
+        state["budget_ok"] = True
+    global_limit = _normalize_concurrency_limit(AGENT_LLM_MAX_CONCURRENCY_GLOBAL)
+    if global_limit > 0 and state.get("lease") is None:
+        lease = coordinator.try_acquire("llm:global", global_limit)
+        if lease is None:
+            return False
+        state["lease"] = lease
+    return True
+
+
+def _acquire_cluster_llm_admission(ticket: Optional["LLMCallTicket"]) -> Optional[Lease]:
+    if not get_coordinator().distributed:
+        return None
+    state: Dict[str, Any] = {}
+    while not _try_cluster_llm_step(state):
+        if ticket is not None and ticket.abandoned:
+            _release_cluster_llm_admission(state.get("lease"))
+            raise TimeoutError("LLM call abandoned before start (timeout)")
+        time.sleep(_LLM_CLUSTER_POLL_SECONDS)
+    return state.get("lease")
+
+
+async def _acquire_cluster_llm_admission_async() -> Optional[Lease]:
+    if not get_coordinator().distributed:
+        return None
+    state: Dict[str, Any] = {}
+    try:
+        while not await asyncio.to_thread(_try_cluster_llm_step, state):
+            await asyncio.sleep(_LLM_CLUSTER_POLL_SECONDS)
+    except BaseException:
+        await asyncio.to_thread(_release_cluster_llm_admission, state.get("lease"))
+        raise
+    return state.get("lease")
+
+
+def _release_cluster_llm_admission(lease: Optional[Lease]) -> None:
+    if lease is None:
+        return
+    try:
+        get_coordinator().release(lease)
+    except Exception as exc:
+        logger.warning("release cluster llm lease failed: %s", exc)
+
+
+# 调度队列中等待全局槽位时的最长休眠（秒）；槽位释放时会被提前唤醒
+_LLM_SCHEDULER_WAIT_SECONDS = 0.05
+
+
+def _global_slot_acquirer(limiter: Optional[_AdaptiveLimiter]) -> Tuple[Callable[[], bool], int]:
+    if limiter is None:
+        return (lambda: True), 0
+    return limiter.try_acquire, int(limiter.current_limit or limiter.base_limit)
+
+
 @contextmanager
 def _llm_concurrency_guard(provider_model_key: str):
     """
     LLM 并发限制（同步调用）。
 
     设计：
+    - 全局槽位经 LLMRequestScheduler 排队发放（优先级 / TPM / run 公平，见 llm_scheduler）；
     - 严格按 global → per-model 的顺序 acquire/release（避免死锁）；
     - 只使用 _AdaptiveLimiter（兼具并发限制与动态降级），去掉冗余的 BoundedSemaphore
       （旧实现同时 acquire sem + adaptive 共 4 层，在高并发下存在交叉持有风险）；
-    - release 顺序与 acquire 相反，且放在 finally 中保证异常安全。
+    - release 顺序与 acquire 相反，且放在 finally 中保证异常安全；
+    - 若当前上下文绑定了 LLMCallTicket，槽位与集群租约登记到 ticket：调用方硬超时放弃时可提前归还。
     """
     _, _, global_adaptive, model_adaptive = _get_llm_concurrency_semaphores(
         provider_model_key=provider_model_key
     )
-    global_acquired = False
-    model_acquired = False
+    limiters = (global_adaptive, model_adaptive)
+    ticket = _CURRENT_LLM_CALL_TICKET.get()
+    acquired: List[_AdaptiveLimiter] = []
+    cluster_lease: Optional[Lease] = None
+    counted = False
+    scheduler = get_llm_scheduler()
+    priority, run_key, estimated_tokens = current_llm_request_class()
+    admission = scheduler.enqueue(priority=priority, run_key=run_key, tokens=estimated_tokens)
     try:
-        # 严格顺序：先 global，再 per-model
+        # 严格顺序：先 global（经调度排队），再 per-model
+        try_slot, global_limit = _global_slot_acquirer(global_adaptive)
+        while not scheduler.poll(admission, try_slot, global_limit=global_limit):
+            if ticket is not None and ticket.abandoned:
+                raise TimeoutError("LLM call abandoned before start (timeout)")
+            scheduler.wait(_LLM_SCHEDULER_WAIT_SECONDS)
         if global_adaptive is not None:
-            global_adaptive.acquire()
-            global_acquired = True
+            acquired.append(global_adaptive)
         if model_adaptive is not None:
             model_adaptive.acquire()
-            model_acquired = True
+            acquired.append(model_adaptive)
+        if ticket is not None and not ticket.bind_limiters(limiters, acquired, admission):
+            acquired = []
+            raise TimeoutError("LLM call abandoned before start (timeout)")
+        # 进程内槽位之后再拿集群槽位：多实例时共享同一份并发/限额
+        cluster_lease = _acquire_cluster_llm_admission(ticket)
+        if ticket is not None and not ticket.bind_lease(cluster_lease):
+            raise TimeoutError("LLM call abandoned before start (timeout)")
+        _bump_llm_call_gauge("in_flight", 1)
+        counted = True
         yield
-        # 成功：尝试恢复并发（慢速）
+        _report_llm_guard_success(limiters)
+    except Exception as exc:
+        # 已被调用方放弃：降并发已在 abandon() 中按超时处理过，这里不再重复计入
+        if ticket is None or not ticket.abandoned:
+            _report_llm_guard_failure(limiters, exc)
+        raise
+    finally:
+        if counted:
+            _bump_llm_call_gauge("in_flight", -1)
+        if ticket is not None:
+            ticket.release_slots()
+        else:
+            _release_cluster_llm_admission(cluster_lease)
+            _release_llm_guard(acquired)
+        admission.release()
+
+
+# asyncio 路径等待并发槽位时的轮询间隔（秒）
+_LLM_ASYNC_ACQUIRE_POLL_SECONDS = 0.05
+
+
+@asynccontextmanager
+async def _llm_concurrency_guard_async(provider_model_key: str):
+    """
+    LLM 并发限制（asyncio 调用）：与同步路径共享同一组 _AdaptiveLimiter 与调度队列。
+
+    说明：
+    - 等待槽位时用 poll/try_acquire + asyncio.sleep 轮询，不阻塞 event loop；
+    - 调用被 cancel（CancelledError）时不做并发降级，但 finally 一定归还槽位。
+    """
+    _, _, global_adaptive, model_adaptive = _get_llm_concurrency_semaphores(
+        provider_model_key=provider_model_key
+    )
+    limiters = (global_adaptive, model_adaptive)
+    acquired: List[_AdaptiveLimiter] = []
+    cluster_lease: Optional[Lease] = None
+    counted = False
+    scheduler = get_llm_scheduler()
+    priority, run_key, estimated_tokens = current_llm_request_class()
+    admission = scheduler.enqueue(priority=priority, run_key=run_key, tokens=estimated_tokens)
+    try:
+        try_slot, global_limit = _global_slot_acquirer(global_adaptive)
+        while not scheduler.poll(admission, try_slot, global_limit=global_limit):
+            await asyncio.sleep(_LLM_ASYNC_ACQUIRE_POLL_SECONDS)
         if global_adaptive is not None:
-            try:
-                global_adaptive.on_success()
-            except Exception:
-                pass
+            acquired.append(global_adaptive)
         if model_adaptive is not None:
-            try:
-                model_adaptive.on_success()
-            except Exception:
-                pass
+            while not model_adaptive.try_acquire():
+                await asyncio.sleep(_LLM_ASYNC_ACQUIRE_POLL_SECONDS)
+            acquired.append(model_adaptive)
+        cluster_lease = await _acquire_cluster_llm_admission_async()
+        _bump_llm_call_gauge("in_flight", 1)
+        counted = True
+        yield
+        _report_llm_guard_success(limiters)
     except Exception as exc:
-        kind = _classify_llm_exception(exc)
-        for limiter in (global_adaptive, model_adaptive):
-            if limiter is None:
-                continue
-            try:
-                if kind == "rate_limit":
-                    limiter.on_rate_limited()
-                elif kind == "transient":
-                    limiter.on_transient_failure()
-            except Exception:
-                continue
+        _report_llm_guard_failure(limiters, exc)
         raise
     finally:
-        # 反序 release：先 per-model，再 global
-        if model_acquired and model_adaptive is not None:
-            try:
-                model_adaptive.release()
-            except Exception:
-                pass
-        if global_acquired and global_adaptive is not None:
-            try:
-                global_adaptive.release()
-            except Exception:
-                pass
+        if counted:
+            _bump_llm_call_gauge("in_flight", -1)
+        _release_cluster_llm_admission(cluster_lease)
+        _release_llm_guard(acquired)
+        admission.release()
 
 
 class ContentCollectMode(Enum):
@@ -421,6 +827,18 @@ class LLMClient:
         except Exception:
             return
 
+    def close_sync(self) -> None:
+        """
+        关闭同步连接池（可从其他线程调用）：用于硬超时放弃时中断仍阻塞在 socket 上的请求。
+        """
+        close_fn = getattr(self._provider, "close_sync", None)
+        if not callable(close_fn):
+            return
+        try:
+            close_fn()
+        except Exception:
+            return
+
     @staticmethod
     def _load_store_config() -> Dict[str, Optional[str]]:
         """
@@ -514,6 +932,28 @@ class LLMClient:
             timeout=timeout,
         )
 
+    def stream_prompt_sync(
+        self,
+        prompt: str,
+        model: Optional[str] = None,
+        parameters: Optional[dict] = None,
+        timeout: int = 120,
+    ) -> Generator[Dict[str, Any], None, None]:
+        """
+        同步流式调用：yield {"content": "...", "usage": {...}|None}。
+        调用方 close() 生成器即可中止请求（用于“拿到完整 action 即停”的场景）。
+        """
+        actual_model = model or self._default_model
+        stream_fn = getattr(self._provider, "stream_prompt_sync", None)
+        if not callable(stream_fn):
+            raise RuntimeError(f"provider 不支持同步流式调用: {self._provider_name}")
+        return stream_fn(
+            prompt=prompt,
+            model=actual_model,
+            parameters=parameters or {},
+            timeout=timeout,
+        )
+
     async def complete_prompt(
         self,
         prompt: str,
@@ -684,6 +1124,43 @@ def _resolve_base_url_fallbacks(provider_name: Optional[str]) -> List[str]:
     return candidates
 
 
+def _resolve_call_timeout(parameters: Optional[dict]) -> Tuple[int, dict]:
+    """
+    从 parameters 中剥离 timeout/timeout_seconds（不透传给供应商），返回 (超时秒数, 其余参数)。
+    小于 5 秒的覆盖值视为无效，回退 LLM_CALL_TIMEOUT_SECONDS。
+    """
+    timeout_seconds = int(LLM_CALL_TIMEOUT_SECONDS)
+    effective_parameters = dict(parameters or {})
+    timeout_override = effective_parameters.pop("timeout", None)
+    timeout_seconds_override = effective_parameters.pop("timeout_seconds", None)
+    if timeout_override is None:
+        timeout_override = timeout_seconds_override
+    if timeout_override is not None:
+        try:
+            parsed_timeout = int(float(timeout_override))
+            if parsed_timeout >= 5:
+                timeout_seconds = parsed_timeout
+        except Exception:
+            pass
+    return timeout_seconds, effective_parameters
+
+
+_LLM_SINGLE_FLIGHT = SingleFlight()
+_LLM_SINGLE_FLIGHT_ASYNC = AsyncSingleFlight()
+
+
+def _llm_single_flight_key(prompt: str, model: Optional[str], parameters: Optional[dict], provider: Optional[str]) -> str:
+    priority, _run_key, _tokens = current_llm_request_class()
+    return single_flight_key(provider=provider, model=model, parameters=parameters, prompt=prompt, priority=priority)
+
+
+def _coalesced_llm_result(result: Any) -> Any:
+    """等待者共享领头调用的文本，但不重复计入用量：tokens 置零并标记 coalesced。"""
+    if not isinstance(result, tuple) or not result:
+        return result
+    return (result[0], {"prompt": 0, "completion": 0, "total": 0, "coalesced": True}, *result[2:])
+
+
 def call_llm(
     prompt: str,
     model: Optional[str],
@@ -696,28 +1173,42 @@ def call_llm(
 
     说明：
     - 供规划/后处理/技能抽象等同步链路复用；
-    - provider 可选：用于多供应商扩展（对应质量报告 P2#8）。
+    - provider 可选：用于多供应商扩展（对应质量报告 P2#8）；
+    - 完全相同的并发调用经 single-flight 合并为一次供应商请求（见 llm_single_flight），
+      等待者返回的 tokens 为 0 并带 coalesced=True（用量只记在领头调用上）。
     """
+    if not AGENT_LLM_SINGLE_FLIGHT_ENABLED:
+        return _call_llm_direct(prompt, model, parameters, provider=provider)
+    ticket = _CURRENT_LLM_CALL_TICKET.get()
+    return _LLM_SINGLE_FLIGHT.do(
+        _llm_single_flight_key(prompt, model, parameters, provider),
+        lambda: _call_llm_direct(prompt, model, parameters, provider=provider),
+        should_abort=lambda: ticket is not None and ticket.abandoned,
+        on_abort=lambda: invalid_request_error("LLM call timeout (abandoned while waiting for identical call)"),
+        share=_coalesced_llm_result,
+    )
+
+
+def _call_llm_direct(
+    prompt: str,
+    model: Optional[str],
+    parameters: Optional[dict],
+    *,
+    provider: Optional[str] = None,
+):
     fallback_urls = _resolve_base_url_fallbacks(provider)
     client_urls: List[Optional[str]] = [None, *fallback_urls]
     errors: List[str] = []
     content = ""
     tokens = None
-    timeout_seconds = int(LLM_CALL_TIMEOUT_SECONDS)
-    effective_parameters = dict(parameters or {})
-    timeout_override = effective_parameters.pop("timeout", None)
-    timeout_seconds_override = effective_parameters.pop("timeout_seconds", None)
-    if timeout_override is None:
-        timeout_override = timeout_seconds_override
-    if timeout_override is not None:
-        try:
-            parsed_timeout = int(float(timeout_override))
-            if parsed_timeout >= 5:
-                timeout_seconds = parsed_timeout
-        except Exception:
-            pass
+    timeout_seconds, effective_parameters = _resolve_call_timeout(parameters)
+    estimated_tokens = estimate_llm_request_tokens(prompt, effective_parameters)
 
+    ticket = _CURRENT_LLM_CALL_TICKET.get()
     for idx, base_url_candidate in enumerate(client_urls):
+        if ticket is not None and ticket.abandoned:
+            # 调用方已硬超时放弃：不再尝试后续 fallback（否则会在后台继续占用槽位/连接）
+            raise invalid_request_error(f"LLM call timeout after {timeout_seconds}s (abandoned)")
         try:
             client = LLMClient(provider=provider, base_url=base_url_candidate)
         except AppError as exc:
@@ -728,7 +1219,9 @@ def call_llm(
         try:
             actual_model = str(model or client._default_model or "").strip() or DEFAULT_LLM_MODEL
             key = f"{str(client._provider_name or '').strip() or LLM_PROVIDER_OPENAI}:{actual_model}"
-            with _llm_concurrency_guard(key):
+            if ticket is not None:
+                ticket.bind_client(client)
+            with llm_request_scope(tokens=estimated_tokens), _llm_concurrency_guard(key):
                 content, tokens = client.complete_prompt_sync(
                     prompt=prompt,
                     model=actual_model,
@@ -756,6 +1249,177 @@ def call_llm(
     return content, tokens
 
 
+def call_llm_streaming(
+    prompt: str,
+    model: Optional[str],
+    parameters: Optional[dict],
+    *,
+    provider: Optional[str] = None,
+    on_text: Callable[[str], bool],
+) -> Tuple[str, Optional[dict], Dict[str, Any]]:
+    """
+    同步流式调用：每收到一段文本调用 on_text(chunk)，返回 True 时立即中止流（不再消费剩余 tokens）。
+
+    返回：(已接收内容, tokens, meta)
+    - meta: {chunks, stopped_early, first_chunk_ms, elapsed_ms}
+    - 只走主 base_url 的单次尝试：流式路径失败时由上层回退到 call_llm（含 fallback/重试）。
+    """
+    timeout_seconds, effective_parameters = _resolve_call_timeout(parameters)
+    ticket = _CURRENT_LLM_CALL_TICKET.get()
+    if ticket is not None and ticket.abandoned:
+        raise invalid_request_error(f"LLM call timeout after {timeout_seconds}s (abandoned)")
+    try:
+        client = LLMClient(provider=provider)
+    except AppError as exc:
+        raise exc
+    except Exception as exc:
+        raise invalid_request_error(str(exc) or ERROR_MESSAGE_LLM_CALL_FAILED)
+
+    actual_model = str(model or client._default_model or "").strip() or DEFAULT_LLM_MODEL
+    key = f"{str(client._provider_name or '').strip() or LLM_PROVIDER_OPENAI}:{actual_model}"
+    if ticket is not None:
+        ticket.bind_client(client)
+
+    parts: List[str] = []
+    tokens = None
+    chunks = 0
+    stopped_early = False
+    first_chunk_ms: Optional[int] = None
+    started = time.monotonic()
+    try:
+        estimated_tokens = estimate_llm_request_tokens(prompt, effective_parameters)
+        with llm_request_scope(tokens=estimated_tokens), _llm_concurrency_guard(key):
+            stream = client.stream_prompt_sync(
+                prompt=prompt,
+                model=actual_model,
+                parameters=effective_parameters,
+                timeout=timeout_seconds,
+            )
+            try:
+                for item in stream:
+                    if ticket is not None and ticket.abandoned:
+                        raise TimeoutError(f"LLM call timeout after {timeout_seconds}s (abandoned)")
+                    if isinstance(item, dict) and item.get("usage"):
+                        tokens = item.get("usage")
+                    text = str((item or {}).get("content") or "") if isinstance(item, dict) else ""
+                    if not text:
+                        continue
+                    chunks += 1
+                    if first_chunk_ms is None:
+                        first_chunk_ms = int((time.monotonic() - started) * 1000)
+                    parts.append(text)
+                    if on_text(text):
+                        stopped_early = True
+                        break
+            finally:
+                close_fn = getattr(stream, "close", None)
+                if callable(close_fn):
+                    close_fn()
+    except AppError:
+        raise
+    except Exception as exc:
+        raise invalid_request_error(str(exc) or ERROR_MESSAGE_LLM_CALL_FAILED)
+
+    content = "".join(parts)
+    if not content.strip():
+        raise invalid_request_error(f"{ERROR_MESSAGE_LLM_CALL_FAILED}: empty_response")
+    meta = {
+        "chunks": int(chunks),
+        "stopped_early": bool(stopped_early),
+        "first_chunk_ms": first_chunk_ms,
+        "elapsed_ms": int((time.monotonic() - started) * 1000),
+    }
+    return content, tokens, meta
+
+
+async def call_llm_async(
+    prompt: str,
+    model: Optional[str],
+    parameters: Optional[dict],
+    *,
+    provider: Optional[str] = None,
+):
+    """
+    call_llm 的 asyncio 版本（语义一致：fallback base_url、并发限制、single-flight、失败抛 AppError）。
+
+    与同步版的区别：
+    - 使用 provider 的异步客户端，超时由 asyncio.wait_for 强制生效：超时即 cancel 请求，
+      不会留下仍占用连接/并发槽位的后台线程；
+    - 调用方 task 被 cancel 时同样会中止在途请求并归还并发槽位。
+    """
+    if not AGENT_LLM_SINGLE_FLIGHT_ENABLED:
+        return await _call_llm_async_direct(prompt, model, parameters, provider=provider)
+    return await _LLM_SINGLE_FLIGHT_ASYNC.do(
+        _llm_single_flight_key(prompt, model, parameters, provider),
+        lambda: _call_llm_async_direct(prompt, model, parameters, provider=provider),
+        share=_coalesced_llm_result,
+    )
+
+
+async def _call_llm_async_direct(
+    prompt: str,
+    model: Optional[str],
+    parameters: Optional[dict],
+    *,
+    provider: Optional[str] = None,
+):
+    fallback_urls = _resolve_base_url_fallbacks(provider)
+    client_urls: List[Optional[str]] = [None, *fallback_urls]
+    errors: List[str] = []
+    content = ""
+    tokens = None
+    timeout_seconds, effective_parameters = _resolve_call_timeout(parameters)
+    estimated_tokens = estimate_llm_request_tokens(prompt, effective_parameters)
+
+    for idx, base_url_candidate in enumerate(client_urls):
+        try:
+            client = LLMClient(provider=provider, base_url=base_url_candidate)
+        except AppError as exc:
+            raise exc
+        except Exception as exc:
+            raise invalid_request_error(str(exc) or ERROR_MESSAGE_LLM_CALL_FAILED)
+
+        try:
+            actual_model = str(model or client._default_model or "").strip() or DEFAULT_LLM_MODEL
+            key = f"{str(client._provider_name or '').strip() or LLM_PROVIDER_OPENAI}:{actual_model}"
+            with llm_request_scope(tokens=estimated_tokens):
+                async with _llm_concurrency_guard_async(key):
+                    try:
+                        content, tokens = await asyncio.wait_for(
+                            client.complete_prompt(
+                                prompt=prompt,
+                                model=actual_model,
+                                parameters=effective_parameters,
+                                timeout=timeout_seconds,
+                            ),
+                            timeout=float(timeout_seconds),
+                        )
+                    except asyncio.TimeoutError:
+                        # 统一成带 "timeout" 字样的异常：并发控制与 fallback 都按 transient 处理
+                        raise TimeoutError(f"LLM call timeout after {timeout_seconds}s") from None
+            if str(content or "").strip():
+                break
+            errors.append(f"attempt#{idx + 1} empty_response")
+        except Exception as exc:
+            err_text = str(exc) or ERROR_MESSAGE_LLM_CALL_FAILED
+            errors.append(f"attempt#{idx + 1} {err_text}")
+            error_kind = classify_llm_error_text(err_text)
+            can_try_next = idx < len(client_urls) - 1
+            if not can_try_next or error_kind not in {"rate_limit", "transient"}:
+                raise invalid_request_error(err_text)
+            continue
+        finally:
+            await client.aclose()
+    else:
+        summary = " | ".join(errors[:4]) if errors else ERROR_MESSAGE_LLM_CALL_FAILED
+        raise invalid_request_error(f"{ERROR_MESSAGE_LLM_CALL_FAILED}: {summary}")
+
+    if not str(content or "").strip():
+        raise invalid_request_error(errors[-1] if errors else ERROR_MESSAGE_LLM_CALL_FAILED)
+
+    return content, tokens
+
+
 def call_openai(prompt: str, model: Optional[str], parameters: Optional[dict]):
     # 兼容旧接口：绝大多数调用方仍使用 call_openai
     try:
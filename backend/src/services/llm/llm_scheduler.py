@@ -0,0 +1,326 @@
+"""
+LLM 请求调度（进程内）：在全局并发槽位之前按优先级、TPM 预算与 run 间公平性排队。
+
+说明：
+- 优先级：interactive（ReAct 步骤/对话，默认）> planning > postprocess（评估/沉淀）> backfill（图谱抽取/历史回填）；
+  有高优先级请求排队时，低优先级请求不会被放行；
+- 后台类（postprocess/backfill）合计最多占用全局并发与 TPM 的 AGENT_LLM_BACKGROUND_MAX_SHARE_PERCENT，
+  剩余容量始终留给前台请求，后台任务不会把用户可见的步骤饿死；
+- 同一优先级内按“在途调用数更少的 run 优先”公平分配，再按到达顺序；
+- TPM：按 prompt 长度（+max_tokens）估算 token，滑动 60s 窗口计量；<=0 表示不限制；
+- 调用方通过 llm_request_scope() 标注优先级与 run（ContextVar，随 await/copy_context 传递）。
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from backend.src.constants import (
+    AGENT_LLM_BACKGROUND_MAX_SHARE_PERCENT,
+    AGENT_LLM_TOKENS_PER_MINUTE,
+)
+
+LLM_PRIORITY_INTERACTIVE = "interactive"
+LLM_PRIORITY_PLANNING = "planning"
+LLM_PRIORITY_POSTPROCESS = "postprocess"
+LLM_PRIORITY_BACKFILL = "backfill"
+
+LLM_PRIORITY_ORDER: Tuple[str, ...] = (
+    LLM_PRIORITY_INTERACTIVE,
+    LLM_PRIORITY_PLANNING,
+    LLM_PRIORITY_POSTPROCESS,
+    LLM_PRIORITY_BACKFILL,
+)
+_PRIORITY_RANK = {name: idx for idx, name in enumerate(LLM_PRIORITY_ORDER)}
+_BACKGROUND_PRIORITIES = frozenset({LLM_PRIORITY_POSTPROCESS, LLM_PRIORITY_BACKFILL})
+
+_TPM_WINDOW_SECONDS = 60.0
+_WAIT_SAMPLES_MAX = 256
+
+# (priority, run_key, estimated_tokens)
+_CURRENT_LLM_REQUEST: ContextVar[Tuple[str, str, int]] = ContextVar(
+    "llm_request_class", default=(LLM_PRIORITY_INTERACTIVE, "", 1)
+)
+
+
+def normalize_llm_priority(value: Any) -> Optional[str]:
+    text = str(value or "").strip().lower()
+    return text if text in _PRIORITY_RANK else None
+
+
+@contextmanager
+def llm_request_scope(*, priority: Optional[str] = None, run_id: Any = None, tokens: Optional[int] = None):
+    """
+    标注当前上下文内 LLM 调用的优先级、所属 run 与预估 token（未提供的字段沿用外层设置）。
+
+    嵌套时优先级只降不升：例如 backfill 线程内调用的评估逻辑仍按 backfill 排队。
+    """
+    current_priority, current_run, current_tokens = _CURRENT_LLM_REQUEST.get()
+    requested = normalize_llm_priority(priority) or current_priority
+    resolved_priority = max(current_priority, requested, key=lambda name: _PRIORITY_RANK.get(name, 0))
+    resolved_run = str(run_id) if run_id not in (None, "") else current_run
+    resolved_tokens = max(1, int(tokens)) if tokens is not None else current_tokens
+    token = _CURRENT_LLM_REQUEST.set((resolved_priority, resolved_run, resolved_tokens))
+    try:
+        yield
+    finally:
+        _CURRENT_LLM_REQUEST.reset(token)
+
+
+def current_llm_request_class() -> Tuple[str, str, int]:
+    """返回 (priority, run_key, estimated_tokens)。"""
+    return _CURRENT_LLM_REQUEST.get()
+
+
+def estimate_llm_request_tokens(prompt: Any, parameters: Optional[dict] = None) -> int:
+    """
+    粗略估算一次调用的 token 消耗（用于 TPM 预算）：
+    - ASCII 约 4 字符 1 token，非 ASCII（中文等）约 1 字符 1 token；
+    - 加上 max_tokens（若调用方显式限制了输出长度）。
+    """
+    text = str(prompt or "")
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    estimate = (ascii_chars + 3) // 4 + (len(text) - ascii_chars)
+    if isinstance(parameters, dict):
+        try:
+            estimate += max(0, int(parameters.get("max_tokens") or 0))
+        except (TypeError, ValueError):
+            pass
+    return max(1, int(estimate))
+
+
+@dataclass
+class LLMAdmission:
+    """一次排队/准入的句柄；release() 幂等。"""
+
+    priority: str
+    run_key: str
+    tokens: int
+    seq: int
+    enqueued_at: float
+    scheduler: "LLMRequestScheduler"
+    admitted: bool = False
+    done: bool = False
+
+    def release(self) -> None:
+        self.scheduler.release(self)
+
+
+@dataclass
+class _ClassStats:
+    admitted_total: int = 0
+    wait_ms_total: float = 0.0
+    wait_ms_max: float = 0.0
+    in_flight: int = 0
+    samples: Deque[float] = field(default_factory=lambda: deque(maxlen=_WAIT_SAMPLES_MAX))
+
+
+class LLMRequestScheduler:
+    def __init__(
+        self,
+        *,
+        tokens_per_minute: Optional[int] = None,
+        background_share_percent: Optional[int] = None,
+    ) -> None:
+        self._cond = threading.Condition(threading.Lock())
+        self._tpm = tokens_per_minute
+        self._background_share = background_share_percent
+        self._seq = 0
+        self._waiting: List[LLMAdmission] = []
+        self._run_in_flight: Dict[str, int] = {}
+        self._token_window: Deque[Tuple[float, int]] = deque()
+        self._window_tokens = 0
+        self._stats: Dict[str, _ClassStats] = {name: _ClassStats() for name in LLM_PRIORITY_ORDER}
+
+    # ---- 配置（支持测试 patch 常量） ----
+
+    def _tokens_per_minute(self) -> int:
+        value = AGENT_LLM_TOKENS_PER_MINUTE if self._tpm is None else self._tpm
+        return max(0, int(value or 0))
+
+    def _background_share_ratio(self) -> float:
+        value = AGENT_LLM_BACKGROUND_MAX_SHARE_PERCENT if self._background_share is None else self._background_share
+        return min(100, max(1, int(value or 0))) / 100.0
+
+    # ---- 排队与准入 ----
+
+    def enqueue(self, *, priority: str, run_key: str, tokens: int) -> LLMAdmission:
+        with self._cond:
+            self._seq += 1
+            admission = LLMAdmission(
+                priority=normalize_llm_priority(priority) or LLM_PRIORITY_INTERACTIVE,
+                run_key=str(run_key or ""),
+                tokens=max(1, int(tokens or 1)),
+                seq=self._seq,
+                enqueued_at=time.monotonic(),
+                scheduler=self,
+            )
+            self._waiting.append(admission)
+            return admission
+
+    def _prune_token_window(self, now_value: float) -> None:
+        while self._token_window and now_value - self._token_window[0][0] >= _TPM_WINDOW_SECONDS:
+            _ts, used = self._token_window.popleft()
+            self._window_tokens -= used
+
+    def _eligible(self, admission: LLMAdmission, *, global_limit: int) -> bool:
+        if admission.priority not in _BACKGROUND_PRIORITIES:
+            return True
+        share = self._background_share_ratio()
+        if global_limit > 0:
+            background_in_flight = sum(self._stats[name].in_flight for name in _BACKGROUND_PRIORITIES)
+            if background_in_flight >= max(1, int(global_limit * share)):
+                return False
+        tpm = self._tokens_per_minute()
+        if tpm > 0 and self._window_tokens > 0:
+            if self._window_tokens + admission.tokens > int(tpm * share):
+                return False
+        return True
+
+    def _select_head(self, *, global_limit: int) -> Optional[LLMAdmission]:
+        candidates = [item for item in self._waiting if self._eligible(item, global_limit=global_limit)]
+        if not candidates:
+            return None
+        return min(
+            candidates,
+            key=lambda item: (
+                _PRIORITY_RANK.get(item.priority, 0),
+                self._run_in_flight.get(item.run_key, 0),
+                item.seq,
+            ),
+        )
+
+    def poll(self, admission: LLMAdmission, try_slot: Callable[[], bool], *, global_limit: int = 0) -> bool:
+        """
+        非阻塞推进一次：仅当该请求是当前队首（优先级 → run 公平 → 到达顺序）且 TPM 允许时，
+        才尝试拿全局槽位（try_slot）；成功返回 True。
+        """
+        with self._cond:
+            if admission.admitted:
+                return True
+            if admission.done:
+                return False
+            now_value = time.monotonic()
+            self._prune_token_window(now_value)
+            head = self._select_head(global_limit=int(global_limit or 0))
+            if head is not admission:
+                return False
+            tpm = self._tokens_per_minute()
+            # 窗口为空时总是放行，避免单个超大请求永远排不上
+            if tpm > 0 and self._window_tokens > 0 and self._window_tokens + admission.tokens > tpm:
+                return False
+            if not try_slot():
+                return False
+            self._waiting.remove(admission)
+            admission.admitted = True
+            self._token_window.append((now_value, admission.tokens))
+            self._window_tokens += admission.tokens
+            self._run_in_flight[admission.run_key] = self._run_in_flight.get(admission.run_key, 0) + 1
+            waited_ms = (now_value - admission.enqueued_at) * 1000.0
+            stats = self._stats[admission.priority]
+            stats.admitted_total += 1
+            stats.in_flight += 1
+            stats.wait_ms_total += waited_ms
+            stats.wait_ms_max = max(stats.wait_ms_max, waited_ms)
+            stats.samples.append(waited_ms)
+            return True
+
+    def wait(self, timeout: float) -> None:
+        with self._cond:
+            self._cond.wait(timeout=max(0.0, float(timeout)))
+
+    def cancel(self, admission: LLMAdmission) -> None:
+        with self._cond:
+            if admission.admitted or admission.done:
+                return
+            admission.done = True
+            if admission in self._waiting:
+                self._waiting.remove(admission)
+            self._cond.notify_all()
+
+    def release(self, admission: LLMAdmission) -> None:
+        with self._cond:
+            if admission.done:
+                return
+            admission.done = True
+            if not admission.admitted:
+                if admission in self._waiting:
+                    self._waiting.remove(admission)
+            else:
+                stats = self._stats[admission.priority]
+                stats.in_flight = max(0, stats.in_flight - 1)
+                remaining = self._run_in_flight.get(admission.run_key, 0) - 1
+                if remaining > 0:
+                    self._run_in_flight[admission.run_key] = remaining
+                else:
+                    self._run_in_flight.pop(admission.run_key, None)
+            self._cond.notify_all()
+
+    def notify(self) -> None:
+        """外部槽位（全局/模型限流器）释放后唤醒等待者。"""
+        with self._cond:
+            self._cond.notify_all()
+
+    # ---- 观测 ----
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._cond:
+            self._prune_token_window(time.monotonic())
+            queued: Dict[str, int] = {name: 0 for name in LLM_PRIORITY_ORDER}
+            oldest: Dict[str, float] = {}
+            now_value = time.monotonic()
+            for item in self._waiting:
+                queued[item.priority] = queued.get(item.priority, 0) + 1
+                oldest[item.priority] = max(oldest.get(item.priority, 0.0), (now_value - item.enqueued_at) * 1000.0)
+            classes: Dict[str, Dict[str, Any]] = {}
+            for name in LLM_PRIORITY_ORDER:
+                stats = self._stats[name]
+                samples = sorted(stats.samples)
+                p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))] if samples else 0.0
+                classes[name] = {
+                    "queued": int(queued.get(name, 0)),
+                    "in_flight": int(stats.in_flight),
+                    "admitted_total": int(stats.admitted_total),
+                    "wait_ms_avg": round(stats.wait_ms_total / stats.admitted_total, 2) if stats.admitted_total else 0.0,
+                    "wait_ms_p95": round(p95, 2),
+                    "wait_ms_max": round(stats.wait_ms_max, 2),
+                    "oldest_queued_ms": round(oldest.get(name, 0.0), 2),
+                }
+            return {
+                "classes": classes,
+                "tokens_per_minute": {
+                    "limit": self._tokens_per_minute(),
+                    "used": int(self._window_tokens),
+                },
+                "background_share_percent": int(self._background_share_ratio() * 100),
+                "runs_in_flight": len(self._run_in_flight),
+            }
+
+
+_SCHEDULER_LOCK = threading.Lock()
+_SCHEDULER: Optional[LLMRequestScheduler] = None
+
+
+def get_llm_scheduler() -> LLMRequestScheduler:
+    global _SCHEDULER
+    with _SCHEDULER_LOCK:
+        if _SCHEDULER is None:
+            _SCHEDULER = LLMRequestScheduler()
+        return _SCHEDULER
+
+
+def set_llm_scheduler(scheduler: Optional[LLMRequestScheduler]) -> None:
+    """替换进程内调度器（测试用；传 None 则下次访问时重建）。"""
+    global _SCHEDULER
+    with _SCHEDULER_LOCK:
+        _SCHEDULER = scheduler
+
+
+def get_llm_scheduler_snapshot() -> Dict[str, Any]:
+    return get_llm_scheduler().snapshot()
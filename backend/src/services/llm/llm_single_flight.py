@@ -0,0 +1,189 @@
+"""
+LLM 请求合并（single-flight）：同一时刻完全相同的调用只向供应商发一次，其余调用等待并共享结果。
+
+说明：
+- key 为 (provider, model, parameters, prompt, priority) 规范化后的 sha256；只合并“同时在途”的调用，不做结果缓存；
+  priority 参与 key：领头调用按自身优先级排队，不同优先级类别的调用不互相合并（等待者不会被拖到领头者的类别）；
+- 等待者拿到的结果可经 share 转换（如 LLM 调用把 tokens 置零并标记 coalesced，避免同一份用量被重复计入）；
+- 同步路径（线程）与 asyncio 路径（按 event loop 隔离）各自合并；
+- 领头调用的异常同样共享给等待者（与各自单独调用的语义一致，由上层重试）；
+  asyncio 领头调用被 cancel 时，等待者重新竞争成为领头者，而不是跟着被取消；
+- 计数：leader_calls（真实发出的调用）、coalesced（因合并省下的供应商调用）。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+_FOLLOWER_POLL_SECONDS = 0.1
+
+
+def single_flight_key(*, provider: Any, model: Any, parameters: Any, prompt: Any, priority: Any = None) -> str:
+    try:
+        params_text = json.dumps(parameters or {}, ensure_ascii=False, sort_keys=True, default=str)
+    except (TypeError, ValueError):
+        params_text = str(parameters or "")
+    raw = "\x1f".join(
+        [
+            str(provider or "").strip().lower(),
+            str(model or "").strip(),
+            params_text,
+            str(prompt or ""),
+            str(priority or "").strip().lower(),
+        ]
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class _Call:
+    __slots__ = ("event", "result", "error", "followers")
+
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.followers = 0
+
+
+class _LeaderCancelled(Exception):
+    """asyncio 领头调用被取消：等待者需重新竞争。"""
+
+
+_STATS_LOCK = threading.Lock()
+_STATS: Dict[str, int] = {
+    "leader_calls": 0,
+    "coalesced": 0,
+    "in_flight_keys": 0,
+}
+
+
+def _bump(key: str, delta: int) -> None:
+    with _STATS_LOCK:
+        _STATS[key] = max(0, int(_STATS.get(key) or 0) + int(delta))
+
+
+def get_llm_single_flight_stats() -> Dict[str, int]:
+    """返回合并计数快照（coalesced 即省下的供应商调用次数）。"""
+    with _STATS_LOCK:
+        return {key: int(value) for key, value in _STATS.items()}
+
+
+def reset_llm_single_flight_stats() -> None:
+    with _STATS_LOCK:
+        for key in list(_STATS.keys()):
+            _STATS[key] = 0
+
+
+class SingleFlight:
+    """线程版 single-flight。"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+
+    def do(
+        self,
+        key: str,
+        fn: Callable[[], T],
+        *,
+        should_abort: Optional[Callable[[], bool]] = None,
+        on_abort: Optional[Callable[[], BaseException]] = None,
+        share: Optional[Callable[[T], T]] = None,
+    ) -> T:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+            else:
+                call.followers += 1
+
+        if not leader:
+            _bump("coalesced", 1)
+            # 等待领头调用；调用方自身被放弃（硬超时）时不再等待
+            while not call.event.wait(timeout=_FOLLOWER_POLL_SECONDS):
+                if should_abort is not None and should_abort():
+                    raise on_abort() if on_abort is not None else TimeoutError("single-flight wait abandoned")
+            if call.error is not None:
+                raise call.error
+            return share(call.result) if share is not None else call.result
+
+        _bump("leader_calls", 1)
+        _bump("in_flight_keys", 1)
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            _bump("in_flight_keys", -1)
+            call.event.set()
+
+
+class AsyncSingleFlight:
+    """asyncio 版 single-flight（按 event loop 隔离，Future 不跨 loop 共享）。"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: Dict[Tuple[int, str], "asyncio.Future[Any]"] = {}
+
+    async def do(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[T]],
+        *,
+        share: Optional[Callable[[T], T]] = None,
+    ) -> T:
+        loop = asyncio.get_running_loop()
+        slot = (id(loop), key)
+        while True:
+            with self._lock:
+                future = self._calls.get(slot)
+                leader = future is None
+                if leader:
+                    future = loop.create_future()
+                    self._calls[slot] = future
+            if not leader:
+                _bump("coalesced", 1)
+                try:
+                    # shield：等待者被取消不影响领头调用
+                    result = await asyncio.shield(future)
+                except _LeaderCancelled:
+                    _bump("coalesced", -1)
+                    continue
+                return share(result) if share is not None else result
+
+            _bump("leader_calls", 1)
+            _bump("in_flight_keys", 1)
+            try:
+                result = await fn()
+            except asyncio.CancelledError:
+                if not future.done():
+                    future.set_exception(_LeaderCancelled())
+                raise
+            except BaseException as exc:
+                if not future.done():
+                    future.set_exception(exc)
+                raise
+            else:
+                if not future.done():
+                    future.set_result(result)
+                return result
+            finally:
+                with self._lock:
+                    if self._calls.get(slot) is future:
+                        self._calls.pop(slot, None)
+                _bump("in_flight_keys", -1)
+                if future.done() and not future.cancelled():
+                    # 标记异常已读取：没有等待者时避免 "Future exception was never retrieved" 警告
+                    future.exception()
@@ -1,9 +1,38 @@
+"""
+prompt_templates 解析（llm_call 热路径）：name -> template_id 与 template_id -> 模板文本的进程内缓存。
+
+说明：
+- 模板的增删改统一经 services/knowledge/query/prompts（路由使用），写入后调用 invalidate_prompt_caches；
+- invalidate_prompt_caches 是提示词资产的唯一失效入口：同时清空模板缓存与系统提示词文件缓存；
+- AGENT_COORDINATION_BACKEND 非 local（多进程共享库）时其他进程的写入无法通知到本进程，直接读库不缓存。
+"""
+
 from __future__ import annotations
 
-from typing import Optional
+import threading
+from typing import Dict, Optional, Tuple
+
+from backend.src.constants import AGENT_COORDINATION_BACKEND, PROMPT_TEMPLATE_NAME_MAX_CHARS
+from backend.src.prompt.system_prompts import clear_system_prompt_cache
+from backend.src.storage import get_connection, resolve_db_path
+
+_CACHE_LOCK = threading.Lock()
+# (db_path, 归一化 name) -> template_id（None 表示不存在）
+_NAME_TO_ID: Dict[Tuple[str, str], Optional[int]] = {}
+# (db_path, template_id) -> 模板文本（None 表示不存在）
+_TEMPLATE_TEXT: Dict[Tuple[str, int], Optional[str]] = {}
+
+
+def _use_cache() -> bool:
+    return AGENT_COORDINATION_BACKEND == "local"
+
 
-from backend.src.constants import PROMPT_TEMPLATE_NAME_MAX_CHARS
-from backend.src.storage import get_connection
+def invalidate_prompt_caches() -> None:
+    """提示词资产统一失效钩子：模板 name/id/文本缓存 + 系统提示词文件缓存。"""
+    with _CACHE_LOCK:
+        _NAME_TO_ID.clear()
+        _TEMPLATE_TEXT.clear()
+    clear_system_prompt_cache()
 
 
 def normalize_prompt_template_name(
@@ -31,17 +60,46 @@ def find_prompt_template_id_by_name(name: str) -> Optional[int]:
     normalized = normalize_prompt_template_name(name)
     if not normalized:
         return None
+    key = (resolve_db_path(), normalized)
+    use_cache = _use_cache()
+    if use_cache:
+        with _CACHE_LOCK:
+            if key in _NAME_TO_ID:
+                return _NAME_TO_ID[key]
     with get_connection() as conn:
         row = conn.execute(
             "SELECT id FROM prompt_templates WHERE name = ? ORDER BY id DESC LIMIT 1",
             (normalized,),
         ).fetchone()
-    if not row:
-        return None
-    try:
-        return int(row["id"])
-    except Exception:
-        return None
+    template_id: Optional[int] = None
+    if row:
+        try:
+            template_id = int(row["id"])
+        except Exception:
+            template_id = None
+    if use_cache:
+        with _CACHE_LOCK:
+            _NAME_TO_ID[key] = template_id
+    return template_id
+
+
+def get_prompt_template_text(template_id: int) -> Optional[str]:
+    """
+    按 id 获取模板文本（不存在返回 None）。
+    """
+    key = (resolve_db_path(), int(template_id))
+    use_cache = _use_cache()
+    if use_cache:
+        with _CACHE_LOCK:
+            if key in _TEMPLATE_TEXT:
+                return _TEMPLATE_TEXT[key]
+    with get_connection() as conn:
+        row = conn.execute("SELECT template FROM prompt_templates WHERE id = ?", (int(template_id),)).fetchone()
+    text = str(row["template"] or "") if row else None
+    if use_cache:
+        with _CACHE_LOCK:
+            _TEMPLATE_TEXT[key] = text
+    return text
 
 
 def ensure_llm_call_template(payload: dict, step_title: str) -> None:
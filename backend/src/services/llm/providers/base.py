@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Any, AsyncGenerator, Dict, List, Optional, Protocol, Tuple
+from typing import Any, AsyncGenerator, Dict, Generator, List, Optional, Protocol, Tuple
 
 
 class LLMProvider(Protocol):
@@ -39,6 +39,18 @@ class LLMProvider(Protocol):
         同步一次性调用：返回 (content, tokens)。
         """
 
+    def stream_prompt_sync(
+        self,
+        *,
+        prompt: str,
+        model: str,
+        parameters: Optional[dict],
+        timeout: int,
+    ) -> Generator[Dict[str, Any], None, None]:
+        """
+        同步流式调用：yield {"content": "...", "usage": {...}|None}；调用方 close() 生成器即中止请求。
+        """
+
     async def complete_prompt(
         self,
         *,
@@ -51,6 +63,11 @@ class LLMProvider(Protocol):
         异步一次性调用：返回 (content, tokens)。
         """
 
+    def close_sync(self) -> None:
+        """
+        关闭同步连接池（可为空实现）：硬超时放弃调用时从其他线程调用，用于中断阻塞中的请求。
+        """
+
     async def aclose(self) -> None:
         """
         释放连接池等资源（可为空实现）。
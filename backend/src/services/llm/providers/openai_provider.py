@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import logging
 import uuid
-from typing import Any, AsyncGenerator, Dict, List, Optional, Tuple
+from typing import Any, AsyncGenerator, Dict, Generator, List, Optional, Tuple
 
 from backend.src.common.errors import AppError
 from backend.src.constants import (
@@ -100,6 +100,12 @@ class OpenAIProvider(LLMProvider):
             normalized[str(key)] = value
         return normalized
 
+    def close_sync(self) -> None:
+        """关闭同步 client 的连接池：正在阻塞读取响应的请求会随之报错退出（可跨线程调用）。"""
+        close_fn = getattr(self._sync_client, "close", None)
+        if callable(close_fn):
+            close_fn()
+
     async def aclose(self) -> None:
         client = self._async_client
         self._async_client = None
@@ -182,7 +188,9 @@ class OpenAIProvider(LLMProvider):
         actual_model = model or self._default_model
         params = self._normalize_chat_completions_params(parameters)
         try:
-            resp = self._sync_client.with_options(timeout=float(timeout)).chat.completions.create(
+            # max_retries=0：重试策略由上层（call_llm fallback / create_llm_call）统一控制，
+            # 否则 SDK 内部重试会让实际耗时变成 timeout 的数倍，硬超时无法在传输层生效。
+            resp = self._sync_client.with_options(timeout=float(timeout), max_retries=0).chat.completions.create(
                 model=actual_model,
                 messages=[{"role": "user", "content": prompt}],
                 **params,
@@ -204,6 +212,59 @@ class OpenAIProvider(LLMProvider):
             }
         return content, tokens
 
+    def stream_prompt_sync(
+        self,
+        *,
+        prompt: str,
+        model: str,
+        parameters: Optional[dict],
+        timeout: int,
+    ) -> Generator[Dict[str, Any], None, None]:
+        """
+        同步流式调用：逐块 yield {"content": "...", "usage": {...}|None}。
+
+        说明：
+        - 调用方可在拿到足够内容后直接 close() 本生成器，finally 中会关闭底层 HTTP 流，
+          服务端随之停止生成（节省剩余 completion tokens）；
+        - 与 complete_prompt_sync 一样 max_retries=0，重试由上层控制；
+        - 不强制 stream_options（部分 OpenAI 兼容实现不支持），服务端若在末块返回 usage 则透传。
+        """
+        actual_model = model or self._default_model
+        params = self._normalize_chat_completions_params(parameters)
+        try:
+            stream = self._sync_client.with_options(timeout=float(timeout), max_retries=0).chat.completions.create(
+                model=actual_model,
+                messages=[{"role": "user", "content": prompt}],
+                stream=True,
+                **params,
+            )
+        except Exception as exc:
+            raise RuntimeError(f"{ERROR_MESSAGE_LLM_CALL_FAILED}:{exc}") from exc
+
+        try:
+            for chunk in stream:
+                usage = getattr(chunk, "usage", None)
+                tokens = None
+                if usage is not None:
+                    tokens = {
+                        "prompt": getattr(usage, "prompt_tokens", None),
+                        "completion": getattr(usage, "completion_tokens", None),
+                        "total": getattr(usage, "total_tokens", None),
+                    }
+                content = None
+                if getattr(chunk, "choices", None):
+                    delta = getattr(chunk.choices[0], "delta", None)
+                    content = getattr(delta, "content", None) if delta else None
+                if content or tokens:
+                    yield {"content": content or "", "usage": tokens}
+        finally:
+            close_fn = getattr(stream, "close", None)
+            if callable(close_fn):
+                try:
+                    close_fn()
+                except Exception:
+                    pass
+
     async def complete_prompt(
         self,
         *,
@@ -216,7 +277,7 @@ class OpenAIProvider(LLMProvider):
         params = self._normalize_chat_completions_params(parameters)
         try:
             client = self._get_async_client()
-            resp = await client.with_options(timeout=float(timeout)).chat.completions.create(
+            resp = await client.with_options(timeout=float(timeout), max_retries=0).chat.completions.create(
                 model=actual_model,
                 messages=[{"role": "user", "content": prompt}],
                 **params,
@@ -1,6 +1,6 @@
 import uuid
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 from backend.src.common.path_utils import is_path_within_root
 from backend.src.common.utils import (
@@ -13,6 +13,13 @@ from backend.src.common.utils import (
 )
 from backend.src.prompt.paths import memory_prompt_dir
 from backend.src.prompt.skill_files import parse_skill_markdown
+from backend.src.services.common.file_manifest import (
+    FILE_SYNC_KIND_MEMORY,
+    ManifestFile,
+    existing_paths_under,
+    save_file_manifest,
+    scan_file_manifest,
+)
 from backend.src.storage import get_connection
 
 
@@ -96,7 +103,13 @@ def publish_memory_item_file(
     return {"ok": True, "uid": uid_value, "path": str(path)}
 
 
-def sync_memory_from_files(base_dir: Optional[Path] = None, *, prune: bool = True) -> dict:
+def sync_memory_from_files(
+    base_dir: Optional[Path] = None,
+    *,
+    prune: bool = True,
+    incremental: bool = False,
+    changed_paths: Optional[Iterable[Path]] = None,
+) -> dict:
     """
     将 backend/prompt/memory 下的 memory 文件同步到 SQLite（memory_items）。
 
@@ -104,9 +117,12 @@ def sync_memory_from_files(base_dir: Optional[Path] = None, *, prune: bool = Tru
     - 以 uid 作为主键（文件 frontmatter.uid；缺失则用文件名 stem）
     - prune=True 时强一致删除：DB 中 uid 存在但文件系统已不存在 -> 删除 DB 记录
     - 会自动“补齐未跟踪的历史 DB 记忆”：uid 为空的行会被生成 uid 并落盘文件（便于后续恢复）
+    - incremental=True 时只解析 file_sync_manifest 中 mtime/size/hash 有变化的文件（启动同步使用）
+    - changed_paths：只同步这些文件（文件监听传入），prune 也只删除其中已不存在的文件对应的记录
     """
     base = base_dir or memory_prompt_dir()
     base.mkdir(parents=True, exist_ok=True)
+    scope = list(changed_paths) if changed_paths is not None else None
 
     errors: List[str] = []
     discovered_uids = set()
@@ -116,14 +132,29 @@ def sync_memory_from_files(base_dir: Optional[Path] = None, *, prune: bool = Tru
     deleted = 0
     published = 0
 
+    scan = scan_file_manifest(
+        kind=FILE_SYNC_KIND_MEMORY,
+        base_dir=base,
+        paths=discover_markdown_files(base) if scope is None else existing_paths_under(base, scope),
+        incremental=incremental,
+        scope=scope,
+    )
+    if scan.unchanged:
+        with get_connection() as conn:
+            rows = conn.execute("SELECT uid FROM memory_items WHERE uid IS NOT NULL AND uid != ''").fetchall()
+        scan.requeue_missing({str(row["uid"]) for row in rows})
+    for entry in scan.unchanged:
+        discovered_uids.add(str(entry.entity_key))
+
     # 重要：parse 失败不应误删 DB，因此先记录“存在的 uid 集合”（即使解析失败也尽量保留）。
     parsed_items: List[Tuple[str, Dict[str, Any], str]] = []
-    for path in discover_markdown_files(base):
+    entries_by_uid: Dict[str, ManifestFile] = {}
+    for entry in scan.changed:
+        path = entry.path
         uid_value: Optional[str] = None
         try:
-            text = path.read_text(encoding="utf-8")
-            rel = str(path.relative_to(base)).replace("\\", "/")
-            parsed = parse_skill_markdown(text=text, source_path=rel)
+            text = entry.read_text()
+            parsed = parse_skill_markdown(text=text, source_path=entry.rel)
             meta = parsed.meta or {}
             uid_value = _safe_uid(meta.get("uid")) or _safe_uid(meta.get("id")) or _safe_uid(path.stem)
             if not uid_value:
@@ -135,6 +166,7 @@ def sync_memory_from_files(base_dir: Optional[Path] = None, *, prune: bool = Tru
                 atomic_write_text(path, fixed, encoding="utf-8")
             discovered_uids.add(uid_value)
             parsed_items.append((uid_value, meta, parsed.body or ""))
+            entries_by_uid[uid_value] = entry
         except Exception as exc:
             # 解析失败时：尽量用文件名作为 uid，避免误删 DB
             try:
@@ -185,6 +217,11 @@ def sync_memory_from_files(base_dir: Optional[Path] = None, *, prune: bool = Tru
                 )
                 inserted += 1
             upserts += 1
+            entry = entries_by_uid.get(uid_value)
+            if entry is not None:
+                scan.mark_synced(entry, uid_value)
+
+        save_file_manifest(scan, conn=conn)
 
     # 2) DB -> 文件：补齐未跟踪（uid 为空）的历史记录。
     # 独立事务，避免与 upsert 阶段共享长锁。
@@ -200,7 +237,7 @@ def sync_memory_from_files(base_dir: Optional[Path] = None, *, prune: bool = Tru
 
     # 3) prune：文件不存在 -> 删除 DB 记录。
     # 独立事务，缩短写锁粒度，避免阻塞并发的 create_memory_item 调用。
-    if prune:
+    if prune and (scope is None or scan.removed_keys):
         with get_connection() as conn:
             rows = conn.execute(
                 "SELECT id, uid FROM memory_items WHERE uid IS NOT NULL AND uid != ''"
@@ -211,6 +248,8 @@ def sync_memory_from_files(base_dir: Optional[Path] = None, *, prune: bool = Tru
                     continue
                 if uid_value in discovered_uids:
                     continue
+                if scope is not None and uid_value not in scan.removed_keys:
+                    continue
                 conn.execute("DELETE FROM memory_items WHERE id = ?", (int(row["id"]),))
                 deleted += 1
 
@@ -222,5 +261,6 @@ def sync_memory_from_files(base_dir: Optional[Path] = None, *, prune: bool = Tru
         "deleted": deleted,
         "published": published,
         "prune": bool(prune),
+        "manifest": scan.summary(),
         "errors": errors,
     }
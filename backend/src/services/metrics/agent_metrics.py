@@ -5,6 +5,17 @@ from typing import Dict, List, Optional, Tuple
 
 from backend.src.common.sql import in_clause_placeholders
 from backend.src.common.utils import coerce_int, extract_json_object, now_iso
+from backend.src.repositories.run_summaries_repo import (
+    aggregate_rollups_after_day,
+    aggregate_summaries_for_day_since,
+    list_unsummarized_agent_runs_since,
+)
+from backend.src.services.coordination.coordinator import get_coordinator
+from backend.src.services.knowledge.knowledge_watcher import get_knowledge_watcher_stats
+from backend.src.services.llm.llm_client import get_llm_call_gauge
+from backend.src.services.llm.llm_scheduler import get_llm_scheduler_snapshot
+from backend.src.services.llm.llm_single_flight import get_llm_single_flight_stats
+from backend.src.services.tools.tool_registry_cache import get_tool_registry_cache_stats
 from backend.src.storage import get_connection
 
 
@@ -82,6 +93,143 @@ def _classify_distill_block_reason(*, distill_status: str, distill_notes: str) -
     return "other"
 
 
+def _new_run_totals() -> dict:
+    return {
+        "runs": 0,
+        "steps": 0,
+        "tokens_total": 0,
+        "replan_attempts": 0,
+        "reflection_count": 0,
+        "by_status": {},
+        "by_mode": {},
+    }
+
+
+def _add_run_group(
+    totals: dict,
+    *,
+    status: str,
+    mode: str,
+    runs: int,
+    steps: int,
+    tokens_total: int,
+    replan_attempts: int,
+    reflection_count: int,
+) -> None:
+    if runs <= 0:
+        return
+    status_key = str(status or "").strip().lower() or "unknown"
+    mode_key = str(mode or "").strip().lower() or "do"
+    totals["by_status"][status_key] = int(totals["by_status"].get(status_key, 0)) + int(runs)
+    totals["by_mode"][mode_key] = int(totals["by_mode"].get(mode_key, 0)) + int(runs)
+    totals["runs"] += int(runs)
+    totals["steps"] += int(steps)
+    totals["tokens_total"] += int(tokens_total)
+    totals["replan_attempts"] += int(replan_attempts)
+    totals["reflection_count"] += int(reflection_count)
+
+
+def _add_grouped_rows(totals: dict, rows) -> None:
+    for row in rows or []:
+        _add_run_group(
+            totals,
+            status=str(row["status"] or ""),
+            mode=str(row["mode"] or ""),
+            runs=coerce_int(row["runs"] or 0, default=0),
+            steps=coerce_int(row["steps"] or 0, default=0),
+            tokens_total=coerce_int(row["tokens_total"] or 0, default=0),
+            replan_attempts=coerce_int(row["replan_attempts"] or 0, default=0),
+            reflection_count=coerce_int(row["reflection_count"] or 0, default=0),
+        )
+
+
+def _add_unsummarized_runs(conn, totals: dict, *, since: Optional[str]) -> int:
+    """
+    尚无 run_summaries 的 agent run 走旧的实时口径（解析 agent_state + 按 run_id 统计 steps/tokens）。
+
+    正常情况下只有“回填尚未完成的历史 run”会落到这里，数量随回填推进收敛到 0。
+    """
+    run_rows = list_unsummarized_agent_runs_since(since=since, conn=conn)
+    run_ids: List[int] = []
+    runs: List[dict] = []
+    for row in run_rows or []:
+        rid = coerce_int(row["id"], default=0)
+        if rid <= 0:
+            continue
+        run_ids.append(rid)
+        state_obj = extract_json_object(row["agent_state"] or "") or {}
+        runs.append(
+            {
+                "run_id": rid,
+                "status": str(row["status"] or "").strip(),
+                "mode": str(state_obj.get("mode") or "").strip().lower() or "do",
+                "replan_attempts": coerce_int(state_obj.get("replan_attempts") or 0, default=0),
+                "reflection_count": coerce_int(state_obj.get("reflection_count") or 0, default=0),
+            }
+        )
+
+    # step counts（分块避免超出 SQLite 变量上限）
+    step_counts: Dict[int, int] = {}
+    token_sums: Dict[int, int] = {}
+    for chunk in _chunked(run_ids):
+        placeholders = in_clause_placeholders(chunk)
+        if not placeholders:
+            continue
+        rows = conn.execute(
+            f"SELECT run_id, COUNT(*) AS c FROM task_steps WHERE run_id IN ({placeholders}) GROUP BY run_id",
+            chunk,
+        ).fetchall()
+        for r in rows or []:
+            rid = coerce_int(r["run_id"], default=0)
+            if rid <= 0:
+                continue
+            step_counts[rid] = coerce_int(r["c"] or 0, default=0)
+
+        rows = conn.execute(
+            f"SELECT run_id, COALESCE(SUM(tokens_total), 0) AS t FROM llm_records WHERE run_id IN ({placeholders}) GROUP BY run_id",
+            chunk,
+        ).fetchall()
+        for r in rows or []:
+            rid = coerce_int(r["run_id"], default=0)
+            if rid <= 0:
+                continue
+            token_sums[rid] = coerce_int(r["t"] or 0, default=0)
+
+    for r in runs:
+        rid = int(r["run_id"])
+        _add_run_group(
+            totals,
+            status=r["status"],
+            mode=r["mode"],
+            runs=1,
+            steps=coerce_int(step_counts.get(rid) or 0, default=0),
+            tokens_total=coerce_int(token_sums.get(rid) or 0, default=0),
+            replan_attempts=r["replan_attempts"],
+            reflection_count=r["reflection_count"],
+        )
+    return len(runs)
+
+
+def _aggregate_run_totals(conn, *, since: Optional[str]) -> dict:
+    """
+    runs 维度聚合：优先读预计算结果，避免每次请求扫描 task_runs/task_steps/llm_records。
+
+    - 完整的天：run_daily_rollups（run 收敛时增量维护）；
+    - 时间窗起始那一天：run_summaries 按 created_at 精确过滤；
+    - 尚未汇总的 run：回退实时计算（口径与旧实现一致）。
+    """
+    totals = _new_run_totals()
+    since_day = str(since)[:10] if since else None
+    _add_grouped_rows(totals, aggregate_rollups_after_day(day=since_day, conn=conn))
+    if since_day:
+        _add_grouped_rows(
+            totals,
+            aggregate_summaries_for_day_since(day=since_day, since=str(since), conn=conn),
+        )
+    totals["unsummarized_runs"] = _add_unsummarized_runs(conn, totals, since=since)
+    return totals
+
+
 def compute_agent_metrics(*, since_days: int = 30) -> dict:
     """
     聚合 Agent 运行指标（P3：可观测性）。
@@ -99,65 +247,7 @@ def compute_agent_metrics(*, since_days: int = 30) -> dict:
     days, since = _resolve_since_iso(since_days=since_days)
 
     with get_connection() as conn:
-        where = "summary LIKE 'agent_%'"
-        params: List = []
-        if since:
-            where += " AND created_at >= ?"
-            params.append(str(since))
-
-        run_rows = conn.execute(
-            f"SELECT id, status, agent_state, created_at FROM task_runs WHERE {where} ORDER BY id ASC",
-            params,
-        ).fetchall()
-
-        run_ids: List[int] = []
-        runs: List[dict] = []
-        for row in run_rows or []:
-            rid = coerce_int(row["id"], default=0)
-            if rid <= 0:
-                continue
-            run_ids.append(rid)
-            state_obj = extract_json_object(row["agent_state"] or "") or {}
-            mode = str(state_obj.get("mode") or "").strip().lower() or "do"
-            replan_attempts = coerce_int(state_obj.get("replan_attempts") or 0, default=0)
-            reflection_count = coerce_int(state_obj.get("reflection_count") or 0, default=0)
-            runs.append(
-                {
-                    "run_id": rid,
-                    "status": str(row["status"] or "").strip(),
-                    "mode": mode,
-                    "replan_attempts": replan_attempts,
-                    "reflection_count": reflection_count,
-                }
-            )
-
-        # step counts（分块避免超出 SQLite 变量上限）
-        step_counts: Dict[int, int] = {}
-        token_sums: Dict[int, int] = {}
-        if run_ids:
-            for chunk in _chunked(run_ids):
-                placeholders = in_clause_placeholders(chunk)
-                if not placeholders:
-                    continue
-                rows = conn.execute(
-                    f"SELECT run_id, COUNT(*) AS c FROM task_steps WHERE run_id IN ({placeholders}) GROUP BY run_id",
-                    chunk,
-                ).fetchall()
-                for r in rows or []:
-                    rid = coerce_int(r["run_id"], default=0)
-                    if rid <= 0:
-                        continue
-                    step_counts[rid] = coerce_int(r["c"] or 0, default=0)
-
-                rows = conn.execute(
-                    f"SELECT run_id, COALESCE(SUM(tokens_total), 0) AS t FROM llm_records WHERE run_id IN ({placeholders}) GROUP BY run_id",
-                    chunk,
-                ).fetchall()
-                for r in rows or []:
-                    rid = coerce_int(r["run_id"], default=0)
-                    if rid <= 0:
-                        continue
-                    token_sums[rid] = coerce_int(r["t"] or 0, default=0)
+        run_totals = _aggregate_run_totals(conn, since=since)
 
         # tool reuse stats（时间窗内）
         tool_row = _query_one_with_optional_since(
@@ -231,42 +321,21 @@ def compute_agent_metrics(*, since_days: int = 30) -> dict:
             distill_block_reasons[reason] = int(distill_block_reasons.get(reason, 0)) + 1
 
     # runs 聚合
-    by_status: Dict[str, int] = {}
-    by_mode: Dict[str, int] = {}
-    done = 0
-    failed = 0
-    stopped = 0
-    waiting = 0
-    total_steps = 0
-    total_tokens = 0
-    total_replan = 0
-    total_reflection = 0
-
-    for r in runs:
-        status = str(r.get("status") or "").strip().lower() or "unknown"
-        by_status[status] = by_status.get(status, 0) + 1
-        mode = str(r.get("mode") or "").strip().lower() or "do"
-        by_mode[mode] = by_mode.get(mode, 0) + 1
-
-        if status == "done":
-            done += 1
-        elif status == "failed":
-            failed += 1
-        elif status == "stopped":
-            stopped += 1
-        elif status == "waiting":
-            waiting += 1
-
-        rid = coerce_int(r.get("run_id") or 0, default=0)
-        total_steps += coerce_int(step_counts.get(rid) or 0, default=0)
-        total_tokens += coerce_int(token_sums.get(rid) or 0, default=0)
-        total_replan += coerce_int(r.get("replan_attempts") or 0, default=0)
-        total_reflection += coerce_int(r.get("reflection_count") or 0, default=0)
+    by_status: Dict[str, int] = dict(run_totals["by_status"])
+    by_mode: Dict[str, int] = dict(run_totals["by_mode"])
+    done = int(by_status.get("done", 0))
+    failed = int(by_status.get("failed", 0))
+    stopped = int(by_status.get("stopped", 0))
+    waiting = int(by_status.get("waiting", 0))
+    total_steps = int(run_totals["steps"])
+    total_tokens = int(run_totals["tokens_total"])
+    total_replan = int(run_totals["replan_attempts"])
+    total_reflection = int(run_totals["reflection_count"])
 
     denom_success = done + failed
     success_rate = (float(done) / float(denom_success)) if denom_success else 0.0
 
-    total_runs = len(runs)
+    total_runs = int(run_totals["runs"])
     avg_steps = (float(total_steps) / float(total_runs)) if total_runs else 0.0
     avg_tokens = (float(total_tokens) / float(total_runs)) if total_runs else 0.0
     avg_replan_attempts = (float(total_replan) / float(total_runs)) if total_runs else 0.0
@@ -290,6 +359,8 @@ def compute_agent_metrics(*, since_days: int = 30) -> dict:
             "avg_tokens_total": round(avg_tokens, 4),
             "avg_replan_attempts": round(avg_replan_attempts, 4),
             "avg_reflection_count": round(avg_reflection_count, 4),
+            # 尚无预计算汇总、走实时计算的 run 数（回填完成后应为 0）
+            "unsummarized": int(run_totals["unsummarized_runs"]),
         },
         "tool_calls": {
             "calls": int(calls),
@@ -310,4 +381,16 @@ def compute_agent_metrics(*, since_days: int = 30) -> dict:
             "distill_deny": int(distill_deny),
             "distill_block_reasons_among_pass": distill_block_reasons,
         },
+        # 进程内实时 gauge（非 since_days 窗口统计）：在途/被硬超时放弃但尚未退出的 LLM 调用
+        "llm_calls": get_llm_call_gauge(),
+        # LLM 调度：各优先级的排队数、在途数与排队等待时间（avg/p95/max），以及 TPM 用量
+        "llm_scheduler": get_llm_scheduler_snapshot(),
+        # LLM 请求合并：leader_calls 为真实发出的调用，coalesced 为合并省下的供应商调用
+        "llm_single_flight": get_llm_single_flight_stats(),
+        # 知识目录文件监听：同步次数与 sync lag（文件变更 -> 写入 DB 的耗时）
+        "knowledge_sync": get_knowledge_watcher_stats(),
+        # tool_call 编译工具表：命中/未命中/失效次数与当前条目数
+        "tool_registry_cache": get_tool_registry_cache_stats(),
+        # 多实例协调：后端类型与当前集群租约占用
+        "coordination": get_coordinator().snapshot(),
     }
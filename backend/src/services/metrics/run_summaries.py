@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Optional
+
+from backend.src.repositories.run_summaries_repo import (
+    count_run_summaries,
+    list_agent_run_ids_missing_summary,
+    refresh_run_summaries,
+)
+
+logger = logging.getLogger(__name__)
+
+_BACKFILL_LOCK = threading.Lock()
+
+
+def backfill_run_summaries(*, batch_size: int = 200, max_runs: Optional[int] = None) -> dict:
+    """
+    为历史 agent run 补齐 run_summaries/run_daily_rollups（按 id 分批，每批一个事务）。
+
+    说明：
+    - 可重复执行：只处理尚无汇总行的 run；
+    - 分批提交，避免长事务阻塞前台写入；回填期间 /api/metrics 对未汇总的 run 走实时口径，结果不受影响。
+    """
+    size = max(1, int(batch_size or 200))
+    limit = int(max_runs) if max_runs is not None and int(max_runs) > 0 else None
+    if not _BACKFILL_LOCK.acquire(blocking=False):
+        return {"ok": False, "running": True, "processed": 0}
+    started = time.monotonic()
+    processed = 0
+    batches = 0
+    try:
+        after_id = 0
+        while limit is None or processed < limit:
+            take = size if limit is None else min(size, limit - processed)
+            run_ids = list_agent_run_ids_missing_summary(after_id=after_id, limit=take)
+            if not run_ids:
+                break
+            refresh_run_summaries(run_ids=run_ids)
+            processed += len(run_ids)
+            batches += 1
+            after_id = run_ids[-1]
+    finally:
+        _BACKFILL_LOCK.release()
+    result = {
+        "ok": True,
+        "processed": int(processed),
+        "batches": int(batches),
+        "duration_ms": int((time.monotonic() - started) * 1000),
+    }
+    result.update(count_run_summaries())
+    return result
+
+
+def start_run_summaries_backfill_background(*, batch_size: int = 200) -> threading.Thread:
+    def _worker() -> None:
+        try:
+            result = backfill_run_summaries(batch_size=batch_size)
+            logger.info("backfill_run_summaries: %s", result)
+        except Exception as exc:
+            logger.exception("backfill_run_summaries failed: %s", exc)
+
+    thread = threading.Thread(target=_worker, name="run-summaries-backfill", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,193 @@
+"""
+来源信誉（source_reputation）：按 host 跨 run 记录 web_fetch/http_request 的尝试结果。
+
+说明：
+- 每次尝试回写：尝试/成功次数、延迟 EWMA、最近一次错误分类；host 级失败（由调用方按既有规则判定）
+  进入冷却，时长 = BASE * 2^(连续失败-1)，封顶 MAX；成功后清除冷却与连续失败计数；
+- 候选排序：冷却中的 host 排最后，其余按平滑成功率（分档）与延迟（秒级分档）稳定排序；无记录的 host 不会排到
+  有记录的 host 之后（未知来源不因别的 host 攒了成功记录而被挤后，例如用户给出的原始 URL 不会排到代理之后）；
+- 跳过：候选中存在未冷却的 host 时跳过冷却中的 host；全部冷却时仍按顺序尝试（冷却只是“先试别的”）；
+- 回写为单条 upsert（计数/EWMA/冷却在 SQL 内基于旧行累加），并发抓取同一 host 不丢更新；
+- 信誉读写均为尽力而为：数据库异常只记日志，不影响抓取主链路。
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple, TypeVar
+
+from backend.src.constants import (
+    AGENT_SOURCE_COOLDOWN_BASE_SECONDS,
+    AGENT_SOURCE_COOLDOWN_MAX_SECONDS,
+    AGENT_SOURCE_REPUTATION_ENABLED,
+)
+from backend.src.repositories import source_reputation_repo
+from backend.src.repositories.source_reputation_repo import SourceAttemptParams
+from backend.src.storage import get_connection
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# 延迟 EWMA 平滑系数（越大越偏向最近一次）
+_LATENCY_EWMA_ALPHA = 0.3
+# 连续失败指数退避的最大指数（避免 2**n 溢出）
+_COOLDOWN_MAX_EXPONENT = 16
+
+
+def normalize_source_host(host: object) -> str:
+    text = str(host or "").strip().lower()
+    if not text:
+        return ""
+    text = text.split("@", 1)[-1].split(":", 1)[0].strip().rstrip(".")
+    if text.startswith("www."):
+        text = text[4:]
+    return text
+
+
+def _row_to_reputation(row, *, now: float) -> dict:
+    attempts = int(row["attempts"] or 0)
+    successes = int(row["successes"] or 0)
+    cooldown_until = float(row["cooldown_until"]) if row["cooldown_until"] is not None else None
+    remaining = max(0.0, cooldown_until - now) if cooldown_until is not None else 0.0
+    return {
+        "host": str(row["host"]),
+        "attempts": attempts,
+        "successes": successes,
+        "failures": max(0, attempts - successes),
+        "success_rate": round(successes / attempts, 4) if attempts > 0 else None,
+        "consecutive_failures": int(row["consecutive_failures"] or 0),
+        "latency_ewma_ms": round(float(row["latency_ewma_ms"]), 1) if row["latency_ewma_ms"] is not None else None,
+        "last_status": str(row["last_status"] or ""),
+        "last_error_code": str(row["last_error_code"] or ""),
+        "last_error_reason": str(row["last_error_reason"] or ""),
+        "cooldown_until": cooldown_until,
+        "cooldown_remaining_seconds": round(remaining, 1),
+        "cooling_down": remaining > 0,
+        "updated_at": str(row["updated_at"] or ""),
+    }
+
+
+def record_source_attempt(
+    host: object,
+    *,
+    ok: bool,
+    latency_ms: Optional[float] = None,
+    error_code: str = "",
+    reason: str = "",
+    host_level: bool = False,
+    now: Optional[float] = None,
+) -> Optional[dict]:
+    """
+    回写一次尝试结果；host_level=True 表示 host 级失败（进入/延长冷却）。返回更新后的信誉（失败/关闭时为 None）。
+    """
+    normalized = normalize_source_host(host)
+    if not normalized or not AGENT_SOURCE_REPUTATION_ENABLED:
+        return None
+    current_time = float(now if now is not None else time.time())
+    try:
+        with get_connection() as conn:
+            source_reputation_repo.record_source_attempt(
+                SourceAttemptParams(
+                    host=normalized,
+                    ok=bool(ok),
+                    now=current_time,
+                    latency_ms=float(latency_ms) if latency_ms is not None and float(latency_ms) >= 0 else None,
+                    error_code=str(error_code or "").strip() or None,
+                    error_reason=str(reason or "").strip() or None,
+                    host_level=bool(host_level),
+                    ewma_alpha=_LATENCY_EWMA_ALPHA,
+                    cooldown_base_seconds=float(AGENT_SOURCE_COOLDOWN_BASE_SECONDS),
+                    cooldown_max_seconds=float(AGENT_SOURCE_COOLDOWN_MAX_SECONDS),
+                    cooldown_max_exponent=_COOLDOWN_MAX_EXPONENT,
+                ),
+                conn=conn,
+            )
+            updated = source_reputation_repo.get_source_reputation(host=normalized, conn=conn)
+    except Exception as exc:
+        logger.warning("source reputation update failed: host=%s err=%s", normalized, exc)
+        return None
+    return _row_to_reputation(updated, now=current_time) if updated else None
+
+
+def load_source_reputations(hosts: Iterable[object], *, now: Optional[float] = None) -> Dict[str, dict]:
+    """批量读取 host 信誉（按归一化 host 索引）；关闭或读库失败时返回空 dict。"""
+    if not AGENT_SOURCE_REPUTATION_ENABLED:
+        return {}
+    normalized = sorted({item for item in (normalize_source_host(host) for host in hosts or []) if item})
+    if not normalized:
+        return {}
+    current_time = float(now if now is not None else time.time())
+    try:
+        rows = source_reputation_repo.get_source_reputations(hosts=normalized)
+    except Exception as exc:
+        logger.warning("source reputation load failed: %s", exc)
+        return {}
+    return {str(row["host"]): _row_to_reputation(row, now=current_time) for row in rows}
+
+
+def _rank_key(reputation: Optional[dict]) -> Tuple[int, float, int]:
+    if not reputation:
+        return 0, -1.0, 0
+    attempts = int(reputation.get("attempts") or 0)
+    successes = int(reputation.get("successes") or 0)
+    # 平滑成功率（Laplace）按 0.1 分档：小样本差异不打乱原顺序
+    smoothed = round((successes + 1) / (attempts + 2), 1)
+    latency = reputation.get("latency_ewma_ms")
+    latency_bucket = int(float(latency) // 1000) if latency is not None else 0
+    return (1 if reputation.get("cooling_down") else 0), -smoothed, latency_bucket
+
+
+def plan_source_candidates(
+    candidates: Sequence[T],
+    *,
+    host_of: Callable[[T], object],
+    reorder: bool = True,
+    now: Optional[float] = None,
+) -> Tuple[List[T], Set[str]]:
+    """
+    按信誉规划候选顺序：返回 (排序后的候选, 应跳过的冷却 host 集合)。
+
+    reorder=False 时保持原顺序（例如已按相关性排好的检索结果），只给出跳过集合。
+    """
+    items = list(candidates or [])
+    hosts = [normalize_source_host(host_of(item)) for item in items]
+    reputations = load_source_reputations(hosts, now=now)
+    if not reputations:
+        return items, set()
+
+    if reorder:
+        order = sorted(range(len(items)), key=lambda idx: _rank_key(reputations.get(hosts[idx])))
+    else:
+        order = list(range(len(items)))
+    cooling = {host for host in hosts if host and (reputations.get(host) or {}).get("cooling_down")}
+    has_viable = any(not host or host not in cooling for host in hosts)
+    return [items[idx] for idx in order], (cooling if has_viable else set())
+
+
+def is_source_host_skipped(host: object, skipped_hosts: Set[str]) -> bool:
+    normalized = normalize_source_host(host)
+    return bool(normalized and normalized in skipped_hosts)
+
+
+def list_source_reputations(*, offset: int = 0, limit: int = 50) -> List[dict]:
+    now = time.time()
+    rows = source_reputation_repo.list_source_reputations(offset=max(0, int(offset)), limit=max(1, int(limit)))
+    return [_row_to_reputation(row, now=now) for row in rows]
+
+
+def get_source_reputation(host: object) -> Optional[dict]:
+    normalized = normalize_source_host(host)
+    if not normalized:
+        return None
+    row = source_reputation_repo.get_source_reputation(host=normalized)
+    return _row_to_reputation(row, now=time.time()) if row else None
+
+
+def reset_source_reputation(hosts: Optional[Sequence[object]] = None) -> int:
+    """重置信誉：hosts 为空时清空全部；返回删除条数。"""
+    if hosts is None:
+        return source_reputation_repo.delete_source_reputations()
+    normalized = [item for item in (normalize_source_host(host) for host in hosts) if item]
+    return source_reputation_repo.delete_source_reputations(hosts=normalized)
@@ -1,9 +1,15 @@
 import json
 import logging
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional
 
 from backend.src.common.utils import now_iso
+from backend.src.services.common.file_manifest import (
+    FILE_SYNC_KIND_SKILLS,
+    existing_paths_under,
+    save_file_manifest,
+    scan_file_manifest,
+)
 from backend.src.prompt.paths import skills_prompt_dir
 from backend.src.prompt.skill_files import (
     discover_skill_markdown_files,
@@ -31,7 +37,13 @@ def _json_list(value: Optional[List[Any]]) -> str:
     return json.dumps(value or [], ensure_ascii=False)
 
 
-def sync_skills_from_files(base_dir: Optional[Path] = None, *, prune: bool = True) -> dict:
+def sync_skills_from_files(
+    base_dir: Optional[Path] = None,
+    *,
+    prune: bool = True,
+    incremental: bool = False,
+    changed_paths: Optional[Iterable[Path]] = None,
+) -> dict:
     """
     将 backend/prompt/skills 下的技能文件同步到 SQLite（skills_items）。
 
@@ -39,26 +51,43 @@ def sync_skills_from_files(base_dir: Optional[Path] = None, *, prune: bool = Tru
     - 以 source_path 作为主键（相对 skills 目录的路径）
     - frontmatter.category 缺失时，从目录推断 category
     - prune=True 时强一致删除：若 DB 中存在 source_path，但文件系统已不存在，则删除该 DB 记录
+    - incremental=True 时只解析 file_sync_manifest 中 mtime/size/hash 有变化的文件（启动同步使用）
+    - changed_paths：只同步这些文件（文件监听传入），prune 也只删除其中已不存在的文件对应的记录
     """
     base_dir = base_dir or skills_prompt_dir()
+    scope = list(changed_paths) if changed_paths is not None else None
     errors: List[str] = []
     items = []
 
+    scan = scan_file_manifest(
+        kind=FILE_SYNC_KIND_SKILLS,
+        base_dir=base_dir,
+        paths=(
+            discover_skill_markdown_files(base_dir=base_dir)
+            if scope is None
+            else existing_paths_under(base_dir, scope)
+        ),
+        incremental=incremental,
+        scope=scope,
+    )
+    if scan.unchanged:
+        with get_connection() as conn:
+            rows = conn.execute(
+                "SELECT source_path FROM skills_items WHERE source_path IS NOT NULL AND source_path != ''"
+            ).fetchall()
+        scan.requeue_missing({str(row["source_path"]) for row in rows})
+
     # 重要：强一致删除需要“文件存在集合”，但 parse 失败不应误删 DB。
-    # 因此这里单独维护 discovered_source_paths，并且无论 parse 是否成功都纳入集合。
-    rel_root = base_dir
-    discovered_source_paths = set()
-    for path in discover_skill_markdown_files(base_dir=base_dir):
-        try:
-            rel = str(path.relative_to(rel_root)).replace("\\", "/")
-        except ValueError:
-            rel = path.name
-        discovered_source_paths.add(rel)
+    # 因此这里单独维护 discovered_source_paths，并且无论 parse 是否成功（或是否未变化）都纳入集合。
+    discovered_source_paths = {entry.rel for entry in scan.files}
+    entries_by_rel = {}
+    for entry in scan.changed:
         try:
-            text = path.read_text(encoding="utf-8")
-            items.append(parse_skill_markdown(text=text, source_path=rel))
+            text = entry.read_text()
+            items.append(parse_skill_markdown(text=text, source_path=entry.rel))
+            entries_by_rel[entry.rel] = entry
         except Exception as exc:
-            errors.append(f"{path}: {exc}")
+            errors.append(f"{entry.path}: {exc}")
             continue
 
     inserted = 0
@@ -186,9 +215,12 @@ def sync_skills_from_files(base_dir: Optional[Path] = None, *, prune: bool = Tru
                     ),
                 )
                 inserted += 1
+            entry = entries_by_rel.get(item.source_path)
+            if entry is not None:
+                scan.mark_synced(entry, item.source_path)
 
         # prune：删除“文件已不存在”的 DB 记录（仅对有 source_path 的技能生效）
-        if prune:
+        if prune and (scope is None or scan.removed_keys):
             try:
                 rows = conn.execute(
                     "SELECT id, source_path FROM skills_items WHERE source_path IS NOT NULL AND source_path != ''",
@@ -199,11 +231,15 @@ def sync_skills_from_files(base_dir: Optional[Path] = None, *, prune: bool = Tru
                         continue
                     if sp in discovered_source_paths:
                         continue
+                    if scope is not None and sp not in scan.removed_keys:
+                        continue
                     conn.execute("DELETE FROM skills_items WHERE id = ?", (int(row["id"]),))
                     deleted += 1
             except Exception as exc:
                 errors.append(f"prune_failed: {exc}")
 
+        save_file_manifest(scan, conn=conn)
+
     if errors:
         for err in errors[:5]:
             logger.warning("skill file load error: %s", err)
@@ -215,5 +251,6 @@ def sync_skills_from_files(base_dir: Optional[Path] = None, *, prune: bool = Tru
         "skipped": skipped,
         "deleted": deleted,
         "prune": bool(prune),
+        "manifest": scan.summary(),
         "errors": errors,
     }
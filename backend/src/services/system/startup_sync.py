@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from backend.src.common.utils import now_iso
+from backend.src.services.knowledge.knowledge_version import bump_knowledge_version
+
+logger = logging.getLogger(__name__)
+
+_STATUS_LOCK = threading.Lock()
+_STATUS: Dict[str, Any] = {"state": "idle"}
+
+
+def knowledge_sync_steps() -> List[Tuple[str, Callable[..., dict], dict]]:
+    # 延迟导入：避免 main 模块 import 时拉起全部服务依赖
+    from backend.src.services.graph.graph_store import sync_graph_from_files
+    from backend.src.services.memory.memory_store import sync_memory_from_files
+    from backend.src.services.skills.skills_sync import sync_skills_from_files
+    from backend.src.services.tools.tools_store import sync_tools_from_files
+
+    return [
+        ("skills", sync_skills_from_files, {}),
+        ("memory", sync_memory_from_files, {"prune": True}),
+        ("tools", sync_tools_from_files, {"prune": True}),
+        ("graph", sync_graph_from_files, {"prune": True}),
+    ]
+
+
+def count_sync_changes(result: Any) -> int:
+    """从 sync_*_from_files 的返回值中统计实际写入 DB 的变更数（inserted/updated/deleted 等）。"""
+    if not isinstance(result, dict):
+        return 0
+    total = 0
+    for key, value in result.items():
+        if key.startswith(("inserted", "updated", "deleted", "exported")) or key == "published":
+            try:
+                total += int(value or 0)
+            except (TypeError, ValueError):
+                continue
+    return total
+
+
+def _set_status(**fields: Any) -> None:
+    with _STATUS_LOCK:
+        _STATUS.update(fields)
+
+
+def get_startup_sync_status() -> Dict[str, Any]:
+    """
+    启动同步状态快照：state=idle/running/done，附带耗时与各类文件的同步结果摘要。
+    """
+    with _STATUS_LOCK:
+        return dict(_STATUS)
+
+
+def run_startup_file_sync(*, incremental: bool = True) -> Dict[str, Any]:
+    """
+    依次同步 skills/memory/tools/graph 文件到 SQLite（单项失败不影响其他项）。
+    """
+    started = time.monotonic()
+    _set_status(state="running", incremental=bool(incremental), started_at=now_iso(), finished_at=None, results={})
+    results: Dict[str, Any] = {}
+    for name, func, kwargs in knowledge_sync_steps():
+        step_started = time.monotonic()
+        try:
+            result = func(incremental=incremental, **kwargs)
+            results[name] = {
+                "ok": True,
+                "elapsed_ms": int((time.monotonic() - step_started) * 1000),
+                "changes": count_sync_changes(result),
+                "manifest": result.get("manifest"),
+                "errors": len(result.get("errors") or []),
+            }
+        except Exception as exc:
+            logger.exception("startup sync %s failed: %s", name, exc)
+            results[name] = {"ok": False, "elapsed_ms": int((time.monotonic() - step_started) * 1000), "error": str(exc)}
+    if any(int(item.get("changes") or 0) > 0 for item in results.values()):
+        bump_knowledge_version("startup_sync")
+    elapsed_ms = int((time.monotonic() - started) * 1000)
+    _set_status(state="done", finished_at=now_iso(), elapsed_ms=elapsed_ms, results=results)
+    logger.info("startup file sync finished in %sms (incremental=%s)", elapsed_ms, bool(incremental))
+    return {"elapsed_ms": elapsed_ms, "incremental": bool(incremental), "results": results}
+
+
+def start_startup_file_sync_background(
+    *,
+    incremental: bool = True,
+    after: Optional[Callable[[], None]] = None,
+) -> threading.Thread:
+    """
+    后台线程执行启动同步：服务可先接收请求，同步进度通过 get_startup_sync_status 查询。
+
+    after：同步结束后在同一线程内执行（例如启动文件监听，避免与启动同步并发写同一批记录）。
+    """
+    _set_status(state="running", incremental=bool(incremental), started_at=now_iso(), finished_at=None, results={})
+
+    def _worker() -> None:
+        try:
+            run_startup_file_sync(incremental=incremental)
+        except Exception as exc:
+            logger.exception("startup file sync thread failed: %s", exc)
+            _set_status(state="done", finished_at=now_iso(), error=str(exc))
+        if after is not None:
+            try:
+                after()
+            except Exception as exc:
+                logger.exception("startup file sync after-hook failed: %s", exc)
+
+    thread = threading.Thread(target=_worker, name="startup-file-sync", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,244 @@
+"""
+状态推送通道：把 run 状态、任务计数、最近动态、评估记录等变化多路复用到一个 SSE 连接上。
+
+说明：
+- 事件来源：
+  1) 写库提交（common.resource_versions 的版本变更监听）：按资源族标记 dirty，合并窗口后由后台线程
+     为每个 dirty 主题调用一次快照函数，结果广播给所有订阅者（查询次数与订阅者数量无关）；
+  2) StreamRunStateEmitter.emit_run_status：run 状态变化即时推送（不等写库）；
+- 事件 id 为 "<epoch>-<seq>"，环形缓冲保留最近 AGENT_STATE_CHANNEL_BUFFER 条，
+  客户端带 Last-Event-ID 重连时补发缺失事件；缓冲已覆盖/进程重启（epoch 变化）时返回 reset，由调用方重发快照；
+- 空闲订阅者只阻塞在 asyncio.Event 上（加低频心跳），不产生轮询开销。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Set, Tuple
+
+from backend.src.common.resource_versions import add_resource_version_listener, get_resource_version
+from backend.src.constants import AGENT_STATE_CHANNEL_BUFFER, AGENT_STATE_CHANNEL_DEBOUNCE_MS
+
+logger = logging.getLogger(__name__)
+
+STATE_TOPIC_RUNS = "runs"
+STATE_TOPIC_TASKS = "tasks"
+STATE_TOPIC_RECORDS = "records"
+STATE_TOPIC_REVIEWS = "reviews"
+STATE_TOPIC_MEMORY = "memory"
+
+STATE_TOPICS = (STATE_TOPIC_RUNS, STATE_TOPIC_TASKS, STATE_TOPIC_RECORDS, STATE_TOPIC_REVIEWS, STATE_TOPIC_MEMORY)
+
+StateEvent = Tuple[int, str, Dict[str, Any]]
+
+
+def parse_state_topics(raw: Optional[str]) -> Set[str]:
+    """逗号分隔的主题列表；为空或全部非法时订阅全部主题。"""
+    topics = {part.strip().lower() for part in str(raw or "").split(",") if part.strip()}
+    topics &= set(STATE_TOPICS)
+    return topics or set(STATE_TOPICS)
+
+
+class StateSubscriber:
+    __slots__ = ("topics", "_loop", "_event")
+
+    def __init__(self, topics: Set[str], loop: asyncio.AbstractEventLoop) -> None:
+        self.topics = set(topics)
+        self._loop = loop
+        self._event = asyncio.Event()
+
+    def notify(self) -> None:
+        try:
+            self._loop.call_soon_threadsafe(self._event.set)
+        except RuntimeError:
+            # loop 已关闭：订阅者即将被移除
+            pass
+
+    async def wait(self, timeout: float) -> bool:
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return False
+        self._event.clear()
+        return True
+
+
+class StateChannel:
+    def __init__(self, *, buffer_size: int = AGENT_STATE_CHANNEL_BUFFER, debounce_ms: int = AGENT_STATE_CHANNEL_DEBOUNCE_MS):
+        self.epoch = format(int(time.time() * 1000), "x")
+        self._lock = threading.Lock()
+        self._events: Deque[StateEvent] = deque(maxlen=max(10, int(buffer_size)))
+        self._seq = 0
+        self._subscribers: List[StateSubscriber] = []
+        self._snapshots: Dict[str, Callable[[], Any]] = {}
+        self._dirty: Set[str] = set()
+        self._dirty_event = threading.Event()
+        self._debounce_seconds = max(0, int(debounce_ms)) / 1000.0
+        self._worker: Optional[threading.Thread] = None
+        self._stats = {"published": 0, "snapshots": 0, "snapshot_errors": 0}
+
+    # ----- 事件 id -----
+
+    def format_event_id(self, seq: int) -> str:
+        return f"{self.epoch}-{int(seq)}"
+
+    def parse_event_id(self, event_id: Optional[str]) -> Optional[int]:
+        """返回本 epoch 内的 seq；格式非法或来自其他 epoch 时返回 None。"""
+        text = str(event_id or "").strip()
+        epoch, sep, seq = text.rpartition("-")
+        if not sep or epoch != self.epoch:
+            return None
+        try:
+            return int(seq)
+        except ValueError:
+            return None
+
+    @property
+    def head(self) -> int:
+        with self._lock:
+            return self._seq
+
+    # ----- 发布 -----
+
+    def publish(self, topic: str, payload: Dict[str, Any]) -> int:
+        with self._lock:
+            self._seq += 1
+            seq = self._seq
+            self._events.append((seq, str(topic), dict(payload or {})))
+            self._stats["published"] += 1
+            targets = [sub for sub in self._subscribers if topic in sub.topics]
+        for sub in targets:
+            sub.notify()
+        return seq
+
+    def register_snapshot(self, topic: str, provider: Callable[[], Any]) -> None:
+        with self._lock:
+            self._snapshots[str(topic)] = provider
+
+    def build_snapshot(self, topic: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            provider = self._snapshots.get(topic)
+        if provider is None:
+            return None
+        try:
+            data = provider()
+        except Exception as exc:
+            self._stats["snapshot_errors"] += 1
+            logger.warning("state channel snapshot %s failed: %s", topic, exc)
+            return None
+        self._stats["snapshots"] += 1
+        return {"type": "snapshot", "topic": topic, "version": get_resource_version(topic), "data": data}
+
+    def mark_dirty(self, topics: Iterable[str]) -> None:
+        """资源族版本变更回调（写入线程内执行，只做标记与唤醒）。"""
+        with self._lock:
+            if not self._subscribers:
+                return
+            self._dirty.update(topic for topic in topics if topic in self._snapshots)
+            if not self._dirty:
+                return
+        self._dirty_event.set()
+
+    def _ensure_worker(self) -> None:
+        if self._worker is not None and self._worker.is_alive():
+            return
+        self._worker = threading.Thread(target=self._worker_loop, name="state-channel", daemon=True)
+        self._worker.start()
+
+    def _worker_loop(self) -> None:
+        while True:
+            self._dirty_event.wait()
+            if self._debounce_seconds:
+                time.sleep(self._debounce_seconds)
+            self._dirty_event.clear()
+            self.flush_dirty()
+
+    def flush_dirty(self) -> int:
+        """为每个 dirty 主题构建一次快照并广播，返回发布条数。"""
+        with self._lock:
+            topics = sorted(self._dirty)
+            self._dirty.clear()
+        published = 0
+        for topic in topics:
+            snapshot = self.build_snapshot(topic)
+            if snapshot is not None:
+                self.publish(topic, snapshot)
+                published += 1
+        return published
+
+    # ----- 订阅 -----
+
+    def subscribe(self, topics: Set[str], *, loop: Optional[asyncio.AbstractEventLoop] = None) -> StateSubscriber:
+        sub = StateSubscriber(topics, loop or asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers.append(sub)
+        self._ensure_worker()
+        return sub
+
+    def unsubscribe(self, sub: StateSubscriber) -> None:
+        with self._lock:
+            if sub in self._subscribers:
+                self._subscribers.remove(sub)
+
+    def events_after(self, seq: Optional[int], topics: Set[str]) -> Tuple[List[StateEvent], bool, int]:
+        """
+        返回 (seq 之后属于 topics 的事件, 是否无法续传, 当前 head)。
+
+        无法续传（seq 为空/来自其他 epoch/已被环形缓冲覆盖）时调用方应重发快照，并从 head 继续。
+        """
+        with self._lock:
+            head = self._seq
+            if seq is None or seq > head:
+                return [], True, head
+            oldest = self._events[0][0] if self._events else head + 1
+            if seq + 1 < oldest:
+                return [], True, head
+            return [event for event in self._events if event[0] > seq and event[1] in topics], False, head
+
+    def snapshot_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "epoch": self.epoch,
+                "head": self._seq,
+                "buffered": len(self._events),
+                "subscribers": len(self._subscribers),
+                **self._stats,
+            }
+
+
+def format_state_sse(channel: StateChannel, event: StateEvent) -> str:
+    seq, topic, payload = event
+    return (
+        f"id: {channel.format_event_id(seq)}\n"
+        f"event: {topic}\n"
+        f"data: {json.dumps(payload, ensure_ascii=False, default=str)}\n\n"
+    )
+
+
+_CHANNEL_LOCK = threading.Lock()
+_CHANNEL: Optional[StateChannel] = None
+
+
+def get_state_channel() -> StateChannel:
+    global _CHANNEL
+    with _CHANNEL_LOCK:
+        if _CHANNEL is None:
+            _CHANNEL = StateChannel()
+            add_resource_version_listener(_CHANNEL.mark_dirty)
+        return _CHANNEL
+
+
+def publish_run_status(*, task_id: Optional[int], run_id: Optional[int], status: str) -> None:
+    """run 状态即时推送（StreamRunStateEmitter 调用）；通道未启用订阅时开销仅为一次入队。"""
+    try:
+        get_state_channel().publish(
+            STATE_TOPIC_RUNS,
+            {"type": "run_status", "task_id": task_id, "run_id": run_id, "status": str(status or "")},
+        )
+    except Exception as exc:
+        logger.debug("publish run_status failed: %s", exc)
@@ -14,6 +14,7 @@ from backend.src.repositories.task_outputs_repo import list_task_outputs_for_run
 from backend.src.repositories.task_steps_repo import list_task_steps_for_run
 from backend.src.repositories.tasks_repo import get_task
 from backend.src.repositories.tool_call_records_repo import list_tool_calls_with_tool_name_by_run
+from backend.src.services.tasks.run_artifacts import list_run_artifacts
 from backend.src.services.agent_review.review_snapshot import (
     build_artifacts_check,
     build_run_meta,
@@ -137,6 +138,7 @@ def collect_review_data(
     artifacts_check_workdir, artifacts_check_items, missing_artifacts = build_artifacts_check(
         plan_artifacts=plan_artifacts,
         state_obj=state_obj if isinstance(state_obj, dict) else None,
+        run_artifacts=list_run_artifacts(task_id=tid, run_id=rid) if plan_artifacts else None,
     )
 
     auto_status = None
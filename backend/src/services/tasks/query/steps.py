@@ -1,11 +1,19 @@
 from __future__ import annotations
 
+import logging
 import sqlite3
-from typing import Optional, Tuple
+from typing import Dict, Optional, Sequence, Tuple
 
+from backend.src.constants import STEP_STATUS_DONE
 from backend.src.repositories.task_steps_repo import (
     TaskStepCreateParams as TaskStepCreateParamsRepo,
 )
+from backend.src.repositories.task_steps_repo import (
+    TaskStepTransition as TaskStepTransitionRepo,
+)
+from backend.src.repositories.task_steps_repo import (
+    apply_task_step_transitions as apply_task_step_transitions_repo,
+)
 from backend.src.repositories.task_steps_repo import create_task_step as create_task_step_repo
 from backend.src.repositories.task_steps_repo import get_task_step as get_task_step_repo
 from backend.src.repositories.task_steps_repo import (
@@ -14,6 +22,7 @@ from backend.src.repositories.task_steps_repo import (
 from backend.src.repositories.task_steps_repo import (
     get_max_step_order_for_run_by_status as get_max_step_order_for_run_by_status_repo,
 )
+from backend.src.repositories.task_steps_repo import list_action_duration_stats as list_action_duration_stats_repo
 from backend.src.repositories.task_steps_repo import list_task_steps as list_task_steps_repo
 from backend.src.repositories.task_steps_repo import (
     list_task_steps_for_run as list_task_steps_for_run_repo,
@@ -33,8 +42,12 @@ from backend.src.services.common.coerce import (
     to_optional_text,
     to_text,
 )
+from backend.src.services.tasks.run_artifacts import record_done_step_artifact
+
+logger = logging.getLogger(__name__)
 
 TaskStepCreateParams = TaskStepCreateParamsRepo
+TaskStepTransition = TaskStepTransitionRepo
 
 
 def get_max_step_order_for_run_by_status(
@@ -81,6 +94,26 @@ def list_task_steps_for_run(
     )
 
 
+def get_action_duration_estimates(
+    *,
+    limit: int,
+    conn: Optional[sqlite3.Connection] = None,
+) -> Dict[str, float]:
+    """
+    返回 {action_type: 平均耗时秒}（来自最近 limit 条已完成步骤的 started_at/finished_at）。
+    """
+    estimates: Dict[str, float] = {}
+    for row in list_action_duration_stats_repo(limit=to_int(limit), conn=conn):
+        action_type = to_text(row["action_type"]).strip()
+        if not action_type:
+            continue
+        try:
+            estimates[action_type] = max(0.0, float(row["avg_seconds"] or 0))
+        except (TypeError, ValueError):
+            continue
+    return estimates
+
+
 def create_task_step(
     params: TaskStepCreateParamsRepo,
     *,
@@ -89,6 +122,28 @@ def create_task_step(
     return create_task_step_repo(params, conn=conn)
 
 
+def apply_task_step_transitions(
+    transitions: Sequence[TaskStepTransitionRepo],
+    *,
+    conn: Optional[sqlite3.Connection] = None,
+) -> int:
+    """
+    批量应用步骤状态迁移/结果写入（单事务），返回处理的条数。
+
+    与 mark_task_step_done 一致：迁移到 done 的步骤登记其 run 产物。
+    """
+    items = list(transitions or [])
+    applied = apply_task_step_transitions_repo(items, conn=conn)
+    for item in items:
+        if str(item.status or "") != STEP_STATUS_DONE:
+            continue
+        try:
+            record_done_step_artifact(step_id=int(item.step_id), result=item.result, conn=conn)
+        except Exception as exc:
+            logger.warning("record run artifact failed: step_id=%s err=%s", item.step_id, exc)
+    return applied
+
+
 def get_task_step(*, step_id: int, conn: Optional[sqlite3.Connection] = None):
     return get_task_step_repo(step_id=to_int(step_id), conn=conn)
 
@@ -168,13 +223,19 @@ def mark_task_step_done(
     updated_at: Optional[str] = None,
     conn: Optional[sqlite3.Connection] = None,
 ) -> str:
-    return mark_task_step_done_repo(
+    updated = mark_task_step_done_repo(
         step_id=to_int(step_id),
         result=to_optional_text(result),
         finished_at=to_text(finished_at),
         updated_at=updated_at,
         conn=conn,
     )
+    # file_write/file_append 的 run 产物只在步骤 done 时登记（登记失败不影响步骤状态）
+    try:
+        record_done_step_artifact(step_id=to_int(step_id), result=to_optional_text(result), conn=conn)
+    except Exception as exc:
+        logger.warning("record run artifact failed: step_id=%s err=%s", step_id, exc)
+    return updated
 
 
 def mark_task_step_failed(
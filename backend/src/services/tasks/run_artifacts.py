@@ -0,0 +1,364 @@
+"""
+run 产物登记：file_write/file_append 步骤标记 done 时记录 path/size/产出步骤/类型（run_artifacts 表 + 进程内索引）。
+
+说明：
+- 只登记 done 的步骤（与回填口径一致）：动作写盘后步骤仍可能被判失败，此时不应视为产物；
+- 登记时只 stat 不读内容；size/sha256 在读取登记（评估/产物检查）时按当前文件计算，
+  并按 (size, mtime_ns) 缓存，反复 file_append 同一大文件不会每次重新整文件哈希；
+- 脚本绑定校验（shell_command/tool_call）、产物检查直接按 run 查询登记结果，
+  不再每一步都回扫 task_steps 并反序列化所有 detail/result（O(steps²)）；
+- 进程内索引按 (db_path, run_id) 维护，写入时同步更新；未命中时读表，表中没有该 run 的登记
+  （进程重启前已在执行的 run / 老数据）则从 task_steps 回填一次并落表；
+- AGENT_COORDINATION_BACKEND 非 local（多进程共享库）时其他进程的写入不会进入本进程索引，
+  因此每次直接读表（按 run_id 的单次索引查询）；回填仍只做一次。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from backend.src.common.path_utils import normalize_windows_abs_path_on_posix
+from backend.src.common.utils import parse_json_dict
+from backend.src.constants import (
+    ACTION_TYPE_FILE_APPEND,
+    ACTION_TYPE_FILE_WRITE,
+    AGENT_COORDINATION_BACKEND,
+    RUN_STATUS_RUNNING,
+    RUN_STATUS_WAITING,
+)
+from backend.src.repositories.run_artifacts_repo import (
+    RunArtifactParams,
+    delete_run_artifact,
+    delete_run_artifacts_under,
+    list_run_artifacts as list_run_artifacts_repo,
+    list_runs_without_artifacts,
+    upsert_run_artifact,
+    upsert_run_artifacts,
+)
+from backend.src.repositories.task_steps_repo import get_task_step, list_task_steps_for_run
+from backend.src.storage import resolve_db_path
+
+logger = logging.getLogger(__name__)
+
+RUN_ARTIFACT_KINDS = (ACTION_TYPE_FILE_WRITE, ACTION_TYPE_FILE_APPEND)
+
+# 超大文件不计算哈希（只登记大小），避免登记本身成为写入瓶颈
+_HASH_MAX_BYTES = 64 * 1024 * 1024
+_HASH_CHUNK_BYTES = 1024 * 1024
+
+# 进程内只保留最近活跃的 run（淘汰后再次访问时从表重新加载，不会重复回填）
+_INDEX_MAX_RUNS = 256
+_DIGEST_CACHE_MAX = 1024
+
+_IndexKey = Tuple[str, int]
+
+_LOCK = threading.Lock()
+_INDEX: "OrderedDict[_IndexKey, Dict[str, dict]]" = OrderedDict()
+_BACKFILLED: Set[_IndexKey] = set()
+# path_key -> (size, mtime_ns, sha256)
+_DIGESTS: "OrderedDict[str, Tuple[int, int, Optional[str]]]" = OrderedDict()
+
+
+def _path_key(path: str) -> str:
+    return os.path.normcase(str(path))
+
+
+def _index_key(run_id: int) -> _IndexKey:
+    return resolve_db_path(), int(run_id)
+
+
+def _use_memory_index() -> bool:
+    return AGENT_COORDINATION_BACKEND == "local"
+
+
+def _row_to_item(row) -> dict:
+    return {
+        "task_id": row["task_id"],
+        "run_id": row["run_id"],
+        "step_id": row["step_id"],
+        "path": str(row["path"]),
+        "kind": str(row["kind"]),
+        "size": row["size"],
+        "sha256": row["sha256"],
+    }
+
+
+def _file_size(path: str) -> Optional[int]:
+    try:
+        return int(os.path.getsize(path))
+    except OSError:
+        return None
+
+
+def _file_digest(path: str) -> Tuple[Optional[int], Optional[str]]:
+    """当前文件的 (size, sha256)；(size, mtime_ns) 未变时复用缓存，超大/不可读文件 sha256 为 None。"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None, None
+    size, mtime_ns = int(stat.st_size), int(stat.st_mtime_ns)
+    key = _path_key(path)
+    with _LOCK:
+        cached = _DIGESTS.get(key)
+    if cached is not None and cached[0] == size and cached[1] == mtime_ns:
+        return size, cached[2]
+    sha256 = _hash_file(path, size)
+    with _LOCK:
+        _DIGESTS[key] = (size, mtime_ns, sha256)
+        _DIGESTS.move_to_end(key)
+        while len(_DIGESTS) > _DIGEST_CACHE_MAX:
+            _DIGESTS.popitem(last=False)
+    return size, sha256
+
+
+def _hash_file(path: str, size: int) -> Optional[str]:
+    if size > _HASH_MAX_BYTES:
+        return None
+    digest = hashlib.sha256()
+    try:
+        with open(path, "rb") as handle:
+            while True:
+                chunk = handle.read(_HASH_CHUNK_BYTES)
+                if not chunk:
+                    break
+                digest.update(chunk)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+def _artifact_from_step(row, result: Optional[str]) -> Optional[RunArtifactParams]:
+    """done 的 file_write/file_append 步骤 -> 登记参数（优先 result.path，其次 payload.path）。"""
+    detail_obj = parse_json_dict(row["detail"]) or {}
+    kind = str(detail_obj.get("type") or "").strip().lower()
+    if kind not in RUN_ARTIFACT_KINDS:
+        return None
+    result_obj = parse_json_dict(result) or {}
+    payload_obj = detail_obj.get("payload") if isinstance(detail_obj.get("payload"), dict) else {}
+    raw_path = str(result_obj.get("path") or "").strip() or str(payload_obj.get("path") or "").strip()
+    raw_path = normalize_windows_abs_path_on_posix(raw_path)
+    if not raw_path or row["run_id"] is None:
+        return None
+    # 文件类 action 的相对路径以进程 cwd 为基准（见 file_action_common.resolve_action_target_path）
+    path = os.path.abspath(raw_path)
+    size = result_obj.get("bytes")
+    return RunArtifactParams(
+        task_id=int(row["task_id"]),
+        run_id=int(row["run_id"]),
+        step_id=int(row["id"]) if row["id"] is not None else None,
+        path=path,
+        kind=kind,
+        size=int(size) if isinstance(size, int) else None,
+    )
+
+
+def _collect_artifacts_from_steps(
+    *,
+    task_id: int,
+    run_id: int,
+    conn: Optional[sqlite3.Connection] = None,
+) -> List[RunArtifactParams]:
+    """回填：与旧的回扫口径一致（status=done 的 file_write/file_append；优先 result.path）。"""
+    latest: Dict[str, RunArtifactParams] = {}
+    for row in list_task_steps_for_run(task_id=int(task_id), run_id=int(run_id), conn=conn) or []:
+        if str(row["status"] or "").strip().lower() != "done":
+            continue
+        params = _artifact_from_step(row, row["result"])
+        if params is not None:
+            latest[_path_key(params.path)] = params
+    return list(latest.values())
+
+
+def backfill_run_artifacts(*, task_id: int, run_id: int, conn: Optional[sqlite3.Connection] = None) -> int:
+    """从 task_steps 回填一个 run 的产物登记（幂等：已登记的路径以步骤记录为准覆盖）。"""
+    items = _collect_artifacts_from_steps(task_id=int(task_id), run_id=int(run_id), conn=conn)
+    if items:
+        upsert_run_artifacts(items, conn=conn)
+    with _LOCK:
+        _BACKFILLED.add(_index_key(run_id))
+    return len(items)
+
+
+def backfill_active_run_artifacts(
+    *,
+    statuses: Sequence[str] = (RUN_STATUS_RUNNING, RUN_STATUS_WAITING),
+) -> Dict[str, int]:
+    """为进行中（含等待输入）且尚无登记的 run 批量回填（升级后一次性执行；未执行时也会在首次查询时按 run 懒回填）。"""
+    runs = 0
+    artifacts = 0
+    for row in list_runs_without_artifacts(statuses=list(statuses)):
+        artifacts += backfill_run_artifacts(task_id=int(row["task_id"]), run_id=int(row["run_id"]))
+        runs += 1
+    return {"runs": runs, "artifacts": artifacts}
+
+
+def _load_run_items(*, task_id: int, run_id: int, conn: Optional[sqlite3.Connection] = None) -> Dict[str, dict]:
+    key = _index_key(run_id)
+    with _LOCK:
+        backfilled = key in _BACKFILLED
+    rows = list_run_artifacts_repo(run_id=int(run_id), conn=conn)
+    if not rows and not backfilled:
+        backfill_run_artifacts(task_id=int(task_id), run_id=int(run_id), conn=conn)
+        rows = list_run_artifacts_repo(run_id=int(run_id), conn=conn)
+    with _LOCK:
+        _BACKFILLED.add(key)
+    return {_path_key(row["path"]): _row_to_item(row) for row in rows}
+
+
+def _run_items(*, task_id: int, run_id: int, conn: Optional[sqlite3.Connection] = None) -> Dict[str, dict]:
+    """返回 run 的登记索引（path_key -> item）；本地模式下返回的是共享索引，调用方只读。"""
+    if not _use_memory_index():
+        return _load_run_items(task_id=task_id, run_id=run_id, conn=conn)
+    key = _index_key(run_id)
+    with _LOCK:
+        items = _INDEX.get(key)
+        if items is not None:
+            _INDEX.move_to_end(key)
+            return items
+    loaded = _load_run_items(task_id=task_id, run_id=run_id, conn=conn)
+    with _LOCK:
+        # 并发加载时以先写入者为准（其后的写入登记已合并进该字典）
+        items = _INDEX.setdefault(key, loaded)
+        _INDEX.move_to_end(key)
+        while len(_INDEX) > _INDEX_MAX_RUNS:
+            _INDEX.popitem(last=False)
+        return items
+
+
+def record_run_artifact(
+    *,
+    task_id: int,
+    run_id: int,
+    step_id: Optional[int],
+    path: str,
+    kind: str,
+    conn: Optional[sqlite3.Connection] = None,
+) -> Optional[dict]:
+    """
+    登记一次写入产物（只 stat 大小，哈希在读取登记时按需计算）。
+
+    先确保该 run 已加载/回填，避免“重启后第一次写入落表”让旧步骤的产物被跳过回填。
+    """
+    target = str(path or "").strip()
+    if not target:
+        return None
+    target = os.path.abspath(target)
+    items = _run_items(task_id=int(task_id), run_id=int(run_id), conn=conn)
+    params = RunArtifactParams(
+        task_id=int(task_id),
+        run_id=int(run_id),
+        step_id=int(step_id) if step_id is not None else None,
+        path=target,
+        kind=str(kind),
+        size=_file_size(target),
+    )
+    upsert_run_artifact(params, conn=conn)
+    item = {
+        "task_id": params.task_id,
+        "run_id": params.run_id,
+        "step_id": params.step_id,
+        "path": params.path,
+        "kind": params.kind,
+        "size": params.size,
+        "sha256": params.sha256,
+    }
+    if _use_memory_index():
+        with _LOCK:
+            items[_path_key(target)] = item
+    return dict(item)
+
+
+def record_done_step_artifact(
+    *,
+    step_id: int,
+    result: Optional[str],
+    conn: Optional[sqlite3.Connection] = None,
+) -> Optional[dict]:
+    """步骤标记 done 后调用：file_write/file_append 步骤登记其产物，其他步骤忽略。"""
+    row = get_task_step(step_id=int(step_id), conn=conn)
+    if row is None:
+        return None
+    params = _artifact_from_step(row, result)
+    if params is None:
+        return None
+    return record_run_artifact(
+        task_id=params.task_id,
+        run_id=params.run_id,
+        step_id=params.step_id,
+        path=params.path,
+        kind=params.kind,
+        conn=conn,
+    )
+
+
+def forget_run_artifact(*, task_id: int, run_id: int, path: str, is_dir: bool = False) -> None:
+    """file_delete 成功后移除登记（目录删除时移除其下全部路径）。"""
+    target = str(path or "").strip()
+    if not target:
+        return
+    target = os.path.abspath(target)
+    items = _run_items(task_id=int(task_id), run_id=int(run_id))
+    if is_dir:
+        delete_run_artifacts_under(run_id=int(run_id), directory=target)
+    else:
+        delete_run_artifact(run_id=int(run_id), path=target)
+    if not _use_memory_index():
+        return
+    target_key = _path_key(target)
+    prefix = target_key.rstrip(os.sep) + os.sep
+    with _LOCK:
+        for key in list(items.keys()):
+            if key == target_key or (is_dir and key.startswith(prefix)):
+                items.pop(key, None)
+
+
+def _with_digest(item: dict) -> dict:
+    # size/sha256 取读取时的文件内容（文件已不存在时保留登记值）
+    out = dict(item)
+    size, sha256 = _file_digest(str(out["path"]))
+    if size is not None:
+        out["size"] = size
+        out["sha256"] = sha256
+    return out
+
+
+def list_run_artifacts(*, task_id: int, run_id: int) -> List[dict]:
+    items = _run_items(task_id=int(task_id), run_id=int(run_id))
+    with _LOCK:
+        snapshot = [dict(item) for item in items.values()]
+    return [_with_digest(item) for item in snapshot]
+
+
+def get_run_artifact(*, task_id: int, run_id: int, path: str) -> Optional[dict]:
+    items = _run_items(task_id=int(task_id), run_id=int(run_id))
+    with _LOCK:
+        item = items.get(_path_key(os.path.abspath(str(path))))
+    return _with_digest(item) if item is not None else None
+
+
+def get_run_written_paths(
+    *,
+    task_id: int,
+    run_id: int,
+    exclude_step_ids: Iterable[Optional[int]] = (),
+) -> Set[str]:
+    """当前 run 已通过 file_write/file_append 写入的路径（normcase 后的绝对路径）。"""
+    excluded = {int(item) for item in exclude_step_ids if item is not None}
+    items = _run_items(task_id=int(task_id), run_id=int(run_id))
+    with _LOCK:
+        if not excluded:
+            return set(items.keys())
+        return {key for key, item in items.items() if item.get("step_id") not in excluded}
+
+
+def reset_run_artifact_index() -> None:
+    with _LOCK:
+        _INDEX.clear()
+        _BACKFILLED.clear()
+        _DIGESTS.clear()
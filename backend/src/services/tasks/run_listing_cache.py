@@ -0,0 +1,124 @@
+"""
+run 级目录列举缓存：同一 run 内重复 file_list 同一目录（同参数）时直接复用上次结果。
+
+说明：
+- 命中前只 stat 上次遍历过的目录（目录内增删/改名会改变其 mtime），不重新列举；
+- file_write/file_append/file_delete 成功后按路径失效其所有祖先目录的列举
+  （覆盖写已有文件不改变目录 mtime，但会影响按 mtime 排序的结果）；
+  shell_command/tool_call 可能任意改动文件，执行后清空该 run 的缓存；
+- 进程内按 (db_path, run_id) 维护，最近活跃的 run 优先保留。
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional, Tuple
+
+from backend.src.common.dir_listing import DirListing, listing_still_valid
+from backend.src.constants import AGENT_FILE_LIST_CACHE_ENTRIES_PER_RUN
+from backend.src.storage import resolve_db_path
+
+_CACHE_MAX_RUNS = 256
+
+_RunKey = Tuple[str, int]
+_EntryKey = Tuple[str, Hashable]
+
+_LOCK = threading.Lock()
+_CACHE: "OrderedDict[_RunKey, OrderedDict[_EntryKey, DirListing]]" = OrderedDict()
+_STATS: Dict[str, int] = {"hits": 0, "misses": 0, "invalidations": 0}
+
+
+def _path_key(path: str) -> str:
+    return os.path.normcase(os.path.abspath(str(path)))
+
+
+def _run_key(run_id: int) -> _RunKey:
+    return resolve_db_path(), int(run_id)
+
+
+def get_cached_listing(*, run_id: int, root: str, params: Hashable) -> Optional[DirListing]:
+    key = (_path_key(root), params)
+    with _LOCK:
+        entries = _CACHE.get(_run_key(run_id))
+        listing = entries.get(key) if entries is not None else None
+        if listing is None:
+            _STATS["misses"] += 1
+            return None
+    if not listing_still_valid(listing.dir_mtimes):
+        with _LOCK:
+            entries = _CACHE.get(_run_key(run_id))
+            if entries is not None:
+                entries.pop(key, None)
+            _STATS["misses"] += 1
+        return None
+    with _LOCK:
+        _STATS["hits"] += 1
+        entries = _CACHE.get(_run_key(run_id))
+        if entries is not None and key in entries:
+            entries.move_to_end(key)
+    return listing
+
+
+def store_listing(*, run_id: int, root: str, params: Hashable, listing: DirListing) -> None:
+    capacity = int(AGENT_FILE_LIST_CACHE_ENTRIES_PER_RUN)
+    if capacity <= 0:
+        return
+    run_key = _run_key(run_id)
+    with _LOCK:
+        entries = _CACHE.get(run_key)
+        if entries is None:
+            entries = OrderedDict()
+            _CACHE[run_key] = entries
+        _CACHE.move_to_end(run_key)
+        entries[(_path_key(root), params)] = listing
+        entries.move_to_end((_path_key(root), params))
+        while len(entries) > capacity:
+            entries.popitem(last=False)
+        while len(_CACHE) > _CACHE_MAX_RUNS:
+            _CACHE.popitem(last=False)
+
+
+def invalidate_run_listings(*, run_id: int, path: Optional[str] = None) -> int:
+    """
+    失效 run 的列举缓存：path 为空时清空整个 run；否则失效 root 为 path 本身、其祖先或其子目录的条目。
+    返回失效条数。
+    """
+    run_key = _run_key(run_id)
+    with _LOCK:
+        entries = _CACHE.get(run_key)
+        if not entries:
+            return 0
+        if not path:
+            removed = len(entries)
+            _CACHE.pop(run_key, None)
+        else:
+            target = _path_key(path)
+            stale = [
+                key
+                for key in entries
+                if target == key[0]
+                or target.startswith(key[0].rstrip(os.sep) + os.sep)
+                or key[0].startswith(target.rstrip(os.sep) + os.sep)
+            ]
+            for key in stale:
+                entries.pop(key, None)
+            removed = len(stale)
+        _STATS["invalidations"] += removed
+        return removed
+
+
+def get_listing_cache_stats() -> Dict[str, int]:
+    with _LOCK:
+        stats = dict(_STATS)
+        stats["runs"] = len(_CACHE)
+        stats["entries"] = sum(len(entries) for entries in _CACHE.values())
+    return stats
+
+
+def reset_listing_cache() -> None:
+    with _LOCK:
+        _CACHE.clear()
+        for key in _STATS:
+            _STATS[key] = 0
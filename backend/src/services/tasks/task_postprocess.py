@@ -4,6 +4,11 @@ from typing import List, Optional, Tuple
 from backend.src.services.debug.safe_debug import safe_write_debug as _safe_write_debug
 from backend.src.services.graph.graph_extract import extract_graph_updates
 from backend.src.services.llm.llm_client import call_openai
+from backend.src.services.llm.llm_scheduler import (
+    LLM_PRIORITY_BACKFILL,
+    LLM_PRIORITY_POSTPROCESS,
+    llm_request_scope,
+)
 from backend.src.services.tasks.postprocess.backfill import (
     backfill_missing_agent_reviews as backfill_missing_agent_reviews_core,
 )
@@ -59,33 +64,37 @@ def ensure_agent_review_record(
     skills: Optional[list] = None,
     force: bool = False,
 ) -> Optional[int]:
-    return ensure_agent_review_record_core(
-        task_id=task_id,
-        run_id=run_id,
-        skills=skills,
-        force=force,
-        review_record_lock=_REVIEW_RECORD_LOCK,
-        allow_tool_approval_on_waiting_feedback_fn=_allow_tool_approval_on_waiting_feedback,
-        is_selftest_title_fn=_is_selftest_title,
-        extract_tool_name_from_tool_call_step_fn=_extract_tool_name_from_tool_call_step,
-        find_unverified_text_output_fn=_find_unverified_text_output,
-        call_openai_fn=call_openai,
-        safe_write_debug_fn=_safe_write_debug,
-    )
+    # 评估属于后处理：LLM 调用按 postprocess 排队，不与前台步骤抢槽位
+    with llm_request_scope(priority=LLM_PRIORITY_POSTPROCESS, run_id=run_id):
+        return ensure_agent_review_record_core(
+            task_id=task_id,
+            run_id=run_id,
+            skills=skills,
+            force=force,
+            review_record_lock=_REVIEW_RECORD_LOCK,
+            allow_tool_approval_on_waiting_feedback_fn=_allow_tool_approval_on_waiting_feedback,
+            is_selftest_title_fn=_is_selftest_title,
+            extract_tool_name_from_tool_call_step_fn=_extract_tool_name_from_tool_call_step,
+            find_unverified_text_output_fn=_find_unverified_text_output,
+            call_openai_fn=call_openai,
+            safe_write_debug_fn=_safe_write_debug,
+        )
 
 
 def backfill_missing_agent_reviews(*, limit: int = 10) -> dict:
-    return backfill_missing_agent_reviews_core(
-        ensure_agent_review_record_fn=ensure_agent_review_record,
-        limit=limit,
-    )
+    with llm_request_scope(priority=LLM_PRIORITY_BACKFILL):
+        return backfill_missing_agent_reviews_core(
+            ensure_agent_review_record_fn=ensure_agent_review_record,
+            limit=limit,
+        )
 
 
 def backfill_waiting_feedback_agent_reviews(*, limit: int = 10) -> dict:
-    return backfill_waiting_feedback_agent_reviews_core(
-        ensure_agent_review_record_fn=ensure_agent_review_record,
-        limit=limit,
-    )
+    with llm_request_scope(priority=LLM_PRIORITY_BACKFILL):
+        return backfill_waiting_feedback_agent_reviews_core(
+            ensure_agent_review_record_fn=ensure_agent_review_record,
+            limit=limit,
+        )
 
 
 def write_task_result_memory_if_missing(
@@ -115,14 +124,16 @@ def postprocess_task_run(
     run_id: int,
     run_status: str,
 ) -> Tuple[Optional[dict], Optional[dict], Optional[dict]]:
-    return postprocess_task_run_core(
-        task_row=task_row,
-        task_id=task_id,
-        run_id=run_id,
-        run_status=run_status,
-        ensure_agent_review_record_fn=ensure_agent_review_record,
-        safe_write_debug_fn=_safe_write_debug,
-        extract_graph_updates_fn=extract_graph_updates,
-        write_task_result_memory_if_missing_fn=write_task_result_memory_if_missing,
-        resolve_default_model_fn=_resolve_default_model,
-    )
+    # 评估/技能沉淀/图谱抽取等后处理 LLM 调用统一按 postprocess 排队
+    with llm_request_scope(priority=LLM_PRIORITY_POSTPROCESS, run_id=run_id):
+        return postprocess_task_run_core(
+            task_row=task_row,
+            task_id=task_id,
+            run_id=run_id,
+            run_status=run_status,
+            ensure_agent_review_record_fn=ensure_agent_review_record,
+            safe_write_debug_fn=_safe_write_debug,
+            extract_graph_updates_fn=extract_graph_updates,
+            write_task_result_memory_if_missing_fn=write_task_result_memory_if_missing,
+            resolve_default_model_fn=_resolve_default_model,
+        )
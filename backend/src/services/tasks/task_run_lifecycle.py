@@ -18,6 +18,7 @@ from backend.src.constants import (
     STATUS_STOPPED,
     STATUS_WAITING,
 )
+from backend.src.repositories.run_summaries_repo import refresh_run_summary
 from backend.src.repositories.task_runs_repo import get_task_run, update_task_run
 from backend.src.repositories.task_runs_repo import create_task_run as create_task_run_record
 from backend.src.repositories.tasks_repo import create_task as create_task_record
@@ -252,6 +253,12 @@ def enqueue_postprocess_thread(*, task_id: int, run_id: int, run_status: object)
                 level="warning",
             )
             return
+        finally:
+            # 后处理（评估/沉淀）也会产生 llm_records：收尾时刷新预计算汇总，保证 tokens 口径完整
+            try:
+                refresh_run_summary(run_id=int(run_id))
+            except Exception as exc:
+                logger.warning("refresh run summary failed: run_id=%s err=%s", run_id, exc)
 
     _run_worker_in_test_or_thread(_worker)
 
@@ -13,6 +13,7 @@ from backend.src.repositories.tool_call_records_repo import list_tool_calls_with
 from backend.src.repositories.tools_repo import get_tool, update_tool
 from backend.src.services.debug.safe_debug import safe_write_debug as _safe_write_debug
 from backend.src.services.skills.tool_skill_autogen import autogen_tool_skill_from_call
+from backend.src.services.tools.tool_registry_cache import refresh_compiled_tool
 from backend.src.services.tools.tools_store import publish_tool_file
 from backend.src.storage import get_connection
 
@@ -131,6 +132,10 @@ def approve_draft_tools_from_run(
             except Exception:
                 pass
 
+    # 事务提交后再失效一次编译工具表（审批状态已变化，避免并发读到提交前的旧状态）
+    for item in approved_tools:
+        refresh_compiled_tool(tool_id=int(item["tool_id"]), name=str(item.get("name") or ""))
+
     # 额外沉淀：批准后再总结 tool skill（失败不阻塞）
     for tid in approved_ids:
         ex = examples.get(int(tid)) or {}
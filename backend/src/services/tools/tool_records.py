@@ -31,6 +31,7 @@ from backend.src.repositories.tools_repo import (
     update_tool_last_used_at,
 )
 from backend.src.services.common.coerce import to_int, to_text
+from backend.src.services.tools.tool_registry_cache import refresh_compiled_tools_after_commit
 from backend.src.services.tools.tools_store import publish_tool_file
 from backend.src.storage import get_connection
 
@@ -239,4 +240,7 @@ def create_tool_record(payload: Any) -> dict:
         )
         update_tool_last_used_at(tool_id=to_int(tool_id), last_used_at=created_at, conn=conn)
         row = get_tool_call_record(record_id=to_int(record_id), conn=conn)
+    if tool_id is not None and tool_changed:
+        # 提交后按最新记录再校验一次编译工具表（落盘时的校验发生在事务内）
+        refresh_compiled_tools_after_commit([to_int(tool_id)])
     return {"record": tool_call_from_row(row)}
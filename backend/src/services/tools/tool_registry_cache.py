@@ -0,0 +1,270 @@
+"""
+tool_call 编译工具表（进程内）：按 id / name 缓存已解析的 metadata、归一化后的 exec 定义、
+审批状态，tool_call 派发时不再每次查库 + JSON 解析 + 归一化（命令切分由 tokenize_command_template 按文本缓存）。
+
+说明：
+- 失效时机：tools_store 落盘/同步、工具审批、工具删除；落盘发生在调用方事务内，提交后调用方需再用
+  refresh_compiled_tools_after_commit 按已提交的行校验一次（避免提交前被并发读取回填旧行）；落盘时比较“编译指纹”（name/exec/approval），
+  只有影响派发的字段变化才丢弃条目（tool_call 每次回写 input/output 样例不会导致缓存失效）；
+- 未找到的工具也会缓存（负缓存），新建工具落盘时按 name 丢弃；
+- AGENT_COORDINATION_BACKEND 非 local（多进程共享库）时其他进程的写入无法通知到本进程，直接读库不缓存。
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import shlex
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterable, Optional, Tuple, Union
+
+from backend.src.common.utils import parse_json_dict, tool_approval_status
+from backend.src.constants import AGENT_COORDINATION_BACKEND, TOOL_METADATA_APPROVAL_KEY
+from backend.src.repositories.tools_repo import get_tool, get_tool_by_name
+from backend.src.storage import resolve_db_path
+
+# 命令 token 模板缓存条数（按命令文本，跨工具共享）
+_TOKENIZE_CACHE_SIZE = 512
+
+
+def normalize_exec_spec(exec_spec: dict) -> dict:
+    """
+    tool_metadata.exec 兼容归一化：
+    - 常见别名：shell -> command，timeout -> timeout_ms
+    - args 可能被模型输出成字符串：转为 command
+    - command 可能被模型输出成 list：转为 args
+
+    约定：最终使用字段
+    - type: "shell"（可省略，若提供了 command/args 会自动按 shell 执行）
+    - command: str 或 args: list[str]
+    - timeout_ms: int（可选）
+    - workdir: str（建议必填）
+    """
+    if not isinstance(exec_spec, dict):
+        return {}
+    spec = dict(exec_spec)
+
+    # 常见别名：shell -> command
+    shell_value = spec.get("shell")
+    if (
+        isinstance(shell_value, str)
+        and shell_value.strip()
+        and not spec.get("command")
+    ):
+        spec["command"] = shell_value.strip()
+
+    # args: str -> command
+    args_value = spec.get("args")
+    if isinstance(args_value, str) and args_value.strip():
+        if not spec.get("command"):
+            spec["command"] = args_value.strip()
+        spec.pop("args", None)
+
+    # command: list -> args
+    cmd_value = spec.get("command")
+    if isinstance(cmd_value, list) and cmd_value:
+        existing_args = spec.get("args")
+        if isinstance(existing_args, list) and existing_args:
+            # 兼容：模型可能同时输出 command(list) + args(list)。这里把两者拼接成“完整命令 token 列表”，
+            # 避免丢失 command(list) 导致仅执行 args（常见错误：args=["GC=F"] -> [WinError 2]）。
+            spec["args"] = [str(v) for v in cmd_value] + [str(v) for v in existing_args]
+        else:
+            spec["args"] = [str(v) for v in cmd_value]
+        spec.pop("command", None)
+
+    # timeout: 兼容字段；若 < 1000 认为是秒，否则认为是毫秒
+    if spec.get("timeout_ms") is None and spec.get("timeout") is not None:
+        value = spec.get("timeout")
+        try:
+            num = float(value)
+            spec["timeout_ms"] = int(num * 1000) if 0 < num < 1000 else int(num)
+        except Exception:
+            pass
+
+    return spec
+
+
+def has_nonempty_exec_spec(spec: dict) -> bool:
+    """判断 exec_spec 是否包含有效内容（兼容模型输出空 exec {}）。"""
+    return bool(
+        str(spec.get("type") or "").strip()
+        or (isinstance(spec.get("args"), list) and spec.get("args"))
+        or str(spec.get("command") or "").strip()
+    )
+
+
+@lru_cache(maxsize=_TOKENIZE_CACHE_SIZE)
+def tokenize_command_template(text: str) -> Tuple[str, ...]:
+    """
+    把 exec.command 文本切分为 token 模板（{input} 占位符保留，由调用方替换）。
+
+    Windows 下剥离最外层引号（参见 services/execution/shell_command.py），否则 python -c 会把代码当作字符串字面量。
+    """
+    tokens = shlex.split(text, posix=os.name != "nt")
+    if os.name == "nt":
+        cleaned = []
+        for item in tokens:
+            s = str(item)
+            if len(s) >= 2 and ((s[0] == s[-1] == '"') or (s[0] == s[-1] == "'")):
+                s = s[1:-1]
+            cleaned.append(s)
+        tokens = cleaned
+    return tuple(str(token) for token in tokens)
+
+
+@dataclass(frozen=True)
+class CompiledTool:
+    tool_id: int
+    name: str
+    # 解析后的 metadata（只读；指纹未变时不刷新，input/output 样例等字段可能滞后）
+    metadata: dict
+    # 归一化后的 exec（无有效 exec 时为 None）
+    exec_spec: Optional[dict]
+    approval_status: str
+    fingerprint: str
+
+
+def _compile_tool_row(row) -> CompiledTool:
+    metadata = parse_json_dict(row["metadata"]) or {}
+    exec_spec: Optional[dict] = None
+    raw_exec = metadata.get("exec")
+    if isinstance(raw_exec, dict):
+        normalized = normalize_exec_spec(raw_exec)
+        if has_nonempty_exec_spec(normalized):
+            exec_spec = normalized
+    approval_status = tool_approval_status(metadata, approval_key=TOOL_METADATA_APPROVAL_KEY)
+    name = str(row["name"] or "")
+    fingerprint = json.dumps(
+        [name, exec_spec, approval_status],
+        ensure_ascii=False,
+        sort_keys=True,
+        default=str,
+    )
+    return CompiledTool(
+        tool_id=int(row["id"]),
+        name=name,
+        metadata=metadata,
+        exec_spec=exec_spec,
+        approval_status=approval_status,
+        fingerprint=fingerprint,
+    )
+
+
+_CacheKey = Tuple[str, str, Union[int, str]]
+
+_LOCK = threading.Lock()
+_ENTRIES: Dict[_CacheKey, Optional[CompiledTool]] = {}
+_STATS: Dict[str, int] = {"hits": 0, "misses": 0, "invalidations": 0}
+
+
+def _use_cache() -> bool:
+    return AGENT_COORDINATION_BACKEND == "local"
+
+
+def get_compiled_tool(*, tool_id: Optional[int] = None, name: Optional[str] = None) -> Optional[CompiledTool]:
+    """
+    按 tool_id（优先）或 name 取编译后的工具；name 的选择规则与 tools_repo.get_tool_by_name 一致。
+    """
+    if tool_id is not None:
+        key: _CacheKey = (resolve_db_path(), "id", int(tool_id))
+    elif name:
+        key = (resolve_db_path(), "name", str(name))
+    else:
+        return None
+
+    use_cache = _use_cache()
+    if use_cache:
+        with _LOCK:
+            if key in _ENTRIES:
+                _STATS["hits"] += 1
+                return _ENTRIES[key]
+            _STATS["misses"] += 1
+
+    row = get_tool(tool_id=int(tool_id)) if tool_id is not None else get_tool_by_name(name=str(name))
+    compiled = _compile_tool_row(row) if row else None
+    if use_cache:
+        with _LOCK:
+            _ENTRIES[key] = compiled
+            if compiled is not None and key[1] == "name":
+                _ENTRIES.setdefault((key[0], "id", compiled.tool_id), compiled)
+    return compiled
+
+
+def refresh_compiled_tool(*, tool_id: int, name: Optional[str] = None, row=None) -> bool:
+    """
+    工具写入后的失效钩子：
+    - 传入写入后的 row：只有编译指纹变化（或同名解析可能改变）时才丢弃条目；
+    - 未传 row（删除等）：无条件丢弃该 id 与 name 的条目。
+    返回是否丢弃了条目。
+    """
+    compiled = None
+    if row is not None:
+        try:
+            compiled = _compile_tool_row(row)
+        except Exception:
+            compiled = None
+        name = name or (compiled.name if compiled else None)
+    db_path = resolve_db_path()
+    name_key: Optional[_CacheKey] = (db_path, "name", str(name)) if name else None
+    stale = []
+    with _LOCK:
+        for key, cached in _ENTRIES.items():
+            if key[0] != db_path:
+                continue
+            if key == name_key:
+                # 同名解析可能切换到另一条记录（新建/审批），不是同一条就丢弃
+                unchanged = (
+                    compiled is not None
+                    and cached is not None
+                    and cached.tool_id == compiled.tool_id
+                    and cached.fingerprint == compiled.fingerprint
+                )
+            elif cached is not None and cached.tool_id == int(tool_id):
+                # id 条目，以及按旧名称缓存到该工具的条目（改名）
+                unchanged = compiled is not None and cached.fingerprint == compiled.fingerprint
+            elif key == (db_path, "id", int(tool_id)):
+                # 负缓存的 id
+                unchanged = False
+            else:
+                continue
+            if not unchanged:
+                stale.append(key)
+        for key in stale:
+            _ENTRIES.pop(key, None)
+        _STATS["invalidations"] += len(stale)
+    return bool(stale)
+
+
+def invalidate_tool_registry_cache() -> None:
+    with _LOCK:
+        _STATS["invalidations"] += len(_ENTRIES)
+        _ENTRIES.clear()
+
+
+def get_tool_registry_cache_stats() -> Dict[str, int]:
+    with _LOCK:
+        stats = {key: int(value) for key, value in _STATS.items()}
+        stats["entries"] = len(_ENTRIES)
+    return stats
+
+
+def reset_tool_registry_cache() -> None:
+    with _LOCK:
+        _ENTRIES.clear()
+        for key in list(_STATS.keys()):
+            _STATS[key] = 0
+
+
+def refresh_compiled_tools_after_commit(tool_ids: Iterable[int]) -> None:
+    """
+    写入事务提交后的再校验：按已提交的行刷新（行不存在时丢弃）。
+
+    publish_tool_file 在调用方事务内失效条目，提交前并发的 tool_call 可能读到旧的已提交行并重新缓存。
+    """
+    for tool_id in dict.fromkeys(int(item) for item in tool_ids or []):
+        try:
+            refresh_compiled_tool(tool_id=tool_id, row=get_tool(tool_id=tool_id))
+        except Exception:
+            pass
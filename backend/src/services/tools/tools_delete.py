@@ -13,6 +13,7 @@ from backend.src.services.common.staged_delete_utils import (
     resolve_staged_paths,
     staged_delete_file_result,
 )
+from backend.src.services.tools.tool_registry_cache import refresh_compiled_tool
 from backend.src.services.tools.tools_store import stage_delete_tool_file_by_source_path, tool_file_path_from_source_path
 from backend.src.storage import get_connection
 
@@ -53,6 +54,8 @@ def delete_tool_strong(tool_id: int) -> Dict[str, Any]:
             restore_staged_file(original_path=target_path, trash_path=trash_path)
         raise
 
+    refresh_compiled_tool(tool_id=int(tool_id), name=str(existing["name"] or ""))
+
     finalize_err = None
     if trash_path:
         finalize_err = finalize_staged_delete(trash_path=trash_path)
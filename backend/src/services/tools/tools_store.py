@@ -3,7 +3,7 @@ from __future__ import annotations
 import json
 import logging
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 from backend.src.common.path_utils import is_path_within_root
 from backend.src.common.utils import (
@@ -18,6 +18,15 @@ from backend.src.prompt.file_trash import stage_delete_file
 from backend.src.prompt.paths import tools_prompt_dir
 from backend.src.prompt.skill_files import parse_skill_markdown
 from backend.src.prompt.skill_files import slugify_filename
+from backend.src.services.common.file_manifest import (
+    FILE_SYNC_KIND_TOOLS,
+    FileManifestScan,
+    ManifestFile,
+    existing_paths_under,
+    save_file_manifest,
+    scan_file_manifest,
+)
+from backend.src.services.tools.tool_registry_cache import invalidate_tool_registry_cache, refresh_compiled_tool
 from backend.src.storage import get_connection
 
 logger = logging.getLogger(__name__)
@@ -55,6 +64,8 @@ def publish_tool_file(
     row = conn.execute("SELECT * FROM tools_items WHERE id = ? LIMIT 1", (int(tool_id),)).fetchone()
     if not row:
         return {"ok": False, "error": "tool_not_found"}
+    # 编译工具表：只有 name/exec/approval 变化才丢弃（样例回写等不影响派发）
+    refresh_compiled_tool(tool_id=int(row["id"]), row=row)
 
     meta = {
         "id": int(row["id"]),
@@ -115,7 +126,19 @@ def stage_delete_tool_file_by_source_path(source_path: Optional[str]) -> Tuple[O
     return rel, None
 
 
-def sync_tools_from_files(base_dir: Optional[Path] = None, *, prune: bool = True) -> dict:
+def _mark_tool_synced(scan: FileManifestScan, entries_by_rel: Dict[str, ManifestFile], source_path: str) -> None:
+    entry = entries_by_rel.get(source_path)
+    if entry is not None:
+        scan.mark_synced(entry, source_path)
+
+
+def sync_tools_from_files(
+    base_dir: Optional[Path] = None,
+    *,
+    prune: bool = True,
+    incremental: bool = False,
+    changed_paths: Optional[Iterable[Path]] = None,
+) -> dict:
     """
     将 backend/prompt/tools 下的工具文件同步到 SQLite（tools_items）。
 
@@ -124,27 +147,41 @@ def sync_tools_from_files(base_dir: Optional[Path] = None, *, prune: bool = True
     - 若 meta.id 存在，则优先用 id 定位（用于“保留 tool_id，避免 skills.scope=tool:{id} 失效”）
     - prune=True：DB 中 source_path 存在但文件不存在 -> 删除 DB 记录（强一致删除）
     - 会自动“补齐未跟踪的历史 DB 工具”：source_path 为空的行会落盘文件（便于后续恢复）
+    - incremental=True 时只解析 file_sync_manifest 中 mtime/size/hash 有变化的文件（启动同步使用）
+    - changed_paths：只同步这些文件（文件监听传入），prune 也只删除其中已不存在的文件对应的记录
     """
     base = base_dir or tools_prompt_dir()
     base.mkdir(parents=True, exist_ok=True)
+    scope = list(changed_paths) if changed_paths is not None else None
 
     errors: List[str] = []
-    discovered_source_paths = set()
     parsed_items: List[Tuple[str, Dict[str, Any]]] = []
 
-    for path in discover_markdown_files(base):
-        try:
-            rel = str(path.relative_to(base)).replace("\\", "/")
-        except Exception:
-            rel = path.name
-        discovered_source_paths.add(rel)
+    scan = scan_file_manifest(
+        kind=FILE_SYNC_KIND_TOOLS,
+        base_dir=base,
+        paths=discover_markdown_files(base) if scope is None else existing_paths_under(base, scope),
+        incremental=incremental,
+        scope=scope,
+    )
+    if scan.unchanged:
+        with get_connection() as conn:
+            rows = conn.execute(
+                "SELECT source_path FROM tools_items WHERE source_path IS NOT NULL AND source_path != ''"
+            ).fetchall()
+        scan.requeue_missing({str(row["source_path"]) for row in rows})
+
+    discovered_source_paths = {entry.rel for entry in scan.files}
+    entries_by_rel: Dict[str, ManifestFile] = {}
+    for entry in scan.changed:
         try:
-            text = path.read_text(encoding="utf-8")
-            parsed = parse_skill_markdown(text=text, source_path=rel)
+            text = entry.read_text()
+            parsed = parse_skill_markdown(text=text, source_path=entry.rel)
             meta = parsed.meta or {}
-            parsed_items.append((rel, meta))
+            parsed_items.append((entry.rel, meta))
+            entries_by_rel[entry.rel] = entry
         except Exception as exc:
-            errors.append(f"{path}: {exc}")
+            errors.append(f"{entry.path}: {exc}")
             continue
 
     inserted = 0
@@ -195,6 +232,7 @@ def sync_tools_from_files(base_dir: Optional[Path] = None, *, prune: bool = True
                         ),
                     )
                     updated += 1
+                    _mark_tool_synced(scan, entries_by_rel, source_path)
                     continue
 
                 # 新插入：显式指定 id（确保恢复后 skill.scope=tool:{id} 仍有效）
@@ -213,6 +251,7 @@ def sync_tools_from_files(base_dir: Optional[Path] = None, *, prune: bool = True
                     ),
                 )
                 inserted += 1
+                _mark_tool_synced(scan, entries_by_rel, source_path)
                 continue
 
             row = conn.execute(
@@ -247,6 +286,7 @@ def sync_tools_from_files(base_dir: Optional[Path] = None, *, prune: bool = True
                     ),
                 )
                 inserted += 1
+            _mark_tool_synced(scan, entries_by_rel, source_path)
 
         # 2) DB -> 文件：补齐未跟踪（source_path 为空）的历史工具，便于后续恢复
         rows = conn.execute(
@@ -258,7 +298,7 @@ def sync_tools_from_files(base_dir: Optional[Path] = None, *, prune: bool = True
                 published += 1
 
         # 3) prune：文件不存在 -> 删除 DB 记录（仅对有 source_path 的行生效）
-        if prune:
+        if prune and (scope is None or scan.removed_keys):
             rows = conn.execute(
                 "SELECT id, source_path FROM tools_items WHERE source_path IS NOT NULL AND source_path != ''"
             ).fetchall()
@@ -268,9 +308,16 @@ def sync_tools_from_files(base_dir: Optional[Path] = None, *, prune: bool = True
                     continue
                 if sp in discovered_source_paths:
                     continue
+                if scope is not None and sp not in scan.removed_keys:
+                    continue
                 conn.execute("DELETE FROM tools_items WHERE id = ?", (int(row["id"]),))
                 deleted += 1
 
+        save_file_manifest(scan, conn=conn)
+
+    if inserted or updated or deleted:
+        invalidate_tool_registry_cache()
+
     if errors:
         for err in errors[:5]:
             logger.warning("tool file load error: %s", err)
@@ -282,5 +329,6 @@ def sync_tools_from_files(base_dir: Optional[Path] = None, *, prune: bool = True
         "deleted": deleted,
         "published": published,
         "prune": bool(prune),
+        "manifest": scan.summary(),
         "errors": errors,
     }
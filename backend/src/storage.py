@@ -14,6 +14,7 @@ from contextlib import contextmanager
 from pathlib import Path
 from typing import Iterator, Optional
 
+from backend.src.common.resource_versions import TrackedConnection, WriteTracker
 from backend.src.constants import (
     DB_ENV_VAR,
     DB_RELATIVE_PATH,
@@ -115,12 +116,18 @@ def _open_connection(db_path: str) -> Iterator[sqlite3.Connection]:
     #
     # 说明：并行调度执行器会产生“多线程多连接写入”；这里适度提高等待窗口，
     # 避免短暂锁争用直接变成步骤失败（由上层触发反思/重试会更慢且更不稳定）。
-    conn = sqlite3.connect(db_path, timeout=15.0, uri=is_uri)
+    conn = sqlite3.connect(db_path, timeout=15.0, uri=is_uri, factory=TrackedConnection)
     conn.row_factory = sqlite3.Row
     try:
         conn.execute("PRAGMA busy_timeout = 15000")
     except Exception as exc:
         logger.warning("set PRAGMA busy_timeout failed: %s", exc, exc_info=True)
+    # 写入追踪：每次提交后按被写的表递增资源族版本号（供轮询接口 ETag/304 使用）
+    tracker = WriteTracker()
+    try:
+        tracker.install(conn)
+    except Exception as exc:
+        logger.warning("install write tracker failed: %s", exc, exc_info=True)
     try:
         yield conn
         conn.commit()
@@ -0,0 +1,383 @@
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    try:
+        with open(f"/proc/{pid}/stat", "r", encoding="utf-8") as handle:
+            return handle.read().split(")")[-1].split()[0] != "Z"
+    except OSError:
+        return True
+
+
+class TestLLMAsyncConcurrencyGuard(unittest.IsolatedAsyncioTestCase):
+    async def test_cancelled_call_releases_slot(self):
+        import backend.src.services.llm.llm_client as llm_client
+
+        with patch.object(llm_client, "AGENT_LLM_MAX_CONCURRENCY_GLOBAL", 1), patch.object(
+            llm_client, "AGENT_LLM_MAX_CONCURRENCY_PER_MODEL", 1
+        ):
+            llm_client._LLM_CONCURRENCY_STATE["global_limit"] = None
+            llm_client._LLM_CONCURRENCY_STATE["per_model_limit"] = None
+
+            entered = asyncio.Event()
+
+            async def _hold():
+                async with llm_client._llm_concurrency_guard_async("openai:fake"):
+                    entered.set()
+                    await asyncio.sleep(30)
+
+            task = asyncio.create_task(_hold())
+            await asyncio.wait_for(entered.wait(), timeout=2)
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+            # 槽位已归还：第二次进入不应阻塞
+            async def _enter():
+                async with llm_client._llm_concurrency_guard_async("openai:fake"):
+                    return True
+
+            self.assertTrue(await asyncio.wait_for(_enter(), timeout=1))
+            _, _, global_adaptive, model_adaptive = llm_client._get_llm_concurrency_semaphores(
+                provider_model_key="openai:fake"
+            )
+            self.assertEqual(global_adaptive.in_flight, 0)
+            self.assertEqual(model_adaptive.in_flight, 0)
+
+            llm_client._LLM_CONCURRENCY_STATE["global_limit"] = None
+            llm_client._LLM_CONCURRENCY_STATE["per_model_limit"] = None
+
+
+@unittest.skipIf(os.name == "nt", "进程组 kill 仅在 POSIX 下验证")
+class TestRunShellCommandViaLoopBridge(unittest.IsolatedAsyncioTestCase):
+    """run_shell_command 在 LoopBridge 上下文中（AGENT_REACT_ASYNC_EXECUTION）改由 event loop 等待子进程。"""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self._patches = [
+            patch("backend.src.services.execution.shell_command.has_exec_permission", return_value=True),
+            # 走到线程版即失败：确认子进程确实交给了 event loop
+            patch(
+                "backend.src.services.execution.shell_command.run_process_streaming",
+                side_effect=AssertionError("应走 run_process_streaming_async"),
+            ),
+        ]
+        for item in self._patches:
+            item.start()
+
+    def tearDown(self):
+        for item in self._patches:
+            item.stop()
+        self._tmp.cleanup()
+
+    def _start(self, bridge, payload: dict):
+        """模拟 ReAct 工作线程：经桥提交的协程把同步 executor 放进线程（与 execute_step_action_async 的回退路径一致）。"""
+        from backend.src.services.execution.shell_command import run_shell_command
+
+        box: dict = {}
+
+        def _executor():
+            box["result"] = run_shell_command(payload)
+
+        async def _submit():
+            try:
+                await asyncio.to_thread(bridge.run, lambda: asyncio.to_thread(_executor))
+            except BaseException as exc:  # noqa: BLE001
+                box["outer_error"] = exc
+
+        return box, asyncio.create_task(_submit())
+
+    def _write_spawn_script(self) -> tuple:
+        pid_file = os.path.join(self._tmp.name, "child.pid")
+        script = os.path.join(self._tmp.name, "spawn.py")
+        with open(script, "w", encoding="utf-8") as handle:
+            handle.write(
+                "import subprocess, sys, time\n"
+                "child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(30)'])\n"
+                f"open({pid_file!r}, 'w').write(str(child.pid))\n"
+                "time.sleep(30)\n"
+            )
+        return script, pid_file
+
+    async def _assert_process_gone(self, pid: int) -> None:
+        # 孙进程也应随进程组一起被结束（给内核一点回收时间；孤儿进程可能短暂停留为 zombie）
+        for _ in range(50):
+            if not _process_alive(pid):
+                return
+            await asyncio.sleep(0.05)
+        self.fail("孙进程仍存活")
+
+    async def test_returns_output_like_sync_version(self):
+        from backend.src.common.async_bridge import LoopBridge
+
+        bridge = LoopBridge(asyncio.get_running_loop())
+        box, task = self._start(
+            bridge,
+            {"command": [sys.executable, "-c", "import sys; print(sys.stdin.read().upper())"], "workdir": self._tmp.name, "stdin": "hi"},
+        )
+        await asyncio.wait_for(task, timeout=10)
+
+        result, error = box["result"]
+        self.assertIsNone(error)
+        self.assertTrue(result["ok"])
+        self.assertEqual(result["stdout"].strip(), "HI")
+
+    async def test_timeout_kills_whole_process_group(self):
+        from backend.src.common.async_bridge import LoopBridge
+
+        script, pid_file = self._write_spawn_script()
+        bridge = LoopBridge(asyncio.get_running_loop())
+        started = time.monotonic()
+        box, task = self._start(bridge, {"command": [sys.executable, script], "workdir": self._tmp.name, "timeout_ms": 1500})
+        await asyncio.wait_for(task, timeout=10)
+
+        result, error = box["result"]
+        self.assertIsNone(error)
+        self.assertEqual(result["stderr"], "timeout")
+        self.assertLess(time.monotonic() - started, 10)
+        with open(pid_file, "r", encoding="utf-8") as handle:
+            await self._assert_process_gone(int(handle.read().strip()))
+
+    async def test_bridge_close_kills_running_process_group(self):
+        from backend.src.common.async_bridge import LoopBridge
+        from backend.src.constants import ERROR_MESSAGE_ACTION_CANCELLED
+
+        script, pid_file = self._write_spawn_script()
+        bridge = LoopBridge(asyncio.get_running_loop())
+        box, task = self._start(bridge, {"command": [sys.executable, script], "workdir": self._tmp.name})
+        for _ in range(100):
+            if os.path.exists(pid_file) and os.path.getsize(pid_file) > 0:
+                break
+            await asyncio.sleep(0.05)
+        with open(pid_file, "r", encoding="utf-8") as handle:
+            child_pid = int(handle.read().strip())
+
+        # 模拟流结束（客户端断开/外部停止）：mode_do_runner 的 finally 会调用 close()
+        self.assertGreaterEqual(bridge.close(), 1)
+        await asyncio.wait_for(task, timeout=10)
+        for _ in range(100):
+            if "result" in box:
+                break
+            await asyncio.sleep(0.05)
+
+        result, error = box["result"]
+        self.assertIsNone(result)
+        self.assertIn(ERROR_MESSAGE_ACTION_CANCELLED, error)
+        await self._assert_process_gone(child_pid)
+
+
+class TestReactLoopAsyncExecution(unittest.IsolatedAsyncioTestCase):
+    """真实 ReAct 循环 + mode_do_runner：开启异步执行后步骤动作与 LLM 调用在 SSE 流的 event loop 上运行。"""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        os.environ["AGENT_DB_PATH"] = os.path.join(self._tmp.name, "agent_test.db")
+        os.environ["AGENT_PROMPT_ROOT"] = os.path.join(self._tmp.name, "prompt")
+
+        import backend.src.storage as storage
+
+        storage.init_db()
+
+    def tearDown(self):
+        os.environ.pop("AGENT_DB_PATH", None)
+        os.environ.pop("AGENT_PROMPT_ROOT", None)
+        self._tmp.cleanup()
+
+    def _create_task_and_run(self):
+        from backend.src.common.utils import now_iso
+        from backend.src.constants import RUN_STATUS_RUNNING, STATUS_RUNNING
+        from backend.src.storage import get_connection
+
+        created_at = now_iso()
+        with get_connection() as conn:
+            cursor = conn.execute(
+                "INSERT INTO tasks (title, status, created_at, expectation_id, started_at, finished_at) VALUES (?, ?, ?, ?, ?, ?)",
+                ("test", STATUS_RUNNING, created_at, None, created_at, None),
+            )
+            task_id = int(cursor.lastrowid)
+            cursor = conn.execute(
+                "INSERT INTO task_runs (task_id, status, summary, started_at, finished_at, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (task_id, RUN_STATUS_RUNNING, "agent_command_react", created_at, None, created_at, created_at),
+            )
+            run_id = int(cursor.lastrowid)
+        return task_id, run_id
+
+    def _config(self, task_id: int, run_id: int, messages: list):
+        from backend.src.agent.core.plan_structure import PlanStructure
+        from backend.src.agent.runner.mode_do_runner import DoExecutionConfig
+
+        return DoExecutionConfig(
+            task_id=task_id,
+            run_id=run_id,
+            message="总结一句话",
+            workdir=self._tmp.name,
+            model="base-model",
+            parameters={},
+            tools_hint="(无)",
+            skills_hint="(无)",
+            memories_hint="(无)",
+            graph_hint="(无)",
+            agent_state={},
+            context={"last_llm_response": None},
+            observations=[],
+            start_step_order=1,
+            variables_source="test",
+            yield_func=messages.append,
+            plan_struct=PlanStructure.from_legacy(
+                plan_titles=["llm_call:总结一句话"],
+                plan_items=[{"id": 1, "brief": "总结", "status": "pending"}],
+                plan_allows=[["llm_call"]],
+                plan_artifacts=[],
+            ),
+            poll_interval_seconds=0.05,
+            async_execution=True,
+        )
+
+    def _llm_records(self, run_id: int) -> list:
+        from backend.src.storage import get_connection
+
+        with get_connection() as conn:
+            rows = conn.execute("SELECT status, error FROM llm_records WHERE run_id = ? ORDER BY id", (int(run_id),)).fetchall()
+        return [(row["status"], row["error"]) for row in rows]
+
+    async def test_step_action_and_llm_calls_run_on_stream_loop(self):
+        import threading
+
+        from backend.src.agent.runner.mode_do_runner import _run_do_mode_execution_impl
+        from backend.src.constants import RUN_STATUS_DONE
+
+        action = '{"action": {"type": "llm_call", "payload": {"prompt": "用一句话总结"}}}'
+        loop_thread_id = threading.get_ident()
+        call_threads: list = []
+
+        async def _fake_call_llm_async(prompt, model, parameters, provider=None):
+            call_threads.append(threading.get_ident())
+            await asyncio.sleep(0)
+            return (action if len(call_threads) == 1 else "一句话总结"), {"prompt": 1, "completion": 1, "total": 2}
+
+        task_id, run_id = self._create_task_and_run()
+        messages: list = []
+        with patch("backend.src.services.llm.llm_calls.call_llm_async", side_effect=_fake_call_llm_async), patch(
+            "backend.src.services.llm.llm_calls.call_llm",
+            side_effect=AssertionError("异步执行不应走同步 call_llm"),
+        ):
+            result = await asyncio.wait_for(_run_do_mode_execution_impl(self._config(task_id, run_id, messages)), timeout=30)
+
+        self.assertEqual(result.run_status, RUN_STATUS_DONE)
+        # action 生成 + llm_call 步骤执行：两次调用都在 event loop 线程上 await
+        self.assertEqual(call_threads, [loop_thread_id, loop_thread_id])
+        self.assertEqual(self._llm_records(run_id), [("success", None), ("success", None)])
+
+    async def test_no_thread_started_per_step(self):
+        import threading
+
+        from backend.src.agent.core.plan_structure import PlanStructure
+        from backend.src.agent.runner.mode_do_runner import _run_do_mode_execution_impl
+        from backend.src.constants import RUN_STATUS_DONE
+
+        action = '{"action": {"type": "llm_call", "payload": {"prompt": "用一句话总结"}}}'
+        calls = {"count": 0}
+
+        async def _fake_call_llm_async(prompt, model, parameters, provider=None):
+            calls["count"] += 1
+            return (action if calls["count"] % 2 == 1 else "一句话总结"), {"prompt": 1, "completion": 1, "total": 2}
+
+        task_id, run_id = self._create_task_and_run()
+        messages: list = []
+        config = self._config(task_id, run_id, messages)
+        config.plan_struct = PlanStructure.from_legacy(
+            plan_titles=[f"llm_call:总结第{idx}段" for idx in range(1, 4)],
+            plan_items=[{"id": idx, "brief": "总结", "status": "pending"} for idx in range(1, 4)],
+            plan_allows=[["llm_call"] for _ in range(3)],
+            plan_artifacts=[],
+        )
+
+        started_names: list = []
+        original_start = threading.Thread.start
+
+        def _spy_start(thread):
+            started_names.append(thread.name)
+            return original_start(thread)
+
+        with patch("backend.src.services.llm.llm_calls.call_llm_async", side_effect=_fake_call_llm_async), patch.object(
+            threading.Thread, "start", _spy_start
+        ):
+            result = await asyncio.wait_for(_run_do_mode_execution_impl(config), timeout=30)
+
+        self.assertEqual(result.run_status, RUN_STATUS_DONE)
+        self.assertEqual(calls["count"], 6)
+        # 循环以协程方式跑在 event loop 上：不起泵线程/桥接线程，只会复用 loop 默认线程池（落库等阻塞操作）
+        self.assertEqual([name for name in started_names if not name.startswith("asyncio_")], [])
+
+    async def test_external_stop_cancels_in_flight_llm_call(self):
+        from backend.src.agent.runner.mode_do_runner import _run_do_mode_execution_impl
+        from backend.src.constants import RUN_STATUS_STOPPED
+        from backend.src.storage import get_connection
+
+        action = '{"action": {"type": "llm_call", "payload": {"prompt": "用一句话总结"}}}'
+        step_started = asyncio.Event()
+        step_cancelled = asyncio.Event()
+        calls = {"count": 0}
+
+        async def _fake_call_llm_async(prompt, model, parameters, provider=None):
+            calls["count"] += 1
+            if calls["count"] == 1:
+                return action, {"prompt": 1, "completion": 1, "total": 2}
+            step_started.set()
+            try:
+                await asyncio.sleep(30)
+            except asyncio.CancelledError:
+                step_cancelled.set()
+                raise
+            return "never", None
+
+        task_id, run_id = self._create_task_and_run()
+        messages: list = []
+        with patch("backend.src.services.llm.llm_calls.call_llm_async", side_effect=_fake_call_llm_async):
+            runner = asyncio.create_task(_run_do_mode_execution_impl(self._config(task_id, run_id, messages)))
+            await asyncio.wait_for(step_started.wait(), timeout=10)
+            with get_connection() as conn:
+                conn.execute("UPDATE task_runs SET status = ? WHERE id = ?", (RUN_STATUS_STOPPED, int(run_id)))
+            result = await asyncio.wait_for(runner, timeout=10)
+            await asyncio.wait_for(step_cancelled.wait(), timeout=5)
+
+        self.assertEqual(result.run_status, RUN_STATUS_STOPPED)
+        # 在途请求被取消后 llm_records 收尾为 error(cancelled)，不会停留在 running
+        for _ in range(100):
+            records = self._llm_records(run_id)
+            if records and records[-1][0] != "running":
+                break
+            await asyncio.sleep(0.05)
+        self.assertEqual(records[-1], ("error", "cancelled"))
+
+
+class TestExecuteStepActionAsync(unittest.IsolatedAsyncioTestCase):
+    async def test_falls_back_to_thread_for_sync_only_actions(self):
+        from backend.src.actions.executor import execute_step_action_async
+
+        step_row = {"title": "json", "detail": '{"type": "json_parse", "payload": {"text": "{\\"a\\": 1}"}}'}
+        result, error = await execute_step_action_async(1, 1, step_row, context={})
+
+        self.assertIsNone(error)
+        self.assertIsInstance(result, dict)
+
+    async def test_unknown_action_type_is_rejected(self):
+        from backend.src.actions.executor import execute_step_action_async
+
+        result, error = await execute_step_action_async(1, 1, {"title": "x", "detail": '{"type": "nope", "payload": {}}'})
+
+        self.assertIsNone(result)
+        self.assertTrue(error)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,158 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+
+def _asgi_get(app, path: str, headers=None):
+    messages = []
+
+    async def _receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def _send(message):
+        messages.append(message)
+
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": path,
+        "query_string": b"",
+        "headers": [(key.encode("latin-1"), value.encode("latin-1")) for key, value in (headers or {}).items()],
+    }
+    asyncio.run(app(scope, _receive, _send))
+    start = messages[0]
+    return start["status"], {key.decode(): value.decode() for key, value in start.get("headers", [])}
+
+
+class TestConditionalPolling(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        os.environ["AGENT_DB_PATH"] = str(Path(self._tmp.name) / "agent_test.db")
+        os.environ["AGENT_PROMPT_ROOT"] = str(Path(self._tmp.name) / "prompt")
+
+        from backend.src.storage import init_db
+
+        init_db()
+
+    def tearDown(self):
+        os.environ.pop("AGENT_DB_PATH", None)
+        os.environ.pop("AGENT_PROMPT_ROOT", None)
+        self._tmp.cleanup()
+
+    def _insert_memory(self, conn, content: str) -> None:
+        conn.execute(
+            "INSERT INTO memory_items (content, created_at, memory_type) VALUES (?, '2024-01-01', 'short_term')",
+            (content,),
+        )
+
+    def test_versions_bump_only_after_committed_writes(self):
+        from backend.src.common.resource_versions import get_resource_version
+        from backend.src.storage import get_connection
+
+        memory_before = get_resource_version("memory")
+        reviews_before = get_resource_version("reviews")
+        with get_connection() as conn:
+            conn.execute("SELECT COUNT(*) FROM memory_items").fetchone()
+        self.assertEqual(get_resource_version("memory"), memory_before)
+
+        with get_connection() as conn:
+            self._insert_memory(conn, "a")
+        self.assertEqual(get_resource_version("memory"), memory_before + 1)
+        self.assertEqual(get_resource_version("reviews"), reviews_before)
+
+        with self.assertRaises(RuntimeError):
+            with get_connection() as conn:
+                self._insert_memory(conn, "b")
+                raise RuntimeError("rollback")
+        self.assertEqual(get_resource_version("memory"), memory_before + 1)
+
+    def test_versions_bump_on_commit_inside_context(self):
+        from backend.src.common.resource_versions import get_resource_version
+        from backend.src.storage import get_connection
+
+        memory_before = get_resource_version("memory")
+        with self.assertRaises(RuntimeError):
+            with get_connection() as conn:
+                self._insert_memory(conn, "committed")
+                conn.commit()
+                raise RuntimeError("after commit")
+        # 已提交的写入不会被回滚：版本号必须已递增，否则客户端会拿到过期的 304
+        self.assertEqual(get_resource_version("memory"), memory_before + 1)
+        with get_connection() as conn:
+            count = conn.execute("SELECT COUNT(*) AS c FROM memory_items WHERE content = 'committed'").fetchone()["c"]
+        self.assertEqual(count, 1)
+
+        # with conn: 形式的提交同样计入，且后续无写入的提交不重复递增
+        with get_connection() as conn:
+            with conn:
+                self._insert_memory(conn, "nested")
+            self.assertEqual(get_resource_version("memory"), memory_before + 2)
+        self.assertEqual(get_resource_version("memory"), memory_before + 2)
+
+    def test_middleware_returns_304_until_family_changes(self):
+        from backend.src.api.conditional_get import ConditionalPollingMiddleware
+        from backend.src.storage import get_connection
+
+        calls = []
+
+        async def _app(scope, receive, send):
+            calls.append(scope["path"])
+            await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/json")]})
+            await send({"type": "http.response.body", "body": b"{}"})
+
+        app = ConditionalPollingMiddleware(_app)
+        status, headers = _asgi_get(app, "/api/memory/summary")
+        self.assertEqual(status, 200)
+        etag = headers["etag"]
+
+        status, _ = _asgi_get(app, "/api/memory/summary", {"if-none-match": etag})
+        self.assertEqual(status, 304)
+        self.assertEqual(len(calls), 1)
+
+        # 其他资源族的写入不影响 memory 的 ETag
+        with get_connection() as conn:
+            conn.execute(
+                "INSERT INTO agent_review_records (run_id, status, created_at) VALUES (1, 'pass', '2024-01-01')"
+            )
+        status, _ = _asgi_get(app, "/api/memory/summary", {"if-none-match": etag})
+        self.assertEqual(status, 304)
+
+        with get_connection() as conn:
+            self._insert_memory(conn, "changed")
+        status, headers = _asgi_get(app, "/api/memory/summary", {"if-none-match": etag})
+        self.assertEqual(status, 200)
+        self.assertNotEqual(headers["etag"], etag)
+
+        # 非轮询接口不受影响
+        status, headers = _asgi_get(app, "/api/tasks")
+        self.assertEqual(status, 200)
+        self.assertNotIn("etag", headers)
+        self.assertEqual(len(calls), 3)
+
+    def test_keyset_pagination_for_memory_and_reviews(self):
+        from backend.src.repositories.agent_reviews_repo import list_agent_reviews
+        from backend.src.repositories.memory_repo import list_memory_items
+        from backend.src.storage import get_connection
+
+        with get_connection() as conn:
+            for i in range(5):
+                self._insert_memory(conn, f"m{i}")
+                conn.execute(
+                    "INSERT INTO agent_review_records (run_id, status, created_at) VALUES (?, 'pass', '2024-01-01')",
+                    (i + 1,),
+                )
+
+        first = list_memory_items(offset=0, limit=2)
+        second = list_memory_items(offset=999, limit=2, after_id=int(first[-1]["id"]))
+        self.assertEqual([row["content"] for row in first + second], ["m0", "m1", "m2", "m3"])
+
+        newest = list_agent_reviews(offset=0, limit=2, task_id=None, run_id=None)
+        older = list_agent_reviews(offset=0, limit=10, task_id=None, run_id=None, before_id=int(newest[-1]["id"]))
+        self.assertEqual([row["run_id"] for row in newest], [5, 4])
+        self.assertEqual([row["run_id"] for row in older], [3, 2, 1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,230 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import textwrap
+import time
+import unittest
+from pathlib import Path
+
+_REPO_ROOT = Path(__file__).resolve().parents[2]
+
+_WORKER_SCRIPT = textwrap.dedent(
+    """
+    import json
+    import sys
+    import time
+
+    from backend.src.services.coordination.coordinator import SqliteCoordinationBackend
+
+    db_path, mode, start_at = sys.argv[1], sys.argv[2], float(sys.argv[3])
+    backend = SqliteCoordinationBackend(db_path=db_path, lease_ttl_seconds=10)
+    # 尽量让所有进程同时开始争抢
+    while time.time() < start_at:
+        time.sleep(0.005)
+
+    out = {}
+    if mode == "lease":
+        intervals = []
+        for _ in range(3):
+            lease = backend.acquire("stream:global", 2, timeout_seconds=60)
+            begin = time.time()
+            time.sleep(0.15)
+            end = time.time()
+            backend.release(lease)
+            intervals.append([begin, end])
+        out["intervals"] = intervals
+    elif mode == "claim":
+        claimed, state = backend.claim("resume:1:tok", ttl_seconds=60)
+        out["claimed"] = claimed
+        out["state"] = state
+    elif mode == "budget":
+        out["granted"] = sum(
+            1 for _ in range(5) if backend.try_consume_budget("llm:rpm", 1, limit=10, window_seconds=10**9)
+        )
+    backend.stop()
+    print(json.dumps(out))
+    """
+)
+
+
+class TestCoordinationLeases(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self._db_path = str(Path(self._tmp.name) / "coord.db")
+        os.environ["AGENT_DB_PATH"] = str(Path(self._tmp.name) / "agent_test.db")
+        os.environ["AGENT_PROMPT_ROOT"] = str(Path(self._tmp.name) / "prompt")
+
+    def tearDown(self):
+        from backend.src.services.coordination.coordinator import set_coordinator
+
+        set_coordinator(None)
+        os.environ.pop("AGENT_DB_PATH", None)
+        os.environ.pop("AGENT_PROMPT_ROOT", None)
+        os.environ.pop("AGENT_STREAM_GLOBAL_CONCURRENCY", None)
+        self._tmp.cleanup()
+
+    def _run_workers(self, mode: str, count: int) -> list:
+        from backend.src.services.coordination.coordinator import SqliteCoordinationBackend
+
+        # 先建表，避免多个进程同时首次建表
+        SqliteCoordinationBackend(db_path=self._db_path).release_claim("warmup")
+        env = dict(os.environ)
+        env["PYTHONPATH"] = str(_REPO_ROOT) + os.pathsep + env.get("PYTHONPATH", "")
+        start_at = time.time() + 1.5
+        procs = [
+            subprocess.Popen(
+                [sys.executable, "-c", _WORKER_SCRIPT, self._db_path, mode, str(start_at)],
+                cwd=str(_REPO_ROOT),
+                env=env,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+            )
+            for _ in range(count)
+        ]
+        results = []
+        for proc in procs:
+            stdout, stderr = proc.communicate(timeout=120)
+            self.assertEqual(proc.returncode, 0, stderr)
+            results.append(json.loads(stdout.strip().splitlines()[-1]))
+        return results
+
+    def test_cluster_lease_limits_concurrency_across_processes(self):
+        results = self._run_workers("lease", 5)
+        events = []
+        for item in results:
+            self.assertEqual(len(item["intervals"]), 3)
+            for begin, end in item["intervals"]:
+                events.append((begin, 1))
+                events.append((end, -1))
+        current = 0
+        peak = 0
+        # 同一时刻先处理释放，再处理占用
+        for _ts, delta in sorted(events, key=lambda e: (e[0], e[1])):
+            current += delta
+            peak = max(peak, current)
+        self.assertLessEqual(peak, 2)
+        self.assertEqual(peak, 2)
+
+    def test_resume_claim_is_exactly_once_across_processes(self):
+        results = self._run_workers("claim", 6)
+        self.assertEqual(sum(1 for item in results if item["claimed"]), 1)
+        self.assertTrue(all(item["state"] == "inflight" for item in results))
+
+    def test_llm_budget_is_shared_across_processes(self):
+        results = self._run_workers("budget", 4)
+        self.assertEqual(sum(item["granted"] for item in results), 10)
+
+    def test_backend_interface_requires_primitives(self):
+        from backend.src.services.coordination.coordinator import CoordinationBackend
+
+        class _Partial(CoordinationBackend):
+            def try_acquire(self, resource, limit):
+                return None
+
+        with self.assertRaises(TypeError):
+            _Partial()
+
+    def test_expired_lease_is_reclaimed_and_finalized_claim_reports_state(self):
+        from backend.src.services.coordination.coordinator import SqliteCoordinationBackend
+
+        crashed = SqliteCoordinationBackend(db_path=self._db_path, lease_ttl_seconds=1)
+        other = SqliteCoordinationBackend(db_path=self._db_path, lease_ttl_seconds=1)
+        self.assertIsNotNone(crashed.try_acquire("llm:global", 1))
+        # 模拟进程崩溃：不再续租
+        crashed.stop()
+        self.assertIsNone(other.try_acquire("llm:global", 1))
+        time.sleep(1.6)
+        lease = other.try_acquire("llm:global", 1)
+        self.assertIsNotNone(lease)
+        other.release(lease)
+        other.stop()
+
+        self.assertEqual(other.claim("resume:2:t", ttl_seconds=60), (True, "inflight"))
+        other.set_claim_state("resume:2:t", "done", ttl_seconds=60)
+        self.assertEqual(crashed.claim("resume:2:t", ttl_seconds=60), (False, "done"))
+
+    def test_stream_admission_waits_for_cluster_slot(self):
+        from backend.src.agent.runner.session_queue import (
+            acquire_stream_queue_ticket,
+            reset_stream_queue_state_for_tests,
+        )
+        from backend.src.services.coordination.coordinator import SqliteCoordinationBackend, set_coordinator
+
+        os.environ["AGENT_STREAM_GLOBAL_CONCURRENCY"] = "1"
+        set_coordinator(SqliteCoordinationBackend(db_path=self._db_path))
+        other_instance = SqliteCoordinationBackend(db_path=self._db_path)
+        held = other_instance.try_acquire("stream:global", 1)
+        self.assertIsNotNone(held)
+
+        async def _scenario():
+            await reset_stream_queue_state_for_tests()
+            with self.assertRaises(asyncio.TimeoutError):
+                await acquire_stream_queue_ticket(session_key="sess_a", timeout_seconds=0.3)
+            other_instance.release(held)
+            ticket = await acquire_stream_queue_ticket(session_key="sess_a", timeout_seconds=5)
+            self.assertEqual(len(ticket.cluster_leases), 2)
+            self.assertIsNone(other_instance.try_acquire("stream:global", 1))
+            await ticket.release()
+            lease = other_instance.try_acquire("stream:global", 1)
+            self.assertIsNotNone(lease)
+            other_instance.release(lease)
+            await reset_stream_queue_state_for_tests()
+
+        asyncio.run(_scenario())
+        other_instance.stop()
+
+    def test_abandoned_llm_ticket_releases_cluster_lease(self):
+        import threading
+
+        from backend.src.services.coordination.coordinator import SqliteCoordinationBackend, set_coordinator
+        from backend.src.services.llm.llm_client import (
+            AGENT_LLM_MAX_CONCURRENCY_GLOBAL,
+            LLMCallTicket,
+            _llm_concurrency_guard,
+            bind_llm_call_ticket,
+            reset_llm_call_ticket,
+        )
+
+        set_coordinator(SqliteCoordinationBackend(db_path=self._db_path))
+        other_instance = SqliteCoordinationBackend(db_path=self._db_path)
+        limit = int(AGENT_LLM_MAX_CONCURRENCY_GLOBAL)
+        held = [other_instance.try_acquire("llm:global", limit) for _ in range(limit - 1)]
+        ticket = LLMCallTicket()
+        entered = threading.Event()
+        release = threading.Event()
+
+        def _stuck_call():
+            token = bind_llm_call_ticket(ticket)
+            try:
+                with _llm_concurrency_guard("openai:test-model"):
+                    entered.set()
+                    release.wait(timeout=10)
+            finally:
+                reset_llm_call_ticket(token)
+                ticket.finish()
+
+        worker = threading.Thread(target=_stuck_call, daemon=True)
+        worker.start()
+        try:
+            self.assertTrue(entered.wait(timeout=5))
+            self.assertIsNone(other_instance.try_acquire("llm:global", limit))
+            # 调用方硬超时放弃：工作线程仍卡住，但集群槽位应立即归还
+            ticket.abandon()
+            lease = other_instance.try_acquire("llm:global", limit)
+            self.assertIsNotNone(lease)
+            other_instance.release(lease)
+        finally:
+            release.set()
+            worker.join(timeout=5)
+        for item in held:
+            other_instance.release(item)
+        other_instance.stop()
+
+
+
+if __name__ == "__main__":
+    unittest.main()
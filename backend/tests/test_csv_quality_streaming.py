@@ -0,0 +1,81 @@
+import os
+import tempfile
+import unittest
+from datetime import date, timedelta
+from pathlib import Path
+from unittest.mock import patch
+
+
+class TestCsvQualityStreaming(unittest.TestCase):
+    def setUp(self):
+        from backend.src.common.csv_artifact_quality import clear_csv_quality_cache
+
+        clear_csv_quality_cache()
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _write_rows(self, name: str, rows: int) -> Path:
+        start = date(2024, 1, 1)
+        lines = ["日期,价格,备注"]
+        for index in range(rows):
+            # 每 4 行一行占位（无数值）
+            value = "暂无" if index % 4 == 3 else f"{100 + index}.5"
+            lines.append(f"{start + timedelta(days=index)},{value},ok")
+        path = self.root / name
+        path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        return path
+
+    def test_small_file_is_exact(self):
+        from backend.src.common.csv_artifact_quality import load_csv_quality_stats, load_csv_quality_stats_from_text
+
+        path = self._write_rows("small.csv", 20)
+        stats = load_csv_quality_stats(str(path))
+        self.assertEqual(stats, load_csv_quality_stats_from_text(path.read_text(encoding="utf-8")))
+        self.assertEqual((stats["rows_total"], stats["numeric_rows"], stats["placeholder_rows"]), (20, 15, 5))
+        self.assertEqual(stats["date_span_days"], 19)
+        self.assertFalse(stats["sampled"])
+        self.assertEqual(stats["numeric_ratio_ci"], [0.75, 0.75])
+        self.assertEqual(stats["issues"], [])
+
+        self.assertEqual(load_csv_quality_stats_from_text("\n \n")["issues"], ["csv_empty"])
+        self.assertIn("rows_insufficient", load_csv_quality_stats_from_text("日期,价格\n,,\n")["issues"])
+
+    def test_large_file_is_sampled_with_bounds(self):
+        from backend.src.common.csv_artifact_quality import load_csv_quality_stats
+
+        path = self._write_rows("large.csv", 40000)
+        stats = load_csv_quality_stats(str(path), sample_rows=2000)
+        self.assertTrue(stats["sampled"])
+        self.assertEqual(stats["sample_rows"], 2000)
+        # 行数与日期跨度为全量统计
+        self.assertEqual(stats["rows_total"], 40000)
+        self.assertEqual(stats["date_span_days"], 39999)
+        low, high = stats["numeric_ratio_ci"]
+        self.assertLessEqual(low, stats["numeric_ratio"])
+        self.assertGreaterEqual(high, stats["numeric_ratio"])
+        self.assertLess(high - low, 0.05)
+        self.assertAlmostEqual(stats["numeric_ratio"], 0.75, delta=0.05)
+        self.assertAlmostEqual(stats["numeric_rows"], 30000, delta=2000)
+        self.assertEqual(stats["issues"], [])
+
+    def test_results_cached_by_path_mtime_size(self):
+        from backend.src.common import csv_artifact_quality
+
+        path = self._write_rows("cached.csv", 30)
+        first = csv_artifact_quality.load_csv_quality_stats(str(path))
+        first["issues"].append("mutated")
+        with patch.object(csv_artifact_quality, "_CsvQualityScan", side_effect=AssertionError("rescanned")):
+            second = csv_artifact_quality.load_csv_quality_stats(str(path))
+        self.assertEqual(second["issues"], [])
+        self.assertEqual(second["rows_total"], 30)
+
+        path.write_text("日期,价格\n2024-01-01,1\n", encoding="utf-8")
+        os.utime(path, ns=(path.stat().st_mtime_ns + 10**9, path.stat().st_mtime_ns + 10**9))
+        self.assertEqual(csv_artifact_quality.load_csv_quality_stats(str(path))["rows_total"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,195 @@
+import http.client
+import importlib.util
+import socket
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+
+class _HangingStubServer:
+    """本地桩服务：接受请求后一直不响应，模拟供应商卡死。"""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.requests = 0
+        stub = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_POST(self):  # noqa: N802
+                stub.requests += 1
+                length = int(self.headers.get("Content-Length") or 0)
+                if length:
+                    self.rfile.read(length)
+                stub.release.wait(timeout=30)
+
+            def log_message(self, *_args):
+                return
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *_exc):
+        self.release.set()
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def _reset_concurrency_state(llm_client) -> None:
+    llm_client._LLM_CONCURRENCY_STATE["global_limit"] = None
+    llm_client._LLM_CONCURRENCY_STATE["per_model_limit"] = None
+    llm_client._LLM_CONCURRENCY_STATE["global_sem"] = None
+    llm_client._LLM_CONCURRENCY_STATE["model_sems"] = {}
+    llm_client._LLM_CONCURRENCY_STATE["adaptive_global"] = None
+    llm_client._LLM_CONCURRENCY_STATE["adaptive_models"] = {}
+
+
+def _wait_until(predicate, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return bool(predicate())
+
+
+class TestFaultInjectionLLMHardTimeout(unittest.TestCase):
+    def test_hard_timeout_releases_slot_and_tracks_orphan(self):
+        """
+        供应商卡死（桩服务不响应，且客户端自身的 socket 超时远大于硬超时）：
+        - 硬超时到期立即抛出 TimeoutError；
+        - 并发槽位立即归还（limit=1 时下一次调用不会被饿死）；
+        - 被放弃的调用计入 orphaned，连接被关闭后工作线程退出，orphaned 回落到 0。
+        """
+        import backend.src.services.llm.llm_client as llm_client
+        from backend.src.services.llm.llm_calls import _call_llm_with_hard_timeout
+
+        with _HangingStubServer() as stub:
+
+            class StubHTTPClient:
+                """用 http.client 直连桩服务的最小 client（模拟“不尊重超时”的 SDK）。"""
+
+                def __init__(self, provider=None, api_key=None, base_url=None, default_model=None, strict_mode=False):
+                    self._provider_name = str(provider or "openai")
+                    self._default_model = str(default_model or "fake-model")
+                    self._conn = http.client.HTTPConnection("127.0.0.1", stub.port, timeout=60)
+
+                def complete_prompt_sync(self, prompt: str, model=None, parameters=None, timeout: int = 120):
+                    self._conn.request("POST", "/v1/chat/completions", body=b"{}")
+                    resp = self._conn.getresponse()
+                    return resp.read().decode("utf-8"), None
+
+                def close_sync(self):
+                    sock = self._conn.sock
+                    if sock is not None:
+                        try:
+                            sock.shutdown(socket.SHUT_RDWR)
+                        except OSError:
+                            pass
+
+            with (
+                patch.object(llm_client, "AGENT_LLM_MAX_CONCURRENCY_GLOBAL", 1),
+                patch.object(llm_client, "AGENT_LLM_MAX_CONCURRENCY_PER_MODEL", 1),
+                patch.object(llm_client, "LLMClient", StubHTTPClient),
+            ):
+                _reset_concurrency_state(llm_client)
+                before = llm_client.get_llm_call_gauge()
+
+                started = time.monotonic()
+                with self.assertRaises(TimeoutError):
+                    _call_llm_with_hard_timeout(
+                        prompt_text="p",
+                        model="fake-model",
+                        parameters={"temperature": 0},
+                        provider="openai",
+                        timeout_seconds=1,
+                    )
+                self.assertLess(time.monotonic() - started, 3.0)
+                self.assertEqual(stub.requests, 1)
+
+                global_limiter = llm_client._LLM_CONCURRENCY_STATE.get("adaptive_global")
+                model_limiter = llm_client._LLM_CONCURRENCY_STATE.get("adaptive_models", {}).get("openai:fake-model")
+                self.assertEqual(int(global_limiter.in_flight), 0)
+                self.assertEqual(int(model_limiter.in_flight), 0)
+
+                after = llm_client.get_llm_call_gauge()
+                self.assertEqual(after["hard_timeouts_total"], before["hard_timeouts_total"] + 1)
+                self.assertEqual(after["orphaned_total"], before["orphaned_total"] + 1)
+
+                # 连接被关闭后工作线程应迅速退出，orphaned/in_flight 回落
+                self.assertTrue(_wait_until(lambda: llm_client.get_llm_call_gauge()["orphaned"] == before["orphaned"]))
+                self.assertTrue(_wait_until(lambda: llm_client.get_llm_call_gauge()["in_flight"] == before["in_flight"]))
+
+                # 槽位未被孤儿占用：limit=1 下后续调用仍可进入（同样会硬超时，但能拿到槽位发出请求）
+                with self.assertRaises(TimeoutError):
+                    _call_llm_with_hard_timeout(
+                        prompt_text="p",
+                        model="fake-model",
+                        parameters={},
+                        provider="openai",
+                        timeout_seconds=1,
+                    )
+                self.assertEqual(stub.requests, 2)
+                _reset_concurrency_state(llm_client)
+
+    def test_transport_timeout_aligned_with_hard_timeout(self):
+        """硬超时会作为 timeout_seconds 透传给 call_llm，调用方更大的 timeout 不会突破硬超时。"""
+        from backend.src.services.llm.llm_calls import _call_llm_with_hard_timeout
+
+        seen = {}
+
+        def fake_call_llm(prompt, model, parameters, provider=""):
+            seen.update(parameters or {})
+            return "ok", None
+
+        with patch("backend.src.services.llm.llm_calls.call_llm", side_effect=fake_call_llm):
+            result = _call_llm_with_hard_timeout(
+                prompt_text="p",
+                model="m",
+                parameters={"timeout": 120, "temperature": 0},
+                provider="openai",
+                timeout_seconds=20,
+            )
+
+        self.assertEqual(result, ("ok", None))
+        self.assertEqual(seen.get("timeout_seconds"), 20)
+        self.assertNotIn("timeout", seen)
+        self.assertEqual(seen.get("temperature"), 0)
+
+    @unittest.skipUnless(importlib.util.find_spec("openai") is not None, "需要 openai SDK")
+    def test_openai_provider_times_out_against_hanging_server(self):
+        import backend.src.services.llm.llm_client as llm_client
+        from backend.src.services.llm.llm_calls import _call_llm_with_hard_timeout
+
+        with _HangingStubServer() as stub, patch.dict(
+            "os.environ",
+            {"OPENAI_API_KEY": "test-key", "OPENAI_BASE_URL": f"http://127.0.0.1:{stub.port}/v1"},
+        ), patch.object(llm_client, "AGENT_LLM_MAX_CONCURRENCY_GLOBAL", 1), patch.object(
+            llm_client, "AGENT_LLM_MAX_CONCURRENCY_PER_MODEL", 1
+        ), patch.object(llm_client.LLMClient, "_load_store_config", staticmethod(lambda: {})):
+            _reset_concurrency_state(llm_client)
+            started = time.monotonic()
+            with self.assertRaises(Exception):
+                _call_llm_with_hard_timeout(
+                    prompt_text="p",
+                    model="fake-model",
+                    parameters={},
+                    provider="openai",
+                    timeout_seconds=5,
+                )
+            # SDK 不再自带重试：总耗时约等于一次传输层超时
+            self.assertLess(time.monotonic() - started, 8.0)
+            global_limiter = llm_client._LLM_CONCURRENCY_STATE.get("adaptive_global")
+            self.assertTrue(_wait_until(lambda: int(global_limiter.in_flight) == 0))
+            _reset_concurrency_state(llm_client)
+
+
+if __name__ == "__main__":
+    unittest.main()
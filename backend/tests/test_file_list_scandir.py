@@ -0,0 +1,130 @@
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+
+class TestFileListScandir(unittest.TestCase):
+    def setUp(self):
+        from backend.src.services.tasks.run_listing_cache import reset_listing_cache
+
+        reset_listing_cache()
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        os.environ["AGENT_DB_PATH"] = str(self.root / "agent_test.db")
+        self.tree = self.root / "tree"
+        for rel in (
+            "a.txt",
+            "b.log",
+            "src/main.py",
+            "src/util/helpers.py",
+            "src/util/deep/more/leaf.py",
+            "node_modules/pkg/index.js",
+            ".git/HEAD",
+            "build/out.bin",
+        ):
+            target = self.tree / rel
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_text(rel, encoding="utf-8")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _list(self, run_id=None, **payload):
+        from backend.src.actions.handlers.file_list import execute_file_list
+
+        with patch("backend.src.actions.handlers.file_list.ensure_write_permission_for_action", return_value=None):
+            result, error = execute_file_list({"path": str(self.tree), **payload}, run_id=run_id)
+        self.assertIsNone(error)
+        return result
+
+    def test_recursive_prunes_default_and_custom_excludes(self):
+        result = self._list(recursive=True)
+        self.assertEqual(
+            result["items"],
+            ["a.txt", "b.log", "build/out.bin", "src/main.py", "src/util/helpers.py", "src/util/deep/more/leaf.py"],
+        )
+        self.assertFalse(result["truncated"])
+
+        result = self._list(recursive=True, exclude=["*.log", "/build/", "!node_modules/", "deep/"])
+        self.assertEqual(
+            result["items"],
+            ["a.txt", "node_modules/pkg/index.js", "src/main.py", "src/util/helpers.py"],
+        )
+
+        (self.tree / ".gitignore").write_text("# comment\nsrc/**/helpers.py\n*.bin\n", encoding="utf-8")
+        result = self._list(recursive=True, gitignore=True, pattern=".py")
+        self.assertEqual(result["items"], ["src/main.py", "src/util/deep/more/leaf.py"])
+
+        # 非递归保持旧口径：文件与目录都列出，不应用默认排除
+        self.assertIn("node_modules", self._list()["items"])
+
+    def test_max_depth_and_early_stop(self):
+        result = self._list(recursive=True, max_depth=2)
+        self.assertEqual(result["items"], ["a.txt", "b.log", "build/out.bin", "src/main.py"])
+
+        from backend.src.common import dir_listing
+
+        entered = []
+        original = dir_listing.os.scandir
+
+        def _tracking_scandir(path):
+            entered.append(os.path.relpath(path, self.tree))
+            return original(path)
+
+        with patch.object(dir_listing.os, "scandir", _tracking_scandir):
+            result = self._list(recursive=True, max_entries=3)
+        self.assertEqual(result["items"], ["a.txt", "b.log", "build/out.bin"])
+        self.assertTrue(result["truncated"])
+        # 达到 max_entries 后不再进入 src
+        self.assertEqual(entered, [".", "build"])
+
+    def test_sort_by_mtime_returns_newest(self):
+        now = time.time()
+        for offset, rel in enumerate(["src/main.py", "a.txt", "src/util/helpers.py"]):
+            os.utime(self.tree / rel, (now + offset * 10, now + offset * 10))
+        result = self._list(recursive=True, sort="mtime", max_entries=2)
+        self.assertEqual(result["items"], ["src/util/helpers.py", "a.txt"])
+        self.assertTrue(result["truncated"])
+
+    def test_run_cache_hits_and_invalidation(self):
+        from backend.src.actions.registry import _invalidate_listings
+        from backend.src.services.tasks.run_listing_cache import get_listing_cache_stats
+
+        first = self._list(run_id=7, recursive=True)
+        self.assertFalse(first["cached"])
+        second = self._list(run_id=7, recursive=True)
+        self.assertTrue(second["cached"])
+        self.assertEqual(first["items"], second["items"])
+        self.assertEqual(get_listing_cache_stats()["hits"], 1)
+
+        # 目录内新增文件：目录 mtime 变化，缓存自动失效
+        (self.tree / "src" / "util" / "new.py").write_text("x", encoding="utf-8")
+        third = self._list(run_id=7, recursive=True)
+        self.assertFalse(third["cached"])
+        self.assertIn("src/util/new.py", third["items"])
+
+        # 写入/删除路径失效其祖先目录的列举；其他 run 不受影响
+        self._list(run_id=8, recursive=True)
+        _invalidate_listings(7, str(self.tree / "src" / "main.py"))
+        self.assertFalse(self._list(run_id=7, recursive=True)["cached"])
+        self.assertTrue(self._list(run_id=8, recursive=True)["cached"])
+        _invalidate_listings(8)
+        self.assertFalse(self._list(run_id=8, recursive=True)["cached"])
+
+    def test_payload_validation(self):
+        from backend.src.actions.registry import get_action_spec
+
+        spec = get_action_spec("file_list")
+        validate = spec.validate_payload
+        self.assertIsNone(validate({"path": "a", "max_depth": 2, "exclude": ["*.log"], "sort": "mtime"}))
+        self.assertIn("max_depth", validate({"path": "a", "max_depth": 0}))
+        self.assertIn("exclude", validate({"path": "a", "exclude": [1]}))
+        self.assertIn("sort", validate({"path": "a", "sort": "size"}))
+        self.assertIn("gitignore", spec.allowed_payload_keys)
+
+
+if __name__ == "__main__":
+    unittest.main()
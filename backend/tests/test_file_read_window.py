@@ -0,0 +1,141 @@
+import codecs
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+
+class TestFileReadWindow(unittest.TestCase):
+    def setUp(self):
+        from backend.src.common.text_window import clear_line_index_cache
+
+        clear_line_index_cache()
+        self._tmp = tempfile.TemporaryDirectory()
+        self.big = Path(self._tmp.name) / "big.csv"
+        lines = ["id,name"] + [f"{i},名称{i}" for i in range(1, 50001)]
+        self.lines = lines
+        self.big.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _read(self, **payload):
+        from backend.src.actions.handlers.file_read import execute_file_read
+
+        with patch("backend.src.actions.handlers.file_read.ensure_write_permission_for_action", return_value=None):
+            result, error = execute_file_read({"path": str(payload.pop("path", self.big)), **payload})
+        self.assertIsNone(error)
+        return result
+
+    def test_line_window_and_metadata(self):
+        from backend.src.common import text_window
+
+        # 行索引按 1MB 分块：强制小块以覆盖跨块定位
+        with patch.object(text_window, "_INDEX_CHUNK_BYTES", 4096):
+            result = self._read(start_line=30001, max_lines=3)
+        self.assertEqual(result["mode"], "lines")
+        self.assertEqual(result["content"], "\n".join(self.lines[30000:30003]) + "\n")
+        self.assertEqual((result["start_line"], result["end_line"]), (30001, 30003))
+        self.assertEqual(result["total_lines"], len(self.lines))
+        self.assertEqual(result["size"], self.big.stat().st_size)
+        self.assertEqual(result["encoding"], "utf-8")
+        self.assertEqual(result["next_line"], 30004)
+
+        last = self._read(start_line=len(self.lines), max_lines=10)
+        self.assertEqual(last["content"], self.lines[-1] + "\n")
+        self.assertFalse(last["has_more"])
+        self.assertEqual(self._read(start_line=len(self.lines) + 5)["content"], "")
+
+    def test_byte_window_pages_without_splitting_characters(self):
+        pages = []
+        offset = 0
+        while True:
+            result = self._read(offset=offset, max_bytes=1001)
+            pages.append(result["content"])
+            if not result["has_more"]:
+                break
+            offset = result["next_offset"]
+        self.assertEqual("".join(pages), self.big.read_text(encoding="utf-8"))
+        self.assertNotIn("�", "".join(pages))
+
+        # 默认（未指定 max_bytes）仍从头读取，元数据给出续读位置
+        head = self._read(max_bytes=16)
+        self.assertTrue(head["content"].startswith("id,name\n1,"))
+        self.assertEqual(head["next_offset"], head["end_offset"])
+
+    def test_tail_and_grep(self):
+        tail = self._read(tail_lines=2)
+        self.assertEqual(tail["content"], "\n".join(self.lines[-2:]) + "\n")
+        self.assertEqual((tail["start_line"], tail["end_line"]), (len(self.lines) - 1, len(self.lines)))
+
+        found = self._read(grep=r"^4999\d,", max_matches=5)
+        self.assertEqual(found["mode"], "grep")
+        self.assertEqual([item["line"] for item in found["matches"]], [49991 + i for i in range(5)])
+        self.assertTrue(found["truncated"])
+        self.assertEqual(found["matches"][0]["text"], "49990,名称49990")
+
+        self.assertEqual(self._read(grep="名称12345$")["matches"], [{"line": 12346, "text": "12345,名称12345"}])
+        self.assertEqual(self._read(grep="NAME", ignore_case=True)["match_count"], 1)
+
+    def test_grep_non_ascii_patterns_use_text_semantics(self):
+        from backend.src.common import text_window
+
+        small = Path(self._tmp.name) / "cjk.txt"
+        small.write_text("错误行\n普通行\n价格: 12\nαβ\nplain\n", encoding="utf-8")
+
+        def lines(**kwargs):
+            return [item["line"] for item in self._read(path=small, **kwargs)["matches"]]
+
+        self.assertEqual(lines(grep="[错误]"), [1])
+        self.assertEqual(lines(grep="误?行"), [1, 2])
+        self.assertEqual(lines(grep=r"^\w+:"), [3])
+        self.assertEqual(lines(grep="ΑΒ", ignore_case=True), [4])
+        self.assertEqual(lines(grep="pl.in"), [5])
+
+        # 纯 ASCII 字面量仍走 mmap 字节检索
+        self.assertTrue(text_window._can_grep_bytes("plain$", ignore_case=False))
+        self.assertFalse(text_window._can_grep_bytes("PLAIN", ignore_case=True))
+        self.assertFalse(text_window._can_grep_bytes(r"^\d+,", ignore_case=False))
+
+    def test_grep_double_byte_encoding_ignores_ascii_trail_bytes(self):
+        gbk = Path(self._tmp.name) / "gbk_trail.txt"
+        # “乤”的 GBK 编码为 b"\x81a"：尾字节与 ASCII 的 a 相同
+        gbk.write_bytes(("乤乤乤\n" * 15 + "第二行\nalpha\n").encode("gbk"))
+        result = self._read(path=gbk, grep="a")
+        self.assertEqual(result["encoding"], "gb18030")
+        self.assertEqual(result["matches"], [{"line": 17, "text": "alpha"}])
+
+    def test_encoding_sniffing(self):
+        gbk = Path(self._tmp.name) / "gbk.txt"
+        gbk.write_bytes("第一行\n第二行\n".encode("gb18030"))
+        result = self._read(path=gbk, tail_lines=1)
+        self.assertEqual(result["encoding"], "gb18030")
+        self.assertEqual(result["content"], "第二行\n")
+
+        utf16 = Path(self._tmp.name) / "utf16.txt"
+        utf16.write_bytes(codecs.BOM_UTF16_LE + "a\nbeta\nc\n".encode("utf-16-le"))
+        result = self._read(path=utf16, grep="^b")
+        self.assertEqual(result["matches"], [{"line": 2, "text": "beta"}])
+        self.assertEqual(self._read(path=utf16)["content"], "a\nbeta\nc\n")
+
+        bom = Path(self._tmp.name) / "bom.csv"
+        bom.write_bytes(codecs.BOM_UTF8 + b"h\n1\n")
+        self.assertEqual(self._read(path=bom, start_line=1, max_lines=1)["content"], "h\n")
+
+        empty = Path(self._tmp.name) / "empty.txt"
+        empty.write_bytes(b"")
+        result = self._read(path=empty)
+        self.assertEqual((result["content"], result["size"], result["total_lines"]), ("", 0, 0))
+
+    def test_payload_validation(self):
+        from backend.src.actions.registry import get_action_spec
+
+        validate = get_action_spec("file_read").validate_payload
+        self.assertIsNone(validate({"path": "a.txt", "start_line": 3, "offset": 0, "grep": "x+"}))
+        self.assertIn("start_line", validate({"path": "a.txt", "start_line": 0}))
+        self.assertIn("offset", validate({"path": "a.txt", "offset": -1}))
+        self.assertIn("grep", validate({"path": "a.txt", "grep": "("}))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,155 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+
+def _write_markdown(path: Path, meta: dict, body: str = "") -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("---\n" + json.dumps(meta, ensure_ascii=False) + "\n---\n\n" + body, encoding="utf-8")
+
+
+class TestKnowledgeWatcher(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self._prompt_root = Path(self._tmp.name) / "prompt"
+        os.environ["AGENT_DB_PATH"] = str(Path(self._tmp.name) / "agent_test.db")
+        os.environ["AGENT_PROMPT_ROOT"] = str(self._prompt_root)
+
+        import backend.src.storage as storage
+
+        storage.init_db()
+
+    def tearDown(self):
+        os.environ.pop("AGENT_DB_PATH", None)
+        os.environ.pop("AGENT_PROMPT_ROOT", None)
+        self._tmp.cleanup()
+
+    def _skill_names(self):
+        from backend.src.storage import get_connection
+
+        with get_connection() as conn:
+            rows = conn.execute("SELECT name FROM skills_items WHERE source_path LIKE 'misc/%' ORDER BY name").fetchall()
+        return [row["name"] for row in rows]
+
+    def test_debounced_sync_applies_upserts_and_deletes(self):
+        from backend.src.services.knowledge.knowledge_version import get_knowledge_version
+        from backend.src.services.knowledge.knowledge_watcher import (
+            KnowledgeWatcher,
+            get_knowledge_watcher_stats,
+        )
+
+        watcher = KnowledgeWatcher(debounce_seconds=1.0, use_native=False)
+        watcher.prime()
+        version_before = get_knowledge_version()
+        applied_before = get_knowledge_watcher_stats()["syncs_applied"]
+
+        skill_path = self._prompt_root / "skills" / "misc" / "a.md"
+        _write_markdown(skill_path, {"name": "skill_a"})
+        now = time.time()
+        # 仍在防抖窗口内：不应同步
+        self.assertEqual(watcher.poll_once(now=now), [])
+        self.assertEqual(self._skill_names(), [])
+
+        self.assertEqual(watcher.poll_once(now=now + 2), ["skills"])
+        self.assertEqual(self._skill_names(), ["skill_a"])
+        self.assertEqual(get_knowledge_version(), version_before + 1)
+        stats = get_knowledge_watcher_stats()
+        self.assertEqual(stats["syncs_applied"], applied_before + 1)
+        self.assertEqual(stats["last_kind"], "skills")
+        self.assertGreaterEqual(stats["last_lag_ms"], 0)
+
+        skill_path.unlink()
+        watcher.poll_once(now=now + 3)
+        self.assertEqual(watcher.poll_once(now=now + 5), ["skills"])
+        self.assertEqual(self._skill_names(), [])
+        self.assertEqual(get_knowledge_version(), version_before + 2)
+
+    def test_burst_of_changes_is_synced_once(self):
+        from backend.src.services.knowledge.knowledge_watcher import KnowledgeWatcher, WatchTarget
+
+        base = Path(self._tmp.name) / "notes"
+        calls = []
+        target = WatchTarget(kind="notes", resolve_dir=lambda: base, sync=lambda paths: calls.append(paths) or {"updated": 0})
+        watcher = KnowledgeWatcher(targets=[target], debounce_seconds=1.0, use_native=False)
+        watcher.prime()
+
+        now = time.time()
+        for i in range(3):
+            _write_markdown(base / f"{i}.md", {"i": i})
+            self.assertEqual(watcher.poll_once(now=now + i * 0.5), [])
+        self.assertEqual(watcher.poll_once(now=now + 5), ["notes"])
+        self.assertEqual(watcher.poll_once(now=now + 10), [])
+        self.assertEqual(len(calls), 1)
+        self.assertEqual([p.name for p in calls[0]], ["0.md", "1.md", "2.md"])
+
+    def test_sync_only_touches_changed_paths(self):
+        from backend.src.services.knowledge.knowledge_watcher import KnowledgeWatcher
+        from backend.src.storage import get_connection
+
+        # DB 中有一条文件已不存在的技能：全量 prune 会删它，按路径同步不应碰它
+        with get_connection() as conn:
+            conn.execute(
+                "INSERT INTO skills_items (name, created_at, source_path) VALUES ('orphan', '2026-01-01', 'misc/orphan.md')"
+            )
+        _write_markdown(self._prompt_root / "skills" / "misc" / "keep.md", {"name": "skill_keep"})
+        watcher = KnowledgeWatcher(debounce_seconds=0.0, use_native=False)
+        watcher.prime()
+
+        changed = self._prompt_root / "skills" / "misc" / "b.md"
+        _write_markdown(changed, {"name": "skill_b"})
+        self.assertEqual(watcher.poll_once(now=time.time() + 1), ["skills"])
+        self.assertEqual(self._skill_names(), ["orphan", "skill_b"])
+
+        changed.unlink()
+        self.assertEqual(watcher.poll_once(now=time.time() + 2), ["skills"])
+        self.assertEqual(self._skill_names(), ["orphan"])
+
+    def test_native_events_only_stat_event_paths(self):
+        from backend.src.services.knowledge.knowledge_watcher import KnowledgeWatcher, WatchTarget
+
+        base = Path(self._tmp.name) / "notes"
+        _write_markdown(base / "old" / "x.md", {"x": 1})
+        calls = []
+        target = WatchTarget(kind="notes", resolve_dir=lambda: base, sync=lambda paths: calls.append(paths) or {})
+        watcher = KnowledgeWatcher(targets=[target], debounce_seconds=0.0, use_native=False)
+        watcher.prime()
+
+        # 未通知的变化不会被发现（原生模式不做全量遍历）
+        _write_markdown(base / "silent.md", {"s": 1})
+        self.assertEqual(watcher.process_events(now=time.time()), [])
+
+        _write_markdown(base / "a.md", {"a": 1})
+        (base / "old").rename(base / "new")
+        watcher.notify(str(base / "a.md"), str(base / "readme.md"))
+        watcher.notify(str(base / "old"), str(base / "new"))
+        self.assertEqual(watcher.process_events(now=time.time() + 1), ["notes"])
+        self.assertEqual(
+            sorted(str(p.relative_to(base)) for p in calls[0]),
+            ["a.md", "new/x.md", "old/x.md"],
+        )
+
+    def test_background_thread_picks_up_new_memory_file(self):
+        from backend.src.services.knowledge.knowledge_watcher import KnowledgeWatcher
+        from backend.src.storage import get_connection
+
+        watcher = KnowledgeWatcher(poll_interval_seconds=0.05, debounce_seconds=0.05, use_native=False)
+        watcher.start()
+        try:
+            _write_markdown(self._prompt_root / "memory" / "m1.md", {"uid": "m1", "memory_type": "long_term"}, "hello")
+            deadline = time.time() + 10
+            found = False
+            while time.time() < deadline and not found:
+                with get_connection() as conn:
+                    found = conn.execute("SELECT 1 FROM memory_items WHERE uid = 'm1'").fetchone() is not None
+                time.sleep(0.05)
+        finally:
+            watcher.stop()
+        self.assertTrue(found)
+        self.assertEqual(watcher.backend, "polling")
+
+
+if __name__ == "__main__":
+    unittest.main()
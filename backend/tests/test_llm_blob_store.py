@@ -0,0 +1,109 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+
+def _prompt(step: int) -> str:
+    rules = "【规则】\n" + ("请严格遵守输出 JSON 格式，不要输出多余文字。\n" * 20)
+    tools = "【工具】\n" + ("- file_read / file_write / shell_command / http_request\n" * 20)
+    return f"{rules}\n\n{tools}\n\n【当前步骤】第 {step} 步：读取数据并汇总。"
+
+
+class TestLlmBlobStore(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        os.environ["AGENT_DB_PATH"] = str(Path(self._tmp.name) / "agent_test.db")
+        os.environ["AGENT_PROMPT_ROOT"] = str(Path(self._tmp.name) / "prompt")
+
+        from backend.src.storage import init_db
+
+        init_db()
+
+    def tearDown(self):
+        os.environ.pop("AGENT_DB_PATH", None)
+        os.environ.pop("AGENT_PROMPT_ROOT", None)
+        self._tmp.cleanup()
+
+    def test_records_store_refs_and_read_transparently(self):
+        from backend.src.common.serializers import llm_record_from_row
+        from backend.src.repositories.llm_blobs_repo import get_llm_blob_stats
+        from backend.src.repositories.llm_records_repo import create_llm_record, get_llm_record, list_llm_records
+        from backend.src.storage import get_connection
+
+        first = create_llm_record(prompt=_prompt(1), response="短回复", task_id=None, run_id=7, status="success")
+        second = create_llm_record(prompt=_prompt(2), response="短回复", task_id=None, run_id=7, status="success")
+
+        with get_connection() as conn:
+            raw = conn.execute("SELECT prompt, prompt_ref, response, response_ref FROM llm_records WHERE id = ?", (first,)).fetchone()
+        self.assertEqual(raw["prompt"], "")
+        self.assertTrue(raw["prompt_ref"])
+        self.assertEqual(raw["response"], "短回复")
+        self.assertIsNone(raw["response_ref"])
+
+        # 规则/工具两段共享：2 段 + 2 个清单
+        stats = get_llm_blob_stats()
+        self.assertEqual(stats["blobs"], 4)
+        self.assertLess(stats["stored_bytes"], len(_prompt(1).encode("utf-8")))
+
+        record = llm_record_from_row(get_llm_record(record_id=second))
+        self.assertEqual(record["prompt"], _prompt(2))
+        self.assertEqual(record["response"], "短回复")
+        items = list_llm_records(task_id=None, run_id=7, offset=0, limit=10)
+        self.assertEqual([item["prompt"] for item in items], [_prompt(1), _prompt(2)])
+
+    def test_llm_call_persists_response_via_blob(self):
+        from backend.src.services.llm.llm_calls import create_llm_call
+        from backend.src.storage import get_connection
+
+        long_response = "分析结论如下。\n\n" + ("数据一致，无异常。" * 80)
+
+        def fake_call_llm(prompt: str, model: str, parameters: dict, provider: str = ""):
+            return long_response, {"prompt": 1, "completion": 1, "total": 2}
+
+        with patch("backend.src.services.llm.llm_calls.call_llm", side_effect=fake_call_llm):
+            result = create_llm_call({"prompt": _prompt(3), "provider": "openai", "model": "deepseek-chat"})
+
+        self.assertEqual(result["record"]["prompt"], _prompt(3))
+        self.assertEqual(result["record"]["response"], long_response)
+        with get_connection() as conn:
+            raw = conn.execute("SELECT response, response_ref FROM llm_records WHERE id = ?", (result["record"]["id"],)).fetchone()
+        self.assertEqual(raw["response"], "")
+        self.assertTrue(raw["response_ref"])
+
+    def test_compaction_migrates_inline_rows_and_reports_space(self):
+        from backend.src.repositories.llm_records_repo import get_llm_record
+        from backend.src.services.llm.llm_blob_compaction import compact_llm_records
+        from backend.src.storage import get_connection
+
+        with get_connection() as conn:
+            for step in range(30):
+                conn.execute(
+                    "INSERT INTO llm_records (prompt, response, status, created_at, updated_at) VALUES (?, ?, 'success', '2024-01-01', '2024-01-01')",
+                    (_prompt(step), "ok"),
+                )
+            # 历史残留的孤儿 blob 也会被回收
+            conn.execute(
+                "INSERT INTO llm_blobs (hash, codec, data, raw_size, stored_size, created_at) VALUES ('orphan', 'raw', x'00', 1, 1, '2024-01-01')"
+            )
+
+        report = compact_llm_records(batch_size=7, vacuum=True)
+        self.assertTrue(report["ok"])
+        self.assertEqual(report["rows"], 30)
+        self.assertEqual(report["batches"], 5)
+        self.assertEqual(report["orphan_blobs_deleted"], 1)
+        self.assertGreater(report["bytes_reclaimed"], report["inline_bytes_removed"] // 2)
+        self.assertTrue(report["database"]["vacuumed"])
+
+        with get_connection() as conn:
+            remaining = conn.execute("SELECT COUNT(*) FROM llm_records WHERE prompt_ref IS NULL").fetchone()[0]
+        self.assertEqual(remaining, 0)
+        self.assertEqual(get_llm_record(record_id=5)["prompt"], _prompt(4))
+
+        again = compact_llm_records(batch_size=7)
+        self.assertEqual(again["rows"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
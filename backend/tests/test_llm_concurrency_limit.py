@@ -40,9 +40,10 @@ class TestLLMConcurrencyLimit(unittest.TestCase):
                     active -= 1
                 return "ok", None
 
-        def _worker():
+        def _worker(index: int):
+            # prompt 各不相同：相同的并发调用会被 single-flight 合并，无法制造并发竞争
             llm_client.call_llm(
-                prompt="p",
+                prompt=f"p{index}",
                 model="fake-model",
                 parameters={"temperature": 0},
                 provider="openai",
@@ -57,7 +58,7 @@ class TestLLMConcurrencyLimit(unittest.TestCase):
             llm_client._LLM_CONCURRENCY_STATE["global_sem"] = None
             llm_client._LLM_CONCURRENCY_STATE["model_sems"] = {}
 
-            threads = [threading.Thread(target=_worker, daemon=True) for _ in range(6)]
+            threads = [threading.Thread(target=_worker, args=(i,), daemon=True) for i in range(6)]
             for t in threads:
                 t.start()
 
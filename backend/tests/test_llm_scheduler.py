@@ -0,0 +1,166 @@
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+
+class _Slots:
+    """模拟全局并发槽位（try_slot / release）。"""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.used = 0
+
+    def try_acquire(self) -> bool:
+        if self.used < self.limit:
+            self.used += 1
+            return True
+        return False
+
+    def release(self) -> None:
+        self.used -= 1
+
+
+class TestLLMScheduler(unittest.TestCase):
+    def test_interactive_is_admitted_before_queued_background_work(self):
+        from backend.src.services.llm.llm_scheduler import LLMRequestScheduler
+
+        scheduler = LLMRequestScheduler(tokens_per_minute=0, background_share_percent=100)
+        slots = _Slots(1)
+        holder = scheduler.enqueue(priority="interactive", run_key="1", tokens=10)
+        self.assertTrue(scheduler.poll(holder, slots.try_acquire, global_limit=1))
+
+        backfill = scheduler.enqueue(priority="backfill", run_key="", tokens=10)
+        planning = scheduler.enqueue(priority="planning", run_key="2", tokens=10)
+        interactive = scheduler.enqueue(priority="interactive", run_key="3", tokens=10)
+        self.assertFalse(scheduler.poll(backfill, slots.try_acquire, global_limit=1))
+
+        slots.release()
+        holder.release()
+        # 槽位空出后：到达更早的 backfill/planning 仍需让位给 interactive
+        self.assertFalse(scheduler.poll(backfill, slots.try_acquire, global_limit=1))
+        self.assertFalse(scheduler.poll(planning, slots.try_acquire, global_limit=1))
+        self.assertTrue(scheduler.poll(interactive, slots.try_acquire, global_limit=1))
+        slots.release()
+        interactive.release()
+        self.assertFalse(scheduler.poll(backfill, slots.try_acquire, global_limit=1))
+        self.assertTrue(scheduler.poll(planning, slots.try_acquire, global_limit=1))
+
+        snapshot = scheduler.snapshot()["classes"]
+        self.assertEqual(snapshot["interactive"]["admitted_total"], 2)
+        self.assertEqual(snapshot["backfill"]["queued"], 1)
+        self.assertEqual(snapshot["planning"]["in_flight"], 1)
+
+    def test_background_share_keeps_capacity_for_interactive_steps(self):
+        from backend.src.services.llm.llm_scheduler import LLMRequestScheduler
+
+        scheduler = LLMRequestScheduler(tokens_per_minute=0, background_share_percent=50)
+        slots = _Slots(4)
+        background = [scheduler.enqueue(priority="postprocess", run_key=str(i), tokens=1) for i in range(4)]
+        admitted = [item for item in background if scheduler.poll(item, slots.try_acquire, global_limit=4)]
+        self.assertEqual(len(admitted), 2)
+        for item in background:
+            scheduler.poll(item, slots.try_acquire, global_limit=4)
+        self.assertEqual(slots.used, 2)
+
+        interactive = scheduler.enqueue(priority="interactive", run_key="9", tokens=1)
+        self.assertTrue(scheduler.poll(interactive, slots.try_acquire, global_limit=4))
+
+    def test_fair_share_prefers_runs_with_fewer_calls_in_flight(self):
+        from backend.src.services.llm.llm_scheduler import LLMRequestScheduler
+
+        scheduler = LLMRequestScheduler(tokens_per_minute=0)
+        slots = _Slots(2)
+        first = scheduler.enqueue(priority="interactive", run_key="a", tokens=1)
+        self.assertTrue(scheduler.poll(first, slots.try_acquire, global_limit=2))
+        busy_run = scheduler.enqueue(priority="interactive", run_key="a", tokens=1)
+        other_run = scheduler.enqueue(priority="interactive", run_key="b", tokens=1)
+        self.assertFalse(scheduler.poll(busy_run, slots.try_acquire, global_limit=2))
+        self.assertTrue(scheduler.poll(other_run, slots.try_acquire, global_limit=2))
+
+    def test_tokens_per_minute_budget_blocks_until_window_expires(self):
+        import backend.src.services.llm.llm_scheduler as llm_scheduler
+
+        clock = {"now": 1000.0}
+        with patch.object(llm_scheduler.time, "monotonic", side_effect=lambda: clock["now"]):
+            scheduler = llm_scheduler.LLMRequestScheduler(tokens_per_minute=100, background_share_percent=50)
+            first = scheduler.enqueue(priority="interactive", run_key="1", tokens=80)
+            self.assertTrue(scheduler.poll(first, lambda: True))
+            first.release()
+
+            background = scheduler.enqueue(priority="backfill", run_key="", tokens=10)
+            second = scheduler.enqueue(priority="interactive", run_key="1", tokens=30)
+            self.assertFalse(scheduler.poll(second, lambda: True))
+            self.assertFalse(scheduler.poll(background, lambda: True))
+
+            clock["now"] += 61
+            self.assertTrue(scheduler.poll(second, lambda: True))
+            self.assertTrue(scheduler.poll(background, lambda: True))
+            self.assertEqual(scheduler.snapshot()["tokens_per_minute"]["used"], 40)
+
+        self.assertGreater(llm_scheduler.estimate_llm_request_tokens("你好" * 10, {"max_tokens": 5}), 20)
+
+    def test_call_llm_admits_interactive_before_backfill(self):
+        import backend.src.services.llm.llm_client as llm_client
+        from backend.src.services.llm.llm_scheduler import (
+            LLMRequestScheduler,
+            llm_request_scope,
+            set_llm_scheduler,
+        )
+
+        order = []
+        order_lock = threading.Lock()
+        holder_entered = threading.Event()
+        release_holder = threading.Event()
+
+        class FakeLLMClient:
+            def __init__(self, provider=None, api_key=None, base_url=None, default_model=None, strict_mode=False):
+                self._provider_name = str(provider or "openai")
+                self._default_model = "fake-model"
+
+            def complete_prompt_sync(self, prompt: str, model=None, parameters=None, timeout: int = 120):
+                if prompt == "holder":
+                    holder_entered.set()
+                    release_holder.wait(timeout=5)
+                with order_lock:
+                    order.append(prompt)
+                return "ok", None
+
+        def _call(prompt: str, priority: str):
+            with llm_request_scope(priority=priority, run_id=prompt):
+                llm_client.call_llm(prompt, "fake-model", {}, provider="openai")
+
+        set_llm_scheduler(LLMRequestScheduler(tokens_per_minute=0, background_share_percent=100))
+        try:
+            with patch.object(llm_client, "AGENT_LLM_MAX_CONCURRENCY_GLOBAL", 1), patch.object(
+                llm_client, "AGENT_LLM_MAX_CONCURRENCY_PER_MODEL", 1
+            ), patch.object(llm_client, "LLMClient", FakeLLMClient):
+                llm_client._LLM_CONCURRENCY_STATE["global_limit"] = None
+                llm_client._LLM_CONCURRENCY_STATE["per_model_limit"] = None
+                holder = threading.Thread(target=_call, args=("holder", "interactive"), daemon=True)
+                holder.start()
+                self.assertTrue(holder_entered.wait(timeout=2))
+
+                background = threading.Thread(target=_call, args=("graph", "backfill"), daemon=True)
+                background.start()
+                time.sleep(0.1)
+                interactive = threading.Thread(target=_call, args=("step", "interactive"), daemon=True)
+                interactive.start()
+                time.sleep(0.1)
+                release_holder.set()
+                for thread in (holder, background, interactive):
+                    thread.join(timeout=5)
+                    self.assertFalse(thread.is_alive())
+
+            self.assertEqual(order, ["holder", "step", "graph"])
+            snapshot = llm_client.get_llm_scheduler().snapshot()["classes"]
+            self.assertGreater(snapshot["backfill"]["wait_ms_max"], snapshot["interactive"]["wait_ms_avg"])
+            self.assertEqual(sum(item["in_flight"] for item in snapshot.values()), 0)
+        finally:
+            set_llm_scheduler(None)
+            llm_client._LLM_CONCURRENCY_STATE["global_limit"] = None
+            llm_client._LLM_CONCURRENCY_STATE["per_model_limit"] = None
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,161 @@
+import asyncio
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+
+class TestLLMSingleFlight(unittest.TestCase):
+    def setUp(self):
+        from backend.src.services.llm.llm_single_flight import reset_llm_single_flight_stats
+
+        reset_llm_single_flight_stats()
+
+    def test_key_normalizes_parameter_order_and_provider_case(self):
+        from backend.src.services.llm.llm_single_flight import single_flight_key
+
+        a = single_flight_key(provider="OpenAI", model="m", parameters={"a": 1, "b": 2}, prompt="p")
+        b = single_flight_key(provider="openai", model="m", parameters={"b": 2, "a": 1}, prompt="p")
+        c = single_flight_key(provider="openai", model="m", parameters={"a": 1, "b": 2}, prompt="q")
+        self.assertEqual(a, b)
+        self.assertNotEqual(a, c)
+        # 不同优先级类别不合并：等待者不会被拖到领头者的排队类别
+        d = single_flight_key(provider="openai", model="m", parameters={"a": 1, "b": 2}, prompt="p", priority="background")
+        self.assertNotEqual(a, d)
+
+    def test_concurrent_identical_calls_share_one_provider_request(self):
+        import backend.src.services.llm.llm_client as llm_client
+        from backend.src.services.llm.llm_single_flight import get_llm_single_flight_stats
+
+        calls = []
+        calls_lock = threading.Lock()
+        release = threading.Event()
+
+        class FakeLLMClient:
+            def __init__(self, provider=None, api_key=None, base_url=None, default_model=None, strict_mode=False):
+                self._provider_name = str(provider or "openai")
+                self._default_model = "fake-model"
+
+            def complete_prompt_sync(self, prompt: str, model=None, parameters=None, timeout: int = 120):
+                with calls_lock:
+                    calls.append(prompt)
+                release.wait(timeout=2)
+                return f"answer:{prompt}", {"prompt": 1, "completion": 1, "total": 2}
+
+        results = []
+
+        def _worker(prompt: str):
+            results.append(llm_client.call_llm(prompt, "fake-model", {"temperature": 0}, provider="openai"))
+
+        with patch.object(llm_client, "LLMClient", FakeLLMClient):
+            threads = [threading.Thread(target=_worker, args=("same",), daemon=True) for _ in range(4)]
+            threads.append(threading.Thread(target=_worker, args=("other",), daemon=True))
+            for thread in threads:
+                thread.start()
+            time.sleep(0.2)
+            release.set()
+            for thread in threads:
+                thread.join(timeout=3)
+                self.assertFalse(thread.is_alive())
+
+        self.assertEqual(sorted(calls), ["other", "same"])
+        self.assertEqual(sorted(item[0] for item in results), ["answer:other"] + ["answer:same"] * 4)
+        # 用量只记在领头调用上：等待者 tokens 为 0 并标记 coalesced
+        same_tokens = [item[1] for item in results if item[0] == "answer:same"]
+        self.assertEqual(sum(int(tokens["total"]) for tokens in same_tokens), 2)
+        self.assertEqual(sum(1 for tokens in same_tokens if tokens.get("coalesced")), 3)
+        stats = get_llm_single_flight_stats()
+        self.assertEqual(stats["leader_calls"], 2)
+        self.assertEqual(stats["coalesced"], 3)
+        self.assertEqual(stats["in_flight_keys"], 0)
+
+    def test_coalesced_follower_record_has_zero_tokens(self):
+        import os
+        import tempfile
+        from pathlib import Path
+
+        import backend.src.services.llm.llm_calls as llm_calls
+
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        os.environ["AGENT_DB_PATH"] = str(Path(tmp.name) / "agent_test.db")
+        os.environ["AGENT_PROMPT_ROOT"] = str(Path(tmp.name) / "prompt")
+        self.addCleanup(os.environ.pop, "AGENT_DB_PATH", None)
+        self.addCleanup(os.environ.pop, "AGENT_PROMPT_ROOT", None)
+        import backend.src.storage as storage
+
+        storage.init_db()
+
+        shared = ("answer", {"prompt": 0, "completion": 0, "total": 0, "coalesced": True})
+        with patch.object(llm_calls, "_call_llm_with_hard_timeout", return_value=shared):
+            result = llm_calls.create_llm_call({"prompt": "p", "model": "fake-model", "provider": "openai"})
+        record = result["record"]
+        self.assertEqual(record["tokens_total"], 0)
+        self.assertTrue(record["coalesced"])
+
+    def test_leader_error_is_shared_and_next_call_runs_again(self):
+        from backend.src.services.llm.llm_single_flight import SingleFlight
+
+        flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        attempts = []
+
+        def _failing():
+            attempts.append(1)
+            started.set()
+            release.wait(timeout=2)
+            raise RuntimeError("boom")
+
+        errors = []
+
+        def _worker():
+            try:
+                flight.do("k", _failing)
+            except RuntimeError as exc:
+                errors.append(str(exc))
+
+        leader = threading.Thread(target=_worker, daemon=True)
+        leader.start()
+        self.assertTrue(started.wait(timeout=2))
+        follower = threading.Thread(target=_worker, daemon=True)
+        follower.start()
+        time.sleep(0.1)
+        release.set()
+        leader.join(timeout=2)
+        follower.join(timeout=2)
+        self.assertEqual(errors, ["boom", "boom"])
+        self.assertEqual(len(attempts), 1)
+
+        # 只合并在途调用：完成后再次调用会重新执行
+        self.assertEqual(flight.do("k", lambda: "fresh"), "fresh")
+
+    def test_async_followers_share_result_and_survive_leader_cancel(self):
+        from backend.src.services.llm.llm_single_flight import AsyncSingleFlight
+
+        flight = AsyncSingleFlight()
+        attempts = []
+
+        async def _slow():
+            attempts.append(1)
+            await asyncio.sleep(0.05)
+            return "done"
+
+        async def _main():
+            leader = asyncio.create_task(flight.do("k", _slow))
+            await asyncio.sleep(0)
+            followers = [asyncio.create_task(flight.do("k", _slow)) for _ in range(3)]
+            await asyncio.sleep(0.01)
+            # 领头调用被取消：等待者重新竞争，其中一个成为新的领头者
+            leader.cancel()
+            results = await asyncio.gather(*followers)
+            with self.assertRaises(asyncio.CancelledError):
+                await leader
+            return results
+
+        self.assertEqual(asyncio.run(_main()), ["done", "done", "done"])
+        self.assertEqual(len(attempts), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,162 @@
+import os
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+
+class TestProcessCapture(unittest.TestCase):
+    def test_large_output_keeps_head_and_tail_and_spills_full_copy(self):
+        from backend.src.services.execution.process_capture import run_process_streaming
+
+        code = "import sys\nfor i in range(200000):\n    sys.stdout.write('line %06d\\n' % i)\n"
+        captured = run_process_streaming(
+            [sys.executable, "-c", code],
+            cwd=None,
+            timeout=30,
+            spill=True,
+            head_bytes=1024,
+            tail_bytes=1024,
+        )
+        try:
+            self.assertEqual(captured.returncode, 0)
+            self.assertTrue(captured.stdout_truncated)
+            self.assertEqual(captured.stdout_bytes, 200000 * 12)
+            self.assertTrue(captured.stdout.startswith(b"line 000000\n"))
+            self.assertTrue(captured.stdout.endswith(b"line 199999\n"))
+            self.assertIn(b"...[truncated", captured.stdout)
+            self.assertLess(len(captured.stdout), 4096)
+            self.assertEqual(os.path.getsize(captured.stdout_file), captured.stdout_bytes)
+            self.assertFalse(captured.stderr_truncated)
+        finally:
+            for path in (captured.stdout_file, captured.stderr_file):
+                if path:
+                    os.remove(path)
+
+    def test_spill_files_live_under_workdir_and_untruncated_copies_are_removed(self):
+        from backend.src.services.execution.process_capture import run_process_streaming
+
+        code = "import sys\nsys.stdout.write('x' * 50000)\nsys.stderr.write('small')\n"
+        with tempfile.TemporaryDirectory() as tmp:
+            captured = run_process_streaming(
+                [sys.executable, "-c", code],
+                cwd=tmp,
+                timeout=30,
+                spill=True,
+                head_bytes=1024,
+                tail_bytes=1024,
+            )
+            spill_dir = Path(tmp) / "backend" / ".agent" / "workspace" / "shell_output"
+            self.assertTrue(captured.stdout_truncated)
+            self.assertEqual(Path(captured.stdout_file).parent, spill_dir)
+            self.assertEqual(os.path.getsize(captured.stdout_file), 50000)
+            # 未截断的 stderr 已完整在结果中，落盘文件随收尾删除
+            self.assertIsNone(captured.stderr_file)
+            self.assertEqual(captured.stderr, b"small")
+            self.assertEqual(sorted(os.listdir(spill_dir)), [Path(captured.stdout_file).name])
+
+            captured = run_process_streaming([sys.executable, "-c", "print('ok')"], cwd=tmp, timeout=30, spill=True)
+            self.assertEqual((captured.stdout_file, captured.stderr_file), (None, None))
+            self.assertEqual(len(os.listdir(spill_dir)), 1)
+
+    def test_progress_is_rate_limited_and_routed_to_step_events(self):
+        from backend.src.services.execution import process_capture
+
+        events = []
+        context = {"event_sink": events.append, "task_id": 1, "run_id": 2, "step_order": 3}
+        callback = process_capture.build_context_output_progress(context, action_type="shell_command")
+        code = "for i in range(2000):\n    print('row', i, flush=True)\n"
+        with patch.object(process_capture, "AGENT_SHELL_OUTPUT_PROGRESS_INTERVAL_MS", 60000):
+            with process_capture.shell_output_progress_scope(callback):
+                captured = process_capture.run_process_streaming([sys.executable, "-c", code], cwd=None, timeout=30)
+
+        self.assertEqual(captured.returncode, 0)
+        # 首次立即回调 + 结束时补发最后一次
+        self.assertLessEqual(len(events), 2)
+        last = events[-1]
+        self.assertEqual(last["type"], "shell_output")
+        self.assertEqual(last["run_id"], 2)
+        self.assertEqual(last["stream"], "stdout")
+        self.assertEqual(last["lines"], 2000)
+        self.assertEqual(last["line"], "row 1999")
+
+        # 作用域外不再回调
+        process_capture.run_process_streaming([sys.executable, "-c", code], cwd=None, timeout=30)
+        self.assertLessEqual(len(events), 2)
+
+    @unittest.skipIf(os.name == "nt", "进程组 kill 依赖 POSIX")
+    def test_timeout_applies_when_background_grandchild_holds_pipe(self):
+        from backend.src.services.execution import process_capture
+
+        started = time.monotonic()
+        captured = process_capture.run_process_streaming(["sh", "-c", "sleep 8 & echo hi"], cwd=None, timeout=1)
+        self.assertLess(time.monotonic() - started, 5)
+        self.assertTrue(captured.timed_out)
+        self.assertIsNone(captured.returncode)
+        self.assertIn(b"hi", captured.stdout)
+
+    @unittest.skipIf(os.name == "nt", "进程组 kill 依赖 POSIX")
+    def test_async_timeout_applies_when_background_grandchild_holds_pipe(self):
+        import asyncio
+
+        from backend.src.services.execution import process_capture
+
+        started = time.monotonic()
+        captured = asyncio.run(
+            process_capture.run_process_streaming_async(["sh", "-c", "sleep 8 & echo hi"], cwd=None, timeout=1)
+        )
+        self.assertLess(time.monotonic() - started, 5)
+        self.assertTrue(captured.timed_out)
+        self.assertIn(b"hi", captured.stdout)
+
+    @unittest.skipIf(os.name == "nt", "进程组 kill 依赖 POSIX")
+    def test_timeout_kills_process_group_and_keeps_partial_output(self):
+        from backend.src.services.execution.shell_command import run_shell_command
+
+        with tempfile.TemporaryDirectory() as tmp:
+            pid_file = Path(tmp) / "child.pid"
+            script = Path(tmp) / "spawn.py"
+            script.write_text(
+                "import subprocess, sys, time\n"
+                "child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)'])\n"
+                f"open({str(pid_file)!r}, 'w').write(str(child.pid))\n"
+                "print('started', flush=True)\n"
+                "time.sleep(60)\n",
+                encoding="utf-8",
+            )
+            with patch(
+                "backend.src.services.execution.shell_command.has_exec_permission",
+                return_value=True,
+            ):
+                started = time.monotonic()
+                result, error_message = run_shell_command(
+                    {"command": ["python", str(script)], "workdir": tmp, "timeout_ms": 1500}
+                )
+
+            self.assertIsNone(error_message)
+            self.assertLess(time.monotonic() - started, 10)
+            self.assertFalse(result["ok"])
+            self.assertIsNone(result["returncode"])
+            self.assertTrue(result["stderr"].startswith("timeout"))
+            self.assertIn("started", result["stdout"])
+
+            child_pid = int(pid_file.read_text())
+            deadline = time.monotonic() + 5
+            alive = True
+            while alive and time.monotonic() < deadline:
+                try:
+                    os.kill(child_pid, 0)
+                    # 孙进程已被 kill 但尚未被 init 回收时 /proc 状态为 Z
+                    with open(f"/proc/{child_pid}/stat", "r", encoding="utf-8") as handle:
+                        alive = handle.read().split()[2] != "Z"
+                except (ProcessLookupError, FileNotFoundError):
+                    alive = False
+                if alive:
+                    time.sleep(0.05)
+            self.assertFalse(alive)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+
+class TestPromptAssetCache(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        os.environ["AGENT_DB_PATH"] = str(Path(self._tmp.name) / "agent_test.db")
+        os.environ["AGENT_PROMPT_ROOT"] = str(Path(self._tmp.name) / "prompt")
+        self.system_dir = Path(self._tmp.name) / "prompt" / "system"
+        self.system_dir.mkdir(parents=True, exist_ok=True)
+
+        from backend.src.services.llm.prompt_templates import invalidate_prompt_caches
+        from backend.src.storage import init_db
+
+        init_db()
+        invalidate_prompt_caches()
+
+    def tearDown(self):
+        from backend.src.services.llm.prompt_templates import invalidate_prompt_caches
+
+        invalidate_prompt_caches()
+        os.environ.pop("AGENT_DB_PATH", None)
+        os.environ.pop("AGENT_PROMPT_ROOT", None)
+        self._tmp.cleanup()
+
+    def test_system_prompt_cached_within_interval(self):
+        from backend.src.prompt import system_prompts
+
+        path = self.system_dir / "demo_prompt.txt"
+        path.write_text("v1", encoding="utf-8")
+        self.assertEqual(system_prompts.load_system_prompt("demo_prompt"), "v1")
+
+        # 检查间隔内不访问文件系统
+        with patch.object(system_prompts, "_resolve_prompt_file", side_effect=AssertionError("stat")):
+            self.assertEqual(system_prompts.load_system_prompt("demo_prompt"), "v1")
+
+        # 不存在的提示词也缓存
+        self.assertIsNone(system_prompts.load_system_prompt("missing_prompt"))
+        with patch.object(system_prompts, "_resolve_prompt_file", side_effect=AssertionError("stat")):
+            self.assertIsNone(system_prompts.load_system_prompt("missing_prompt"))
+
+    def test_system_prompt_reloads_on_mtime_change(self):
+        from backend.src.prompt import system_prompts
+
+        path = self.system_dir / "demo_prompt.txt"
+        path.write_text("v1", encoding="utf-8")
+        with patch.object(system_prompts, "AGENT_PROMPT_CACHE_CHECK_INTERVAL_MS", 0):
+            self.assertEqual(system_prompts.load_system_prompt("demo_prompt"), "v1")
+
+            # 文件未变化：只 stat，不重读
+            with patch.object(Path, "read_text", side_effect=AssertionError("reread")):
+                self.assertEqual(system_prompts.load_system_prompt("demo_prompt"), "v1")
+
+            path.write_text("v2!", encoding="utf-8")
+            mtime_ns = path.stat().st_mtime_ns + 10**9
+            os.utime(path, ns=(mtime_ns, mtime_ns))
+            self.assertEqual(system_prompts.load_system_prompt("demo_prompt"), "v2!")
+
+            # .txt 删除后回退到 .md
+            (self.system_dir / "demo_prompt.md").write_text("md", encoding="utf-8")
+            path.unlink()
+            self.assertEqual(system_prompts.load_system_prompt("demo_prompt"), "md")
+
+    def test_template_lookup_cached_and_invalidated_by_writes(self):
+        from backend.src.services.knowledge.query import prompts as prompt_service
+        from backend.src.services.llm import prompt_templates
+        from backend.src.storage import get_connection
+
+        self.assertIsNone(prompt_templates.find_prompt_template_id_by_name("greet"))
+        template_id = prompt_service.create_prompt_template(name="greet", template="hi {name}", description=None)
+        # 新建后负缓存被丢弃
+        self.assertEqual(prompt_templates.find_prompt_template_id_by_name(" greet "), template_id)
+        self.assertEqual(prompt_templates.get_prompt_template_text(template_id), "hi {name}")
+
+        with patch.object(prompt_templates, "get_connection", side_effect=AssertionError("db")):
+            self.assertEqual(prompt_templates.find_prompt_template_id_by_name("greet"), template_id)
+            self.assertEqual(prompt_templates.get_prompt_template_text(template_id), "hi {name}")
+
+        prompt_service.update_prompt_template(template_id=template_id, name=None, template="hello {name}", description=None)
+        self.assertEqual(prompt_templates.get_prompt_template_text(template_id), "hello {name}")
+
+        # 路由之外的直接写库不会被感知，需要统一钩子失效
+        with get_connection() as conn:
+            conn.execute("UPDATE prompt_templates SET template = ? WHERE id = ?", ("raw", template_id))
+        self.assertEqual(prompt_templates.get_prompt_template_text(template_id), "hello {name}")
+        prompt_templates.invalidate_prompt_caches()
+        self.assertEqual(prompt_templates.get_prompt_template_text(template_id), "raw")
+
+        prompt_service.delete_prompt_template(template_id=template_id)
+        self.assertIsNone(prompt_templates.find_prompt_template_id_by_name("greet"))
+        self.assertIsNone(prompt_templates.get_prompt_template_text(template_id))
+
+
+if __name__ == "__main__":
+    unittest.main()
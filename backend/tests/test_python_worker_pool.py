@@ -0,0 +1,123 @@
+import os
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from backend.src.services.execution.python_worker_pool import is_python_worker_supported
+
+_SCRIPT = """
+import os
+import sys
+
+data = sys.stdin.read()
+print("argv", sys.argv, "cwd", os.path.basename(os.getcwd()), "stdin", data, "env", os.environ.get("WORKER_TEST_ENV"))
+print("path0", os.path.basename(sys.path[0]), __name__, os.path.basename(__file__))
+print("to stderr", file=sys.stderr)
+if "--fail" in sys.argv:
+    raise ValueError("boom")
+if "--exit" in sys.argv:
+    sys.exit(7)
+if "--background" in sys.argv:
+    import subprocess
+    subprocess.Popen([sys.executable, "-c", "import time; time.sleep(8)"])
+if "--sleep" in sys.argv:
+    import time
+    time.sleep(60)
+"""
+
+
+@unittest.skipUnless(is_python_worker_supported(), "worker 池依赖 fork/SCM_RIGHTS（POSIX）")
+class TestPythonWorkerPool(unittest.TestCase):
+    def setUp(self):
+        from backend.src.services.execution.python_worker_pool import PythonWorkerPool
+
+        self._tmp = tempfile.TemporaryDirectory()
+        Path(self._tmp.name, "script.py").write_text(_SCRIPT, encoding="utf-8")
+        self.pool = PythonWorkerPool(size=1, preload=["json"], max_runs=3, max_rss_mb=0)
+
+    def tearDown(self):
+        self.pool.shutdown()
+        self._tmp.cleanup()
+
+    def test_results_match_subprocess_path(self):
+        from backend.src.services.execution.process_capture import run_process_streaming
+
+        with patch.dict(os.environ, {"WORKER_TEST_ENV": "x1"}):
+            for extra in ([], ["--exit"], ["--fail"], ["a b", "中文"]):
+                args = [sys.executable, "script.py", *extra]
+                pooled = self.pool.run(args, cwd=self._tmp.name, stdin_bytes=b"hello", timeout=20)
+                direct = run_process_streaming(args, cwd=self._tmp.name, stdin_bytes=b"hello", timeout=20)
+                self.assertIsNotNone(pooled)
+                self.assertEqual(pooled.returncode, direct.returncode)
+                self.assertEqual(pooled.stdout, direct.stdout)
+                self.assertEqual(pooled.stderr, direct.stderr)
+
+        # 满 max_runs 次后回收，后续调用自动启动新 worker
+        stats = self.pool.stats()
+        self.assertEqual(stats["runs"], 4)
+        self.assertEqual(stats["recycled"], 1)
+        self.assertEqual(stats["started"], 2)
+        self.assertEqual(stats["fallbacks"], 0)
+
+    def test_non_script_invocations_are_not_pooled(self):
+        cwd = self._tmp.name
+        self.assertIsNone(self.pool.run([sys.executable, "-c", "print(1)"], cwd=cwd))
+        self.assertIsNone(self.pool.run([sys.executable, "-u", "script.py"], cwd=cwd))
+        self.assertIsNone(self.pool.run([sys.executable, "missing.py"], cwd=cwd))
+        self.assertIsNone(self.pool.run(["echo", "script.py"], cwd=cwd))
+        self.assertEqual(self.pool.stats()["started"], 0)
+
+    def test_timeout_kills_forked_script(self):
+        started = time.monotonic()
+        captured = self.pool.run(
+            [sys.executable, "script.py", "--sleep"],
+            cwd=self._tmp.name,
+            timeout=1.0,
+        )
+        self.assertLess(time.monotonic() - started, 10)
+        self.assertTrue(captured.timed_out)
+        self.assertIsNone(captured.returncode)
+
+        # worker 仍可继续服务
+        again = self.pool.run([sys.executable, "script.py"], cwd=self._tmp.name, timeout=20)
+        self.assertEqual(again.returncode, 0)
+
+    def test_timeout_applies_when_background_child_holds_pipe(self):
+        started = time.monotonic()
+        captured = self.pool.run(
+            [sys.executable, "script.py", "--background"],
+            cwd=self._tmp.name,
+            timeout=1.0,
+        )
+        self.assertLess(time.monotonic() - started, 5)
+        self.assertTrue(captured.timed_out)
+        self.assertIsNone(captured.returncode)
+
+    def test_run_shell_command_uses_pool_when_enabled(self):
+        from backend.src.services.execution import python_worker_pool
+        from backend.src.services.execution.shell_command import run_shell_command
+
+        with patch.object(python_worker_pool, "AGENT_PYTHON_WORKER_POOL_ENABLED", True), patch.object(
+            python_worker_pool, "_POOL", self.pool
+        ), patch(
+            "backend.src.services.execution.shell_command.has_exec_permission",
+            return_value=True,
+        ), patch(
+            "backend.src.services.execution.shell_command.run_process_streaming",
+            side_effect=AssertionError("subprocess path"),
+        ):
+            result, error_message = run_shell_command(
+                {"command": "python script.py --exit", "workdir": self._tmp.name, "timeout_ms": 20000}
+            )
+
+        self.assertIsNone(error_message)
+        self.assertEqual(result["returncode"], 7)
+        self.assertFalse(result["ok"])
+        self.assertIn("to stderr", result["stderr"])
+
+
+if __name__ == "__main__":
+    unittest.main()
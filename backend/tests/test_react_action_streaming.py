@@ -0,0 +1,190 @@
+import json
+import unittest
+from unittest.mock import patch
+
+
+class TestIncrementalJsonObjectScanner(unittest.TestCase):
+    def test_object_split_across_chunks_with_braces_in_strings(self):
+        from backend.src.common.json_stream import IncrementalJsonObjectScanner
+
+        text = '说明文字 {"action": {"type": "task_output", "payload": {"content": "a } \\" { b"}}} 尾巴'
+        scanner = IncrementalJsonObjectScanner()
+        found = []
+        for i in range(0, len(text), 3):
+            found.extend(scanner.feed(text[i : i + 3]))
+
+        self.assertEqual(len(found), 1)
+        self.assertEqual(json.loads(found[0])["action"]["payload"]["content"], 'a } " { b')
+        self.assertEqual(scanner.consumed_chars, len(text))
+
+    def test_multiple_objects_are_emitted_in_order(self):
+        from backend.src.common.json_stream import IncrementalJsonObjectScanner
+
+        scanner = IncrementalJsonObjectScanner()
+        self.assertEqual(scanner.feed('{"a": 1} x {"b"'), ['{"a": 1}'])
+        self.assertTrue(scanner.in_object)
+        self.assertEqual(scanner.feed(': 2}'), ['{"b": 2}'])
+        self.assertFalse(scanner.in_object)
+
+    def test_oversized_object_is_dropped(self):
+        from backend.src.common.json_stream import IncrementalJsonObjectScanner
+
+        scanner = IncrementalJsonObjectScanner(max_object_chars=8)
+        self.assertEqual(scanner.feed('{"long_key": 1'), [])
+        self.assertFalse(scanner.in_object)
+        self.assertEqual(scanner.feed('} {"k":1}'), ['{"k":1}'])
+
+
+def _fake_stream_call(chunks, calls):
+    def _call(payload, on_text):
+        calls.append(payload)
+        received = []
+        stopped = False
+        for chunk in chunks:
+            received.append(chunk)
+            if on_text(chunk):
+                stopped = True
+                break
+        return {
+            "record": {"id": 1, "status": "success", "response": "".join(received)},
+            "stream": {"chunks": len(received), "stopped_early": stopped, "first_chunk_ms": 0, "elapsed_ms": 1},
+        }
+
+    return _call
+
+
+class TestGenerateActionStreaming(unittest.TestCase):
+    def _generate(self, **kwargs):
+        from backend.src.agent.runner.react_step_executor import generate_action_with_retry
+
+        params = dict(
+            react_prompt="p",
+            task_id=1,
+            run_id=1,
+            step_order=1,
+            step_title="task_output 输出结果",
+            workdir=".",
+            model="m",
+            react_params={"max_tokens": 1000},
+            variables_source="test",
+            allowed_actions_text="task_output",
+        )
+        params.update(kwargs)
+        return generate_action_with_retry(**params)
+
+    def test_stops_stream_once_valid_action_is_parsed(self):
+        action = {"action": {"type": "task_output", "payload": {"output_type": "text", "content": "ok"}}}
+        action_text = json.dumps(action, ensure_ascii=False)
+        chunks = [action_text[:10], action_text[10:], "\n解释：", "以上动作用于输出结果。" * 50]
+        calls: list = []
+        stats: dict = {}
+
+        def _llm_call(_payload):
+            raise AssertionError("流式成功时不应走非流式调用")
+
+        action_obj, action_type, payload_obj, err, last_text = self._generate(
+            llm_call=_llm_call,
+            llm_stream_call=_fake_stream_call(chunks, calls),
+            stats_sink=stats,
+        )
+
+        self.assertIsNone(err)
+        self.assertEqual(action_type, "task_output")
+        self.assertEqual(payload_obj.get("content"), "ok")
+        self.assertEqual(json.loads(last_text), json.loads(action_text))
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(stats["streaming"])
+        self.assertTrue(stats["stopped_early"])
+        self.assertEqual(stats["streamed_chars"], len(action_text))
+        self.assertIsNotNone(stats["time_to_action_ms"])
+        self.assertGreater(stats["tokens_saved_est"], 0)
+
+    def test_invalid_first_object_keeps_streaming_until_valid_one(self):
+        valid = json.dumps({"action": {"type": "task_output", "payload": {"output_type": "text", "content": "ok"}}})
+        chunks = ['{"foo": 1} ', valid, " 结尾"]
+        calls: list = []
+        stats: dict = {}
+
+        _obj, action_type, _payload, err, _text = self._generate(
+            llm_call=lambda _p: {"record": {"status": "error", "error": "unused"}},
+            llm_stream_call=_fake_stream_call(chunks, calls),
+            stats_sink=stats,
+        )
+
+        self.assertIsNone(err)
+        self.assertEqual(action_type, "task_output")
+        self.assertTrue(stats["stopped_early"])
+        self.assertEqual(stats["streamed_chars"], len(chunks[0]) + len(valid))
+
+    def test_stream_failure_falls_back_to_non_streaming_call(self):
+        valid = json.dumps({"action": {"type": "task_output", "payload": {"output_type": "text", "content": "ok"}}})
+        stats: dict = {}
+        plain_calls: list = []
+
+        def _stream_call(_payload, _on_text):
+            return {"record": {"id": 1, "status": "error", "error": "provider 不支持同步流式调用"}, "stream": {}}
+
+        def _llm_call(payload):
+            plain_calls.append(payload)
+            return {"record": {"id": 2, "status": "success", "response": valid}}
+
+        _obj, action_type, _payload, err, _text = self._generate(
+            llm_call=_llm_call,
+            llm_stream_call=_stream_call,
+            stats_sink=stats,
+        )
+
+        self.assertIsNone(err)
+        self.assertEqual(action_type, "task_output")
+        self.assertEqual(len(plain_calls), 1)
+        self.assertTrue(stats["fallback"])
+        self.assertFalse(stats["stopped_early"])
+
+    def test_record_action_generation_stats_is_bounded(self):
+        from backend.src.agent.runner.react_step_executor import record_action_generation_stats
+
+        agent_state: dict = {}
+        for i in range(60):
+            record_action_generation_stats(agent_state, step_order=i + 1, stats={"total_ms": i})
+
+        self.assertEqual(len(agent_state["action_generation_stats"]), 50)
+        self.assertEqual(agent_state["action_generation_last_meta"], {"step_order": 60, "total_ms": 59})
+
+
+class TestCallLlmStreaming(unittest.TestCase):
+    def test_on_text_true_closes_provider_stream(self):
+        import backend.src.services.llm.llm_client as llm_client
+
+        state = {"closed": False, "yielded": 0}
+
+        class StubClient:
+            def __init__(self, provider=None, base_url=None, **_kwargs):
+                self._provider_name = "openai"
+                self._default_model = "fake-model"
+
+            def stream_prompt_sync(self, prompt, model=None, parameters=None, timeout=120):
+                try:
+                    for piece in ["{", '"a": 1', "}", " tail", " more"]:
+                        state["yielded"] += 1
+                        yield {"content": piece, "usage": None}
+                finally:
+                    state["closed"] = True
+
+        with patch.object(llm_client, "LLMClient", StubClient):
+            content, _tokens, meta = llm_client.call_llm_streaming(
+                "p",
+                "fake-model",
+                {},
+                provider="openai",
+                on_text=lambda chunk: chunk == "}",
+            )
+
+        self.assertEqual(content, '{"a": 1}')
+        self.assertTrue(meta["stopped_early"])
+        self.assertEqual(meta["chunks"], 3)
+        self.assertEqual(state["yielded"], 3)
+        self.assertTrue(state["closed"])
+
+
+if __name__ == "__main__":
+    unittest.main()
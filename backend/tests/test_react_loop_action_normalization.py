@@ -727,24 +727,11 @@ class TestReactLoopActionNormalization(unittest.TestCase):
         script_path.parent.mkdir(parents=True, exist_ok=True)
         script_path.write_text("print('ok')\n", encoding="utf-8")
 
-        rows = [
-            {
-                "id": 1,
-                "status": "done",
-                "detail": json.dumps(
-                    {"type": "file_write", "payload": {"path": "backend/.agent/workspace/other.py"}},
-                    ensure_ascii=False,
-                ),
-                "result": json.dumps(
-                    {"path": str((Path(self._tmp.name) / "backend/.agent/workspace/other.py").resolve())},
-                    ensure_ascii=False,
-                ),
-            }
-        ]
-
+        # 当前 run 只登记了另一个脚本
+        other_path = str((Path(self._tmp.name) / "backend/.agent/workspace/other.py").resolve())
         with patch(
-            "backend.src.actions.handlers.tool_call.list_task_steps_for_run",
-            return_value=rows,
+            "backend.src.actions.handlers.tool_call.get_run_written_paths",
+            return_value={os.path.normcase(other_path)},
         ):
             error = validate_runtime_action_contracts(
                 task_id=task_id,
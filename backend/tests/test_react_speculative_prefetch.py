@@ -0,0 +1,386 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+from datetime import datetime, timezone
+from pathlib import Path
+
+
+class TestSpeculationSkipReason(unittest.TestCase):
+    def test_only_predictable_actions_with_independent_next_step(self):
+        from backend.src.agent.runner.react_speculation import speculation_skip_reason
+
+        common = dict(next_is_feedback=False, next_has_direct_user_prompt=False)
+        self.assertIsNone(speculation_skip_reason(current_action_type="file_write", next_allowed=["shell_command"], **common))
+        self.assertEqual(
+            speculation_skip_reason(current_action_type="shell_command", next_allowed=["file_write"], **common),
+            "unpredictable_observation",
+        )
+        self.assertEqual(
+            speculation_skip_reason(current_action_type="file_write", next_allowed=["task_output"], **common),
+            "next_depends_on_observation",
+        )
+        self.assertEqual(
+            speculation_skip_reason(
+                current_action_type="file_write",
+                next_allowed=["file_write"],
+                next_is_feedback=True,
+                next_has_direct_user_prompt=False,
+            ),
+            "next_is_feedback",
+        )
+
+
+def _file_write_result(step_row):
+    from backend.src.actions.handlers.file_action_common import resolve_action_target_path
+
+    payload = json.loads(step_row["detail"])["payload"]
+    return {"path": resolve_action_target_path(payload["path"]), "bytes": len(payload["content"].encode("utf-8"))}
+
+
+class TestPredictSuccessObservation(unittest.TestCase):
+    def test_prediction_matches_real_observation_line(self):
+        from backend.src.agent.runner.react_speculation import predict_success_observation
+        from backend.src.agent.runner.react_step_executor import build_observation_line
+
+        payload = {"path": "a.txt", "content": "你好"}
+        predicted = predict_success_observation(action_type="file_write", title="写入", payload=payload)
+        actual, _ = build_observation_line(
+            action_type="file_write",
+            title="写入",
+            result={"path": os.path.abspath("a.txt"), "bytes": 6},
+            context={},
+        )
+        self.assertEqual(predicted, actual)
+        self.assertIsNone(predict_success_observation(action_type="memory_write", title="t", payload={"content": "x"}))
+        self.assertIsNone(predict_success_observation(action_type="file_write", title="t", payload={"content": "x"}))
+
+
+class TestSpeculativePrefetchCancel(unittest.TestCase):
+    def test_cancel_abandons_inflight_llm_call(self):
+        from backend.src.agent.runner.react_speculation import start_speculative_prefetch
+        from backend.src.services.llm.llm_calls import _run_with_hard_timeout
+        from backend.src.services.llm.llm_client import LLMCallCancelled
+
+        entered = threading.Event()
+        release = threading.Event()
+
+        def _blocking_provider_call():
+            entered.set()
+            release.wait(timeout=10)
+            return "late", None
+
+        prefetch = start_speculative_prefetch(
+            step_order=2,
+            key=("k",),
+            generate=lambda: _run_with_hard_timeout(_blocking_provider_call, timeout_seconds=30),
+        )
+        try:
+            self.assertTrue(entered.wait(timeout=5))
+            self.assertTrue(prefetch.cancel())
+            # 在途调用被放弃：预取线程立即返回，而不是等供应商调用结束
+            self.assertTrue(prefetch.done.wait(timeout=2))
+            self.assertIsInstance(prefetch.box.get("error"), LLMCallCancelled)
+        finally:
+            release.set()
+
+
+class TestReactSpeculativePrefetch(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        os.environ["AGENT_DB_PATH"] = str(Path(self._tmp.name) / "agent_test.db")
+        os.environ["AGENT_PROMPT_ROOT"] = str(Path(self._tmp.name) / "prompt")
+
+        import backend.src.storage as storage
+
+        storage.init_db()
+
+    def tearDown(self):
+        os.environ.pop("AGENT_DB_PATH", None)
+        os.environ.pop("AGENT_PROMPT_ROOT", None)
+        self._tmp.cleanup()
+
+    def _create_task_and_run(self):
+        from backend.src.constants import RUN_STATUS_RUNNING, STATUS_RUNNING
+        from backend.src.storage import get_connection
+
+        created_at = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+        with get_connection() as conn:
+            cursor = conn.execute(
+                "INSERT INTO tasks (title, status, created_at, expectation_id, started_at, finished_at) VALUES (?, ?, ?, ?, ?, ?)",
+                ("test", STATUS_RUNNING, created_at, None, created_at, None),
+            )
+            task_id = int(cursor.lastrowid)
+            cursor = conn.execute(
+                "INSERT INTO task_runs (task_id, status, summary, started_at, finished_at, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (task_id, RUN_STATUS_RUNNING, "agent_command_react", created_at, None, created_at, created_at),
+            )
+            run_id = int(cursor.lastrowid)
+        return task_id, run_id
+
+    def _run(self, *, llm_call, execute_step_action, agent_state, message="写入 README.md 文档与 main.py 代码"):
+        from backend.src.agent.core.plan_structure import PlanStructure
+        from backend.src.agent.runner.react_loop_impl import run_react_loop_impl
+
+        task_id, run_id = self._create_task_and_run()
+        plan_struct = PlanStructure.from_legacy(
+            plan_titles=["file_write:README.md 写入文档", "file_write:main.py 写入代码"],
+            plan_items=[{"id": 1, "brief": "doc", "status": "pending"}, {"id": 2, "brief": "code", "status": "pending"}],
+            plan_allows=[["file_write"], ["file_write"]],
+            plan_artifacts=[],
+        )
+        gen = run_react_loop_impl(
+            task_id=task_id,
+            run_id=run_id,
+            message=message,
+            workdir=self._tmp.name,
+            model="base-model",
+            parameters={"temperature": 0.2},
+            plan_struct=plan_struct,
+            tools_hint="(无)",
+            skills_hint="(无)",
+            memories_hint="(无)",
+            graph_hint="(无)",
+            agent_state=agent_state,
+            context={"last_llm_response": None},
+            observations=[],
+            start_step_order=1,
+            variables_source="test",
+            llm_call=llm_call,
+            execute_step_action=execute_step_action,
+            speculative_prefetch=True,
+        )
+        try:
+            while True:
+                next(gen)
+        except StopIteration as exc:
+            return exc.value
+
+    def test_next_action_is_prefetched_during_execution_and_accepted(self):
+        from backend.src.constants import RUN_STATUS_DONE
+
+        actions = {
+            1: {"action": {"type": "file_write", "payload": {"path": "README.md", "content": "doc"}}},
+            2: {"action": {"type": "file_write", "payload": {"path": "main.py", "content": "code"}}},
+        }
+        sources: list = []
+        speculative_started = threading.Event()
+        lock = threading.Lock()
+
+        def _fake_llm_call(payload):
+            variables = payload.get("variables") or {}
+            source = str(variables.get("source") or "")
+            with lock:
+                sources.append(source)
+            if source.endswith("_speculative"):
+                speculative_started.set()
+            response = json.dumps(actions[int(variables["step_order"])], ensure_ascii=False)
+            return {"record": {"status": "success", "response": response}}
+
+        executed: list = []
+
+        def _fake_execute(_task_id, _run_id, step_row, context=None):
+            executed.append(json.loads(step_row["detail"])["payload"]["path"])
+            if len(executed) == 1:
+                # 第 1 步执行期间，下一步的 action 应已在后台开始生成
+                self.assertTrue(speculative_started.wait(timeout=5))
+            return _file_write_result(step_row), None
+
+        agent_state: dict = {}
+        result = self._run(llm_call=_fake_llm_call, execute_step_action=_fake_execute, agent_state=agent_state)
+
+        self.assertEqual(result.run_status, RUN_STATUS_DONE)
+        self.assertEqual(executed, ["README.md", "main.py"])
+        # 第 2 步直接复用预取结果：总共只有 2 次 LLM 调用
+        self.assertEqual(sources, ["test", "test_speculative"])
+        stats = agent_state.get("speculation_stats") or {}
+        self.assertEqual(stats.get("started"), 1)
+        self.assertEqual(stats.get("accepted"), 1)
+        self.assertEqual(stats.get("discarded"), 0)
+        self.assertEqual(stats.get("accept_rate"), 1.0)
+        self.assertGreaterEqual(stats.get("latency_saved_ms"), 0)
+        last_meta = agent_state.get("action_generation_last_meta") or {}
+        self.assertTrue(last_meta.get("speculative"))
+        self.assertEqual(last_meta.get("step_order"), 2)
+
+    def test_invalid_prefetch_is_discarded_and_regenerated(self):
+        from backend.src.constants import RUN_STATUS_DONE
+
+        sources: list = []
+        lock = threading.Lock()
+        valid = {
+            1: {"action": {"type": "file_write", "payload": {"path": "README.md", "content": "doc"}}},
+            2: {"action": {"type": "file_write", "payload": {"path": "main.py", "content": "code"}}},
+        }
+
+        def _fake_llm_call(payload):
+            variables = payload.get("variables") or {}
+            source = str(variables.get("source") or "")
+            with lock:
+                sources.append(source)
+            if source.endswith("_speculative"):
+                return {"record": {"status": "success", "response": "not json"}}
+            return {"record": {"status": "success", "response": json.dumps(valid[int(variables["step_order"])])}}
+
+        agent_state: dict = {}
+        result = self._run(
+            llm_call=_fake_llm_call,
+            execute_step_action=lambda _t, _r, step_row, context=None: (_file_write_result(step_row), None),
+            agent_state=agent_state,
+        )
+
+        self.assertEqual(result.run_status, RUN_STATUS_DONE)
+        self.assertEqual(sorted(sources), sorted(["test", "test_speculative", "test"]))
+        stats = agent_state.get("speculation_stats") or {}
+        self.assertEqual(stats.get("accepted"), 0)
+        self.assertEqual(stats.get("discarded"), 1)
+        self.assertEqual(stats.get("discard_reasons"), {"invalid_action": 1})
+        self.assertEqual(stats.get("accept_rate"), 0.0)
+
+    def test_prefetch_discarded_when_real_observation_differs(self):
+        """第 1 步写入带告警：真实观测与预测的成功观测不同，预取不可复用。"""
+        from backend.src.constants import RUN_STATUS_DONE
+
+        actions = {
+            1: {"action": {"type": "file_write", "payload": {"path": "README.md", "content": "doc"}}},
+            2: {"action": {"type": "file_write", "payload": {"path": "main.py", "content": "code"}}},
+        }
+        sources: list = []
+        lock = threading.Lock()
+
+        def _fake_llm_call(payload):
+            variables = payload.get("variables") or {}
+            with lock:
+                sources.append(str(variables.get("source") or ""))
+            return {"record": {"status": "success", "response": json.dumps(actions[int(variables["step_order"])])}}
+
+        def _fake_execute(_task_id, _run_id, step_row, context=None):
+            result = _file_write_result(step_row)
+            if result["path"].endswith("README.md"):
+                result["warnings"] = ["空内容"]
+            return result, None
+
+        agent_state: dict = {}
+        result = self._run(llm_call=_fake_llm_call, execute_step_action=_fake_execute, agent_state=agent_state)
+
+        self.assertEqual(result.run_status, RUN_STATUS_DONE)
+        self.assertEqual(sorted(sources), sorted(["test", "test_speculative", "test"]))
+        stats = agent_state.get("speculation_stats") or {}
+        self.assertEqual(stats.get("accepted"), 0)
+        self.assertEqual(stats.get("discard_reasons"), {"observation_mismatch": 1})
+
+    def test_prefetch_discarded_when_step_result_changes_retry_guidance(self):
+        """第 1 步成功但无目标进展 → 下一步 prompt 会注入“必须换策略”，预取结果不可复用。"""
+        actions = {
+            1: {"action": {"type": "file_write", "payload": {"path": "README.md", "content": "doc"}}},
+            2: {"action": {"type": "file_write", "payload": {"path": "main.py", "content": "code"}}},
+        }
+        sources: list = []
+        lock = threading.Lock()
+
+        def _fake_llm_call(payload):
+            variables = payload.get("variables") or {}
+            with lock:
+                sources.append(str(variables.get("source") or ""))
+            return {"record": {"status": "success", "response": json.dumps(actions[int(variables["step_order"])])}}
+
+        agent_state: dict = {}
+        self._run(
+            llm_call=_fake_llm_call,
+            execute_step_action=lambda *_a, **_k: ({"ok": True}, None),
+            agent_state=agent_state,
+            message="m",
+        )
+
+        self.assertEqual(len(sources), 3)
+        stats = agent_state.get("speculation_stats") or {}
+        self.assertEqual(stats.get("discard_reasons"), {"context_changed": 1})
+
+    def test_inflight_prefetch_cancelled_when_run_stops(self):
+        from backend.src.constants import RUN_STATUS_STOPPED
+        from backend.src.storage import get_connection
+
+        actions = {
+            1: {"action": {"type": "file_write", "payload": {"path": "README.md", "content": "doc"}}},
+            2: {"action": {"type": "file_write", "payload": {"path": "main.py", "content": "code"}}},
+        }
+        speculative_started = threading.Event()
+        release = threading.Event()
+
+        def _fake_llm_call(payload):
+            variables = payload.get("variables") or {}
+            if str(variables.get("source") or "").endswith("_speculative"):
+                speculative_started.set()
+                release.wait(timeout=5)
+            return {"record": {"status": "success", "response": json.dumps(actions[int(variables["step_order"])])}}
+
+        def _fake_execute(_task_id, run_id, _step_row, context=None):
+            self.assertTrue(speculative_started.wait(timeout=5))
+            # 步骤执行期间 run 被外部取消
+            with get_connection() as conn:
+                conn.execute("UPDATE task_runs SET status = ? WHERE id = ?", (RUN_STATUS_STOPPED, int(run_id)))
+            return {"ok": True}, None
+
+        agent_state: dict = {}
+        try:
+            result = self._run(llm_call=_fake_llm_call, execute_step_action=_fake_execute, agent_state=agent_state)
+        finally:
+            release.set()
+
+        self.assertEqual(result.run_status, RUN_STATUS_STOPPED)
+        stats = agent_state.get("speculation_stats") or {}
+        self.assertEqual((stats.get("started"), stats.get("discarded")), (1, 1))
+        self.assertEqual(stats.get("cancelled_in_flight"), 1)
+        self.assertEqual(stats.get("discard_reasons"), {"run_stopped": 1})
+
+    def test_prefetch_cancelled_when_generator_is_closed(self):
+        from backend.src.agent.core.plan_structure import PlanStructure
+        from backend.src.agent.runner.react_loop_impl import run_react_loop_impl
+
+        def _fake_llm_call(payload):
+            variables = payload.get("variables") or {}
+            step_order = int(variables["step_order"])
+            action = {"type": "file_write", "payload": {"path": f"f{step_order}.txt", "content": "x"}}
+            return {"record": {"status": "success", "response": json.dumps({"action": action})}}
+
+        task_id, run_id = self._create_task_and_run()
+        agent_state: dict = {}
+        gen = run_react_loop_impl(
+            task_id=task_id,
+            run_id=run_id,
+            message="写入文件",
+            workdir=self._tmp.name,
+            model="base-model",
+            parameters={},
+            plan_struct=PlanStructure.from_legacy(
+                plan_titles=["file_write:f1.txt 写入", "file_write:f2.txt 写入"],
+                plan_items=[{"id": 1, "brief": "a", "status": "pending"}, {"id": 2, "brief": "b", "status": "pending"}],
+                plan_allows=[["file_write"], ["file_write"]],
+                plan_artifacts=[],
+            ),
+            tools_hint="(无)",
+            skills_hint="(无)",
+            memories_hint="(无)",
+            graph_hint="(无)",
+            agent_state=agent_state,
+            context={"last_llm_response": None},
+            observations=[],
+            start_step_order=1,
+            variables_source="test",
+            llm_call=_fake_llm_call,
+            execute_step_action=lambda *_a, **_k: ({"ok": True}, None),
+            speculative_prefetch=True,
+        )
+        # 推进到预取已发起（第 1 步开始执行）后模拟客户端断开
+        while not (agent_state.get("speculation_stats") or {}).get("started"):
+            next(gen)
+        gen.close()
+
+        stats = agent_state.get("speculation_stats") or {}
+        self.assertEqual(stats.get("discarded"), 1)
+        self.assertEqual(stats.get("discard_reasons"), {"run_aborted": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,166 @@
+import hashlib
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+
+class TestRunArtifacts(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        os.environ["AGENT_DB_PATH"] = str(Path(self._tmp.name) / "agent_test.db")
+        os.environ["AGENT_PROMPT_ROOT"] = str(Path(self._tmp.name) / "prompt")
+
+        from backend.src.services.tasks.run_artifacts import reset_run_artifact_index
+        from backend.src.storage import init_db
+
+        init_db()
+        reset_run_artifact_index()
+
+        from backend.src.storage import get_connection
+
+        with get_connection() as conn:
+            cursor = conn.execute(
+                "INSERT INTO tasks (title, status, created_at) VALUES ('t', 'running', '2024-01-01')"
+            )
+            self.task_id = int(cursor.lastrowid)
+            cursor = conn.execute(
+                "INSERT INTO task_runs (task_id, status, created_at, updated_at) VALUES (?, 'running', '2024-01-01', '2024-01-01')",
+                (self.task_id,),
+            )
+            self.run_id = int(cursor.lastrowid)
+
+    def tearDown(self):
+        os.environ.pop("AGENT_DB_PATH", None)
+        os.environ.pop("AGENT_PROMPT_ROOT", None)
+        self._tmp.cleanup()
+
+    def _insert_step(self, conn, *, status: str, action: str, path: str) -> int:
+        cursor = conn.execute(
+            "INSERT INTO task_steps (task_id, run_id, title, status, detail, result, created_at, updated_at) "
+            "VALUES (?, ?, 't', ?, ?, ?, '2024-01-01', '2024-01-01')",
+            (
+                self.task_id,
+                self.run_id,
+                status,
+                json.dumps({"type": action, "payload": {"path": path}}),
+                json.dumps({"path": path, "bytes": 3}),
+            ),
+        )
+        return int(cursor.lastrowid)
+
+    def test_file_steps_register_artifacts_when_marked_done(self):
+        from backend.src.actions.registry import get_action_spec
+        from backend.src.services.tasks import run_artifacts
+        from backend.src.services.tasks.run_artifacts import get_run_written_paths, list_run_artifacts
+        from backend.src.services.tasks.task_queries import mark_task_step_done, mark_task_step_failed
+        from backend.src.storage import get_connection
+
+        target = os.path.join(self._tmp.name, "out", "notes.txt")
+        with get_connection() as conn:
+            write_id = self._insert_step(conn, status="running", action="file_write", path=target)
+            append_id = self._insert_step(conn, status="running", action="file_append", path=target)
+            failed_id = self._insert_step(conn, status="running", action="file_append", path=target)
+
+        key = os.path.normcase(target)
+        with patch("backend.src.actions.handlers.file_action_common.has_write_permission_for_path", return_value=True):
+            result, error = get_action_spec("file_write").executor(
+                self.task_id, self.run_id, {"id": write_id}, {"path": target, "content": "abc"}, {}
+            )
+            self.assertIsNone(error)
+            # 动作写盘后、步骤 done 之前不登记
+            self.assertEqual(get_run_written_paths(task_id=self.task_id, run_id=self.run_id), set())
+            mark_task_step_done(step_id=write_id, result=json.dumps(result), finished_at="2024-01-01T00:00:01Z")
+            self.assertEqual(get_run_written_paths(task_id=self.task_id, run_id=self.run_id), {key})
+
+            result, error = get_action_spec("file_append").executor(
+                self.task_id, self.run_id, {"id": append_id}, {"path": target, "content": "def"}, {}
+            )
+            self.assertIsNone(error)
+            mark_task_step_done(step_id=append_id, result=json.dumps(result), finished_at="2024-01-01T00:00:02Z")
+
+            _, error = get_action_spec("file_append").executor(
+                self.task_id, self.run_id, {"id": failed_id}, {"path": target, "content": "!"}, {}
+            )
+            self.assertIsNone(error)
+            mark_task_step_failed(step_id=failed_id, error="verify failed", finished_at="2024-01-01T00:00:03Z")
+
+        # 排除最近一次产出步骤（当前步骤）后不再视为“已绑定”；失败步骤不改变登记
+        self.assertEqual(
+            get_run_written_paths(task_id=self.task_id, run_id=self.run_id, exclude_step_ids=(append_id,)), set()
+        )
+
+        # 哈希在读取登记时计算，文件未变化时复用缓存
+        with patch.object(run_artifacts, "_hash_file", wraps=run_artifacts._hash_file) as hashed:
+            items = list_run_artifacts(task_id=self.task_id, run_id=self.run_id)
+            list_run_artifacts(task_id=self.task_id, run_id=self.run_id)
+        self.assertEqual(hashed.call_count, 1)
+        self.assertEqual(len(items), 1)
+        self.assertEqual(items[0]["kind"], "file_append")
+        self.assertEqual(items[0]["step_id"], append_id)
+        self.assertEqual(items[0]["size"], 7)
+        self.assertEqual(items[0]["sha256"], hashlib.sha256(b"abcdef!").hexdigest())
+
+        with patch("backend.src.actions.handlers.file_action_common.has_write_permission_for_path", return_value=True):
+            _, error = get_action_spec("file_delete").executor(
+                self.task_id, self.run_id, {"id": failed_id + 1}, {"path": os.path.dirname(target), "recursive": True}, {}
+            )
+        self.assertIsNone(error)
+        self.assertEqual(get_run_written_paths(task_id=self.task_id, run_id=self.run_id), set())
+
+        from backend.src.repositories.run_artifacts_repo import list_run_artifacts as list_rows
+
+        self.assertEqual(list_rows(run_id=self.run_id), [])
+
+    def test_in_flight_run_is_backfilled_once_from_steps(self):
+        from backend.src.services.tasks import run_artifacts
+        from backend.src.storage import get_connection
+
+        done_path = os.path.join(self._tmp.name, "fetch.py")
+        failed_path = os.path.join(self._tmp.name, "broken.py")
+        with get_connection() as conn:
+            step_id = self._insert_step(conn, status="done", action="file_write", path=done_path)
+            self._insert_step(conn, status="failed", action="file_write", path=failed_path)
+            self._insert_step(conn, status="done", action="shell_command", path=failed_path)
+
+        paths = run_artifacts.get_run_written_paths(task_id=self.task_id, run_id=self.run_id)
+        self.assertEqual(paths, {os.path.normcase(done_path)})
+        self.assertEqual(
+            run_artifacts.get_run_artifact(task_id=self.task_id, run_id=self.run_id, path=done_path)["step_id"],
+            step_id,
+        )
+
+        # 进程重启（索引清空）后从 run_artifacts 表加载，不再回扫 task_steps
+        run_artifacts.reset_run_artifact_index()
+        with patch.object(run_artifacts, "list_task_steps_for_run", side_effect=AssertionError("rescan")):
+            paths = run_artifacts.get_run_written_paths(task_id=self.task_id, run_id=self.run_id)
+        self.assertEqual(paths, {os.path.normcase(done_path)})
+
+    def test_backfill_active_runs_and_artifacts_check_provenance(self):
+        from backend.src.services.agent_review.review_snapshot import build_artifacts_check
+        from backend.src.services.tasks.run_artifacts import backfill_active_run_artifacts, list_run_artifacts
+        from backend.src.storage import get_connection
+
+        csv_path = os.path.join(self._tmp.name, "data.csv")
+        Path(csv_path).write_text("a,b\n1,2\n", encoding="utf-8")
+        with get_connection() as conn:
+            step_id = self._insert_step(conn, status="done", action="file_write", path=csv_path)
+
+        self.assertEqual(backfill_active_run_artifacts(), {"runs": 1, "artifacts": 1})
+        self.assertEqual(backfill_active_run_artifacts(), {"runs": 0, "artifacts": 0})
+
+        _, items, missing = build_artifacts_check(
+            plan_artifacts=["data.csv", "missing.csv"],
+            state_obj={"workdir": self._tmp.name},
+            run_artifacts=list_run_artifacts(task_id=self.task_id, run_id=self.run_id),
+        )
+        self.assertEqual(missing, ["missing.csv"])
+        self.assertEqual(items[0]["step_id"], step_id)
+        self.assertEqual(items[0]["kind"], "file_write")
+        self.assertNotIn("step_id", items[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
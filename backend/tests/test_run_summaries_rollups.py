@@ -0,0 +1,188 @@
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+
+class TestRunSummariesRollups(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        os.environ["AGENT_DB_PATH"] = str(Path(self._tmp.name) / "agent_test.db")
+        os.environ["AGENT_PROMPT_ROOT"] = str(Path(self._tmp.name) / "prompt")
+
+        import backend.src.storage as storage
+
+        storage.init_db()
+
+    def tearDown(self):
+        os.environ.pop("AGENT_DB_PATH", None)
+        os.environ.pop("AGENT_PROMPT_ROOT", None)
+        self._tmp.cleanup()
+
+    def _create_run(self, *, created_at: str, status: str = "running", summary: str = "agent_command_react") -> int:
+        from backend.src.repositories.task_runs_repo import create_task_run
+        from backend.src.repositories.tasks_repo import create_task
+
+        task_id, _ = create_task(title="t", status="running", created_at=created_at)
+        run_id, _, _ = create_task_run(
+            task_id=task_id,
+            status=status,
+            summary=summary,
+            created_at=created_at,
+        )
+        return run_id
+
+    def _add_steps_and_tokens(self, run_id: int, *, steps: int, tokens: int, created_at: str) -> None:
+        from backend.src.storage import get_connection
+
+        with get_connection() as conn:
+            for i in range(steps):
+                conn.execute(
+                    "INSERT INTO task_steps (task_id, run_id, title, status, created_at, updated_at, step_order) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (1, run_id, f"s{i}", "done", created_at, created_at, i + 1),
+                )
+            conn.execute(
+                "INSERT INTO llm_records (prompt, response, run_id, created_at, updated_at, tokens_total) VALUES (?, ?, ?, ?, ?, ?)",
+                ("p", "r", run_id, created_at, created_at, tokens),
+            )
+
+    def _rollups(self):
+        from backend.src.storage import get_connection
+
+        with get_connection() as conn:
+            rows = conn.execute(
+                "SELECT day, status, mode, runs, steps, tokens_total FROM run_daily_rollups ORDER BY day, status, mode"
+            ).fetchall()
+        return [tuple(row) for row in rows]
+
+    def test_finalize_updates_summary_and_moves_rollup(self):
+        from backend.src.repositories.task_runs_repo import update_task_run
+
+        created_at = "2026-02-01T10:00:00Z"
+        run_id = self._create_run(created_at=created_at)
+        self.assertEqual(self._rollups(), [("2026-02-01", "running", "do", 1, 0, 0)])
+
+        self._add_steps_and_tokens(run_id, steps=3, tokens=120, created_at=created_at)
+        update_task_run(run_id=run_id, status="done", agent_state={"mode": "think", "reflection_count": 2})
+        self.assertEqual(self._rollups(), [("2026-02-01", "done", "think", 1, 3, 120)])
+
+        # 继续执行再失败：rollup 从 done 挪到 failed，不重复计数
+        update_task_run(run_id=run_id, status="failed")
+        self.assertEqual(self._rollups(), [("2026-02-01", "failed", "think", 1, 3, 120)])
+
+    def test_step_writes_refresh_running_summary(self):
+        from backend.src.repositories.task_runs_repo import update_task_run
+        from backend.src.repositories.task_steps_repo import (
+            TaskStepCreateParams,
+            create_task_step,
+            mark_task_step_done,
+        )
+        from backend.src.storage import get_connection
+
+        created_at = "2026-02-02T10:00:00Z"
+        run_id = self._create_run(created_at=created_at)
+        step_id, _, _ = create_task_step(
+            TaskStepCreateParams(task_id=1, run_id=run_id, title="s1", status="running", step_order=1)
+        )
+        self.assertEqual(self._rollups(), [("2026-02-02", "running", "do", 1, 1, 0)])
+
+        with get_connection() as conn:
+            conn.execute(
+                "INSERT INTO llm_records (prompt, response, run_id, created_at, updated_at, tokens_total) VALUES (?, ?, ?, ?, ?, ?)",
+                ("p", "r", run_id, created_at, created_at, 40),
+            )
+        mark_task_step_done(step_id=step_id, result="{}", finished_at=created_at)
+        self.assertEqual(self._rollups(), [("2026-02-02", "running", "do", 1, 1, 40)])
+
+        # 运行中保存 agent_state 同样刷新 replan_attempts 等字段
+        update_task_run(run_id=run_id, agent_state={"mode": "do", "replan_attempts": 2})
+        with get_connection() as conn:
+            row = conn.execute("SELECT replan_attempts FROM run_summaries WHERE run_id = ?", (run_id,)).fetchone()
+        self.assertEqual(int(row["replan_attempts"]), 2)
+
+    def test_summary_keeps_status_casing(self):
+        from backend.src.storage import get_connection
+
+        run_id = self._create_run(created_at="2026-02-03T10:00:00Z", status="Done")
+        with get_connection() as conn:
+            row = conn.execute("SELECT status FROM run_summaries WHERE run_id = ?", (run_id,)).fetchone()
+        self.assertEqual(row["status"], "Done")
+
+    def test_backfill_and_metrics_match_live_computation(self):
+        from backend.src.services.metrics.agent_metrics import compute_agent_metrics
+        from backend.src.services.metrics.run_summaries import backfill_run_summaries
+        from backend.src.storage import get_connection
+
+        # 历史数据：直接写库（没有经过仓储层），因此没有汇总行
+        rows = [
+            (101, "done", "2026-01-20T08:00:00Z", {"mode": "do", "replan_attempts": 1}, 2, 50),
+            (102, "failed", "2026-02-01T03:00:00Z", {"mode": "think", "reflection_count": 3}, 1, 70),
+            (103, "done", "2026-02-01T20:00:00Z", {"mode": "do"}, 4, 30),
+            (104, "done", "2026-02-03T09:00:00Z", {"mode": "do", "replan_attempts": 2}, 1, 10),
+        ]
+        with get_connection() as conn:
+            for run_id, status, created_at, state, _steps, _tokens in rows:
+                conn.execute(
+                    "INSERT INTO task_runs (id, task_id, status, summary, created_at, updated_at, agent_state) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (run_id, 1, status, "agent_command_react", created_at, created_at, json.dumps(state)),
+                )
+            conn.execute(
+                "INSERT INTO task_runs (id, task_id, status, summary, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (105, 1, "done", "manual", "2026-02-03T09:00:00Z", "2026-02-03T09:00:00Z"),
+            )
+        for run_id, _status, created_at, _state, steps, tokens in rows:
+            self._add_steps_and_tokens(run_id, steps=steps, tokens=tokens, created_at=created_at)
+
+        # since = 2026-02-01T12:00:00Z：边界日只统计 20:00 的 run 103
+        with patch("backend.src.services.metrics.agent_metrics.now_iso", return_value="2026-02-05T12:00:00Z"):
+            live = compute_agent_metrics(since_days=4)
+            self.assertEqual(live["runs"]["unsummarized"], 2)
+
+            result = backfill_run_summaries(batch_size=1)
+            self.assertEqual(result["processed"], 4)
+            self.assertEqual(result["batches"], 4)
+            self.assertEqual(result["summaries"], 4)
+            self.assertEqual(backfill_run_summaries()["processed"], 0)
+
+            rolled = compute_agent_metrics(since_days=4)
+            full = compute_agent_metrics(since_days=3650)
+
+        self.assertEqual(rolled["runs"]["unsummarized"], 0)
+        for key in ("total", "by_status", "by_mode", "done", "failed", "avg_steps", "avg_tokens_total", "avg_replan_attempts"):
+            self.assertEqual(rolled["runs"][key], live["runs"][key], key)
+        self.assertEqual(rolled["runs"]["total"], 2)
+        self.assertAlmostEqual(rolled["runs"]["avg_steps"], 2.5)
+        self.assertEqual(full["runs"]["total"], 4)
+        self.assertEqual(full["runs"]["by_mode"], {"do": 3, "think": 1})
+        self.assertAlmostEqual(full["runs"]["avg_tokens_total"], 40.0)
+
+    def test_cleanup_delete_refreshes_rollup(self):
+        from backend.src.repositories.run_summaries_repo import collect_summary_run_ids, refresh_run_summaries
+        from backend.src.repositories.task_runs_repo import update_task_run
+        from backend.src.storage import get_connection
+
+        created_at = "2026-02-01T10:00:00Z"
+        run_id = self._create_run(created_at=created_at)
+        self._add_steps_and_tokens(run_id, steps=2, tokens=40, created_at=created_at)
+        update_task_run(run_id=run_id, status="done")
+        self.assertEqual(self._rollups(), [("2026-02-01", "done", "do", 1, 2, 40)])
+
+        # 与维护清理同样的顺序：删除前收集受影响 run，删除后同事务刷新
+        with get_connection() as conn:
+            step_ids = [row["id"] for row in conn.execute("SELECT id FROM task_steps WHERE run_id = ?", (run_id,))]
+            affected = collect_summary_run_ids(table_name="task_steps", ids=step_ids[:1], conn=conn)
+            conn.execute("DELETE FROM task_steps WHERE id = ?", (step_ids[0],))
+            refresh_run_summaries(run_ids=affected, conn=conn)
+        self.assertEqual(self._rollups(), [("2026-02-01", "done", "do", 1, 1, 40)])
+
+        with get_connection() as conn:
+            affected = collect_summary_run_ids(table_name="task_runs", ids=[run_id], conn=conn)
+            conn.execute("DELETE FROM task_runs WHERE id = ?", (run_id,))
+            refresh_run_summaries(run_ids=affected, conn=conn)
+        self.assertEqual(self._rollups(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -121,6 +121,36 @@ class TestSessionQueue(unittest.IsolatedAsyncioTestCase):
             else:
                 os.environ["AGENT_STREAM_GLOBAL_CONCURRENCY"] = old
 
+    async def test_timeout_is_shared_across_waits(self):
+        import time
+
+        from backend.src.agent.runner.session_queue import acquire_stream_queue_ticket, reset_stream_queue_state_for_tests
+
+        old = os.getenv("AGENT_STREAM_GLOBAL_CONCURRENCY")
+        os.environ["AGENT_STREAM_GLOBAL_CONCURRENCY"] = "2"
+        try:
+            await reset_stream_queue_state_for_tests()
+            lane_holder = await acquire_stream_queue_ticket(session_key="sess_a", timeout_seconds=2)
+            global_holder = await acquire_stream_queue_ticket(session_key="sess_b", timeout_seconds=2)
+
+            async def _release_global_later():
+                await asyncio.sleep(0.2)
+                await global_holder.release()
+
+            releaser = asyncio.create_task(_release_global_later())
+            started = time.monotonic()
+            # 先等全局令牌 0.2s，再等同 session 令牌：两段共用 0.3s 的总超时，而不是各等 0.3s
+            with self.assertRaises(asyncio.TimeoutError):
+                await acquire_stream_queue_ticket(session_key="sess_a", timeout_seconds=0.3)
+            self.assertLess(time.monotonic() - started, 0.45)
+            await releaser
+            await lane_holder.release()
+        finally:
+            if old is None:
+                os.environ.pop("AGENT_STREAM_GLOBAL_CONCURRENCY", None)
+            else:
+                os.environ["AGENT_STREAM_GLOBAL_CONCURRENCY"] = old
+
 
 if __name__ == "__main__":
     unittest.main()
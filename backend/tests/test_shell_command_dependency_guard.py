@@ -33,8 +33,8 @@ class TestShellCommandDependencyGuard(unittest.TestCase):
                 handle.write("print('ok')\n")
 
             with patch(
-                "backend.src.actions.handlers.shell_command.list_task_steps_for_run",
-                return_value=[],
+                "backend.src.actions.handlers.shell_command.get_run_written_paths",
+                return_value=set(),
             ):
                 with self.assertRaises(ValueError) as ctx:
                     execute_shell_command(
@@ -58,18 +58,10 @@ class TestShellCommandDependencyGuard(unittest.TestCase):
             with open(script_path, "w", encoding="utf-8") as handle:
                 handle.write("print('ok')\n")
 
-            rows = [
-                {
-                    "id": 1,
-                    "status": "done",
-                    "detail": '{"type":"file_write","payload":{"path":"tool_script.py"}}',
-                    "result": '{"path":"' + script_path.replace("\\", "\\\\") + '","bytes":12}',
-                }
-            ]
-
+            # 当前 run 的产物登记
             with patch(
-                "backend.src.actions.handlers.shell_command.list_task_steps_for_run",
-                return_value=rows,
+                "backend.src.actions.handlers.shell_command.get_run_written_paths",
+                return_value={os.path.normcase(script_path)},
             ):
                 result, error_message = execute_shell_command(
                     task_id=1,
@@ -95,8 +87,8 @@ class TestShellCommandDependencyGuard(unittest.TestCase):
                 handle.write("print('ok')\n")
 
             with patch(
-                "backend.src.actions.handlers.shell_command.list_task_steps_for_run",
-                return_value=[],
+                "backend.src.actions.handlers.shell_command.get_run_written_paths",
+                return_value=set(),
             ):
                 result, error_message = execute_shell_command(
                     task_id=1,
@@ -1,8 +1,22 @@
 import unittest
-from types import SimpleNamespace
 from unittest.mock import patch
 
 
+def _captured(*, stdout: bytes, stderr: bytes, returncode: int):
+    from backend.src.services.execution.process_capture import CapturedProcess
+
+    return CapturedProcess(
+        stdout=stdout,
+        stderr=stderr,
+        returncode=returncode,
+        timed_out=False,
+        stdout_bytes=len(stdout),
+        stderr_bytes=len(stderr),
+        stdout_truncated=False,
+        stderr_truncated=False,
+    )
+
+
 class TestShellCommandOutputDecode(unittest.TestCase):
     def test_non_utf8_subprocess_output_is_decoded_without_exception(self):
         from backend.src.services.execution.shell_command import run_shell_command
@@ -11,8 +25,8 @@ class TestShellCommandOutputDecode(unittest.TestCase):
             "backend.src.services.execution.shell_command.has_exec_permission",
             return_value=True,
         ), patch(
-            "backend.src.services.execution.shell_command.subprocess.run",
-            return_value=SimpleNamespace(stdout=b"\x81abc", stderr=b"\xff", returncode=1),
+            "backend.src.services.execution.shell_command.run_process_streaming",
+            return_value=_captured(stdout=b"\x81abc", stderr=b"\xff", returncode=1),
         ):
             result, error_message = run_shell_command(
                 {
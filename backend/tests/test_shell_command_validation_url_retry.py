@@ -94,18 +94,10 @@ class TestShellCommandValidationUrlRetry(unittest.TestCase):
                     "print(sys.argv[1])\n"
                 )
 
-            rows = [
-                {
-                    "id": 1,
-                    "status": "done",
-                    "detail": '{"type":"file_write","payload":{"path":"web_fetch.py"}}',
-                    "result": '{"path":"' + script_path.replace("\\", "\\\\") + '","bytes":120}',
-                }
-            ]
-
+            # 脚本已由本 run 的 file_write 登记
             with patch(
-                "backend.src.actions.handlers.shell_command.list_task_steps_for_run",
-                return_value=rows,
+                "backend.src.actions.handlers.shell_command.get_run_written_paths",
+                return_value={os.path.normcase(script_path)},
             ):
                 result, error_message = execute_shell_command(
                     task_id=1,
@@ -139,18 +131,10 @@ class TestShellCommandValidationUrlRetry(unittest.TestCase):
                     "print(sys.argv[1])\n"
                 )
 
-            rows = [
-                {
-                    "id": 1,
-                    "status": "done",
-                    "detail": '{"type":"file_write","payload":{"path":"web_fetch.py"}}',
-                    "result": '{"path":"' + script_path.replace("\\", "\\\\") + '","bytes":120}',
-                }
-            ]
-
+            # 脚本已由本 run 的 file_write 登记
             with patch(
-                "backend.src.actions.handlers.shell_command.list_task_steps_for_run",
-                return_value=rows,
+                "backend.src.actions.handlers.shell_command.get_run_written_paths",
+                return_value={os.path.normcase(script_path)},
             ):
                 with self.assertRaises(ValueError) as ctx:
                     execute_shell_command(
@@ -181,18 +165,10 @@ class TestShellCommandValidationUrlRetry(unittest.TestCase):
                     "print('ok:' + text.splitlines()[0])\n"
                 )
 
-            rows = [
-                {
-                    "id": 1,
-                    "status": "done",
-                    "detail": '{"type":"file_write","payload":{"path":"convert.py"}}',
-                    "result": '{"path":"' + script_path.replace("\\", "\\\\") + '","bytes":120}',
-                }
-            ]
-
+            # 脚本已由本 run 的 file_write 登记
             with patch(
-                "backend.src.actions.handlers.shell_command.list_task_steps_for_run",
-                return_value=rows,
+                "backend.src.actions.handlers.shell_command.get_run_written_paths",
+                return_value={os.path.normcase(script_path)},
             ):
                 result, error_message = execute_shell_command(
                     task_id=1,
@@ -233,18 +209,10 @@ class TestShellCommandValidationUrlRetry(unittest.TestCase):
                     "print(text.splitlines()[0])\n"
                 )
 
-            rows = [
-                {
-                    "id": 1,
-                    "status": "done",
-                    "detail": '{"type":"file_write","payload":{"path":"stdin_only.py"}}',
-                    "result": '{"path":"' + script_path.replace("\\", "\\\\") + '","bytes":120}',
-                }
-            ]
-
+            # 脚本已由本 run 的 file_write 登记
             with patch(
-                "backend.src.actions.handlers.shell_command.list_task_steps_for_run",
-                return_value=rows,
+                "backend.src.actions.handlers.shell_command.get_run_written_paths",
+                return_value={os.path.normcase(script_path)},
             ):
                 result, error_message = execute_shell_command(
                     task_id=1,
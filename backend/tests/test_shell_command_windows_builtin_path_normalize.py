@@ -1,8 +1,22 @@
 import unittest
-from types import SimpleNamespace
 from unittest.mock import patch
 
 
+def _captured(*, stdout: bytes, stderr: bytes, returncode: int):
+    from backend.src.services.execution.process_capture import CapturedProcess
+
+    return CapturedProcess(
+        stdout=stdout,
+        stderr=stderr,
+        returncode=returncode,
+        timed_out=False,
+        stdout_bytes=len(stdout),
+        stderr_bytes=len(stderr),
+        stdout_truncated=False,
+        stderr_truncated=False,
+    )
+
+
 class TestShellCommandWindowsBuiltinPathNormalize(unittest.TestCase):
     def test_dir_builtin_normalizes_relative_path_slashes(self):
         from backend.src.services.execution.shell_command import run_shell_command
@@ -14,8 +28,8 @@ class TestShellCommandWindowsBuiltinPathNormalize(unittest.TestCase):
             "backend.src.services.execution.shell_command.has_exec_permission",
             return_value=True,
         ), patch(
-            "backend.src.services.execution.shell_command.subprocess.run",
-            return_value=SimpleNamespace(stdout="ok", stderr="", returncode=0),
+            "backend.src.services.execution.shell_command.run_process_streaming",
+            return_value=_captured(stdout=b"ok", stderr=b"", returncode=0),
         ) as mocked_run:
             result, error_message = run_shell_command(
                 {
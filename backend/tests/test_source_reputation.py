@@ -0,0 +1,182 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+
+class _FakeResponse:
+    def __init__(self, url, status_code, body):
+        self.url = url
+        self.status_code = status_code
+        self.headers = {"content-type": "text/plain"}
+        self.encoding = "utf-8"
+        self._body = body
+
+    def iter_bytes(self):
+        yield self._body
+
+    def read(self):
+        return self._body
+
+
+class _FakeStream:
+    def __init__(self, resp):
+        self._resp = resp
+
+    def __enter__(self):
+        return self._resp
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+class TestSourceReputation(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        os.environ["AGENT_DB_PATH"] = str(Path(self._tmp.name) / "agent_test.db")
+
+        from backend.src.storage import init_db
+
+        init_db()
+
+    def tearDown(self):
+        os.environ.pop("AGENT_DB_PATH", None)
+        self._tmp.cleanup()
+
+    def test_attempts_update_rate_latency_and_cooldown(self):
+        from backend.src.services.search import source_reputation as rep
+
+        with patch.object(rep, "AGENT_SOURCE_COOLDOWN_BASE_SECONDS", 60), patch.object(
+            rep, "AGENT_SOURCE_COOLDOWN_MAX_SECONDS", 200
+        ):
+            rep.record_source_attempt("WWW.Example.com:443", ok=True, latency_ms=100, now=1000.0)
+            item = rep.record_source_attempt("example.com", ok=True, latency_ms=200, now=1001.0)
+            self.assertEqual((item["attempts"], item["successes"]), (2, 2))
+            self.assertAlmostEqual(item["latency_ewma_ms"], 130.0)
+
+            # 非 host 级失败：计入失败率，不冷却
+            item = rep.record_source_attempt("example.com", ok=False, error_code="http_404", now=1002.0)
+            self.assertFalse(item["cooling_down"])
+            self.assertEqual(item["last_error_code"], "http_404")
+
+            # host 级失败：冷却按连续失败次数指数退避并封顶
+            cooldowns = []
+            for _ in range(3):
+                item = rep.record_source_attempt(
+                    "example.com", ok=False, error_code="rate_limited", host_level=True, now=2000.0
+                )
+                cooldowns.append(item["cooldown_until"] - 2000.0)
+            self.assertEqual(cooldowns, [60.0, 120.0, 200.0])
+            self.assertEqual(item["consecutive_failures"], 3)
+
+            # 成功清除冷却
+            item = rep.record_source_attempt("example.com", ok=True, now=2001.0)
+            self.assertIsNone(item["cooldown_until"])
+            self.assertEqual(item["consecutive_failures"], 0)
+            self.assertEqual(item["success_rate"], round(3 / 7, 4))
+
+    def test_parallel_attempts_do_not_lose_updates(self):
+        from concurrent.futures import ThreadPoolExecutor
+
+        from backend.src.services.search import source_reputation as rep
+
+        def record(index):
+            return rep.record_source_attempt("race.test", ok=index % 2 == 0, latency_ms=100)
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(record, range(40)))
+        self.assertTrue(all(item is not None for item in results))
+        item = rep.get_source_reputation("race.test")
+        self.assertEqual((item["attempts"], item["successes"]), (40, 20))
+
+    def test_plan_orders_by_reputation_and_skips_cooling_hosts(self):
+        from backend.src.services.search import source_reputation as rep
+
+        urls = ["http://a.test/x", "http://b.test/x", "http://c.test/x"]
+        host_of = lambda url: url.split("/")[2]  # noqa: E731
+        self.assertEqual(rep.plan_source_candidates(urls, host_of=host_of), (urls, set()))
+
+        rep.record_source_attempt("a.test", ok=False, error_code="web_fetch_blocked", host_level=True)
+        rep.record_source_attempt("b.test", ok=False, error_code="http_500")
+        for _ in range(3):
+            rep.record_source_attempt("c.test", ok=True)
+        ordered, skipped = rep.plan_source_candidates(urls, host_of=host_of)
+        self.assertEqual(ordered, ["http://c.test/x", "http://b.test/x", "http://a.test/x"])
+        self.assertEqual(skipped, {"a.test"})
+
+        # 无记录的 host 不排在有记录的 host 之后
+        ordered, _ = rep.plan_source_candidates(["http://new.test/x", "http://c.test/x"], host_of=host_of)
+        self.assertEqual(ordered, ["http://new.test/x", "http://c.test/x"])
+
+        ordered, _ = rep.plan_source_candidates(urls, host_of=host_of, reorder=False)
+        self.assertEqual(ordered, urls)
+
+        # 全部冷却时不跳过
+        self.assertEqual(rep.plan_source_candidates(urls[:1], host_of=host_of)[1], set())
+
+        self.assertEqual(rep.reset_source_reputation(["A.test"]), 1)
+        self.assertIsNone(rep.get_source_reputation("a.test"))
+        self.assertEqual(sorted(item["host"] for item in rep.list_source_reputations()), ["b.test", "c.test"])
+        self.assertEqual(rep.reset_source_reputation(), 2)
+
+    def test_web_fetch_tries_requested_url_before_proxy_with_better_history(self):
+        from backend.src.actions.handlers.tool_call import _execute_web_fetch_with_fallback
+        from backend.src.services.search import source_reputation as rep
+
+        for _ in range(3):
+            rep.record_source_attempt("r.jina.ai", ok=True)
+        fetched = []
+
+        def fake_exec(_spec, url):
+            fetched.append(url)
+            return "页面正文：示例内容，包含足够的文字用于判定抓取成功。" * 5, None
+
+        with patch("backend.src.actions.handlers.tool_call._execute_tool_with_exec_spec", side_effect=fake_exec):
+            result = _execute_web_fetch_with_fallback({"command": "echo ok", "workdir": "/tmp"}, "https://example.org/page")
+
+        self.assertTrue(result["ok"])
+        self.assertEqual(fetched, ["https://example.org/page"])
+        self.assertEqual(result["warnings"], [])
+
+    def test_http_request_skips_host_cooling_from_previous_call(self):
+        from backend.src.actions.handlers.http_request import execute_http_request
+        from backend.src.services.search.source_reputation import get_source_reputation
+
+        requested = []
+
+        class FakeClient:
+            def __init__(self, timeout=None):
+                _ = timeout
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, exc_type, exc, tb):
+                return False
+
+            def stream(self, method, url, **_kwargs):
+                requested.append(str(url))
+                if "primary.test" in str(url):
+                    return _FakeStream(_FakeResponse(str(url), 403, b"forbidden"))
+                return _FakeStream(_FakeResponse(str(url), 200, b"mirror ok"))
+
+        payload = {"url": "http://primary.test/a", "fallback_urls": ["http://mirror.test/a"]}
+        with patch("backend.src.actions.handlers.http_request.httpx.Client", FakeClient):
+            first, error = execute_http_request(payload)
+            self.assertIsNone(error)
+            self.assertEqual(requested, ["http://primary.test/a", "http://mirror.test/a"])
+            self.assertTrue(get_source_reputation("primary.test")["cooling_down"])
+            self.assertEqual(get_source_reputation("primary.test")["last_error_code"], "web_fetch_blocked")
+
+            # 新调用：冷却中的 host 直接跳过，不再重新发现 403
+            requested.clear()
+            second, error = execute_http_request(payload)
+        self.assertIsNone(error)
+        self.assertEqual(requested, ["http://mirror.test/a"])
+        self.assertEqual(second["source_url"], "http://mirror.test/a")
+        self.assertEqual(get_source_reputation("mirror.test")["successes"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
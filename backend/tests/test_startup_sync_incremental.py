@@ -0,0 +1,143 @@
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+
+def _write_markdown(path: Path, meta: dict, body: str = "") -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("---\n" + json.dumps(meta, ensure_ascii=False) + "\n---\n\n" + body, encoding="utf-8")
+
+
+class TestStartupSyncIncremental(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self._prompt_root = Path(self._tmp.name) / "prompt"
+        os.environ["AGENT_DB_PATH"] = str(Path(self._tmp.name) / "agent_test.db")
+        os.environ["AGENT_PROMPT_ROOT"] = str(self._prompt_root)
+
+        import backend.src.storage as storage
+
+        storage.init_db()
+
+    def tearDown(self):
+        os.environ.pop("AGENT_DB_PATH", None)
+        os.environ.pop("AGENT_PROMPT_ROOT", None)
+        self._tmp.cleanup()
+
+    def _skill_names(self):
+        from backend.src.storage import get_connection
+
+        with get_connection() as conn:
+            rows = conn.execute("SELECT name FROM skills_items WHERE source_path LIKE 'misc/%' ORDER BY name").fetchall()
+        return [row["name"] for row in rows]
+
+    def test_skills_only_changed_files_are_parsed_and_deleted_ones_pruned(self):
+        from backend.src.services.skills.skills_sync import sync_skills_from_files
+
+        base = Path(self._tmp.name) / "skills"
+        for name in ("a", "b", "c"):
+            _write_markdown(base / "misc" / f"{name}.md", {"name": f"skill_{name}"})
+
+        first = sync_skills_from_files(base_dir=base, incremental=True)
+        self.assertEqual(first["inserted"], 3)
+        self.assertEqual(first["manifest"]["changed"], 3)
+
+        second = sync_skills_from_files(base_dir=base, incremental=True)
+        self.assertEqual(second["manifest"]["changed"], 0)
+        self.assertEqual(second["manifest"]["unchanged"], 3)
+        self.assertEqual(second["inserted"] + second["updated"], 0)
+        self.assertEqual(second["deleted"], 0)
+
+        _write_markdown(base / "misc" / "b.md", {"name": "skill_b2"})
+        (base / "misc" / "c.md").unlink()
+        third = sync_skills_from_files(base_dir=base, incremental=True)
+        self.assertEqual(third["manifest"]["changed"], 1)
+        self.assertEqual(third["updated"], 1)
+        self.assertEqual(third["deleted"], 1)
+        self.assertEqual(self._skill_names(), ["skill_a", "skill_b2"])
+
+    def test_touched_file_with_same_content_is_not_reparsed(self):
+        from backend.src.services.skills.skills_sync import sync_skills_from_files
+
+        base = Path(self._tmp.name) / "skills"
+        path = base / "misc" / "a.md"
+        _write_markdown(path, {"name": "skill_a"})
+        sync_skills_from_files(base_dir=base, incremental=True)
+
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 5_000_000_000))
+        result = sync_skills_from_files(base_dir=base, incremental=True)
+        self.assertEqual(result["manifest"]["hashed"], 1)
+        self.assertEqual(result["manifest"]["changed"], 0)
+
+        # stat 已刷新：再次同步无需重新计算哈希
+        again = sync_skills_from_files(base_dir=base, incremental=True)
+        self.assertEqual(again["manifest"]["hashed"], 0)
+
+    def test_db_row_removed_outside_sync_is_restored_from_unchanged_file(self):
+        from backend.src.services.skills.skills_sync import sync_skills_from_files
+        from backend.src.storage import get_connection
+
+        base = Path(self._tmp.name) / "skills"
+        _write_markdown(base / "misc" / "a.md", {"name": "skill_a"})
+        sync_skills_from_files(base_dir=base, incremental=True)
+        with get_connection() as conn:
+            conn.execute("DELETE FROM skills_items WHERE source_path = 'misc/a.md'")
+
+        result = sync_skills_from_files(base_dir=base, incremental=True)
+        self.assertEqual(result["inserted"], 1)
+        self.assertEqual(self._skill_names(), ["skill_a"])
+
+    def test_memory_and_graph_incremental(self):
+        from backend.src.services.graph.graph_store import sync_graph_from_files
+        from backend.src.services.memory.memory_store import sync_memory_from_files
+        from backend.src.storage import get_connection
+
+        memory_base = Path(self._tmp.name) / "memory"
+        _write_markdown(memory_base / "u1.md", {"uid": "u1", "memory_type": "long_term"}, "one")
+        _write_markdown(memory_base / "u2.md", {"uid": "u2", "memory_type": "long_term"}, "two")
+        self.assertEqual(sync_memory_from_files(memory_base, incremental=True)["inserted"], 2)
+
+        (memory_base / "u2.md").unlink()
+        result = sync_memory_from_files(memory_base, incremental=True)
+        self.assertEqual(result["manifest"]["changed"], 0)
+        self.assertEqual(result["deleted"], 1)
+        with get_connection() as conn:
+            uids = [row["uid"] for row in conn.execute("SELECT uid FROM memory_items").fetchall()]
+        self.assertEqual(uids, ["u1"])
+
+        graph_base = Path(self._tmp.name) / "graph"
+        _write_markdown(graph_base / "nodes" / "1.md", {"id": 1, "label": "A"})
+        _write_markdown(graph_base / "nodes" / "2.md", {"id": 2, "label": "B"})
+        _write_markdown(graph_base / "edges" / "1.md", {"id": 1, "source": 1, "target": 2, "relation": "rel"})
+        sync_graph_from_files(graph_base, incremental=True)
+
+        again = sync_graph_from_files(graph_base, incremental=True)
+        # 文件全部未变化时不能误入“目录为空 -> 导出 DB”的迁移兜底
+        self.assertNotEqual(again.get("mode"), "export_db_to_files")
+        self.assertEqual(again["manifest"]["nodes"]["unchanged"], 2)
+        self.assertEqual(again["manifest"]["edges"]["unchanged"], 1)
+        self.assertEqual(again["deleted_nodes"] + again["deleted_edges"], 0)
+
+    def test_background_startup_sync_reports_status(self):
+        from backend.src.services.system.startup_sync import (
+            get_startup_sync_status,
+            start_startup_file_sync_background,
+        )
+
+        _write_markdown(self._prompt_root / "skills" / "misc" / "a.md", {"name": "skill_a"})
+
+        thread = start_startup_file_sync_background(incremental=True)
+        thread.join(timeout=30)
+
+        status = get_startup_sync_status()
+        self.assertEqual(status["state"], "done")
+        self.assertTrue(all(item.get("ok") for item in status["results"].values()))
+        self.assertEqual(status["results"]["skills"]["manifest"]["changed"], 1)
+        self.assertEqual(self._skill_names(), ["skill_a"])
+
+
+if __name__ == "__main__":
+    unittest.main()
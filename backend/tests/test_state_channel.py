@@ -0,0 +1,109 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+
+class TestStateChannel(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        os.environ["AGENT_DB_PATH"] = str(Path(self._tmp.name) / "agent_test.db")
+        os.environ["AGENT_PROMPT_ROOT"] = str(Path(self._tmp.name) / "prompt")
+
+        from backend.src.storage import init_db
+
+        init_db()
+
+    def tearDown(self):
+        os.environ.pop("AGENT_DB_PATH", None)
+        os.environ.pop("AGENT_PROMPT_ROOT", None)
+        self._tmp.cleanup()
+
+    def test_resume_after_event_id_and_reset_when_unknown(self):
+        from backend.src.services.system.state_channel import StateChannel
+
+        channel = StateChannel(buffer_size=10, debounce_ms=0)
+        first = channel.publish("runs", {"status": "running"})
+        channel.publish("tasks", {"count": 1})
+        channel.publish("runs", {"status": "done"})
+
+        resume = channel.parse_event_id(channel.format_event_id(first))
+        events, reset, head = channel.events_after(resume, {"runs"})
+        self.assertFalse(reset)
+        self.assertEqual(head, 3)
+        self.assertEqual([payload["status"] for _, _, payload in events], ["done"])
+
+        # 其他 epoch（进程重启）/ 未带 id：需要重发快照
+        self.assertIsNone(channel.parse_event_id("otherepoch-1"))
+        self.assertTrue(channel.events_after(None, {"runs"})[1])
+
+        # 缓冲被覆盖后同样 reset
+        for i in range(20):
+            channel.publish("tasks", {"count": i})
+        self.assertTrue(channel.events_after(resume, {"runs"})[1])
+
+    def test_dirty_topics_build_one_snapshot_for_all_subscribers(self):
+        from backend.src.services.system.state_channel import StateChannel
+
+        channel = StateChannel(debounce_ms=100)
+        calls = []
+        channel.register_snapshot("tasks", lambda: calls.append(1) or {"count": len(calls)})
+
+        # 无订阅者时不做任何工作
+        channel.mark_dirty({"tasks"})
+        self.assertEqual(channel.flush_dirty(), 0)
+
+        async def _run():
+            loop = asyncio.get_running_loop()
+            subs = [channel.subscribe({"tasks"}, loop=loop) for _ in range(50)]
+            other = channel.subscribe({"memory"}, loop=loop)
+            # 合并窗口内的多次写入只触发一次快照
+            channel.mark_dirty({"tasks", "records"})
+            channel.mark_dirty({"tasks"})
+            woke = await asyncio.gather(*[sub.wait(2.0) for sub in subs])
+            self.assertTrue(all(woke))
+            self.assertFalse(await other.wait(0.05))
+            for sub in subs + [other]:
+                channel.unsubscribe(sub)
+
+        asyncio.run(_run())
+        self.assertEqual(len(calls), 1)
+        events, reset, _ = channel.events_after(0, {"tasks"})
+        self.assertFalse(reset)
+        self.assertEqual(events[0][2]["type"], "snapshot")
+        self.assertEqual(events[0][2]["data"], {"count": 1})
+
+    def test_committed_write_marks_topic_dirty(self):
+        from backend.src.common.resource_versions import (
+            add_resource_version_listener,
+            remove_resource_version_listener,
+        )
+        from backend.src.services.system.state_channel import StateChannel
+        from backend.src.storage import get_connection
+
+        channel = StateChannel(debounce_ms=0)
+        channel.register_snapshot("memory", lambda: {"ok": True})
+        add_resource_version_listener(channel.mark_dirty)
+        try:
+
+            async def _run():
+                sub = channel.subscribe({"memory"}, loop=asyncio.get_running_loop())
+                try:
+                    with get_connection() as conn:
+                        conn.execute(
+                            "INSERT INTO memory_items (content, created_at, memory_type) VALUES ('x', '2024-01-01', 'short_term')"
+                        )
+                    return await sub.wait(2.0)
+                finally:
+                    channel.unsubscribe(sub)
+
+            self.assertTrue(asyncio.run(_run()))
+        finally:
+            remove_resource_version_listener(channel.mark_dirty)
+        events, _, _ = channel.events_after(0, {"memory"})
+        self.assertEqual(len(events), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+
+class TestTaskStepsBatch(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        os.environ["AGENT_DB_PATH"] = str(Path(self._tmp.name) / "agent_test.db")
+        os.environ["AGENT_PROMPT_ROOT"] = str(Path(self._tmp.name) / "prompt")
+
+        from backend.src.storage import init_db
+
+        init_db()
+
+    def tearDown(self):
+        os.environ.pop("AGENT_DB_PATH", None)
+        os.environ.pop("AGENT_PROMPT_ROOT", None)
+        self._tmp.cleanup()
+
+    def _plan(self, count: int):
+        from backend.src.services.tasks.task_queries import TaskStepCreateParams
+
+        return [
+            TaskStepCreateParams(task_id=1, run_id=2, title=f"步骤 {i}", status="planned", step_order=i, executor="code")
+            for i in range(1, count + 1)
+        ]
+
+    def _create_steps(self, count: int):
+        from backend.src.services.tasks.task_queries import create_task_step
+
+        return [create_task_step(params)[0] for params in self._plan(count)]
+
+    def test_apply_transitions_in_one_call(self):
+        from backend.src.services.tasks.task_queries import (
+            TaskStepTransition,
+            apply_task_step_transitions,
+            get_task_step,
+        )
+
+        step_ids = self._create_steps(3)
+        applied = apply_task_step_transitions(
+            [
+                TaskStepTransition(step_id=step_id, status="running", run_id=9, attempts=1, started_at="2024-01-01T00:00:00Z")
+                for step_id in step_ids
+            ]
+        )
+        self.assertEqual(applied, 3)
+        apply_task_step_transitions(
+            [
+                TaskStepTransition(step_id=step_ids[0], status="done", result='{"ok": 1}', finished_at="2024-01-01T00:01:00Z"),
+                TaskStepTransition(step_id=step_ids[1], status="failed", error="boom", finished_at="2024-01-01T00:01:00Z"),
+                # started_at 只在为空时写入
+                TaskStepTransition(step_id=step_ids[2], status="running", attempts=2, started_at="2024-01-02T00:00:00Z"),
+            ]
+        )
+
+        done = get_task_step(step_id=step_ids[0])
+        self.assertEqual((done["status"], done["result"], done["run_id"]), ("done", '{"ok": 1}', 9))
+        self.assertEqual(done["finished_at"], "2024-01-01T00:01:00Z")
+        failed = get_task_step(step_id=step_ids[1])
+        self.assertEqual((failed["status"], failed["error"]), ("failed", "boom"))
+        retried = get_task_step(step_id=step_ids[2])
+        self.assertEqual((retried["attempts"], retried["started_at"]), (2, "2024-01-01T00:00:00Z"))
+        self.assertEqual(apply_task_step_transitions([]), 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,251 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+from backend.src.agent.core.plan_structure import PlanStructure
+
+
+def _make_plan_struct(plan_titles, plan_allows):
+    plan_items = [{"id": i + 1, "brief": "", "status": "pending"} for i in range(len(plan_titles))]
+    return PlanStructure.from_legacy(
+        plan_titles=list(plan_titles),
+        plan_items=plan_items,
+        plan_allows=[list(a) for a in plan_allows],
+        plan_artifacts=[],
+    )
+
+
+class TestCriticalPathPriorities(unittest.TestCase):
+    def test_priorities_follow_longest_downstream_chain(self):
+        from backend.src.agent.think.think_execution import compute_critical_path_priorities
+
+        # 0 -> 1 -> 3, 2 -> 3
+        dep_map = [[], [0], [], [1, 2]]
+        priorities = compute_critical_path_priorities(dep_map, [1.0, 10.0, 2.0, 1.0])
+
+        self.assertEqual(priorities, [12.0, 11.0, 3.0, 1.0])
+        self.assertGreater(priorities[0], priorities[2])
+
+    def test_step_cost_uses_slowest_allowed_action_and_default(self):
+        from backend.src.agent.think.think_execution import estimate_step_costs
+
+        costs = estimate_step_costs(
+            [["file_write", "shell_command"], ["task_output"], []],
+            {"file_write": 0.5, "shell_command": 30.0},
+            default_seconds=4.0,
+        )
+        self.assertEqual(costs, [30.0, 4.0, 4.0])
+
+    def test_executor_can_take_step_respects_role_action_types(self):
+        from backend.src.agent.think.think_execution import executor_can_take_step
+
+        self.assertTrue(executor_can_take_step("executor_doc", ["file_write"]))
+        self.assertFalse(executor_can_take_step("executor_doc", ["shell_command"]))
+        self.assertTrue(executor_can_take_step("executor_test", ["shell_command"]))
+        self.assertFalse(executor_can_take_step("executor_code", ["user_prompt"]))
+        self.assertFalse(executor_can_take_step("executor_code", []))
+
+    def test_recorded_reassignments_only_reused_when_allow_matches(self):
+        from backend.src.agent.think.think_execution import (
+            record_executor_reassignment,
+            resolve_recorded_reassignments,
+        )
+
+        agent_state = {"executor_assignments": [{"step_order": 2, "executor": "executor_code", "allow": ["file_write"]}]}
+        record_executor_reassignment(
+            agent_state,
+            step_order=2,
+            executor="executor_doc",
+            from_executor="executor_code",
+            allow=["file_write"],
+        )
+
+        self.assertEqual(resolve_recorded_reassignments(agent_state, [["shell_command"], ["file_write"]]), {1: "executor_doc"})
+        self.assertEqual(resolve_recorded_reassignments(agent_state, [["shell_command"], ["shell_command"]]), {})
+
+
+class TestActionDurationEstimates(unittest.TestCase):
+    def setUp(self):
+        import backend.src.storage as storage
+
+        self._tmpdir = tempfile.TemporaryDirectory()
+        os.environ["AGENT_DB_PATH"] = os.path.join(self._tmpdir.name, "durations.db")
+        os.environ["AGENT_PROMPT_ROOT"] = os.path.join(self._tmpdir.name, "prompt")
+        storage.init_db()
+
+    def tearDown(self):
+        os.environ.pop("AGENT_DB_PATH", None)
+        os.environ.pop("AGENT_PROMPT_ROOT", None)
+        self._tmpdir.cleanup()
+
+    def test_estimates_average_done_step_durations_by_action_type(self):
+        from backend.src.services.tasks.task_queries import get_action_duration_estimates
+        from backend.src.storage import get_connection
+
+        rows = [
+            ("done", {"type": "shell_command"}, "2026-01-01T00:00:00Z", "2026-01-01T00:00:10Z"),
+            ("done", {"type": "shell_command"}, "2026-01-01T00:00:00Z", "2026-01-01T00:00:20Z"),
+            ("done", {"type": "file_write"}, "2026-01-01T00:00:00Z", "2026-01-01T00:00:01Z"),
+            ("failed", {"type": "file_write"}, "2026-01-01T00:00:00Z", "2026-01-01T00:05:00Z"),
+            ("done", "not-json", "2026-01-01T00:00:00Z", "2026-01-01T00:00:03Z"),
+        ]
+        with get_connection() as conn:
+            for status, detail, started_at, finished_at in rows:
+                conn.execute(
+                    "INSERT INTO task_steps (task_id, run_id, title, status, detail, started_at, finished_at, created_at, updated_at) "
+                    "VALUES (1, 1, 's', ?, ?, ?, ?, ?, ?)",
+                    (
+                        status,
+                        json.dumps(detail) if isinstance(detail, dict) else detail,
+                        started_at,
+                        finished_at,
+                        started_at,
+                        finished_at,
+                    ),
+                )
+
+        estimates = get_action_duration_estimates(limit=100)
+
+        self.assertEqual(set(estimates), {"shell_command", "file_write"})
+        self.assertAlmostEqual(estimates["shell_command"], 15.0, places=2)
+        self.assertAlmostEqual(estimates["file_write"], 1.0, places=2)
+
+
+class TestThinkParallelWorkStealing(unittest.TestCase):
+    def _run_loop(self, *, plan_struct, agent_state, scheduler, execute_step_action, created_steps):
+        from backend.src.agent.runner.think_parallel_loop import run_think_parallel_loop
+
+        def _fake_generate_action_with_retry(*_args, **kwargs):
+            step_title = str(kwargs.get("step_title") or "")
+            if step_title.startswith("task_output"):
+                action_type, payload = "task_output", {"output_type": "text", "content": "ok"}
+            elif step_title.startswith("shell_command"):
+                action_type, payload = "shell_command", {"command": "echo hi"}
+            else:
+                path = step_title.split("file_write:", 1)[-1].split(" ", 1)[0].strip()
+                action_type, payload = "file_write", {"path": path, "content": "x"}
+            action_obj = {"action": {"type": action_type, "payload": payload}}
+            return action_obj, action_type, payload, None, json.dumps(action_obj, ensure_ascii=False)
+
+        def _fake_create_task_step(params, **_kwargs):
+            created_steps.append({"step_order": params.step_order, "executor": params.executor})
+            return len(created_steps), "", ""
+
+        with patch(
+            "backend.src.agent.runner.think_parallel_loop.persist_loop_state",
+            return_value=True,
+        ), patch(
+            "backend.src.agent.runner.think_parallel_loop.generate_action_with_retry",
+            side_effect=_fake_generate_action_with_retry,
+        ), patch(
+            "backend.src.agent.runner.think_parallel_loop.create_task_step",
+            side_effect=_fake_create_task_step,
+        ), patch(
+            "backend.src.agent.runner.think_parallel_loop.mark_task_step_done",
+            return_value=None,
+        ), patch(
+            "backend.src.agent.runner.think_parallel_loop.mark_task_step_failed",
+            return_value=None,
+        ), patch(
+            "backend.src.agent.runner.think_parallel_loop.get_action_duration_estimates",
+            return_value={},
+        ):
+            gen = run_think_parallel_loop(
+                task_id=1,
+                run_id=1,
+                message="test",
+                workdir=".",
+                model="base",
+                parameters={},
+                plan_struct=plan_struct,
+                tools_hint="",
+                skills_hint="",
+                memories_hint="",
+                graph_hint="",
+                agent_state=agent_state,
+                context={},
+                observations=[],
+                start_step_order=1,
+                end_step_order_inclusive=None,
+                variables_source="test",
+                step_llm_config_resolver=None,
+                dependencies=None,
+                executor_roles=None,
+                llm_call=lambda _payload: {"record": {"status": "success", "response": "{}"}},
+                execute_step_action=execute_step_action,
+                safe_write_debug=lambda *_a, **_k: None,
+                scheduler=scheduler,
+            )
+            for _ in range(10000):
+                try:
+                    next(gen)
+                except StopIteration as e:
+                    return e.value
+            self.fail("think_parallel_loop 未在预期迭代次数内结束")
+
+    def test_idle_executor_steals_ready_step_and_records_assignment(self):
+        plan_titles = [
+            "shell_command:运行长任务",
+            "file_write:notes.py 写入脚本",
+            "task_output 输出结果",
+        ]
+        plan_allows = [["shell_command"], ["file_write"], ["task_output"]]
+        second_started = threading.Event()
+
+        def _execute_step_action(_task_id, _run_id, step_row, context=None):
+            # 第 1 步阻塞到第 2 步被其他 executor 接手后再结束：证明两步确实并行。
+            if str(step_row.get("title") or "").startswith("shell_command"):
+                second_started.wait(timeout=5)
+            else:
+                second_started.set()
+            return {"ok": True}, None
+
+        agent_state: dict = {}
+        created_steps: list = []
+        result = self._run_loop(
+            plan_struct=_make_plan_struct(plan_titles, plan_allows),
+            agent_state=agent_state,
+            scheduler="critical_path",
+            execute_step_action=_execute_step_action,
+            created_steps=created_steps,
+        )
+
+        self.assertEqual(str(result.run_status), "done")
+        self.assertTrue(second_started.is_set())
+        by_order = {item["step_order"]: item["executor"] for item in created_steps}
+        self.assertEqual(by_order[1], "executor_code")
+        self.assertEqual(by_order[2], "executor_doc")
+        self.assertEqual(agent_state.get("think_parallel_scheduler"), "critical_path")
+        stolen = [a for a in agent_state.get("executor_assignments") or [] if a.get("stolen_from")]
+        self.assertEqual(stolen, [
+            {"step_order": 2, "executor": "executor_doc", "allow": ["file_write"], "stolen_from": "executor_code"}
+        ])
+
+    def test_role_scheduler_keeps_steps_pinned(self):
+        plan_titles = [
+            "shell_command:运行长任务",
+            "file_write:notes.py 写入脚本",
+            "task_output 输出结果",
+        ]
+        plan_allows = [["shell_command"], ["file_write"], ["task_output"]]
+
+        agent_state: dict = {}
+        created_steps: list = []
+        result = self._run_loop(
+            plan_struct=_make_plan_struct(plan_titles, plan_allows),
+            agent_state=agent_state,
+            scheduler="role",
+            execute_step_action=lambda *_a, **_k: ({"ok": True}, None),
+            created_steps=created_steps,
+        )
+
+        self.assertEqual(str(result.run_status), "done")
+        self.assertTrue(all(item["executor"] == "executor_code" for item in created_steps))
+        self.assertFalse(any(a.get("stolen_from") for a in agent_state.get("executor_assignments") or []))
+
+
+if __name__ == "__main__":
+    unittest.main()
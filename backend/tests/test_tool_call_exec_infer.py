@@ -21,17 +21,10 @@ class TestToolCallExecInfer(unittest.TestCase):
                 "output": "",
                 "tool_metadata": {"exec": {"workdir": tmp}},
             }
-            rows = [
-                {
-                    "id": 1,
-                    "status": "done",
-                    "detail": '{"type":"file_write","payload":{"path":"backend/.agent/workspace/demo_tool.py"}}',
-                    "result": '{"path":"' + script_path.replace('\\', '\\\\') + '","bytes":32}',
-                }
-            ]
+            # 当前 run 的产物登记
             with patch(
-                "backend.src.actions.handlers.tool_call.list_task_steps_for_run",
-                return_value=rows,
+                "backend.src.actions.handlers.tool_call.get_run_written_paths",
+                return_value={os.path.normcase(script_path)},
             ):
                 record, err = execute_tool_call(
                     task_id=11,
@@ -22,8 +22,8 @@ class TestToolCallScriptDependency(unittest.TestCase):
         }
 
         with patch(
-            "backend.src.actions.handlers.tool_call.list_task_steps_for_run",
-            return_value=[],
+            "backend.src.actions.handlers.tool_call.get_run_written_paths",
+            return_value=set(),
         ):
             with self.assertRaises(ValueError) as ctx:
                 execute_tool_call(
@@ -58,18 +58,10 @@ class TestToolCallScriptDependency(unittest.TestCase):
                 },
             }
 
-            rows = [
-                {
-                    "id": 1,
-                    "status": "done",
-                    "detail": '{"type":"file_write","payload":{"path":"backend/.agent/workspace/other.py"}}',
-                    "result": '{"path":"' + os.path.join(workspace, "other.py").replace("\\", "\\\\") + '","bytes":12}',
-                }
-            ]
-
+            # 当前 run 的产物登记
             with patch(
-                "backend.src.actions.handlers.tool_call.list_task_steps_for_run",
-                return_value=rows,
+                "backend.src.actions.handlers.tool_call.get_run_written_paths",
+                return_value={os.path.normcase(os.path.join(workspace, "other.py"))},
             ):
                 with self.assertRaises(ValueError) as ctx:
                     execute_tool_call(
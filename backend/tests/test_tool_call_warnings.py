@@ -1,9 +1,20 @@
 import os
+import tempfile
 import unittest
+from pathlib import Path
 from unittest.mock import patch
 
 
 class TestToolCallWarnings(unittest.TestCase):
+    def setUp(self):
+        # 来源信誉跨调用持久化：每个用例使用独立临时库，避免用例间/开发库互相影响
+        self._tmp = tempfile.TemporaryDirectory()
+        os.environ["AGENT_DB_PATH"] = str(Path(self._tmp.name) / "agent_test.db")
+
+    def tearDown(self):
+        os.environ.pop("AGENT_DB_PATH", None)
+        self._tmp.cleanup()
+
     def test_tool_call_empty_output_returns_warning_not_error(self):
         from backend.src.actions.handlers.tool_call import execute_tool_call
 
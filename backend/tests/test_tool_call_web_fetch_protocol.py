@@ -1,10 +1,22 @@
 import json
+import os
+import tempfile
 import unittest
+from pathlib import Path
 from urllib.parse import parse_qs, unquote_plus, urlparse
 from unittest.mock import patch
 
 
 class TestToolCallWebFetchProtocol(unittest.TestCase):
+    def setUp(self):
+        # 来源信誉跨调用持久化：每个用例使用独立临时库，避免用例间/开发库互相影响
+        self._tmp = tempfile.TemporaryDirectory()
+        os.environ["AGENT_DB_PATH"] = str(Path(self._tmp.name) / "agent_test.db")
+
+    def tearDown(self):
+        os.environ.pop("AGENT_DB_PATH", None)
+        self._tmp.cleanup()
+
     def test_web_fetch_generates_protocol_first_and_caches_to_context(self):
         from backend.src.actions.handlers.tool_call import (
             _WEB_FETCH_PROTOCOL_CONTEXT_KEY,
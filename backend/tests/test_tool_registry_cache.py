@@ -0,0 +1,131 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+
+class TestToolRegistryCache(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        os.environ["AGENT_DB_PATH"] = str(Path(self._tmp.name) / "agent_test.db")
+        os.environ["AGENT_PROMPT_ROOT"] = str(Path(self._tmp.name) / "prompt")
+
+        from backend.src.services.tools.tool_registry_cache import reset_tool_registry_cache
+        from backend.src.storage import init_db
+
+        init_db()
+        reset_tool_registry_cache()
+
+    def tearDown(self):
+        os.environ.pop("AGENT_DB_PATH", None)
+        os.environ.pop("AGENT_PROMPT_ROOT", None)
+        self._tmp.cleanup()
+
+    def _record(self, exec_spec: dict, *, output: str = "ok") -> dict:
+        from backend.src.services.tools.tool_records import create_tool_record
+
+        return create_tool_record(
+            {
+                "tool_name": "demo_tool",
+                "tool_description": "demo",
+                "tool_version": "0.1.0",
+                "tool_metadata": {"exec": exec_spec, "output_sample": output},
+                "input": "q",
+                "output": output,
+            }
+        )["record"]
+
+    def test_compiled_lookup_hits_and_survives_sample_updates(self):
+        from backend.src.actions.handlers.tool_call import _resolve_tool_exec_spec
+        from backend.src.services.tools import tool_registry_cache as cache
+
+        record = self._record({"shell": "python tools/demo.py --q {input}", "timeout": 30})
+        tool_id = int(record["tool_id"])
+
+        with patch.object(cache, "get_tool_by_name", wraps=cache.get_tool_by_name) as by_name:
+            specs = [_resolve_tool_exec_spec({"tool_name": "demo_tool"}) for _ in range(3)]
+        self.assertEqual(by_name.call_count, 1)
+        self.assertEqual(specs[0]["command"], "python tools/demo.py --q {input}")
+        self.assertEqual(specs[0]["timeout_ms"], 30000)
+        # 返回副本：调用方修改不影响缓存
+        specs[0]["command"] = "mutated"
+        self.assertEqual(_resolve_tool_exec_spec({"tool_name": "demo_tool"})["command"], specs[1]["command"])
+
+        compiled = cache.get_compiled_tool(tool_id=tool_id)
+        self.assertEqual(
+            cache.tokenize_command_template(compiled.exec_spec["command"]),
+            ("python", "tools/demo.py", "--q", "{input}"),
+        )
+        self.assertEqual(compiled.name, "demo_tool")
+
+        # 再次调用只回写样例：编译指纹不变，不失效
+        self._record({"shell": "python tools/demo.py --q {input}", "timeout": 30}, output="other")
+        stats = cache.get_tool_registry_cache_stats()
+        self.assertEqual(stats["invalidations"], 0)
+        self.assertGreaterEqual(stats["hits"], 3)
+
+    def test_exec_change_approval_and_delete_invalidate(self):
+        from backend.src.repositories.tools_repo import get_tool, update_tool
+        from backend.src.services.tools import tool_registry_cache as cache
+        from backend.src.services.tools.tools_delete import delete_tool_strong
+        from backend.src.services.tools.tools_store import publish_tool_file
+        from backend.src.storage import get_connection
+
+        self.assertIsNone(cache.get_compiled_tool(name="demo_tool"))
+        record = self._record({"command": "python a.py {input}"})
+        tool_id = int(record["tool_id"])
+        # 新建工具落盘时丢弃同名负缓存
+        self.assertEqual(cache.get_compiled_tool(name="demo_tool").tool_id, tool_id)
+
+        self._record({"command": "python b.py {input}"})
+        self.assertEqual(cache.get_compiled_tool(name="demo_tool").exec_spec["command"], "python b.py {input}")
+
+        with get_connection() as conn:
+            meta = dict(cache.get_compiled_tool(tool_id=tool_id).metadata)
+            meta["approval"] = dict(meta.get("approval") or {}, status="approved")
+            update_tool(
+                tool_id=tool_id,
+                name=None,
+                description=None,
+                version=None,
+                metadata=meta,
+                change_notes=None,
+                conn=conn,
+            )
+            publish_tool_file(tool_id, conn=conn)
+        self.assertEqual(cache.get_compiled_tool(tool_id=tool_id).approval_status, "approved")
+
+        self.assertIsNotNone(get_tool(tool_id=tool_id))
+        delete_tool_strong(tool_id)
+        self.assertIsNone(cache.get_compiled_tool(tool_id=tool_id))
+        self.assertIsNone(cache.get_compiled_tool(name="demo_tool"))
+
+
+    def test_rollback_rechecks_after_commit(self):
+        from backend.src.services.knowledge.governance import rollback_version
+        from backend.src.services.tools import tool_registry_cache as cache
+
+        from backend.src.repositories.tools_repo import update_tool
+
+        tool_id = int(self._record({"command": "python a.py {input}"})["tool_id"])
+        meta = dict(cache.get_compiled_tool(tool_id=tool_id).metadata, exec={"command": "python b.py {input}"})
+        update_tool(tool_id=tool_id, name=None, description=None, version="0.2.0", metadata=meta, change_notes="b")
+        cache.refresh_compiled_tools_after_commit([tool_id])
+        self.assertEqual(cache.get_compiled_tool(tool_id=tool_id).exec_spec["command"], "python b.py {input}")
+
+        real_publish = rollback_version.publish_tool_file
+
+        def publish_then_concurrent_read(tid, *, conn):
+            result = real_publish(tid, conn=conn)
+            # 模拟提交前并发的 tool_call：从另一连接读到旧的已提交行并重新缓存
+            cache.get_compiled_tool(tool_id=int(tid))
+            return result
+
+        with patch.object(rollback_version, "publish_tool_file", side_effect=publish_then_concurrent_read):
+            result = rollback_version.rollback_tool_to_previous_version(tool_id=tool_id)
+        self.assertTrue(result["ok"])
+        self.assertEqual(cache.get_compiled_tool(tool_id=tool_id).exec_spec["command"], "python a.py {input}")
+
+if __name__ == "__main__":
+    unittest.main()
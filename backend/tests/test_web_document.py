@@ -0,0 +1,100 @@
+import re
+import unittest
+
+
+class TestWebDocument(unittest.TestCase):
+    def test_visible_text_tables_and_structured_signals(self):
+        from backend.src.common.web_document import build_web_document
+
+        html = (
+            "<html><head><title>金价</title><style>.x{color:red}</style>"
+            '<script type="application/ld+json">{"@type":"Dataset"}</script>'
+            "<script>var api='https://cdn.example.com/app.js';</script></head><body>"
+            "<div itemscope><h1>黄金  价格</h1></div>"
+            "<table><tr><th>日期</th><th>价格</th></tr><tr><td>2026-02-01</td><td>684.12</td></tr></table>"
+            "<p>more &amp; text</p></body></html>"
+        )
+        doc = build_web_document(html)
+        self.assertEqual(doc.kind, "html")
+        self.assertEqual(doc.text, "金价\n黄金 价格\n日期,价格\n2026-02-01,684.12\nmore & text")
+        self.assertEqual(doc.tables, ((("日期", "价格"), ("2026-02-01", "684.12")),))
+        self.assertEqual((doc.table_count, doc.json_ld_blocks, doc.microdata_items), (1, 1, 1))
+        # script 内的 URL 只作为裸 URL 候选，不进入可见文本
+        self.assertEqual([item.href for item in doc.plain_urls], ["https://cdn.example.com/app.js"])
+        self.assertFalse(doc.search_result_page)
+
+    def test_search_result_blocks_and_anchor_tail(self):
+        from backend.src.common.web_document import build_web_document
+
+        bing = (
+            '<ol id="b_results"><li class="b_algo"><h2><a href="https://a.example.com/x">A <b>title</b></a></h2>'
+            '<div class="b_caption"><div class="meta">meta</div><p>A snippet</p></div></li>'
+            '<li class="b_algo"><div>no heading <a href="https://b.example.com/">B</a></div></li></ol>'
+        )
+        doc = build_web_document(bing)
+        self.assertTrue(doc.search_result_page)
+        self.assertEqual([(a.href, a.text, a.context) for a in doc.block_anchors], [
+            ("https://a.example.com/x", "A title", "A title A snippet"),
+        ])
+
+        so = (
+            '<li class="res-list"><h3><a href="https://www.so.com/link?m=1" data-mdurl="https://c.example.com/d">'
+            'C title</a></h3><span class="res-list-summary">C summary</span></li>'
+        )
+        doc = build_web_document(so)
+        self.assertEqual([(a.source, a.href) for a in doc.block_anchors], [("360_block", "https://c.example.com/d")])
+        self.assertEqual([a.href for a in doc.data_anchors], ["https://c.example.com/d"])
+
+        generic = (
+            '<div><a href="https://e.example.com/">E</a><p>E summary</p></div>'
+            '<div>after</div><a href="https://f.example.com/">F</a> F tail <a href="https://g.example.com/">G</a>'
+        )
+        doc = build_web_document(generic)
+        self.assertEqual([(a.text, a.tail) for a in doc.html_anchors], [("E", "E summary"), ("F", "F tail"), ("G", "")])
+        self.assertIn("after", doc.html_anchors[1].context)
+
+    def test_text_documents_and_caps(self):
+        from backend.src.common.web_document import build_web_document
+
+        markdown = "Markdown Content:\n[SGE 数据](https://sge.example.com/data) 另见 https://mirror.example.com/x"
+        doc = build_web_document(markdown)
+        self.assertEqual(doc.kind, "text")
+        self.assertTrue(doc.search_result_page)
+        self.assertEqual([(a.href, a.text) for a in doc.text_links], [("https://sge.example.com/data", "SGE 数据")])
+        self.assertEqual([a.href for a in doc.plain_urls], ["https://mirror.example.com/x"])
+
+        self.assertTrue(build_web_document('{"rows": [1, 2]}').json_payload)
+        self.assertFalse(build_web_document("<p>{}</p>").json_payload)
+
+        html = "<div>" + "<p>段落文本 0123456789</p>" * 500 + '<a href="https://late.example.com/">late</a></div>'
+        doc = build_web_document(html, max_text_chars=200)
+        self.assertEqual(len(doc.text), 200)
+        self.assertTrue(doc.truncated)
+        self.assertEqual(doc.html_anchors, ())
+
+        doc = build_web_document("x" * 100, max_input_chars=10)
+        self.assertEqual((doc.text, doc.truncated, doc.source_chars), ("x" * 10, True, 100))
+
+    def test_text_signals_match_regex_counts(self):
+        from backend.src.common.web_document import build_web_document
+
+        text = (
+            "date,price\n2026-02-01,684.12\n2026/02/02,685.08 元/克\n"
+            "price 2026年2月3日 686\n备注 12 345 20260 2026-02-01\n"
+        )
+        signals = build_web_document(text).signals
+        date_re = r"(?:20\d{2}[-/.年]\d{1,2}(?:[-/.月]\d{1,2})?)"
+        self.assertEqual(signals.date_hits, len(re.findall(date_re, text)))
+        self.assertEqual(signals.number_hits, len(re.findall(r"\b\d{2,5}(?:\.\d{1,4})?\b", text)))
+        self.assertEqual(signals.distinct_dates, 3)
+        pair_patterns = [
+            date_re + r".{0,80}?\b\d{2,5}(?:\.\d{1,4})?\b.{0,20}?(?:元/克|人民币/克|cny/?g|price)",
+            r"(?:元/克|人民币/克|cny/?g|price).{0,40}?" + date_re + r".{0,80}?\b\d{2,5}(?:\.\d{1,4})?\b",
+            r"(?:^|\n)\s*(?:20\d{2}[-/.]\d{1,2}[-/.]\d{1,2})\s*,\s*\d{2,5}(?:\.\d{1,4})?",
+        ]
+        expected_pairs = sum(len(re.findall(pattern, text, flags=re.IGNORECASE)) for pattern in pair_patterns)
+        self.assertEqual(signals.date_price_pairs, expected_pairs)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -168,6 +168,26 @@ export async function streamExecuteTask(taskId, payload, signal) {
   return response;
 }
 
+// 状态推送通道：一个 SSE 连接多路复用 runs/tasks/records/reviews/memory 变化（替代轮询）。
+// EventSource 断线会自动重连并携带 Last-Event-ID，服务端补发缺失事件。
+export function openStateChannel(topics, handlers = {}) {
+  const suffix = buildQueryString({ topics: Array.isArray(topics) ? topics.join(",") : topics });
+  const source = new EventSource(`${API_BASE}/state/stream${suffix}`);
+  const onEvent = typeof handlers.onEvent === "function" ? handlers.onEvent : () => {};
+  ["runs", "tasks", "records", "reviews", "memory", "reset"].forEach((topic) => {
+    source.addEventListener(topic, (event) => {
+      let data = null;
+      try {
+        data = JSON.parse(event.data || "null");
+      } catch (e) {}
+      onEvent(topic, data);
+    });
+  });
+  if (typeof handlers.onOpen === "function") source.onopen = handlers.onOpen;
+  if (typeof handlers.onError === "function") source.onerror = handlers.onError;
+  return source;
+}
+
 export async function fetchHealth() {
   return request("/health");
 }
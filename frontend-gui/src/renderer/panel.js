@@ -20,6 +20,7 @@ import { AGENT_EVENT_NAME, emitAgentEvent, initAgentEventBridge } from "./agent_
 import { bindPetImageFallback } from "./pet_image.js";
 import { isTerminalRunStatus, normalizeRunStatusValue } from "./run_status.js";
 import {
+  applyWorldChannelEventState,
   applyWorldConvergenceEventState,
   applyWorldAgentPlanDeltaState,
   applyWorldAgentPlanState,
@@ -1961,34 +1962,43 @@ async function updateWorldTrace(taskId, runId, force = false) {
 
   try {
     const resp = await api.fetchRecentRecords({ limit: 120, offset: 0 });
-    const items = Array.isArray(resp?.items) ? resp.items : [];
-
-    const filtered = items.filter((raw) => {
-      const it = raw && typeof raw === "object" ? raw : {};
-      if (Number(it.task_id) !== tid) return false;
-      // 有 run_id 的记录：严格按当前 run 过滤
-      if (it.run_id != null) return Number(it.run_id) === rid;
-      // 没有 run_id 的：仅收进对“Agent 思考轨迹”有价值的（记忆/技能）
-      const t = String(it.type || "").trim().toLowerCase();
-      return t === "memory" || t === "skill";
-    });
-
-    const lines = [];
-    filtered.slice(0, 24).forEach((it) => {
-      const line = formatRecentRecordLine(it);
-      if (line) lines.push(line);
-    });
-
-    worldSession.setState(
-      (prev) => applyWorldTraceLinesState(prev, { lines }),
-      { reason: "trace_update" }
-    );
-    rerenderWorldThoughtsFromState();
+    applyWorldTraceRecords(tid, rid, resp?.items);
   } catch (e) {
     // 忽略：后端可能暂时不可用
   }
 }
 
+// 思考轨迹：按当前 task/run 过滤最近动态并渲染（轮询拉取与状态通道快照共用）
+function applyWorldTraceRecords(taskId, runId, records) {
+  const tid = Number(taskId);
+  const rid = Number(runId);
+  if (!Number.isFinite(tid) || tid <= 0) return;
+  if (!Number.isFinite(rid) || rid <= 0) return;
+  const items = Array.isArray(records) ? records : [];
+
+  const filtered = items.filter((raw) => {
+    const it = raw && typeof raw === "object" ? raw : {};
+    if (Number(it.task_id) !== tid) return false;
+    // 有 run_id 的记录：严格按当前 run 过滤
+    if (it.run_id != null) return Number(it.run_id) === rid;
+    // 没有 run_id 的：仅收进对“Agent 思考轨迹”有价值的（记忆/技能）
+    const t = String(it.type || "").trim().toLowerCase();
+    return t === "memory" || t === "skill";
+  });
+
+  const lines = [];
+  filtered.slice(0, 24).forEach((it) => {
+    const line = formatRecentRecordLine(it);
+    if (line) lines.push(line);
+  });
+
+  worldSession.setState(
+    (prev) => applyWorldTraceLinesState(prev, { lines }),
+    { reason: "trace_update" }
+  );
+  rerenderWorldThoughtsFromState();
+}
+
 async function loadWorldChatHistory(force = false) {
   const chat = getWorldChatState();
   if (chat?.initialized && !force) return;
@@ -2207,216 +2217,318 @@ function commitTempChatMessage(tempKey, savedMsg) {
   }
 }
 
-async function _updateWorldFromBackendImpl(force = false) {
-  // chat 流式时不需要刷新“Agent 进度”，避免左侧内容频繁变化；do 流式时允许刷新 plan/state。
-  const session = worldSession.getState();
-  if (session.streaming && session.streamingMode === "chat" && !force) return;
-  if (!pageWorldEl?.classList.contains("is-visible") && !force) return;
-  try {
-    const current = await api.fetchCurrentAgentRun();
-    const run = current?.run;
-    if (!run) {
-      renderWorldPlan({ items: [] });
-      worldSession.setState((prev) => applyWorldNoRunState(prev), { reason: "no_run" });
-      clearWorldPendingResume({ reason: "no_run", emit: false });
-      renderWorldThoughts(null, null);
-      renderWorldEvalPlan(null);
-      worldLastReviewId = null;
-      worldLastReviewSignature = "";
-      return;
-    }
+function renderWorldNoRun() {
+  renderWorldPlan({ items: [] });
+  worldSession.setState((prev) => applyWorldNoRunState(prev), { reason: "no_run" });
+  clearWorldPendingResume({ reason: "no_run", emit: false });
+  renderWorldThoughts(null, null);
+  renderWorldEvalPlan(null);
+  worldLastReviewId = null;
+  worldLastReviewSignature = "";
+}
 
-    const runId = Number(run.run_id);
-    const taskId = Number(run.task_id);
-    const updatedAt = String(run.updated_at || "").trim();
-    worldSession.setState(
-      (prev) => applyWorldCurrentRunState(prev, { run }),
-      { reason: "current_run" }
-    );
+// run 元信息 -> 会话状态/计划/暂停点（轮询与状态通道共用）；run 的 updated_at 变化时才拉取 plan/state 细节
+async function applyWorldCurrentRun(run, force = false) {
+  const runId = Number(run.run_id);
+  const taskId = Number(run.task_id);
+  const updatedAt = String(run.updated_at || "").trim();
+  worldSession.setState(
+    (prev) => applyWorldCurrentRunState(prev, { run }),
+    { reason: "current_run" }
+  );
 
-    const lastRunMeta = worldSession.getState().lastRunMeta;
-    const shouldRefreshDetail = force
-      || !lastRunMeta
-      || lastRunMeta.run_id !== runId
-      || String(lastRunMeta.updated_at || "") !== updatedAt;
+  const lastRunMeta = worldSession.getState().lastRunMeta;
+  const shouldRefreshDetail = force
+    || !lastRunMeta
+    || lastRunMeta.run_id !== runId
+    || String(lastRunMeta.updated_at || "") !== updatedAt;
 
-    if (shouldRefreshDetail) {
-      const detail = await api.fetchAgentRunDetail(runId);
-      worldSession.setState(
-        (prev) => applyWorldRunDetailState(
-          prev,
-          {
-            detail,
-            lastRunMeta: {
-              run_id: runId,
-              task_id: taskId,
-              updated_at: updatedAt,
-              status: run.status
-            }
-          }
-        ),
-        { reason: "agent_detail" }
-      );
-      renderWorldPlan(detail?.agent_plan || {});
-      rerenderWorldThoughtsFromState();
-    }
-
-    // 思考轨迹：从最近动态里提取当前任务/run 的关键信息（tool/skill/memory/debug 等）
-    updateWorldTrace(taskId, runId, shouldRefreshDetail || force);
-
-    // waiting -> 允许世界页接管交互（页面刷新/错过 SSE 的兜底）
-    const latest = worldSession.getState();
-    if (!latest.streaming) {
-      const statusLower = String(run.status || "").trim().toLowerCase();
-      const paused = latest?.currentAgentState?.paused;
-      if (statusLower === "waiting") {
-        const resolved = resolveWorldNeedInputTransition(
-          {
+  if (shouldRefreshDetail) {
+    const detail = await api.fetchAgentRunDetail(runId);
+    worldSession.setState(
+      (prev) => applyWorldRunDetailState(
+        prev,
+        {
+          detail,
+          lastRunMeta: {
             run_id: runId,
-            task_id: Number.isFinite(taskId) && taskId > 0 ? taskId : null,
-            question: paused?.question,
-            kind: paused?.kind,
-            choices: paused?.choices,
-            prompt_token: paused?.prompt_token,
-            session_key: paused?.session_key || latest?.currentAgentState?.session_key
-          },
-          {
-            state: latest,
-            requireQuestion: true
-          }
-        );
-        if (!resolved.ok) {
-          const existing = latest.pendingResume;
-          if (existing) {
-            clearWorldPendingResume({ runId, reason: "need_input_clear", emit: false });
+            task_id: taskId,
+            updated_at: updatedAt,
+            status: run.status
           }
-        } else if (resolved.transition.suppressed) {
-          worldSession.setState(
-            (prev) => applyWorldNeedInputRecentRecordsState(
-              prev,
-              { recentRecords: resolved.transition.recentRecords }
-            ),
-            { reason: "need_input_poll_suppressed" }
-          );
-          clearWorldPendingResume({ runId, reason: "need_input_poll_suppressed", emit: false });
-        } else if (resolved.transition.changed) {
-          upsertWorldPendingResumeState(resolved.pending, resolved.transition.recentRecords, "need_input_poll");
-          renderWorldNeedInputChoicesUi(resolved.pending);
-        } else {
-          renderWorldNeedInputChoicesUi(latest.pendingResume);
         }
-      } else {
+      ),
+      { reason: "agent_detail" }
+    );
+    renderWorldPlan(detail?.agent_plan || {});
+    rerenderWorldThoughtsFromState();
+  }
+
+  // waiting -> 允许世界页接管交互（页面刷新/错过 SSE 的兜底）
+  const latest = worldSession.getState();
+  if (!latest.streaming) {
+    const statusLower = String(run.status || "").trim().toLowerCase();
+    const paused = latest?.currentAgentState?.paused;
+    if (statusLower === "waiting") {
+      const resolved = resolveWorldNeedInputTransition(
+        {
+          run_id: runId,
+          task_id: Number.isFinite(taskId) && taskId > 0 ? taskId : null,
+          question: paused?.question,
+          kind: paused?.kind,
+          choices: paused?.choices,
+          prompt_token: paused?.prompt_token,
+          session_key: paused?.session_key || latest?.currentAgentState?.session_key
+        },
+        {
+          state: latest,
+          requireQuestion: true
+        }
+      );
+      if (!resolved.ok) {
         const existing = latest.pendingResume;
         if (existing) {
           clearWorldPendingResume({ runId, reason: "need_input_clear", emit: false });
         }
+      } else if (resolved.transition.suppressed) {
+        worldSession.setState(
+          (prev) => applyWorldNeedInputRecentRecordsState(
+            prev,
+            { recentRecords: resolved.transition.recentRecords }
+          ),
+          { reason: "need_input_poll_suppressed" }
+        );
+        clearWorldPendingResume({ runId, reason: "need_input_poll_suppressed", emit: false });
+      } else if (resolved.transition.changed) {
+        upsertWorldPendingResumeState(resolved.pending, resolved.transition.recentRecords, "need_input_poll");
+        renderWorldNeedInputChoicesUi(resolved.pending);
+      } else {
+        renderWorldNeedInputChoicesUi(latest.pendingResume);
+      }
+    } else {
+      const existing = latest.pendingResume;
+      if (existing) {
+        clearWorldPendingResume({ runId, reason: "need_input_clear", emit: false });
       }
     }
+  }
+
+  return { runId, taskId, refreshed: shouldRefreshDetail };
+}
+
+// 评估计划：按该 run 最新一次 review 的摘要决定是否拉取详情；返回放行“最终回答”所需的评估状态
+async function applyWorldReviewMeta(reviewMeta, force = false) {
+  const reviewId = reviewMeta ? Number(reviewMeta.id) : null;
+  if (!reviewId) {
+    worldLastReviewId = null;
+    worldLastReviewSignature = "";
+    renderWorldEvalPlan(null);
+    return { hasReview: false, evalFinal: false };
+  }
+  // 注意：评估记录可能是“先插入 running 占位 -> 再 update 成最终状态”，id 不变但 status/summary 会变。
+  // 因此不能只用 id 判断是否需要刷新。
+  const signature = [
+    reviewId,
+    String(reviewMeta?.status || ""),
+    String(reviewMeta?.summary || ""),
+    String(reviewMeta?.created_at || "")
+  ].join("|");
+
+  const shouldRefresh = force || worldLastReviewId !== reviewId || worldLastReviewSignature !== signature;
+  if (shouldRefresh) {
+    try {
+      const detail = await api.fetchAgentReview(reviewId);
+      worldLastReviewId = reviewId;
+      worldLastReviewSignature = signature;
+      renderWorldEvalPlan(detail?.review || null);
+    } catch (e) {
+      // 忽略：评估模块可能未启用/后端不可用
+    }
+  }
+  return { hasReview: true, evalFinal: isEvalFinalStatus(reviewMeta?.status) };
+}
+
+async function finalizeWorldPendingFinal(run, { hasReview, evalFinal }) {
+  const runId = Number(run?.run_id);
+  // 任务执行 + 评估均完成后，才把“最终回答”落库并展示
+  const pendingFinal = worldSession.getState().pendingFinal;
+  if (pendingFinal && String(pendingFinal.tmpKey || "") && Number(pendingFinal.run_id) === runId) {
+    const runStatusLower = String(run.status || "").trim().toLowerCase();
+    const age = Date.now() - Number(pendingFinal.startedAt || 0);
+    const terminal = runStatusLower === "done" || runStatusLower === "failed" || runStatusLower === "stopped";
+
+    // 默认优先等评估完成；但只要 run 已终态且超过门限，也要放行，
+    // 避免“review 记录存在但长期非终态”导致对话一直停在“评估中...”。
+    const shouldFinalize = shouldFinalizePendingFinal({
+      evalFinal,
+      hasReview,
+      terminal,
+      ageMs: age,
+      timeoutMs: WORLD_EVAL_GATE_TIMEOUT_MS
+    });
+    if (shouldFinalize) {
+      const fallbackLastError = extractRunLastError({
+        snapshot: worldSession.getState()?.currentAgentSnapshot || null
+      });
+      const finalText = String(pendingFinal.content || "").trim()
+        || await buildWorldNoVisibleResultText(runStatusLower, pendingFinal.run_id, fallbackLastError);
+      updateWorldChatMessageContent(pendingFinal.tmpKey, finalText);
+      await saveAndCommitWorldAssistantMessage(pendingFinal.tmpKey, {
+        role: "assistant",
+        content: finalText,
+        run_id: pendingFinal.run_id,
+        task_id: pendingFinal.task_id,
+        metadata: pendingFinal.metadata || { source: "panel", mode: "do" }
+      });
+      worldSession.setState(
+        (prev) => applyWorldPendingFinalState(prev, { pendingFinal: null }),
+        { reason: "pending_final_done" }
+      );
+    }
+  }
+}
+
+// 同步聊天时间线（桌宠/面板都可能产生新消息）；若任务来自桌宠，世界页补一个“进行中占位”
+function syncWorldChatForRun(run) {
+  syncWorldChatNew();
+  ensureRunAssistantPlaceholder(run);
+}
+
+function renderWorldUnavailable() {
+  // 兜底：后端不可用时不要抛到全局（避免 unhandled rejection 导致 UI 卡死）
+  renderWorldPlan({ items: [] });
+  renderWorldEvalPlan(null);
+  if (worldThoughtsEl) {
+    renderThoughtLinesStructured(worldThoughtsEl, [
+      UI_TEXT.WORLD_THOUGHTS_SECTION_STATUS || "【状态】",
+      `- ${UI_TEXT.UNAVAILABLE || "不可用"}`
+    ]);
+  }
+}
+
+function shouldSkipWorldRefresh(force = false) {
+  // chat 流式时不需要刷新“Agent 进度”，避免左侧内容频繁变化；do 流式时允许刷新 plan/state。
+  const session = worldSession.getState();
+  if (session.streaming && session.streamingMode === "chat" && !force) return true;
+  return !pageWorldEl?.classList.contains("is-visible") && !force;
+}
+
+// 全量回源刷新：定时轮询（状态通道不可用/出错时）与通道 reset 后的重新同步使用
+async function _updateWorldFromBackendImpl(force = false) {
+  if (shouldSkipWorldRefresh(force)) return;
+  try {
+    const current = await api.fetchCurrentAgentRun();
+    const run = current?.run;
+    if (!run) {
+      renderWorldNoRun();
+      return;
+    }
+
+    const { runId, taskId, refreshed } = await applyWorldCurrentRun(run, force);
+    // 思考轨迹：从最近动态里提取当前任务/run 的关键信息（tool/skill/memory/debug 等）
+    updateWorldTrace(taskId, runId, refreshed || force);
 
     // 评估计划：取该 run 最新一次 review
-    let hasReview = false;
-    let evalFinal = false;
+    let reviewGate = { hasReview: false, evalFinal: false };
     try {
       const list = await api.fetchAgentReviews({ run_id: runId, limit: 1, offset: 0 });
       const reviewMeta = Array.isArray(list?.items) && list.items.length ? list.items[0] : null;
-      const reviewId = reviewMeta ? Number(reviewMeta.id) : null;
-      if (!reviewId) {
-        worldLastReviewId = null;
-        worldLastReviewSignature = "";
-        renderWorldEvalPlan(null);
-      } else {
-        hasReview = true;
-        evalFinal = isEvalFinalStatus(reviewMeta?.status);
-        // 注意：评估记录可能是“先插入 running 占位 -> 再 update 成最终状态”，id 不变但 status/summary 会变。
-        // 因此不能只用 id 判断是否需要刷新。
-        const signature = [
-          reviewId,
-          String(reviewMeta?.status || ""),
-          String(reviewMeta?.summary || ""),
-          String(reviewMeta?.created_at || "")
-        ].join("|");
-
-        const shouldRefresh = force || worldLastReviewId !== reviewId || worldLastReviewSignature !== signature;
-        if (shouldRefresh) {
-          const detail = await api.fetchAgentReview(reviewId);
-          worldLastReviewId = reviewId;
-          worldLastReviewSignature = signature;
-          renderWorldEvalPlan(detail?.review || null);
-        }
-      }
+      reviewGate = await applyWorldReviewMeta(reviewMeta, force);
     } catch (e) {
       // 忽略：评估模块可能未启用/后端不可用
     }
 
-    // 任务执行 + 评估均完成后，才把“最终回答”落库并展示
-    const pendingFinal = worldSession.getState().pendingFinal;
-    if (pendingFinal && String(pendingFinal.tmpKey || "") && Number(pendingFinal.run_id) === runId) {
-      const runStatusLower = String(run.status || "").trim().toLowerCase();
-      const age = Date.now() - Number(pendingFinal.startedAt || 0);
-      const terminal = runStatusLower === "done" || runStatusLower === "failed" || runStatusLower === "stopped";
-
-      // 默认优先等评估完成；但只要 run 已终态且超过门限，也要放行，
-      // 避免“review 记录存在但长期非终态”导致对话一直停在“评估中...”。
-      const shouldFinalize = shouldFinalizePendingFinal({
-        evalFinal,
-        hasReview,
-        terminal,
-        ageMs: age,
-        timeoutMs: WORLD_EVAL_GATE_TIMEOUT_MS
-      });
-      if (shouldFinalize) {
-        const fallbackLastError = extractRunLastError({
-          snapshot: worldSession.getState()?.currentAgentSnapshot || null
-        });
-        const finalText = String(pendingFinal.content || "").trim()
-          || await buildWorldNoVisibleResultText(runStatusLower, pendingFinal.run_id, fallbackLastError);
-        updateWorldChatMessageContent(pendingFinal.tmpKey, finalText);
-        await saveAndCommitWorldAssistantMessage(pendingFinal.tmpKey, {
-          role: "assistant",
-          content: finalText,
-          run_id: pendingFinal.run_id,
-          task_id: pendingFinal.task_id,
-          metadata: pendingFinal.metadata || { source: "panel", mode: "do" }
-        });
-        worldSession.setState(
-          (prev) => applyWorldPendingFinalState(prev, { pendingFinal: null }),
-          { reason: "pending_final_done" }
-        );
-      }
-    }
-
-    // 同步聊天时间线（桌宠/面板都可能产生新消息）
-    syncWorldChatNew();
-    // 若任务来自桌宠：世界页补一个“进行中占位”，让两种形态看到的聊天区表现一致
-    ensureRunAssistantPlaceholder(run);
+    await finalizeWorldPendingFinal(run, reviewGate);
+    syncWorldChatForRun(run);
   } catch (e) {
-    // 兜底：后端不可用时不要抛到全局（避免 unhandled rejection 导致 UI 卡死）
-    renderWorldPlan({ items: [] });
-    renderWorldEvalPlan(null);
-    if (worldThoughtsEl) {
-      renderThoughtLinesStructured(worldThoughtsEl, [
-        UI_TEXT.WORLD_THOUGHTS_SECTION_STATUS || "【状态】",
-        `- ${UI_TEXT.UNAVAILABLE || "不可用"}`
-      ]);
-    }
-  } finally {}
+    renderWorldUnavailable();
+  }
 }
 
 async function updateWorldFromBackend(force = false) {
   return pollManager.run(WORLD_POLL_KEY, () => _updateWorldFromBackendImpl(force));
 }
 
-function startWorldPolling() {
+let worldStateChannel = null;
+
+function startWorldIntervalPolling() {
   if (pollManager.isRunning(WORLD_POLL_KEY)) return;
-  loadWorldChatHistory(false).catch(() => {});
-  updateWorldFromBackend(true).catch(() => {});
   pollManager.start(WORLD_POLL_KEY, () => _updateWorldFromBackendImpl(false), UI_POLL_INTERVAL_MS, {
     runImmediately: false
   });
 }
 
+// 状态通道最近一次收到的各主题快照（见 applyWorldChannelEventState）
+const WORLD_CHANNEL_EMPTY = Object.freeze({ run: undefined, records: null, reviews: null });
+let worldChannelSnapshots = WORLD_CHANNEL_EMPTY;
+let worldChannelRenderPending = false;
+
+// 用通道快照渲染世界页（不回源拉取 runs/current、records/recent、agent/reviews 列表）
+async function renderWorldFromChannel() {
+  const { run, records, reviews } = worldChannelSnapshots;
+  if (shouldSkipWorldRefresh(false) || run === undefined) return;
+  try {
+    if (!run) {
+      renderWorldNoRun();
+      return;
+    }
+    const { runId, taskId } = await applyWorldCurrentRun(run, false);
+    if (records) applyWorldTraceRecords(taskId, runId, records);
+    if (reviews) {
+      const reviewMeta = reviews.find((it) => Number(it?.run_id) === runId) || null;
+      await finalizeWorldPendingFinal(run, await applyWorldReviewMeta(reviewMeta, false));
+    }
+    syncWorldChatForRun(run);
+  } catch (e) {
+    renderWorldUnavailable();
+  }
+}
+
+function handleWorldChannelEvent(topic, payload) {
+  if (topic === "reset") {
+    // 缓冲无法续传：随后会收到各主题完整快照，这里先全量回源一次保证不漏状态
+    worldChannelSnapshots = WORLD_CHANNEL_EMPTY;
+    updateWorldFromBackend(true).catch(() => {});
+    return;
+  }
+  const next = applyWorldChannelEventState(worldChannelSnapshots, { topic, data: payload });
+  if (next === worldChannelSnapshots) return;
+  worldChannelSnapshots = next;
+  // 与轮询共用 inFlight 锁；渲染期间到达的事件只置位，由进行中的渲染循环补一轮
+  worldChannelRenderPending = true;
+  pollManager.run(WORLD_POLL_KEY, async () => {
+    while (worldChannelRenderPending) {
+      worldChannelRenderPending = false;
+      await renderWorldFromChannel();
+    }
+  }).catch(() => {});
+}
+
+// 优先订阅状态推送通道：连接正常时停掉定时轮询，按事件携带的快照渲染；连接出错时回退到定时轮询。
+function openWorldStateChannel() {
+  if (worldStateChannel || typeof EventSource === "undefined") return false;
+  worldStateChannel = api.openStateChannel(["runs", "records", "reviews"], {
+    onOpen: () => pollManager.stop(WORLD_POLL_KEY),
+    onEvent: handleWorldChannelEvent,
+    onError: () => startWorldIntervalPolling()
+  });
+  return true;
+}
+
+function startWorldPolling() {
+  if (pollManager.isRunning(WORLD_POLL_KEY) || worldStateChannel) return;
+  loadWorldChatHistory(false).catch(() => {});
+  updateWorldFromBackend(true).catch(() => {});
+  if (!openWorldStateChannel()) startWorldIntervalPolling();
+}
+
 function stopWorldPolling() {
   pollManager.stop(WORLD_POLL_KEY);
+  if (worldStateChannel) {
+    worldStateChannel.close();
+    worldStateChannel = null;
+  }
+  worldChannelSnapshots = WORLD_CHANNEL_EMPTY;
 }
 
 function buildWorldChatContextMessages() {
@@ -401,3 +401,25 @@ export function applyWorldPageHideState(prev) {
     streamingStatus: ""
   };
 }
+
+// 状态通道事件 -> 世界页快照缓存 { run, records, reviews }（run 为 undefined 表示尚未收到 runs 快照）。
+// run_status 只改当前 run 的状态（完整快照随写库提交到达）；与世界页无关的事件原样返回 prev。
+export function applyWorldChannelEventState(prev, payload = {}) {
+  const prevState = isObject(prev) ? prev : { run: undefined, records: null, reviews: null };
+  const topic = String(payload.topic || "");
+  const data = isObject(payload.data) ? payload.data : {};
+  if (topic === "runs" && data.type === "run_status") {
+    const run = prevState.run;
+    if (!isObject(run) || toPositiveInt(run.run_id) !== toPositiveInt(data.run_id)) return prevState;
+    return { ...prevState, run: { ...run, status: normalizeRunStatusValue(data.status) || run.status } };
+  }
+  if (data.type !== "snapshot") return prevState;
+  const snapshot = isObject(data.data) ? data.data : {};
+  if (topic === "runs") {
+    return { ...prevState, run: isObject(snapshot.run) ? snapshot.run : null };
+  }
+  if (topic === "records" || topic === "reviews") {
+    return { ...prevState, [topic]: Array.isArray(snapshot.items) ? snapshot.items : [] };
+  }
+  return prevState;
+}
@@ -2,6 +2,7 @@ import test from "node:test";
 import assert from "node:assert/strict";
 
 import {
+  applyWorldChannelEventState,
   applyWorldConvergenceEventState,
   applyWorldAgentPlanDeltaState,
   applyWorldAgentPlanState,
@@ -343,3 +344,40 @@ test("applyWorldTrace reducers and page hide reducer should keep state determini
   assert.equal(hidden.streamingStatus, "");
   assert.equal(hidden.pendingResume, null);
 });
+
+test("applyWorldChannelEventState should cache topic snapshots and patch run status", () => {
+  const run = { run_id: 7, task_id: 3, status: "running", updated_at: "t1" };
+  const withRun = applyWorldChannelEventState(undefined, {
+    topic: "runs",
+    data: { type: "snapshot", topic: "runs", data: { run } }
+  });
+  assert.deepEqual(withRun.run, run);
+  assert.equal(withRun.records, null);
+
+  const withRecords = applyWorldChannelEventState(withRun, {
+    topic: "records",
+    data: { type: "snapshot", data: { items: [{ task_id: 3, run_id: 7 }] } }
+  });
+  assert.equal(withRecords.records.length, 1);
+  const withReviews = applyWorldChannelEventState(withRecords, {
+    topic: "reviews",
+    data: { type: "snapshot", data: { items: [] } }
+  });
+  assert.deepEqual(withReviews.reviews, []);
+
+  const waiting = applyWorldChannelEventState(withReviews, {
+    topic: "runs",
+    data: { type: "run_status", run_id: 7, status: "Waiting" }
+  });
+  assert.equal(waiting.run.status, "waiting");
+  assert.equal(waiting.run.updated_at, "t1");
+
+  // 其他 run 的即时状态、与世界页无关的主题：原样返回
+  const other = { topic: "runs", data: { type: "run_status", run_id: 8, status: "done" } };
+  assert.equal(applyWorldChannelEventState(waiting, other), waiting);
+  const tasks = { topic: "tasks", data: { type: "snapshot", data: {} } };
+  assert.equal(applyWorldChannelEventState(waiting, tasks), waiting);
+
+  const noRun = applyWorldChannelEventState(waiting, { topic: "runs", data: { type: "snapshot", data: { run: null } } });
+  assert.equal(noRun.run, null);
+});
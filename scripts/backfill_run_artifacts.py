@@ -0,0 +1,36 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+run_artifacts 回填：为进行中/等待中的 run 从 task_steps 补齐产物登记（file_write/file_append），输出报告（JSON）。
+
+用法：
+    python scripts/backfill_run_artifacts.py
+    python scripts/backfill_run_artifacts.py --status running --status waiting --status done
+"""
+
+import argparse
+import json
+import os
+import sys
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, _PROJECT_ROOT)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="backfill run_artifacts from task_steps")
+    parser.add_argument("--status", action="append", default=None, help="run 状态（可重复），默认 running + waiting")
+    args = parser.parse_args()
+
+    from backend.src.constants import RUN_STATUS_RUNNING, RUN_STATUS_WAITING
+    from backend.src.services.tasks.run_artifacts import backfill_active_run_artifacts
+
+    statuses = args.status or [RUN_STATUS_RUNNING, RUN_STATUS_WAITING]
+    report = backfill_active_run_artifacts(statuses=statuses)
+    print(json.dumps({"statuses": statuses, **report}, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
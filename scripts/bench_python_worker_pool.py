@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Python 脚本执行延迟对比：每次新起解释器（subprocess） vs 热 worker 池 fork 执行。
+
+两条路径都经过 process_capture 的流式采集，测得的是单次调用的端到端延迟（含导入脚本依赖）；
+同时校验两条路径的 stdout/stderr/returncode 一致。
+
+用法：
+    python scripts/bench_python_worker_pool.py --runs 30 --imports json,csv,urllib.request
+    python scripts/bench_python_worker_pool.py --runs 30 --imports pandas,requests
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, _PROJECT_ROOT)
+
+
+def _write_script(workdir: str, imports: list) -> str:
+    lines = ["import sys"]
+    lines.extend(f"import {name}" for name in imports)
+    lines.append("print('args', sys.argv[1:], 'stdin', len(sys.stdin.read()))")
+    path = Path(workdir) / "bench_tool.py"
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return path.name
+
+
+def _measure(label: str, runs: int, call) -> list:
+    samples = []
+    results = []
+    for index in range(runs):
+        started = time.perf_counter()
+        results.append(call(index))
+        samples.append((time.perf_counter() - started) * 1000.0)
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    print(f"{label:<12} mean {statistics.mean(samples):8.1f} ms   p50 {statistics.median(samples):8.1f} ms   p95 {p95:8.1f} ms")
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=30)
+    parser.add_argument("--imports", default="json,csv,urllib.request", help="脚本导入（同时作为 worker 预导入）的模块")
+    args = parser.parse_args()
+
+    from backend.src.services.execution.process_capture import run_process_streaming
+    from backend.src.services.execution.python_worker_pool import PythonWorkerPool, is_python_worker_supported
+
+    if not is_python_worker_supported():
+        print("python worker pool is not supported on this platform")
+        return
+
+    imports = [item.strip() for item in str(args.imports).split(",") if item.strip()]
+    runs = max(1, int(args.runs))
+    with tempfile.TemporaryDirectory() as tmp:
+        script = _write_script(tmp, imports)
+
+        def _argv(index: int) -> list:
+            return [sys.executable, script, f"--index={index}"]
+
+        direct = _measure(
+            "subprocess",
+            runs,
+            lambda i: run_process_streaming(_argv(i), cwd=tmp, stdin_bytes=b"payload", timeout=60),
+        )
+
+        pool = PythonWorkerPool(size=1, preload=imports, max_runs=runs + 1)
+        try:
+            started = time.perf_counter()
+            pool.warm()
+            print(f"worker warm-up: {(time.perf_counter() - started) * 1000.0:.1f} ms (one-off)")
+            pooled = _measure(
+                "worker pool",
+                runs,
+                lambda i: pool.run(_argv(i), cwd=tmp, stdin_bytes=b"payload", timeout=60),
+            )
+        finally:
+            pool.shutdown()
+
+    mismatches = sum(
+        1
+        for a, b in zip(direct, pooled)
+        if b is None or (a.stdout, a.stderr, a.returncode) != (b.stdout, b.stderr, b.returncode)
+    )
+    print(f"imports: {', '.join(imports) or '-'}   runs: {runs}   result mismatches: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+启动同步基准：在临时目录生成 N 个 skills + N 个 memory 文件，对比全量同步与增量同步耗时。
+
+用法：
+    python scripts/bench_startup_sync.py --count 10000
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, _PROJECT_ROOT)
+
+
+def _write_fixtures(prompt_root: Path, count: int) -> None:
+    skills_dir = prompt_root / "skills" / "misc"
+    memory_dir = prompt_root / "memory"
+    skills_dir.mkdir(parents=True, exist_ok=True)
+    memory_dir.mkdir(parents=True, exist_ok=True)
+    for i in range(count):
+        skill_meta = {"name": f"bench_skill_{i}", "description": f"基准技能 {i}", "tags": ["bench"], "steps": ["a", "b"]}
+        (skills_dir / f"bench_skill_{i}.md").write_text(
+            f"---\n{json.dumps(skill_meta, ensure_ascii=False)}\n---\n\n技能正文 {i}\n", encoding="utf-8"
+        )
+        memory_meta = {"uid": f"bench{i:08d}", "memory_type": "long_term", "tags": ["bench"]}
+        (memory_dir / f"bench{i:08d}.md").write_text(
+            f"---\n{json.dumps(memory_meta, ensure_ascii=False)}\n---\n\n记忆内容 {i}\n", encoding="utf-8"
+        )
+
+
+def _timed(label: str, func) -> dict:
+    started = time.perf_counter()
+    result = func()
+    elapsed_ms = int((time.perf_counter() - started) * 1000)
+    print(f"{label:<36} {elapsed_ms:>8} ms")
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=10000, help="skills 与 memory 各生成多少个文件")
+    parser.add_argument("--touch", type=int, default=100, help="增量场景下修改的文件数")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        prompt_root = Path(tmp) / "prompt"
+        os.environ["AGENT_DB_PATH"] = str(Path(tmp) / "bench.db")
+        os.environ["AGENT_PROMPT_ROOT"] = str(prompt_root)
+        os.environ["AGENT_RUN_EVENT_AUDIT_ENABLED"] = "0"
+
+        from backend.src.repositories.file_sync_manifest_repo import clear_file_sync_manifest
+        from backend.src.services.system.startup_sync import run_startup_file_sync
+        from backend.src.storage import init_db
+
+        init_db()
+        _write_fixtures(prompt_root, int(args.count))
+        print(f"files: {args.count} skills + {args.count} memory")
+
+        _timed("cold (empty db, full parse)", lambda: run_startup_file_sync(incremental=False))
+        _timed("restart, full parse (before)", lambda: run_startup_file_sync(incremental=False))
+        _timed("restart, incremental, 0 changed", lambda: run_startup_file_sync(incremental=True))
+
+        skills_dir = prompt_root / "skills" / "misc"
+        for i in range(min(int(args.touch), int(args.count))):
+            path = skills_dir / f"bench_skill_{i}.md"
+            path.write_text(path.read_text(encoding="utf-8") + "\n修改\n", encoding="utf-8")
+        result = _timed(
+            f"restart, incremental, {args.touch} changed",
+            lambda: run_startup_file_sync(incremental=True),
+        )
+        print("skills manifest:", result["results"]["skills"].get("manifest"))
+
+        clear_file_sync_manifest()
+        _timed("incremental, manifest cleared", lambda: run_startup_file_sync(incremental=True))
+
+
+if __name__ == "__main__":
+    main()
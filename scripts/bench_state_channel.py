@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+状态推送通道压测：N 个空闲订阅者 vs N 个按 UI 轮询间隔拉取的客户端，对比进程 CPU 占用。
+
+轮询方式：每个客户端每个间隔执行一次面板轮询涉及的查询（tasks/summary、runs/current、memory/summary、reviews）；
+推送方式：每个客户端订阅 StateChannel 并空闲等待（仅心跳），期间有少量写入触发一次快照广播。
+
+用法：
+    python scripts/bench_state_channel.py --clients 100 --seconds 10 --interval-ms 1000
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, _PROJECT_ROOT)
+
+
+def _poll_once() -> None:
+    from backend.src.constants import RUN_STATUS_RUNNING, RUN_STATUS_WAITING
+    from backend.src.services.knowledge.knowledge_query import count_memory_items, fetch_latest_memory_content
+    from backend.src.services.agent_review.review_records import list_agent_reviews
+    from backend.src.services.tasks.task_queries import (
+        count_tasks,
+        fetch_agent_run_with_task_title_by_statuses,
+        fetch_current_task_title_by_run_statuses,
+        fetch_latest_agent_run_with_task_title,
+    )
+
+    statuses = [RUN_STATUS_RUNNING, RUN_STATUS_WAITING]
+    count_tasks()
+    fetch_current_task_title_by_run_statuses(statuses=statuses, limit=1)
+    if not fetch_agent_run_with_task_title_by_statuses(statuses=statuses, limit=1):
+        fetch_latest_agent_run_with_task_title()
+    count_memory_items()
+    fetch_latest_memory_content()
+    list_agent_reviews(offset=0, limit=5, task_id=None, run_id=None)
+
+
+async def _run_pollers(clients: int, seconds: float, interval: float) -> int:
+    deadline = time.monotonic() + seconds
+    polls = 0
+
+    async def _client() -> None:
+        nonlocal polls
+        while time.monotonic() < deadline:
+            await asyncio.to_thread(_poll_once)
+            polls += 1
+            await asyncio.sleep(interval)
+
+    await asyncio.gather(*[_client() for _ in range(clients)])
+    return polls
+
+
+async def _run_subscribers(clients: int, seconds: float, writes: int) -> dict:
+    from backend.src.services.system.state_channel import StateChannel
+    from backend.src.storage import get_connection
+
+    channel = StateChannel(debounce_ms=100)
+    channel.register_snapshot("tasks", lambda: _poll_once())
+    from backend.src.common.resource_versions import add_resource_version_listener, remove_resource_version_listener
+
+    add_resource_version_listener(channel.mark_dirty)
+    received = 0
+    deadline = time.monotonic() + seconds
+
+    async def _client() -> None:
+        nonlocal received
+        sub = channel.subscribe({"tasks"})
+        cursor = channel.head
+        try:
+            while time.monotonic() < deadline:
+                if await sub.wait(max(0.0, min(15.0, deadline - time.monotonic()))):
+                    events, _, cursor = channel.events_after(cursor, {"tasks"})
+                    received += len(events)
+        finally:
+            channel.unsubscribe(sub)
+
+    async def _writer() -> None:
+        for i in range(writes):
+            await asyncio.sleep(seconds / (writes + 1))
+            with get_connection() as conn:
+                conn.execute(
+                    "INSERT INTO tasks (title, status, created_at) VALUES (?, 'queued', '2024-01-01')",
+                    (f"bench {i}",),
+                )
+
+    try:
+        await asyncio.gather(_writer(), *[_client() for _ in range(clients)])
+    finally:
+        remove_resource_version_listener(channel.mark_dirty)
+    return {"received": received, **channel.snapshot_stats()}
+
+
+def _measure(label: str, coro_factory) -> float:
+    cpu_started = time.process_time()
+    wall_started = time.perf_counter()
+    result = asyncio.run(coro_factory())
+    cpu = time.process_time() - cpu_started
+    wall = time.perf_counter() - wall_started
+    print(f"{label:<28} cpu {cpu * 1000:>9.1f} ms  wall {wall:>6.2f} s  cpu% {100.0 * cpu / wall:>6.2f}  {result}")
+    return cpu
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--interval-ms", type=int, default=1000, help="模拟 UI 轮询间隔")
+    parser.add_argument("--writes", type=int, default=3, help="推送场景下发生的写入次数")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["AGENT_DB_PATH"] = str(Path(tmp) / "bench.db")
+        os.environ["AGENT_PROMPT_ROOT"] = str(Path(tmp) / "prompt")
+
+        from backend.src.storage import init_db
+
+        init_db()
+        clients = max(1, int(args.clients))
+        seconds = max(1.0, float(args.seconds))
+        print(f"clients: {clients}, duration: {seconds:.0f}s, poll interval: {args.interval_ms}ms")
+        polling = _measure("polling", lambda: _run_pollers(clients, seconds, args.interval_ms / 1000.0))
+        pushing = _measure("state channel (idle)", lambda: _run_subscribers(clients, seconds, max(0, int(args.writes))))
+        if pushing > 0:
+            print(f"cpu reduction: {polling / pushing:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
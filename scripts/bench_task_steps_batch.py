@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+步骤持久化基准：对比逐条写入与批量写入（单事务 executemany）一个 N 步计划的状态迁移耗时。
+
+每种方式都执行：全部标记 running -> 全部写入结果并标记 done（步骤创建不计时，两种方式相同）。
+
+用法：
+    python scripts/bench_task_steps_batch.py --steps 100 --rounds 5
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, _PROJECT_ROOT)
+
+
+def _plan(task_id: int, run_id: int, steps: int):
+    from backend.src.constants import STEP_STATUS_PLANNED
+    from backend.src.services.tasks.task_queries import TaskStepCreateParams
+
+    return [
+        TaskStepCreateParams(
+            task_id=task_id,
+            run_id=run_id,
+            title=f"步骤 {i + 1}",
+            status=STEP_STATUS_PLANNED,
+            detail='{"type": "llm_call", "payload": {"prompt": "bench"}}',
+            step_order=i + 1,
+        )
+        for i in range(steps)
+    ]
+
+
+def _create_steps(task_id: int, run_id: int, steps: int):
+    from backend.src.services.tasks.task_queries import create_task_step
+
+    return [create_task_step(params)[0] for params in _plan(task_id, run_id, steps)]
+
+
+def _persist_one_by_one(step_ids, run_id: int) -> None:
+    from backend.src.common.utils import now_iso
+    from backend.src.services.tasks.task_queries import mark_task_step_done, mark_task_step_running
+
+    for step_id in step_ids:
+        mark_task_step_running(step_id=step_id, run_id=run_id, attempts=1, started_at=now_iso())
+    for step_id in step_ids:
+        mark_task_step_done(step_id=step_id, result='{"ok": true}', finished_at=now_iso())
+
+
+def _persist_batched(step_ids, run_id: int) -> None:
+    from backend.src.common.utils import now_iso
+    from backend.src.constants import STEP_STATUS_DONE, STEP_STATUS_RUNNING
+    from backend.src.services.tasks.task_queries import (
+        TaskStepTransition,
+        apply_task_step_transitions,
+    )
+
+    started_at = now_iso()
+    apply_task_step_transitions(
+        [
+            TaskStepTransition(step_id=step_id, status=STEP_STATUS_RUNNING, run_id=run_id, attempts=1, started_at=started_at)
+            for step_id in step_ids
+        ]
+    )
+    finished_at = now_iso()
+    apply_task_step_transitions(
+        [
+            TaskStepTransition(step_id=step_id, status=STEP_STATUS_DONE, result='{"ok": true}', finished_at=finished_at)
+            for step_id in step_ids
+        ]
+    )
+
+
+def _measure(label: str, func, rounds: int, steps: int) -> float:
+    samples = []
+    for round_index in range(rounds):
+        run_id = round_index + 1
+        step_ids = _create_steps(1, run_id, steps)
+        started = time.perf_counter()
+        func(step_ids, run_id)
+        samples.append((time.perf_counter() - started) * 1000)
+    best = min(samples)
+    print(f"{label:<24} best {best:>9.1f} ms   avg {sum(samples) / len(samples):>9.1f} ms")
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--steps", type=int, default=100, help="计划步骤数")
+    parser.add_argument("--rounds", type=int, default=5, help="每种方式重复次数")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["AGENT_DB_PATH"] = str(Path(tmp) / "bench.db")
+        os.environ["AGENT_PROMPT_ROOT"] = str(Path(tmp) / "prompt")
+
+        from backend.src.storage import init_db
+
+        init_db()
+        steps = max(1, int(args.steps))
+        rounds = max(1, int(args.rounds))
+        print(f"plan: {steps} steps, {rounds} rounds (running + done)")
+        single = _measure("one-by-one", _persist_one_by_one, rounds, steps)
+        batched = _measure("batched", _persist_batched, rounds, steps)
+        print(f"speedup: {single / batched:.1f}x" if batched > 0 else "speedup: n/a")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+web_fetch 候选抽取基准：对一组保存下来的搜索结果页/候选页，分别测量
+文档模型构建（流式 HTML 解析）、候选链接抽取、候选页内容打分的单页耗时。
+
+语料目录下的 .html/.htm/.md/.txt/.json/.csv 文件各视为一页；未指定 --corpus 时生成
+bing / 360 / 通用锚点三类合成搜索结果页（仅用于自测解析路径，数值不代表真实页面）。
+
+用法：
+    python scripts/bench_web_fetch_extraction.py --corpus ./saved_pages --query "黄金 价格 元/克" --runs 5
+    python scripts/bench_web_fetch_extraction.py --synthetic 30 --results 40
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, _PROJECT_ROOT)
+
+_CORPUS_SUFFIXES = {".html", ".htm", ".md", ".txt", ".json", ".csv"}
+
+
+def _load_corpus(corpus_dir: str) -> list:
+    pages = []
+    for path in sorted(Path(corpus_dir).rglob("*")):
+        if path.is_file() and path.suffix.lower() in _CORPUS_SUFFIXES:
+            pages.append((path.name, path.read_text(encoding="utf-8", errors="replace")))
+    return pages
+
+
+def _synthetic_corpus(count: int, results: int) -> list:
+    filler = "<div class='nav'>" + "".join(f"<a href='/nav/{i}'>导航 {i}</a>" for i in range(40)) + "</div>"
+    script = "<script>var cfg={cdn:'https://static.example.com/app.js'};" + "x=1;" * 2000 + "</script>"
+    pages = []
+    for index in range(max(1, count)):
+        kind = index % 3
+        items = []
+        for rank in range(max(1, results)):
+            url = f"https://data{rank}.example.org/gold/history/{index}-{rank}"
+            summary = f"上海黄金交易所 2026-02-{rank % 28 + 1:02d} 黄金价格 {600 + rank}.{rank % 100:02d} 元/克 历史行情"
+            if kind == 0:
+                items.append(
+                    f'<li class="b_algo"><h2><a href="{url}">黄金价格历史数据 {rank}</a></h2>'
+                    f'<div class="b_caption"><p>{summary}</p></div></li>'
+                )
+            elif kind == 1:
+                items.append(
+                    f'<li class="res-list"><h3><a href="https://www.so.com/link?m={rank}" data-mdurl="{url}">'
+                    f'黄金价格历史数据 {rank}</a></h3><span class="res-list-summary">{summary}</span></li>'
+                )
+            else:
+                items.append(f'<div class="result"><a href="{url}">黄金价格历史数据 {rank}</a><p>{summary}</p></div>')
+        container = '<ol id="b_results">' if kind == 0 else "<ul>"
+        closing = "</ol>" if kind == 0 else "</ul>"
+        html = f"<html><head>{script}</head><body>{filler}{container}{''.join(items)}{closing}{filler}</body></html>"
+        pages.append((f"synthetic-{('bing', '360', 'generic')[kind]}-{index}.html", html))
+    return pages
+
+
+def _percentile(samples: list, ratio: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * ratio))]
+
+
+def _report(label: str, samples: list, total_chars: int) -> None:
+    total_seconds = sum(samples) / 1000.0
+    throughput = (total_chars / 1024.0 / 1024.0) / total_seconds if total_seconds > 0 else 0.0
+    print(
+        f"{label:<10} mean {statistics.mean(samples):8.2f} ms   p50 {statistics.median(samples):8.2f} ms   "
+        f"p95 {_percentile(samples, 0.95):8.2f} ms   {throughput:6.1f} MB/s"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--corpus", default="", help="保存的页面目录（递归读取）")
+    parser.add_argument("--synthetic", type=int, default=30, help="未指定 --corpus 时生成的合成页数")
+    parser.add_argument("--results", type=int, default=20, help="每个合成页的结果条数")
+    parser.add_argument("--query", default="黄金 价格 元/克 历史")
+    parser.add_argument("--runs", type=int, default=3, help="每页重复次数（取全部样本统计）")
+    parser.add_argument("--verbose", action="store_true", help="逐页打印候选数与页面类型")
+    args = parser.parse_args()
+
+    from backend.src.actions.handlers.tool_call import (
+        _analyze_web_fetch_candidate_content,
+        _build_web_fetch_query_keywords,
+        _extract_web_fetch_link_records_from_text,
+    )
+    from backend.src.common.web_document import build_web_document
+
+    pages = _load_corpus(args.corpus) if args.corpus else _synthetic_corpus(args.synthetic, args.results)
+    if not pages:
+        print(f"no pages found in corpus: {args.corpus}")
+        return
+    runs = max(1, int(args.runs))
+    query_keywords = _build_web_fetch_query_keywords(args.query)
+    total_chars = sum(len(text) for _, text in pages) * runs
+    print(f"pages: {len(pages)}  runs: {runs}  total: {total_chars / 1024.0:.1f} KiB")
+
+    parse_samples, link_samples, analyze_samples = [], [], []
+    candidate_counts = []
+    for name, text in pages:
+        for run in range(runs):
+            started = time.perf_counter()
+            document = build_web_document(text)
+            parse_samples.append((time.perf_counter() - started) * 1000.0)
+
+            started = time.perf_counter()
+            records = _extract_web_fetch_link_records_from_text(text, exclude_hosts=set(), query=args.query)
+            link_samples.append((time.perf_counter() - started) * 1000.0)
+
+            started = time.perf_counter()
+            _analyze_web_fetch_candidate_content(
+                url="https://bench.example.org/page",
+                context_text="",
+                output_text=text,
+                protocol=None,
+                query_keywords=query_keywords,
+            )
+            analyze_samples.append((time.perf_counter() - started) * 1000.0)
+            if run == 0:
+                candidate_counts.append(len(records))
+                if args.verbose:
+                    print(
+                        f"  {name:<40} {document.kind:<5} search_page={int(document.search_result_page)} "
+                        f"anchors={len(document.html_anchors)} blocks={len(document.block_anchors)} "
+                        f"tables={document.table_count} candidates={len(records)}"
+                    )
+
+    _report("parse", parse_samples, total_chars)
+    _report("links", link_samples, total_chars)
+    _report("analyze", analyze_samples, total_chars)
+    print(f"candidates per page: mean {statistics.mean(candidate_counts):.1f}  min {min(candidate_counts)}  max {max(candidate_counts)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+llm_records 压缩迁移：把历史内联的 prompt/response 转存到内容寻址 blob，输出回收空间报告（JSON）。
+
+用法：
+    python scripts/compact_llm_records.py --batch-size 200 --vacuum
+"""
+
+import argparse
+import json
+import os
+import sys
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, _PROJECT_ROOT)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="compact llm_records prompt/response into content-addressed blobs")
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--max-rows", type=int, default=0, help="<=0 表示处理全部")
+    parser.add_argument("--vacuum", action="store_true", help="迁移后执行 VACUUM，真正缩小数据库文件")
+    args = parser.parse_args()
+
+    from backend.src.services.llm.llm_blob_compaction import compact_llm_records
+
+    report = compact_llm_records(
+        batch_size=args.batch_size,
+        max_rows=args.max_rows if args.max_rows > 0 else None,
+        vacuum=bool(args.vacuum),
+    )
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    return 0 if report.get("ok") else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())